@@ -0,0 +1,3526 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+锚点系统
+锚点单监控与维护、子账户持仓/开平仓/维护、快照
+"""
+
+from datetime import datetime, timedelta
+import json
+import os
+import pytz
+import sqlite3
+import time
+import traceback
+
+from flask import Blueprint, jsonify, make_response, redirect, render_template, request
+
+from app_common import get_china_today
+from db_access import get_connection, get_db_path
+from state_store import (
+    MAINTENANCE_ORDERS, MAIN_ACCOUNT_MAINTENANCE, SUB_ACCOUNT_CONFIG, SUB_ACCOUNT_MAINTENANCE, SUB_ACCOUNT_MAINTENANCE_COUNT, SUB_ACCOUNT_OPENED_POSITIONS
+)
+
+anchor_bp = Blueprint('anchor', __name__)
+
+# ========== 锚点系统（OKEx持仓监控） ==========
+
+@anchor_bp.route('/warning-test')
+def warning_test():
+    """预警模块测试页面"""
+    return render_template('warning_test.html')
+
+@anchor_bp.route('/anchor-system')
+def anchor_system():
+    """锚点系统主页 - 重定向到实盘"""
+    return redirect('/anchor-system-real')
+
+@anchor_bp.route('/anchor-system-real')
+def anchor_system_real():
+    """实盘锚点系统"""
+    response = make_response(render_template('anchor_system_real.html'))
+    # 禁用所有缓存
+    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '-1'
+    return response
+
+@anchor_bp.route('/anchor-snapshots')
+def anchor_snapshots():
+    """锚点系统历史快照查看"""
+    response = make_response(render_template('anchor_snapshots.html'))
+    # 禁用所有缓存
+    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '-1'
+    return response
+
+@anchor_bp.route('/api/anchor-system/real/hourly-extreme-stats')
+def get_real_hourly_extreme_stats():
+    """获取实盘锚点系统最近1小时的极值统计（只统计每个币种的最新极值）"""
+    try:
+        from datetime import datetime, timedelta
+        import pytz
+        
+        db_path = get_db_path('anchor_system')
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        
+        # 使用北京时区
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now_beijing = datetime.now(beijing_tz)
+        one_hour_ago_beijing = now_beijing - timedelta(hours=1)
+        
+        # 转换为字符串（数据库中存储的是北京时间）
+        one_hour_ago_str = one_hour_ago_beijing.strftime('%Y-%m-%d %H:%M:%S')
+        
+        # 获取所有记录
+        cursor.execute("""
+            SELECT inst_id, pos_side, record_type, profit_rate, timestamp
+            FROM anchor_real_profit_records
+            ORDER BY timestamp DESC
+        """)
+        
+        all_records = cursor.fetchall()
+        
+        # 按币种、方向、类型分组，只保留最新的记录
+        latest_records = {}
+        for record in all_records:
+            inst_id, pos_side, record_type, profit_rate, timestamp = record
+            key = (inst_id, pos_side, record_type)
+            if key not in latest_records:
+                latest_records[key] = record
+        
+        # 统计最近1小时内的最新极值
+        stats = {
+            'short_max_profit': 0,  # 空单利润创新高
+            'short_max_loss': 0,    # 空单亏损创新高
+            'long_max_profit': 0,   # 多单利润创新高
+            'long_max_loss': 0      # 多单亏损创新高
+        }
+        
+        for key, record in latest_records.items():
+            inst_id, pos_side, record_type, profit_rate, timestamp = record
+            if timestamp >= one_hour_ago_str:
+                if pos_side == 'short' and record_type == 'max_profit':
+                    stats['short_max_profit'] += 1
+                elif pos_side == 'short' and record_type == 'max_loss':
+                    stats['short_max_loss'] += 1
+                elif pos_side == 'long' and record_type == 'max_profit':
+                    stats['long_max_profit'] += 1
+                elif pos_side == 'long' and record_type == 'max_loss':
+                    stats['long_max_loss'] += 1
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'time_range': f'最近1小时 (>{one_hour_ago_str})',
+            'current_time': now_beijing.strftime('%Y-%m-%d %H:%M:%S'),
+            'stats': stats,
+            'note': '只统计每个币种的最新极值记录（北京时间）'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/anchor-system-paper')
+def anchor_system_paper():
+    """模拟盘锚点系统"""
+    response = make_response(render_template('anchor_system_paper.html'))
+    # 禁用所有缓存
+    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '-1'
+    return response
+
+@anchor_bp.route('/anchor-system-v2')
+def anchor_system_v2():
+    """锚点系统主页 v2 (新URL避免缓存)"""
+    response = make_response(render_template('anchor_system.html'))
+    response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, post-check=0, pre-check=0, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '-1'
+    return response
+
+@anchor_bp.route('/api/anchor-system/monitors')
+def get_anchor_monitors():
+    """获取持仓监控记录"""
+    try:
+        limit = request.args.get('limit', 100, type=int)
+        db_path = get_db_path('anchor_system')
+        
+        conn = get_connection(db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT * FROM anchor_monitors 
+        ORDER BY timestamp DESC 
+        LIMIT ?
+        ''', (limit,))
+        
+        rows = cursor.fetchall()
+        monitors = []
+        for row in rows:
+            monitors.append({
+                'id': row['id'],
+                'timestamp': row['timestamp'],
+                'inst_id': row['inst_id'],
+                'pos_side': row['pos_side'],
+                'pos_size': row['pos_size'],
+                'avg_price': row['avg_price'],
+                'mark_price': row['mark_price'],
+                'upl': row['upl'],
+                'upl_ratio': row['upl_ratio'],
+                'margin': row['margin'],
+                'leverage': row['leverage'],
+                'profit_rate': row['profit_rate'],
+                'alert_type': row['alert_type'],
+                'alert_sent': row['alert_sent']
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': monitors,
+            'total': len(monitors)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/alerts')
+def get_anchor_alerts():
+    """获取告警历史"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        db_path = get_db_path('anchor_system')
+        
+        conn = get_connection(db_path)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT * FROM anchor_alerts 
+        ORDER BY timestamp DESC 
+        LIMIT ?
+        ''', (limit,))
+        
+        rows = cursor.fetchall()
+        alerts = []
+        for row in rows:
+            alerts.append({
+                'id': row['id'],
+                'timestamp': row['timestamp'],
+                'inst_id': row['inst_id'],
+                'pos_side': row['pos_side'],
+                'profit_rate': row['profit_rate'],
+                'alert_type': row['alert_type'],
+                'message': row['message'],
+                'sent_status': row['sent_status']
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': alerts,
+            'total': len(alerts)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/status')
+def get_anchor_status():
+    """获取系统状态"""
+    try:
+        import json
+        
+        # 读取配置
+        config_path = '/home/user/webapp/anchor_config.json'
+        with open(config_path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        # 获取最新监控记录
+        db_path = get_db_path('anchor_system')
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('SELECT COUNT(*) FROM anchor_monitors')
+        total_monitors = cursor.fetchone()[0]
+        
+        cursor.execute('SELECT COUNT(*) FROM anchor_alerts')
+        total_alerts = cursor.fetchone()[0]
+        
+        cursor.execute('''
+        SELECT * FROM anchor_monitors 
+        ORDER BY timestamp DESC 
+        LIMIT 1
+        ''')
+        latest = cursor.fetchone()
+        
+        conn.close()
+        
+        # 使用默认配置值（因为 anchor_config.json 没有 monitor 键）
+        return jsonify({
+            'success': True,
+            'status': {
+                'total_monitors': total_monitors,
+                'total_alerts': total_alerts,
+                'latest_check': latest[1] if latest else None,
+                'config': {
+                    'profit_target': 40.0,  # 默认盈利目标 40%
+                    'loss_limit': -10.0,     # 默认止损限制 -10%
+                    'check_interval': 30,    # 默认检查间隔 30秒
+                    'only_short': False      # 默认支持多空
+                }
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/profit-records')
+def get_anchor_profit_records():
+    """获取历史极值记录 - 实盘和模拟盘使用不同的表"""
+    try:
+        inst_id = request.args.get('inst_id')
+        pos_side = request.args.get('pos_side')
+        trade_mode = request.args.get('trade_mode', 'real')  # 默认实盘
+        
+        # 根据 trade_mode 选择不同的表
+        table_name = 'anchor_real_profit_records' if trade_mode == 'real' else 'anchor_paper_profit_records'
+        
+        db_path = get_db_path('anchor_system')
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        
+        if inst_id and pos_side:
+            # 查询特定币种的记录
+            cursor.execute(f'''
+            SELECT record_type, profit_rate, timestamp, pos_size, avg_price, mark_price, upl, margin, leverage
+            FROM {table_name}
+            WHERE inst_id = ? AND pos_side = ?
+            ORDER BY record_type
+            ''', (inst_id, pos_side))
+        else:
+            # 查询所有记录
+            cursor.execute(f'''
+            SELECT inst_id, pos_side, record_type, profit_rate, timestamp, pos_size, avg_price, mark_price
+            FROM {table_name}
+            ORDER BY inst_id, pos_side, record_type
+            ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        records = []
+        if inst_id and pos_side:
+            for row in rows:
+                records.append({
+                    'record_type': row[0],
+                    'profit_rate': row[1],
+                    'timestamp': row[2],
+                    'pos_size': row[3],
+                    'avg_price': row[4],
+                    'mark_price': row[5],
+                    'upl': row[6],
+                    'margin': row[7],
+                    'leverage': row[8]
+                })
+        else:
+            for row in rows:
+                records.append({
+                    'inst_id': row[0],
+                    'pos_side': row[1],
+                    'record_type': row[2],
+                    'profit_rate': row[3],
+                    'timestamp': row[4],
+                    'pos_size': row[5],
+                    'avg_price': row[6],
+                    'mark_price': row[7]
+                })
+        
+        return jsonify({
+            'success': True,
+            'records': records,
+            'total': len(records),
+            'trade_mode': trade_mode
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/cleanup-extremes', methods=['POST'])
+def cleanup_extreme_records():
+    """清理错误的极值记录（删除所有亏损记录）"""
+    try:
+        import sys
+        sys.path.insert(0, '/home/user/webapp')
+        from extreme_correction_system import (
+            init_correction_system, backup_current_data,
+            detect_error_records, delete_error_records, get_statistics
+        )
+        
+        # 初始化
+        from anchor_system import init_database
+        init_database()
+        init_correction_system()
+        
+        # 备份
+        backup_count = backup_current_data()
+        
+        # 检测错误记录
+        error_records = detect_error_records()
+        
+        if not error_records:
+            return jsonify({
+                'success': True,
+                'message': '没有发现错误记录',
+                'backup_count': backup_count,
+                'deleted_count': 0
+            })
+        
+        # 删除错误记录
+        deleted_count = delete_error_records(error_records, "Web端手动清理")
+        
+        # 获取统计
+        stats = get_statistics()
+        
+        return jsonify({
+            'success': True,
+            'message': f'已清理 {deleted_count} 条错误记录',
+            'backup_count': backup_count,
+            'deleted_count': deleted_count,
+            'statistics': stats
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/extreme-stats')
+def get_extreme_stats():
+    """获取极值记录统计信息"""
+    try:
+        import sys
+        sys.path.insert(0, '/home/user/webapp')
+        from extreme_correction_system import get_statistics, detect_error_records
+        
+        # 获取统计
+        stats = get_statistics()
+        
+        # 检测错误记录
+        error_records = detect_error_records()
+        
+        return jsonify({
+            'success': True,
+            'statistics': stats,
+            'error_count': len(error_records),
+            'has_errors': len(error_records) > 0
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/correction-log')
+def get_correction_log():
+    """获取纠错日志"""
+    try:
+        limit = int(request.args.get('limit', 20))
+        
+        db_path = get_db_path('anchor_system')
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT id, correction_type, inst_id, pos_side, record_type,
+               old_profit_rate, new_profit_rate, reason, created_at
+        FROM extreme_corrections_log
+        ORDER BY created_at DESC
+        LIMIT ?
+        ''', (limit,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        logs = []
+        for row in rows:
+            logs.append({
+                'id': row[0],
+                'correction_type': row[1],
+                'inst_id': row[2],
+                'pos_side': row[3],
+                'record_type': row[4],
+                'old_profit_rate': row[5],
+                'new_profit_rate': row[6],
+                'reason': row[7],
+                'created_at': row[8]
+            })
+        
+        return jsonify({
+            'success': True,
+            'logs': logs,
+            'total': len(logs)
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/current-positions')
+def get_current_positions():
+    """获取当前持仓情况 - 模拟盘直接读取数据库，实盘从 OKEx API 实时获取"""
+    try:
+        import sys
+        import sqlite3
+        from datetime import datetime
+        sys.path.append('/home/user/webapp')
+        from anchor_system import get_positions, calculate_profit_rate
+        
+        # 获取交易模式（默认为 paper 模拟盘）
+        trade_mode = request.args.get('trade_mode', 'paper')
+        
+        # 连接数据库，获取维护后的开仓价格
+        DB_PATH = get_db_path('trading_decision')
+        conn = get_connection(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 从数据库读取模拟盘数据 - 联合查询维护价格表
+        cursor.execute('''
+            SELECT 
+                p.inst_id, 
+                p.pos_side, 
+                COALESCE(amp.maintenance_price, p.open_price) as open_price,
+                p.open_size, 
+                p.updated_time, 
+                p.mark_price, 
+                p.profit_rate, 
+                p.upl, 
+                p.lever, 
+                p.margin,
+                amp.original_open_price,
+                amp.maintenance_count,
+                p.is_anchor
+            FROM position_opens p
+            LEFT JOIN anchor_maintenance_prices amp 
+                ON p.inst_id = amp.inst_id 
+                AND p.pos_side = amp.pos_side 
+                AND p.trade_mode = amp.trade_mode
+            WHERE p.trade_mode = ?
+        ''', (trade_mode,))
+        
+        db_positions = cursor.fetchall()
+        conn.close()
+        
+        # 如果是模拟盘，直接使用数据库数据
+        if trade_mode == 'paper':
+            position_list = []
+            for row in db_positions:
+                profit_rate = row['profit_rate'] if row['profit_rate'] is not None else 0.0
+                
+                # 判断状态
+                status = '监控中'
+                status_class = 'normal'
+                if profit_rate >= 40:
+                    status = '接近盈利目标'
+                    status_class = 'profit'
+                elif profit_rate <= -10:
+                    status = '接近止损'
+                    status_class = 'loss'
+                
+                position_list.append({
+                    'inst_id': row['inst_id'],
+                    'pos_side': row['pos_side'],
+                    'pos_size': abs(float(row['open_size'])),
+                    'avg_price': float(row['open_price']),  # 现在使用维护价格
+                    'mark_price': float(row['mark_price']) if row['mark_price'] else 0.0,
+                    'lever': int(row['lever']) if row['lever'] else 10,
+                    'upl': float(row['upl']) if row['upl'] else 0.0,
+                    'margin': float(row['margin']) if row['margin'] else 0.0,
+                    'profit_rate': profit_rate,
+                    'status': status,
+                    'status_class': status_class,
+                    'is_anchor': int(row['is_anchor']) if row['is_anchor'] else 0
+                })
+            
+            return jsonify({
+                'success': True,
+                'positions': position_list,
+                'total': len(position_list),
+                'trade_mode': trade_mode
+            })
+        
+        # 如果是实盘，从 OKEx API 获取实时持仓
+        okex_positions = get_positions()
+        
+        if not okex_positions or len(okex_positions) == 0:
+            return jsonify({
+                'success': True,
+                'positions': [],
+                'total': 0,
+                'trade_mode': trade_mode
+            })
+        
+        # 将数据库记录转换为字典
+        db_positions_dict = {(row['inst_id'], row['pos_side']): row for row in db_positions}
+        
+        # 获取今日维护次数统计
+        from datetime import datetime
+        from collections import defaultdict
+        
+        maintenance_counts = defaultdict(int)
+
+        try:
+            maintenance_records = MAINTENANCE_ORDERS.load()
+
+            today = get_china_today()
+            for record in maintenance_records:
+                created_at = record.get('created_at', '')
+                if created_at.startswith(today):
+                    inst_id = record.get('inst_id', '')
+                    pos_side = record.get('pos_side', '')
+                    # 使用 (inst_id, pos_side) 作为key，区分多单和空单
+                    key = (inst_id, pos_side)
+                    maintenance_counts[key] += 1
+        except Exception as e:
+            print(f"读取维护记录失败: {e}")
+        
+        position_list = []
+        for pos in okex_positions:
+            inst_id = pos.get('instId')
+            pos_side = pos.get('posSide')
+            pos_value = float(pos.get('pos', 0))
+            
+            # 跳过持仓量为0的
+            if pos_value == 0:
+                continue
+            
+            # 查找数据库记录（可能是锚点单，也可能不是）
+            db_record = db_positions_dict.get((inst_id, pos_side))
+            
+            # 安全转换函数
+            def safe_float(value, default=0):
+                try:
+                    if value == '' or value is None:
+                        return default
+                    return float(value)
+                except (ValueError, TypeError):
+                    return default
+            
+            def safe_int(value, default=10):
+                try:
+                    if value == '' or value is None:
+                        return default
+                    return int(value)
+                except (ValueError, TypeError):
+                    return default
+            
+            # 计算数据
+            okex_avg_price = safe_float(pos.get('avgPx', 0))
+            mark_price = safe_float(pos.get('markPx', 0))
+            lever = safe_int(pos.get('lever', 10))
+            upl = safe_float(pos.get('upl', 0))
+            margin = safe_float(pos.get('margin', 0))
+            
+            # 如果数据库中有记录，使用数据库的开仓价格（可能是维护后的）
+            if db_record:
+                avg_price = float(db_record['open_price'])
+                is_anchor = int(db_record['is_anchor']) if db_record['is_anchor'] else 0
+                # 计算相对保证金的收益率（考虑杠杆）
+                # 方法：未实现盈亏 / 保证金 * 100
+                if margin > 0:
+                    profit_rate = (upl / margin) * 100
+                else:
+                    # 备用计算：价格变动率 * 杠杆
+                    if pos_side == 'short':
+                        profit_rate = ((avg_price - mark_price) / avg_price) * lever * 100
+                    else:  # long
+                        profit_rate = ((mark_price - avg_price) / avg_price) * lever * 100
+            else:
+                # 如果数据库中没有，使用 OKEx 的价格，标记为非锚点单
+                avg_price = okex_avg_price
+                is_anchor = 0
+                profit_rate = calculate_profit_rate(pos)
+            
+            # 判断状态
+            status = '监控中'
+            status_class = 'normal'
+            if profit_rate >= 40:
+                status = '接近盈利目标'
+                status_class = 'profit'
+            elif profit_rate <= -10:
+                status = '接近止损'
+                status_class = 'loss'
+            
+            position_list.append({
+                'inst_id': inst_id,
+                'pos_side': pos_side,
+                'pos_size': abs(pos_value),
+                'avg_price': avg_price,
+                'mark_price': mark_price,
+                'lever': lever,
+                'upl': upl,
+                'margin': margin,
+                'profit_rate': profit_rate,
+                'status': status,
+                'status_class': status_class,
+                'is_anchor': is_anchor,
+                'maintenance_count_today': maintenance_counts.get((inst_id, pos_side), 0)
+            })
+        
+        return jsonify({
+            'success': True,
+            'positions': position_list,
+            'total': len(position_list),
+            'trade_mode': trade_mode
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/today-statistics')
+def get_today_statistics():
+    """获取今日统计数据"""
+    try:
+        import sqlite3
+        import requests
+        from datetime import datetime
+        
+        trade_mode = request.args.get('trade_mode', 'real')
+        
+        # 获取维护次数统计
+        maintenance_stats_response = requests.get('http://localhost:5000/api/anchor/maintenance-stats', timeout=5)
+        maintenance_stats = {}
+        if maintenance_stats_response.status_code == 200:
+            maintenance_data = maintenance_stats_response.json()
+            if maintenance_data.get('success'):
+                maintenance_stats = maintenance_data.get('stats', {})
+        
+        # 统计今日维护次数（按类型分类）
+        auto_maintain_long = 0
+        auto_maintain_short = 0
+        super_maintain_long = 0
+        super_maintain_short = 0
+        
+        try:
+            records = MAINTENANCE_ORDERS.load()
+            
+            today = get_china_today()
+            for record in records:
+                if record.get('created_at', '').startswith(today):
+                    pos_side = record.get('pos_side')
+                    maintenance_type = record.get('maintenance_type', 'normal')
+                    
+                    if maintenance_type == 'super_maintain':
+                        if pos_side == 'long':
+                            super_maintain_long += 1
+                        else:
+                            super_maintain_short += 1
+                    else:
+                        if pos_side == 'long':
+                            auto_maintain_long += 1
+                        else:
+                            auto_maintain_short += 1
+        except Exception as e:
+            print(f"统计维护次数失败: {e}")
+        
+        # 获取当前持仓统计
+        positions_response = requests.get(
+            f'http://localhost:5000/api/anchor-system/current-positions?trade_mode={trade_mode}',
+            timeout=10
+        )
+        
+        total_positions = 0
+        anchor_positions = 0
+        warning_positions = 0
+        
+        if positions_response.status_code == 200:
+            positions_data = positions_response.json()
+            if positions_data.get('success'):
+                positions = positions_data.get('positions', [])
+                total_positions = len(positions)
+                
+                for pos in positions:
+                    if pos.get('is_anchor'):
+                        anchor_positions += 1
+                    if pos.get('profit_rate', 0) <= -8:
+                        warning_positions += 1
+        
+        return jsonify({
+            'success': True,
+            'statistics': {
+                'auto_maintain_long': auto_maintain_long,
+                'auto_maintain_short': auto_maintain_short,
+                'super_maintain_long': super_maintain_long,
+                'super_maintain_short': super_maintain_short,
+                'total_positions': total_positions,
+                'anchor_positions': anchor_positions,
+                'warning_positions': warning_positions
+            },
+            'trade_mode': trade_mode,
+            'date': get_china_today()
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@anchor_bp.route('/api/anchor-system/sub-account-positions')
+def get_sub_account_positions():
+    """获取子账号持仓"""
+    from position_stream import read_positions
+    try:
+        import requests
+        import hmac
+        import base64
+        import hashlib
+        from datetime import datetime
+        
+        # 加载子账号配置
+        config = SUB_ACCOUNT_CONFIG.load()
+        
+        all_positions = []
+        
+        # 遍历所有子账号
+        for sub_account in config.get('sub_accounts', []):
+            if not sub_account.get('enabled'):
+                continue
+            
+            account_name = sub_account['account_name']
+            api_key = sub_account['api_key']
+            secret_key = sub_account['secret_key']
+            passphrase = sub_account['passphrase']
+            
+            api_success = False
+            
+            try:
+                # 持仓流服务（position_stream.py）在线时直接读本地持仓簿，否则签名请求REST
+                data = read_positions(account_name, inst_type='SWAP')
+                if data is not None:
+                    data = {'code': '0', 'data': data}
+                else:
+                    # 生成OKEx签名 - GET请求需要在签名中包含查询参数
+                    request_path = '/api/v5/account/positions'
+                    query_string = 'instType=SWAP'
+                    timestamp = datetime.utcnow().strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+                    message = timestamp + 'GET' + request_path + '?' + query_string
+                    mac = hmac.new(
+                        secret_key.encode('utf-8'),
+                        message.encode('utf-8'),
+                        hashlib.sha256
+                    )
+                    signature = base64.b64encode(mac.digest()).decode('utf-8')
+                    
+                    headers = {
+                        'OK-ACCESS-KEY': api_key,
+                        'OK-ACCESS-SIGN': signature,
+                        'OK-ACCESS-TIMESTAMP': timestamp,
+                        'OK-ACCESS-PASSPHRASE': passphrase,
+                        'Content-Type': 'application/json'
+                    }
+                    
+                    # 获取持仓
+                    url = f"https://www.okx.com{request_path}"
+                    params = {'instType': 'SWAP'}
+                    response = requests.get(url, headers=headers, params=params, timeout=10)
+                    
+                    data = response.json() if response.status_code == 200 else None
+                
+                if data is not None:
+                    print(f"⚠️ 子账号 {account_name} API响应: code={data.get('code')}, 持仓数={len(data.get('data', []))}")
+                    if data.get('code') == '0':
+                        api_success = True
+                        # 处理持仓数据
+                        for pos in data.get('data', []):
+                            # 安全转换float，处理空字符串
+                            try:
+                                pos_size = float(pos.get('pos') or 0)
+                            except:
+                                pos_size = 0
+                            
+                            if pos_size == 0:
+                                continue
+                            
+                            try:
+                                avg_px = float(pos.get('avgPx') or 0)
+                                mark_px = float(pos.get('markPx') or 0)
+                                upl = float(pos.get('upl') or 0)
+                                notional_usd = float(pos.get('notionalUsd') or 0)
+                                # 打印原始字段值
+                                print(f"🔍 原始数据 - imr: {pos.get('imr')}, margin: {pos.get('margin')}, mgnRatio: {pos.get('mgnRatio')}")
+                                # 优先使用 margin（占用保证金），而不是 imr（初始保证金）
+                                margin = float(pos.get('margin') or pos.get('imr') or 0)
+                                print(f"💰 最终使用的保证金: {margin}")
+                            except Exception as e:
+                                print(f"⚠️ 数据转换失败: {e}, pos={pos}")
+                                continue
+                            
+                            leverage = pos.get('lever', '10')
+                            
+                            # 计算盈亏率（相对于保证金，反映真实杠杆收益率）
+                            if margin > 0:
+                                profit_rate = (upl / margin) * 100
+                            else:
+                                profit_rate = 0
+                            
+                            # 获取维护次数
+                            maintenance_count = 0
+                            try:
+                                today = get_china_today()
+                                # Key格式: Wu666666_CRV-USDT-SWAP_long
+                                key = f"{account_name}_{pos['instId']}_{pos['posSide']}"
+                                record = SUB_ACCOUNT_MAINTENANCE.get(key)
+                                if record:
+                                    # 检查日期是否是今天
+                                    if record.get('date') == today:
+                                        maintenance_count = record.get('count', 0)
+                            except Exception as e:
+                                print(f"读取维护次数失败: {e}")
+                                pass
+                            
+                            all_positions.append({
+                                'account_name': account_name,
+                                'inst_id': pos['instId'],
+                                'pos_side': pos['posSide'],
+                                'pos_size': abs(pos_size),
+                                'avg_price': avg_px,
+                                'mark_price': mark_px,
+                                'leverage': leverage,
+                                'margin': margin,
+                                'upl': upl,
+                                'profit_rate': profit_rate,
+                                'notional_usd': abs(notional_usd),
+                                'maintenance_count': maintenance_count,
+                                'status': '正常',
+                                'is_sub_account': True
+                            })
+            
+            except Exception as e:
+                print(f"获取子账号 {account_name} 持仓失败: {e}")
+            
+            # 如果API失败，使用本地记录
+            if not api_success:
+                print(f"⚠️ 子账号 {account_name} API失败，使用本地记录")
+                try:
+                    opened_positions = SUB_ACCOUNT_OPENED_POSITIONS.all()
+                    
+                    for key, pos_info in opened_positions.items():
+                        if pos_info['account_name'] == account_name:
+                            # 获取维护次数
+                            maintenance_count = 0
+                            try:
+                                today = get_china_today()
+                                count_key = f"{account_name}:{pos_info['inst_id']}:{pos_info['pos_side']}:{today}"
+                                maintenance_count = SUB_ACCOUNT_MAINTENANCE_COUNT.get(count_key, 0)
+                            except:
+                                pass
+                            
+                            # 添加基于本地记录的持仓（没有实时价格数据）
+                            all_positions.append({
+                                'account_name': account_name,
+                                'inst_id': pos_info['inst_id'],
+                                'pos_side': pos_info['pos_side'],
+                                'pos_size': 0,  # 未知
+                                'avg_price': 0,  # 未知
+                                'mark_price': 0,  # 未知
+                                'leverage': '10',
+                                'margin': 10,  # 估算
+                                'upl': 0,  # 未知
+                                'profit_rate': 0,  # 未知
+                                'notional_usd': 10,  # 估算
+                                'maintenance_count': maintenance_count,
+                                'status': '⚠️ 数据来自本地记录',
+                                'is_sub_account': True,
+                                'from_local': True
+                            })
+                except Exception as e:
+                    print(f"读取本地持仓记录失败: {e}")
+        
+        # 合并同一账户、同一币种、同一方向的持仓（逐仓模式）
+        merged_positions = {}
+        for pos in all_positions:
+            # 创建合并键：账户名_币种_方向
+            merge_key = f"{pos['account_name']}_{pos['inst_id']}_{pos['pos_side']}"
+            
+            if merge_key in merged_positions:
+                # 已存在，合并数据
+                existing = merged_positions[merge_key]
+                
+                # 计算加权平均开仓价
+                total_value = existing['avg_price'] * existing['pos_size'] + pos['avg_price'] * pos['pos_size']
+                total_size = existing['pos_size'] + pos['pos_size']
+                if total_size > 0:
+                    weighted_avg_price = total_value / total_size
+                else:
+                    weighted_avg_price = existing['avg_price']
+                
+                # 合并数据
+                existing['pos_size'] += pos['pos_size']
+                existing['avg_price'] = weighted_avg_price
+                existing['margin'] += pos['margin']
+                existing['upl'] += pos['upl']
+                existing['notional_usd'] += pos['notional_usd']
+                
+                # 重新计算收益率（基于总保证金）
+                if existing['margin'] > 0:
+                    existing['profit_rate'] = (existing['upl'] / existing['margin']) * 100
+                else:
+                    existing['profit_rate'] = 0
+                
+                # 维护次数取最大值
+                existing['maintenance_count'] = max(existing['maintenance_count'], pos['maintenance_count'])
+                
+                # 标记价格使用最新的（假设最后一个是最新的）
+                existing['mark_price'] = pos['mark_price']
+            else:
+                # 新持仓，直接添加
+                merged_positions[merge_key] = pos.copy()
+        
+        # 转换为列表
+        final_positions = list(merged_positions.values())
+        
+        return jsonify({
+            'success': True,
+            'positions': final_positions,
+            'total': len(final_positions)
+        })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'查询失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/sub-account-config', methods=['GET', 'POST'])
+def sub_account_config():
+    """子账户配置管理"""
+    try:
+        if request.method == 'GET':
+            # 读取配置
+            config = SUB_ACCOUNT_CONFIG.load()
+            
+            return jsonify({
+                'success': True,
+                'config': config
+            })
+        
+        elif request.method == 'POST':
+            # 更新配置
+            data = request.json
+            
+            def apply(config):
+                # 更新所有子账户的超级维护开关
+                if 'super_maintain_long_enabled' in data:
+                    for sub_account in config.get('sub_accounts', []):
+                        sub_account['super_maintain_long_enabled'] = data['super_maintain_long_enabled']
+                
+                if 'super_maintain_short_enabled' in data:
+                    for sub_account in config.get('sub_accounts', []):
+                        sub_account['super_maintain_short_enabled'] = data['super_maintain_short_enabled']
+            
+            # 读-改-写在一个事务内完成
+            config = SUB_ACCOUNT_CONFIG.update(apply)
+            
+            return jsonify({
+                'success': True,
+                'message': '配置已更新',
+                'config': config
+            })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'操作失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor-system/warnings')
+def get_anchor_warnings():
+    """获取当前活跃的锚点预警"""
+    try:
+        import sqlite3
+        
+        # 获取交易模式
+        trade_mode = request.args.get('trade_mode', 'paper')
+        
+        DB_PATH = get_db_path('trading_decision')
+        conn = get_connection(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 查询活跃预警
+        cursor.execute('''
+            SELECT inst_id, pos_side, open_price, current_price, profit_rate, 
+                   open_size, warning_level, alert_message, status, created_at, trade_mode
+            FROM anchor_warning_monitor
+            WHERE status = 'active' AND trade_mode = ?
+            ORDER BY profit_rate ASC
+        ''', (trade_mode,))
+        
+        warnings = cursor.fetchall()
+        conn.close()
+        
+        warning_list = []
+        for row in warnings:
+            warning_list.append({
+                'inst_id': row['inst_id'],
+                'pos_side': row['pos_side'],
+                'open_price': float(row['open_price']),
+                'current_price': float(row['current_price']) if row['current_price'] else 0.0,
+                'profit_rate': float(row['profit_rate']),
+                'open_size': float(row['open_size']),
+                'warning_level': row['warning_level'],
+                'alert_message': row['alert_message'],
+                'status': row['status'],
+                'created_at': row['created_at'],
+                'trade_mode': row['trade_mode']
+            })
+        
+        return jsonify({
+            'success': True,
+            'warnings': warning_list,
+            'total': len(warning_list),
+            'trade_mode': trade_mode
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/super-maintain-anchor', methods=['POST'])
+def super_maintain_anchor_order():
+    """超级维护锚点单：买入100U，保留10U，卖出剩余"""
+    try:
+        import requests
+        import hmac
+        import base64
+        import hashlib
+        import json as json_lib
+        from datetime import datetime, timezone
+        from okex_api_config import OKEX_API_KEY, OKEX_SECRET_KEY, OKEX_PASSPHRASE, OKEX_REST_URL
+        
+        data = request.json
+        inst_id = data.get('inst_id')
+        pos_side = data.get('pos_side')
+        current_pos_size = float(data.get('current_pos_size', 0))
+        maintenance_amount = float(data.get('maintenance_amount', 100))  # 默认100U
+        target_margin = float(data.get('target_margin', 10))  # 默认保留10U
+        
+        print(f"🚀 开始超级维护: {inst_id} {pos_side} 当前持仓={current_pos_size}")
+        print(f"   维护金额: {maintenance_amount}U, 目标保证金: {target_margin}U")
+        
+        # 生成签名函数
+        def generate_signature(timestamp, method, request_path, body=''):
+            if body:
+                body = json_lib.dumps(body)
+            message = timestamp + method + request_path + body
+            mac = hmac.new(
+                bytes(OKEX_SECRET_KEY, encoding='utf8'),
+                bytes(message, encoding='utf-8'),
+                digestmod=hashlib.sha256
+            )
+            return base64.b64encode(mac.digest()).decode()
+        
+        def get_headers(method, request_path, body=''):
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+            sign = generate_signature(timestamp, method, request_path, body)
+            return {
+                'OK-ACCESS-KEY': OKEX_API_KEY,
+                'OK-ACCESS-SIGN': sign,
+                'OK-ACCESS-TIMESTAMP': timestamp,
+                'OK-ACCESS-PASSPHRASE': OKEX_PASSPHRASE,
+                'Content-Type': 'application/json'
+            }
+        
+        # 获取当前标记价格和杠杆
+        position_path = f'/api/v5/account/positions?instType=SWAP&instId={inst_id}'
+        headers = get_headers('GET', position_path)
+        pos_response = requests.get(OKEX_REST_URL + position_path, headers=headers, timeout=10)
+        pos_data = pos_response.json()
+        
+        mark_price = 0
+        lever = 10
+        if pos_data.get('code') == '0' and pos_data.get('data'):
+            for position in pos_data['data']:
+                if position.get('posSide') == pos_side:
+                    mark_price = float(position.get('markPx', 0))
+                    lever = int(position.get('lever', 10))
+                    break
+        
+        if mark_price == 0:
+            return jsonify({
+                'success': False,
+                'message': f'无法获取标记价格，检查持仓和行情数据'
+            })
+        
+        print(f"📊 标记价格: ${mark_price}, 杠杆: {lever}x")
+        
+        # 计算买入数量：maintenance_amount × 杠杆 / 标记价格
+        buy_size_raw = (maintenance_amount * lever) / mark_price
+        
+        # 获取合约面值
+        inst_path = f'/api/v5/public/instruments?instType=SWAP&instId={inst_id}'
+        inst_resp = requests.get(OKEX_REST_URL + inst_path, timeout=10)
+        inst_data = inst_resp.json()
+        lot_size = 1
+        if inst_data.get('code') == '0' and inst_data.get('data'):
+            lot_size = float(inst_data['data'][0].get('ctVal', 1))
+        
+        # 向下取整到lot_size的整数倍
+        buy_size = int(buy_size_raw / lot_size) * lot_size
+        
+        print(f"💰 买入数量: {buy_size} (原始: {buy_size_raw:.2f}, lot_size: {lot_size})")
+        
+        # 第一步：买入100U
+        order_path = '/api/v5/trade/order'
+        buy_side = 'sell' if pos_side == 'short' else 'buy'
+        
+        buy_order_body = {
+            'instId': inst_id,
+            'tdMode': 'isolated',
+            'side': buy_side,
+            'posSide': pos_side,
+            'ordType': 'market',
+            'sz': str(buy_size),
+            'lever': str(lever)
+        }
+        
+        headers = get_headers('POST', order_path, buy_order_body)
+        buy_response = requests.post(
+            OKEX_REST_URL + order_path,
+            headers=headers,
+            json=buy_order_body,
+            timeout=10
+        )
+        buy_data = buy_response.json()
+        
+        if buy_data.get('code') != '0':
+            return jsonify({
+                'success': False,
+                'message': f'买入失败: {buy_data.get("msg")}',
+                'error_code': buy_data.get('code')
+            })
+        
+        buy_order_id = buy_data['data'][0]['ordId']
+        print(f"✅ 买入订单提交成功: {buy_order_id}")
+        
+        # 等待3秒让订单成交
+        import time
+        time.sleep(3)
+        
+        # 查询买入后的持仓
+        pos_response = requests.get(OKEX_REST_URL + position_path, headers=headers, timeout=10)
+        pos_data = pos_response.json()
+        
+        new_pos_size = current_pos_size
+        if pos_data.get('code') == '0' and pos_data.get('data'):
+            for position in pos_data['data']:
+                if position.get('posSide') == pos_side:
+                    new_pos_size = abs(float(position.get('pos', 0)))
+                    break
+        
+        print(f"📊 买入后持仓: {new_pos_size}")
+        
+        # 计算保留目标：target_margin × 杠杆 / 标记价格
+        keep_size_raw = (target_margin * lever) / mark_price
+        keep_size = int(keep_size_raw / lot_size) * lot_size
+        
+        # 计算卖出数量
+        sell_size_raw = new_pos_size - keep_size
+        sell_size = int(sell_size_raw / lot_size) * lot_size
+        
+        if sell_size <= 0:
+            print(f"⚠️  无需卖出，当前持仓已小于目标")
+            return jsonify({
+                'success': True,
+                'message': '超级维护完成（无需卖出）',
+                'data': {
+                    'buy_order_id': buy_order_id,
+                    'buy_size': buy_size,
+                    'new_pos_size': new_pos_size,
+                    'keep_size': keep_size
+                }
+            })
+        
+        print(f"💰 卖出数量: {sell_size} (保留: {keep_size})")
+        
+        # 第二步：卖出到保留10U
+        sell_side = 'buy' if pos_side == 'short' else 'sell'
+        
+        sell_order_body = {
+            'instId': inst_id,
+            'tdMode': 'isolated',
+            'side': sell_side,
+            'posSide': pos_side,
+            'ordType': 'market',
+            'sz': str(sell_size)
+        }
+        
+        headers = get_headers('POST', order_path, sell_order_body)
+        sell_response = requests.post(
+            OKEX_REST_URL + order_path,
+            headers=headers,
+            json=sell_order_body,
+            timeout=10
+        )
+        sell_data = sell_response.json()
+        
+        if sell_data.get('code') != '0':
+            return jsonify({
+                'success': False,
+                'message': f'卖出失败: {sell_data.get("msg")}',
+                'buy_order_id': buy_order_id,
+                'error_code': sell_data.get('code')
+            })
+        
+        sell_order_id = sell_data['data'][0]['ordId']
+        print(f"✅ 卖出订单提交成功: {sell_order_id}")
+        
+        # 保存超级维护记录（计数+2）
+        try:
+            def add_record(records):
+                # 添加超级维护记录
+                new_record = {
+                    'id': len(records) + 1,
+                    'inst_id': inst_id,
+                    'pos_side': pos_side,
+                    'type': 'super_maintain',  # 标记为超级维护
+                    'buy_order_id': buy_order_id,
+                    'buy_size': buy_size,
+                    'sell_order_id': sell_order_id,
+                    'sell_size': sell_size,
+                    'keep_size': keep_size,
+                    'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                    'status': 'success',
+                    'maintenance_count': 1  # 超级维护也是计数+1
+                }
+                
+                records.insert(0, new_record)
+                return records[:100]
+            
+            MAINTENANCE_ORDERS.update(add_record)
+            
+            print(f"✅ 超级维护记录已保存")
+        except Exception as save_error:
+            print(f"⚠️  保存超级维护记录失败: {save_error}")
+        
+        return jsonify({
+            'success': True,
+            'message': '超级维护执行成功',
+            'data': {
+                'buy_order_id': buy_order_id,
+                'buy_size': buy_size,
+                'sell_order_id': sell_order_id,
+                'sell_size': sell_size,
+                'keep_size': keep_size,
+                'new_pos_size': new_pos_size
+            }
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'超级维护失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/maintain-anchor', methods=['POST'])
+def maintain_anchor_order():
+    """维护锚点单：以市价买入10倍底仓数量（10倍杠杆），然后立即平掉92%"""
+    try:
+        import requests
+        import hmac
+        import base64
+        import hashlib
+        import json as json_lib
+        from datetime import datetime, timezone
+        from okex_api_config import OKEX_API_KEY, OKEX_SECRET_KEY, OKEX_PASSPHRASE, OKEX_REST_URL
+        
+        data = request.json
+        inst_id = data.get('inst_id')
+        pos_side = data.get('pos_side')  # 'short' or 'long'
+        pos_size = float(data.get('pos_size'))
+        auto_adjust = data.get('auto_adjust', False)  # 是否自动调整保证金（只用于自动维护-10%）
+        
+        # 检查今日维护次数
+        from collections import defaultdict
+        
+        today = get_china_today()
+        
+        # 统计今天的维护次数
+        today_count = 0
+        try:
+            records = MAINTENANCE_ORDERS.load()
+            
+            for record in records:
+                created_at = record.get('created_at', '')
+                if created_at.startswith(today):
+                    if record.get('inst_id') == inst_id and record.get('pos_side') == pos_side:
+                        today_count += 1
+        except Exception as e:
+            print(f"读取维护记录失败: {e}")
+        
+        print(f"📊 {inst_id} {pos_side} 今日已维护次数: {today_count}/3")
+        
+        # 检查是否超过每日上限
+        if today_count >= 3:
+            return jsonify({
+                'success': False,
+                'message': f'今日维护次数已达上限(3次)，请明天再试',
+                'today_count': today_count,
+                'max_count': 3
+            })
+        
+        # 计算10倍数量
+        order_size = pos_size * 10
+        
+        # 生成签名
+        def generate_signature(timestamp, method, request_path, body=''):
+            if body:
+                body = json_lib.dumps(body)
+            message = timestamp + method + request_path + body
+            mac = hmac.new(
+                bytes(OKEX_SECRET_KEY, encoding='utf8'),
+                bytes(message, encoding='utf-8'),
+                digestmod=hashlib.sha256
+            )
+            return base64.b64encode(mac.digest()).decode()
+        
+        def get_headers(method, request_path, body=''):
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+            sign = generate_signature(timestamp, method, request_path, body)
+            return {
+                'OK-ACCESS-KEY': OKEX_API_KEY,
+                'OK-ACCESS-SIGN': sign,
+                'OK-ACCESS-TIMESTAMP': timestamp,
+                'OK-ACCESS-PASSPHRASE': OKEX_PASSPHRASE,
+                'Content-Type': 'application/json'
+            }
+        
+        # 第一步：开仓 - 买入10倍数量（市价单）
+        order_path = '/api/v5/trade/order'
+        
+        # 确定开仓方向：如果当前是空单，就开空单；如果是多单，就开多单
+        side = 'sell' if pos_side == 'short' else 'buy'
+        
+        open_order_body = {
+            'instId': inst_id,
+            'tdMode': 'isolated',  # 逐仓模式
+            'side': side,
+            'posSide': pos_side,
+            'ordType': 'market',  # 市价单
+            'sz': str(order_size),
+            'lever': '10'  # 10倍杠杆
+        }
+        
+        headers = get_headers('POST', order_path, open_order_body)
+        open_response = requests.post(
+            OKEX_REST_URL + order_path,
+            headers=headers,
+            json=open_order_body,
+            timeout=10
+        )
+        
+        open_result = open_response.json()
+        
+        # 记录详细的响应日志
+        print(f"📝 OKEx开仓响应: {open_result}")
+        
+        if open_result.get('code') != '0':
+            error_msg = open_result.get('msg', '未知错误')
+            error_code = open_result.get('code', '未知代码')
+            print(f"❌ OKEx API错误 - Code: {error_code}, Message: {error_msg}")
+            
+            # 提供更友好的错误提示
+            if 'permission' in error_msg.lower():
+                error_msg = f"{error_msg}\n\n💡 解决方案：\n1. 登录OKEx后台 (www.okx.com)\n2. 进入API管理页面\n3. 确认API密钥已勾选「交易」权限\n4. 如未勾选，需要重新创建API密钥"
+            
+            return jsonify({
+                'success': False,
+                'message': f"开仓失败: {error_msg}",
+                'error_code': error_code,
+                'full_response': open_result
+            })
+        
+        open_order_id = open_result['data'][0]['ordId']
+        print(f"✅ 开仓订单提交成功，订单ID: {open_order_id}")
+        
+        # 等待订单成交（增加等待时间到3秒）
+        import time
+        print(f"⏳ 等待3秒确保订单成交...")
+        time.sleep(3)
+        
+        # 查询订单状态
+        order_detail_path = f'/api/v5/trade/order?instId={inst_id}&ordId={open_order_id}'
+        headers = get_headers('GET', order_detail_path)
+        order_detail_response = requests.get(
+            OKEX_REST_URL + order_detail_path,
+            headers=headers,
+            timeout=10
+        )
+        order_detail = order_detail_response.json()
+        print(f"📝 开仓订单状态: {order_detail}")
+        
+        # 检查订单是否完全成交
+        if order_detail.get('code') == '0' and order_detail.get('data'):
+            order_state = order_detail['data'][0].get('state', '')
+            if order_state != 'filled':
+                print(f"⚠️ 订单未完全成交，状态: {order_state}")
+                # 继续尝试平仓
+        
+        # 获取交易对的最小交易单位
+        instruments_path = f'/api/v5/public/instruments?instType=SWAP&instId={inst_id}'
+        instruments_response = requests.get(
+            OKEX_REST_URL + instruments_path,
+            timeout=10
+        )
+        instruments_data = instruments_response.json()
+        
+        # 获取lot size（合约面值）
+        lot_size = 1  # 默认
+        if instruments_data.get('code') == '0' and instruments_data.get('data'):
+            lot_size_str = instruments_data['data'][0].get('ctVal', '1')
+            lot_size = float(lot_size_str)
+            print(f"📊 {inst_id} 的合约面值: {lot_size}")
+        
+        # 第二步：平掉92% - 计算平仓数量，并按lot size取整
+        close_size_raw = order_size * 0.92
+        # 向下取整到lot size的倍数
+        import math
+        close_size = math.floor(close_size_raw / lot_size) * lot_size
+        
+        # 确保至少保留1个lot size
+        if close_size < lot_size:
+            close_size = lot_size
+        
+        print(f"📊 准备平仓: {close_size} (原始: {close_size_raw}, lot_size: {lot_size})")
+        
+        # 平仓方向与开仓相反
+        close_side = 'buy' if pos_side == 'short' else 'sell'
+        
+        close_order_body = {
+            'instId': inst_id,
+            'tdMode': 'isolated',  # 逐仓模式
+            'side': close_side,
+            'posSide': pos_side,
+            'ordType': 'market',
+            'sz': str(close_size)
+        }
+        
+        print(f"📝 平仓请求参数: {close_order_body}")
+        
+        headers = get_headers('POST', order_path, close_order_body)
+        close_response = requests.post(
+            OKEX_REST_URL + order_path,
+            headers=headers,
+            json=close_order_body,
+            timeout=10
+        )
+        
+        close_result = close_response.json()
+        print(f"📝 OKEx平仓响应: {close_result}")
+        
+        if close_result.get('code') != '0':
+            error_msg = close_result.get('msg', '未知错误')
+            error_code = close_result.get('code', '未知代码')
+            print(f"❌ 平仓失败 - Code: {error_code}, Message: {error_msg}")
+            
+            return jsonify({
+                'success': False,
+                'message': f"平仓失败: {error_msg} (开仓订单ID: {open_order_id})",
+                'error_code': error_code,
+                'open_order_id': open_order_id,
+                'full_response': close_result
+            })
+        
+        close_order_id = close_result['data'][0]['ordId']
+        
+        # 等待平仓订单成交
+        print(f"⏳ 等待3秒确保平仓订单成交...")
+        time.sleep(3)
+        
+        # 查询开仓订单的成交明细（fills）
+        fills_path = f'/api/v5/trade/fills?instId={inst_id}&ordId={open_order_id}'
+        headers = get_headers('GET', fills_path)
+        open_fills_response = requests.get(
+            OKEX_REST_URL + fills_path,
+            headers=headers,
+            timeout=10
+        )
+        open_fills_data = open_fills_response.json()
+        
+        # 查询平仓订单的成交明细
+        close_fills_path = f'/api/v5/trade/fills?instId={inst_id}&ordId={close_order_id}'
+        headers = get_headers('GET', close_fills_path)
+        close_fills_response = requests.get(
+            OKEX_REST_URL + close_fills_path,
+            headers=headers,
+            timeout=10
+        )
+        close_fills_data = close_fills_response.json()
+        
+        # 处理开仓成交明细
+        open_fills = []
+        open_total_fee = 0
+        open_total_qty = 0
+        open_total_value = 0
+        if open_fills_data.get('code') == '0' and open_fills_data.get('data'):
+            for fill in open_fills_data['data']:
+                qty = float(fill.get('fillSz', 0))
+                price = float(fill.get('fillPx', 0))
+                fee = float(fill.get('fee', 0))
+                value = qty * price  # 这笔交易的价值
+                open_fills.append({
+                    'trade_id': fill.get('tradeId'),
+                    'qty': qty,
+                    'price': price,
+                    'value': value,  # 交易价值
+                    'fee': abs(fee),  # 费用取绝对值
+                    'fee_currency': fill.get('feeCcy', 'USDT')
+                })
+                open_total_fee += abs(fee)
+                open_total_qty += qty
+                open_total_value += value
+        
+        # 处理平仓成交明细
+        close_fills = []
+        close_total_fee = 0
+        close_total_qty = 0
+        close_total_value = 0
+        if close_fills_data.get('code') == '0' and close_fills_data.get('data'):
+            for fill in close_fills_data['data']:
+                qty = float(fill.get('fillSz', 0))
+                price = float(fill.get('fillPx', 0))
+                fee = float(fill.get('fee', 0))
+                value = qty * price  # 这笔交易的价值
+                close_fills.append({
+                    'trade_id': fill.get('tradeId'),
+                    'qty': qty,
+                    'price': price,
+                    'value': value,  # 交易价值
+                    'fee': abs(fee),
+                    'fee_currency': fill.get('feeCcy', 'USDT')
+                })
+                close_total_fee += abs(fee)
+                close_total_qty += qty
+                close_total_value += value
+        
+        # 计算总费用和费率
+        total_fee = open_total_fee + close_total_fee
+        
+        # 计算平均开仓价格
+        avg_open_price = 0
+        if open_total_qty > 0:
+            avg_open_price = open_total_value / open_total_qty
+        
+        # 计算平均平仓价格
+        avg_close_price = 0
+        if close_total_qty > 0:
+            avg_close_price = close_total_value / close_total_qty
+        
+        # 计算交易金额（以USDT计）
+        trade_value = open_total_qty * avg_open_price
+        
+        # 计算总盈亏
+        total_profit = 0
+        if pos_side == 'long':
+            total_profit = (avg_close_price - avg_open_price) * close_total_qty
+        else:
+            total_profit = (avg_open_price - avg_close_price) * close_total_qty
+        
+        # 净盈亏（扣除手续费）
+        net_profit = total_profit - total_fee
+        
+        # 计算总成本：手续费 + 亏损（如果盈利则不算）
+        total_cost = total_fee
+        if total_profit < 0:
+            total_cost += abs(total_profit)  # 亏损也是成本
+        
+        # 计算费率（总成本/交易金额）
+        fee_rate = (total_cost / trade_value * 100) if trade_value > 0 else 0
+        
+        # 计算每笔订单的盈亏
+        # 对于每笔开仓，计算对应的平仓盈亏
+        # 盈亏 = (平仓价格 - 开仓价格) * 数量 (多单)
+        # 盈亏 = (开仓价格 - 平仓价格) * 数量 (空单)
+        for i, open_fill in enumerate(open_fills):
+            if i < len(close_fills):
+                close_fill = close_fills[i]
+                qty = min(open_fill['qty'], close_fill['qty'])
+                
+                if pos_side == 'long':
+                    # 多单：平仓价格 - 开仓价格
+                    profit = (close_fill['price'] - open_fill['price']) * qty
+                else:
+                    # 空单：开仓价格 - 平仓价格
+                    profit = (open_fill['price'] - close_fill['price']) * qty
+                
+                # 减去这笔交易的手续费
+                net_profit = profit - open_fill['fee'] - close_fill['fee']
+                
+                open_fill['profit'] = profit
+                open_fill['net_profit'] = net_profit
+                close_fill['profit'] = profit
+                close_fill['net_profit'] = net_profit
+        
+        print(f"📊 开仓成交: {len(open_fills)}笔, 总量{open_total_qty}, 均价${avg_open_price:.4f}, 费用${open_total_fee:.4f}")
+        print(f"📊 平仓成交: {len(close_fills)}笔, 总量{close_total_qty}, 均价${avg_close_price:.4f}, 费用${close_total_fee:.4f}")
+        print(f"💰 总费用: ${total_fee:.4f}, 总成本: ${total_cost:.4f}, 费率: {fee_rate:.4f}%")
+        print(f"💵 盈亏: ${total_profit:.4f}, 净盈亏: ${net_profit:.4f}")
+        
+        # 保存维护记录
+        try:
+            from datetime import datetime
+            
+            # 添加新记录（id 在写入时按当前记录数分配）
+            new_record = {
+                'id': None,
+                'account_name': 'JAMESYI',  # 账户名称（后续可从配置读取）
+                'inst_id': inst_id,
+                'pos_side': pos_side,
+                'original_size': pos_size,
+                'open_order_id': open_order_id,
+                'open_size': order_size,
+                'open_fills': open_fills,
+                'open_total_qty': open_total_qty,
+                'open_avg_price': avg_open_price,
+                'open_total_fee': open_total_fee,
+                'close_order_id': close_order_id,
+                'close_size': close_size,
+                'close_fills': close_fills,
+                'close_total_qty': close_total_qty,
+                'close_avg_price': avg_close_price,
+                'close_total_fee': close_total_fee,
+                'remaining_size': order_size - close_size,
+                'total_fee': total_fee,
+                'total_cost': total_cost,  # 总成本（手续费+亏损）
+                'fee_rate': fee_rate,
+                'total_profit': total_profit,  # 总盈亏
+                'net_profit': net_profit,  # 净盈亏（扣除手续费）
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'status': 'success'
+            }
+            
+            def add_record(records):
+                new_record['id'] = len(records) + 1
+                records.insert(0, new_record)  # 最新的记录放在前面
+                # 只保留最近100条记录
+                return records[:100]
+            
+            MAINTENANCE_ORDERS.update(add_record)
+            
+            print(f"✅ 维护记录已保存: ID {new_record['id']}")
+            
+            # 发送TG通知
+            try:
+                from telegram_notifier import TelegramNotifier
+                
+                notifier = TelegramNotifier()
+                
+                # 构建通知消息
+                tg_message = f"""🔧 **锚点单维护通知**
+
+📍 **币种**: {inst_id}
+📊 **方向**: {'做空' if pos_side == 'short' else '做多'}
+💼 **原始仓位**: {pos_size}
+
+**🟢 开仓详情**:
+• 订单ID: `{open_order_id}`
+• 开仓数量: {open_total_qty}
+• 平均价格: ${avg_open_price:.4f}
+• 成交笔数: {len(open_fills)}笔
+• 开仓费用: ${open_total_fee:.4f} USDT
+
+**🔴 平仓详情**:
+• 订单ID: `{close_order_id}`
+• 平仓数量: {close_total_qty}
+• 平均价格: ${avg_close_price:.4f}
+• 成交笔数: {len(close_fills)}笔
+• 平仓费用: ${close_total_fee:.4f} USDT
+
+**💰 盈亏统计**:
+• 总盈亏: ${total_profit:.4f} USDT {'📈' if total_profit > 0 else '📉' if total_profit < 0 else '➖'}
+• 手续费: ${total_fee:.4f} USDT
+• 总成本: ${total_cost:.4f} USDT (手续费{'+ 亏损' if total_profit < 0 else ''})
+• 净盈亏: ${net_profit:.4f} USDT {'✅' if net_profit > 0 else '❌' if net_profit < 0 else '➖'}
+• 费率: {fee_rate:.4f}%
+• 剩余仓位: {order_size - close_size}
+
+⏰ 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+"""
+                
+                notifier.send_message(tg_message)
+                print(f"✅ TG通知已发送")
+            except Exception as tg_error:
+                print(f"⚠️  发送TG通知失败: {tg_error}")
+                import traceback
+                print(traceback.format_exc())
+                # 不影响主流程
+        except Exception as save_error:
+            print(f"⚠️  保存维护记录失败: {save_error}")
+            # 不影响主流程，继续返回成功
+        
+        # 检查剩余持仓的保证金，如果大于2U则继续平仓到0.6-1U之间
+        # 注意：只在自动维护（auto_adjust=True）时才执行此检查
+        # 超级维护不做此限制
+        adjustment_order_id = None
+        adjustment_size = 0
+        
+        if auto_adjust:  # 只有自动维护才调整保证金
+            try:
+                print(f"🔍 检查剩余持仓保证金...")
+                
+                # 等待3秒让持仓数据更新
+                import time
+                time.sleep(3)
+                
+                # 查询当前持仓
+                position_path = f'/api/v5/account/positions?instType=SWAP&instId={inst_id}'
+                headers = get_headers('GET', position_path)
+                pos_response = requests.get(
+                    OKEX_REST_URL + position_path,
+                    headers=headers,
+                    timeout=10
+                )
+                pos_data = pos_response.json()
+                
+                if pos_data.get('code') == '0' and pos_data.get('data'):
+                    for position in pos_data['data']:
+                        if position.get('posSide') == pos_side:
+                            current_pos_size = abs(float(position.get('pos', 0)))
+                            current_margin = float(position.get('margin', 0))
+                            mark_price = float(position.get('markPx', 0))
+                            lever = int(position.get('lever', 10))
+                            
+                            print(f"📊 当前持仓: 数量={current_pos_size}, 保证金={current_margin:.4f}u, 标记价格={mark_price}")
+                            
+                            if current_margin > 2.0 and current_pos_size > 0:
+                                print(f"⚠️  保证金 {current_margin:.4f}u > 2u，需要调整")
+                                
+                                # 目标保证金设为0.8U（在0.6-1U之间）
+                                target_margin = 0.8
+                                
+                                # 计算需要的持仓量：margin = pos_size * mark_price / lever
+                                # target_pos_size = target_margin * lever / mark_price
+                                target_pos_size = (target_margin * lever) / mark_price
+                                
+                                # 计算需要平仓的数量
+                                adjustment_size_raw = current_pos_size - target_pos_size
+                                
+                                # 获取合约面值
+                                inst_path = f'/api/v5/public/instruments?instType=SWAP&instId={inst_id}'
+                                inst_resp = requests.get(OKEX_REST_URL + inst_path, timeout=10)
+                                inst_data = inst_resp.json()
+                                lot_size = 1
+                                if inst_data.get('code') == '0' and inst_data.get('data'):
+                                    lot_size = float(inst_data['data'][0].get('ctVal', 1))
+                                
+                                # 向下取整到lot_size的整数倍
+                                adjustment_size = int(adjustment_size_raw / lot_size) * lot_size
+                                
+                                if adjustment_size > 0:
+                                    print(f"📉 计划平仓: {adjustment_size} (目标保证金: {target_margin}u)")
+                                    
+                                    # 执行平仓
+                                    close_side = 'buy' if pos_side == 'short' else 'sell'
+                                    adjustment_body = {
+                                        'instId': inst_id,
+                                        'tdMode': 'isolated',
+                                        'side': close_side,
+                                        'posSide': pos_side,
+                                        'ordType': 'market',
+                                        'sz': str(adjustment_size)
+                                    }
+                                    
+                                    headers = get_headers('POST', order_path, adjustment_body)
+                                    adj_response = requests.post(
+                                        OKEX_REST_URL + order_path,
+                                        headers=headers,
+                                        json=adjustment_body,
+                                        timeout=10
+                                    )
+                                    adj_data = adj_response.json()
+                                    
+                                    if adj_data.get('code') == '0':
+                                        adjustment_order_id = adj_data['data'][0]['ordId']
+                                        print(f"✅ 调整平仓成功: 订单ID {adjustment_order_id}, 平仓数量 {adjustment_size}")
+                                    else:
+                                        print(f"❌ 调整平仓失败: {adj_data.get('msg')}")
+                                else:
+                                    print(f"⚠️  计算的平仓数量 <= 0，跳过调整")
+                            else:
+                                print(f"✅ 保证金 {current_margin:.4f}u <= 2u，无需调整")
+                            break
+            except Exception as adj_error:
+                print(f"⚠️  保证金调整失败: {adj_error}")
+                import traceback
+                print(traceback.format_exc())
+        else:
+            print(f"ℹ️  手动维护/超级维护模式，跳过保证金自动调整")
+        
+        response_data = {
+            'open_order_id': open_order_id,
+            'close_order_id': close_order_id,
+            'open_size': order_size,
+            'close_size': close_size,
+            'remaining_size': order_size - close_size,
+            'open_fills': open_fills,
+            'close_fills': close_fills,
+            'open_total_fee': open_total_fee,
+            'close_total_fee': close_total_fee,
+            'total_fee': total_fee,
+            'fee_rate': fee_rate
+        }
+        
+        if adjustment_order_id:
+            response_data['adjustment_order_id'] = adjustment_order_id
+            response_data['adjustment_size'] = adjustment_size
+        
+        return jsonify({
+            'success': True,
+            'message': '维护锚点单执行成功' + (f'，已调整保证金（平仓{adjustment_size}）' if adjustment_order_id else ''),
+            'data': response_data
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'执行失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/maintenance-orders', methods=['GET'])
+def get_maintenance_orders():
+    """查询维护锚点单记录"""
+    try:
+        # 读取记录
+        records = MAINTENANCE_ORDERS.load()
+        
+        # 获取查询参数
+        limit = request.args.get('limit', 50, type=int)
+        inst_id = request.args.get('inst_id', None)
+        
+        # 过滤
+        if inst_id:
+            records = [r for r in records if r['inst_id'] == inst_id]
+        
+        # 限制数量
+        records = records[:limit]
+        
+        return jsonify({
+            'success': True,
+            'data': records,
+            'total': len(records)
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'查询失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/test-api-permission', methods=['GET'])
+def test_api_permission():
+    """测试API密钥权限"""
+    try:
+        import requests
+        import hmac
+        import base64
+        import hashlib
+        import json as json_lib
+        from datetime import datetime, timezone
+        from okex_api_config import OKEX_API_KEY, OKEX_SECRET_KEY, OKEX_PASSPHRASE, OKEX_REST_URL
+        
+        # 生成签名
+        def generate_signature(timestamp, method, request_path, body=''):
+            if body:
+                body = json_lib.dumps(body)
+            message = timestamp + method + request_path + body
+            mac = hmac.new(
+                bytes(OKEX_SECRET_KEY, encoding='utf8'),
+                bytes(message, encoding='utf-8'),
+                digestmod=hashlib.sha256
+            )
+            return base64.b64encode(mac.digest()).decode()
+        
+        def get_headers(method, request_path, body=''):
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+            sign = generate_signature(timestamp, method, request_path, body)
+            return {
+                'OK-ACCESS-KEY': OKEX_API_KEY,
+                'OK-ACCESS-SIGN': sign,
+                'OK-ACCESS-TIMESTAMP': timestamp,
+                'OK-ACCESS-PASSPHRASE': OKEX_PASSPHRASE,
+                'Content-Type': 'application/json'
+            }
+        
+        # 测试1：读取账户余额
+        balance_path = '/api/v5/account/balance'
+        headers = get_headers('GET', balance_path)
+        balance_response = requests.get(
+            OKEX_REST_URL + balance_path,
+            headers=headers,
+            timeout=10
+        )
+        balance_result = balance_response.json()
+        
+        # 测试2：读取持仓信息
+        position_path = '/api/v5/account/positions'
+        headers = get_headers('GET', position_path)
+        position_response = requests.get(
+            OKEX_REST_URL + position_path,
+            headers=headers,
+            timeout=10
+        )
+        position_result = position_response.json()
+        
+        return jsonify({
+            'success': True,
+            'api_key': OKEX_API_KEY[:10] + '...',
+            'tests': {
+                'balance': {
+                    'code': balance_result.get('code'),
+                    'msg': balance_result.get('msg'),
+                    'has_permission': balance_result.get('code') == '0'
+                },
+                'positions': {
+                    'code': position_result.get('code'),
+                    'msg': position_result.get('msg'),
+                    'has_permission': position_result.get('code') == '0'
+                }
+            },
+            'message': '如果has_permission都是True，说明API密钥可以读取数据。如果交易失败，需要在OKEx后台勾选「交易」权限。'
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'测试失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/auto-maintenance-config', methods=['GET', 'POST'])
+def auto_maintenance_config():
+    """获取或设置自动维护配置"""
+    try:
+        import json as json_lib
+        import os
+        
+        config_file = 'auto_maintenance_config.json'
+        
+        if request.method == 'GET':
+            # 读取配置
+            if os.path.exists(config_file):
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    config = json_lib.load(f)
+            else:
+                # 默认配置
+                config = {
+                    'auto_maintain_long_enabled': False,
+                    'auto_maintain_short_enabled': False,
+                    'super_maintain_long_enabled': False,
+                    'super_maintain_short_enabled': False,
+                    'loss_threshold': -10,
+                    'margin_min': 0.6,
+                    'margin_max': 1.0,
+                    'last_check_time': None
+                }
+                # 保存默认配置
+                with open(config_file, 'w', encoding='utf-8') as f:
+                    json_lib.dump(config, f, ensure_ascii=False, indent=2)
+            
+            return jsonify({
+                'success': True,
+                'config': config
+            })
+        
+        elif request.method == 'POST':
+            # 更新配置
+            data = request.get_json()
+            
+            # 读取现有配置
+            if os.path.exists(config_file):
+                with open(config_file, 'r', encoding='utf-8') as f:
+                    config = json_lib.load(f)
+            else:
+                config = {
+                    'auto_maintain_long_enabled': False,
+                    'auto_maintain_short_enabled': False,
+                    'super_maintain_long_enabled': False,
+                    'super_maintain_short_enabled': False,
+                    'loss_threshold': -10,
+                    'margin_min': 0.6,
+                    'margin_max': 1.0,
+                    'last_check_time': None
+                }
+            
+            # 更新指定的字段
+            if 'auto_maintain_long_enabled' in data:
+                config['auto_maintain_long_enabled'] = data['auto_maintain_long_enabled']
+            if 'auto_maintain_short_enabled' in data:
+                config['auto_maintain_short_enabled'] = data['auto_maintain_short_enabled']
+            if 'super_maintain_long_enabled' in data:
+                config['super_maintain_long_enabled'] = data['super_maintain_long_enabled']
+            if 'super_maintain_short_enabled' in data:
+                config['super_maintain_short_enabled'] = data['super_maintain_short_enabled']
+            if 'loss_threshold' in data:
+                config['loss_threshold'] = data['loss_threshold']
+            if 'margin_min' in data:
+                config['margin_min'] = data['margin_min']
+            if 'margin_max' in data:
+                config['margin_max'] = data['margin_max']
+            
+            # 保存配置
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json_lib.dump(config, f, ensure_ascii=False, indent=2)
+            
+            return jsonify({
+                'success': True,
+                'message': '配置已更新',
+                'config': config
+            })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'操作失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/sub-account/config', methods=['GET', 'POST'])
+def sub_account_config_v2():
+    """获取或设置子账户配置"""
+    try:
+        if request.method == 'GET':
+            # 读取配置
+            config = SUB_ACCOUNT_CONFIG.load()
+            
+            return jsonify({
+                'success': True,
+                'config': config
+            })
+        
+        elif request.method == 'POST':
+            # 更新配置
+            data = request.get_json()
+            
+            def apply(config):
+                # 更新指定的字段
+                if 'super_maintain_long_enabled' in data:
+                    config['super_maintain_long_enabled'] = data['super_maintain_long_enabled']
+                if 'super_maintain_short_enabled' in data:
+                    config['super_maintain_short_enabled'] = data['super_maintain_short_enabled']
+            
+            # 读-改-写在一个事务内完成
+            config = SUB_ACCOUNT_CONFIG.update(apply)
+            
+            return jsonify({
+                'success': True,
+                'message': '子账户配置已更新',
+                'config': config
+            })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'操作失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/maintenance-stats', methods=['GET'])
+def get_maintenance_stats():
+    """获取维护次数统计（按自然日、币种和方向）"""
+    try:
+        from collections import defaultdict
+        
+        # 读取维护记录
+        records = MAINTENANCE_ORDERS.load()
+        
+        # 今天的日期
+        today = get_china_today()
+        
+        # 统计今天每个币种+方向的维护次数（普通维护和超级维护都是+1）
+        stats = defaultdict(int)
+        
+        for record in records:
+            created_at = record.get('created_at', '')
+            if created_at.startswith(today):
+                inst_id = record.get('inst_id', '')
+                pos_side = record.get('pos_side', '')
+                key = f"{inst_id}:{pos_side}"
+                
+                # 无论是普通维护还是超级维护，都计数+1
+                stats[key] += 1
+        
+        return jsonify({
+            'success': True,
+            'stats': dict(stats),
+            'today_date': today
+        })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'查询失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+# ==================== 历史快照API ====================
+
+@anchor_bp.route('/api/anchor/snapshots/positions', methods=['GET'])
+def get_position_snapshots():
+    """获取持仓历史快照"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        
+        # 获取参数
+        start_time = request.args.get('start_time')  # 2025-12-30 00:00:00
+        end_time = request.args.get('end_time')      # 2025-12-30 23:59:59
+        inst_id = request.args.get('inst_id')        # 可选：筛选币种
+        pos_side = request.args.get('pos_side')      # 可选：筛选方向
+        limit = int(request.args.get('limit', 100))  # 默认100条
+        
+        # 默认查询最近24小时
+        if not end_time:
+            end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if not start_time:
+            start_dt = datetime.now() - timedelta(hours=24)
+            start_time = start_dt.strftime('%Y-%m-%d %H:%M:%S')
+        
+        # 查询数据库
+        conn = get_connection('anchor_snapshots')
+        cursor = conn.cursor()
+        
+        # 构建查询
+        query = '''
+        SELECT snapshot_time, inst_id, pos_side, pos_size, avg_price,
+               mark_price, leverage, margin, profit_rate, upl,
+               maintenance_count, is_anchor, status
+        FROM position_snapshots
+        WHERE snapshot_time BETWEEN ? AND ?
+        '''
+        params = [start_time, end_time]
+        
+        if inst_id:
+            query += ' AND inst_id = ?'
+            params.append(inst_id)
+        
+        if pos_side:
+            query += ' AND pos_side = ?'
+            params.append(pos_side)
+        
+        query += ' ORDER BY snapshot_time DESC LIMIT ?'
+        params.append(limit)
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        # 转换为字典列表
+        snapshots = []
+        for row in rows:
+            snapshots.append({
+                'snapshot_time': row[0],
+                'inst_id': row[1],
+                'pos_side': row[2],
+                'pos_size': row[3],
+                'avg_price': row[4],
+                'mark_price': row[5],
+                'leverage': row[6],
+                'margin': row[7],
+                'profit_rate': row[8],
+                'upl': row[9],
+                'maintenance_count': row[10],
+                'is_anchor': row[11],
+                'status': row[12]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'snapshots': snapshots,
+            'count': len(snapshots),
+            'start_time': start_time,
+            'end_time': end_time
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'查询失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        }), 500
+
+@anchor_bp.route('/api/anchor/snapshots/statistics', methods=['GET'])
+def get_statistics_snapshots():
+    """获取统计历史快照"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        
+        # 获取参数
+        start_time = request.args.get('start_time')
+        end_time = request.args.get('end_time')
+        stat_type = request.args.get('stat_type')  # 可选：筛选统计类型
+        limit = int(request.args.get('limit', 100))
+        
+        # 默认查询最近24小时
+        if not end_time:
+            end_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if not start_time:
+            start_dt = datetime.now() - timedelta(hours=24)
+            start_time = start_dt.strftime('%Y-%m-%d %H:%M:%S')
+        
+        # 查询数据库
+        conn = get_connection('anchor_snapshots')
+        cursor = conn.cursor()
+        
+        # 构建查询
+        query = '''
+        SELECT snapshot_time, stat_type, stat_value, stat_label
+        FROM statistics_snapshots
+        WHERE snapshot_time BETWEEN ? AND ?
+        '''
+        params = [start_time, end_time]
+        
+        if stat_type:
+            query += ' AND stat_type = ?'
+            params.append(stat_type)
+        
+        query += ' ORDER BY snapshot_time DESC, stat_type LIMIT ?'
+        params.append(limit)
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        
+        # 转换为字典列表
+        snapshots = []
+        for row in rows:
+            snapshots.append({
+                'snapshot_time': row[0],
+                'stat_type': row[1],
+                'stat_value': row[2],
+                'stat_label': row[3]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'snapshots': snapshots,
+            'count': len(snapshots),
+            'start_time': start_time,
+            'end_time': end_time
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'查询失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        }), 500
+
+@anchor_bp.route('/api/anchor/snapshots/times', methods=['GET'])
+def get_snapshot_times():
+    """获取可用的快照时间点列表"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        
+        # 获取参数
+        date = request.args.get('date')  # 格式：2025-12-30
+        
+        if not date:
+            date = get_china_today()
+        
+        # 查询数据库
+        conn = get_connection('anchor_snapshots')
+        cursor = conn.cursor()
+        
+        # 查询当天的所有快照时间
+        cursor.execute('''
+        SELECT DISTINCT snapshot_time
+        FROM position_snapshots
+        WHERE snapshot_time LIKE ?
+        ORDER BY snapshot_time DESC
+        ''', (f"{date}%",))
+        
+        rows = cursor.fetchall()
+        times = [row[0] for row in rows]
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'times': times,
+            'count': len(times),
+            'date': date
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'查询失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        }), 500
+
+@anchor_bp.route('/api/anchor/reset-maintenance-count', methods=['POST'])
+def reset_maintenance_count():
+    """清零子账户今日维护次数"""
+    try:
+        from datetime import datetime
+        import pytz
+        
+        data = request.json
+        account_name = data.get('account_name')
+        inst_id = data.get('inst_id')
+        pos_side = data.get('pos_side')
+        
+        if not all([account_name, inst_id, pos_side]):
+            return jsonify({
+                'success': False,
+                'message': '缺少必要参数'
+            })
+        
+        # 构建记录键
+        record_key = f"{account_name}_{inst_id}_{pos_side}"
+        
+        # 获取当前北京时间的日期
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now_beijing = datetime.now(beijing_tz)
+        today_date = now_beijing.strftime('%Y-%m-%d')
+        
+        # 检查是否存在今日记录
+        if record_key not in SUB_ACCOUNT_MAINTENANCE:
+            return jsonify({
+                'success': False,
+                'message': '该持仓没有维护记录'
+            })
+        
+        old = {}
+        reset_time = now_beijing.strftime('%Y-%m-%d %H:%M:%S')
+        
+        def reset(record):
+            # 清零今日维护次数
+            old['count'] = record.get('count', 0)
+            old['date'] = record.get('date', '')
+            
+            # 重置记录
+            record['count'] = 0
+            record['date'] = today_date
+            record['last_reset'] = reset_time
+        
+        SUB_ACCOUNT_MAINTENANCE.update(record_key, reset, default={})
+        old_count = old['count']
+        old_date = old['date']
+        
+        return jsonify({
+            'success': True,
+            'message': f'清零成功！原维护次数: {old_count}次',
+            'data': {
+                'account_name': account_name,
+                'inst_id': inst_id,
+                'pos_side': pos_side,
+                'old_count': old_count,
+                'old_date': old_date,
+                'new_count': 0,
+                'reset_time': reset_time
+            }
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'清零失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/maintain-sub-account', methods=['POST'])
+def maintain_sub_account():
+    """子账户维护锚点单：买入100U并立即平掉"""
+    try:
+        import requests
+        import hmac
+        import base64
+        import hashlib
+        import json as json_lib
+        from datetime import datetime, timezone
+        import pytz
+        import math
+        import time
+        
+        data = request.json
+        account_name = data.get('account_name')
+        inst_id = data.get('inst_id')
+        pos_side = data.get('pos_side')
+        pos_size = float(data.get('pos_size', 0))
+        
+        # 新增参数：支持动态维护金额和目标保证金
+        maintenance_amount = float(data.get('amount', 100))  # 维护金额，默认100U
+        target_margin = float(data.get('target_margin', 10))  # 目标保证金，默认10U
+        maintenance_count = int(data.get('maintenance_count', 0))  # 当前维护次数
+        
+        if not all([account_name, inst_id, pos_side]):
+            return jsonify({
+                'success': False,
+                'message': '缺少必要参数'
+            })
+        
+        # 读取子账户配置
+        config = SUB_ACCOUNT_CONFIG.load()
+        
+        # 查找对应的子账户
+        sub_account = None
+        for acc in config.get('sub_accounts', []):
+            if acc['account_name'] == account_name:
+                sub_account = acc
+                break
+        
+        if not sub_account:
+            return jsonify({
+                'success': False,
+                'message': f'未找到子账户: {account_name}'
+            })
+        
+        api_key = sub_account['api_key']
+        secret_key = sub_account['secret_key']
+        passphrase = sub_account['passphrase']
+        
+        # 检查今日维护次数
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now_beijing = datetime.now(beijing_tz)
+        today_date = now_beijing.strftime('%Y-%m-%d')
+        
+        # 读取维护记录
+        record_key = f"{account_name}_{inst_id}_{pos_side}"
+        record = SUB_ACCOUNT_MAINTENANCE.get(record_key, {})
+        
+        # 检查今日维护次数
+        today_count = 0
+        if record.get('date') == today_date:
+            today_count = record.get('count', 0)
+        
+        max_count = sub_account.get('max_maintenance_count', 3)
+        if today_count >= max_count:
+            return jsonify({
+                'success': False,
+                'message': f'今日维护次数已达上限({max_count}次)，请明天再试或手动清零',
+                'today_count': today_count,
+                'max_count': max_count
+            })
+        
+        # OKEx API签名函数
+        def generate_signature(timestamp, method, request_path, body=''):
+            if body:
+                body = json_lib.dumps(body)
+            message = timestamp + method + request_path + body
+            mac = hmac.new(
+                bytes(secret_key, encoding='utf8'),
+                bytes(message, encoding='utf-8'),
+                digestmod=hashlib.sha256
+            )
+            return base64.b64encode(mac.digest()).decode()
+        
+        def get_headers(method, request_path, body=''):
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+            sign = generate_signature(timestamp, method, request_path, body)
+            return {
+                'OK-ACCESS-KEY': api_key,
+                'OK-ACCESS-SIGN': sign,
+                'OK-ACCESS-TIMESTAMP': timestamp,
+                'OK-ACCESS-PASSPHRASE': passphrase,
+                'Content-Type': 'application/json'
+            }
+        
+        OKEX_REST_URL = 'https://www.okx.com'
+        
+        # 维护操作：买入100U并立即平掉
+        # 计算买入数量：100U / 标记价格 * 杠杆
+        # 先获取当前标记价格
+        position_path = f'/api/v5/account/positions?instType=SWAP&instId={inst_id}'
+        headers = get_headers('GET', position_path)
+        pos_response = requests.get(
+            OKEX_REST_URL + position_path,
+            headers=headers,
+            timeout=10
+        )
+        pos_data = pos_response.json()
+        
+        mark_price = 0
+        for position in pos_data.get('data', []):
+            if position.get('posSide') == pos_side:
+                # 安全转换：处理空字符串和None
+                mark_px_str = position.get('markPx', '0')
+                try:
+                    mark_price = float(mark_px_str) if mark_px_str and mark_px_str != '' else 0
+                except (ValueError, TypeError):
+                    mark_price = 0
+                break
+        
+        if mark_price == 0:
+            # 如果没有持仓，查询行情获取价格
+            ticker_path = f'/api/v5/market/ticker?instId={inst_id}'
+            ticker_response = requests.get(
+                OKEX_REST_URL + ticker_path,
+                timeout=10
+            )
+            ticker_data = ticker_response.json()
+            if ticker_data.get('code') == '0' and ticker_data.get('data'):
+                # 安全转换：处理空字符串和None
+                last_price_str = ticker_data['data'][0].get('last', '0')
+                try:
+                    mark_price = float(last_price_str) if last_price_str and last_price_str != '' else 0
+                except (ValueError, TypeError):
+                    mark_price = 0
+        
+        if mark_price == 0:
+            return jsonify({
+                'success': False,
+                'message': f'无法获取标记价格，检查持仓和行情数据'
+            })
+        
+        print(f"🎯 子账户维护: {account_name} {inst_id} {pos_side}")
+        print(f"   标记价格: {mark_price}")
+        print(f"   维护金额: {maintenance_amount}U")
+        print(f"   目标保证金: {target_margin}U")
+        print(f"   杠杆: {sub_account.get('leverage', 10)}x")
+        
+        # 计算买入数量：使用动态维护金额
+        # pos_size = maintenance_amount * lever / mark_price
+        lever = int(sub_account.get('leverage', 10))
+        order_size = (maintenance_amount * lever) / mark_price
+        
+        # 向下取整到合约最小单位
+        import math
+        order_size = math.floor(order_size)
+        
+        # 计算平仓数量：保留target_margin对应的仓位
+        # 保留的仓位 = target_margin * lever / mark_price
+        keep_size = math.floor((target_margin * lever) / mark_price)
+        close_size = order_size - keep_size
+        
+        if close_size < 0:
+            close_size = 0  # 如果计算出负数，不平仓
+        
+        # 第零步：向逐仓仓位增加保证金（逐仓必须）
+        # 计算所需保证金：维护金额 / 杠杆 + 手续费缓冲（3%）
+        required_margin = maintenance_amount / lever * 1.03  # 加3%手续费和滑点缓冲
+        
+        margin_path = '/api/v5/account/position/margin-balance'
+        margin_body = {
+            'instId': inst_id,
+            'posSide': pos_side,
+            'type': 'add',  # 增加保证金
+            'amt': str(round(required_margin, 2)),
+            'ccy': 'USDT'
+        }
+        
+        print(f"💰 增加逐仓保证金: {required_margin:.2f} USDT 到 {inst_id} {pos_side}")
+        headers = get_headers('POST', margin_path, margin_body)
+        margin_response = requests.post(
+            OKEX_REST_URL + margin_path,
+            headers=headers,
+            json=margin_body,
+            timeout=10
+        )
+        
+        margin_result = margin_response.json()
+        print(f"📥 保证金增加响应: code={margin_result.get('code')}, msg={margin_result.get('msg')}")
+        
+        # 如果保证金增加失败，继续尝试（可能已经有足够保证金或是新仓位）
+        if margin_result.get('code') != '0':
+            print(f"⚠️  保证金增加失败（可能是新仓位或已有足够保证金）: {margin_result.get('msg')}")
+        else:
+            print(f"✅ 保证金增加成功")
+            # 等待保证金生效
+            time.sleep(1)
+        
+        # 第一步：开仓
+        order_path = '/api/v5/trade/order'
+        side = 'sell' if pos_side == 'short' else 'buy'
+        
+        open_order_body = {
+            'instId': inst_id,
+            'tdMode': 'cross',  # 改用全仓模式，避免逐仓保证金不足问题
+            'side': side,
+            'posSide': pos_side,
+            'ordType': 'market',
+            'sz': str(order_size)
+            # 全仓模式不需要指定杠杆，使用账户级别杠杆
+        }
+        
+        headers = get_headers('POST', order_path, open_order_body)
+        open_response = requests.post(
+            OKEX_REST_URL + order_path,
+            headers=headers,
+            json=open_order_body,
+            timeout=10
+        )
+        
+        open_result = open_response.json()
+        
+        # 详细日志：打印OKEx响应
+        print(f"📤 开仓请求: {open_order_body}")
+        print(f"📥 OKEx响应: code={open_result.get('code')}, msg={open_result.get('msg')}")
+        if open_result.get('code') != '0':
+            print(f"❌ 完整响应: {open_result}")
+        
+        if open_result.get('code') != '0':
+            return jsonify({
+                'success': False,
+                'message': f"开仓失败: {open_result.get('msg', '未知错误')}",
+                'error_code': open_result.get('code'),
+                'full_response': str(open_result)  # 添加完整响应
+            })
+        
+        open_order_id = open_result['data'][0]['ordId']
+        
+        # 等待订单成交
+        import time
+        time.sleep(2)
+        
+        # 第二步：平掉多余仓位，保留target_margin对应的数量
+        # close_size已经在前面计算好了
+        close_side = 'buy' if pos_side == 'short' else 'sell'
+        
+        close_order_body = {
+            'instId': inst_id,
+            'tdMode': 'cross',  # 全仓模式
+            'side': close_side,
+            'posSide': pos_side,
+            'ordType': 'market',
+            'sz': str(close_size)
+        }
+        
+        headers = get_headers('POST', order_path, close_order_body)
+        close_response = requests.post(
+            OKEX_REST_URL + order_path,
+            headers=headers,
+            json=close_order_body,
+            timeout=10
+        )
+        
+        close_result = close_response.json()
+        
+        if close_result.get('code') != '0':
+            return jsonify({
+                'success': False,
+                'message': f"平仓失败: {close_result.get('msg', '未知错误')} (开仓订单ID: {open_order_id})",
+                'error_code': close_result.get('code'),
+                'open_order_id': open_order_id
+            })
+        
+        close_order_id = close_result['data'][0]['ordId']
+        
+        # 维护成功，更新维护次数（在事务内基于最新记录计数，避免并发丢失）
+        def bump(record):
+            if record.get('date') != today_date:
+                # 新的一天，重置次数
+                return {
+                    'count': 1,
+                    'date': today_date,
+                    'last_maintenance': now_beijing.strftime('%Y-%m-%d %H:%M:%S')
+                }
+            # 同一天，增加次数
+            record['count'] = record.get('count', 0) + 1
+            record['last_maintenance'] = now_beijing.strftime('%Y-%m-%d %H:%M:%S')
+        
+        record = SUB_ACCOUNT_MAINTENANCE.update(record_key, bump, default={})
+        
+        return jsonify({
+            'success': True,
+            'message': f'维护成功！今日第{record["count"]}次维护',
+            'data': {
+                'account_name': account_name,
+                'inst_id': inst_id,
+                'pos_side': pos_side,
+                'open_order_id': open_order_id,
+                'close_order_id': close_order_id,
+                'order_size': order_size,
+                'close_size': close_size,
+                'today_count': record['count'],
+                'max_count': max_count
+            }
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'维护失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/close-sub-account-position', methods=['POST'])
+def close_sub_account_position():
+    """子账户平仓：部分或全部平仓"""
+    try:
+        import requests
+        import hmac
+        import base64
+        import hashlib
+        import json as json_lib
+        from datetime import datetime, timezone
+        from position_close_guard import validate_close_request, MIN_KEEP_MARGIN
+        
+        data = request.json
+        account_name = data.get('account_name')
+        inst_id = data.get('inst_id')
+        pos_side = data.get('pos_side')
+        close_size = float(data.get('close_size', 0))
+        reason = data.get('reason', '手动平仓')
+        
+        if not all([account_name, inst_id, pos_side, close_size]):
+            return jsonify({
+                'success': False,
+                'message': '缺少必要参数'
+            })
+        
+        # 读取子账户配置
+        config = SUB_ACCOUNT_CONFIG.load()
+        
+        # 查找对应的子账户
+        sub_account = None
+        for acc in config.get('sub_accounts', []):
+            if acc['account_name'] == account_name:
+                sub_account = acc
+                break
+        
+        if not sub_account:
+            return jsonify({
+                'success': False,
+                'message': f'未找到子账户: {account_name}'
+            })
+        
+        api_key = sub_account['api_key']
+        secret_key = sub_account['secret_key']
+        passphrase = sub_account['passphrase']
+        
+        # OKEx API签名函数
+        def generate_signature(timestamp, method, request_path, body=''):
+            if body:
+                body = json_lib.dumps(body)
+            message = timestamp + method + request_path + body
+            mac = hmac.new(
+                bytes(secret_key, encoding='utf8'),
+                bytes(message, encoding='utf-8'),
+                digestmod=hashlib.sha256
+            )
+            return base64.b64encode(mac.digest()).decode()
+        
+        def get_headers(method, request_path, body=''):
+            timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+            sign = generate_signature(timestamp, method, request_path, body)
+            return {
+                'OK-ACCESS-KEY': api_key,
+                'OK-ACCESS-SIGN': sign,
+                'OK-ACCESS-TIMESTAMP': timestamp,
+                'OK-ACCESS-PASSPHRASE': passphrase,
+                'Content-Type': 'application/json'
+            }
+        
+        # OKEx API URL
+        OKEX_REST_URL = 'https://www.okx.com'
+        
+        # 🛡️ 底仓保护：获取当前持仓信息
+        positions_path = '/api/v5/account/positions'
+        positions_params = f'?instType=SWAP&instId={inst_id}'
+        positions_headers = get_headers('GET', positions_path + positions_params)
+        positions_response = requests.get(
+            OKEX_REST_URL + positions_path + positions_params,
+            headers=positions_headers,
+            timeout=10
+        )
+        positions_data = positions_response.json()
+        
+        if positions_data.get('code') != '0':
+            return jsonify({
+                'success': False,
+                'message': f'获取持仓信息失败: {positions_data.get("msg")}'
+            })
+        
+        # 查找对应的持仓
+        current_position = None
+        for pos in positions_data.get('data', []):
+            if pos['instId'] == inst_id and pos['posSide'] == pos_side:
+                current_position = pos
+                break
+        
+        if not current_position:
+            return jsonify({
+                'success': False,
+                'message': f'未找到持仓: {inst_id} {pos_side}'
+            })
+        
+        # 提取持仓信息（安全转换，处理空字符串）
+        pos_size = abs(float(current_position['pos']) if current_position['pos'] else 0)
+        
+        # 如果 markPx 为空，尝试从行情API获取
+        mark_price_str = current_position.get('markPx', '')
+        if mark_price_str and mark_price_str.strip():
+            mark_price = float(mark_price_str)
+        else:
+            # 从ticker获取价格
+            ticker_path = f'/api/v5/market/ticker?instId={inst_id}'
+            ticker_headers = get_headers('GET', ticker_path)
+            ticker_response = requests.get(
+                OKEX_REST_URL + ticker_path,
+                headers=ticker_headers,
+                timeout=10
+            )
+            ticker_data = ticker_response.json()
+            if ticker_data.get('code') == '0' and ticker_data.get('data'):
+                mark_price = float(ticker_data['data'][0].get('last', 0))
+            else:
+                return jsonify({
+                    'success': False,
+                    'message': '无法获取标记价格'
+                })
+        
+        leverage_str = current_position.get('lever', '10')
+        leverage = float(leverage_str) if leverage_str and leverage_str.strip() else 10.0
+        
+        # 🛡️ 底仓保护验证
+        is_safe, adjusted_close_size, warning_msg = validate_close_request(
+            pos_size, close_size, mark_price, leverage, MIN_KEEP_MARGIN
+        )
+        
+        if not is_safe:
+            print(f"⚠️  {warning_msg}")
+            close_size = adjusted_close_size
+            reason = f"{reason} (底仓保护自动调整)"
+        
+        # 执行平仓
+        order_path = '/api/v5/trade/order'
+        
+        # 确定平仓方向
+        close_side = 'buy' if pos_side == 'short' else 'sell'
+        
+        close_order_body = {
+            'instId': inst_id,
+            'tdMode': 'isolated',
+            'side': close_side,
+            'posSide': pos_side,
+            'ordType': 'market',
+            'sz': str(int(close_size))
+        }
+        
+        print(f"🎯 子账户平仓: {account_name} {inst_id} {pos_side} {close_size}")
+        print(f"   原因: {reason}")
+        
+        headers = get_headers('POST', order_path, close_order_body)
+        close_response = requests.post(
+            OKEX_REST_URL + order_path,
+            headers=headers,
+            json=close_order_body,
+            timeout=10
+        )
+        close_data = close_response.json()
+        
+        if close_data.get('code') != '0':
+            return jsonify({
+                'success': False,
+                'message': f'平仓失败: {close_data.get("msg")}',
+                'error_code': close_data.get('code')
+            })
+        
+        order_id = close_data['data'][0]['ordId']
+        print(f"✅ 平仓订单提交成功: {order_id}")
+        
+        return jsonify({
+            'success': True,
+            'message': '平仓成功',
+            'order_id': order_id,
+            'close_size': int(close_size),
+            'reason': reason
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'平仓失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/anchor/open-sub-account-position', methods=['POST'])
+def open_sub_account_position():
+    """子账户开仓：按指定金额开仓"""
+    try:
+        import requests
+        import hmac
+        import base64
+        import hashlib
+        import json as json_lib
+        from datetime import datetime, timezone
+        import pytz
+        import math
+        import time
+        
+        data = request.json
+        account_name = data.get('account_name')
+        inst_id = data.get('inst_id')
+        pos_side = data.get('pos_side')  # 'long' or 'short'
+        amount = float(data.get('amount', 10))  # 默认10U
+        
+        if not all([account_name, inst_id, pos_side]):
+            return jsonify({
+                'success': False,
+                'message': '缺少必要参数'
+            })
+        
+        # 读取子账户配置
+        config = SUB_ACCOUNT_CONFIG.load()
+        
+        # 查找对应的子账户
+        sub_account = None
+        for acc in config.get('sub_accounts', []):
+            if acc['account_name'] == account_name:
+                sub_account = acc
+                break
+        
+        if not sub_account:
+            return jsonify({
+                'success': False,
+                'message': f'未找到子账户: {account_name}'
+            })
+        
+        api_key = sub_account['api_key']
+        secret_key = sub_account['secret_key']
+        passphrase = sub_account['passphrase']
+        
+        print(f"\n{'='*80}")
+        print(f"🚀 子账户开仓")
+        print(f"账户: {account_name}")
+        print(f"币种: {inst_id}")
+        print(f"方向: {pos_side}")
+        print(f"金额: {amount} USDT")
+        print(f"{'='*80}\n")
+        
+        # 1. 获取当前标记价格
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+        request_path = f'/api/v5/public/mark-price?instType=SWAP&instId={inst_id}'
+        message = timestamp + 'GET' + request_path
+        mac = hmac.new(bytes(secret_key, encoding='utf8'), bytes(message, encoding='utf-8'), digestmod=hashlib.sha256)
+        signature = base64.b64encode(mac.digest()).decode()
+        
+        headers = {
+            'OK-ACCESS-KEY': api_key,
+            'OK-ACCESS-SIGN': signature,
+            'OK-ACCESS-TIMESTAMP': timestamp,
+            'OK-ACCESS-PASSPHRASE': passphrase,
+            'Content-Type': 'application/json'
+        }
+        
+        mark_price_url = f'https://www.okx.com{request_path}'
+        mark_response = requests.get(mark_price_url, headers=headers, timeout=10)
+        mark_result = mark_response.json()
+        
+        if mark_result['code'] != '0' or not mark_result['data']:
+            return jsonify({
+                'success': False,
+                'message': f'获取标记价格失败: {mark_result.get("msg")}'
+            })
+        
+        mark_price = float(mark_result['data'][0]['markPx'])
+        print(f"📊 当前标记价格: {mark_price}")
+        
+        # 2. 获取合约信息（张数和面值）
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+        request_path = f'/api/v5/public/instruments?instType=SWAP&instId={inst_id}'
+        message = timestamp + 'GET' + request_path
+        mac = hmac.new(bytes(secret_key, encoding='utf8'), bytes(message, encoding='utf-8'), digestmod=hashlib.sha256)
+        signature = base64.b64encode(mac.digest()).decode()
+        
+        headers['OK-ACCESS-SIGN'] = signature
+        headers['OK-ACCESS-TIMESTAMP'] = timestamp
+        
+        instruments_url = f'https://www.okx.com{request_path}'
+        instruments_response = requests.get(instruments_url, headers=headers, timeout=10)
+        instruments_result = instruments_response.json()
+        
+        if instruments_result['code'] != '0' or not instruments_result['data']:
+            return jsonify({
+                'success': False,
+                'message': f'获取合约信息失败: {instruments_result.get("msg")}'
+            })
+        
+        ct_val = float(instruments_result['data'][0]['ctVal'])
+        lot_sz = float(instruments_result['data'][0]['lotSz'])
+        print(f"📊 合约面值: {ct_val}, 最小张数: {lot_sz}")
+        
+        # 3. 计算开仓张数（10倍杠杆）
+        leverage = 10
+        # amount USDT * 杠杆 / 标记价格 = 可开张数
+        raw_size = (amount * leverage) / (mark_price * ct_val)
+        # 向下取整到最小张数的倍数
+        open_size = math.floor(raw_size / lot_sz) * lot_sz
+        
+        if open_size < lot_sz:
+            return jsonify({
+                'success': False,
+                'message': f'开仓金额太小，无法开仓（最少需要 {lot_sz} 张）'
+            })
+        
+        print(f"📊 计算开仓张数: {open_size}")
+        
+        # 4. 设置杠杆
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+        request_path = '/api/v5/account/set-leverage'
+        body = json_lib.dumps({
+            'instId': inst_id,
+            'lever': str(leverage),
+            'mgnMode': 'isolated',
+            'posSide': pos_side if pos_side in ['long', 'short'] else 'net'
+        })
+        message = timestamp + 'POST' + request_path + body
+        mac = hmac.new(bytes(secret_key, encoding='utf8'), bytes(message, encoding='utf-8'), digestmod=hashlib.sha256)
+        signature = base64.b64encode(mac.digest()).decode()
+        
+        headers['OK-ACCESS-SIGN'] = signature
+        headers['OK-ACCESS-TIMESTAMP'] = timestamp
+        
+        leverage_url = f'https://www.okx.com{request_path}'
+        leverage_response = requests.post(leverage_url, headers=headers, data=body, timeout=10)
+        leverage_result = leverage_response.json()
+        print(f"📊 设置杠杆结果: {leverage_result}")
+        
+        # 5. 提交开仓订单
+        timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3] + 'Z'
+        request_path = '/api/v5/trade/order'
+        
+        # 判断订单方向
+        if pos_side == 'long':
+            side = 'buy'
+        elif pos_side == 'short':
+            side = 'sell'
+        else:
+            side = 'buy'  # 默认买入
+        
+        body = json_lib.dumps({
+            'instId': inst_id,
+            'tdMode': 'isolated',
+            'side': side,
+            'ordType': 'market',
+            'sz': str(int(open_size)),
+            'posSide': pos_side if pos_side in ['long', 'short'] else 'net'
+        })
+        
+        message = timestamp + 'POST' + request_path + body
+        mac = hmac.new(bytes(secret_key, encoding='utf8'), bytes(message, encoding='utf-8'), digestmod=hashlib.sha256)
+        signature = base64.b64encode(mac.digest()).decode()
+        
+        headers['OK-ACCESS-SIGN'] = signature
+        headers['OK-ACCESS-TIMESTAMP'] = timestamp
+        
+        order_url = f'https://www.okx.com{request_path}'
+        order_response = requests.post(order_url, headers=headers, data=body, timeout=10)
+        order_result = order_response.json()
+        
+        print(f"📊 开仓订单结果: {order_result}")
+        
+        if order_result['code'] != '0':
+            return jsonify({
+                'success': False,
+                'message': f'开仓失败: {order_result.get("msg", "未知错误")}'
+            })
+        
+        order_id = order_result['data'][0]['ordId']
+        print(f"✅ 开仓订单ID: {order_id}")
+        
+        # 6. 保存开仓记录
+        position_key = f"{account_name}_{inst_id}_{pos_side}"
+        SUB_ACCOUNT_OPENED_POSITIONS.set(position_key, {
+            'account_name': account_name,
+            'inst_id': inst_id,
+            'pos_side': pos_side,
+            'order_id': order_id,
+            'open_size': open_size,
+            'open_price': mark_price,
+            'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+        return jsonify({
+            'success': True,
+            'message': '开仓成功',
+            'data': {
+                'account_name': account_name,
+                'inst_id': inst_id,
+                'pos_side': pos_side,
+                'order_id': order_id,
+                'open_size': open_size,
+                'open_price': mark_price,
+                'amount': amount
+            }
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'开仓失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/sub-account/reset-maintenance-count', methods=['POST'])
+def reset_sub_account_maintenance_count():
+    """清零子账户今日维护次数"""
+    try:
+        from datetime import datetime
+        import pytz
+        
+        data = request.json
+        account_name = data.get('account_name')
+        inst_id = data.get('inst_id')
+        pos_side = data.get('pos_side')
+        
+        if not all([account_name, inst_id, pos_side]):
+            return jsonify({
+                'success': False,
+                'message': '缺少必要参数'
+            })
+        
+        # 构建记录键
+        record_key = f"{account_name}_{inst_id}_{pos_side}"
+        
+        # 获取当前北京时间的日期
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now_beijing = datetime.now(beijing_tz)
+        today_date = now_beijing.strftime('%Y-%m-%d')
+        
+        # 检查是否存在今日记录
+        if record_key not in SUB_ACCOUNT_MAINTENANCE:
+            return jsonify({
+                'success': False,
+                'message': '该持仓没有维护记录'
+            })
+        
+        old = {}
+        
+        def reset(record):
+            # 清零今日维护次数
+            old['count'] = record.get('count', 0)
+            
+            # 重置记录
+            record['count'] = 0
+            record['date'] = today_date
+            record['last_reset'] = now_beijing.strftime('%Y-%m-%d %H:%M:%S')
+        
+        SUB_ACCOUNT_MAINTENANCE.update(record_key, reset, default={})
+        old_count = old['count']
+        
+        return jsonify({
+            'success': True,
+            'message': f'清零成功！原维护次数: {old_count}次',
+            'account_name': account_name,
+            'inst_id': inst_id,
+            'pos_side': pos_side,
+            'old_count': old_count,
+            'new_count': 0,
+            'reset_time': now_beijing.strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'清零失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/main-account/reset-maintenance-count', methods=['POST'])
+def reset_main_account_maintenance_count():
+    """清零主账户今日超级维护次数"""
+    try:
+        from datetime import datetime
+        
+        data = request.json
+        inst_id = data.get('inst_id')
+        pos_side = data.get('pos_side')
+        
+        if not all([inst_id, pos_side]):
+            return jsonify({
+                'success': False,
+                'message': '缺少必要参数'
+            })
+        
+        # 构建记录键
+        record_key = f"{inst_id}_{pos_side}"
+        
+        # 获取当前日期
+        today_date = datetime.now().strftime('%Y-%m-%d')
+        
+        # 检查是否存在今日记录
+        if record_key not in MAIN_ACCOUNT_MAINTENANCE:
+            return jsonify({
+                'success': False,
+                'message': '该持仓没有维护记录'
+            })
+        
+        old = {}
+        
+        def reset(record):
+            # 清零今日维护次数
+            old['count'] = record.get('count', 0)
+            
+            # 重置记录
+            record['count'] = 0
+            record['date'] = today_date
+            record['last_reset'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        MAIN_ACCOUNT_MAINTENANCE.update(record_key, reset, default={})
+        old_count = old['count']
+        
+        return jsonify({
+            'success': True,
+            'message': f'清零成功！原超级维护次数: {old_count}次',
+            'inst_id': inst_id,
+            'pos_side': pos_side,
+            'old_count': old_count,
+            'new_count': 0,
+            'reset_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'清零失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/api/sub-account/take-profit-records', methods=['GET'])
+def get_sub_account_take_profit_records():
+    """获取子账户止盈记录"""
+    try:
+        import json as json_lib
+        from datetime import datetime, timedelta
+        
+        # 获取查询参数
+        account_name = request.args.get('account_name')
+        days = int(request.args.get('days', 7))  # 默认查询最近7天
+        
+        # 读取止盈记录文件
+        records_file = 'sub_account_take_profit_records.json'
+        try:
+            with open(records_file, 'r', encoding='utf-8') as f:
+                all_records = json_lib.load(f)
+        except FileNotFoundError:
+            all_records = []
+        
+        # 计算时间范围
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=days)
+        
+        # 过滤记录
+        filtered_records = []
+        total_profit = 0
+        total_closed_amount = 0
+        
+        for record in all_records:
+            # 按账户名过滤
+            if account_name and record.get('account_name') != account_name:
+                continue
+            
+            # 按时间范围过滤
+            record_time = datetime.strptime(record['timestamp'], '%Y-%m-%d %H:%M:%S')
+            if record_time < start_date or record_time > end_date:
+                continue
+            
+            filtered_records.append(record)
+            
+            # 统计数据
+            if 'estimated_profit' in record:
+                total_profit += record['estimated_profit']
+            if 'close_amount' in record:
+                total_closed_amount += record['close_amount']
+        
+        # 按时间倒序排序
+        filtered_records.sort(key=lambda x: x['timestamp'], reverse=True)
+        
+        # 统计信息
+        stats = {
+            'total_records': len(filtered_records),
+            'total_profit': round(total_profit, 2),
+            'total_closed_amount': round(total_closed_amount, 2),
+            'avg_profit_per_trade': round(total_profit / len(filtered_records), 2) if len(filtered_records) > 0 else 0,
+            'rule1_count': len([r for r in filtered_records if r.get('rule') == 'rule1']),
+            'rule2_count': len([r for r in filtered_records if r.get('rule') == 'rule2']),
+            'date_range': {
+                'start': start_date.strftime('%Y-%m-%d'),
+                'end': end_date.strftime('%Y-%m-%d')
+            }
+        }
+        
+        return jsonify({
+            'success': True,
+            'records': filtered_records,
+            'stats': stats
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'获取记录失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+# 测试页面路由
+@anchor_bp.route('/api/anchor/decline-strength', methods=['GET'])
+def get_decline_strength():
+    """
+    获取下跌强度分类
+    根据空单盈利情况判断市场下跌强度
+    """
+    try:
+        import sys
+        sys.path.append('/home/user/webapp')
+        from anchor_system import get_positions_from_okex
+        
+        # 获取实盘持仓
+        raw_positions = get_positions_from_okex()
+        
+        # 统计空单盈利情况
+        short_profits = []
+        for pos in raw_positions:
+            if pos.get('posSide') == 'short':  # OKEx API 使用 posSide
+                profit_rate = float(pos.get('uplRatio', 0)) * 100  # 转换为百分比
+                short_profits.append({
+                    'inst_id': pos.get('instId'),
+                    'profit_rate': profit_rate,
+                    'margin': float(pos.get('margin', 0)),
+                    'upl': float(pos.get('upl', 0))
+                })
+        
+        # 计算各盈利区间的空单数量
+        count_70 = len([p for p in short_profits if p['profit_rate'] >= 70])
+        count_60 = len([p for p in short_profits if p['profit_rate'] >= 60])
+        count_50 = len([p for p in short_profits if p['profit_rate'] >= 50])
+        count_40 = len([p for p in short_profits if p['profit_rate'] >= 40])
+        
+        # 判断下跌强度
+        strength_level = 0
+        strength_name = ''
+        buy_suggestion = ''
+        color_class = ''
+        
+        # 没有空单的情况
+        if len(short_profits) == 0:
+            strength_name = '无空单持仓'
+            buy_suggestion = '市场上涨或震荡，暂无下跌信号'
+            color_class = 'strength-0'
+        # 下跌强度1级（最弱）
+        elif count_70 == 0 and count_60 == 0 and count_50 == 0 and count_40 <= 3:
+            strength_level = 1
+            strength_name = '下跌强度1级'
+            buy_suggestion = '多单买入点在50%'
+            color_class = 'strength-1'
+        # 下跌强度2级（中等）
+        elif count_70 == 0 and count_60 <= 1 and count_50 <= 4 and count_40 <= 5:
+            strength_level = 2
+            strength_name = '下跌强度2级'
+            buy_suggestion = '多单买入点在60%'
+            color_class = 'strength-2'
+        # 下跌强度3级（最强）
+        elif count_70 <= 2 and count_60 <= 5 and count_50 <= 8 and count_40 <= 11:
+            strength_level = 3
+            strength_name = '下跌强度3级'
+            buy_suggestion = '多单买入点在70-80%'
+            color_class = 'strength-3'
+        # 超出范围（极端下跌）
+        else:
+            strength_level = 4
+            strength_name = '极端下跌'
+            buy_suggestion = '市场极度恐慌，谨慎操作'
+            color_class = 'strength-4'
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'strength_level': strength_level,
+                'strength_name': strength_name,
+                'buy_suggestion': buy_suggestion,
+                'color_class': color_class,
+                'statistics': {
+                    'total_shorts': len(short_profits),
+                    'profit_70': count_70,
+                    'profit_60': count_60,
+                    'profit_50': count_50,
+                    'profit_40': count_40
+                },
+                'short_positions': short_profits
+            }
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'获取下跌强度失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@anchor_bp.route('/test-positions')
+def test_positions_page():
+    """持仓数据测试页面"""
+    return render_template('test_positions.html')
+
+@anchor_bp.route('/sub-account-trades')
+def sub_account_trades_page():
+    """子账户交易详情页面"""
+    return render_template('sub_account_trades.html')
@@ -27,6 +27,12 @@ TRADE_MODE = 'paper'  # 默认使用模拟交易（模拟盘）
 
 # 最小底仓保护配置
 MIN_KEEP_MARGIN = 0.6  # 平仓时必须保留的最小保证金（USDT），防止锚点单被完全平掉
+MAX_KEEP_MARGIN = 2.0  # 维护平仓后保留的保证金上限（USDT）
+
+# 维护规则（回测 rule_backtester 共用）
+MAINTENANCE_TRIGGER_RATE = -10.0  # 收益率（含杠杆）≤ 该值触发维护
+MAINTENANCE_WARNING_RATE = -8.0   # 收益率 ≤ 该值提前监控
+MAINTENANCE_ADD_MULTIPLE = 10     # 补仓倍数
 
 class AnchorMaintenanceDaemon:
     """锚点单自动维护守护进程"""
@@ -166,7 +172,7 @@ class AnchorMaintenanceDaemon:
         profit_rate = self.calculate_profit_rate(open_price, current_price, pos_side)
         
         # 4. 检查是否需要提前监控（亏损≥8%）或触发维护（亏损≥10%）
-        if profit_rate <= -10.0:
+        if profit_rate <= MAINTENANCE_TRIGGER_RATE:
             # 触发维护
             return {
                 'inst_id': inst_id,
@@ -179,7 +185,7 @@ class AnchorMaintenanceDaemon:
                 'need_maintenance': True,
                 'alert_level': 'critical'  # 严重告警
             }
-        elif profit_rate <= -8.0:
+        elif profit_rate <= MAINTENANCE_WARNING_RATE:
             # 提前监控
             return {
                 'inst_id': inst_id,
@@ -268,7 +274,7 @@ class AnchorMaintenanceDaemon:
             now = datetime.now(BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
             
             # 1. 记录补仓（10倍原持仓）
-            add_size = open_size * 10
+            add_size = open_size * MAINTENANCE_ADD_MULTIPLE
             cursor.execute('''
             INSERT INTO position_adds (
                 inst_id,
@@ -303,12 +309,12 @@ class AnchorMaintenanceDaemon:
             # 2. 记录平仓（保留≥0.6U底仓）
             # 计算平仓数量：补仓后总量 = 原持仓 + 10倍补仓 = 11倍原持仓
             # 保留至少0.6U保证金对应的持仓量，防止锚点单被完全平掉
-            total_after_add = open_size * 11  # 补仓后总量
+            total_after_add = open_size + add_size  # 补仓后总量
             total_margin_after_add = total_after_add * current_price / 10  # 10x杠杆，总保证金
             
             # 计算保留量：目标MIN_KEEP_MARGIN (0.6U)，但不超过总保证金
             # 重要：必须保留至少0.6U，即使总保证金很小也要保留
-            target_remaining_margin = max(MIN_KEEP_MARGIN, min(2.0, total_margin_after_add))
+            target_remaining_margin = max(MIN_KEEP_MARGIN, min(MAX_KEEP_MARGIN, total_margin_after_add))
             remain_size = (target_remaining_margin * 10) / current_price  # 保证金在10x杠杆下对应的持仓量
             
             # 安全检查：确保保留量不会超过总量
@@ -18,6 +18,9 @@ import sqlite3
 import sys
 sys.path.append(os.path.dirname(__file__))
 from okex_api_config import OKEX_API_KEY, OKEX_SECRET_KEY, OKEX_PASSPHRASE, OKEX_REST_URL
+from okx_market_client import get_client
+from db_access import get_connection, transaction
+from position_stream import read_positions
 
 # 加载其他配置
 CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'anchor_config.json')
@@ -160,7 +163,11 @@ def get_positions():
 
 
 def get_positions_from_okex():
-    """从OKEx API获取实盘持仓"""
+    """从OKEx API获取实盘持仓（持仓流服务在线时直接读本地持仓簿）"""
+    streamed = read_positions()
+    if streamed is not None:
+        return streamed
+    
     try:
         method = 'GET'
         request_path = '/api/v5/account/positions'
@@ -191,35 +198,24 @@ def get_btc_eth_change():
         dict: {'BTC': change%, 'ETH': change%}
     """
     try:
-        # 使用OKEx的公共ticker接口（不需要签名）
+        # 使用OKEx的公共ticker接口（不需要签名），两个币种并发请求
         tickers = ['BTC-USDT', 'ETH-USDT']
         result = {}
         
-        for ticker in tickers:
-            url = f"{OKEX_BASE_URL}/api/v5/market/ticker?instId={ticker}"
-            
-            # 公共接口不需要签名
-            response = requests.get(url, timeout=10)
-            data = response.json()
-            
-            if data.get('code') == '0' and data.get('data'):
-                ticker_data = data['data'][0]
-                
+        for ticker, ticker_data in zip(tickers, get_client().map(get_client().get_ticker, tickers)):
+            coin = ticker.split('-')[0]
+            if ticker_data:
                 # 手动计算24小时涨跌幅
                 last_price = float(ticker_data.get('last', 0))
                 open_24h = float(ticker_data.get('open24h', 0))
                 
                 if open_24h > 0:
-                    change_24h = ((last_price - open_24h) / open_24h) * 100
+                    result[coin] = ((last_price - open_24h) / open_24h) * 100
                 else:
-                    change_24h = 0.0
-                
-                # 提取币种名称
-                coin = ticker.split('-')[0]
-                result[coin] = change_24h
+                    result[coin] = 0.0
             else:
-                print(f"❌ 获取{ticker}数据失败: {data.get('msg')}")
-                result[ticker.split('-')[0]] = 0.0
+                print(f"❌ 获取{ticker}数据失败")
+                result[coin] = 0.0
         
         return result
     except Exception as e:
@@ -315,6 +311,12 @@ def init_database():
     )
     ''')
     
+    # 冷却期查询按时间范围扫描告警表
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_anchor_alerts_timestamp 
+    ON anchor_alerts(timestamp)
+    ''')
+    
     # 创建历史极值记录表
     cursor.execute('''
     CREATE TABLE IF NOT EXISTS anchor_profit_records (
@@ -665,8 +667,12 @@ def get_market_data():
         return None
 
 
-def format_alert_message(position, profit_rate, alert_type, cycle_count=None):
-    """格式化告警消息"""
+def format_alert_message(position, profit_rate, alert_type, cycle_count=None,
+                         market_data=None, btc_eth_change=None):
+    """
+    格式化告警消息
+    market_data / btc_eth_change 可传入本轮已获取的数据，未传入时现查
+    """
     inst_id = position.get('instId')
     pos_side = position.get('posSide')
     pos_size = float(position.get('pos', 0))
@@ -709,7 +715,8 @@ def format_alert_message(position, profit_rate, alert_type, cycle_count=None):
         signal_type = "做空亏损-10%，建议开仓做空"
     
     # 获取市场数据
-    market_data = get_market_data()
+    if market_data is None:
+        market_data = get_market_data()
     
     message = f"""
 {alert_emoji} <b>锚点系统触发</b> {alert_emoji}
@@ -762,7 +769,8 @@ def format_alert_message(position, profit_rate, alert_type, cycle_count=None):
 """
     
     # 获取BTC和ETH的24小时涨跌幅
-    btc_eth_change = get_btc_eth_change()
+    if btc_eth_change is None:
+        btc_eth_change = get_btc_eth_change()
     btc_change = btc_eth_change.get('BTC', 0.0)
     eth_change = btc_eth_change.get('ETH', 0.0)
     
@@ -786,7 +794,8 @@ def format_alert_message(position, profit_rate, alert_type, cycle_count=None):
     return message.strip()
 
 
-def format_extreme_alert(position, current_rate, previous_rate, extreme_type):
+def format_extreme_alert(position, current_rate, previous_rate, extreme_type,
+                         market_data=None, btc_eth_change=None):
     """
     格式化极值突破告警消息
     
@@ -795,6 +804,8 @@ def format_extreme_alert(position, current_rate, previous_rate, extreme_type):
         current_rate: 当前收益率
         previous_rate: 之前的极值收益率
         extreme_type: 'max_profit' 或 'max_loss'
+        market_data: 本轮已获取的市场计次数据（可选）
+        btc_eth_change: 本轮已获取的BTC/ETH涨跌幅（可选）
     """
     inst_id = position.get('instId')
     pos_side = position.get('posSide')
@@ -823,7 +834,8 @@ def format_extreme_alert(position, current_rate, previous_rate, extreme_type):
         change = abs(current_rate - previous_rate)
     
     # 获取市场数据
-    market_data = get_market_data()
+    if market_data is None:
+        market_data = get_market_data()
     
     message = f"""
 {emoji} <b>锚点系统 - 极值突破预警</b>
@@ -867,7 +879,8 @@ def format_extreme_alert(position, current_rate, previous_rate, extreme_type):
 """
     
     # 获取BTC和ETH的24小时涨跌幅
-    btc_eth_change = get_btc_eth_change()
+    if btc_eth_change is None:
+        btc_eth_change = get_btc_eth_change()
     btc_change = btc_eth_change.get('BTC', 0.0)
     eth_change = btc_eth_change.get('ETH', 0.0)
     
@@ -891,11 +904,173 @@ def format_extreme_alert(position, current_rate, previous_rate, extreme_type):
     return message.strip()
 
 
+def load_monitor_state(conn, positions, cooldown_minutes=ALERT_COOLDOWN):
+    """
+    一次性读取本轮所有持仓的历史极值和冷却期内已发送的告警
+    
+    Returns:
+        (extremes, recent_alerts)
+        extremes: {(inst_id, pos_side, record_type): profit_rate}
+        recent_alerts: {(inst_id, alert_type)}
+    """
+    profit_table = 'anchor_real_profit_records' if TRADE_MODE == 'real' else 'anchor_paper_profit_records'
+    cursor = conn.cursor()
+    
+    extremes = {}
+    inst_ids = sorted({pos.get('instId') for pos in positions})
+    for i in range(0, len(inst_ids), 500):
+        chunk = inst_ids[i:i + 500]
+        cursor.execute(f'''
+        SELECT inst_id, pos_side, record_type, profit_rate FROM {profit_table}
+        WHERE inst_id IN ({','.join('?' * len(chunk))})
+        ''', chunk)
+        for inst_id, pos_side, record_type, profit_rate in cursor.fetchall():
+            extremes[(inst_id, pos_side, record_type)] = profit_rate
+    
+    time_threshold = datetime.now(BEIJING_TZ) - timedelta(minutes=cooldown_minutes)
+    cursor.execute('''
+    SELECT DISTINCT inst_id, alert_type FROM anchor_alerts
+    WHERE timestamp > ? AND sent_status = 1
+    ''', (time_threshold.strftime('%Y-%m-%d %H:%M:%S'),))
+    recent_alerts = set(cursor.fetchall())
+    
+    return extremes, recent_alerts
+
+
+def evaluate_positions(positions, extremes, recent_alerts):
+    """
+    在内存中对所有持仓执行极值与告警规则（与 update_profit_record + 原逐个检查的规则一致）
+    
+    Args:
+        positions: 持仓列表
+        extremes: load_monitor_state 返回的历史极值，会被就地更新
+        recent_alerts: 冷却期内已发送的告警，本轮决定发送的告警会加入其中
+    
+    Returns:
+        list: 每个持仓一个决策字典
+    """
+    decisions = []
+    for pos in positions:
+        inst_id = pos.get('instId')
+        pos_side = pos.get('posSide')
+        profit_rate = calculate_profit_rate(pos)
+        decision = {
+            'position': pos,
+            'profit_rate': profit_rate,
+            'extreme_type': None,        # 需要写入的极值类型
+            'previous_extreme': None,    # 被刷新的旧极值（首次记录为 None）
+            'extreme_alert': False,      # 是否发送极值突破预警
+            'extreme_cooling': False,
+            'alert_type': None,
+            'send_alert': False,
+            'skipped': False,
+        }
+        
+        # 历史极值：盈利看最高收益，否则看最大亏损
+        record_type = 'max_profit' if profit_rate > 0 else 'max_loss'
+        key = (inst_id, pos_side, record_type)
+        current_record = extremes.get(key)
+        if current_record is None:
+            decision['extreme_type'] = record_type
+        elif (record_type == 'max_profit' and profit_rate > current_record) or \
+                (record_type == 'max_loss' and profit_rate < current_record):
+            decision['extreme_type'] = record_type
+            decision['previous_extreme'] = current_record
+            extreme_alert_type = f"extreme_{record_type}"
+            if (inst_id, extreme_alert_type) in recent_alerts:
+                decision['extreme_cooling'] = True
+            else:
+                decision['extreme_alert'] = True
+                recent_alerts.add((inst_id, extreme_alert_type))
+        if decision['extreme_type']:
+            extremes[key] = profit_rate
+        
+        # 只监控做空持仓（如果配置要求）
+        if ONLY_SHORT and pos_side != 'short':
+            decision['skipped'] = True
+        elif profit_rate >= PROFIT_TARGET:
+            decision['alert_type'] = 'profit_target'
+        elif profit_rate <= LOSS_LIMIT:
+            decision['alert_type'] = 'loss_limit'
+        
+        if decision['alert_type']:
+            if (inst_id, decision['alert_type']) not in recent_alerts:
+                decision['send_alert'] = True
+                recent_alerts.add((inst_id, decision['alert_type']))
+        
+        decisions.append(decision)
+    return decisions
+
+
+def save_monitor_results(conn, decisions, timestamp):
+    """把本轮的极值更新、监控记录和告警记录写入同一个事务"""
+    profit_table = 'anchor_real_profit_records' if TRADE_MODE == 'real' else 'anchor_paper_profit_records'
+    
+    extreme_rows = []
+    monitor_rows = []
+    alert_rows = []
+    for d in decisions:
+        pos = d['position']
+        inst_id = pos.get('instId')
+        pos_side = pos.get('posSide')
+        numbers = (
+            float(pos.get('pos', 0)),
+            float(pos.get('avgPx', 0)),
+            float(pos.get('markPx', 0)),
+            float(pos.get('upl', 0)),
+        )
+        margin = float(pos.get('margin', 0))
+        lever = float(pos.get('lever', 0))
+        
+        if d['extreme_type']:
+            extreme_rows.append((inst_id, pos_side, d['extreme_type'], d['profit_rate'], timestamp)
+                                + numbers + (margin, lever, timestamp))
+        if d.get('extreme_sent'):
+            alert_rows.append((timestamp, inst_id, pos_side, d['profit_rate'],
+                               f"extreme_{d['extreme_type']}", d['extreme_message'], 1))
+        
+        alert_sent = 1 if d.get('alert_success') else 0
+        monitor_rows.append((timestamp, inst_id, pos_side) + numbers
+                            + (float(pos.get('uplRatio', 0)), margin, lever, d['profit_rate'],
+                               d['alert_type'], alert_sent))
+        if d['send_alert']:
+            alert_rows.append((timestamp, inst_id, pos_side, d['profit_rate'],
+                               d['alert_type'], d['alert_message'], alert_sent))
+    
+    cursor = conn.cursor()
+    if extreme_rows:
+        cursor.executemany(f'''
+        INSERT OR REPLACE INTO {profit_table} (
+            inst_id, pos_side, record_type, profit_rate, timestamp,
+            pos_size, avg_price, mark_price, upl, margin, leverage, updated_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', extreme_rows)
+    cursor.executemany('''
+    INSERT INTO anchor_monitors (
+        timestamp, inst_id, pos_side, pos_size, avg_price, mark_price,
+        upl, upl_ratio, margin, leverage, profit_rate, alert_type, alert_sent
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ''', monitor_rows)
+    if alert_rows:
+        cursor.executemany('''
+        INSERT INTO anchor_alerts (
+            timestamp, inst_id, pos_side, profit_rate, alert_type, message, sent_status
+        ) VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', alert_rows)
+
+
 def monitor_positions(cycle=None):
-    """监控持仓"""
+    """
+    监控持仓（批量）
+    1. 一次读取全部持仓的历史极值和告警冷却状态
+    2. 在内存中执行极值与告警规则
+    3. 发送需要的Telegram消息（市场数据每轮只取一次）
+    4. 监控记录、极值更新、告警记录在一个事务内写入
+    """
     print("\n" + "=" * 60)
     print("🔍 锚点系统 - 持仓监控")
-    beijing_time = datetime.now(BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+    now = datetime.now(BEIJING_TZ)
+    beijing_time = now.strftime('%Y-%m-%d %H:%M:%S')
     print(f"⏰ 时间: {beijing_time} (北京时间)")
     print("=" * 60)
     
@@ -908,60 +1083,66 @@ def monitor_positions(cycle=None):
     
     print(f"\n📊 当前持仓数: {len(positions)}")
     
-    for idx, pos in enumerate(positions, 1):
+    conn = get_connection(DB_PATH)
+    try:
+        extremes, recent_alerts = load_monitor_state(conn, positions)
+    finally:
+        conn.close()
+    
+    decisions = evaluate_positions(positions, extremes, recent_alerts)
+    
+    # 本轮共享的消息数据，只在需要发消息时获取一次
+    shared = {}
+    
+    def message_data():
+        if not shared:
+            shared['market_data'] = get_market_data()
+            shared['btc_eth_change'] = get_btc_eth_change()
+        return shared
+    
+    for idx, d in enumerate(decisions, 1):
+        pos = d['position']
         inst_id = pos.get('instId')
-        pos_side = pos.get('posSide')
-        pos_size = float(pos.get('pos', 0))
+        profit_rate = d['profit_rate']
         
         print(f"\n【持仓 {idx}】")
         print(f"  币种: {inst_id}")
-        print(f"  方向: {pos_side}")
-        print(f"  持仓量: {abs(pos_size)}")
-        
-        # 计算收益率
-        profit_rate = calculate_profit_rate(pos)
+        print(f"  方向: {pos.get('posSide')}")
+        print(f"  持仓量: {abs(float(pos.get('pos', 0)))}")
         print(f"  收益率: {profit_rate:+.2f}%")
         
-        # 更新历史极值记录
-        update_profit_record(pos, profit_rate)
+        if d['previous_extreme'] is not None:
+            label = '最高收益' if d['extreme_type'] == 'max_profit' else '最大亏损'
+            print(f"  🎉 {inst_id} 刷新{label} [{TRADE_MODE}]: {d['previous_extreme']:.2f}% → {profit_rate:.2f}%")
+            if d['extreme_alert']:
+                print(f"  📢 发送极值突破预警...")
+                d['extreme_message'] = format_extreme_alert(
+                    pos, profit_rate, d['previous_extreme'], d['extreme_type'], **message_data())
+                d['extreme_sent'] = send_telegram_message(d['extreme_message'])
+            elif d['extreme_cooling']:
+                print(f"  ⏸️  极值突破预警冷却中，跳过")
         
-        # 只监控做空持仓（如果配置要求）
-        if ONLY_SHORT and pos_side != 'short':
+        if d['skipped']:
             print("  ⏭️  跳过（非做空持仓）")
-            save_monitor_record(pos, profit_rate)
-            continue
-        
-        # 检查告警条件
-        alert_type = None
-        should_alert = False
-        
-        if profit_rate >= PROFIT_TARGET:
-            alert_type = "profit_target"
-            should_alert = True
+        elif d['alert_type'] == 'profit_target':
             print(f"  ✅ 触发盈利目标 (>= {PROFIT_TARGET}%)")
-        elif profit_rate <= LOSS_LIMIT:
-            alert_type = "loss_limit"
-            should_alert = True
+        elif d['alert_type'] == 'loss_limit':
             print(f"  ⚠️  触发止损警告 (<= {LOSS_LIMIT}%)")
         else:
             print(f"  📍 监控中 (目标: {PROFIT_TARGET}%, 止损: {LOSS_LIMIT}%)")
         
-        # 发送告警
-        if should_alert:
-            # 检查是否最近已发送过
-            if check_alert_sent_recently(inst_id, alert_type, minutes=ALERT_COOLDOWN):
-                print(f"  ⏸️  {ALERT_COOLDOWN}分钟内已发送过告警，跳过")
-                save_monitor_record(pos, profit_rate, alert_type, alert_sent=0)
-            else:
-                # 发送Telegram消息（传入检测次数）
-                message = format_alert_message(pos, profit_rate, alert_type, cycle)
-                success = send_telegram_message(message)
-                
-                # 保存记录
-                save_monitor_record(pos, profit_rate, alert_type, alert_sent=1 if success else 0)
-                save_alert_record(inst_id, pos_side, profit_rate, alert_type, message, 1 if success else 0)
-        else:
-            save_monitor_record(pos, profit_rate)
+        if d['alert_type'] and not d['send_alert']:
+            print(f"  ⏸️  {ALERT_COOLDOWN}分钟内已发送过告警，跳过")
+        elif d['send_alert']:
+            # 发送Telegram消息（传入检测次数）
+            d['alert_message'] = format_alert_message(pos, profit_rate, d['alert_type'], cycle, **message_data())
+            d['alert_success'] = send_telegram_message(d['alert_message'])
+    
+    try:
+        with transaction(DB_PATH) as conn:
+            save_monitor_results(conn, decisions, beijing_time)
+    except Exception as e:
+        print(f"❌ 保存监控结果失败: {e}")
     
     print("\n" + "=" * 60)
     print("✅ 监控完成")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+各功能 Blueprint 共用的工具
+- 北京时间
+- 路由级响应缓存（cached_response）及其数据源版本号
+- 按需创建的重对象（lazy）：首次使用时才导入依赖，未启用的功能不付出导入和内存开销
+
+这里只导入轻量模块，避免拖慢每个 worker 的启动
+"""
+
+import threading
+from datetime import datetime
+from functools import wraps
+
+import pytz
+from flask import make_response, request
+
+from db_access import get_db_path
+from response_cache import DataVersions, ResponseCache
+
+BEIJING_TZ = pytz.timezone('Asia/Shanghai')
+
+def get_china_today():
+    """获取中国时区的今日日期字符串 (YYYY-MM-DD)"""
+    return datetime.now(BEIJING_TZ).strftime('%Y-%m-%d')
+
+def get_china_now():
+    """获取中国时区的当前时间"""
+    return datetime.now(BEIJING_TZ)
+
+
+def lazy(factory):
+    """
+    装饰器：factory() 在第一次调用时执行（线程安全），之后返回同一个对象
+    用于需要导入重依赖（numpy 等）的全局对象；loaded() 判断是否已经创建
+    """
+    lock = threading.Lock()
+    box = []
+
+    @wraps(factory)
+    def get():
+        if not box:
+            with lock:
+                if not box:
+                    box.append(factory())
+        return box[0]
+
+    get.loaded = lambda: bool(box)
+    return get
+
+
+# 路由级响应缓存：LRU + TTL + 单飞 + 数据版本失效
+response_cache = ResponseCache(max_entries=512)
+data_versions = DataVersions(poll_interval=1.0)
+
+# 采集器写入时递增版本号的数据源（见 response_cache.bump_data_version）
+SNAPSHOT_SOURCES = ((get_db_path('crypto_data'), 'crypto_snapshots'),)
+INDICATOR_SOURCES = ((get_db_path('crypto_data'), 'okex_technical_indicators'),)
+SAR_SLOPE_SOURCES = ((get_db_path('sar_slope'), 'sar_slope'),)
+
+# /api/cache/clear 递增的版本号：多个 worker 进程时清除对所有进程生效
+CACHE_CLEAR_DB = 'state_store'
+CACHE_CLEAR_SOURCE = 'response_cache'
+
+
+def cache_clear_sources(route):
+    """全部清除 + 按路由清除 两个版本号"""
+    path = get_db_path(CACHE_CLEAR_DB)
+    return ((path, CACHE_CLEAR_SOURCE), (path, f'{CACHE_CLEAR_SOURCE}:{route}'))
+
+
+@lazy
+def candle_store():
+    """最近10天K线常驻内存（首次访问从 okex_kline_ohlc 加载，之后只同步新K线）"""
+    from candle_store import CandleStore
+    return CandleStore(days=10, sync_interval=2.0)
+
+
+def cached_response(max_age=60, sources=()):
+    """
+    缓存装饰器 - 在服务器端缓存API响应
+    max_age: 缓存有效期（秒）
+    sources: 依赖的数据源 [(db_path, source), ...]，采集器递增版本号后缓存立即失效
+
+    缓存键包含路由参数和查询参数；只缓存 200 且 success 不为 False 的JSON响应，
+    命中时直接返回序列化好的响应体。
+    """
+    def decorator(f):
+        route = f.__name__
+        all_sources = tuple(sources) + cache_clear_sources(route)
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            cache_key = (
+                route,
+                tuple(sorted(kwargs.items())),
+                tuple(sorted(request.args.items(multi=True))),
+            )
+
+            def compute():
+                response = make_response(f(*args, **kwargs))
+                cacheable = response.status_code == 200 and response.is_json
+                if cacheable:
+                    data = response.get_json(silent=True)
+                    cacheable = not (isinstance(data, dict) and data.get('success') is False)
+                headers = [(k, v) for k, v in response.headers.items() if k != 'Content-Length']
+                return (response.get_data(), response.status_code, headers), cacheable
+
+            (body, status, headers), age = response_cache.get_or_compute(
+                route, cache_key, max_age, data_versions.get(all_sources), compute)
+            response = make_response(body, status, headers)
+            response.headers['X-Server-Cache'] = 'MISS' if age is None else 'HIT'
+            if age is not None:
+                response.headers['X-Server-Cache-Age'] = str(int(age))
+            return response
+
+        return decorated_function
+    return decorator
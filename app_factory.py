@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+应用工厂：按部署启用的功能注册 Blueprint
+- 每个功能是一个独立模块（*_api.py），只有启用的功能才会被导入
+- 重依赖（numpy、K线常驻内存、冷数据归档等）在各功能内部首次使用时才导入
+- 记录每个功能的导入耗时、路由数和内存增量，便于排查启动慢 / worker 内存大
+
+启用的功能由环境变量 WEBAPP_FEATURES 指定（逗号分隔，默认 all），system 总是启用:
+    WEBAPP_FEATURES=market,sar_slope,anchor pm2 restart flask-app
+
+导入耗时分析:
+    python app_factory.py --profile
+    python app_factory.py --profile --features market,sar_slope
+"""
+
+import argparse
+import importlib
+import os
+import resource
+import sys
+import time
+
+from flask import Flask
+
+# 功能名 -> (模块, Blueprint 变量名, 说明)；注册顺序即此顺序
+FEATURES = {
+    'trading': ('trading_api', 'trading_bp', '交易管理'),
+    'market': ('market_api', 'market_bp', '首页与行情数据'),
+    'signals': ('signals_api', 'signals_bp', '交易信号'),
+    'price_comparison': ('price_comparison_api', 'price_comparison_bp', '比价系统'),
+    'monitor': ('monitor_api', 'monitor_bp', '系统监控'),
+    'star_system': ('star_system_api', 'star_system_bp', '星星系统'),
+    'crypto_index': ('crypto_index_api', 'crypto_index_bp', '深度评分与加密指数'),
+    'position_system': ('position_system_api', 'position_system_bp', '持仓系统'),
+    'v1v2': ('v1v2_api', 'v1v2_bp', 'V1V2 成交量监控'),
+    'price_speed': ('price_speed_api', 'price_speed_bp', '价格速度监控'),
+    'gdrive': ('gdrive_api', 'gdrive_bp', 'Google Drive 数据导入'),
+    'system': ('system_api', 'system_bp', '系统接口'),
+    'support_resistance': ('support_resistance_api', 'support_resistance_bp', '支撑压力线与逃顶信号'),
+    'kline': ('kline_api', 'kline_bp', 'K线与技术指标'),
+    'telegram': ('telegram_api', 'telegram_bp', 'Telegram 通知'),
+    'sar_slope': ('sar_slope_api', 'sar_slope_bp', 'SAR 斜率系统'),
+    'fund_monitor': ('fund_monitor_api', 'fund_monitor_bp', '资金监控'),
+    'anchor': ('anchor_api', 'anchor_bp', '锚点系统'),
+    'trading_decision': ('trading_decision_api', 'trading_decision_bp', '交易决策系统'),
+}
+
+# 缓存统计/清除、favicon 等基础接口，任何部署都需要
+ALWAYS_ENABLED = ('system',)
+
+
+def parse_features(value=None):
+    """
+    'all' / 'market,anchor' / 列表 -> 按注册顺序排列的功能名列表
+    未知功能名抛出 ValueError，避免拼写错误时静默少注册路由
+    """
+    if value is None:
+        value = os.environ.get('WEBAPP_FEATURES', 'all')
+    if isinstance(value, str):
+        value = [name.strip() for name in value.split(',') if name.strip()]
+    names = set(value)
+    if not names or 'all' in names:
+        return list(FEATURES)
+    unknown = sorted(names - set(FEATURES))
+    if unknown:
+        raise ValueError(f"未知功能: {', '.join(unknown)}（可选: {', '.join(FEATURES)}）")
+    names.update(ALWAYS_ENABLED)
+    return [name for name in FEATURES if name in names]
+
+
+def _rss_kb():
+    """当前进程常驻内存（KB）；没有 /proc 时退回峰值内存"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def create_app(features=None):
+    """
+    创建 Flask 应用，只导入并注册启用的功能
+    features: None 时读取 WEBAPP_FEATURES；也可以传 'a,b' 或列表
+
+    每个功能的导入耗时/路由数/内存增量记录在 app.extensions['feature_profile']
+    """
+    enabled = parse_features(features)
+
+    app = Flask(__name__)
+    app.config['TEMPLATES_AUTO_RELOAD'] = True
+    app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
+
+    profile = []
+    for name in enabled:
+        module_name, bp_name, _ = FEATURES[name]
+        rss_before = _rss_kb()
+        started = time.perf_counter()
+        module = importlib.import_module(module_name)
+        import_ms = (time.perf_counter() - started) * 1000
+        rules_before = len(list(app.url_map.iter_rules()))
+        app.register_blueprint(getattr(module, bp_name))
+        profile.append({
+            'feature': name,
+            'module': module_name,
+            'import_ms': round(import_ms, 1),
+            'routes': len(list(app.url_map.iter_rules())) - rules_before,
+            'rss_delta_kb': _rss_kb() - rss_before,
+        })
+
+    app.extensions['feature_profile'] = profile
+    total_ms = sum(item['import_ms'] for item in profile)
+    print(f"📦 已启用 {len(enabled)}/{len(FEATURES)} 个功能，{len(list(app.url_map.iter_rules()))} 个路由，"
+          f"功能模块导入 {total_ms:.0f}ms", flush=True)
+    return app
+
+
+def print_profile(app):
+    profile = app.extensions['feature_profile']
+    print(f"\n{'功能':<22}{'模块':<28}{'导入ms':>10}{'路由':>6}{'内存增量KB':>12}")
+    for item in sorted(profile, key=lambda item: item['import_ms'], reverse=True):
+        print(f"{item['feature']:<22}{item['module']:<28}{item['import_ms']:>10}{item['routes']:>6}"
+              f"{item['rss_delta_kb']:>12}")
+    heavy = [name for name in ('numpy', 'candle_store', 'cold_archive', 'position_stream', 'score_calculator')
+             if name in sys.modules]
+    print(f"\n当前内存 {_rss_kb() / 1024:.1f}MB，峰值 "
+          f"{resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f}MB")
+    print(f"已导入的重依赖: {', '.join(heavy) if heavy else '无'}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='按功能创建应用并输出导入耗时分析')
+    parser.add_argument('--features', default=None, help='逗号分隔的功能名，默认读取 WEBAPP_FEATURES（all）')
+    parser.add_argument('--profile', action='store_true', help='输出每个功能的导入耗时、路由数和内存增量')
+    parser.add_argument('--list', action='store_true', help='列出所有功能')
+    args = parser.parse_args()
+
+    if args.list:
+        for name, (module_name, _, description) in FEATURES.items():
+            print(f"{name:<22}{module_name:<28}{description}")
+        return
+
+    started = time.perf_counter()
+    app = create_app(args.features)
+    print(f"create_app 用时 {(time.perf_counter() - started) * 1000:.0f}ms")
+    if args.profile:
+        print_profile(app)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+异步批量 SQLite 写入器
+- asyncio.Queue 接收写请求，事件循环内只做入队，不再阻塞 websocket 读取
+- 专用写线程持有一个长连接（WAL 模式）
+- 每个刷新窗口内同一主键的 INSERT OR REPLACE 只保留最后一次
+- 追加类写入按 SQL 分组后 executemany
+- 统计队列深度与刷新耗时
+"""
+
+import asyncio
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Hashable, Optional, Sequence
+
+_STOP = object()
+
+
+class AsyncSQLiteWriter:
+    """单连接、批量刷新的异步写入器"""
+
+    def __init__(self, db_path: str, flush_interval: float = 0.5, max_batch: int = 5000,
+                 timeout: float = 30.0, on_flush: Optional[Callable] = None):
+        """
+        Args:
+            db_path: 数据库路径
+            flush_interval: 刷新窗口（秒）
+            max_batch: 单次刷新最多处理的写请求数
+            timeout: 连接 busy timeout（秒）
+            on_flush: 可选回调 on_flush(cursor, written)，在同一事务内执行
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.timeout = timeout
+        self.on_flush = on_flush
+
+        self.queue = None
+        self._task = None
+        self._conn = None
+        # 单线程执行器：连接始终只在这一个线程里使用
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sqlite-writer')
+
+        self._stats = {
+            'enqueued': 0,
+            'requests_written': 0,
+            'rows_written': 0,
+            'coalesced': 0,
+            'flushes': 0,
+            'errors': 0,
+            'last_flush_ms': 0.0,
+            'max_flush_ms': 0.0,
+            'total_flush_ms': 0.0,
+            'max_queue_depth': 0,
+        }
+
+    # ------------------------------------------------------------------
+    # 入队（事件循环内调用，非阻塞）
+    # ------------------------------------------------------------------
+    def _put(self, item):
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        self.queue.put_nowait(item)
+        self._stats['enqueued'] += 1
+        depth = self.queue.qsize()
+        if depth > self._stats['max_queue_depth']:
+            self._stats['max_queue_depth'] = depth
+
+    def upsert(self, key: Hashable, sql: str, params: Sequence):
+        """INSERT OR REPLACE 类写入：同一窗口内相同 (sql, key) 只写最后一次"""
+        self._put(('upsert', (sql, key), sql, tuple(params)))
+
+    def append(self, sql: str, params: Sequence):
+        """追加类写入：同一窗口内按 SQL 分组 executemany"""
+        self._put(('append', None, sql, tuple(params)))
+
+    # ------------------------------------------------------------------
+    # 生命周期
+    # ------------------------------------------------------------------
+    def start(self):
+        """在当前事件循环中启动写入任务"""
+        if self.queue is None:
+            self.queue = asyncio.Queue()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return self._task
+
+    async def stop(self):
+        """写完队列中剩余数据后停止"""
+        if self._task is not None and not self._task.done():
+            self.queue.put_nowait(_STOP)
+            await self._task
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._close)
+
+    def _connect(self):
+        if self._conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=self.timeout)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn = conn
+        return self._conn
+
+    def _close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # ------------------------------------------------------------------
+    # 写入循环
+    # ------------------------------------------------------------------
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        stopping = False
+
+        while not stopping:
+            item = await self.queue.get()
+            if item is _STOP:
+                break
+            items = [item]
+
+            # 收集一个刷新窗口内的写请求
+            deadline = loop.time() + self.flush_interval
+            while len(items) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    item = await asyncio.wait_for(self.queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                items.append(item)
+
+            upserts, appends = self._coalesce(items)
+            try:
+                await loop.run_in_executor(self._executor, self._write_batch,
+                                           upserts, appends, len(items))
+            except Exception as e:
+                self._stats['errors'] += 1
+                print(f"❌ 批量写入失败 ({len(items)} 条): {e}")
+
+        # 停止前把剩余的写完
+        items = []
+        while not self.queue.empty():
+            item = self.queue.get_nowait()
+            if item is not _STOP:
+                items.append(item)
+        if items:
+            upserts, appends = self._coalesce(items)
+            await loop.run_in_executor(self._executor, self._write_batch,
+                                       upserts, appends, len(items))
+
+    def _coalesce(self, items):
+        """合并同主键的 upsert，按 SQL 分组 append"""
+        upserts: Dict = {}
+        appends: Dict[str, list] = {}
+        for kind, key, sql, params in items:
+            if kind == 'upsert':
+                upserts[key] = params
+            else:
+                appends.setdefault(sql, []).append(params)
+
+        grouped: Dict[str, list] = {}
+        for (sql, _), params in upserts.items():
+            grouped.setdefault(sql, []).append(params)
+
+        upsert_count = sum(1 for item in items if item[0] == 'upsert')
+        self._stats['coalesced'] += upsert_count - len(upserts)
+        return grouped, appends
+
+    def _write_batch(self, upserts, appends, request_count):
+        """在写线程中执行一次事务"""
+        started = time.perf_counter()
+        conn = self._connect()
+        cursor = conn.cursor()
+        written = 0
+        try:
+            for sql, rows in upserts.items():
+                cursor.executemany(sql, rows)
+                written += len(rows)
+            for sql, rows in appends.items():
+                cursor.executemany(sql, rows)
+                written += len(rows)
+            if self.on_flush is not None:
+                self.on_flush(cursor, written)
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        stats = self._stats
+        stats['flushes'] += 1
+        stats['requests_written'] += request_count
+        stats['rows_written'] += written
+        stats['last_flush_ms'] = elapsed_ms
+        stats['total_flush_ms'] += elapsed_ms
+        if elapsed_ms > stats['max_flush_ms']:
+            stats['max_flush_ms'] = elapsed_ms
+
+    # ------------------------------------------------------------------
+    # 统计
+    # ------------------------------------------------------------------
+    def stats(self) -> Dict:
+        """队列深度与刷新耗时统计"""
+        stats = dict(self._stats)
+        stats['queue_depth'] = self.queue.qsize() if self.queue is not None else 0
+        stats['avg_flush_ms'] = (stats['total_flush_ms'] / stats['flushes']
+                                 if stats['flushes'] else 0.0)
+        return stats
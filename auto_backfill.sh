@@ -1,7 +1,8 @@
 #!/bin/bash
 # 自动backfill指标数据脚本
 # 每5分钟运行一次，确保指标数据与K线数据同步
+# 只读取最近一天及之前 1000 根预热K线，替换范围止于已读到的最后一根K线
 
 cd /home/user/webapp
-python3 backfill_indicators.py >> /home/user/webapp/logs/auto_backfill.log 2>&1
+python3 indicator_recalc.py --since 1d --warmup-bars 1000 >> /home/user/webapp/logs/auto_backfill.log 2>&1
 echo "$(date): Backfill completed" >> /home/user/webapp/logs/auto_backfill.log
@@ -8,11 +8,12 @@
 """
 
 import requests
-import json
 import time
 from datetime import datetime
 import traceback
 
+from state_store import MAIN_ACCOUNT_MAINTENANCE
+
 BASE_URL = 'http://localhost:5000'
 
 def log(message):
@@ -36,19 +37,13 @@ def get_maintenance_count_today(inst_id, pos_side):
 def get_main_account_maintenance_count(inst_id, pos_side):
     """获取主账户今日超级维护次数"""
     try:
-        with open('main_account_maintenance.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         key = f"{inst_id}_{pos_side}"
-        if key in data:
-            record = data[key]
-            from datetime import datetime
+        record = MAIN_ACCOUNT_MAINTENANCE.get(key)
+        if record:
             today = datetime.now().strftime('%Y-%m-%d')
             if record.get('date') == today:
                 return record.get('count', 0)
         return 0
-    except FileNotFoundError:
-        return 0
     except Exception as e:
         log(f"⚠️ 读取主账户维护次数失败: {e}")
         return 0
@@ -56,36 +51,26 @@ def get_main_account_maintenance_count(inst_id, pos_side):
 def update_main_account_maintenance_count(inst_id, pos_side):
     """更新主账户维护次数+1"""
     try:
-        try:
-            with open('main_account_maintenance.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            data = {}
-        
         key = f"{inst_id}_{pos_side}"
-        from datetime import datetime
         today = datetime.now().strftime('%Y-%m-%d')
         now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
-        if key not in data:
-            data[key] = {
-                'count': 1,
-                'date': today,
-                'last_maintenance': now
-            }
-        else:
-            record = data[key]
+        def increment(record):
+            if record is None:
+                return {
+                    'count': 1,
+                    'date': today,
+                    'last_maintenance': now
+                }
             if record.get('date') == today:
                 record['count'] = record.get('count', 0) + 1
             else:
                 record['count'] = 1
                 record['date'] = today
             record['last_maintenance'] = now
+            return record
         
-        with open('main_account_maintenance.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        return data[key]['count']
+        return MAIN_ACCOUNT_MAINTENANCE.update(key, increment)['count']
     except Exception as e:
         log(f"❌ 更新主账户维护次数失败: {e}")
         return 0
@@ -5,9 +5,12 @@
 import os
 import re
 import sqlite3
-import subprocess
 from datetime import datetime
 
+from txt_snapshot_importer import import_files
+
+DB_PATH = '/home/user/webapp/crypto_data.db'
+
 def find_all_txt_files():
     """查找所有历史txt文件"""
     txt_files = []
@@ -54,36 +57,6 @@ def find_all_txt_files():
     
     return unique_files
 
-def check_file_imported(filename):
-    """检查文件是否已导入"""
-    try:
-        conn = sqlite3.connect('/home/user/webapp/crypto_data.db')
-        cursor = conn.cursor()
-        cursor.execute('SELECT COUNT(*) FROM crypto_snapshots WHERE filename = ?', (filename,))
-        count = cursor.fetchone()[0]
-        conn.close()
-        return count > 0
-    except:
-        return False
-
-def import_txt_file(filepath, filename):
-    """导入单个txt文件"""
-    try:
-        # 使用原有的collect_and_store.py脚本导入
-        result = subprocess.run(
-            ['python3', '/home/user/webapp/collect_and_store.py', filepath],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        
-        if result.returncode == 0:
-            return True, "成功"
-        else:
-            return False, result.stderr[:100]
-    except Exception as e:
-        return False, str(e)[:100]
-
 def batch_import():
     """批量导入所有txt文件"""
     print("=" * 80)
@@ -102,32 +75,20 @@ def batch_import():
     
     # 统计
     total = len(files)
-    imported = 0
-    skipped = 0
-    failed = 0
     
     print(f"\n开始导入...")
     print("-" * 80)
     
-    for i, file_info in enumerate(files, 1):
-        filename = file_info['filename']
-        filepath = file_info['path']
-        
-        # 检查是否已导入
-        if check_file_imported(filename):
-            print(f"[{i:3d}/{total}] ⏭️  已存在: {filename}")
-            skipped += 1
-            continue
-        
-        # 导入文件
-        success, message = import_txt_file(filepath, filename)
-        
-        if success:
-            print(f"[{i:3d}/{total}] ✅ 导入成功: {filename}")
-            imported += 1
-        else:
-            print(f"[{i:3d}/{total}] ❌ 导入失败: {filename} - {message}")
-            failed += 1
+    # 所有文件一次解析、批量写入（按 snapshot_time 去重）
+    result = import_files([f['path'] for f in files], db=DB_PATH)
+    imported = len(result['inserted'])
+    skipped = len(result['skipped'])
+    failed = len(result['failed'])
+    
+    for data in result['inserted']:
+        print(f"✅ 导入成功: {data['filename']}")
+    for path in result['failed']:
+        print(f"❌ 导入失败: {os.path.basename(path)} - 解析失败")
     
     print("-" * 80)
     print(f"\n📊 导入统计:")
@@ -138,7 +99,7 @@ def batch_import():
     
     # 查询数据库最终状态
     try:
-        conn = sqlite3.connect('/home/user/webapp/crypto_data.db')
+        conn = sqlite3.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute('SELECT COUNT(*) FROM crypto_snapshots')
         total_records = cursor.fetchone()[0]
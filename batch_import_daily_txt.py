@@ -5,7 +5,6 @@
 """
 import requests
 import re
-import sqlite3
 from datetime import datetime
 import pytz
 import json
@@ -13,8 +12,8 @@ import sys
 import time
 from bs4 import BeautifulSoup
 
-# 导入计次得分计算函数
-from calculate_count_score import calculate_count_score
+# 与 gdrive_final_detector 共用的解析和批量导入
+from txt_snapshot_importer import import_snapshots, parse_txt
 
 # 配置
 DB_PATH = "/home/user/webapp/crypto_data.db"
@@ -113,226 +112,6 @@ def download_txt_content(file_id):
         log(f"   ❌ 下载失败: {e}")
         return None
 
-def parse_content(content):
-    """解析TXT文件内容"""
-    try:
-        # 提取时间戳
-        timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})', content)
-        if not timestamp_match:
-            return None
-        
-        date_str, time_str = timestamp_match.groups()
-        timestamp = f"{date_str} {time_str}"
-        
-        # 解析为datetime对象（只保留到分钟）
-        dt = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-        snapshot_time = dt.strftime('%Y-%m-%d %H:%M:00')
-        snapshot_date = dt.strftime('%Y-%m-%d')
-        
-        # 提取急涨急跌数据（兼容新旧格式）
-        rush_up_match = re.search(r'透明标签_急涨总和=急涨[:：](\d+)', content)
-        if not rush_up_match:
-            rush_up_match = re.search(r'本轮急涨.*?(\d+)/', content)
-        
-        rush_down_match = re.search(r'透明标签_急跌总和=急跌[:：](\d+)', content)
-        if not rush_down_match:
-            rush_down_match = re.search(r'本轮急跌.*?(\d+)/', content)
-        
-        rush_up = int(rush_up_match.group(1)) if rush_up_match else 0
-        rush_down = int(rush_down_match.group(1)) if rush_down_match else 0
-        
-        # 提取计次和状态（兼容新旧格式）
-        count_match = re.search(r'透明标签_计次=(\d+)', content)
-        if not count_match:
-            count_match = re.search(r'计次[:：](\d+)', content)
-        
-        status_match = re.search(r'透明标签_五种状态=状态[:：]([^\r\n]+)', content)
-        if not status_match:
-            status_match = re.search(r'[★☆]+\s*\|\s*([^\n]+)', content)
-        
-        count = int(count_match.group(1)) if count_match else 0
-        status = status_match.group(1).strip() if status_match else ""
-        
-        # 自动计算计次得分
-        count_score_display, count_score_type = calculate_count_score(snapshot_time, count)
-        
-        # 计算diff = rush_up - rush_down
-        diff = rush_up - rush_down
-        
-        return {
-            'snapshot_time': snapshot_time,
-            'snapshot_date': snapshot_date,
-            'rush_up': rush_up,
-            'rush_down': rush_down,
-            'diff': diff,
-            'count': count,
-            'status': status,
-            'count_score_display': count_score_display,
-            'count_score_type': count_score_type,
-            'file_timestamp': timestamp
-        }
-        
-    except Exception as e:
-        log(f"   ❌ 解析内容失败: {e}")
-        return None
-
-def parse_coin_data(content):
-    """解析币种详细数据"""
-    try:
-        coins = []
-        lines = content.split('\n')
-        
-        # 查找币种数据区域（在[超级列表框_首页开始]之后）
-        in_coin_section = False
-        for line in lines:
-            if '[超级列表框_首页开始]' in line:
-                in_coin_section = True
-                continue
-            
-            if '[超级列表框_首页结束]' in line:
-                break
-            
-            if in_coin_section and '|' in line:
-                parts = line.strip().split('|')
-                if len(parts) >= 15:
-                    try:
-                        index = int(parts[0])
-                        
-                        # 解析最高占比和最低占比
-                        ratio1_str = parts[14] if len(parts) > 14 else '0%'
-                        ratio2_str = parts[15] if len(parts) > 15 else '0%'
-                        
-                        # 移除百分号并转换为浮点数
-                        try:
-                            max_ratio = float(ratio1_str.rstrip('%')) if ratio1_str else 0
-                            min_ratio = float(ratio2_str.rstrip('%')) if ratio2_str else 0
-                        except:
-                            max_ratio = 0
-                            min_ratio = 0
-                        
-                        # 根据最高占比和最低占比计算优先级等级
-                        if max_ratio > 90 and min_ratio > 120:
-                            priority_level = '等级1'
-                        elif max_ratio > 80 and min_ratio > 120:
-                            priority_level = '等级2'
-                        elif max_ratio > 90 and min_ratio > 110:
-                            priority_level = '等级3'
-                        elif max_ratio > 70 and min_ratio > 120:
-                            priority_level = '等级4'
-                        elif max_ratio > 80 and min_ratio > 110:
-                            priority_level = '等级5'
-                        else:
-                            priority_level = '等级6'
-                        
-                        coin = {
-                            'index_order': index,
-                            'symbol': parts[1],
-                            'change': float(parts[2]) if parts[2] else 0,
-                            'rush_up': int(parts[3]) if parts[3] else 0,
-                            'rush_down': int(parts[4]) if parts[4] else 0,
-                            'update_time': parts[5],
-                            'high_price': float(parts[6]) if parts[6] else 0,
-                            'high_time': parts[7],
-                            'decline': float(parts[8]) if parts[8] else 0,
-                            'change_24h': float(parts[9]) if parts[9] else 0,
-                            'rank': int(parts[12]) if parts[12] else 0,
-                            'current_price': float(parts[13]) if parts[13] else 0,
-                            'ratio1': ratio1_str,
-                            'ratio2': ratio2_str,
-                            'priority_level': priority_level
-                        }
-                        coins.append(coin)
-                    except (ValueError, IndexError):
-                        continue
-        
-        return coins
-        
-    except Exception as e:
-        log(f"   ❌ 解析币种数据失败: {e}")
-        return []
-
-def check_if_exists(cursor, snapshot_time):
-    """检查数据是否已存在"""
-    cursor.execute("""
-        SELECT COUNT(*) FROM crypto_snapshots 
-        WHERE snapshot_time = ?
-    """, (snapshot_time,))
-    return cursor.fetchone()[0] > 0
-
-def import_to_database(data, content, conn, cursor):
-    """导入数据到数据库"""
-    try:
-        # 检查数据是否已存在
-        if check_if_exists(cursor, data['snapshot_time']):
-            return 'exists'
-        
-        # 验证数据有效性：rush_up和rush_down不能同时为0
-        if data['rush_up'] == 0 and data['rush_down'] == 0:
-            return 'invalid'
-        
-        # 插入新数据到crypto_snapshots
-        cursor.execute("""
-            INSERT INTO crypto_snapshots 
-            (snapshot_time, snapshot_date, rush_up, rush_down, diff, count, status, count_score_display, count_score_type, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', '+8 hours'))
-        """, (
-            data['snapshot_time'],
-            data['snapshot_date'],
-            data['rush_up'],
-            data['rush_down'],
-            data['diff'],
-            data['count'],
-            data['status'],
-            data['count_score_display'],
-            data['count_score_type']
-        ))
-        
-        # 获取刚插入的snapshot_id
-        snapshot_id = cursor.lastrowid
-        
-        # 解析并导入币种数据
-        coins = parse_coin_data(content)
-        coin_count = 0
-        
-        if coins:
-            for coin in coins:
-                try:
-                    cursor.execute("""
-                        INSERT INTO crypto_coin_data 
-                        (snapshot_id, snapshot_time, symbol, index_order, change, rush_up, rush_down, 
-                         update_time, high_price, high_time, decline, change_24h, rank, current_price, 
-                         ratio1, ratio2, priority_level, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', '+8 hours'))
-                    """, (
-                        snapshot_id,
-                        data['snapshot_time'],
-                        coin['symbol'],
-                        coin['index_order'],
-                        coin['change'],
-                        coin['rush_up'],
-                        coin['rush_down'],
-                        coin['update_time'],
-                        coin['high_price'],
-                        coin['high_time'],
-                        coin['decline'],
-                        coin['change_24h'],
-                        coin['rank'],
-                        coin['current_price'],
-                        coin['ratio1'],
-                        coin['ratio2'],
-                        coin['priority_level']
-                    ))
-                    coin_count += 1
-                except:
-                    continue
-        
-        conn.commit()
-        return 'success'
-        
-    except Exception as e:
-        log(f"   ❌ 数据库操作失败: {e}")
-        return 'error'
-
 def main():
     """主函数"""
     log("")
@@ -370,73 +149,60 @@ def main():
     log(f"✅ 共找到 {len(file_list)} 个文件")
     log("")
     
-    # 连接数据库
-    log("步骤2: 连接数据库...")
-    try:
-        conn = sqlite3.connect(DB_PATH, timeout=30)
-        cursor = conn.cursor()
-        log(f"✅ 数据库连接成功: {DB_PATH}")
-    except Exception as e:
-        log(f"❌ 数据库连接失败: {e}")
-        return
-    
-    log("")
-    log("步骤3: 开始批量导入...")
+    log("步骤2: 下载并解析所有文件...")
     log("=" * 80)
     log("")
     
     # 统计
     total = len(file_list)
-    success_count = 0
-    exists_count = 0
     invalid_count = 0
     error_count = 0
+    snapshots = []
     
-    # 逐个处理文件
     for idx, file_info in enumerate(file_list, 1):
         filename = file_info['filename']
-        file_id = file_info['file_id']
         
-        log(f"[{idx}/{total}] 处理: {filename}")
-        
-        # 下载内容
-        content = download_txt_content(file_id)
+        log(f"[{idx}/{total}] 下载: {filename}")
+        content = download_txt_content(file_info['file_id'])
         if not content:
             log(f"   ❌ 下载失败，跳过")
             error_count += 1
             continue
         
-        # 解析内容
-        data = parse_content(content)
+        data = parse_txt(content, filename=filename)
         if not data:
             log(f"   ❌ 解析失败，跳过")
             error_count += 1
             continue
         
-        # 导入数据库
-        result = import_to_database(data, content, conn, cursor)
-        
-        if result == 'success':
-            log(f"   ✅ 成功导入: {data['snapshot_time']} | 急涨:{data['rush_up']} 急跌:{data['rush_down']} | 计次:{data['count']} {data['count_score_display']}")
-            success_count += 1
-        elif result == 'exists':
-            log(f"   ℹ️  已存在: {data['snapshot_time']}")
-            exists_count += 1
-        elif result == 'invalid':
+        # 验证数据有效性：rush_up和rush_down不能同时为0
+        if data['rush_up'] == 0 and data['rush_down'] == 0:
             log(f"   ⚠️  无效数据: {data['snapshot_time']} (急涨和急跌均为0)")
             invalid_count += 1
-        else:
-            log(f"   ❌ 导入失败")
-            error_count += 1
+            continue
         
-        log("")
+        snapshots.append(data)
         
         # 每处理10个文件休息0.5秒，避免请求过快
         if idx % 10 == 0:
             time.sleep(0.5)
     
-    # 关闭数据库
-    conn.close()
+    # 所有文件一次批量写入（按 snapshot_time 去重）
+    log("")
+    log("步骤3: 批量写入数据库...")
+    try:
+        result = import_snapshots(snapshots, db=DB_PATH)
+    except Exception as e:
+        log(f"❌ 数据库写入失败: {e}")
+        return
+    
+    for data in result['inserted']:
+        log(f"   ✅ 成功导入: {data['snapshot_time']} | 急涨:{data['rush_up']} 急跌:{data['rush_down']} | 计次:{data['count']} {data['count_score_display']}")
+    for snapshot_time in result['skipped']:
+        log(f"   ℹ️  已存在: {snapshot_time}")
+    success_count = len(result['inserted'])
+    exists_count = len(result['skipped'])
+    log("")
     
     # 输出统计结果
     log("=" * 80)
@@ -5,14 +5,13 @@
 """
 import requests
 import re
-import sqlite3
 from datetime import datetime
 import pytz
 import json
 import sys
 
-# 从gdrive_final_detector导入必要函数
-from calculate_count_score import calculate_count_score
+# 与 gdrive_final_detector 共用的解析和批量导入
+from txt_snapshot_importer import import_snapshots, parse_txt
 
 # 配置
 DB_PATH = "/home/user/webapp/crypto_data.db"
@@ -77,210 +76,18 @@ def download_file_content(file_id):
         log(f"❌ 下载文件失败: {e}")
         return None
 
-def parse_content(content, file_timestamp=None):
-    """解析TXT文件内容"""
-    try:
-        data = {}
-        
-        # 提取快照时间
-        time_match = re.search(r'(\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})', content)
-        if time_match:
-            data['snapshot_time'] = time_match.group(1)
-        elif file_timestamp:
-            data['snapshot_time'] = file_timestamp
-        else:
-            return None
-        
-        # 提取日期
-        date_match = re.search(r'(\d{4}-\d{2}-\d{2})', data['snapshot_time'])
-        if date_match:
-            data['snapshot_date'] = date_match.group(1)
-        else:
-            return None
-        
-        # 提取急涨急跌数据
-        rush_up_match = re.search(r'本轮急涨数量[:：]\s*(\d+)', content)
-        rush_down_match = re.search(r'本轮急跌数量[:：]\s*(\d+)', content)
-        
-        data['rush_up'] = int(rush_up_match.group(1)) if rush_up_match else 0
-        data['rush_down'] = int(rush_down_match.group(1)) if rush_down_match else 0
-        data['diff'] = data['rush_up'] - data['rush_down']
-        
-        # 提取计次
-        count_match = re.search(r'本轮计次[:：]\s*(\d+)', content)
-        data['count'] = int(count_match.group(1)) if count_match else 0
-        
-        # 计算计次得分
-        score_result = calculate_count_score(data['count'])
-        data['count_score_display'] = score_result['display']
-        data['count_score_type'] = score_result['type']
-        
-        # 提取状态
-        status_match = re.search(r'本轮状态[:：]\s*([^\n]+)', content)
-        data['status'] = status_match.group(1).strip() if status_match else '震荡无序'
-        
-        return data
-    
-    except Exception as e:
-        log(f"❌ 解析内容失败: {e}")
+def download_and_parse(file_info):
+    """下载并解析单个文件"""
+    content = download_file_content(file_info['id'])
+    if not content:
+        log(f"   ❌ 无法下载文件: {file_info['name']}")
         return None
-
-def parse_coin_data(content):
-    """解析币种数据"""
-    try:
-        coins = []
-        
-        # 查找表格数据
-        lines = content.split('\n')
-        in_table = False
-        index_order = 1
-        
-        for line in lines:
-            line = line.strip()
-            
-            # 跳过空行和分隔线
-            if not line or line.startswith('---') or line.startswith('==='):
-                continue
-            
-            # 检测表格开始
-            if '|' in line and ('币种' in line or 'symbol' in line.lower()):
-                in_table = True
-                continue
-            
-            # 解析表格行
-            if in_table and '|' in line:
-                parts = [p.strip() for p in line.split('|')]
-                parts = [p for p in parts if p]  # 移除空字符串
-                
-                if len(parts) >= 4:
-                    try:
-                        symbol = parts[0]
-                        change = float(parts[1].replace('%', '').strip())
-                        rush_up = int(parts[2]) if parts[2].isdigit() else 0
-                        rush_down = int(parts[3]) if parts[3].isdigit() else 0
-                        
-                        # 构建币种数据
-                        coin = {
-                            'symbol': symbol,
-                            'index_order': index_order,
-                            'change': change,
-                            'rush_up': rush_up,
-                            'rush_down': rush_down,
-                            'update_time': '',
-                            'high_price': 0.0,
-                            'high_time': '',
-                            'decline': 0.0,
-                            'change_24h': 0.0,
-                            'rank': 0,
-                            'current_price': 0.0,
-                            'ratio1': 0.0,
-                            'ratio2': 0.0,
-                            'priority_level': 0
-                        }
-                        
-                        coins.append(coin)
-                        index_order += 1
-                    
-                    except (ValueError, IndexError):
-                        continue
-        
-        return coins
     
-    except Exception as e:
-        log(f"❌ 解析币种数据失败: {e}")
-        return []
-
-def check_exists(cursor, snapshot_time):
-    """检查数据是否已存在"""
-    cursor.execute("""
-        SELECT COUNT(*) FROM crypto_snapshots 
-        WHERE snapshot_time = ?
-    """, (snapshot_time,))
-    return cursor.fetchone()[0] > 0
-
-def import_file_to_database(file_info, folder_id):
-    """导入单个文件到数据库"""
-    try:
-        # 下载文件内容
-        content = download_file_content(file_info['id'])
-        if not content:
-            log(f"   ❌ 无法下载文件: {file_info['name']}")
-            return False
-        
-        # 解析文件内容
-        data = parse_content(content)
-        if not data:
-            log(f"   ❌ 无法解析文件: {file_info['name']}")
-            return False
-        
-        # 连接数据库
-        conn = sqlite3.connect(DB_PATH, timeout=30)
-        cursor = conn.cursor()
-        
-        # 检查是否已存在
-        if check_exists(cursor, data['snapshot_time']):
-            log(f"   ℹ️  数据已存在: {data['snapshot_time']}")
-            conn.close()
-            return False
-        
-        # 插入快照数据
-        cursor.execute("""
-            INSERT INTO crypto_snapshots 
-            (snapshot_time, snapshot_date, rush_up, rush_down, diff, count, status, 
-             count_score_display, count_score_type, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', '+8 hours'))
-        """, (
-            data['snapshot_time'],
-            data['snapshot_date'],
-            data['rush_up'],
-            data['rush_down'],
-            data['diff'],
-            data['count'],
-            data['status'],
-            data['count_score_display'],
-            data['count_score_type']
-        ))
-        
-        snapshot_id = cursor.lastrowid
-        
-        # 解析并插入币种数据
-        coins = parse_coin_data(content)
-        for coin in coins:
-            cursor.execute("""
-                INSERT INTO crypto_coin_data 
-                (snapshot_id, snapshot_time, symbol, index_order, change, rush_up, rush_down, 
-                 update_time, high_price, high_time, decline, change_24h, rank, current_price, 
-                 ratio1, ratio2, priority_level, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', '+8 hours'))
-            """, (
-                snapshot_id,
-                data['snapshot_time'],
-                coin['symbol'],
-                coin['index_order'],
-                coin['change'],
-                coin['rush_up'],
-                coin['rush_down'],
-                coin['update_time'],
-                coin['high_price'],
-                coin['high_time'],
-                coin['decline'],
-                coin['change_24h'],
-                coin['rank'],
-                coin['current_price'],
-                coin['ratio1'],
-                coin['ratio2'],
-                coin['priority_level']
-            ))
-        
-        conn.commit()
-        conn.close()
-        
-        log(f"   ✅ 成功导入: {data['snapshot_time']} ({len(coins)} 个币种)")
-        return True
-    
-    except Exception as e:
-        log(f"   ❌ 导入失败: {e}")
-        return False
+    data = parse_txt(content, filename=file_info['name'])
+    if not data:
+        log(f"   ❌ 无法解析文件: {file_info['name']}")
+        return None
+    return data
 
 def batch_import_date(date_str):
     """批量导入指定日期的所有文件"""
@@ -304,12 +111,25 @@ def batch_import_date(date_str):
     
     log(f"📄 找到 {len(files)} 个TXT文件")
     
-    # 逐个导入
-    success_count = 0
+    # 逐个下载解析，最后一次批量写入
+    snapshots = []
     for i, file_info in enumerate(files, 1):
         log(f"\n[{i}/{len(files)}] 处理文件: {file_info['name']}")
-        if import_file_to_database(file_info, folder_id):
-            success_count += 1
+        data = download_and_parse(file_info)
+        if data:
+            snapshots.append(data)
+    
+    try:
+        result = import_snapshots(snapshots, db=DB_PATH)
+    except Exception as e:
+        log(f"   ❌ 导入失败: {e}")
+        return 0
+    
+    for data in result['inserted']:
+        log(f"   ✅ 成功导入: {data['snapshot_time']} ({len(data['coins'])} 个币种)")
+    for snapshot_time in result['skipped']:
+        log(f"   ℹ️  数据已存在: {snapshot_time}")
+    success_count = len(result['inserted'])
     
     log(f"\n{'='*80}")
     log(f"✅ 完成! 成功导入 {success_count}/{len(files)} 个文件")
@@ -8,11 +8,16 @@
 - 买点4检测
 """
 import sqlite3
+import sys
 from datetime import datetime
 
+import numpy as np
+
+DB_PATH = 'crypto_data.db'
+
 def get_indicator_data(symbol, timeframe):
     """从 okex_indicators_history 获取技术指标数据"""
-    conn = sqlite3.connect('crypto_data.db')
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
     cursor.execute('''
@@ -127,9 +132,182 @@ def detect_buy_point_4(rows, ohlc_data, seven_day_low_idx):
     
     return buy_point_4_indices
 
-def calculate_all_markers(symbol, timeframe):
-    """计算所有技术标记"""
-    conn = sqlite3.connect('crypto_data.db')
+MARKER_COLUMNS = (
+    'is_narrow_range', 'change_percent', 'range_percent', 'consecutive_count',
+    'is_7d_high', 'is_7d_low', 'is_48h_high', 'is_48h_low',
+    'rsi_14', 'sar', 'sar_position', 'sar_quadrant', 'sar_count_label',
+    'bb_upper', 'bb_middle', 'bb_lower', 'is_buy_point_4'
+)
+
+MARKER_UPSERT_SQL = f'''
+    INSERT OR REPLACE INTO kline_technical_markers 
+    (symbol, timeframe, timestamp, {', '.join(MARKER_COLUMNS)})
+    VALUES ({', '.join('?' * (len(MARKER_COLUMNS) + 3))})
+'''
+
+def run_lengths(mask):
+    """每个 True 元素所在连续段的长度（False 为 0）"""
+    mask = np.asarray(mask, dtype=bool)
+    out = np.zeros(len(mask), dtype=np.int64)
+    if not mask.any():
+        return out
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], mask.view(np.int8), [0]))))
+    lengths = edges[1::2] - edges[0::2]
+    out[mask] = np.repeat(lengths, lengths)
+    return out
+
+def run_positions(values):
+    """每个元素在其连续相同值段内的序号（从1开始）"""
+    n = len(values)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    index = np.arange(n)
+    starts = np.ones(n, dtype=bool)
+    starts[1:] = values[1:] != values[:-1]
+    return index - np.maximum.accumulate(np.where(starts, index, 0)) + 1
+
+def window_extreme_indices(timestamps, highs, lows, window_ms):
+    """
+    最新K线往前 window_ms 内的最高/最低点下标（并列取最早的一根）
+    与原实现一致：首根K线即在窗口内时从第2根开始统计
+    """
+    n = len(timestamps)
+    start = int(np.searchsorted(timestamps, timestamps[-1] - window_ms, side='left'))
+    if start == 0 and n > 1:
+        start = 1
+    return start + int(np.argmax(highs[start:])), start + int(np.argmin(lows[start:]))
+
+def compute_markers(ohlc_rows, indicator_rows):
+    """
+    单次线性计算全部标记（NumPy 向量化）
+    
+    Args:
+        ohlc_rows: [(timestamp, open, high, low, close), ...] 按时间升序
+        indicator_rows: get_indicator_data() 的结果
+    
+    Returns:
+        (markers, summary)
+        markers: [(timestamp, *MARKER_COLUMNS)]，与 ohlc_rows 一一对应
+        summary: 日志用的统计
+    """
+    n = len(ohlc_rows)
+    timestamps = np.fromiter((r[0] for r in ohlc_rows), dtype=np.int64, count=n)
+    opens = np.fromiter((r[1] for r in ohlc_rows), dtype=np.float64, count=n)
+    highs = np.fromiter((r[2] for r in ohlc_rows), dtype=np.float64, count=n)
+    lows = np.fromiter((r[3] for r in ohlc_rows), dtype=np.float64, count=n)
+    closes = np.fromiter((r[4] for r in ohlc_rows), dtype=np.float64, count=n)
+    
+    # 窄幅震荡（开盘价为0的K线不参与计算，也不打断连续段）
+    max_change_percent = 0.25
+    max_range_percent = 0.50
+    valid = opens != 0
+    safe_opens = np.where(valid, opens, 1.0)
+    change_percent = np.where(valid, np.abs((closes - opens) / safe_opens * 100), 0.0)
+    range_percent = np.where(valid, (highs - lows) / safe_opens * 100, 0.0)
+    is_narrow = valid & (change_percent <= max_change_percent) & (range_percent <= max_range_percent)
+    
+    consecutive = np.zeros(n, dtype=np.int64)
+    valid_runs = run_lengths(is_narrow[valid])
+    consecutive[valid] = np.where(valid_runs >= 2, valid_runs, 0)
+    consecutive_groups = int(np.count_nonzero(np.diff(np.concatenate(([0], (consecutive > 0).view(np.int8)))) == 1))
+    
+    # 7天和48小时高低点
+    seven_day_high_idx, seven_day_low_idx = window_extreme_indices(
+        timestamps, highs, lows, 7 * 24 * 60 * 60 * 1000)
+    h48_high_idx, h48_low_idx = window_extreme_indices(
+        timestamps, highs, lows, 48 * 60 * 60 * 1000)
+    
+    # 技术指标按时间戳对齐到K线
+    indicator_map = {row[0]: row for row in indicator_rows}
+    aligned = [indicator_map.get(ts) for ts in timestamps.tolist()]
+    rsi = [row[2] if row else None for row in aligned]
+    sar = [row[3] if row else None for row in aligned]
+    bb_upper = [row[6] if row else None for row in aligned]
+    bb_middle = [row[7] if row else None for row in aligned]
+    bb_lower = [row[8] if row else None for row in aligned]
+    
+    def as_array(values):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    
+    sar_arr = as_array(sar)
+    upper_arr, middle_arr, lower_arr = as_array(bb_upper), as_array(bb_middle), as_array(bb_lower)
+    has_sar = ~np.isnan(sar_arr)
+    has_quadrant = has_sar & ~np.isnan(upper_arr)
+    bullish = closes > sar_arr
+    quadrant = np.select(
+        [sar_arr > upper_arr, sar_arr > middle_arr, sar_arr > lower_arr], [1, 2, 3], default=4)
+    
+    # SAR多空计数标签：在有SAR的K线序列上计数，按序号对应到K线（与原实现一致）
+    sar_bullish = bullish[has_sar]
+    counts = run_positions(sar_bullish)
+    sar_count_labels = [
+        f'多头{count:02d}' if is_bull else f'空头{count:02d}'
+        for is_bull, count in zip(sar_bullish.tolist(), counts.tolist())
+    ]
+    
+    # 买点4：7天低点后2根不创新低
+    buy_point_4_idx = None
+    check_idx = seven_day_low_idx + 2
+    if check_idx < n and not (lows[seven_day_low_idx + 1:check_idx + 1] < lows[seven_day_low_idx]).any():
+        buy_point_4_idx = check_idx
+    
+    markers = []
+    ts_list = timestamps.tolist()
+    narrow_list = is_narrow.tolist()
+    change_list = change_percent.tolist()
+    range_list = range_percent.tolist()
+    consecutive_list = consecutive.tolist()
+    has_quadrant_list = has_quadrant.tolist()
+    bullish_list = bullish.tolist()
+    quadrant_list = quadrant.tolist()
+    label_count = len(sar_count_labels)
+    for i in range(n):
+        if has_quadrant_list[i]:
+            sar_position = 'bullish' if bullish_list[i] else 'bearish'
+            sar_quadrant = quadrant_list[i]
+        else:
+            sar_position = None
+            sar_quadrant = None
+        markers.append((
+            ts_list[i],
+            1 if narrow_list[i] else 0, change_list[i], range_list[i], consecutive_list[i],
+            1 if i == seven_day_high_idx else 0, 1 if i == seven_day_low_idx else 0,
+            1 if i == h48_high_idx else 0, 1 if i == h48_low_idx else 0,
+            rsi[i], sar[i], sar_position, sar_quadrant,
+            sar_count_labels[i] if i < label_count else None,
+            bb_upper[i], bb_middle[i], bb_lower[i],
+            1 if i == buy_point_4_idx else 0
+        ))
+    
+    summary = {
+        'narrow_count': int(np.count_nonzero(is_narrow)),
+        'consecutive_groups': consecutive_groups,
+        'seven_day_high': float(highs[seven_day_high_idx]),
+        'seven_day_high_idx': seven_day_high_idx,
+        'seven_day_low': float(lows[seven_day_low_idx]),
+        'seven_day_low_idx': seven_day_low_idx,
+        'buy_point_4_count': 0 if buy_point_4_idx is None else 1,
+    }
+    return markers, summary
+
+def load_existing_markers(cursor, symbol, timeframe):
+    """读取已存储的标记：{timestamp: (timestamp, *MARKER_COLUMNS)}"""
+    cursor.execute(f'''
+        SELECT timestamp, {', '.join(MARKER_COLUMNS)}
+        FROM kline_technical_markers
+        WHERE symbol = ? AND timeframe = ?
+    ''', (symbol, timeframe))
+    return {row[0]: tuple(row) for row in cursor.fetchall()}
+
+def calculate_all_markers(symbol, timeframe, incremental=False):
+    """
+    计算所有技术标记
+    
+    Args:
+        incremental: 增量模式，只写入与已存储结果不同的行
+                     （新K线、未收盘K线的更新、延长的窄幅段、移动了的高低点/买点4标记）
+    """
+    conn = sqlite3.connect(DB_PATH)
     cursor = conn.cursor()
     
     # 获取OHLC数据
@@ -157,210 +335,23 @@ def calculate_all_markers(symbol, timeframe):
     
     print(f"  📊 处理 {symbol} {timeframe}: OHLC={len(ohlc_rows)}, 指标={len(indicator_rows)}")
     
-    # 创建时间戳到指标的映射
-    indicator_map = {}
-    for row in indicator_rows:
-        timestamp = row[0]
-        indicator_map[timestamp] = {
-            'current_price': row[1],
-            'rsi_14': row[2],
-            'sar': row[3],
-            'sar_position_db': row[4],  # 数据库中的position
-            'sar_count_label_db': row[5],  # 数据库中的count label
-            'bb_upper': row[6],
-            'bb_middle': row[7],
-            'bb_lower': row[8]
-        }
-    
-    # 计算窄幅震荡
-    max_change_percent = 0.25
-    max_range_percent = 0.50
-    narrow_range_records = []
-    consecutive_groups = []
-    
-    for i, (timestamp, open_price, high, low, close) in enumerate(ohlc_rows):
-        if open_price == 0:
-            continue
-        
-        change_percent = abs((close - open_price) / open_price * 100)
-        range_percent = (high - low) / open_price * 100
-        is_narrow = (change_percent <= max_change_percent and range_percent <= max_range_percent)
-        
-        narrow_range_records.append({
-            'timestamp': timestamp,
-            'is_narrow': is_narrow,
-            'change_percent': change_percent,
-            'range_percent': range_percent
-        })
-    
-    # 计算连续窄幅震荡组
-    consecutive_count = 0
-    current_group = []
-    
-    for record in narrow_range_records:
-        if record['is_narrow']:
-            consecutive_count += 1
-            current_group.append(record['timestamp'])
-        else:
-            if consecutive_count >= 2:
-                consecutive_groups.append({
-                    'timestamps': current_group,
-                    'count': consecutive_count
-                })
-            consecutive_count = 0
-            current_group = []
-    
-    if consecutive_count >= 2:
-        consecutive_groups.append({
-            'timestamps': current_group,
-            'count': consecutive_count
-        })
-    
-    # 计算7天和48小时高低点
-    latest_timestamp = ohlc_rows[-1][0]
-    seven_days_ms = 7 * 24 * 60 * 60 * 1000
-    forty_eight_hours_ms = 48 * 60 * 60 * 1000
-    
-    seven_day_start_idx = 0
-    forty_eight_hour_start_idx = 0
-    
-    for i, (timestamp, _, _, _, _) in enumerate(ohlc_rows):
-        age = latest_timestamp - timestamp
-        if age <= seven_days_ms and seven_day_start_idx == 0:
-            seven_day_start_idx = i
-        if age <= forty_eight_hours_ms and forty_eight_hour_start_idx == 0:
-            forty_eight_hour_start_idx = i
-    
-    # 7天最高低点
-    seven_day_high_idx = seven_day_start_idx
-    seven_day_low_idx = seven_day_start_idx
-    seven_day_high = ohlc_rows[seven_day_start_idx][2]
-    seven_day_low = ohlc_rows[seven_day_start_idx][3]
-    
-    for i in range(seven_day_start_idx, len(ohlc_rows)):
-        high = ohlc_rows[i][2]
-        low = ohlc_rows[i][3]
-        if high > seven_day_high:
-            seven_day_high = high
-            seven_day_high_idx = i
-        if low < seven_day_low:
-            seven_day_low = low
-            seven_day_low_idx = i
-    
-    # 48小时最高低点
-    h48_high_idx = forty_eight_hour_start_idx
-    h48_low_idx = forty_eight_hour_start_idx
-    h48_high = ohlc_rows[forty_eight_hour_start_idx][2]
-    h48_low = ohlc_rows[forty_eight_hour_start_idx][3]
-    
-    for i in range(forty_eight_hour_start_idx, len(ohlc_rows)):
-        high = ohlc_rows[i][2]
-        low = ohlc_rows[i][3]
-        if high > h48_high:
-            h48_high = high
-            h48_high_idx = i
-        if low < h48_low:
-            h48_low = low
-            h48_low_idx = i
-    
-    # 重新计算SAR position和count labels
-    sar_positions = []
-    for timestamp, _, _, _, close in ohlc_rows:
-        if timestamp in indicator_map:
-            sar = indicator_map[timestamp]['sar']
-            if sar is not None:
-                position = calculate_sar_position(close, sar)
-                sar_positions.append(position)
-            else:
-                sar_positions.append(None)
-        else:
-            sar_positions.append(None)
-    
-    # 计算SAR count labels
-    sar_count_labels = calculate_sar_count_labels([p for p in sar_positions if p is not None])
+    markers, summary = compute_markers(ohlc_rows, indicator_rows)
     
-    # 检测买点4
-    buy_point_4_indices = detect_buy_point_4(indicator_rows, ohlc_rows, seven_day_low_idx)
+    if incremental:
+        existing = load_existing_markers(cursor, symbol, timeframe)
+        markers = [m for m in markers if existing.get(m[0]) != m]
     
     # 写入数据库
-    insert_count = 0
-    narrow_count = 0
-    
-    for i, (timestamp, open_price, high, low, close) in enumerate(ohlc_rows):
-        # 获取技术指标
-        indicators = indicator_map.get(timestamp, {})
-        rsi_14 = indicators.get('rsi_14')
-        sar = indicators.get('sar')
-        bb_upper = indicators.get('bb_upper')
-        bb_middle = indicators.get('bb_middle')
-        bb_lower = indicators.get('bb_lower')
-        
-        # SAR position 和 quadrant
-        sar_position = None
-        sar_quadrant = None
-        if sar is not None and bb_upper is not None:
-            sar_position = calculate_sar_position(close, sar)
-            sar_quadrant = calculate_sar_quadrant(sar, bb_upper, bb_middle, bb_lower)
-        
-        # SAR count label
-        sar_count_label = None
-        if i < len(sar_count_labels):
-            sar_count_label = sar_count_labels[i]
-        
-        # 窄幅震荡
-        narrow_record = next((r for r in narrow_range_records if r['timestamp'] == timestamp), None)
-        is_narrow = 0
-        change_percent = 0
-        range_percent = 0
-        consecutive_count = 0
-        
-        if narrow_record:
-            is_narrow = 1 if narrow_record['is_narrow'] else 0
-            change_percent = narrow_record['change_percent']
-            range_percent = narrow_record['range_percent']
-            
-            # 查找连续组
-            for group in consecutive_groups:
-                if timestamp in group['timestamps']:
-                    consecutive_count = group['count']
-                    break
-            
-            if is_narrow:
-                narrow_count += 1
-        
-        # 高低点标记
-        is_7d_high = 1 if i == seven_day_high_idx else 0
-        is_7d_low = 1 if i == seven_day_low_idx else 0
-        is_48h_high = 1 if i == h48_high_idx else 0
-        is_48h_low = 1 if i == h48_low_idx else 0
-        
-        # 买点4
-        is_buy_point_4 = 1 if i in buy_point_4_indices else 0
-        
-        # 插入或更新
-        cursor.execute('''
-            INSERT OR REPLACE INTO kline_technical_markers 
-            (symbol, timeframe, timestamp, 
-             is_narrow_range, change_percent, range_percent, consecutive_count,
-             is_7d_high, is_7d_low, is_48h_high, is_48h_low,
-             rsi_14, sar, sar_position, sar_quadrant, sar_count_label,
-             bb_upper, bb_middle, bb_lower, is_buy_point_4)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            symbol, timeframe, timestamp,
-            is_narrow, change_percent, range_percent, consecutive_count,
-            is_7d_high, is_7d_low, is_48h_high, is_48h_low,
-            rsi_14, sar, sar_position, sar_quadrant, sar_count_label,
-            bb_upper, bb_middle, bb_lower, is_buy_point_4
-        ))
-        insert_count += 1
+    cursor.executemany(MARKER_UPSERT_SQL, [(symbol, timeframe) + m for m in markers])
+    insert_count = len(markers)
     
     conn.commit()
     conn.close()
     
-    print(f"  ✅ 窄幅震荡: {narrow_count}/{len(ohlc_rows)}, {len(consecutive_groups)}个区域")
-    print(f"  ✅ 高低点: 7天高={seven_day_high:.4f}(idx={seven_day_high_idx}), 低={seven_day_low:.4f}(idx={seven_day_low_idx})")
-    print(f"  ✅ 买点4: {len(buy_point_4_indices)}个")
+    print(f"  ✅ 窄幅震荡: {summary['narrow_count']}/{len(ohlc_rows)}, {summary['consecutive_groups']}个区域")
+    print(f"  ✅ 高低点: 7天高={summary['seven_day_high']:.4f}(idx={summary['seven_day_high_idx']}), "
+          f"低={summary['seven_day_low']:.4f}(idx={summary['seven_day_low_idx']})")
+    print(f"  ✅ 买点4: {summary['buy_point_4_count']}个")
     print(f"  ✅ 插入/更新: {insert_count}条记录")
 
 def main():
@@ -368,6 +359,9 @@ def main():
     print("K线技术指标计算 V2")
     print("=" * 80)
     
+    # --incremental: 只写入有变化的行（定时任务在新K线到达后使用）
+    incremental = '--incremental' in sys.argv[1:]
+    
     symbols = ['BTC', 'ETH', 'SOL', 'XRP', 'DOGE', 'ADA', 'AVAX', 'SHIB', 'TON', 'DOT', 'LINK', 'ETC', 'XLM']
     timeframes = ['5m', '1H']
     
@@ -383,7 +377,7 @@ def main():
             print(f"\n⏰ {timeframe} 周期:")
             
             try:
-                calculate_all_markers(symbol_full, timeframe)
+                calculate_all_markers(symbol_full, timeframe, incremental=incremental)
             except Exception as e:
                 print(f"  ❌ 计算失败: {e}")
                 import traceback
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻内存的K线列式存储
+- 每个 (币种, 周期) 保留最近 N 天的K线，按列存放在 NumPy 数组中
+- 启动时从 okex_kline_ohlc 预热，之后只增量同步新K线（时间戳 >= 最后一根）
+- 按时间范围/最近N根切片返回数组视图（零拷贝），供API和指标计算直接使用
+
+返回的 Candles 是只读视图：追加新K线不会影响已返回的视图，
+只有最后一根未收盘K线被实时更新时，包含它的视图会看到新值。
+
+用法:
+    store = CandleStore(days=10)
+    store.sync(conn, 'BTC-USDT-SWAP', '5m')
+    candles = store.tail('BTC-USDT-SWAP', '5m', 2880)
+    candles.close[-1], len(candles)
+"""
+
+import threading
+import time
+from collections import namedtuple
+from typing import Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+from cold_archive import KLINE_ARCHIVE
+
+# 周期 -> 毫秒
+TIMEFRAME_MS = {
+    '1m': 60 * 1000,
+    '3m': 3 * 60 * 1000,
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '30m': 30 * 60 * 1000,
+    '1H': 60 * 60 * 1000,
+    '4H': 4 * 60 * 60 * 1000,
+    '1D': 24 * 60 * 60 * 1000,
+}
+
+_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+
+class Candles(namedtuple('Candles', _FIELDS)):
+    """一段K线的列视图（timestamp 为 int64 毫秒，其余为 float64）"""
+
+    __slots__ = ()
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    def rows(self):
+        """逐行元组 (timestamp, open, high, low, close, volume)，用于JSON输出"""
+        return list(zip(*(column.tolist() for column in self)))
+
+
+class CandleSeries:
+    """单个 (币种, 周期) 的K线环形缓冲"""
+
+    def __init__(self, retention: int):
+        """
+        Args:
+            retention: 保留的K线根数
+        """
+        self.retention = max(1, retention)
+        self._allocate(self.retention * 2)
+
+    def _allocate(self, capacity: int):
+        self._timestamps = np.empty(capacity, dtype=np.int64)
+        self._values = np.empty((5, capacity), dtype=np.float64)
+        self._start = 0
+        self._end = 0
+
+    def __len__(self):
+        return self._end - self._start
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._timestamps[self._end - 1]) if self._end > self._start else None
+
+    def _compact(self):
+        """写满时把保留的尾部复制到新数组（旧数组仍被已返回的视图引用，不做原地移动）"""
+        keep = min(len(self), self.retention - 1)
+        timestamps = self._timestamps[self._end - keep:self._end]
+        values = self._values[:, self._end - keep:self._end]
+        self._allocate(self.retention * 2)
+        self._timestamps[:keep] = timestamps
+        self._values[:, :keep] = values
+        self._end = keep
+
+    def upsert(self, timestamp: int, values: Sequence[float]):
+        """写入一根K线：同一时间戳覆盖，更新的时间戳追加，更早的时间戳插入"""
+        last = self.last_timestamp
+        if last is not None and timestamp == last:
+            self._values[:, self._end - 1] = values
+            return
+        if last is None or timestamp > last:
+            if self._end == len(self._timestamps):
+                self._compact()
+            self._timestamps[self._end] = timestamp
+            self._values[:, self._end] = values
+            self._end += 1
+            if len(self) > self.retention:
+                self._start = self._end - self.retention
+            return
+
+        # 乱序的历史K线（补数据）：重建数组
+        timestamps = self._timestamps[self._start:self._end]
+        idx = int(np.searchsorted(timestamps, timestamp))
+        if idx < len(timestamps) and timestamps[idx] == timestamp:
+            self._values[:, self._start + idx] = values
+            return
+        if idx == 0 and len(self) >= self.retention:
+            return  # 早于保留窗口
+        self.replace(np.insert(timestamps, idx, timestamp),
+                     np.insert(self._values[:, self._start:self._end], idx, values, axis=1))
+
+    def replace(self, timestamps: np.ndarray, values: np.ndarray):
+        """整体替换为给定的（已按时间升序）数据，只保留最后 retention 根"""
+        timestamps = timestamps[-self.retention:]
+        values = values[:, -self.retention:]
+        self._allocate(self.retention * 2)
+        count = len(timestamps)
+        self._timestamps[:count] = timestamps
+        self._values[:, :count] = values
+        self._end = count
+
+    def view(self, start: int = 0, stop: Optional[int] = None) -> Candles:
+        """按下标切片（相对于保留窗口）返回只读视图"""
+        begin = self._start + start
+        end = self._end if stop is None else self._start + stop
+        columns = [self._timestamps[begin:end]] + [self._values[i, begin:end] for i in range(5)]
+        for column in columns:
+            column.flags.writeable = False
+        return Candles(*columns)
+
+    def tail(self, count: Optional[int] = None) -> Candles:
+        if count is None or count >= len(self):
+            return self.view()
+        return self.view(len(self) - max(count, 0))
+
+    def between(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> Candles:
+        """时间戳在 [start_ms, end_ms] 闭区间内的K线"""
+        timestamps = self._timestamps[self._start:self._end]
+        lo = 0 if start_ms is None else int(np.searchsorted(timestamps, start_ms, side='left'))
+        hi = len(timestamps) if end_ms is None else int(np.searchsorted(timestamps, end_ms, side='right'))
+        return self.view(lo, max(lo, hi))
+
+
+def _row_values(row) -> Tuple[float, ...]:
+    # 数据库中的 NULL / OKEx 推送的字符串统一转为浮点数，NULL 记为 0
+    return tuple(float(v) if v else 0.0 for v in row)
+
+
+class CandleStore:
+    """所有 (币种, 周期) 的K线存储"""
+
+    def __init__(self, days: float = 10, sync_interval: float = 2.0):
+        """
+        Args:
+            days: 每个周期保留的天数（5m 10天 = 2880 根，1H 10天 = 240 根）
+            sync_interval: 同一 (币种, 周期) 两次数据库增量同步的最小间隔（秒）
+        """
+        self.days = days
+        self.sync_interval = sync_interval
+        self._series: Dict[Tuple[str, str], CandleSeries] = {}
+        self._synced_at: Dict[Tuple[str, str], float] = {}
+        self._lock = threading.RLock()
+        self._stats = {'loads': 0, 'syncs': 0, 'synced_rows': 0, 'appends': 0}
+
+    def retention(self, timeframe: str) -> int:
+        """某周期保留的K线根数"""
+        interval = TIMEFRAME_MS.get(timeframe, TIMEFRAME_MS['5m'])
+        return int(self.days * TIMEFRAME_MS['1D'] // interval)
+
+    def _get_series(self, symbol: str, timeframe: str) -> CandleSeries:
+        key = (symbol, timeframe)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = CandleSeries(self.retention(timeframe))
+        return series
+
+    # ------------------------------------------------------------------
+    # 写入
+    # ------------------------------------------------------------------
+    def append(self, symbol: str, timeframe: str, kline: Sequence):
+        """
+        写入一条K线推送（采集器调用）
+
+        Args:
+            kline: [timestamp, open, high, low, close, volume, ...]（OKEx 原始字符串也可）
+        """
+        values = _row_values(kline[1:6])
+        with self._lock:
+            self._get_series(symbol, timeframe).upsert(int(kline[0]), values)
+            self._stats['appends'] += 1
+
+    def load(self, conn, symbol: str, timeframe: str) -> int:
+        """从 okex_kline_ohlc（及其冷数据归档）读取最近 retention 根K线，替换内存中的数据"""
+        rows = KLINE_ARCHIVE.query(conn, symbol, ('timestamp', 'open', 'high', 'low', 'close', 'volume'),
+                                   where={'timeframe': timeframe}, descending=True,
+                                   limit=self.retention(timeframe))
+        rows.reverse()
+        timestamps = np.array([int(row[0]) if row[0] else 0 for row in rows], dtype=np.int64)
+        values = np.array([_row_values(row[1:6]) for row in rows], dtype=np.float64).reshape(-1, 5).T
+        with self._lock:
+            self._get_series(symbol, timeframe).replace(timestamps, values)
+            self._synced_at[(symbol, timeframe)] = time.monotonic()
+            self._stats['loads'] += 1
+        return len(rows)
+
+    def warm_load(self, conn, symbols: Optional[Iterable[str]] = None,
+                  timeframes: Iterable[str] = ('5m', '1H')) -> int:
+        """启动预热：加载指定（默认库中全部）币种的各周期K线"""
+        timeframes = list(timeframes)
+        if symbols is None:
+            placeholders = ','.join('?' * len(timeframes))
+            keys = conn.execute(f'''
+                SELECT DISTINCT symbol, timeframe FROM okex_kline_ohlc
+                WHERE timeframe IN ({placeholders})
+            ''', timeframes).fetchall()
+        else:
+            keys = [(symbol, timeframe) for symbol in symbols for timeframe in timeframes]
+        return sum(self.load(conn, symbol, timeframe) for symbol, timeframe in keys)
+
+    def sync(self, conn, symbol: str, timeframe: str, force: bool = False) -> int:
+        """
+        与数据库增量同步：只读取时间戳 >= 最后一根的K线（索引上的一次范围查询）
+        sync_interval 内重复调用直接返回，首次调用等同于 load()
+
+        Returns:
+            读取的行数
+        """
+        key = (symbol, timeframe)
+        with self._lock:
+            series = self._series.get(key)
+            synced_at = self._synced_at.get(key)
+            if series is None or synced_at is None:
+                last = None
+            elif not force and time.monotonic() - synced_at < self.sync_interval:
+                return 0
+            else:
+                last = series.last_timestamp
+            # 先占位，避免并发请求同时查询
+            self._synced_at[key] = time.monotonic()
+
+        if last is None:
+            return self.load(conn, symbol, timeframe)
+
+        rows = conn.execute('''
+            SELECT timestamp, open, high, low, close, volume
+            FROM okex_kline_ohlc
+            WHERE symbol = ? AND timeframe = ? AND timestamp >= ?
+            ORDER BY timestamp ASC
+        ''', (symbol, timeframe, last)).fetchall()
+        with self._lock:
+            for row in rows:
+                series.upsert(int(row[0]), _row_values(row[1:6]))
+            self._stats['syncs'] += 1
+            self._stats['synced_rows'] += len(rows)
+        return len(rows)
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+            self._synced_at.clear()
+
+    # ------------------------------------------------------------------
+    # 读取
+    # ------------------------------------------------------------------
+    def tail(self, symbol: str, timeframe: str, count: Optional[int] = None) -> Optional[Candles]:
+        """最近 count 根K线（默认全部保留的K线）；没有数据返回 None"""
+        with self._lock:
+            series = self._series.get((symbol, timeframe))
+            if series is None or not len(series):
+                return None
+            return series.tail(count)
+
+    def between(self, symbol: str, timeframe: str, start_ms: Optional[int] = None,
+                end_ms: Optional[int] = None) -> Optional[Candles]:
+        """时间戳在 [start_ms, end_ms] 内的K线；没有数据返回 None"""
+        with self._lock:
+            series = self._series.get((symbol, timeframe))
+            if series is None or not len(series):
+                return None
+            return series.between(start_ms, end_ms)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats['series'] = len(self._series)
+            stats['candles'] = sum(len(series) for series in self._series.values())
+            stats['memory_mb'] = round(sum(
+                series._timestamps.nbytes + series._values.nbytes
+                for series in self._series.values()) / 1024 / 1024, 2)
+            return stats
@@ -8,6 +8,7 @@ import base64
 import hashlib
 import json
 from datetime import datetime
+from state_store import SUB_ACCOUNT_CONFIG
 
 # OKX API配置
 OKEX_REST_URL = "https://www.okx.com"
@@ -98,8 +99,7 @@ def reduce_cro_position(api_key, secret_key, passphrase, current_size, target_si
 
 def main():
     # 加载子账户配置
-    with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-        config = json.load(f)
+    config = SUB_ACCOUNT_CONFIG.load()
     
     sub_account = config['sub_accounts'][0]  # Wu666666
     api_key = sub_account['api_key']
@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+冷数据归档
+历史表中超过保留天数的行按 (币种, 北京时间日期) 压缩成列式 .npz 文件，并从 SQLite 删除，
+让在线数据库只保留近期数据（更小、查询更快、WAL checkpoint 更便宜）。
+
+文件布局: <ARCHIVE_DIR>/<数据库>/<表>/<币种>/<YYYY-MM-DD>.npz
+- 每列一个数组（整数 int64、浮点 float64、文本 unicode），含 NULL 的列另存 <列>.null 掩码
+- 同时保存原 rowid（_rowid），重复归档同一天时按 rowid 合并；写文件和删除行之间中断时，
+  查询按 rowid 去重，下次归档合并进同一个文件
+- 文件先写临时文件再 os.replace，读取方不会看到写了一半的文件
+
+查询门面 ArchivedTable.query() 同时读取 SQLite 和归档文件，按时间合并排序，
+历史API不需要关心数据在哪一层。
+
+用法:
+    rows = SAR_SLOPE_ARCHIVE.query(conn, 'BTC-USDT-SWAP', ('timestamp', 'sar_value'),
+                                   start=start_ms, descending=True, limit=600)
+
+    python cold_archive.py [--days 30] [--table okex_kline_ohlc] [--dry-run]
+"""
+
+import argparse
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from db_access import DB_DIR, get_connection, transaction
+
+ARCHIVE_DIR = os.environ.get('COLD_ARCHIVE_DIR', os.path.join(DB_DIR, 'archive'))
+ARCHIVE_AFTER_DAYS = 30         # 默认保留在 SQLite 中的天数
+FILE_CACHE_SIZE = 64            # 查询时缓存的已解压文件数
+
+BEIJING_TZ = timezone(timedelta(hours=8))
+TEXT_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def _encode_column(values: Sequence) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """一列值 -> (数组, NULL掩码或None)；整数/浮点/文本分别用 int64/float64/unicode 存储"""
+    nulls = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+    present = [value for value in values if value is not None]
+    if all(isinstance(value, int) for value in present):
+        array = np.array([0 if value is None else value for value in values], dtype=np.int64)
+    elif all(isinstance(value, (int, float)) for value in present):
+        array = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    else:
+        array = np.array(['' if value is None else str(value) for value in values], dtype=str)
+    return array, (nulls if nulls.any() else None)
+
+
+def _decode_column(array: np.ndarray, nulls: Optional[np.ndarray]) -> list:
+    values = array.tolist()
+    if nulls is not None:
+        for i in np.flatnonzero(nulls).tolist():
+            values[i] = None
+    return values
+
+
+class ArchiveFile:
+    """一个已解压的归档文件（列名 -> 数组）"""
+
+    def __init__(self, path: str):
+        with np.load(path, allow_pickle=False) as data:
+            self.columns = data['_columns'].tolist()
+            self.arrays = {name: data[name] for name in data.files}
+
+    def __len__(self):
+        return len(self.arrays['_rowid'])
+
+    def column(self, name: str, index: Optional[np.ndarray] = None) -> list:
+        if name not in self.arrays:
+            return [None] * (len(self) if index is None else len(index))
+        array = self.arrays[name]
+        nulls = self.arrays.get(f'{name}.null')
+        if index is not None:
+            array = array[index]
+            nulls = nulls[index] if nulls is not None else None
+        return _decode_column(array, nulls)
+
+    def rows(self) -> Dict[int, tuple]:
+        """rowid -> 整行（按 self.columns 的顺序）"""
+        columns = [self.column(name) for name in self.columns]
+        return dict(zip(self.arrays['_rowid'].tolist(), zip(*columns)))
+
+
+def write_archive_file(path: str, columns: Sequence[str], rows: Dict[int, tuple]):
+    """写入归档文件（rows: rowid -> 整行，按 rowid 排序写入）"""
+    rowids = sorted(rows)
+    arrays = {'_columns': np.array(columns, dtype=str), '_rowid': np.array(rowids, dtype=np.int64)}
+    for i, name in enumerate(columns):
+        array, nulls = _encode_column([rows[rowid][i] for rowid in rowids])
+        arrays[name] = array
+        if nulls is not None:
+            arrays[f'{name}.null'] = nulls
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f'{path}.tmp.{os.getpid()}.npz'
+    np.savez_compressed(tmp_path, **arrays)
+    os.replace(tmp_path, path)
+
+
+class ArchivedTable:
+    """一张按 (币种, 时间) 归档的历史表"""
+
+    def __init__(self, db: str, table: str, symbol_column: str, time_column: str,
+                 time_kind: str = 'ms', archive_after_days: float = ARCHIVE_AFTER_DAYS,
+                 root: Optional[str] = None):
+        """
+        Args:
+            db: 数据库名称（db_access 注册表）或路径
+            table: 表名
+            symbol_column: 币种列
+            time_column: 时间列（需有索引）
+            time_kind: 'ms' 毫秒时间戳 或 'text' 北京时间 'YYYY-MM-DD HH:MM:SS'
+            archive_after_days: 超过该天数的行归档
+            root: 归档根目录（默认 ARCHIVE_DIR）
+        """
+        self.db = db
+        self.table = table
+        self.symbol_column = symbol_column
+        self.time_column = time_column
+        self.time_kind = time_kind
+        self.archive_after_days = archive_after_days
+        self.root = root
+        self._files: 'OrderedDict[str, Tuple[float, ArchiveFile]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def directory(self) -> str:
+        db_name = os.path.splitext(os.path.basename(self.db))[0]
+        return os.path.join(self.root or ARCHIVE_DIR, db_name, self.table)
+
+    def _path(self, symbol: str, day: str) -> str:
+        return os.path.join(self.directory, str(symbol).replace('/', '_'), f'{day}.npz')
+
+    # ------------------------------------------------------------------
+    # 时间换算
+    # ------------------------------------------------------------------
+    def _day(self, value) -> str:
+        """时间列的值 -> 北京时间日期"""
+        if self.time_kind == 'text':
+            return str(value)[:10]
+        return datetime.fromtimestamp(int(value) / 1000, BEIJING_TZ).strftime('%Y-%m-%d')
+
+    def _day_start(self, day: str):
+        """某天0点对应的时间列的值"""
+        if self.time_kind == 'text':
+            return f'{day} 00:00:00'
+        start = datetime.strptime(day, '%Y-%m-%d').replace(tzinfo=BEIJING_TZ)
+        return int(start.timestamp() * 1000)
+
+    @staticmethod
+    def _next_day(day: str) -> str:
+        return (datetime.strptime(day, '%Y-%m-%d') + timedelta(days=1)).strftime('%Y-%m-%d')
+
+    def cutoff(self, days: Optional[float] = None, now: Optional[datetime] = None):
+        """归档截止点：now - days 所在日期的0点（只归档整天）"""
+        days = self.archive_after_days if days is None else days
+        now = now or datetime.now(BEIJING_TZ)
+        if now.tzinfo is None:
+            now = now.replace(tzinfo=BEIJING_TZ)
+        day = (now.astimezone(BEIJING_TZ) - timedelta(days=days)).strftime('%Y-%m-%d')
+        return self._day_start(day)
+
+    # ------------------------------------------------------------------
+    # 归档
+    # ------------------------------------------------------------------
+    def _archive_day(self, conn, columns: List[str], day: str, end) -> Tuple[int, int]:
+        """把某天（截止到 end 之前）的行写入归档并删除，返回 (行数, 文件数)"""
+        symbol_index = columns.index(self.symbol_column)
+        rows = conn.execute(f'''
+            SELECT rowid, {', '.join(columns)} FROM {self.table}
+            WHERE {self.time_column} >= ? AND {self.time_column} < ?
+        ''', (self._day_start(day), end)).fetchall()
+        if not rows:
+            return 0, 0
+
+        by_symbol: Dict[object, Dict[int, tuple]] = {}
+        for row in rows:
+            by_symbol.setdefault(row[1 + symbol_index], {})[row[0]] = tuple(row[1:])
+
+        for symbol, symbol_rows in by_symbol.items():
+            path = self._path(symbol, day)
+            if os.path.exists(path):
+                # 同一天再次归档（晚到的数据或上次中断）：按 rowid 合并，列按当前表结构对齐
+                existing = ArchiveFile(path)
+                merged = {}
+                for rowid, old in existing.rows().items():
+                    values = dict(zip(existing.columns, old))
+                    merged[rowid] = tuple(values.get(name) for name in columns)
+                merged.update(symbol_rows)
+                symbol_rows = merged
+            write_archive_file(path, columns, symbol_rows)
+            self._forget(path)
+
+        conn.executemany(f'DELETE FROM {self.table} WHERE rowid = ?', [(row[0],) for row in rows])
+        return len(rows), len(by_symbol)
+
+    def archive(self, days: Optional[float] = None, now: Optional[datetime] = None,
+                dry_run: bool = False) -> Dict:
+        """
+        归档 cutoff 之前的所有行（每天一个写事务：读取、写文件、删除）
+
+        Returns:
+            {'table', 'cutoff', 'days', 'rows', 'files'}
+        """
+        cutoff = self.cutoff(days, now)
+        result = {'table': self.table, 'cutoff': cutoff, 'days': 0, 'rows': 0, 'files': 0}
+        conn = get_connection(self.db)
+        try:
+            columns = [row[1] for row in conn.execute(f'PRAGMA table_info({self.table})').fetchall()]
+            if not columns:
+                return result
+            first = conn.execute(f'SELECT MIN({self.time_column}) FROM {self.table} '
+                                 f'WHERE {self.time_column} < ?', (cutoff,)).fetchone()[0]
+            if dry_run:
+                result['rows'] = conn.execute(f'SELECT COUNT(*) FROM {self.table} '
+                                              f'WHERE {self.time_column} < ?', (cutoff,)).fetchone()[0]
+                return result
+        finally:
+            conn.close()
+
+        while first is not None:
+            day = self._day(first)
+            next_start = self._day_start(self._next_day(day))
+            with transaction(self.db) as conn:
+                rows, files = self._archive_day(conn, columns, day, min(next_start, cutoff))
+                first = conn.execute(f'''
+                    SELECT MIN({self.time_column}) FROM {self.table}
+                    WHERE {self.time_column} >= ? AND {self.time_column} < ?
+                ''', (next_start, cutoff)).fetchone()[0]
+            result['days'] += 1
+            result['rows'] += rows
+            result['files'] += files
+
+        if result['rows']:
+            conn = get_connection(self.db)
+            try:
+                conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+            finally:
+                conn.close()
+        return result
+
+    # ------------------------------------------------------------------
+    # 查询
+    # ------------------------------------------------------------------
+    def _forget(self, path: str):
+        with self._lock:
+            self._files.pop(path, None)
+
+    def _load(self, path: str) -> Optional[ArchiveFile]:
+        """读取归档文件（按 mtime 缓存最近使用的文件）"""
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            return None
+        with self._lock:
+            cached = self._files.get(path)
+            if cached is not None and cached[0] == mtime:
+                self._files.move_to_end(path)
+                return cached[1]
+        archive_file = ArchiveFile(path)
+        with self._lock:
+            self._files[path] = (mtime, archive_file)
+            while len(self._files) > FILE_CACHE_SIZE:
+                self._files.popitem(last=False)
+        return archive_file
+
+    def archived_days(self, symbol: str) -> List[str]:
+        """某币种已归档的日期（升序）"""
+        try:
+            names = os.listdir(os.path.dirname(self._path(symbol, 'x')))
+        except OSError:
+            return []
+        return sorted(name[:-4] for name in names if name.endswith('.npz') and '.tmp.' not in name)
+
+    def archived_until(self, symbol: str):
+        """某币种已归档数据的结束点（最后归档日期次日0点），没有归档返回 None"""
+        days = self.archived_days(symbol)
+        if not days:
+            return None
+        return self._day_start(self._next_day(days[-1]))
+
+    def _read_day(self, symbol: str, day: str, columns: Sequence[str], start, end,
+                  where: Dict) -> List[tuple]:
+        archive_file = self._load(self._path(symbol, day))
+        if archive_file is None or not len(archive_file):
+            return []
+        times = archive_file.arrays[self.time_column]
+        mask = np.ones(len(times), dtype=bool)
+        if start is not None:
+            mask &= times >= start
+        if end is not None:
+            mask &= times <= end
+        for name, value in where.items():
+            if name not in archive_file.arrays:
+                return []
+            mask &= archive_file.arrays[name] == value
+            nulls = archive_file.arrays.get(f'{name}.null')
+            if nulls is not None:
+                mask &= ~nulls
+        index = np.flatnonzero(mask)
+        if not len(index):
+            return []
+        return list(zip(*(archive_file.column(name, index) for name in columns)))
+
+    def query(self, conn, symbol: str, columns: Sequence[str], start=None, end=None,
+              where: Optional[Dict] = None, descending: bool = False,
+              limit: Optional[int] = None) -> List[tuple]:
+        """
+        读取某币种 [start, end] 内的行（SQLite + 归档），按时间列排序
+
+        Args:
+            conn: 在线数据库连接
+            columns: 返回的列
+            start/end: 时间列闭区间（None 表示不限）
+            where: 额外的等值条件，如 {'timeframe': '5m'}
+            descending: 按时间倒序
+            limit: 最多返回的行数（倒序时为最新的 limit 行）
+        """
+        where = where or {}
+        select = [self.time_column] + list(columns)
+        conditions = [f'{self.symbol_column} = ?'] + [f'{name} = ?' for name in where]
+        params = [symbol] + list(where.values())
+        if start is not None:
+            conditions.append(f'{self.time_column} >= ?')
+            params.append(start)
+        if end is not None:
+            conditions.append(f'{self.time_column} <= ?')
+            params.append(end)
+        sql = f'''
+            SELECT rowid, {', '.join(select)} FROM {self.table}
+            WHERE {' AND '.join(conditions)}
+            ORDER BY {self.time_column} {'DESC' if descending else 'ASC'}
+        '''
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        # (rowid, 时间) -> (时间, 列...)：文件已写入但删除行的事务没有提交时（中断、回滚），
+        # 同一行同时在 SQLite 和归档文件中，按原 rowid 去重，以 SQLite 为准
+        found = {(row[0], row[1]): tuple(row[1:]) for row in conn.execute(sql, params).fetchall()}
+
+        days = self.archived_days(symbol)
+        if start is not None:
+            days = [day for day in days if day >= self._day(start)]
+        if end is not None:
+            days = [day for day in days if day <= self._day(end)]
+
+        # 从离排序起点最近的一天开始读，已够 limit 行且第 limit 行比整天都新（旧）时停止
+        for day in (reversed(days) if descending else days):
+            if limit is not None and len(found) >= limit:
+                merged = sorted(found.values(), key=lambda row: row[0], reverse=descending)
+                boundary = merged[limit - 1][0]
+                if descending and boundary >= self._day_start(self._next_day(day)):
+                    break
+                if not descending and boundary < self._day_start(day):
+                    break
+            for row in self._read_day(symbol, day, ['_rowid'] + select, start, end, where):
+                found.setdefault((row[0], row[1]), row[1:])
+
+        merged = sorted(found.values(), key=lambda row: row[0], reverse=descending)
+        if limit is not None:
+            merged = merged[:limit]
+        return [row[1:] for row in merged]
+
+    def clear(self):
+        with self._lock:
+            self._files.clear()
+
+
+# 需要归档的历史表
+# crypto_coin_data / price_breakthrough_events 不归档：/api/query、星星系统、比价等按快照时间
+# 跨币种查询或统计，直接读 SQLite，不经过查询门面，归档后历史快照会查不到币种数据
+KLINE_ARCHIVE = ArchivedTable('crypto_data', 'okex_kline_ohlc', 'symbol', 'timestamp')
+INDICATORS_HISTORY_ARCHIVE = ArchivedTable('crypto_data', 'okex_indicators_history', 'symbol', 'timestamp')
+SAR_SLOPE_ARCHIVE = ArchivedTable('crypto_data', 'sar_slope_data', 'symbol', 'timestamp')
+FUND_MONITOR_ARCHIVE = ArchivedTable('fund_monitor', 'fund_monitor_aggregated', 'symbol', 'timestamp')
+
+ARCHIVES = (KLINE_ARCHIVE, INDICATORS_HISTORY_ARCHIVE, SAR_SLOPE_ARCHIVE, FUND_MONITOR_ARCHIVE)
+
+
+def archive_all(tables: Optional[Iterable[str]] = None, days: Optional[float] = None,
+                dry_run: bool = False) -> List[Dict]:
+    """归档所有（或指定的）历史表"""
+    tables = set(tables) if tables else None
+    results = []
+    for archived_table in ARCHIVES:
+        if tables is None or archived_table.table in tables:
+            results.append(archived_table.archive(days=days, dry_run=dry_run))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='历史表冷数据归档')
+    parser.add_argument('--days', type=float, default=None,
+                        help=f'保留在SQLite中的天数（默认{ARCHIVE_AFTER_DAYS}）')
+    parser.add_argument('--table', action='append', help='只归档指定的表（可重复）')
+    parser.add_argument('--dry-run', action='store_true', help='只统计需要归档的行数')
+    args = parser.parse_args()
+
+    for result in archive_all(args.table, args.days, args.dry_run):
+        if args.dry_run:
+            print(f"📊 {result['table']}: {result['rows']} 行待归档")
+        else:
+            print(f"✅ {result['table']}: 归档 {result['rows']} 行，"
+                  f"{result['days']} 天，{result['files']} 个文件")
+
+
+if __name__ == '__main__':
+    main()
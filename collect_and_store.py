@@ -9,9 +9,23 @@ import pytz
 import re
 import sqlite3
 
+from home_txt_parser import field, scan_fields
+
 PARENT_FOLDER_ID = "1j8YV6KysUCmgcmASFOxztWWIE1Vq-kYV"  # 首页数据 (包含所有日期文件夹)
 BEIJING_TZ = pytz.timezone('Asia/Shanghai')
 
+# 基础数据字段（正则 + 必然出现的字面前缀）
+BASE_FIELDS = (
+    field('急涨', r'急涨[：:](\d+)', '急涨'),
+    field('急跌', r'急跌[：:](\d+)', '急跌'),
+    field('状态', r'状态[：:]([^\s\|★]+)', '状态'),
+    field('比值', r'比值[：:]([\d.]+)', '比值'),
+    field('差值', r'差值[：:]([-\d.]+)', '差值'),
+    field('比价最低', r'比价最低\s+(\d+)', '比价最低'),
+    field('比价创新高', r'比价创新高\s+(\d+)', '比价创新高'),
+    field('计次', r'透明标签_计次=(\d+)', '透明标签_计次='),
+)
+
 def calculate_count_score_display(count, snapshot_time):
     """计算计次得分显示字符串"""
     hour = datetime.strptime(snapshot_time, '%Y-%m-%d %H:%M:%S').hour
@@ -285,22 +299,10 @@ def parse_and_store_data(content, filename, current_hour):
         '采集时间': snapshot_time
     }
     
-    # 提取基础数据
-    patterns = {
-        '急涨': r'急涨[：:](\d+)',
-        '急跌': r'急跌[：:](\d+)',
-        '状态': r'状态[：:]([^\s\|★]+)',
-        '比值': r'比值[：:]([\d.]+)',
-        '差值': r'差值[：:]([-\d.]+)',
-        '比价最低': r'比价最低\s+(\d+)',
-        '比价创新高': r'比价创新高\s+(\d+)',
-        '计次': r'透明标签_计次=(\d+)',
-    }
-    
-    for key, pattern in patterns.items():
-        match = re.search(pattern, content)
-        if match:
-            data[key] = match.group(1)
+    # 提取基础数据（一遍扫描）
+    for key, value in scan_fields(content, BASE_FIELDS).items():
+        if value is not None:
+            data[key] = value
     
     # 解析币种数据
     lines = content.split('\n')
@@ -9,6 +9,9 @@ from datetime import datetime
 import json
 from typing import List, Dict, Optional
 
+from response_cache import bump_data_version
+from event_bus import publish, SNAPSHOT_CREATED
+
 class CryptoDatabase:
     def __init__(self, db_path='crypto_data.db'):
         """初始化数据库连接"""
@@ -196,8 +199,19 @@ class CryptoDatabase:
                     coin.get('priorityLevel', '-')
                 ))
             
+            bump_data_version(cursor, 'crypto_snapshots')
             conn.commit()
             print(f"✅ 数据快照已保存: {snapshot_time} (ID: {snapshot_id}, {len(data)}个币种)")
+            publish(SNAPSHOT_CREATED, {
+                'snapshot_id': snapshot_id,
+                'snapshot_time': snapshot_time,
+                'snapshot_date': snapshot_date,
+                'rush_up': int(stats.get('rushUp', 0)),
+                'rush_down': int(stats.get('rushDown', 0)),
+                'diff': int(stats.get('diff', 0)),
+                'count': int(stats.get('count', 0)),
+                'status': stats.get('status', ''),
+            })
             return snapshot_id
             
         except Exception as e:
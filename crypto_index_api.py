@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+深度评分与加密指数
+深度评分、深度图、市场平均分、OKEx 加密指数
+"""
+
+import traceback
+
+from flask import Blueprint, jsonify, render_template, request
+
+from db_access import get_connection
+
+crypto_index_bp = Blueprint('crypto_index', __name__)
+
+@crypto_index_bp.route('/depth-score')
+def depth_score_page():
+    """深度图得分页面"""
+    return render_template('depth_score.html')
+
+@crypto_index_bp.route('/depth-chart')
+def depth_chart_page():
+    """深度图可视化页面"""
+    return render_template('depth_chart.html')
+
+@crypto_index_bp.route('/score-overview')
+def score_overview_page():
+    """平均分页面"""
+    return render_template('score_overview.html')
+
+@crypto_index_bp.route('/crypto-index')
+def crypto_index_page():
+    """OKEX加密指数页面"""
+    return render_template('crypto_index.html')
+
+@crypto_index_bp.route('/api/depth-scores')
+def api_depth_scores():
+    """获取深度得分数据"""
+    from score_calculator import ScoreCalculator
+    try:
+        timeframe = int(request.args.get('timeframe', 24))
+        limit = int(request.args.get('limit', 50))
+        
+        calculator = ScoreCalculator()
+        scores = calculator.calculate_all_coins_depth_scores(timeframe, limit)
+        
+        # 计算平均分
+        avg_score = sum(s['score'] for s in scores) / len(scores) if scores else 0
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'scores': scores,
+                'total_coins': len(scores),
+                'average_score': round(avg_score, 2),
+                'timeframe': f'{timeframe}h'
+            }
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@crypto_index_bp.route('/api/depth-chart-data')
+def api_depth_chart_data():
+    """获取深度图表数据"""
+    from score_calculator import ScoreCalculator
+    try:
+        timeframe = int(request.args.get('timeframe', 24))
+        top_n = int(request.args.get('top_n', 20))
+        
+        calculator = ScoreCalculator()
+        chart_data = calculator.get_depth_chart_data(timeframe, top_n)
+        
+        return jsonify({
+            'success': True,
+            'data': chart_data
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@crypto_index_bp.route('/api/market-average-score')
+def api_market_average_score():
+    """获取市场平均得分"""
+    from score_calculator import ScoreCalculator
+    try:
+        timeframe = int(request.args.get('timeframe', 24))
+        
+        calculator = ScoreCalculator()
+        market_score = calculator.calculate_average_market_score(timeframe)
+        
+        return jsonify({
+            'success': True,
+            'data': market_score
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@crypto_index_bp.route('/api/okex-crypto-index')
+def api_okex_crypto_index():
+    """获取OKEX加密货币指数"""
+    from score_calculator import ScoreCalculator
+    try:
+        calculator = ScoreCalculator()
+        index_data = calculator.calculate_okex_crypto_index()
+        
+        return jsonify({
+            'success': True,
+            'data': index_data
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+# ============================================================================
+# OKEX加密指数页面专用API端点
+# ============================================================================
+
+@crypto_index_bp.route('/api/index/start', methods=['POST'])
+def api_index_start():
+    """启动指数监控"""
+    return jsonify({
+        'success': True,
+        'message': '指数监控已启动'
+    })
+
+@crypto_index_bp.route('/api/index/current')
+def api_index_current():
+    """获取当前指数值 - 基于27币种加权指数"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取最新的K线数据
+        cursor.execute('''
+            SELECT timestamp, index_value, open_price, high_price, low_price, close_price
+            FROM crypto_index_klines
+            ORDER BY timestamp DESC
+            LIMIT 1
+        ''')
+        
+        row = cursor.fetchone()
+        
+        # 获取有多少个币种有有效的基准价格
+        cursor.execute('SELECT COUNT(*) FROM crypto_index_base_prices WHERE base_price > 0')
+        valid_components = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        if not row:
+            return jsonify({
+                'success': False,
+                'message': '暂无指数数据，请等待数据采集'
+            })
+        
+        current_value = row[1]
+        base_value = 1000.00
+        change = current_value - base_value
+        change_percent = (change / base_value) * 100
+        
+        # 获取BTC的4个周期平均位置数据
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT position_4h, position_12h, position_24h, position_48h
+            FROM position_system
+            WHERE symbol = 'BTC-USDT-SWAP'
+            ORDER BY record_time DESC
+            LIMIT 1
+        ''')
+        position_row = cursor.fetchone()
+        conn.close()
+        
+        # 准备周期位置数据
+        period_positions = {}
+        if position_row:
+            period_positions = {
+                'position_4h': round(position_row[0], 2) if position_row[0] else None,
+                'position_12h': round(position_row[1], 2) if position_row[1] else None,
+                'position_24h': round(position_row[2], 2) if position_row[2] else None,
+                'position_48h': round(position_row[3], 2) if position_row[3] else None
+            }
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'value': current_value,
+                'base_value': base_value,
+                'change': round(change, 2),
+                'change_percent': round(change_percent, 2),
+                'valid_components': valid_components,
+                'timestamp': row[0],
+                'open': row[2],
+                'high': row[3],
+                'low': row[4],
+                'close': row[5],
+                'period_positions': period_positions
+            }
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'获取指数失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@crypto_index_bp.route('/api/index/components')
+def api_index_components():
+    """获取成分详情 - 27币种权重明细"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取所有币种的基准价格和权重
+        cursor.execute('''
+            SELECT coin_id, base_price, weight
+            FROM crypto_index_base_prices
+            ORDER BY weight DESC, coin_id
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        # 币种名称映射
+        coin_name_map = {
+            'bitcoin': 'BTC', 'ethereum': 'ETH', 'ripple': 'XRP',
+            'binancecoin': 'BNB', 'solana': 'SOL', 'litecoin': 'LTC',
+            'dogecoin': 'DOGE', 'sui': 'SUI', 'tron': 'TRX',
+            'the-open-network': 'TON', 'ethereum-classic': 'ETC',
+            'bitcoin-cash': 'BCH', 'hedera-hashgraph': 'HBAR',
+            'stellar': 'XLM', 'filecoin': 'FIL', 'chainlink': 'LINK',
+            'crypto-com-chain': 'CRO', 'polkadot': 'DOT', 'aave': 'AAVE',
+            'uniswap': 'UNI', 'near': 'NEAR', 'aptos': 'APT',
+            'conflux-token': 'CFX', 'curve-dao-token': 'CRV',
+            'stacks': 'STX', 'lido-dao': 'LDO', 'bittensor': 'TAO'
+        }
+        
+        # 获取当前价格（从CoinGecko）- 简化版，仅用基准价格模拟
+        import requests
+        try:
+            coin_ids = ','.join([r[0] for r in rows])
+            response = requests.get(
+                'https://api.coingecko.com/api/v3/simple/price',
+                params={'ids': coin_ids, 'vs_currencies': 'usd'},
+                timeout=5
+            )
+            current_prices = response.json() if response.status_code == 200 else {}
+        except:
+            current_prices = {}
+        
+        # 构建成分数据（以对象形式返回，key为币种symbol）
+        components = {}
+        for row in rows:
+            coin_id = row[0]
+            symbol = coin_name_map.get(coin_id, coin_id.upper())
+            base_price = row[1]
+            weight = row[2]
+            
+            # 获取当前价格
+            current_price = current_prices.get(coin_id, {}).get('usd', base_price)
+            price_change = ((current_price - base_price) / base_price * 100) if base_price > 0 else 0
+            weighted_contribution = price_change * weight
+            
+            components[symbol] = {
+                'name': symbol,
+                'coin_id': coin_id,
+                'price': current_price,
+                'base_price': base_price,
+                'weight': weight,
+                'weight_percent': f"{weight*100:.2f}%",
+                'change_percent': round(price_change, 2),
+                'weighted_contribution': round(weighted_contribution, 3)
+            }
+        
+        return jsonify({
+            'success': True,
+            'total_coins': len(components),
+            'data': components
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'获取成分失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@crypto_index_bp.route('/test-refresh')
+def test_refresh():
+    """测试刷新页面 - 用于验证缓存问题"""
+    return render_template('test_refresh.html')
+
+@crypto_index_bp.route('/test-btc-eth')
+def test_btc_eth():
+    """测试BTC和ETH数据显示"""
+    return render_template('test_btc_eth.html')
+
+@crypto_index_bp.route('/api/index/history')
+def api_index_history():
+    """获取历史数据 - 基于K线数据，支持分页（12小时一页）"""
+    try:
+        page = int(request.args.get('page', 1))  # 当前页，默认第1页
+        hours_per_page = 12  # 每页12小时
+        records_per_hour = 60  # 每小时60条（1分钟K线）
+        page_size = hours_per_page * records_per_hour  # 每页720条
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取总记录数
+        cursor.execute('SELECT COUNT(*) FROM crypto_index_klines')
+        total_records = cursor.fetchone()[0]
+        
+        # 计算总页数
+        total_pages = (total_records + page_size - 1) // page_size
+        
+        # 确保页码有效
+        if page < 1:
+            page = 1
+        if page > total_pages:
+            page = total_pages
+        
+        # 计算偏移量（从最新数据开始倒数）
+        offset = (page - 1) * page_size
+        
+        # 获取当前页的K线数据
+        cursor.execute('''
+            SELECT timestamp, index_value, close_price
+            FROM crypto_index_klines
+            ORDER BY timestamp DESC
+            LIMIT ? OFFSET ?
+        ''', (page_size, offset))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        if not rows:
+            return jsonify({
+                'success': False,
+                'message': '暂无历史数据'
+            })
+        
+        history = []
+        base_value = 1000.00
+        for row in rows:
+            index_value = row[1]
+            change_percent = ((index_value - base_value) / base_value * 100)
+            history.append({
+                'time': row[0],
+                'value': index_value,
+                'close': row[2],
+                'change_percent': round(change_percent, 2)
+            })
+        
+        history.reverse()  # 时间正序
+        
+        return jsonify({
+            'success': True,
+            'total': len(history),
+            'total_records': total_records,
+            'total_pages': total_pages,
+            'current_page': page,
+            'page_size': page_size,
+            'data': history
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'获取历史失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
+
+@crypto_index_bp.route('/api/index/klines')
+def api_index_klines():
+    """获取K线数据 - 5分钟K线"""
+    try:
+        limit = int(request.args.get('limit', 100))
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取最近的K线数据
+        cursor.execute('''
+            SELECT timestamp, open_price, high_price, low_price, close_price, index_value
+            FROM crypto_index_klines
+            ORDER BY timestamp DESC
+            LIMIT ?
+        ''', (limit,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        if not rows:
+            return jsonify({
+                'success': False,
+                'message': '暂无K线数据，请等待数据采集'
+            })
+        
+        klines = []
+        for row in rows:
+            klines.append({
+                'timestamp': row[0],
+                'open': row[1],
+                'high': row[2],
+                'low': row[3],
+                'close': row[4],
+                'value': row[5]
+            })
+        
+        klines.reverse()  # 时间正序
+        
+        return jsonify({
+            'success': True,
+            'total': len(klines),
+            'interval': '5m',
+            'data': klines
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'message': f'获取K线失败: {str(e)}',
+            'traceback': traceback.format_exc()
+        })
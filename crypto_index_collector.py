@@ -8,13 +8,14 @@
 """
 
 import sqlite3
-import requests
 import time
 import json
 from datetime import datetime, timedelta
 import logging
 import pytz
 
+from okx_market_client import get_client
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -155,25 +156,14 @@ class CryptoIndexCollector:
                 'bittensor': 'TAO-USDT-SWAP'
             }
             
-            # 从OKX API逐个获取价格（使用ticker接口）
+            # 一次 tickers 调用获取全部价格（缺失的币种由客户端单独补取）
+            last_prices = get_client().get_last_prices(symbol_mapping.values())
             prices = {}
             for coin_id, okx_symbol in symbol_mapping.items():
-                try:
-                    url = f'https://www.okx.com/api/v5/market/ticker?instId={okx_symbol}'
-                    response = requests.get(url, timeout=5)
-                    response.raise_for_status()
-                    data = response.json()
-                    
-                    if data['code'] == '0' and data['data']:
-                        # OKX ticker返回格式: {'data': [{'last': '89000', ...}]}
-                        last_price = float(data['data'][0]['last'])
-                        prices[coin_id] = last_price
-                    else:
-                        logging.warning(f"⚠️  {coin_id} OKX API返回错误: {data.get('msg')}")
-                        
-                except Exception as e:
-                    logging.warning(f"⚠️  获取 {coin_id} 价格失败: {str(e)}")
-                    continue
+                if okx_symbol in last_prices:
+                    prices[coin_id] = last_prices[okx_symbol]
+                else:
+                    logging.warning(f"⚠️  获取 {coin_id} 价格失败")
             
             logging.info(f"✅ 成功获取 {len(prices)}/27 个币种价格（从 OKX API）")
             return prices if len(prices) > 0 else None
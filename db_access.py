@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+统一的SQLite访问层
+- 数据库路径注册表（替代散落各处的 /home/user/webapp/xxx.db 硬编码）
+- 每个线程每个数据库一个长连接，统一的 WAL PRAGMA 配置
+- 长连接复用 sqlite3 的语句缓存（cached_statements），同一SQL不再重复编译
+- 写操作先 BEGIN IMMEDIATE 取写锁并计时，"database is locked" 等待可统计
+
+用法（与 sqlite3.connect 返回的连接用法相同，close() 只是归还连接）:
+    conn = get_connection('crypto_data')
+    conn.row_factory = sqlite3.Row   # 只对本次取得的句柄生效
+    cursor = conn.cursor()
+    ...
+    conn.commit()
+    conn.close()
+
+    with transaction('sar_slope') as conn:
+        conn.execute(...)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict
+
+DB_DIR = os.environ.get('WEBAPP_DB_DIR', '/home/user/webapp')
+
+# 数据库注册表：名称 -> 文件名（相对 DB_DIR）
+DATABASES = {
+    'crypto_data': 'crypto_data.db',
+    'trading_decision': 'trading_decision.db',
+    'sar_slope': 'sar_slope_data.db',
+    'anchor_system': 'anchor_system.db',
+    'anchor_snapshots': 'anchor_snapshots.db',
+    'fund_monitor': 'fund_monitor.db',
+    'support_resistance': 'support_resistance.db',
+    'price_speed': 'price_speed_data.db',
+    'v1v2': 'v1v2_data.db',
+    'telegram_signals': 'telegram_signals.db',
+    'tg_signals': 'tg_signals.db',
+    'event_bus': 'event_bus.db',
+    'signal_data': 'signal_data.db',
+    'state_store': 'state_store.db',
+}
+
+# 所有长连接统一的PRAGMA
+PRAGMAS = (
+    ('journal_mode', 'WAL'),
+    ('synchronous', 'NORMAL'),
+    ('cache_size', -16384),        # 16MB 页缓存
+    ('mmap_size', 268435456),      # 256MB 内存映射读
+    ('temp_store', 'MEMORY'),
+)
+
+BUSY_TIMEOUT = 30.0          # 等待写锁的最长时间（秒）
+LOCK_WAIT_THRESHOLD = 0.01   # 超过该时长的取锁计为一次锁等待（秒）
+CACHED_STATEMENTS = 256
+
+_WRITE_PREFIXES = ('INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+
+
+def get_db_path(name: str) -> str:
+    """
+    数据库名称或路径 -> 绝对路径
+    注册过的名称映射到 DB_DIR 下；其他按路径处理（相对路径以当前目录为准）
+    """
+    if name in DATABASES:
+        return os.path.join(DB_DIR, DATABASES[name])
+    if name == ':memory:':
+        return name
+    return os.path.abspath(name)
+
+
+# ----------------------------------------------------------------------
+# 统计
+# ----------------------------------------------------------------------
+_stats: Dict[str, Dict] = {}
+_stats_lock = threading.Lock()
+
+
+def _record(path: str, **deltas):
+    with _stats_lock:
+        stats = _stats.get(path)
+        if stats is None:
+            stats = _stats[path] = {
+                'connections_opened': 0, 'checkouts': 0, 'write_transactions': 0,
+                'lock_waits': 0, 'lock_wait_ms_total': 0.0, 'lock_wait_ms_max': 0.0,
+                'lock_timeouts': 0,
+            }
+        for key, value in deltas.items():
+            if key == 'lock_wait_ms_max':
+                stats[key] = max(stats[key], value)
+            else:
+                stats[key] += value
+
+
+def get_stats() -> Dict[str, Dict]:
+    """按数据库文件汇总的连接与锁等待统计（本进程）"""
+    with _stats_lock:
+        result = {}
+        for path, stats in _stats.items():
+            item = dict(stats)
+            item['lock_wait_ms_total'] = round(item['lock_wait_ms_total'], 2)
+            item['lock_wait_ms_max'] = round(item['lock_wait_ms_max'], 2)
+            result[os.path.basename(path)] = item
+        return result
+
+
+# ----------------------------------------------------------------------
+# 连接
+# ----------------------------------------------------------------------
+def _is_write(sql: str) -> bool:
+    return sql.lstrip()[:7].upper().startswith(_WRITE_PREFIXES)
+
+
+class PooledConnection(sqlite3.Connection):
+    """线程内复用的长连接"""
+
+    db_path = None
+
+    def begin_immediate(self):
+        """取写锁并开始事务，记录等待时长"""
+        started = time.perf_counter()
+        try:
+            sqlite3.Connection.execute(self, 'BEGIN IMMEDIATE')
+        except sqlite3.OperationalError as e:
+            if 'locked' in str(e) or 'busy' in str(e):
+                waited = (time.perf_counter() - started) * 1000
+                _record(self.db_path, lock_timeouts=1, lock_waits=1,
+                        lock_wait_ms_total=waited, lock_wait_ms_max=waited)
+            raise
+        waited = time.perf_counter() - started
+        if waited >= LOCK_WAIT_THRESHOLD:
+            _record(self.db_path, write_transactions=1, lock_waits=1,
+                    lock_wait_ms_total=waited * 1000, lock_wait_ms_max=waited * 1000)
+        else:
+            _record(self.db_path, write_transactions=1)
+
+    def before(self, sql: str):
+        # 事务外的第一条写语句：显式 BEGIN IMMEDIATE 代替 sqlite3 隐式的 BEGIN，
+        # 这样取锁时间可计量，也避免读事务升级为写事务时的 SQLITE_BUSY
+        if not self.in_transaction and _is_write(sql):
+            self.begin_immediate()
+
+
+class PooledCursor(sqlite3.Cursor):
+    """写语句前自动取写锁的游标"""
+
+    def execute(self, sql, parameters=()):
+        self.connection.before(sql)
+        return super().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        self.connection.before(sql)
+        return super().executemany(sql, seq_of_parameters)
+
+
+def _open(path: str) -> PooledConnection:
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, factory=PooledConnection,
+                           cached_statements=CACHED_STATEMENTS, check_same_thread=False)
+    conn.db_path = path
+    for name, value in PRAGMAS:
+        try:
+            conn.execute(f'PRAGMA {name} = {value}')
+        except sqlite3.OperationalError:
+            # 切换WAL需要短暂独占；其他进程持锁时跳过，下次打开再设置
+            pass
+    _record(path, connections_opened=1)
+    return conn
+
+
+class ConnectionHandle:
+    """
+    一次 get_connection() 取得的句柄，接口同 sqlite3.Connection
+    row_factory 只作用于本句柄创建的游标；close() 归还连接而不是关闭
+    """
+
+    def __init__(self, slot: 'PoolSlot'):
+        self._slot = slot
+        self._conn = slot.conn
+        self._released = False
+        self.row_factory = None
+
+    def cursor(self, factory=PooledCursor):
+        cursor = self._conn.cursor(factory)
+        cursor.row_factory = self.row_factory
+        return cursor
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script):
+        return self._conn.executescript(script)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        """归还连接；同一线程最外层的句柄归还时回滚未提交的事务"""
+        if not self._released:
+            self._released = True
+            self._slot.release()
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # 与 sqlite3.Connection 一致：只提交/回滚，不关闭
+        if exc_type is None:
+            self._conn.commit()
+        else:
+            self._conn.rollback()
+        return False
+
+    def __del__(self):
+        # 忘记 close() 的句柄在被回收时归还（等同于原来连接被回收时关闭）
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class PoolSlot:
+    """线程内某个数据库的长连接及其借用计数"""
+
+    def __init__(self, path: str):
+        self.pid = os.getpid()
+        self.conn = _open(path)
+        self.depth = 0
+
+    def release(self):
+        self.depth -= 1
+        if self.depth <= 0:
+            self.depth = 0
+            if self.conn.in_transaction:
+                self.conn.rollback()
+
+
+_local = threading.local()
+
+
+def get_connection(name: str) -> ConnectionHandle:
+    """
+    取当前线程的长连接
+
+    Args:
+        name: 注册的数据库名称（如 'crypto_data'）或文件路径
+    """
+    path = get_db_path(name)
+    slots = getattr(_local, 'slots', None)
+    if slots is None:
+        slots = _local.slots = {}
+
+    slot = slots.get(path)
+    if slot is None or slot.pid != os.getpid() or path == ':memory:':
+        # fork 后不能沿用父进程的连接
+        slot = slots[path] = PoolSlot(path)
+    slot.depth += 1
+    _record(path, checkouts=1)
+    return ConnectionHandle(slot)
+
+
+@contextmanager
+def transaction(name: str, row_factory=None):
+    """
+    写事务：BEGIN IMMEDIATE 取写锁（计入锁等待统计），正常结束提交，异常回滚
+    """
+    conn = get_connection(name)
+    conn.row_factory = row_factory
+    nested = conn.in_transaction
+    try:
+        if not nested:
+            conn._conn.begin_immediate()
+        yield conn
+        if not nested:
+            conn.commit()
+    except Exception:
+        if not nested:
+            conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def close_thread_connections():
+    """关闭当前线程的所有长连接（线程池任务结束或进程退出前调用）"""
+    slots = getattr(_local, 'slots', None) or {}
+    for slot in slots.values():
+        try:
+            slot.conn.close()
+        except Exception:
+            pass
+    slots.clear()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+本地事件总线（SQLite 变更流 + 持久化游标）
+采集器发布带类型的事件，守护进程订阅，不再定时轮询 localhost:5000 的API。
+
+- 事件写入 event_bus.db 的 events 表（自增 id 即全局顺序）
+- 每个订阅者按 (consumer, topic) 保存已处理到的 id，重启后从断点继续，不丢不重
+- 订阅者用 PRAGMA data_version 检测其他进程的提交（不读表），有新提交时才查询，
+  事件延迟约为 poll_interval（默认0.1秒），而不是原来的一个轮询周期
+
+发布:
+    from event_bus import publish, SNAPSHOT_CREATED
+    publish(SNAPSHOT_CREATED, {'snapshot_time': ..., 'count': ...})
+
+订阅:
+    subscriber = Subscriber('telegram_signal_system', [SNAPSHOT_CREATED])
+    while True:
+        for event in subscriber.wait(timeout=60):
+            handle(event.topic, event.payload)
+            subscriber.ack(event)
+"""
+
+import json
+import logging
+import time
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, List, Optional
+
+from db_access import get_connection, transaction
+
+EVENT_DB = 'event_bus'
+
+# 事件类型
+SNAPSHOT_CREATED = 'snapshot.created'          # 首页数据快照入库（crypto_snapshots）
+POSITION_UPDATE = 'position.update'            # 账户持仓变化（持仓流服务）
+PRICE_SPEED_ALERT = 'price_speed.alert'        # 1分钟涨跌速预警级别变化
+
+RETENTION_DAYS = 3
+PRUNE_EVERY = 500           # 每发布多少条事件清理一次过期事件
+
+EVENTS_DDL = '''
+    CREATE TABLE IF NOT EXISTS events (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        topic TEXT NOT NULL,
+        payload TEXT NOT NULL,
+        dedup_key TEXT UNIQUE,
+        created_at REAL NOT NULL
+    )
+'''
+EVENTS_INDEX_DDL = 'CREATE INDEX IF NOT EXISTS idx_events_topic_id ON events(topic, id)'
+CURSORS_DDL = '''
+    CREATE TABLE IF NOT EXISTS event_cursors (
+        consumer TEXT NOT NULL,
+        topic TEXT NOT NULL,
+        last_id INTEGER NOT NULL,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (consumer, topic)
+    )
+'''
+
+Event = namedtuple('Event', ['id', 'topic', 'payload', 'created_at'])
+
+logger = logging.getLogger(__name__)
+
+_initialized = set()
+_published = 0
+_local_commits = 0          # 本进程的发布次数（本连接的提交不会改变 data_version）
+
+
+def init_schema(conn):
+    conn.execute(EVENTS_DDL)
+    conn.execute(EVENTS_INDEX_DDL)
+    conn.execute(CURSORS_DDL)
+
+
+def _ensure_schema(db: str):
+    if db in _initialized:
+        return
+    with transaction(db) as conn:
+        init_schema(conn)
+    _initialized.add(db)
+
+
+def publish(topic: str, payload: Dict, dedup_key: Optional[str] = None,
+            db: str = EVENT_DB) -> Optional[int]:
+    """
+    发布事件（独立的短事务）
+    发布失败只记录日志，不影响采集器自身的写入
+
+    Args:
+        dedup_key: 去重键，同一键只保留第一次发布（如未收盘K线上反复计算出的转换点）
+
+    Returns:
+        事件 id；重复或失败返回 None
+    """
+    return publish_many(topic, [payload], [dedup_key], db=db)[0]
+
+
+def publish_many(topic: str, payloads: List[Dict], dedup_keys: Optional[List[Optional[str]]] = None,
+                 db: str = EVENT_DB) -> List[Optional[int]]:
+    """批量发布同一类型的事件（一个事务）"""
+    global _published, _local_commits
+    dedup_keys = dedup_keys or [None] * len(payloads)
+    ids = []
+    try:
+        _ensure_schema(db)
+        now = time.time()
+        with transaction(db) as conn:
+            for payload, dedup_key in zip(payloads, dedup_keys):
+                cursor = conn.execute('''
+                    INSERT OR IGNORE INTO events (topic, payload, dedup_key, created_at)
+                    VALUES (?, ?, ?, ?)
+                ''', (topic, json.dumps(payload, ensure_ascii=False, default=str), dedup_key, now))
+                ids.append(cursor.lastrowid if cursor.rowcount else None)
+        _published += len(payloads)
+        _local_commits += 1
+        if _published >= PRUNE_EVERY:
+            _published = 0
+            prune(db=db)
+    except Exception as e:
+        logger.warning("发布事件失败 %s: %s", topic, e)
+        ids = [None] * len(payloads)
+    return ids
+
+
+def prune(max_age_days: float = RETENTION_DAYS, db: str = EVENT_DB) -> int:
+    """删除过期事件"""
+    with transaction(db) as conn:
+        cursor = conn.execute('DELETE FROM events WHERE created_at < ?',
+                              (time.time() - max_age_days * 86400,))
+        return cursor.rowcount
+
+
+class Subscriber:
+    """某个消费者对若干事件类型的订阅（游标持久化在 event_cursors 表）"""
+
+    def __init__(self, consumer: str, topics: Iterable[str], start: str = 'latest',
+                 poll_interval: float = 0.1, db: str = EVENT_DB):
+        """
+        Args:
+            consumer: 消费者名称（同名订阅共享游标）
+            topics: 订阅的事件类型
+            start: 首次订阅（没有游标）时的起点：'latest' 只接收之后的新事件，'earliest' 从头开始
+            poll_interval: 检测新提交的间隔（秒）
+        """
+        self.consumer = consumer
+        self.topics = list(topics)
+        self.poll_interval = poll_interval
+        self.db = db
+        _ensure_schema(db)
+        self.cursors = self._load_cursors(start)
+        self._data_version = None
+
+    def _load_cursors(self, start: str) -> Dict[str, int]:
+        with transaction(self.db) as conn:
+            placeholders = ','.join('?' * len(self.topics))
+            cursors = dict(conn.execute(f'''
+                SELECT topic, last_id FROM event_cursors
+                WHERE consumer = ? AND topic IN ({placeholders})
+            ''', [self.consumer] + self.topics).fetchall())
+            missing = [topic for topic in self.topics if topic not in cursors]
+            if missing:
+                initial = 0
+                if start == 'latest':
+                    initial = conn.execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+                for topic in missing:
+                    cursors[topic] = initial
+                conn.executemany('''
+                    INSERT OR IGNORE INTO event_cursors (consumer, topic, last_id, updated_at)
+                    VALUES (?, ?, ?, ?)
+                ''', [(self.consumer, topic, initial, time.time()) for topic in missing])
+        return cursors
+
+    def poll(self, limit: int = 100) -> List[Event]:
+        """读取游标之后的事件（按 id 升序，不移动游标）"""
+        conn = get_connection(self.db)
+        try:
+            clauses = ' OR '.join('(topic = ? AND id > ?)' for _ in self.topics)
+            params = [value for topic in self.topics for value in (topic, self.cursors[topic])]
+            rows = conn.execute(f'''
+                SELECT id, topic, payload, created_at FROM events
+                WHERE {clauses}
+                ORDER BY id
+                LIMIT ?
+            ''', params + [limit]).fetchall()
+        finally:
+            conn.close()
+        return [Event(row[0], row[1], json.loads(row[2]), row[3]) for row in rows]
+
+    def ack(self, event: Event):
+        """标记事件已处理（持久化游标）"""
+        if event.id <= self.cursors.get(event.topic, 0):
+            return
+        self.cursors[event.topic] = event.id
+        with transaction(self.db) as conn:
+            conn.execute('''
+                UPDATE event_cursors SET last_id = ?, updated_at = ?
+                WHERE consumer = ? AND topic = ?
+            ''', (event.id, time.time(), self.consumer, event.topic))
+
+    def _changed(self) -> bool:
+        """自上次检查后是否有其他连接提交过（PRAGMA data_version，无需读表）"""
+        conn = get_connection(self.db)
+        try:
+            version = conn.execute('PRAGMA data_version').fetchone()[0]
+        finally:
+            conn.close()
+        version = (version, _local_commits)
+        changed = version != self._data_version
+        self._data_version = version
+        return changed
+
+    def wait(self, timeout: Optional[float] = None, limit: int = 100) -> List[Event]:
+        """
+        阻塞等待新事件，最长 timeout 秒（None 为一直等待）
+        超时返回空列表，调用方可在超时后执行原有的定时任务
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._changed()
+        events = self.poll(limit)
+        while not events:
+            if deadline is not None and time.monotonic() >= deadline:
+                return []
+            time.sleep(self.poll_interval)
+            if self._changed():
+                events = self.poll(limit)
+        return events
+
+    def listen(self, handler: Callable[[Event], None], timeout: Optional[float] = None,
+               on_idle: Optional[Callable[[], None]] = None, stop: Optional[Callable[[], bool]] = None):
+        """
+        循环处理事件：handler(event) 成功后确认
+        handler 抛出异常时记录日志并跳过该事件，不阻塞后续事件
+        on_idle 在每次 wait 超时后调用（用于保留原有的定时检查）
+        """
+        while stop is None or not stop():
+            events = self.wait(timeout)
+            if not events and on_idle is not None:
+                on_idle()
+            for event in events:
+                try:
+                    handler(event)
+                except Exception as e:
+                    logger.exception("处理事件失败 %s #%s: %s", event.topic, event.id, e)
+                self.ack(event)
+
+
+def get_stats(db: str = EVENT_DB) -> Dict:
+    """各事件类型的数量及各消费者的积压"""
+    _ensure_schema(db)
+    conn = get_connection(db)
+    try:
+        topics = {topic: {'events': count, 'last_id': last_id} for topic, count, last_id in conn.execute(
+            'SELECT topic, COUNT(*), MAX(id) FROM events GROUP BY topic').fetchall()}
+        consumers = {}
+        for consumer, topic, last_id in conn.execute(
+                'SELECT consumer, topic, last_id FROM event_cursors').fetchall():
+            backlog = conn.execute('SELECT COUNT(*) FROM events WHERE topic = ? AND id > ?',
+                                   (topic, last_id)).fetchone()[0]
+            consumers.setdefault(consumer, {})[topic] = {'last_id': last_id, 'backlog': backlog}
+        return {'topics': topics, 'consumers': consumers}
+    finally:
+        conn.close()
@@ -7,10 +7,10 @@ import base64
 import hashlib
 from datetime import datetime
 import time
+from state_store import SUB_ACCOUNT_CONFIG
 
 # 加载配置
-with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+config = SUB_ACCOUNT_CONFIG.load()
 
 sub_account = config['sub_accounts'][0]
 api_key = sub_account['api_key']
@@ -9,9 +9,9 @@
 """
 
 import requests
-import json
 import sys
 from datetime import datetime, timezone, timedelta
+from state_store import SUB_ACCOUNT_CONFIG, SUB_ACCOUNT_MAINTENANCE
 
 BASE_URL = 'http://localhost:5000'
 DRY_RUN = '--fix' not in sys.argv  # 默认dry-run模式
@@ -27,18 +27,13 @@ def log(msg):
 def get_maintenance_count(account_name, inst_id, pos_side):
     """获取维护次数"""
     try:
-        with open('sub_account_maintenance.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         key = f"{account_name}_{inst_id}_{pos_side}"
-        if key in data:
-            record = data[key]
+        record = SUB_ACCOUNT_MAINTENANCE.get(key)
+        if record:
             today = get_china_time().strftime('%Y-%m-%d')
             if record.get('date') == today:
                 return record.get('count', 0)
         return 0
-    except FileNotFoundError:
-        return 0
     except Exception as e:
         log(f"⚠️ 读取维护次数失败: {e}")
         return 0
@@ -148,8 +143,7 @@ def main():
     
     # 加载子账户配置
     try:
-        with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-            config_data = json.load(f)
+        config_data = SUB_ACCOUNT_CONFIG.load()
         config = config_data.get('sub_accounts', [])
     except Exception as e:
         log(f"❌ 加载配置失败: {e}")
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+资金监控增量聚合
+每个币种在内存中保留最近60分钟的5分钟成交量和最近3天的聚合成交量，
+每根新K线 O(1) 更新15/30/60分钟聚合量和3日均量，不再每轮对每个币种执行6次 SUM/AVG 范围查询。
+
+结果与 fund_monitor_collector 中的SQL计算一致:
+- 聚合量: fund_monitor_5min 中 timestamp ∈ (ts - N分钟 + 1, ts] 的成交量之和
+- 3日均量: fund_monitor_aggregated 中同周期 timestamp ∈ (ts - 3天, ts) 的平均值，没有数据为 None
+- 同一时间戳重复采集（未收盘K线）时覆盖上一次的值，与 INSERT OR REPLACE 相同
+- 早于最新数据的补采集K线窗口可能已被移出内存，返回 None 由调用方回退到SQL
+
+启动时用 restore() 从数据库恢复窗口。
+
+用法:
+    aggregator = FundAggregator()
+    aggregator.restore(conn)
+    for interval, (volume, avg_3day) in aggregator.update('BTC', timestamp, volume).items():
+        ...
+"""
+
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+INTERVALS = (15, 30, 60)                      # 聚合周期（分钟）
+BASELINE_MS = 3 * 24 * 60 * 60 * 1000         # 3日均量的回看范围
+MINUTE_MS = 60 * 1000
+RESYNC_EVERY = 1024                           # 每更新N次用 fsum 重算一次累计和，消除浮点误差累积
+
+
+class RollingSum:
+    """按时间戳递增追加的滑动窗口累计和"""
+
+    def __init__(self):
+        self.items: deque = deque()     # (timestamp, value)
+        self.total = 0.0
+        self._updates = 0
+
+    def __len__(self):
+        return len(self.items)
+
+    def _changed(self):
+        self._updates += 1
+        if self._updates >= RESYNC_EVERY:
+            self._updates = 0
+            self.total = math.fsum(value for _, value in self.items)
+
+    def push(self, timestamp: int, value: float):
+        """追加一个值；时间戳与最后一个相同则覆盖，更早的时间戳按顺序插入"""
+        items = self.items
+        if items and timestamp <= items[-1][0]:
+            if timestamp == items[-1][0]:
+                self.total += value - items[-1][1]
+                items[-1] = (timestamp, value)
+            else:
+                # 补采集的旧K线：少见，重建顺序
+                merged = {ts: v for ts, v in items}
+                merged[timestamp] = value
+                self.items = deque(sorted(merged.items()))
+                self.total = math.fsum(merged.values())
+            self._changed()
+            return
+        items.append((timestamp, value))
+        self.total += value
+        self._changed()
+
+    def evict_through(self, timestamp: int):
+        """移除时间戳 <= timestamp 的值"""
+        items = self.items
+        while items and items[0][0] <= timestamp:
+            self.total -= items.popleft()[1]
+            self._changed()
+        if not items:
+            self.total = 0.0
+
+    def newer_than(self, timestamp: int) -> bool:
+        return bool(self.items) and self.items[-1][0] > timestamp
+
+    def pop_last_if(self, timestamp: int) -> Optional[float]:
+        """最后一个值的时间戳等于 timestamp 时移除并返回它"""
+        if self.items and self.items[-1][0] == timestamp:
+            value = self.items.pop()[1]
+            self.total -= value
+            self._changed()
+            if not self.items:
+                self.total = 0.0
+            return value
+        return None
+
+
+class FundAggregator:
+    """所有币种的增量聚合状态"""
+
+    def __init__(self, intervals: Iterable[int] = INTERVALS, baseline_ms: int = BASELINE_MS):
+        self.intervals = tuple(intervals)
+        self.baseline_ms = baseline_ms
+        self._volumes: Dict[Tuple[str, int], RollingSum] = {}     # (币种, 周期) -> 5分钟成交量
+        self._baselines: Dict[Tuple[str, int], RollingSum] = {}   # (币种, 周期) -> 聚合成交量
+
+    def _series(self, store: Dict, key) -> RollingSum:
+        series = store.get(key)
+        if series is None:
+            series = store[key] = RollingSum()
+        return series
+
+    def restore(self, conn, symbols: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """从 fund_monitor_5min / fund_monitor_aggregated 恢复窗口（启动时调用一次）"""
+        self._volumes.clear()
+        self._baselines.clear()
+        symbol_filter, params = '', []
+        if symbols is not None:
+            symbols = list(symbols)
+            symbol_filter = f" AND symbol IN ({','.join('?' * len(symbols))})"
+            params = symbols
+
+        longest = max(self.intervals) * MINUTE_MS
+        rows = conn.execute(f'''
+            SELECT symbol, timestamp, volume FROM fund_monitor_5min
+            WHERE timestamp > (SELECT COALESCE(MAX(timestamp), 0) FROM fund_monitor_5min) - ?{symbol_filter}
+            ORDER BY symbol, timestamp
+        ''', [longest] + params).fetchall()
+        for symbol, timestamp, volume in rows:
+            for interval in self.intervals:
+                self._series(self._volumes, (symbol, interval)).push(timestamp, volume)
+
+        interval_types = {f'{interval}min': interval for interval in self.intervals}
+        baseline_rows = conn.execute(f'''
+            SELECT symbol, interval_type, timestamp, volume FROM fund_monitor_aggregated
+            WHERE timestamp > (SELECT COALESCE(MAX(timestamp), 0) FROM fund_monitor_aggregated) - ?{symbol_filter}
+            ORDER BY symbol, interval_type, timestamp
+        ''', [self.baseline_ms] + params).fetchall()
+        restored = 0
+        for symbol, interval_type, timestamp, volume in baseline_rows:
+            interval = interval_types.get(interval_type)
+            if interval is not None:
+                self._series(self._baselines, (symbol, interval)).push(timestamp, volume)
+                restored += 1
+        return {'5min': len(rows), 'aggregated': restored}
+
+    def aggregated_volume(self, symbol: str, timestamp: int, interval: int) -> float:
+        """当前窗口内的聚合成交量（先调用 add_volume）"""
+        series = self._series(self._volumes, (symbol, interval))
+        series.evict_through(timestamp - interval * MINUTE_MS + 1)
+        return series.total if len(series) else 0.0
+
+    def add_volume(self, symbol: str, timestamp: int, volume: float):
+        for interval in self.intervals:
+            self._series(self._volumes, (symbol, interval)).push(timestamp, volume)
+
+    def baseline(self, symbol: str, timestamp: int, interval: int) -> Optional[float]:
+        """(ts - 3天, ts) 内聚合量的平均值；没有数据返回 None"""
+        series = self._series(self._baselines, (symbol, interval))
+        series.evict_through(timestamp - self.baseline_ms)
+        # 同一时间戳重复采集：旧值不参与平均，随后被新值覆盖
+        series.pop_last_if(timestamp)
+        if not len(series):
+            return None
+        return series.total / len(series)
+
+    def add_aggregated(self, symbol: str, timestamp: int, interval: int, volume: float):
+        self._series(self._baselines, (symbol, interval)).push(timestamp, volume)
+
+    def update(self, symbol: str, timestamp: int,
+               volume: float) -> Optional[Dict[int, Tuple[float, Optional[float]]]]:
+        """
+        写入一根5分钟K线的成交量
+
+        Returns:
+            {周期分钟: (聚合成交量, 3日均量或None)}；
+            早于已有数据的K线（补采集）返回 None，由调用方用SQL计算后 add_aggregated()
+        """
+        key = (symbol, self.intervals[0])
+        if self._series(self._volumes, key).newer_than(timestamp):
+            self.add_volume(symbol, timestamp, volume)
+            return None
+        self.add_volume(symbol, timestamp, volume)
+        result = {}
+        for interval in self.intervals:
+            aggregated = self.aggregated_volume(symbol, timestamp, interval)
+            avg_3day = self.baseline(symbol, timestamp, interval)
+            self.add_aggregated(symbol, timestamp, interval, aggregated)
+            result[interval] = (aggregated, avg_3day)
+        return result
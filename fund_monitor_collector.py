@@ -6,7 +6,6 @@
 - 与过去3天平均量能对比，检测异常波动（>20%，可配置）
 - 数据与V1V2系统共享OKEx数据源
 """
-import requests
 import sqlite3
 import time
 import logging
@@ -15,6 +14,9 @@ import pytz
 import json
 import os
 
+from okx_market_client import get_client
+from fund_monitor_aggregator import FundAggregator
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -46,6 +48,10 @@ DEFAULT_CONFIG = {
 # 全局配置
 CONFIG = DEFAULT_CONFIG.copy()
 
+# 聚合量和3日均量的增量计算状态（首次采集时从数据库恢复）
+AGGREGATOR = FundAggregator()
+_aggregator_restored = False
+
 def load_config():
     """加载配置"""
     global CONFIG
@@ -138,37 +144,22 @@ def fetch_volume_from_okex(symbol):
     返回: (timestamp, volume_usdt) 或 (None, None)
     """
     try:
-        url = 'https://www.okx.com/api/v5/market/candles'
-        params = {
-            'instId': f'{symbol}-USDT-SWAP',
-            'bar': '5m',
-            'limit': '1'  # 只获取最新一根K线
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
+        # 只获取最新一根K线（共享客户端负责限频与重试）
+        candles = get_client().get_candles(f'{symbol}-USDT-SWAP', '5m', 1)
         
-        data = response.json()
-        
-        if data['code'] == '0' and data['data']:
+        if candles:
             # K线数据: [timestamp, open, high, low, close, volume, volCcy, volCcyQuote, confirm]
             # volCcyQuote(索引7) 是USDT成交额
-            candle = data['data'][0]
+            candle = candles[0]
             timestamp = int(candle[0])  # 毫秒时间戳
             volume_usdt = float(candle[7])  # USDT成交额
             
             logging.info(f'✅ {symbol}: Vol=${volume_usdt:,.2f} USDT')
             return timestamp, volume_usdt
         else:
-            logging.warning(f'⚠️ {symbol}: API返回无数据 - {data}')
+            logging.warning(f'⚠️ {symbol}: API返回无数据')
             return None, None
             
-    except requests.exceptions.Timeout:
-        logging.error(f'❌ {symbol}: 请求超时')
-        return None, None
-    except requests.exceptions.RequestException as e:
-        logging.error(f'❌ {symbol}: 网络错误 - {str(e)}')
-        return None, None
     except Exception as e:
         logging.error(f'❌ {symbol}: 数据解析错误 - {str(e)}')
         return None, None
@@ -273,17 +264,15 @@ def store_abnormal_history(conn, symbol, timestamp, interval_minutes, volume, av
         logging.error(f'❌ {symbol}: 记录异常历史失败 - {str(e)}')
         return False
 
-def store_aggregated_data(conn, symbol, timestamp, interval_minutes, volume):
+def store_aggregated_data(conn, symbol, timestamp, interval_minutes, volume, avg_3day):
     """
     存储聚合数据并检测异常
+    avg_3day 由 AGGREGATOR 增量计算（等同于 calculate_3day_average）
     """
     cursor = conn.cursor()
     collect_time = datetime.fromtimestamp(timestamp / 1000, BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
     interval_type = f'{interval_minutes}min'
     
-    # 计算3天平均
-    avg_3day = calculate_3day_average(conn, symbol, timestamp, interval_minutes)
-    
     # 计算偏差百分比和异常标记
     deviation_percent = None
     is_abnormal = 0
@@ -311,17 +300,25 @@ def store_aggregated_data(conn, symbol, timestamp, interval_minutes, volume):
 
 def collect_and_process():
     """采集数据并处理"""
+    global _aggregator_restored
     conn = sqlite3.connect(DB_FILE)
     
+    if not _aggregator_restored:
+        restored = AGGREGATOR.restore(conn, COINS)
+        _aggregator_restored = True
+        logging.info(f'✅ 聚合窗口已恢复: 5分钟数据{restored["5min"]}条, 聚合数据{restored["aggregated"]}条')
+    
     logging.info('='*60)
     logging.info(f'开始采集 - {datetime.now(BEIJING_TZ).strftime("%Y-%m-%d %H:%M:%S")}')
     
     success_count = 0
     fail_count = 0
     
-    for symbol in COINS:
-        # 1. 从OKEx获取5分钟数据
-        timestamp, volume = fetch_volume_from_okex(symbol)
+    # 1. 从OKEx并发获取所有币种的5分钟数据
+    fetched = get_client().map(fetch_volume_from_okex, COINS)
+    
+    for symbol, result in zip(COINS, fetched):
+        timestamp, volume = result or (None, None)
         
         if timestamp is None or volume is None:
             fail_count += 1
@@ -334,10 +331,17 @@ def collect_and_process():
             fail_count += 1
             continue
         
-        # 3. 计算并存储聚合数据（15/30/60分钟）
-        for interval_min in [15, 30, 60]:
-            agg_volume = calculate_aggregated_volume(conn, symbol, timestamp, interval_min)
-            store_aggregated_data(conn, symbol, timestamp, interval_min, agg_volume)
+        # 3. 增量计算并存储聚合数据（15/30/60分钟）
+        aggregated = AGGREGATOR.update(symbol, timestamp, volume)
+        if aggregated is None:
+            # 早于内存窗口的补采集K线：用SQL计算
+            aggregated = {}
+            for interval_min in AGGREGATOR.intervals:
+                agg_volume = calculate_aggregated_volume(conn, symbol, timestamp, interval_min)
+                aggregated[interval_min] = (agg_volume, calculate_3day_average(conn, symbol, timestamp, interval_min))
+                AGGREGATOR.add_aggregated(symbol, timestamp, interval_min, agg_volume)
+        for interval_min, (agg_volume, avg_3day) in aggregated.items():
+            store_aggregated_data(conn, symbol, timestamp, interval_min, agg_volume, avg_3day)
     
     conn.commit()
     conn.close()
@@ -0,0 +1,1013 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Google Drive 数据导入
+文件夹检测、配置、手动触发、文件夹更新与日志
+"""
+
+from datetime import datetime
+import json
+import os
+import pytz
+import time
+import traceback
+
+from flask import Blueprint, jsonify, render_template, request
+
+from app_common import BEIJING_TZ
+from db_access import get_connection, get_db_path
+
+gdrive_bp = Blueprint('gdrive', __name__)
+
+# ============================================================================
+# Google Drive TXT检测器 API
+# ============================================================================
+
+@gdrive_bp.route('/gdrive-detector')
+def gdrive_detector_page():
+    """Google Drive检测器页面"""
+    return render_template('gdrive_detector.html')
+
+@gdrive_bp.route('/test-gdrive-status')
+def test_gdrive_status():
+    """Google Drive状态测试页面"""
+    return render_template('test_gdrive_status.html')
+
+@gdrive_bp.route('/gdrive-detector-fresh')
+def gdrive_detector_fresh():
+    """Google Drive检测器页面（无缓存版本）"""
+    import time
+    return render_template('gdrive_detector_fresh.html', timestamp=int(time.time()))
+
+@gdrive_bp.route('/api/gdrive-detector/status')
+def gdrive_detector_status():
+    """获取Google Drive检测器状态"""
+    try:
+        import subprocess
+        import re
+        import requests
+        from datetime import datetime
+        import pytz
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        
+        # 检查检测器进程是否运行
+        result = subprocess.run(['ps', 'aux'], capture_output=True, text=True)
+        detector_running = ('gdrive_txt_detector.py' in result.stdout or 
+                          'gdrive_final_detector.py' in result.stdout or
+                          'gdrive_smart_detector.py' in result.stdout)
+        
+        # 从数据库读取最新数据时间戳
+        file_timestamp = None
+        delay_minutes = None
+        
+        try:
+            import sqlite3
+            db_path = get_db_path('crypto_data')
+            conn = get_connection(db_path)
+            cursor = conn.cursor()
+            cursor.execute("SELECT snapshot_time FROM crypto_snapshots ORDER BY created_at DESC LIMIT 1")
+            result = cursor.fetchone()
+            conn.close()
+            
+            if result:
+                file_timestamp = result[0]
+                # 计算延迟 - 数据库时间是北京时间
+                try:
+                    last_time = datetime.strptime(file_timestamp, '%Y-%m-%d %H:%M:%S')
+                except ValueError:
+                    last_time = datetime.strptime(file_timestamp, '%Y-%m-%d %H:%M:%S.%f')
+                
+                # 数据库存储的是北京时间，直接与北京时间比较
+                last_time_beijing = beijing_tz.localize(last_time)
+                delay_seconds = (now - last_time_beijing).total_seconds()
+                delay_minutes = delay_seconds / 60
+        except:
+            pass
+        
+        # 读取日志获取检查次数
+        check_count = 0
+        last_check_time = None
+        try:
+            with open('/home/user/webapp/gdrive_final_detector.log', 'r') as f:
+                lines = f.readlines()
+                for line in lines:
+                    if '检查 #' in line:
+                        match = re.search(r'检查 #(\d+)', line)
+                        if match:
+                            check_count = int(match.group(1))
+                    if re.search(r'\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}', line):
+                        # 提取时间戳
+                        match = re.search(r'(2025-\d{2}-\d{2} \d{2}:\d{2}:\d{2})', line)
+                        if match:
+                            last_check_time = match.group(1)
+        except:
+            pass
+        
+        # 从配置文件读取所有文件夹ID
+        root_folder_odd = "1jFGGlGP5KEVhAxpCNxFIYEFI5-cDOBjM"  # 默认值
+        root_folder_even = "1jFGGlGP5KEVhAxpCNxFIYEFI5-cDOBjM"  # 默认值
+        folder_id = None  # 子账号文件夹ID（今日文件夹）
+        
+        try:
+            import json
+            config_file = '/home/user/webapp/daily_folder_config.json'
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+                # 读取单数/双数父文件夹ID
+                if 'root_folder_odd' in config:
+                    root_folder_odd = config['root_folder_odd']
+                if 'root_folder_even' in config:
+                    root_folder_even = config['root_folder_even']
+                # 🆕 读取子账号文件夹ID（今日文件夹）
+                if 'folder_id' in config:
+                    folder_id = config['folder_id']
+        except:
+            pass
+        
+        # 如果配置文件中没有子账号文件夹ID，尝试从日志读取
+        if not folder_id:
+            try:
+                with open('/home/user/webapp/gdrive_final_detector.log', 'r') as f:
+                    lines = f.readlines()
+                    for line in reversed(lines[-100:]):  # 只看最近100行
+                        # 提取文件夹ID（子账号）
+                        if '今日文件夹' in line or '子文件夹' in line:
+                            match = re.search(r'([A-Za-z0-9_-]{20,})', line)
+                            if match and match.group(1) != root_folder_odd and match.group(1) != root_folder_even:
+                                folder_id = match.group(1)
+                                break
+            except:
+                pass
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'detector_running': detector_running,
+                'file_timestamp': file_timestamp,
+                'delay_minutes': delay_minutes,
+                'check_count': check_count,
+                'last_check_time': last_check_time,
+                'current_time': now.strftime('%Y-%m-%d %H:%M:%S'),
+                'folder_id': folder_id,
+                'root_folder_odd': root_folder_odd,
+                'root_folder_even': root_folder_even,
+                'today_date': now.strftime('%Y年%m月%d日')
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': None
+        })
+
+@gdrive_bp.route('/api/gdrive-detector/txt-files')
+def gdrive_detector_txt_files():
+    """获取今天的TXT文件列表"""
+    try:
+        import requests
+        import re
+        from datetime import datetime
+        import pytz
+        import json
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        today = datetime.now(beijing_tz).strftime('%Y-%m-%d')
+        
+        # 从配置文件读取今天的文件夹ID
+        folder_id = "1jFGGlGP5KEVhAxpCNxFIYEFI5-cDOBjM"  # 默认值
+        try:
+            config_file = '/home/user/webapp/daily_folder_config.json'
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+                if config.get('current_date') == today and 'folder_id' in config:
+                    folder_id = config['folder_id']
+        except:
+            pass
+        
+        url = f"https://drive.google.com/embeddedfolderview?id={folder_id}"
+        
+        response = requests.get(url, timeout=10)
+        content = response.text
+        
+        # 查找今天所有的TXT文件
+        pattern = rf'>{today}_(\d{{4}})\.txt<'
+        matches = re.findall(pattern, content)
+        
+        # 排序（从新到旧）
+        times_sorted = sorted(matches, reverse=True)
+        filenames = [f"{today}_{time}.txt" for time in times_sorted]
+        
+        return jsonify({
+            'success': True,
+            'files': filenames,
+            'count': len(filenames),
+            'date': today,
+            'folder_id': folder_id
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'files': [],
+            'count': 0
+        })
+
+@gdrive_bp.route('/api/gdrive-detector/logs')
+def gdrive_detector_logs():
+    """获取检测器日志"""
+    try:
+        lines = request.args.get('lines', 50, type=int)
+        
+        # 尝试多个日志文件
+        log_files = [
+            '/home/user/webapp/gdrive_final_detector.log',
+            '/home/user/webapp/gdrive_txt_detector.log',
+            '/home/user/webapp/gdrive_smart_detector.log'
+        ]
+        
+        log_content = None
+        total_lines = 0
+        
+        for log_file in log_files:
+            try:
+                with open(log_file, 'r') as f:
+                    all_lines = f.readlines()
+                    log_content = ''.join(all_lines[-lines:] if len(all_lines) > lines else all_lines)
+                    total_lines = len(all_lines)
+                    break
+            except FileNotFoundError:
+                continue
+        
+        if log_content is not None:
+            return jsonify({
+                'success': True,
+                'logs': log_content,
+                'total_lines': total_lines
+            })
+        else:
+            return jsonify({
+                'success': True,
+                'logs': '日志文件不存在',
+                'total_lines': 0
+            })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'logs': ''
+        })
+
+@gdrive_bp.route('/api/gdrive-detector/config', methods=['GET'])
+def gdrive_detector_get_config():
+    """获取Google Drive配置"""
+    try:
+        import json
+        config_file = '/home/user/webapp/daily_folder_config.json'
+        
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        return jsonify({
+            'success': True,
+            'config': config
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+@gdrive_bp.route('/api/gdrive-detector/config', methods=['POST'])
+def gdrive_detector_update_config():
+    """更新Google Drive配置（父文件夹共享链接）"""
+    try:
+        import json
+        import re
+        import requests
+        from datetime import datetime
+        import pytz
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        
+        data = request.get_json()
+        parent_folder_url = data.get('parent_folder_url', '')
+        
+        # 从URL中提取文件夹ID
+        match = re.search(r'folders/([A-Za-z0-9_-]+)', parent_folder_url)
+        if not match:
+            return jsonify({
+                'success': False,
+                'message': '无效的Google Drive文件夹链接'
+            })
+        
+        parent_folder_id = match.group(1)
+        
+        # 获取父文件夹内的今日文件夹
+        today_str = now.strftime('%Y-%m-%d')
+        url = f"https://drive.google.com/embeddedfolderview?id={parent_folder_id}"
+        response = requests.get(url, timeout=10)
+        content = response.text
+        
+        # 查找今日日期文件夹
+        folder_pattern = rf'>{today_str}<'
+        if today_str not in content:
+            return jsonify({
+                'success': False,
+                'message': f'父文件夹中未找到今日文件夹: {today_str}'
+            })
+        
+        # 提取今日文件夹ID
+        # 查找包含今日日期的文件夹链接
+        folder_id_pattern = rf'"([A-Za-z0-9_-]{{20,}})"[^>]*>{today_str}<'
+        folder_match = re.search(folder_id_pattern, content)
+        
+        if not folder_match:
+            # 尝试另一种模式
+            folder_id_pattern = rf'https://drive\.google\.com/drive/folders/([A-Za-z0-9_-]+)[^>]*>{today_str}<'
+            folder_match = re.search(folder_id_pattern, content)
+        
+        if not folder_match:
+            return jsonify({
+                'success': False,
+                'message': f'无法从父文件夹中提取今日文件夹ID: {today_str}'
+            })
+        
+        today_folder_id = folder_match.group(1)
+        
+        # 验证今日文件夹是否包含TXT文件
+        txt_url = f"https://drive.google.com/embeddedfolderview?id={today_folder_id}"
+        txt_response = requests.get(txt_url, timeout=10)
+        txt_content = txt_response.text
+        
+        # 查找TXT文件
+        txt_pattern = rf'>{today_str}_(\d{{4}})\.txt<'
+        txt_matches = re.findall(txt_pattern, txt_content)
+        
+        if not txt_matches:
+            return jsonify({
+                'success': False,
+                'message': f'今日文件夹中未找到TXT文件'
+            })
+        
+        # 获取最新的TXT文件
+        latest_txt_time = sorted(txt_matches, reverse=True)[0]
+        latest_txt = f"{today_str}_{latest_txt_time}.txt"
+        
+        # 更新配置文件
+        config_file = '/home/user/webapp/daily_folder_config.json'
+        
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except:
+            config = {}
+        
+        # 判断今天是单数还是双数日期
+        day_of_month = now.day
+        is_odd_day = day_of_month % 2 == 1
+        
+        # 更新配置
+        config['parent_folder_url'] = parent_folder_url
+        config['parent_folder_id'] = parent_folder_id
+        config['current_date'] = today_str
+        config['data_date'] = today_str
+        config['folder_id'] = today_folder_id
+        config['folder_name'] = today_str
+        config['latest_txt'] = latest_txt
+        config['txt_count'] = len(txt_matches)
+        config['last_update'] = now.strftime('%Y-%m-%d %H:%M:%S')
+        config['update_reason'] = '通过配置页面更新父文件夹'
+        config['last_manual_update'] = now.strftime('%Y-%m-%d %H:%M:%S')
+        
+        # 根据单双数更新对应的父文件夹ID
+        if is_odd_day:
+            config['root_folder_odd'] = parent_folder_id
+        else:
+            config['root_folder_even'] = parent_folder_id
+        
+        # 保存配置
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+        
+        return jsonify({
+            'success': True,
+            'message': '配置更新成功',
+            'data': {
+                'parent_folder_id': parent_folder_id,
+                'today_folder_id': today_folder_id,
+                'today_date': today_str,
+                'txt_count': len(txt_matches),
+                'latest_txt': latest_txt,
+                'is_odd_day': is_odd_day
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+@gdrive_bp.route('/api/gdrive-detector/trigger-update', methods=['POST'])
+def gdrive_detector_trigger_update():
+    """触发手动更新检测"""
+    try:
+        import subprocess
+        import time
+        
+        # 运行检测脚本一次
+        result = subprocess.run(
+            ['python3', '/home/user/webapp/gdrive_final_detector.py'],
+            capture_output=True,
+            text=True,
+            timeout=30
+        )
+        
+        return jsonify({
+            'success': True,
+            'message': '检测已执行',
+            'output': result.stdout[:500] if result.stdout else '',
+            'error': result.stderr[:500] if result.stderr else ''
+        })
+        
+    except subprocess.TimeoutExpired:
+        return jsonify({
+            'success': False,
+            'message': '检测超时（30秒）'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+@gdrive_bp.route('/gdrive-config')
+def gdrive_config_page():
+    """Google Drive配置页面"""
+    return render_template('gdrive_config.html')
+
+# ==================== Google Drive 监控状态 API ====================
+
+@gdrive_bp.route('/gdrive-monitor-status')
+def gdrive_monitor_status_page():
+    """Google Drive 监控状态页面 - 11分钟超时保险机制可视化"""
+    return render_template('gdrive_monitor_status.html')
+
+@gdrive_bp.route('/api/gdrive-monitor/status')
+def api_gdrive_monitor_status():
+    """获取 Google Drive 监控状态的实时数据"""
+    import os
+    import json
+    from datetime import datetime
+    import pytz
+    import re
+    import requests
+    from bs4 import BeautifulSoup
+    
+    try:
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        
+        # 读取配置文件
+        config_file = '/home/user/webapp/daily_folder_config.json'
+        config = {}
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        
+        # 🆕 扫描 Google Drive 中的实际文件
+        gdrive_dates = {}
+        gdrive_scan_error = None
+        try:
+            ROOT_FOLDER_ID = "1jFGGlGP5KEVhAxpCNxFIYEFI5-cDOBjM"
+            url = f"https://drive.google.com/embeddedfolderview?id={ROOT_FOLDER_ID}"
+            response = requests.get(url, timeout=5)
+            soup = BeautifulSoup(response.text, 'html.parser')
+            
+            all_links = soup.find_all('a', href=True)
+            pattern = re.compile(r'(\d{4}-\d{2}-\d{2})_(\d{4})\.txt')
+            
+            for link in all_links:
+                text = link.get_text(strip=True)
+                match = pattern.match(text)
+                if match:
+                    date = match.group(1)
+                    if date not in gdrive_dates:
+                        gdrive_dates[date] = 0
+                    gdrive_dates[date] += 1
+        except Exception as e:
+            gdrive_scan_error = str(e)
+        
+        # 读取日志文件获取最新状态
+        log_file = '/home/user/webapp/gdrive_final_detector.log'
+        latest_file = None
+        latest_file_time = None
+        check_count = 0
+        last_file_found_time = None
+        recovery_count = 0
+        
+        if os.path.exists(log_file):
+            with open(log_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+                
+                # 分析日志
+                for line in reversed(lines[-500:]):  # 只看最近500行
+                    # 查找最新文件
+                    if '最新文件名 =' in line and not latest_file:
+                        match = re.search(r'最新文件名 = (.+\.txt)', line)
+                        if match:
+                            latest_file = match.group(1)
+                            # 提取时间戳
+                            time_match = re.search(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]', line)
+                            if time_match:
+                                latest_file_time = time_match.group(1)
+                    
+                    # 查找检查次数
+                    if '检查 #' in line:
+                        match = re.search(r'检查 #(\d+)', line)
+                        if match:
+                            check_count = max(check_count, int(match.group(1)))
+                    
+                    # 查找恢复触发
+                    if '触发11分钟超时恢复机制' in line:
+                        recovery_count += 1
+                    
+                    # 查找最后找到文件的时间
+                    if '找到' in line and 'TXT文件' in line and not last_file_found_time:
+                        match = re.search(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]', line)
+                        if match:
+                            last_file_found_time = match.group(1)
+        
+        # 计算距上次找到文件的时间
+        time_since_last_file = 0
+        if last_file_found_time:
+            try:
+                last_time = datetime.strptime(last_file_found_time, '%Y-%m-%d %H:%M:%S')
+                last_time = beijing_tz.localize(last_time)
+                time_since_last_file = (now - last_time).total_seconds()
+            except:
+                pass
+        
+        # 获取数据库记录数
+        db_records = 0
+        try:
+            import sqlite3
+            conn = get_connection('crypto_data')
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*) FROM crypto_snapshots WHERE snapshot_date = ?", (now.strftime('%Y-%m-%d'),))
+            db_records = cursor.fetchone()[0]
+            conn.close()
+        except:
+            pass
+        
+        # 计算系统运行时长 (从最早的日志时间戳开始)
+        uptime_seconds = 0
+        if os.path.exists(log_file):
+            with open(log_file, 'r', encoding='utf-8') as f:
+                first_line = f.readline()
+                match = re.search(r'\[(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2})\]', first_line)
+                if match:
+                    start_time = datetime.strptime(match.group(1), '%Y-%m-%d %H:%M:%S')
+                    start_time = beijing_tz.localize(start_time)
+                    uptime_seconds = (now - start_time).total_seconds()
+        
+        # 🆕 判断数据源状态
+        today_str = now.strftime('%Y-%m-%d')
+        data_source_status = 'unknown'
+        data_source_message = ''
+        
+        if gdrive_dates:
+            latest_gdrive_date = max(gdrive_dates.keys())
+            if latest_gdrive_date == today_str:
+                data_source_status = 'active'
+                data_source_message = f'✅ 数据源正常，今天有 {gdrive_dates[today_str]} 个文件'
+            else:
+                days_old = (datetime.strptime(today_str, '%Y-%m-%d') - datetime.strptime(latest_gdrive_date, '%Y-%m-%d')).days
+                data_source_status = 'stale'
+                data_source_message = f'⚠️  数据源已停更 {days_old} 天，最新数据：{latest_gdrive_date}'
+        elif gdrive_scan_error:
+            data_source_status = 'error'
+            data_source_message = f'❌ 无法访问 Google Drive: {gdrive_scan_error}'
+        else:
+            data_source_status = 'empty'
+            data_source_message = '❌ Google Drive 中没有任何数据文件'
+        
+        return jsonify({
+            'success': True,
+            'time_since_last_file': time_since_last_file,
+            'current_folder_id': config.get('folder_id', 'N/A'),
+            'folder_date': config.get('current_date', '--'),
+            'latest_file': latest_file or '--',
+            'file_time': latest_file_time or '--',
+            'gdrive_dates': gdrive_dates,  # 🆕 Google Drive 中的日期分布
+            'data_source_status': data_source_status,  # 🆕 数据源状态
+            'data_source_message': data_source_message,  # 🆕 数据源状态消息
+            'today_date': today_str,  # 🆕 当前日期
+            'root_folder_odd': config.get('root_folder_odd', 'N/A'),  # 🆕 单数日期父文件夹
+            'root_folder_even': config.get('root_folder_even', 'N/A'),  # 🆕 双数日期父文件夹
+            'recovery_count': recovery_count,
+            'check_count': check_count,
+            'files_found': check_count,  # 简化处理
+            'db_records': db_records,
+            'last_update': now.strftime('%H:%M:%S'),
+            'uptime_seconds': uptime_seconds,
+            'current_time': now.strftime('%Y-%m-%d %H:%M:%S')
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# ==================== 文件夹更新监控 API ====================
+
+@gdrive_bp.route('/folder-update-monitor')
+def folder_update_monitor():
+    """文件夹更新监控页面"""
+    return render_template('folder_update_monitor.html')
+
+@gdrive_bp.route('/api/folder-update-status')
+def api_folder_update_status():
+    """获取文件夹更新状态"""
+    import os
+    import json
+    
+    try:
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        today_str = now.strftime('%Y-%m-%d')
+        
+        # 读取配置文件
+        config_file = '/home/user/webapp/daily_folder_config.json'
+        config = {}
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        
+        config_date = config.get('current_date', 'unknown')
+        need_update = config_date != today_str
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'config_date': config_date,
+                'today_date': today_str,
+                'folder_id': config.get('folder_id', 'N/A'),
+                'latest_txt': config.get('latest_txt', 'N/A'),
+                'txt_count': config.get('txt_count', 0),
+                'last_updated': config.get('last_updated', 'N/A'),
+                'need_update': need_update,
+                'message': '配置日期与今天不匹配' if need_update else '配置正常'
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@gdrive_bp.route('/api/trigger-folder-update', methods=['POST'])
+def api_trigger_folder_update():
+    """触发文件夹更新"""
+    import subprocess
+    import os
+    
+    try:
+        script_path = '/home/user/webapp/auto_update_today_folder.py'
+        
+        if not os.path.exists(script_path):
+            return jsonify({
+                'success': False,
+                'message': '更新脚本不存在'
+            }), 404
+        
+        # 执行更新脚本
+        result = subprocess.run(
+            ['python3', script_path],
+            capture_output=True,
+            text=True,
+            timeout=60
+        )
+        
+        if result.returncode == 0:
+            # 读取更新后的配置
+            config_file = '/home/user/webapp/daily_folder_config.json'
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            
+            return jsonify({
+                'success': True,
+                'data': {
+                    'folder_id': config.get('folder_id'),
+                    'date': config.get('current_date'),
+                    'latest_txt': config.get('latest_txt'),
+                    'txt_count': config.get('txt_count', 0)
+                },
+                'message': '更新成功'
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': f'更新失败: {result.stderr}'
+            }), 500
+            
+    except subprocess.TimeoutExpired:
+        return jsonify({
+            'success': False,
+            'message': '更新超时（60秒）'
+        }), 500
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@gdrive_bp.route('/api/list-recent-folders')
+def api_list_recent_folders():
+    """列出最近的文件夹"""
+    import requests
+    from bs4 import BeautifulSoup
+    import re
+    
+    try:
+        parent_folder_id = "1j8YV6KysUCmgcmASFOxztWWIE1Vq-kYV"
+        url = f"https://drive.google.com/embeddedfolderview?id={parent_folder_id}"
+        
+        response = requests.get(url, timeout=15)
+        soup = BeautifulSoup(response.text, 'html.parser')
+        
+        folders = []
+        all_links = soup.find_all('a', href=True)
+        
+        for link in all_links:
+            href = link.get('href', '')
+            text = link.get_text(strip=True)
+            
+            if '/folders/' in href:
+                match = re.search(r'/folders/([a-zA-Z0-9_-]+)', href)
+                if match:
+                    folder_id = match.group(1)
+                    # 检查是否是日期文件夹
+                    if re.search(r'\d{4}-\d{2}-\d{2}', text):
+                        folders.append({
+                            'name': text,
+                            'id': folder_id
+                        })
+        
+        # 排序（最新的在前）
+        folders.sort(key=lambda x: x['name'], reverse=True)
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        today = datetime.now(beijing_tz).strftime('%Y-%m-%d')
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'folders': folders[:10],  # 只返回最近10个
+                'today': today
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@gdrive_bp.route('/api/get-update-log')
+def api_get_update_log():
+    """获取更新日志"""
+    import os
+    
+    try:
+        log_file = '/home/user/webapp/auto_update_folder.log'
+        log_content = ''
+        
+        if os.path.exists(log_file):
+            with open(log_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+                # 只返回最近200行
+                log_content = ''.join(lines[-200:])
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'log': log_content or '暂无日志'
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 500
+
+@gdrive_bp.route('/gdrive-config')
+def gdrive_config():
+    """Google Drive配置管理页面"""
+    return render_template('gdrive_config.html')
+
+@gdrive_bp.route('/api/gdrive-config/get')
+def gdrive_config_get():
+    """获取当前Google Drive配置"""
+    try:
+        import json
+        config_file = '/home/user/webapp/daily_folder_config.json'
+        with open(config_file, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+        
+        return jsonify({
+            'success': True,
+            'config': config
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@gdrive_bp.route('/api/gdrive-config/update', methods=['POST'])
+def gdrive_config_update():
+    """更新Google Drive文件夹配置"""
+    try:
+        import json
+        from datetime import datetime
+        
+        data = request.get_json()
+        parent_folder_url = data.get('parent_folder_url', '')
+        
+        if not parent_folder_url:
+            return jsonify({
+                'success': False,
+                'error': '请提供Google Drive文件夹链接'
+            }), 400
+        
+        # 提取文件夹ID
+        import re
+        folder_id_match = re.search(r'/folders/([a-zA-Z0-9_-]+)', parent_folder_url)
+        if not folder_id_match:
+            return jsonify({
+                'success': False,
+                'error': '无法从链接中提取文件夹ID，请检查链接格式'
+            }), 400
+        
+        root_folder_id = folder_id_match.group(1)
+        
+        # 读取现有配置
+        config_file = '/home/user/webapp/daily_folder_config.json'
+        try:
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        except:
+            config = {}
+        
+        # 更新配置
+        beijing_time = datetime.now(BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+        today = datetime.now(BEIJING_TZ).strftime('%Y-%m-%d')
+        
+        # 根据日期判断是单数还是双数
+        day_of_month = datetime.now(BEIJING_TZ).day
+        is_odd_day = day_of_month % 2 == 1
+        
+        if is_odd_day:
+            config['root_folder_odd'] = root_folder_id
+        else:
+            config['root_folder_even'] = root_folder_id
+        
+        config['parent_folder_url'] = parent_folder_url
+        config['last_manual_update'] = beijing_time
+        config['last_updated'] = beijing_time
+        config['update_reason'] = f'手动更新{"单数" if is_odd_day else "双数"}日期父文件夹'
+        
+        # 保存配置
+        with open(config_file, 'w', encoding='utf-8') as f:
+            json.dump(config, f, indent=2, ensure_ascii=False)
+        
+        return jsonify({
+            'success': True,
+            'message': f'配置已更新 ({"单数" if is_odd_day else "双数"}日期父文件夹)',
+            'config': config
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@gdrive_bp.route('/api/gdrive-config/manual-trigger', methods=['POST'])
+def gdrive_manual_trigger():
+    """手动触发数据采集"""
+    try:
+        import subprocess
+        import os
+        
+        # 运行gdrive_final_detector.py一次
+        script_path = '/home/user/webapp/gdrive_final_detector.py'
+        
+        if not os.path.exists(script_path):
+            return jsonify({
+                'success': False,
+                'error': f'脚本不存在: {script_path}'
+            }), 404
+        
+        # 在后台运行一次检测
+        process = subprocess.Popen(
+            ['python3', script_path],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd='/home/user/webapp'
+        )
+        
+        # 等待最多5秒
+        try:
+            stdout, stderr = process.communicate(timeout=5)
+            return jsonify({
+                'success': True,
+                'message': '手动触发成功，数据采集已开始',
+                'output': stdout.decode('utf-8', errors='ignore')[:500]
+            })
+        except subprocess.TimeoutExpired:
+            return jsonify({
+                'success': True,
+                'message': '手动触发成功，数据采集正在后台运行'
+            })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@gdrive_bp.route('/api/gdrive-config/latest-data')
+def gdrive_latest_data():
+    """获取最新数据时间和状态"""
+    try:
+        import sqlite3
+        from datetime import datetime
+        
+        db_path = get_db_path('crypto_data')
+        conn = get_connection(db_path)
+        cursor = conn.cursor()
+        
+        # 获取最新数据
+        cursor.execute("""
+            SELECT snapshot_time, rush_up, rush_down, count, status, created_at
+            FROM crypto_snapshots
+            ORDER BY created_at DESC
+            LIMIT 1
+        """)
+        
+        result = cursor.fetchone()
+        conn.close()
+        
+        if not result:
+            return jsonify({
+                'success': True,
+                'has_data': False,
+                'message': '暂无数据'
+            })
+        
+        snapshot_time = result[0]
+        created_at = result[5]
+        
+        # 计算延迟（分钟）
+        now = datetime.now(BEIJING_TZ)
+        try:
+            snapshot_dt = datetime.strptime(snapshot_time, '%Y-%m-%d %H:%M:%S')
+            snapshot_dt = BEIJING_TZ.localize(snapshot_dt)
+        except:
+            snapshot_dt = datetime.strptime(snapshot_time, '%Y-%m-%d %H:%M:%S.%f')
+            snapshot_dt = BEIJING_TZ.localize(snapshot_dt)
+        
+        delay_minutes = (now - snapshot_dt).total_seconds() / 60
+        
+        return jsonify({
+            'success': True,
+            'has_data': True,
+            'data': {
+                'snapshot_time': snapshot_time,
+                'rush_up': result[1],
+                'rush_down': result[2],
+                'count': result[3],
+                'status': result[4],
+                'created_at': created_at,
+                'delay_minutes': round(delay_minutes, 1)
+            }
+        })
+        
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
@@ -10,13 +10,14 @@ Google Drive TXT文件智能检测器 - 最终版本
 import requests
 import re
 import time
-import sqlite3
 from datetime import datetime
 import pytz
 import sys
 
 # 导入计次得分计算函数
-from calculate_count_score import calculate_count_score
+from home_txt_parser import parse as parse_home_txt
+from txt_snapshot_importer import import_snapshots, parse_txt, snapshot_data
+from event_bus import publish, SNAPSHOT_CREATED
 
 # 配置
 TODAY_FOLDER_ID = "1jFGGlGP5KEVhAxpCNxFIYEFI5-cDOBjM"  # 默认文件夹ID（如果配置文件不存在则使用此值）
@@ -262,307 +263,56 @@ def parse_content(content, file_timestamp=None):
         file_timestamp: 可选的时间戳（格式：YYYY-MM-DD HH:MM:SS）
                        如果提供，则使用此时间戳而不从内容中提取
     """
-    try:
-        # 提取时间戳（如果未提供则从内容中提取）
-        if file_timestamp:
-            timestamp = file_timestamp
-        else:
-            timestamp_match = re.search(r'(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})', content)
-            if not timestamp_match:
-                return None
-            
-            date_str, time_str = timestamp_match.groups()
-            timestamp = f"{date_str} {time_str}"
-        
-        # 解析为datetime对象（只保留到分钟）
-        dt = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
-        snapshot_time = dt.strftime('%Y-%m-%d %H:%M:00')
-        snapshot_date = dt.strftime('%Y-%m-%d')
-        
-        # 提取急涨急跌数据（兼容新旧格式）
-        rush_up_match = re.search(r'透明标签_急涨总和=急涨[:：](\d+)', content)
-        if not rush_up_match:
-            rush_up_match = re.search(r'本轮急涨.*?(\d+)/', content)
-        
-        rush_down_match = re.search(r'透明标签_急跌总和=急跌[:：](\d+)', content)
-        if not rush_down_match:
-            rush_down_match = re.search(r'本轮急跌.*?(\d+)/', content)
-        
-        rush_up = int(rush_up_match.group(1)) if rush_up_match else 0
-        rush_down = int(rush_down_match.group(1)) if rush_down_match else 0
-        
-        # 提取计次和状态（兼容新旧格式）
-        count_match = re.search(r'透明标签_计次=(\d+)', content)
-        if not count_match:
-            count_match = re.search(r'计次[:：](\d+)', content)
-        
-        status_match = re.search(r'透明标签_五种状态=状态[:：]([^\r\n]+)', content)
-        if not status_match:
-            status_match = re.search(r'[★☆]+\s*\|\s*([^\n]+)', content)
-        
-        count = int(count_match.group(1)) if count_match else 0
-        status = status_match.group(1).strip() if status_match else ""
-        
-        # 提取计次得分显示（先从文件中提取，如果没有则自动计算）
-        score_match = re.search(r'((?:[★☆])+(?:---)?)', content)
-        count_score_display_from_file = score_match.group(1) if score_match else ""
-        
-        # 自动计算计次得分（确保数据完整性）
-        count_score_display, count_score_type = calculate_count_score(snapshot_time, count)
-        
-        # 如果文件中有得分，记录日志但使用计算结果
-        if count_score_display_from_file and count_score_display_from_file != count_score_display:
-            log(f"   ⚠️ 文件中的计次得分 '{count_score_display_from_file}' 与计算结果 '{count_score_display}' 不一致，使用计算结果")
-        
-        # 计算diff = rush_up - rush_down
-        diff = rush_up - rush_down
-        
-        return {
-            'snapshot_time': snapshot_time,
-            'snapshot_date': snapshot_date,
-            'rush_up': rush_up,
-            'rush_down': rush_down,
-            'diff': diff,
-            'count': count,
-            'status': status,
-            'count_score_display': count_score_display,
-            'count_score_type': count_score_type,
-            'file_timestamp': timestamp
-        }
-        
-    except Exception as e:
-        log(f"❌ 解析内容失败: {e}")
-        return None
+    return snapshot_data(parse_home_txt(content), file_timestamp)
 
 def parse_coin_data(content):
     """解析币种详细数据"""
     try:
-        coins = []
-        lines = content.split('\n')
-        
-        # 查找币种数据区域（在[超级列表框_首页开始]之后）
-        in_coin_section = False
-        for line in lines:
-            if '[超级列表框_首页开始]' in line:
-                in_coin_section = True
-                continue
-            
-            if '[超级列表框_首页结束]' in line:
-                break
-            
-            if in_coin_section and '|' in line:
-                # 格式: 1|BTC|-0.14|0|0|2025-12-09 22:20:00|126259.48|2025-10-07|-28.43|-1.24|||15|89901.39296|71.71%|110.5%
-                parts = line.strip().split('|')
-                if len(parts) >= 15:
-                    try:
-                        index = int(parts[0])
-                        
-                        # 解析最高占比和最低占比 (ratio1=最高占比, ratio2=最低占比)
-                        ratio1_str = parts[14] if len(parts) > 14 else '0%'
-                        ratio2_str = parts[15] if len(parts) > 15 else '0%'
-                        
-                        # 移除百分号并转换为浮点数
-                        try:
-                            max_ratio = float(ratio1_str.rstrip('%')) if ratio1_str else 0
-                            min_ratio = float(ratio2_str.rstrip('%')) if ratio2_str else 0
-                        except:
-                            max_ratio = 0
-                            min_ratio = 0
-                        
-                        # 根据最高占比和最低占比计算优先级等级
-                        # 等级1: 最高占比>90 且 最低占比>120
-                        # 等级2: 最高占比>80 且 最低占比>120
-                        # 等级3: 最高占比>90 且 最低占比>110
-                        # 等级4: 最高占比>70 且 最低占比>120
-                        # 等级5: 最高占比>80 且 最低占比>110
-                        # 等级6: 其他情况 (最高占比<80 或 最低占比<110)
-                        if max_ratio > 90 and min_ratio > 120:
-                            priority_level = '等级1'
-                        elif max_ratio > 80 and min_ratio > 120:
-                            priority_level = '等级2'
-                        elif max_ratio > 90 and min_ratio > 110:
-                            priority_level = '等级3'
-                        elif max_ratio > 70 and min_ratio > 120:
-                            priority_level = '等级4'
-                        elif max_ratio > 80 and min_ratio > 110:
-                            priority_level = '等级5'
-                        else:
-                            priority_level = '等级6'
-                        
-                        coin = {
-                            'index_order': index,
-                            'symbol': parts[1],
-                            'change': float(parts[2]) if parts[2] else 0,
-                            'rush_up': int(parts[3]) if parts[3] else 0,
-                            'rush_down': int(parts[4]) if parts[4] else 0,
-                            'update_time': parts[5],
-                            'high_price': float(parts[6]) if parts[6] else 0,
-                            'high_time': parts[7],
-                            'decline': float(parts[8]) if parts[8] else 0,
-                            'change_24h': float(parts[9]) if parts[9] else 0,
-                            'rank': int(parts[12]) if parts[12] else 0,
-                            'current_price': float(parts[13]) if parts[13] else 0,
-                            'ratio1': ratio1_str,  # 最高占比
-                            'ratio2': ratio2_str,  # 最低占比
-                            'priority_level': priority_level
-                        }
-                        coins.append(coin)
-                    except (ValueError, IndexError) as e:
-                        continue
-        
-        return coins
-        
+        return [coin._asdict() for coin in parse_home_txt(content).coins]
     except Exception as e:
         log(f"❌ 解析币种数据失败: {e}")
         return []
 
 def import_to_database(data, content):
     """导入数据到数据库（首页监控系统）"""
-    import time
-    max_retries = 5
-    retry_delay = 2  # 秒
-    
-    for attempt in range(max_retries):
-        try:
-            log(f"   🔌 连接数据库: {DB_PATH} (尝试 {attempt + 1}/{max_retries})")
-            conn = sqlite3.connect(DB_PATH, timeout=60)
-            conn.execute("PRAGMA journal_mode=WAL")  # 启用WAL模式，提高并发性能
-            cursor = conn.cursor()
-            
-            # 检查数据是否已存在
-            log(f"   🔍 检查数据是否已存在...")
-            cursor.execute("""
-                SELECT COUNT(*) FROM crypto_snapshots 
-                WHERE snapshot_time = ?
-            """, (data['snapshot_time'],))
-            
-            exists = cursor.fetchone()[0] > 0
-            
-            if exists:
-                log(f"   ℹ️  数据库中已存在该时间的记录: {data['snapshot_time']}")
-                conn.close()
-                return False
-            
-            # 注释掉旧的验证逻辑 - rush_up=0和rush_down=0是正常的市场状态（震荡无序）
-            # if data['rush_up'] == 0 and data['rush_down'] == 0:
-            #     log(f"   ⚠️  数据无效：rush_up和rush_down均为0，跳过本次保存")
-            #     conn.close()
-            #     return False
-            
-            # 插入新数据到crypto_snapshots
-            log(f"   📝 准备插入新记录到 crypto_snapshots 表...")
-            cursor.execute("""
-                INSERT INTO crypto_snapshots 
-                (snapshot_time, snapshot_date, rush_up, rush_down, diff, count, status, count_score_display, count_score_type, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', '+8 hours'))
-            """, (
-                data['snapshot_time'],
-                data['snapshot_date'],
-                data['rush_up'],
-                data['rush_down'],
-                data['diff'],
-                data['count'],
-                data['status'],
-                data['count_score_display'],
-                data['count_score_type']
-            ))
-            
-            # 获取刚插入的snapshot_id
-            snapshot_id = cursor.lastrowid
-            log(f"   ✅ 快照数据插入成功 (ID: {snapshot_id})")
-            
-            # 解析并导入币种数据
+    try:
+        if 'coins' not in data:
             log(f"   🪙 开始解析币种数据...")
-            coins = parse_coin_data(content)
-            
-            if coins:
-                log(f"   📊 找到 {len(coins)} 个币种数据")
-                coin_count = 0
-                
-                for coin in coins:
-                    try:
-                        cursor.execute("""
-                            INSERT INTO crypto_coin_data 
-                            (snapshot_id, snapshot_time, symbol, index_order, change, rush_up, rush_down, 
-                             update_time, high_price, high_time, decline, change_24h, rank, current_price, 
-                             ratio1, ratio2, priority_level, created_at)
-                            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now', '+8 hours'))
-                        """, (
-                            snapshot_id,
-                            data['snapshot_time'],
-                            coin['symbol'],
-                            coin['index_order'],
-                            coin['change'],
-                            coin['rush_up'],
-                            coin['rush_down'],
-                            coin['update_time'],
-                            coin['high_price'],
-                            coin['high_time'],
-                            coin['decline'],
-                            coin['change_24h'],
-                            coin['rank'],
-                            coin['current_price'],
-                            coin['ratio1'],
-                            coin['ratio2'],
-                            coin['priority_level']
-                        ))
-                        coin_count += 1
-                    except Exception as e:
-                        log(f"   ⚠️  导入币种 {coin.get('symbol', 'Unknown')} 失败: {e}")
-                        continue
-                
-                log(f"   ✅ 成功导入 {coin_count} 个币种数据")
-            else:
-                log(f"   ⚠️  未找到币种数据")
-            
-            log(f"   💾 提交事务...")
-            conn.commit()
-            
-            # 验证插入
-            cursor.execute("SELECT COUNT(*) FROM crypto_snapshots WHERE snapshot_time = ?", (data['snapshot_time'],))
-            verify_count = cursor.fetchone()[0]
-            
-            conn.close()
-            
-            if verify_count > 0:
-                log(f"   ✅ 数据库插入成功并已验证")
-                log(f"   📊 记录详情: {data['snapshot_time']} | 急涨:{data['rush_up']} 急跌:{data['rush_down']} | 计次:{data['count']} {data['count_score_display']} | {data['status']}")
-                return True
-            else:
-                log(f"   ❌ 插入验证失败")
-                return False
-            
-        except sqlite3.OperationalError as e:
-            if "database is locked" in str(e) and attempt < max_retries - 1:
-                log(f"   ⚠️  数据库被锁定，{retry_delay}秒后重试... (尝试 {attempt + 1}/{max_retries})")
-                try:
-                    conn.close()
-                except:
-                    pass
-                time.sleep(retry_delay)
-                continue  # 重试
-            else:
-                log(f"   ❌ 数据库操作失败: {e}")
-                import traceback
-                log(f"   错误详情: {traceback.format_exc()}")
-                try:
-                    conn.close()
-                except:
-                    pass
-                return False
-        except Exception as e:
-            log(f"   ❌ 数据库操作失败: {e}")
-            import traceback
-            log(f"   错误详情: {traceback.format_exc()}")
-            try:
-                conn.close()
-            except:
-                pass
+            data['coins'] = parse_coin_data(content)
+        if data['coins']:
+            log(f"   📊 找到 {len(data['coins'])} 个币种数据")
+        else:
+            log(f"   ⚠️  未找到币种数据")
+        
+        # 快照和币种数据在一个事务内写入，按 snapshot_time 去重
+        log(f"   📝 写入 crypto_snapshots / crypto_coin_data: {DB_PATH}")
+        result = import_snapshots([data], db=DB_PATH)
+        
+        if not result['inserted']:
+            log(f"   ℹ️  数据库中已存在该时间的记录: {data['snapshot_time']}")
             return False
-    
-    # 如果所有重试都失败
-    log(f"   ❌ 达到最大重试次数({max_retries})，导入失败")
-    return False
+        
+        snapshot_id = result['inserted'][0]['snapshot_id']
+        log(f"   ✅ 快照数据插入成功 (ID: {snapshot_id})，成功导入 {result['coins']} 个币种数据")
+        publish(SNAPSHOT_CREATED, {
+            'snapshot_id': snapshot_id,
+            'snapshot_time': data['snapshot_time'],
+            'snapshot_date': data['snapshot_date'],
+            'rush_up': data['rush_up'],
+            'rush_down': data['rush_down'],
+            'diff': data['diff'],
+            'count': data['count'],
+            'status': data['status'],
+            'count_score_display': data['count_score_display'],
+        })
+        log(f"   📊 记录详情: {data['snapshot_time']} | 急涨:{data['rush_up']} 急跌:{data['rush_down']} | 计次:{data['count']} {data['count_score_display']} | {data['status']}")
+        return True
+        
+    except Exception as e:
+        log(f"   ❌ 数据库操作失败: {e}")
+        import traceback
+        log(f"   错误详情: {traceback.format_exc()}")
+        return False
 
 def get_root_folder_id_and_create_today_folder():
     """
@@ -840,7 +590,8 @@ def main():
             
             # 解析内容
             log(f"⚙️  开始提取文件数据...")
-            data = parse_content(result['content'], file_timestamp=result['file_timestamp'])
+            data = parse_txt(result['content'], file_timestamp=result['file_timestamp'],
+                             filename=result['latest_filename'])
             if not data:
                 log("❌ 数据提取失败，等待下次检查...")
                 time.sleep(CHECK_INTERVAL)
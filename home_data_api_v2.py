@@ -14,6 +14,8 @@ from datetime import datetime, timedelta
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from home_txt_parser import home_page_data, parse as parse_home_txt
+
 app = Flask(__name__)
 
 # 全局缓存
@@ -35,73 +37,7 @@ GDRIVE_WAIT_MAX = 15  # 最多等待到第15秒
 
 def parse_home_data(content):
     """解析首页数据内容"""
-    lines = content.strip().split('\n')
-    
-    stats = {}
-    coins = []
-    
-    in_coin_section = False
-    
-    for line in lines:
-        line = line.strip()
-        
-        # 解析统计数据
-        if line.startswith('透明标签_'):
-            parts = line.split('=')
-            if len(parts) == 2:
-                key = parts[0].replace('透明标签_', '')
-                value = parts[1]
-                
-                if '急涨总和' in key:
-                    stats['rushUp'] = value.split('：')[1] if '：' in value else value
-                elif '急跌总和' in key:
-                    stats['rushDown'] = value.split('：')[1] if '：' in value else value
-                elif '五种状态' in key:
-                    stats['status'] = value.split('：')[1] if '：' in value else value
-                elif '急涨急跌比值' in key:
-                    stats['ratio'] = value.split('：')[1] if '：' in value else value
-                elif '绿色数量' in key:
-                    stats['greenCount'] = value
-                elif '百分比' in key:
-                    stats['percentage'] = value
-        
-        # 币种数据
-        if '[超级列表框_首页开始]' in line:
-            in_coin_section = True
-            continue
-        
-        if '[超级列表框_首页结束]' in line:
-            break
-        
-        if in_coin_section and '|' in line:
-            parts = line.split('|')
-            if len(parts) >= 16:
-                coin = {
-                    'index': parts[0],
-                    'symbol': parts[1],
-                    'change': parts[2],
-                    'rushUp': parts[3],
-                    'rushDown': parts[4],
-                    'updateTime': parts[5],
-                    'highPrice': parts[6],
-                    'highTime': parts[7],
-                    'decline': parts[8],
-                    'change24h': parts[9],
-                    'rank': parts[12],
-                    'currentPrice': parts[13],
-                    'ratio1': parts[14],
-                    'ratio2': parts[15]
-                }
-                coins.append(coin)
-    
-    # 获取更新时间
-    update_time = coins[0]['updateTime'] if coins else ''
-    
-    return {
-        'stats': stats,
-        'coins': coins,
-        'updateTime': update_time
-    }
+    return home_page_data(parse_home_txt(content))
 
 def save_to_home_cache(parsed_data, filename, time_diff, update_time):
     """保存首页数据到缓存表"""
@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+首页监控TXT文件解析器（gdrive_final_detector / txt_snapshot_importer / home_data_api_v2 / collect_and_store 共用）
+
+- 字段语法表：每个字段一个预编译正则 + 字面标记，先用 str.find 定位标记，
+  正则只从标记第一次出现的位置开始匹配；兼容旧格式的字段只在新格式缺失时才搜索
+- 结果与原来对整个文件逐个 re.search 完全一致：标记是正则的必需前缀，更早的位置不可能匹配
+- 只逐行扫描一遍，同时收集 透明标签_ 行和 [超级列表框_首页开始]...[超级列表框_首页结束] 之间的币种行
+- parse_files() 用进程池并行解析大量历史文件
+
+用法:
+    snapshot = parse(content)
+    snapshot.rush_up, snapshot.count, snapshot.coins[0].symbol
+
+    for path, snapshot in parse_files(paths):
+        ...
+"""
+
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Pattern, Sequence, Tuple
+
+COIN_SECTION_START = '[超级列表框_首页开始]'
+COIN_SECTION_END = '[超级列表框_首页结束]'
+LABEL_PREFIX = '透明标签_'
+
+
+class Field(NamedTuple):
+    """语法表中的一个字段"""
+    name: str
+    pattern: Pattern
+    markers: Tuple[str, ...] = ()      # 匹配必然以其中之一开头的字面前缀；为空时直接搜索全文
+    convert: Callable = None           # match -> 值；默认取 group(1)
+
+
+def field(name: str, pattern: str, *markers: str, convert: Callable = None) -> Field:
+    return Field(name, re.compile(pattern), tuple(markers), convert)
+
+
+# 首页快照的字段语法（同名字段的兼容格式在 parse() 中按优先级合并）
+HOME_FIELDS = (
+    field('timestamp', r'(\d{4}-\d{2}-\d{2}) (\d{2}:\d{2}:\d{2})',
+          convert=lambda m: f"{m.group(1)} {m.group(2)}"),
+    field('rush_up', r'透明标签_急涨总和=急涨[:：](\d+)', '透明标签_急涨总和=急涨'),
+    field('rush_up_legacy', r'本轮急涨.*?(\d+)/', '本轮急涨'),
+    field('rush_down', r'透明标签_急跌总和=急跌[:：](\d+)', '透明标签_急跌总和=急跌'),
+    field('rush_down_legacy', r'本轮急跌.*?(\d+)/', '本轮急跌'),
+    field('count', r'透明标签_计次=(\d+)', '透明标签_计次='),
+    field('count_legacy', r'计次[:：](\d+)', '计次'),
+    field('status', r'透明标签_五种状态=状态[:：]([^\r\n]+)', '透明标签_五种状态=状态'),
+    field('status_legacy', r'[★☆]+\s*\|\s*([^\n]+)', '★', '☆'),
+    field('score_display', r'((?:[★☆])+(?:---)?)', '★', '☆'),
+)
+
+
+class CoinRow(NamedTuple):
+    """币种明细的一行"""
+    index_order: int
+    symbol: str
+    change: float
+    rush_up: int
+    rush_down: int
+    update_time: str
+    high_price: float
+    high_time: str
+    decline: float
+    change_24h: float
+    rank: int
+    current_price: float
+    ratio1: str             # 最高占比
+    ratio2: str             # 最低占比
+    priority_level: str
+
+
+class HomeSnapshot(NamedTuple):
+    """一个首页TXT文件的解析结果"""
+    timestamp: Optional[str]                    # 内容中第一个 YYYY-MM-DD HH:MM:SS
+    rush_up: int
+    rush_down: int
+    count: int
+    status: str
+    score_display: str                          # 文件中的计次得分（★☆）
+    labels: Tuple[Tuple[str, str], ...]         # 币种区结束前的 透明标签_ 行 (键, 值)，按出现顺序
+    coin_rows: Tuple[Tuple[str, ...], ...]      # 币种区中含 | 的行（strip 后按 | 切分的原始字段）
+
+    @property
+    def coins(self) -> List[CoinRow]:
+        """类型化的币种明细（字段不足15个或无法转换的行跳过）"""
+        coins = []
+        for parts in self.coin_rows:
+            coin = coin_from_parts(parts)
+            if coin is not None:
+                coins.append(coin)
+        return coins
+
+
+def priority_level(max_ratio: float, min_ratio: float) -> str:
+    """
+    根据最高占比和最低占比计算优先级等级
+    等级1: 最高占比>90 且 最低占比>120
+    等级2: 最高占比>80 且 最低占比>120
+    等级3: 最高占比>90 且 最低占比>110
+    等级4: 最高占比>70 且 最低占比>120
+    等级5: 最高占比>80 且 最低占比>110
+    等级6: 其他情况
+    """
+    if max_ratio > 90 and min_ratio > 120:
+        return '等级1'
+    if max_ratio > 80 and min_ratio > 120:
+        return '等级2'
+    if max_ratio > 90 and min_ratio > 110:
+        return '等级3'
+    if max_ratio > 70 and min_ratio > 120:
+        return '等级4'
+    if max_ratio > 80 and min_ratio > 110:
+        return '等级5'
+    return '等级6'
+
+
+def coin_from_parts(parts: Sequence[str]) -> Optional[CoinRow]:
+    # 格式: 1|BTC|-0.14|0|0|2025-12-09 22:20:00|126259.48|2025-10-07|-28.43|-1.24|||15|89901.39296|71.71%|110.5%
+    if len(parts) < 15:
+        return None
+    try:
+        ratio1 = parts[14]
+        ratio2 = parts[15] if len(parts) > 15 else '0%'
+        try:
+            max_ratio = float(ratio1.rstrip('%')) if ratio1 else 0
+            min_ratio = float(ratio2.rstrip('%')) if ratio2 else 0
+        except ValueError:
+            max_ratio = min_ratio = 0
+        return CoinRow(
+            index_order=int(parts[0]),
+            symbol=parts[1],
+            change=float(parts[2]) if parts[2] else 0,
+            rush_up=int(parts[3]) if parts[3] else 0,
+            rush_down=int(parts[4]) if parts[4] else 0,
+            update_time=parts[5],
+            high_price=float(parts[6]) if parts[6] else 0,
+            high_time=parts[7],
+            decline=float(parts[8]) if parts[8] else 0,
+            change_24h=float(parts[9]) if parts[9] else 0,
+            rank=int(parts[12]) if parts[12] else 0,
+            current_price=float(parts[13]) if parts[13] else 0,
+            ratio1=ratio1,
+            ratio2=ratio2,
+            priority_level=priority_level(max_ratio, min_ratio),
+        )
+    except (ValueError, IndexError):
+        return None
+
+
+def _search(content: str, spec: Field):
+    """等价于 spec.pattern.search(content)"""
+    if not spec.markers:
+        return spec.pattern.search(content)
+    # 匹配必然以某个标记开头：从标记第一次出现的位置开始搜索，标记不存在时不必执行正则
+    start = -1
+    for marker in spec.markers:
+        pos = content.find(marker)
+        if pos >= 0 and (start < 0 or pos < start):
+            start = pos
+    return spec.pattern.search(content, start) if start >= 0 else None
+
+
+def _scan_sections(content: str):
+    """一遍逐行扫描：币种区结束前的透明标签行 + 币种区的行"""
+    labels, coin_rows = [], []
+    in_section = False
+    for line in content.split('\n'):
+        if LABEL_PREFIX in line:
+            stripped = line.strip()
+            if stripped.startswith(LABEL_PREFIX):
+                parts = stripped.split('=')
+                if len(parts) == 2:
+                    labels.append((parts[0][len(LABEL_PREFIX):], parts[1]))
+        if '[' in line:
+            if COIN_SECTION_START in line:
+                in_section = True
+                continue
+            if COIN_SECTION_END in line:
+                break
+        if in_section and '|' in line:
+            coin_rows.append(tuple(line.strip().split('|')))
+    return labels, coin_rows
+
+
+def scan_fields(content: str, fields: Sequence[Field]) -> Dict[str, object]:
+    """
+    按语法表提取字段（不解析币种区），结果等同于对每个字段执行 re.search(pattern, content)
+    没有匹配的字段值为 None
+    """
+    result = {}
+    for spec in fields:
+        match = _search(content, spec)
+        if match is None:
+            result[spec.name] = None
+        else:
+            result[spec.name] = spec.convert(match) if spec.convert else match.group(1)
+    return result
+
+
+_HOME_FIELDS_BY_NAME = {spec.name: spec for spec in HOME_FIELDS}
+
+
+def parse(content: str) -> HomeSnapshot:
+    """解析一个首页TXT文件"""
+
+    def value(*names):
+        # 按优先级取第一个匹配到的兼容格式，新格式匹配到时不再搜索旧格式
+        for name in names:
+            match = _search(content, _HOME_FIELDS_BY_NAME[name])
+            if match is not None:
+                return match
+        return None
+
+    def group(*names):
+        match = value(*names)
+        return match.group(1) if match else None
+
+    labels, coin_rows = _scan_sections(content)
+    timestamp = value('timestamp')
+    status = group('status', 'status_legacy')
+    return HomeSnapshot(
+        timestamp=_HOME_FIELDS_BY_NAME['timestamp'].convert(timestamp) if timestamp else None,
+        rush_up=int(group('rush_up', 'rush_up_legacy') or 0),
+        rush_down=int(group('rush_down', 'rush_down_legacy') or 0),
+        count=int(group('count', 'count_legacy') or 0),
+        status=status.strip() if status else '',
+        score_display=group('score_display') or '',
+        labels=tuple(labels),
+        coin_rows=tuple(coin_rows),
+    )
+
+
+def home_page_data(snapshot: HomeSnapshot) -> Dict:
+    """首页API的数据格式（原 home_data_api_v2.parse_home_data）"""
+    stats = {}
+    for key, value in snapshot.labels:
+        after_colon = value.split('：')[1] if '：' in value else value
+        if '急涨总和' in key:
+            stats['rushUp'] = after_colon
+        elif '急跌总和' in key:
+            stats['rushDown'] = after_colon
+        elif '五种状态' in key:
+            stats['status'] = after_colon
+        elif '急涨急跌比值' in key:
+            stats['ratio'] = after_colon
+        elif '绿色数量' in key:
+            stats['greenCount'] = value
+        elif '百分比' in key:
+            stats['percentage'] = value
+
+    coins = []
+    for parts in snapshot.coin_rows:
+        if len(parts) >= 16:
+            coins.append({
+                'index': parts[0],
+                'symbol': parts[1],
+                'change': parts[2],
+                'rushUp': parts[3],
+                'rushDown': parts[4],
+                'updateTime': parts[5],
+                'highPrice': parts[6],
+                'highTime': parts[7],
+                'decline': parts[8],
+                'change24h': parts[9],
+                'rank': parts[12],
+                'currentPrice': parts[13],
+                'ratio1': parts[14],
+                'ratio2': parts[15]
+            })
+
+    return {
+        'stats': stats,
+        'coins': coins,
+        'updateTime': coins[0]['updateTime'] if coins else ''
+    }
+
+
+# ----------------------------------------------------------------------
+# 批量解析
+# ----------------------------------------------------------------------
+def read_txt(path: str) -> str:
+    """读取TXT文件（Google Drive 下载的是 UTF-8，本地导出的是 GB18030）"""
+    with open(path, 'rb') as f:
+        raw = f.read()
+    try:
+        return raw.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        return raw.decode('gb18030', errors='ignore')
+
+
+def parse_file(path: str) -> Tuple[str, Optional[HomeSnapshot]]:
+    """读取并解析一个文件；读取失败返回 (path, None)"""
+    try:
+        return path, parse(read_txt(path))
+    except OSError:
+        return path, None
+
+
+def parse_files(paths: Iterable[str], workers: Optional[int] = None,
+                chunksize: int = 64) -> List[Tuple[str, Optional[HomeSnapshot]]]:
+    """
+    并行解析多个文件，结果顺序与 paths 一致
+
+    Args:
+        workers: 进程数（默认CPU核数）；1 或文件很少时在当前进程内解析
+        chunksize: 每个任务包含的文件数
+    """
+    paths = list(paths)
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < chunksize * 2:
+        return [parse_file(path) for path in paths]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(parse_file, paths, chunksize=chunksize))
+
+
+# ----------------------------------------------------------------------
+# 吞吐量测试: python home_txt_parser.py [样例文件] [文件数]
+# ----------------------------------------------------------------------
+def _search_each(content: str):
+    """原来的做法：每个字段对全文 re.search，币种区和标签各自再逐行扫描一遍"""
+    result = {spec.name: spec.pattern.search(content) for spec in HOME_FIELDS}
+    rows, in_section = [], False
+    for line in content.split('\n'):
+        if COIN_SECTION_START in line:
+            in_section = True
+        elif COIN_SECTION_END in line:
+            break
+        elif in_section and '|' in line:
+            rows.append(coin_from_parts(line.strip().split('|')))
+    labels = [line.strip().split('=') for line in content.strip().split('\n')
+              if line.strip().startswith(LABEL_PREFIX)]
+    return result, rows, labels
+
+
+def benchmark(path: str, files: int = 2000):
+    import tempfile
+    import time
+
+    content = read_txt(path)
+    for name, func in (('逐字段 re.search', _search_each), ('一遍扫描 parse()', lambda c: parse(c).coins)):
+        start = time.perf_counter()
+        for _ in range(files):
+            func(content)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20} {files / elapsed:>10.0f} 文件/秒")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(files):
+            paths.append(os.path.join(tmp, f'{i:05d}.txt'))
+            with open(paths[-1], 'w', encoding='utf-8') as f:
+                f.write(content)
+        for workers in (1, None):
+            start = time.perf_counter()
+            parse_files(paths, workers=workers)
+            elapsed = time.perf_counter() - start
+            print(f"parse_files(workers={workers or os.cpu_count()}) {files / elapsed:>10.0f} 文件/秒（含读取）")
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 2:
+        print("用法: python3 home_txt_parser.py <样例TXT文件> [文件数]")
+        sys.exit(1)
+    benchmark(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
@@ -0,0 +1,477 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+多币种批量指标重算
+一次读取多个币种的全部K线放进二维数组（每行一个币种，左对齐，末尾补 NaN），
+按列推进 SAR / RSI 的状态、用滑动窗口计算布林带，所有币种同时计算；
+SAR 象限和连续计数标签也按数组一次得出。
+结果按 (币种, 周期, 起始时间) 分区整体替换 okex_indicators_history：
+一个事务内 DELETE 分区 + executemany INSERT，不再逐行 UPDATE。
+
+第 i 根K线的指标与 calculate_indicators(klines[:i+1])（WebSocket 采集器）一致：
+RSI/SAR 从该币种第一根K线起算，前 19 根K线（不足20根）不写入。
+--since 只读取 since 之前 WARMUP_BARS 根K线作为预热，不再读全部历史：
+RSI 的 Wilder 平滑对起点的影响按 (13/14)^n 衰减，1000 根后低于浮点精度；
+SAR 在窗口内反转两次后状态与全量计算完全相同。不指定 --since 时仍读取全部历史。
+替换的分区以本次读到的最后一根K线为上界，之后（采集器先写入的）指标不删除。
+已归档到冷数据的日期不重写。
+
+用法:
+    python indicator_recalc.py                                # 全部币种、5m和1H，全量重算
+    python indicator_recalc.py --since 2025-01-01 --symbols BTC-USDT-SWAP ETH-USDT-SWAP
+    python indicator_recalc.py --since 1d --workers 4         # 最近一天，4个进程
+    python indicator_recalc.py --since 1d --warmup-bars 2000  # 加长预热窗口
+"""
+
+import argparse
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from cold_archive import INDICATORS_HISTORY_ARCHIVE, KLINE_ARCHIVE
+from db_access import get_connection, transaction
+
+TIMEFRAMES = ('5m', '1H')
+MIN_BARS = 20               # 与 calculate_indicators 相同：不足20根K线不输出
+RSI_PERIOD = 14
+BB_PERIOD = 20
+BB_DEV = 2.0
+SAR_ACCELERATION = 0.02
+SAR_MAXIMUM = 0.2
+WARMUP_BARS = 1000          # --since 时在写回起点之前读取的预热K线数
+
+# 周期 -> 每根K线的毫秒数；不在表中的周期读取全部历史
+TIMEFRAME_MS = {
+    '5m': 5 * 60 * 1000,
+    '1H': 60 * 60 * 1000,
+}
+
+BEIJING_TZ = timezone(timedelta(hours=8))
+
+HISTORY_INSERT_SQL = '''
+    INSERT OR REPLACE INTO okex_indicators_history
+    (symbol, timeframe, timestamp, current_price, rsi_14, sar, sar_position, sar_count_label,
+     bb_upper, bb_middle, bb_lower, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+HISTORY_DELETE_SQL = '''
+    DELETE FROM okex_indicators_history
+    WHERE symbol = ? AND timeframe = ? AND timestamp >= ? AND timestamp <= ?
+'''
+
+
+# ----------------------------------------------------------------------
+# 读取
+# ----------------------------------------------------------------------
+class OhlcBatch:
+    """多个币种同一周期的K线，二维数组左对齐，长度不足的行末尾为 NaN"""
+
+    def __init__(self, symbols: Sequence[str], series: Sequence[Sequence[tuple]]):
+        """
+        Args:
+            symbols: 币种
+            series: 每个币种按时间升序的 (timestamp, high, low, close)
+        """
+        self.symbols = list(symbols)
+        self.lengths = np.array([len(rows) for rows in series], dtype=np.int64)
+        width = int(self.lengths.max()) if len(series) else 0
+        self.timestamps = np.zeros((len(series), width), dtype=np.int64)
+        self.highs = np.full((len(series), width), np.nan)
+        self.lows = np.full((len(series), width), np.nan)
+        self.closes = np.full((len(series), width), np.nan)
+        for row, rows in enumerate(series):
+            if not rows:
+                continue
+            values = np.array(rows, dtype=np.float64)
+            count = len(rows)
+            self.timestamps[row, :count] = [int(item[0]) for item in rows]
+            self.highs[row, :count] = values[:, 1]
+            self.lows[row, :count] = values[:, 2]
+            self.closes[row, :count] = values[:, 3]
+
+    def __len__(self):
+        return len(self.symbols)
+
+
+def warmup_start(timeframe: str, since: Optional[int], warmup_bars: Optional[int] = WARMUP_BARS) -> Optional[int]:
+    """读取起点：since 之前 warmup_bars 根K线；未指定 since 或周期未知时为 None（全部历史）"""
+    if since is None or warmup_bars is None or timeframe not in TIMEFRAME_MS:
+        return None
+    return since - warmup_bars * TIMEFRAME_MS[timeframe]
+
+
+def load_ohlc(conn, symbols: Sequence[str], timeframe: str, start: Optional[int] = None) -> OhlcBatch:
+    """读取多个币种 timestamp >= start 的K线（okex_kline_ohlc 及其冷数据归档），start 为 None 时读取全部"""
+    series = []
+    for symbol in symbols:
+        rows = KLINE_ARCHIVE.query(conn, symbol, ('timestamp', 'high', 'low', 'close'), start=start,
+                                   where={'timeframe': timeframe})
+        series.append([row for row in rows if None not in row])
+    return OhlcBatch(symbols, series)
+
+
+def list_symbols(conn, timeframes: Sequence[str] = TIMEFRAMES) -> List[str]:
+    """okex_kline_ohlc 中出现过的币种"""
+    rows = conn.execute(f'''
+        SELECT DISTINCT symbol FROM okex_kline_ohlc
+        WHERE timeframe IN ({','.join('?' * len(timeframes))})
+        ORDER BY symbol
+    ''', list(timeframes)).fetchall()
+    return [row[0] for row in rows]
+
+
+# ----------------------------------------------------------------------
+# 批量计算（每行一个币种）
+# ----------------------------------------------------------------------
+def batch_rsi(closes: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """与 talib.RSI 相同的 Wilder RSI"""
+    rsi = np.full(closes.shape, np.nan)
+    if closes.shape[1] <= period:
+        return rsi
+    changes = np.diff(closes, axis=1)
+    gains = np.where(changes > 0, changes, 0.0)
+    losses = np.where(changes < 0, -changes, 0.0)
+
+    def value(avg_gain, avg_loss):
+        total = avg_gain + avg_loss
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result = 100.0 * (avg_gain / total)
+        return np.where((total > -1e-8) & (total < 1e-8), 0.0, result)
+
+    avg_gain = gains[:, :period].sum(axis=1) / period
+    avg_loss = losses[:, :period].sum(axis=1) / period
+    rsi[:, period] = value(avg_gain, avg_loss)
+    for column in range(period + 1, closes.shape[1]):
+        avg_gain = (avg_gain * (period - 1) + gains[:, column - 1]) / period
+        avg_loss = (avg_loss * (period - 1) + losses[:, column - 1]) / period
+        rsi[:, column] = value(avg_gain, avg_loss)
+    return rsi
+
+
+def batch_bbands(closes: np.ndarray, period: int = BB_PERIOD, dev: float = BB_DEV):
+    """与 talib.BBANDS(matype=SMA) 相同的布林带，返回 (upper, middle, lower)"""
+    upper = np.full(closes.shape, np.nan)
+    middle = np.full(closes.shape, np.nan)
+    lower = np.full(closes.shape, np.nan)
+    if closes.shape[1] < period:
+        return upper, middle, lower
+    windows = sliding_window_view(closes, period, axis=1)
+    mean = windows.mean(axis=2)
+    variance = (windows * windows).mean(axis=2) - mean * mean
+    # 滚动平方和的舍入误差可能使方差略小于 0
+    std = np.sqrt(np.maximum(variance, 0.0))
+    middle[:, period - 1:] = mean
+    upper[:, period - 1:] = mean + dev * std
+    lower[:, period - 1:] = mean - dev * std
+    return upper, middle, lower
+
+
+def batch_sar(highs: np.ndarray, lows: np.ndarray, acceleration: float = SAR_ACCELERATION,
+              maximum: float = SAR_MAXIMUM) -> np.ndarray:
+    """
+    与 talib.SAR 相同的抛物线SAR（状态机同 streaming_indicators._advance_sar），
+    按列推进，每列所有币种一起更新
+    """
+    acceleration = min(acceleration, maximum)
+    sar_out = np.full(highs.shape, np.nan)
+    if highs.shape[1] < 2:
+        return sar_out
+
+    # 第二根K线：用 1 周期 -DM 判断初始方向
+    diff_plus = highs[:, 1] - highs[:, 0]
+    diff_minus = lows[:, 0] - lows[:, 1]
+    minus_dm = np.where((diff_minus > 0) & (diff_plus < diff_minus), diff_minus, 0.0)
+    is_long = minus_dm <= 0
+    ep = np.where(is_long, highs[:, 1], lows[:, 1])
+    sar = np.where(is_long, lows[:, 0], highs[:, 0])
+    af = np.full(len(highs), acceleration)
+    prev_high, prev_low = highs[:, 0], lows[:, 0]
+
+    for column in range(1, highs.shape[1]):
+        high, low = highs[:, column], lows[:, column]
+        flip_down = is_long & (low <= sar)
+        flip_up = ~is_long & (high >= sar)
+        flip = flip_down | flip_up
+
+        # 反转：SAR 取反转前的极值点
+        flip_sar = np.where(flip_down, np.maximum(np.maximum(ep, prev_high), high),
+                            np.minimum(np.minimum(ep, prev_low), low))
+        output = np.where(flip, flip_sar, sar)
+
+        # 未反转：创新高/新低时加速
+        extend = np.where(is_long, high > ep, low < ep) & ~flip
+        ep = np.where(flip, np.where(flip_down, low, high),
+                      np.where(extend, np.where(is_long, high, low), ep))
+        af = np.where(flip, acceleration, np.where(extend, np.minimum(af + acceleration, maximum), af))
+
+        sar = output + af * (ep - output)
+        is_long = is_long ^ flip
+        sar = np.where(is_long, np.minimum(np.minimum(sar, prev_low), low),
+                       np.maximum(np.maximum(sar, prev_high), high))
+        sar_out[:, column] = output
+        prev_high, prev_low = high, low
+    return sar_out
+
+
+def sar_runs(closes: np.ndarray, sar: np.ndarray):
+    """
+    SAR 多空方向及连续周期数（与 calculate_indicators 向前数到方向改变或 SAR 为空为止相同）
+
+    Returns:
+        (bullish 布尔数组, 连续计数整数数组；SAR 为空处计数为 0)
+    """
+    valid = ~np.isnan(sar)
+    bullish = valid & (closes > sar)
+    starts = valid.copy()
+    starts[:, 1:] &= ~valid[:, :-1] | (bullish[:, 1:] != bullish[:, :-1])
+    columns = np.broadcast_to(np.arange(sar.shape[1]), sar.shape)
+    last_start = np.maximum.accumulate(np.where(starts, columns, 0), axis=1)
+    counts = np.where(valid, columns - last_start + 1, 0)
+    return bullish, counts
+
+
+def sar_quadrants(sar: np.ndarray, upper: np.ndarray, middle: np.ndarray,
+                  lower: np.ndarray) -> np.ndarray:
+    """SAR 相对布林带的象限 1-4，无法计算处为 0"""
+    quadrant = np.select([sar > upper, sar > middle, sar > lower], [1, 2, 3], 4)
+    return np.where(np.isnan(sar) | np.isnan(upper), 0, quadrant)
+
+
+def calculate_batch(batch: OhlcBatch) -> Dict[str, np.ndarray]:
+    """计算一批币种的所有指标，返回 名称 -> 二维数组"""
+    sar = batch_sar(batch.highs, batch.lows)
+    upper, middle, lower = batch_bbands(batch.closes)
+    bullish, counts = sar_runs(batch.closes, sar)
+    columns = np.arange(batch.closes.shape[1])
+    return {
+        'rsi_14': batch_rsi(batch.closes),
+        'sar': sar,
+        'bb_upper': upper,
+        'bb_middle': middle,
+        'bb_lower': lower,
+        'bullish': bullish,
+        'sar_count': counts,
+        'sar_quadrant': sar_quadrants(sar, upper, middle, lower),
+        # 每行有效的列：已有 MIN_BARS 根K线且未超出该币种长度
+        'ready': (columns >= MIN_BARS - 1) & (columns < batch.lengths[:, None]),
+    }
+
+
+def _optional(values: np.ndarray) -> list:
+    return [None if np.isnan(value) else float(value) for value in values]
+
+
+def indicator_dict(batch: OhlcBatch, results: Dict[str, np.ndarray], row: int,
+                   column: int) -> Optional[Dict]:
+    """某个币种某根K线的指标，结构与 calculate_indicators 的返回值相同"""
+    if not results['ready'][row, column]:
+        return None
+    rsi_14, sar, upper, middle, lower = _optional(np.array([
+        results[name][row, column] for name in ('rsi_14', 'sar', 'bb_upper', 'bb_middle', 'bb_lower')]))
+    if sar:
+        position = 'bullish' if results['bullish'][row, column] else 'bearish'
+        label = f"{'多头' if position == 'bullish' else '空头'}{int(results['sar_count'][row, column]):02d}"
+        quadrant = int(results['sar_quadrant'][row, column]) or None
+    else:
+        position = label = quadrant = None
+    return {
+        'current_price': float(batch.closes[row, column]),
+        'rsi_14': rsi_14,
+        'sar': sar,
+        'sar_position': position,
+        'sar_quadrant': quadrant,
+        'sar_count_label': label,
+        'bb_upper': upper,
+        'bb_middle': middle,
+        'bb_lower': lower,
+    }
+
+
+def history_rows(batch: OhlcBatch, results: Dict[str, np.ndarray], row: int, timeframe: str,
+                 start: int = 0, created_at: Optional[str] = None) -> List[tuple]:
+    """某个币种 timestamp >= start 的 okex_indicators_history 行（HISTORY_INSERT_SQL 的参数）"""
+    if created_at is None:
+        created_at = datetime.now(BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+    symbol = batch.symbols[row]
+    selected = np.flatnonzero(results['ready'][row] & (batch.timestamps[row] >= start))
+    if not len(selected):
+        return []
+
+    sar = results['sar'][row, selected]
+    has_sar = ~np.isnan(sar) & (sar != 0)
+    bullish = results['bullish'][row, selected]
+    counts = results['sar_count'][row, selected]
+    positions = [('bullish' if bull else 'bearish') if ok else None
+                 for ok, bull in zip(has_sar, bullish)]
+    labels = [f"{'多头' if bull else '空头'}{int(count):02d}" if ok else None
+              for ok, bull, count in zip(has_sar, bullish, counts)]
+    return list(zip(
+        [symbol] * len(selected),
+        [timeframe] * len(selected),
+        batch.timestamps[row, selected].tolist(),
+        batch.closes[row, selected].tolist(),
+        _optional(results['rsi_14'][row, selected]),
+        _optional(sar),
+        positions,
+        labels,
+        _optional(results['bb_upper'][row, selected]),
+        _optional(results['bb_middle'][row, selected]),
+        _optional(results['bb_lower'][row, selected]),
+        [created_at] * len(selected),
+    ))
+
+
+# ----------------------------------------------------------------------
+# 写回
+# ----------------------------------------------------------------------
+def replace_partition(db: str, symbol: str, timeframe: str, start: int, end: int,
+                      rows: Sequence[tuple]) -> int:
+    """在一个事务中替换 (symbol, timeframe, start <= timestamp <= end) 分区，返回删除的行数"""
+    with transaction(db) as conn:
+        deleted = conn.execute(HISTORY_DELETE_SQL, (symbol, timeframe, start, end)).rowcount
+        conn.executemany(HISTORY_INSERT_SQL, rows)
+    return deleted
+
+
+def _write_start(symbol: str, since: Optional[int]) -> int:
+    """写回起点：since 与冷数据已归档日期之后的较晚者"""
+    start = since or 0
+    archived_until = INDICATORS_HISTORY_ARCHIVE.archived_until(symbol)
+    if archived_until is not None:
+        start = max(start, archived_until)
+    return start
+
+
+def recalculate(db: str, symbols: Sequence[str], timeframes: Sequence[str] = TIMEFRAMES,
+                since: Optional[int] = None, dry_run: bool = False,
+                warmup_bars: Optional[int] = WARMUP_BARS) -> List[Dict]:
+    """
+    重算一组币种的指标并写回
+    指定 since 时只读取 since 之前 warmup_bars 根K线起的数据（None 表示读取全部历史）
+
+    Returns:
+        每个 (币种, 周期) 一条 {'symbol', 'timeframe', 'bars', 'deleted', 'inserted'}
+    """
+    summary = []
+    conn = get_connection(db)
+    try:
+        batches = [(timeframe, load_ohlc(conn, symbols, timeframe, warmup_start(timeframe, since, warmup_bars)))
+                   for timeframe in timeframes]
+    finally:
+        conn.close()
+
+    for timeframe, batch in batches:
+        if not batch.closes.size:
+            continue
+        results = calculate_batch(batch)
+        for row, symbol in enumerate(batch.symbols):
+            start = _write_start(symbol, since)
+            rows = history_rows(batch, results, row, timeframe, start)
+            deleted = 0
+            length = int(batch.lengths[row])
+            if not dry_run and length:
+                last_bar = int(batch.timestamps[row, length - 1])
+                deleted = replace_partition(db, symbol, timeframe, start, last_bar, rows)
+            summary.append({'symbol': symbol, 'timeframe': timeframe, 'bars': int(batch.lengths[row]),
+                            'deleted': deleted, 'inserted': len(rows)})
+    return summary
+
+
+def _recalculate_chunk(args) -> List[Dict]:
+    return recalculate(*args)
+
+
+def recalculate_parallel(db: str, symbols: Sequence[str], timeframes: Sequence[str] = TIMEFRAMES,
+                         since: Optional[int] = None, workers: int = 1,
+                         dry_run: bool = False, warmup_bars: Optional[int] = WARMUP_BARS) -> List[Dict]:
+    """按币种分组到多个进程重算（每个进程内仍按批量数组计算）"""
+    symbols = list(symbols)
+    if workers <= 1 or len(symbols) <= 1:
+        return recalculate(db, symbols, timeframes, since, dry_run, warmup_bars)
+    chunks = [symbols[index::workers] for index in range(workers)]
+    tasks = [(db, chunk, tuple(timeframes), since, dry_run, warmup_bars) for chunk in chunks if chunk]
+    summary = []
+    with ProcessPoolExecutor(max_workers=len(tasks)) as executor:
+        for part in executor.map(_recalculate_chunk, tasks):
+            summary.extend(part)
+    return summary
+
+
+# ----------------------------------------------------------------------
+# 命令行
+# ----------------------------------------------------------------------
+def parse_since(value: Optional[str], now: Optional[datetime] = None) -> Optional[int]:
+    """
+    --since 参数 -> 毫秒时间戳
+    支持毫秒时间戳、北京时间 'YYYY-MM-DD[ HH:MM[:SS]]'、相对时间 '6h' / '2d'
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    relative = re.fullmatch(r'(\d+(?:\.\d+)?)([hd])', value)
+    if relative:
+        amount = float(relative.group(1))
+        delta = timedelta(hours=amount) if relative.group(2) == 'h' else timedelta(days=amount)
+        now = now or datetime.now(BEIJING_TZ)
+        return int((now - delta).timestamp() * 1000)
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+        try:
+            moment = datetime.strptime(value, fmt).replace(tzinfo=BEIJING_TZ)
+            return int(moment.timestamp() * 1000)
+        except ValueError:
+            continue
+    raise ValueError(f'无法解析的时间: {value}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='多币种批量重算 SAR/RSI/布林带 指标')
+    parser.add_argument('--db', default='crypto_data', help='数据库名称或路径（默认 crypto_data）')
+    parser.add_argument('--symbols', nargs='+', help='只重算指定币种（默认K线表中的全部币种）')
+    parser.add_argument('--timeframes', nargs='+', default=list(TIMEFRAMES), help='周期（默认 5m 1H）')
+    parser.add_argument('--since', help="只写回该时间之后的指标：毫秒时间戳 / 'YYYY-MM-DD HH:MM' / '6h' / '2d'")
+    parser.add_argument('--warmup-bars', type=int, default=WARMUP_BARS,
+                        help=f'指定 --since 时写回起点之前读取的预热K线数（默认 {WARMUP_BARS}）')
+    parser.add_argument('--workers', type=int, default=1, help='并行进程数')
+    parser.add_argument('--dry-run', action='store_true', help='只计算不写回')
+    args = parser.parse_args()
+
+    since = parse_since(args.since)
+    symbols = args.symbols
+    if not symbols:
+        conn = get_connection(args.db)
+        try:
+            symbols = list_symbols(conn, args.timeframes)
+        finally:
+            conn.close()
+
+    print("=" * 80)
+    print("技术指标批量重算")
+    print(f"币种: {len(symbols)} 个, 周期: {args.timeframes}, 进程: {args.workers}")
+    if since:
+        print(f"写回起点: {datetime.fromtimestamp(since / 1000, BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"预热K线: {args.warmup_bars} 根")
+    print("=" * 80)
+
+    started = time.time()
+    summary = recalculate_parallel(args.db, symbols, args.timeframes, since, args.workers, args.dry_run,
+                                   args.warmup_bars)
+    for item in summary:
+        print(f"  {item['symbol']} {item['timeframe']}: {item['bars']} 根K线, "
+              f"删除 {item['deleted']} 条, 写入 {item['inserted']} 条")
+
+    print("=" * 80)
+    print(f"✅ 完成: 删除 {sum(item['deleted'] for item in summary)} 条, "
+          f"写入 {sum(item['inserted'] for item in summary)} 条, 耗时 {time.time() - started:.1f}秒")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,820 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+K线与技术指标
+K线指标、单币详情、K线图
+"""
+
+from datetime import datetime, timedelta
+import pytz
+import sqlite3
+import traceback
+
+from flask import Blueprint, jsonify, make_response, redirect, render_template, request
+
+from app_common import candle_store
+from db_access import get_connection
+from latest_state import INDICATORS_LATEST
+
+kline_bp = Blueprint('kline', __name__)
+
+# =====================================================
+# OKEx K线指标系统 API路由
+# =====================================================
+
+@kline_bp.route('/kline-indicators')
+def kline_indicators_page():
+    """K线指标系统监控页面"""
+    return render_template('kline_indicators.html')
+
+@kline_bp.route('/api/kline-indicators/latest')
+def api_kline_indicators_latest():
+    """
+    获取最新的技术指标数据
+    
+    参数：
+        - symbol: 币种（可选，如BTC-USDT-SWAP）
+        - timeframe: 时间周期（可选，5m或1h）
+    """
+    try:
+        symbol = request.args.get('symbol')
+        timeframe = request.args.get('timeframe')
+        
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 构建查询条件
+        conditions = []
+        params = []
+        
+        if symbol:
+            conditions.append('symbol = ?')
+            params.append(symbol)
+        if timeframe:
+            conditions.append('timeframe = ?')
+            params.append(timeframe)
+        
+        # 构建WHERE子句
+        where_clause = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        
+        # 获取每个币种+时间周期的最新数据（物化表）
+        cursor.execute(f'''
+            SELECT 
+                symbol, timeframe, current_price, rsi_14, 
+                sar, sar_position, sar_quadrant, sar_count_label,
+                bb_upper, bb_middle, bb_lower, record_time
+            FROM {INDICATORS_LATEST.ensure(conn)}
+            {where_clause}
+            ORDER BY symbol, timeframe
+        ''', params)
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        data = []
+        for row in rows:
+            data.append({
+                'symbol': row['symbol'],
+                'timeframe': row['timeframe'],
+                'current_price': row['current_price'],
+                'rsi_14': row['rsi_14'],
+                'sar': row['sar'],
+                'sar_position': row['sar_position'],
+                'sar_quadrant': row['sar_quadrant'],
+                'sar_count_label': row['sar_count_label'],
+                'bb_upper': row['bb_upper'],
+                'bb_middle': row['bb_middle'],
+                'bb_lower': row['bb_lower'],
+                'record_time': row['record_time']
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'count': len(data),
+            'timestamp': datetime.now(pytz.timezone('Asia/Shanghai')).strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@kline_bp.route('/api/kline-indicators/collector-status')
+def api_kline_indicators_status():
+    """获取采集器运行状态"""
+    try:
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 获取最新采集时间
+        cursor.execute('''
+            SELECT MAX(record_time) as last_collection
+            FROM okex_technical_indicators
+        ''')
+        row = cursor.fetchone()
+        last_collection = row['last_collection'] if row else None
+        
+        # 统计数据量
+        cursor.execute('SELECT COUNT(*) as count_indicators FROM okex_technical_indicators')
+        count_indicators = cursor.fetchone()['count_indicators']
+        
+        # 统计不同时间周期的数量
+        cursor.execute('''
+            SELECT 
+                SUM(CASE WHEN timeframe = '5m' THEN 1 ELSE 0 END) as count_5m,
+                SUM(CASE WHEN timeframe = '1H' THEN 1 ELSE 0 END) as count_1h
+            FROM okex_technical_indicators
+        ''')
+        row = cursor.fetchone()
+        count_5m = row['count_5m'] or 0
+        count_1h = row['count_1h'] or 0
+        
+        conn.close()
+        
+        # 计算状态（数据库存储的是北京时间）
+        if last_collection:
+            # 数据库中的时间是北京时间，需要与北京时间比较
+            import pytz
+            beijing_tz = pytz.timezone('Asia/Shanghai')
+            last_time = datetime.strptime(last_collection, '%Y-%m-%d %H:%M:%S')
+            now_beijing = datetime.now(beijing_tz).replace(tzinfo=None)
+            delta_minutes = (now_beijing - last_time).total_seconds() / 60
+            status = 'running' if delta_minutes < 10 else 'stopped'
+        else:
+            status = 'not_started'
+            delta_minutes = None
+        
+        return jsonify({
+            'success': True,
+            'status': status,
+            'last_collection_time': last_collection,
+            'minutes_since_last': round(delta_minutes, 1) if delta_minutes else None,
+            'data_counts': {
+                'kline_5m': count_5m,
+                'kline_1h': count_1h,
+                'indicators': count_indicators
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+def cleanup_expired_signals():
+    """
+    清理2小时之前的过期信号
+    将 is_valid 设置为 0
+    """
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        from datetime import datetime, timedelta
+        cutoff_time = (datetime.now() - timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        # 清理买点4过期信号
+        cursor.execute('''
+            UPDATE buy_point_4_signals
+            SET is_valid = 0
+            WHERE is_valid = 1 AND confirm_time < ?
+        ''', (cutoff_time,))
+        buy_point_4_cleaned = cursor.rowcount
+        
+        # 清理卖点1过期信号
+        cursor.execute('''
+            UPDATE sell_point_1_signals
+            SET is_valid = 0
+            WHERE is_valid = 1 AND mark_time < ?
+        ''', (cutoff_time,))
+        sell_point_1_cleaned = cursor.rowcount
+        
+        conn.commit()
+        conn.close()
+        
+        return {
+            'buy_point_4_cleaned': buy_point_4_cleaned,
+            'sell_point_1_cleaned': sell_point_1_cleaned
+        }
+    except Exception as e:
+        return {'error': str(e)}
+
+@kline_bp.route('/api/kline-indicators/signals')
+def api_kline_indicators_signals():
+    """
+    返回K线指标信号（2小时时间窗口）
+    数据完全从数据库读取，不进行实时检测
+    - 买点4: 从 buy_point_4_signals 表读取（RSI < 20）
+    - 卖点1: 从 sell_point_1_signals 表读取（RSI >= 60）
+    """
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        from datetime import datetime, timedelta
+        now = datetime.now()
+        cutoff_time = (now - timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        # 初始化信号容器
+        signals = {
+            'buy_point_4': [],      # 买点4（从数据库读取）
+            'sell_point_1': []      # 卖点1（从数据库读取）
+        }
+        
+        # 1. 读取买点4信号（不查询当前价格，使用信号时的价格）
+        cursor.execute('''
+            SELECT symbol, low_price, low_time, confirm_time, 
+                   signal_generated_at, confirm_rsi
+            FROM buy_point_4_signals
+            WHERE is_valid = 1 
+              AND confirm_rsi IS NOT NULL 
+              AND confirm_rsi < 20
+              AND confirm_time >= ?
+            ORDER BY confirm_time DESC
+            LIMIT 100
+        ''', (cutoff_time,))
+        
+        for row in cursor.fetchall():
+            signals['buy_point_4'].append({
+                'symbol': row[0],
+                'price': row[1],
+                'low_7d': row[1],
+                'low_time': row[2],
+                'confirm_time': row[3],
+                'signal_generated_at': row[4],
+                'confirm_rsi': row[5],
+                'current_price': row[1],  # 使用确认时的价格
+                'distance': 0.0  # 信号时刻距离为0
+            })
+        
+        # 2. 读取卖点1信号（不查询当前价格）
+        cursor.execute('''
+            SELECT symbol, high_price, high_time, mark_price, 
+                   mark_time, mark_rsi, signal_generated_at
+            FROM sell_point_1_signals
+            WHERE is_valid = 1 
+              AND mark_rsi IS NOT NULL 
+              AND mark_rsi >= 60
+              AND mark_time >= ?
+            ORDER BY mark_time DESC
+            LIMIT 100
+        ''', (cutoff_time,))
+        
+        for row in cursor.fetchall():
+            signals['sell_point_1'].append({
+                'symbol': row[0],
+                'high_price': row[1],
+                'high_time': row[2],
+                'mark_price': row[3],
+                'mark_time': row[4],
+                'mark_rsi': row[5],
+                'signal_generated_at': row[6],
+                'current_price': row[3],  # 使用标记时的价格
+                'distance': 0.0  # 信号时刻距离为0
+            })
+        
+        conn.close()
+        
+        # 统计信号数量
+        signal_counts = {k: len(v) for k, v in signals.items()}
+        
+        # 异步清理过期信号（不阻塞响应）
+        import threading
+        threading.Thread(target=cleanup_expired_signals, daemon=True).start()
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'signals': signals,
+                'counts': signal_counts,
+                'update_time': now.strftime('%Y-%m-%d %H:%M:%S')
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@kline_bp.route('/api/kline-indicators-tv/latest')
+def api_kline_indicators_tv_latest():
+    """
+    获取TradingView直接获取的K线指标数据（不计算）
+    支持参数: symbol, timeframe
+    数据源: TradingView (OKX交易所)
+    """
+    try:
+        symbol = request.args.get('symbol')
+        timeframe = request.args.get('timeframe')
+        
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 构建查询条件
+        conditions = []
+        params = []
+        
+        if symbol:
+            conditions.append('symbol = ?')
+            params.append(symbol)
+        if timeframe:
+            conditions.append('timeframe = ?')
+            params.append(timeframe)
+        
+        # 构建WHERE子句
+        if conditions:
+            where_clause = f"WHERE {' AND '.join(conditions)}"
+        else:
+            where_clause = ""
+        
+        # 获取每个币种+时间周期的最新数据
+        query = f'''
+            SELECT 
+                symbol, timeframe, current_price, rsi_14, 
+                sar, bb_upper, bb_middle, bb_lower,
+                ema_10, ema_20, recommendation,
+                buy_signals, sell_signals, neutral_signals,
+                record_time
+            FROM okex_tv_indicators
+            {where_clause}
+            ORDER BY symbol, timeframe
+        '''
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        
+        data = []
+        for row in rows:
+            # Calculate SAR position
+            sar_position = None
+            if row['sar'] and row['current_price']:
+                sar_position = 'bullish' if row['current_price'] > row['sar'] else 'bearish'
+            
+            # Calculate BB middle if not provided
+            bb_middle = row['bb_middle']
+            if not bb_middle and row['bb_upper'] and row['bb_lower']:
+                bb_middle = (row['bb_upper'] + row['bb_lower']) / 2
+            
+            data.append({
+                'symbol': row['symbol'],
+                'timeframe': row['timeframe'],
+                'current_price': row['current_price'],
+                'rsi_14': row['rsi_14'],
+                'sar': row['sar'],
+                'sar_position': sar_position,
+                'bb_upper': row['bb_upper'],
+                'bb_middle': bb_middle,
+                'bb_lower': row['bb_lower'],
+                'ema_10': row['ema_10'],
+                'ema_20': row['ema_20'],
+                'recommendation': row['recommendation'],
+                'buy_signals': row['buy_signals'],
+                'sell_signals': row['sell_signals'],
+                'neutral_signals': row['neutral_signals'],
+                'record_time': row['record_time'],
+                'data_source': 'TradingView (直接获取, 不计算)'
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'count': len(data),
+            'data_source': 'TradingView API (OKX Exchange)',
+            'note': '所有技术指标均直接从TradingView获取，不进行本地计算',
+            'timestamp': datetime.now(pytz.timezone('Asia/Shanghai')).strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@kline_bp.route('/api/kline-indicators-tv/collector-status')
+def api_kline_indicators_tv_status():
+    """获取TradingView指标采集器运行状态"""
+    try:
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 检查表是否存在
+        cursor.execute('''
+            SELECT name FROM sqlite_master 
+            WHERE type='table' AND name='okex_tv_collector_status'
+        ''')
+        
+        if not cursor.fetchone():
+            conn.close()
+            return jsonify({
+                'success': True,
+                'status': 'not_initialized',
+                'message': 'TradingView collector not initialized yet'
+            })
+        
+        # 获取采集状态
+        cursor.execute('''
+            SELECT last_collect_time, total_indicators_count, status
+            FROM okex_tv_collector_status
+            WHERE id = 1
+        ''')
+        
+        row = cursor.fetchone()
+        
+        # 统计数据量
+        cursor.execute('SELECT COUNT(*) FROM okex_tv_indicators')
+        count_indicators = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        status = row['status'] if row else 'stopped'
+        last_collection = row['last_collect_time'] if row else None
+        
+        return jsonify({
+            'success': True,
+            'status': status,
+            'last_collection_time': last_collection,
+            'total_indicators': count_indicators,
+            'data_source': 'TradingView (直接获取)',
+            'note': 'RSI, SAR, 布林带均直接从TradingView获取，不计算'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+# ==================== 币种详情页面 ====================
+
+@kline_bp.route('/symbol/<symbol>')
+def symbol_detail(symbol):
+    """币种详情页面 - 自动重定向到v6以避开浏览器缓存"""
+    from flask import redirect, url_for
+    return redirect(url_for('.symbol_detail_v6', symbol=symbol), code=302)
+
+@kline_bp.route('/api/symbol/<symbol>/kline')
+def api_symbol_kline(symbol):
+    """获取币种K线数据（10天）- 使用okex_technical_indicators表"""
+    from cold_archive import INDICATORS_HISTORY_ARCHIVE
+    try:
+        timeframe = request.args.get('timeframe', '5m')  # 5m 或 1H
+        
+        # 将symbol转换为标准格式
+        if not symbol.endswith('-USDT-SWAP'):
+            symbol = f"{symbol}-USDT-SWAP"
+        
+        # 转换timeframe格式: 5m -> 5m, 1h -> 1H (数据库中使用大写H)
+        db_timeframe = timeframe.upper() if timeframe == '1h' else timeframe
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 根据时间周期设置limit
+        if timeframe == '5m':
+            # 10天的5分钟K线 = 10 * 24 * 12 = 2880根
+            limit = 2880
+        else:  # 1h
+            # 10天的1小时K线 = 10 * 24 = 240根
+            limit = 240
+        
+        # 从内存K线存储获取真实的OHLC K线数据（与okex_kline_ohlc增量同步）
+        candle_store().sync(conn, symbol, db_timeframe)
+        candles = candle_store().tail(symbol, db_timeframe, limit)
+        
+        # 如果OHLC表没有数据，回退到indicators_history表
+        if candles is None:
+            rows_indicators = INDICATORS_HISTORY_ARCHIVE.query(
+                conn, symbol, ('timestamp', 'current_price'), where={'timeframe': db_timeframe},
+                descending=True, limit=limit)
+            rows_indicators.reverse()
+            kline_data = []
+            
+            for i, row in enumerate(rows_indicators):
+                timestamp = int(row[0]) if row[0] else 0
+                close_price = float(row[1]) if row[1] else 0
+                
+                # 模拟OHLC
+                open_price = close_price * (1 + 0.001 * (i % 3 - 1))
+                high_price = close_price * 1.002
+                low_price = close_price * 0.998
+                volume = close_price * 10
+                
+                kline_data.append({
+                    'timestamp': timestamp,
+                    'data': [open_price, high_price, low_price, close_price],  # 标准K线格式: OHLC
+                    'volume': volume
+                })
+        else:
+            # 使用真实OHLC数据
+            kline_data = [
+                {
+                    'timestamp': timestamp,
+                    'data': [open_price, high_price, low_price, close_price],  # 标准K线格式: OHLC
+                    'volume': volume
+                }
+                for timestamp, open_price, high_price, low_price, close_price, volume in candles.rows()
+            ]
+        
+        # 查询技术标记数据（窄幅震荡、高低点、SAR、RSI、布林带等）
+        cursor.execute('''
+            SELECT timestamp, is_narrow_range, change_percent, range_percent, consecutive_count,
+                   is_7d_high, is_7d_low, is_48h_high, is_48h_low,
+                   rsi_14, sar, sar_position, sar_quadrant, sar_count_label,
+                   bb_upper, bb_middle, bb_lower, is_buy_point_4
+            FROM kline_technical_markers
+            WHERE symbol = ? AND timeframe = ?
+            ORDER BY timestamp ASC
+        ''', (symbol, db_timeframe))
+        
+        marker_rows = cursor.fetchall()
+        markers_dict = {}
+        for marker_row in marker_rows:
+            ts = int(marker_row[0]) if marker_row[0] else 0
+            markers_dict[ts] = {
+                'is_narrow_range': bool(marker_row[1]),
+                'change_percent': float(marker_row[2]) if marker_row[2] else 0,
+                'range_percent': float(marker_row[3]) if marker_row[3] else 0,
+                'consecutive_count': int(marker_row[4]) if marker_row[4] else 0,
+                'is_7d_high': bool(marker_row[5]),
+                'is_7d_low': bool(marker_row[6]),
+                'is_48h_high': bool(marker_row[7]),
+                'is_48h_low': bool(marker_row[8]),
+                'rsi_14': float(marker_row[9]) if marker_row[9] else None,
+                'sar': float(marker_row[10]) if marker_row[10] else None,
+                'sar_position': marker_row[11],
+                'sar_quadrant': int(marker_row[12]) if marker_row[12] else None,
+                'sar_count_label': marker_row[13],
+                'bb_upper': float(marker_row[14]) if marker_row[14] else None,
+                'bb_middle': float(marker_row[15]) if marker_row[15] else None,
+                'bb_lower': float(marker_row[16]) if marker_row[16] else None,
+                'is_buy_point_4': bool(marker_row[17])
+            }
+        
+        # 将标记数据合并到K线数据中
+        for item in kline_data:
+            ts = item['timestamp']
+            if ts in markers_dict:
+                item['markers'] = markers_dict[ts]
+        
+        conn.close()
+        
+        # 创建响应对象并添加缓存头
+        response = jsonify({
+            'success': True,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'data': kline_data,
+            'count': len(kline_data)
+        })
+        
+        # 添加HTTP缓存头（缓存60秒，因为数据每60秒更新一次）
+        response.headers['Cache-Control'] = 'public, max-age=60'
+        response.headers['Vary'] = 'Accept-Encoding'
+        
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@kline_bp.route('/api/symbol/<symbol>/indicators')
+def api_symbol_indicators(symbol):
+    """获取币种技术指标数据 - 使用okex_technical_indicators表"""
+    try:
+        timeframe = request.args.get('timeframe', '5m')
+        
+        # 将symbol转换为标准格式
+        if not symbol.endswith('-USDT-SWAP'):
+            symbol = f"{symbol}-USDT-SWAP"
+        
+        # 转换timeframe格式: 5m -> 5m, 1h -> 1H
+        db_timeframe = timeframe.upper() if timeframe == '1h' else timeframe
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 设置limit
+        limit = 2880 if timeframe == '5m' else 240
+        
+        # 从okex_indicators_history表获取历史指标数据
+        cursor.execute('''
+            SELECT created_at, current_price, rsi_14, sar, sar_position, sar_count_label,
+                   bb_upper, bb_middle, bb_lower, timestamp
+            FROM okex_indicators_history
+            WHERE symbol = ? AND timeframe = ?
+            ORDER BY timestamp ASC
+            LIMIT ?
+        ''', (symbol, db_timeframe, limit))
+        
+        rows = cursor.fetchall()
+        
+        indicators = []
+        for row in rows:
+            # 使用数据库中的timestamp字段（毫秒）
+            timestamp = int(row[9]) if row[9] else 0
+            
+            indicators.append({
+                'timestamp': timestamp,
+                'price': float(row[1]) if row[1] else None,
+                'rsi': float(row[2]) if row[2] else None,
+                'sar': float(row[3]) if row[3] else None,
+                'sar_position': row[4],
+                'sar_label': row[5],
+                'bb_upper': float(row[6]) if row[6] else None,
+                'bb_middle': float(row[7]) if row[7] else None,
+                'bb_lower': float(row[8]) if row[8] else None,
+                'time_str': row[0]  # 保留时间字符串用于调试
+            })
+        
+        conn.close()
+        
+        # 创建响应对象并添加缓存头
+        response = jsonify({
+            'success': True,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'data': indicators,
+            'count': len(indicators)
+        })
+        
+        # 添加HTTP缓存头（缓存60秒，因为数据每60秒更新一次）
+        response.headers['Cache-Control'] = 'public, max-age=60'
+        response.headers['Vary'] = 'Accept-Encoding'
+        
+        return response
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@kline_bp.route('/api/symbol/<symbol>/extremes')
+def api_symbol_extremes(symbol):
+    """获取币种的48小时和7天高低点"""
+    import numpy as np
+    try:
+        from datetime import datetime, timedelta
+        
+        timeframe = request.args.get('timeframe', '5m')
+        
+        # 将symbol转换为标准格式
+        if not symbol.endswith('-USDT-SWAP'):
+            symbol = f"{symbol}-USDT-SWAP"
+        
+        # 转换timeframe格式
+        db_timeframe = timeframe.upper() if timeframe == '1h' else timeframe
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 计算时间范围（毫秒时间戳）
+        hours_48_ago_ms = int((datetime.now() - timedelta(hours=48)).timestamp() * 1000)
+        days_7_ago_ms = int((datetime.now() - timedelta(days=7)).timestamp() * 1000)
+        
+        # 从内存K线存储切片（10天窗口覆盖48小时和7天）
+        candle_store().sync(conn, symbol, db_timeframe)
+        conn.close()
+        
+        def window_extremes(start_ms):
+            """窗口内最高/最低价及其时间（并列时取最后一根）"""
+            extremes = {'high': None, 'low': None, 'high_time': None, 'low_time': None}
+            candles = candle_store().between(symbol, db_timeframe, start_ms)
+            if candles is None or not len(candles):
+                return extremes
+            last = len(candles) - 1
+            high_idx = last - int(np.argmax(candles.high[::-1]))
+            low_idx = last - int(np.argmin(candles.low[::-1]))
+            extremes['high'] = float(candles.high[high_idx])
+            extremes['high_time'] = int(candles.timestamp[high_idx])
+            extremes['low'] = float(candles.low[low_idx])
+            extremes['low_time'] = int(candles.timestamp[low_idx])
+            return extremes
+        
+        # 计算48小时和7天高低点
+        extremes_48h = window_extremes(hours_48_ago_ms)
+        extremes_7d = window_extremes(days_7_ago_ms)
+        
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'timeframe': timeframe,
+            'extremes_48h': extremes_48h,
+            'extremes_7d': extremes_7d
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@kline_bp.route('/test-chart')
+def test_chart():
+    """测试K线图渲染"""
+    with open('test_chart_render.html', 'r', encoding='utf-8') as f:
+        return f.read()
+
+# ==================== 新版本路由 - 强制刷新 ====================
+
+@kline_bp.route('/symbol/<symbol>/v6')
+def symbol_detail_v6(symbol):
+    """币种详情页面 v6.0 - 全新路由避开缓存"""
+    from datetime import datetime
+    from flask import make_response
+    
+    cache_buster = datetime.now().strftime('%Y%m%d%H%M%S')
+    response = make_response(render_template('symbol_detail_v6.html', symbol=symbol, cache_buster=cache_buster))
+    
+    # 禁用HTML页面缓存，确保每次都加载最新代码
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    
+    return response
+
+@kline_bp.route('/symbol/<symbol>/v7')
+def symbol_detail_v7(symbol):
+    """币种详情页面 v7.0 - 全新路由避开缓存，简化调试"""
+    from datetime import datetime
+    from flask import make_response
+    
+    cache_buster = datetime.now().strftime('%Y%m%d%H%M%S')
+    response = make_response(render_template('symbol_detail_v7.html', symbol=symbol, cache_buster=cache_buster))
+    
+    # 禁用HTML页面缓存，确保每次都加载最新代码
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    
+    return response
+
+@kline_bp.route('/symbol/<symbol>/v8')
+def symbol_detail_v8(symbol):
+    """币种详情页面 v8.0 - 彻底避开所有浏览器缓存"""
+    from datetime import datetime
+    from flask import make_response
+    
+    cache_buster = datetime.now().strftime('%Y%m%d%H%M%S')
+    response = make_response(render_template('symbol_detail_v8.html', symbol=symbol, cache_buster=cache_buster))
+    
+    # 最强缓存禁用策略
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    
+    return response
+
+@kline_bp.route('/kline/<symbol>')
+def kline_chart(symbol):
+    """全新的K线图路由 - 完全独立的地址"""
+    from datetime import datetime
+    from flask import make_response
+    
+    cache_buster = datetime.now().strftime('%Y%m%d%H%M%S')
+    response = make_response(render_template('kline_chart.html', symbol=symbol, cache_buster=cache_buster))
+    
+    # 强制禁用所有缓存
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    
+    return response
+
+@kline_bp.route('/test-xlm-data')
+def test_xlm_data():
+    """XLM数据诊断测试页"""
+    return render_template('test_xlm_data.html')
+
+@kline_bp.route('/chart/<symbol>')
+def chart_new(symbol):
+    """全新K线图 - 从零开始，简单清晰"""
+    from datetime import datetime
+    from flask import make_response
+    
+    cache_buster = datetime.now().strftime('%Y%m%d%H%M%S')
+    response = make_response(render_template('chart_new.html', symbol=symbol, cache_buster=cache_buster))
+    
+    # 强制禁用所有缓存
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    
+    return response
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+"每个币种最新一行"物化表
+历史表 <table> 旁边维护一张 <table>_latest，每个键（如 symbol 或 symbol+timeframe）只保留一行。
+由触发器维护，与历史表的写入在同一事务内生效，所有采集器（包括直接用 sqlite3 写入的）无需改动。
+
+API读取"最新"数据时查询 <table>_latest，代价只与币种数有关，不再对整张历史表
+执行 WHERE id IN (SELECT MAX(id) ... GROUP BY symbol)。
+
+用法:
+    COIN_LATEST = LatestTable('crypto_coin_data', ('symbol',), 'id')
+    table = COIN_LATEST.ensure(conn)    # 首次使用时建表、回填、创建触发器
+    cursor.execute(f'SELECT ... FROM {table}')
+
+也可以预先安装:
+    python latest_state.py
+"""
+
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Sequence
+
+from db_access import get_connection
+
+# 触发器版本：触发器逻辑变化时递增，旧版本会被重建
+TRIGGER_VERSION = 1
+
+
+class LatestTable:
+    """一张历史表的"最新一行"物化表"""
+
+    def __init__(self, table: str, keys: Sequence[str], order: str):
+        """
+        Args:
+            table: 历史表名
+            keys: 分组键（每个键值保留一行）
+            order: 排序列，值最大（相同时最后写入）的一行为最新
+        """
+        self.table = table
+        self.keys = tuple(keys)
+        self.order = order
+        self.name = f'{table}_latest'
+        self._installed = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _db_key(conn) -> str:
+        return conn.execute('PRAGMA database_list').fetchone()[2]
+
+    def _columns(self, conn, table: str) -> List[tuple]:
+        # (名称, 类型)
+        return [(row[1], row[2]) for row in conn.execute(f'PRAGMA table_info({table})').fetchall()]
+
+    def _trigger_names(self) -> List[str]:
+        return [f'{self.name}_{op}_v{TRIGGER_VERSION}' for op in ('ai', 'au', 'ad')]
+
+    def _is_current(self, conn, columns: List[tuple]) -> bool:
+        if [name for name, _ in self._columns(conn, self.name)] != [name for name, _ in columns]:
+            return False
+        names = self._trigger_names()
+        placeholders = ','.join('?' * len(names))
+        count = conn.execute(f'''
+            SELECT COUNT(*) FROM sqlite_master
+            WHERE type = 'trigger' AND tbl_name = ? AND name IN ({placeholders})
+        ''', [self.table] + names).fetchone()[0]
+        return count == len(names)
+
+    def _match(self, alias: str) -> str:
+        # IS 而不是 =，键为 NULL 时也能匹配
+        return ' AND '.join(f'{key} IS {alias}.{key}' for key in self.keys)
+
+    def _refresh_sql(self, columns: str, alias: str) -> str:
+        """重新计算某个键的最新行（只在最新行被修改/删除时执行）"""
+        return f'''
+            DELETE FROM {self.name} WHERE {self._match(alias)};
+            INSERT INTO {self.name} ({columns})
+                SELECT {columns} FROM {self.table} WHERE {self._match(alias)}
+                ORDER BY {self.order} DESC, rowid DESC LIMIT 1;
+        '''
+
+    def _install(self, conn, columns: List[tuple]):
+        names = [name for name, _ in columns]
+        column_list = ', '.join(names)
+        column_defs = ', '.join(f'{name} {col_type}' for name, col_type in columns)
+        newer = (f'NEW.{self.order} >= COALESCE((SELECT {self.order} FROM {self.name} '
+                 f'WHERE {self._match("NEW")}), NEW.{self.order})')
+        is_latest = (f'EXISTS (SELECT 1 FROM {self.name} '
+                     f'WHERE {self._match("OLD")} AND {self.order} IS OLD.{self.order})')
+        insert_trigger, update_trigger, delete_trigger = self._trigger_names()
+
+        for row in conn.execute('''
+            SELECT name FROM sqlite_master
+            WHERE type = 'trigger' AND tbl_name = ? AND name LIKE ?
+        ''', (self.table, f'{self.name}_%')).fetchall():
+            conn.execute(f'DROP TRIGGER IF EXISTS {row[0]}')
+        conn.execute(f'DROP TABLE IF EXISTS {self.name}')
+        conn.execute(f'CREATE TABLE {self.name} ({column_defs}, PRIMARY KEY ({", ".join(self.keys)}))')
+
+        # 回填：SQLite 的 MAX() 聚合会让同一行的其他列取自最大值所在的行
+        key_list = ', '.join(self.keys)
+        conn.execute(f'''
+            INSERT INTO {self.name} ({column_list})
+            SELECT {column_list} FROM (
+                SELECT {column_list}, MAX({self.order}) AS _latest_order
+                FROM {self.table}
+                GROUP BY {key_list}
+            )
+        ''')
+
+        values = ', '.join(f'NEW.{name}' for name in names)
+        conn.execute(f'''
+            CREATE TRIGGER {insert_trigger} AFTER INSERT ON {self.table}
+            WHEN {newer}
+            BEGIN
+                DELETE FROM {self.name} WHERE {self._match("NEW")};
+                INSERT INTO {self.name} ({column_list}) VALUES ({values});
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER {update_trigger} AFTER UPDATE ON {self.table}
+            WHEN {is_latest} OR {newer}
+            BEGIN
+                {self._refresh_sql(column_list, 'OLD')}
+                {self._refresh_sql(column_list, 'NEW')}
+            END
+        ''')
+        conn.execute(f'''
+            CREATE TRIGGER {delete_trigger} AFTER DELETE ON {self.table}
+            WHEN {is_latest}
+            BEGIN
+                {self._refresh_sql(column_list, 'OLD')}
+            END
+        ''')
+
+    def ensure(self, conn) -> str:
+        """
+        确保物化表和触发器存在且与历史表的列一致，返回物化表名
+        每个数据库文件在本进程内只检查一次
+        """
+        db_key = self._db_key(conn)
+        if db_key in self._installed:
+            return self.name
+
+        with self._lock:
+            if db_key in self._installed:
+                return self.name
+            columns = self._columns(conn, self.table)
+            if not columns:
+                raise sqlite3.OperationalError(f'no such table: {self.table}')
+            if not self._is_current(conn, columns):
+                # 建表、回填、建触发器在同一个写事务内，期间的写入不会遗漏
+                if not conn.in_transaction:
+                    conn.execute('BEGIN IMMEDIATE')
+                try:
+                    columns = self._columns(conn, self.table)
+                    if not self._is_current(conn, columns):
+                        self._install(conn, columns)
+                    conn.commit()
+                except Exception:
+                    conn.rollback()
+                    raise
+            self._installed.add(db_key)
+        return self.name
+
+    def clear(self):
+        with self._lock:
+            self._installed.clear()
+
+
+# 各数据库中需要"最新一行"的历史表
+SUPPORT_RESISTANCE_LATEST = LatestTable('support_resistance_levels', ('symbol',), 'record_time')
+COIN_DATA_LATEST = LatestTable('crypto_coin_data', ('symbol',), 'id')
+INDICATORS_LATEST = LatestTable('okex_technical_indicators', ('symbol', 'timeframe'), 'record_time')
+KLINE_LATEST = LatestTable('okex_kline_ohlc', ('symbol', 'timeframe'), 'timestamp')
+POSITION_SYSTEM_LATEST = LatestTable('position_system', ('symbol',), 'id')
+SAR_SLOPE_LATEST = LatestTable('sar_slope_data', ('symbol',), 'timestamp')
+FUND_MONITOR_LATEST = LatestTable('fund_monitor_aggregated', ('symbol', 'interval_type'), 'timestamp')
+
+# 数据库名称 -> 其中的物化表
+LATEST_TABLES: Dict[str, Sequence[LatestTable]] = {
+    'crypto_data': (SUPPORT_RESISTANCE_LATEST, COIN_DATA_LATEST, INDICATORS_LATEST,
+                    POSITION_SYSTEM_LATEST, SAR_SLOPE_LATEST),
+    'support_resistance': (SUPPORT_RESISTANCE_LATEST, KLINE_LATEST),
+    'sar_slope': (SAR_SLOPE_LATEST,),
+    'fund_monitor': (FUND_MONITOR_LATEST,),
+}
+
+
+def install_all(databases: Optional[Sequence[str]] = None) -> Dict[str, List[str]]:
+    """安装所有物化表（历史表不存在的跳过）"""
+    result = {}
+    for db in databases or LATEST_TABLES:
+        conn = get_connection(db)
+        try:
+            installed = []
+            for latest in LATEST_TABLES[db]:
+                try:
+                    installed.append(latest.ensure(conn))
+                except sqlite3.OperationalError as e:
+                    print(f"⚠️ {db}.{latest.table}: {e}")
+            result[db] = installed
+        finally:
+            conn.close()
+    return result
+
+
+if __name__ == '__main__':
+    for db, tables in install_all().items():
+        print(f"✅ {db}: {', '.join(tables) or '无'}")
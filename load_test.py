@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+看板接口压测
+多个轮询者并发循环请求看板接口，可同时持续发送慢的交易操作，
+输出每个接口的 p50 / p90 / p99 / 最大延迟、吞吐量和错误数
+
+用法:
+    python load_test.py                                         # 默认 50 个轮询者压测 30 秒
+    python load_test.py --url http://127.0.0.1:5000 --pollers 100 --duration 60 \\
+        --path /api/homepage/summary --path /api/sar-slope/status
+    # 同时用 4 个并发持续发送交易操作，观察看板延迟是否受影响
+    python load_test.py --action POST:/api/anchor/maintain-sub-account --action-concurrency 4
+"""
+
+import argparse
+import http.client
+import json
+import math
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+DEFAULT_PATHS = (
+    '/api/homepage/summary',
+    '/api/star-system/data',
+    '/api/sar-slope/status',
+    '/api/cache/stats',
+)
+
+
+def percentile(sorted_values: Sequence[float], pct: float) -> float:
+    """最近秩百分位（输入已排序）"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _request(host: str, port: int, method: str, path: str, body: Optional[bytes], timeout: float):
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        headers = {'Content-Type': 'application/json'} if body is not None else {}
+        conn.request(method, path, body=body, headers=headers)
+        response = conn.getresponse()
+        response.read()
+        return response.status
+    finally:
+        conn.close()
+
+
+def run_load(base_url: str, paths: Sequence[str] = DEFAULT_PATHS, pollers: int = 50, duration: float = 30.0,
+             actions: Sequence[str] = (), action_concurrency: int = 0, action_body: str = '{}',
+             timeout: float = 30.0) -> Dict:
+    """
+    Args:
+        base_url: 服务地址，如 http://127.0.0.1:5000
+        paths: 轮询的看板接口（GET）
+        pollers: 并发轮询者数量，每个轮询者依次循环请求 paths
+        duration: 压测时长（秒）
+        actions: 'METHOD:PATH' 形式的交易操作，由 action_concurrency 个线程持续发送
+        action_body: 交易操作的 JSON 请求体
+
+    Returns:
+        {'duration', 'endpoints': {名称: {count, errors, rps, p50_ms, p90_ms, p99_ms, max_ms}}}
+    """
+    parts = urlsplit(base_url)
+    host, port = parts.hostname, parts.port or 80
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def loop(requests, offset):
+        i = offset
+        while time.monotonic() < deadline:
+            name, method, path, body = requests[i % len(requests)]
+            i += 1
+            started = time.perf_counter()
+            try:
+                ok = _request(host, port, method, path, body, timeout) < 500
+            except (OSError, http.client.HTTPException):
+                ok = False
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies[name].append(elapsed)
+                if not ok:
+                    errors[name] += 1
+
+    poll_requests = [(f'GET {path}', 'GET', path, None) for path in paths]
+    action_requests = []
+    for action in actions:
+        method, _, path = action.partition(':')
+        action_requests.append((f'{method.upper()} {path}', method.upper(), path, action_body.encode()))
+
+    threads = [threading.Thread(target=loop, args=(poll_requests, i), daemon=True) for i in range(pollers)]
+    if action_requests:
+        threads += [threading.Thread(target=loop, args=(action_requests, i), daemon=True)
+                    for i in range(action_concurrency)]
+    started = time.monotonic()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - started
+
+    endpoints = {}
+    for name, values in latencies.items():
+        values.sort()
+        endpoints[name] = {
+            'count': len(values),
+            'errors': errors[name],
+            'rps': round(len(values) / elapsed, 1),
+            'p50_ms': round(percentile(values, 50), 2),
+            'p90_ms': round(percentile(values, 90), 2),
+            'p99_ms': round(percentile(values, 99), 2),
+            'max_ms': round(values[-1], 2),
+        }
+    return {'duration': round(elapsed, 2), 'endpoints': endpoints}
+
+
+def print_report(result: Dict):
+    print(f"\n压测时长 {result['duration']}s")
+    print(f"{'接口':<50}{'请求数':>8}{'错误':>6}{'rps':>8}{'p50ms':>10}{'p90ms':>10}{'p99ms':>10}{'maxms':>10}")
+    for name, stats in sorted(result['endpoints'].items()):
+        print(f"{name:<50}{stats['count']:>8}{stats['errors']:>6}{stats['rps']:>8}"
+              f"{stats['p50_ms']:>10}{stats['p90_ms']:>10}{stats['p99_ms']:>10}{stats['max_ms']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='看板接口压测（p50/p99 延迟）')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='服务地址')
+    parser.add_argument('--path', action='append', help='轮询的接口，可重复；默认首页常用接口')
+    parser.add_argument('--pollers', type=int, default=50, help='并发轮询者数量')
+    parser.add_argument('--duration', type=float, default=30.0, help='压测时长（秒）')
+    parser.add_argument('--action', action='append', default=[], help='同时发送的交易操作 METHOD:PATH，可重复')
+    parser.add_argument('--action-concurrency', type=int, default=2, help='交易操作并发数')
+    parser.add_argument('--action-body', default='{}', help='交易操作的 JSON 请求体')
+    parser.add_argument('--timeout', type=float, default=30.0, help='单个请求超时（秒）')
+    parser.add_argument('--json', action='store_true', help='以 JSON 输出结果')
+    args = parser.parse_args()
+
+    result = run_load(args.url, args.path or DEFAULT_PATHS, args.pollers, args.duration,
+                      args.action, args.action_concurrency if args.action else 0, args.action_body, args.timeout)
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,2552 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+首页与行情数据
+首页、查询、图表、时间线、恐慌指数、统计等接口
+"""
+
+from datetime import datetime, timedelta
+import os
+import pytz
+import sqlite3
+import traceback
+
+from flask import Blueprint, jsonify, make_response, render_template, render_template_string, request
+
+from app_common import BEIJING_TZ, SNAPSHOT_SOURCES, cached_response
+from db_access import get_connection
+from windowed_query import TimeWindowQuery
+
+market_bp = Blueprint('market', __name__)
+
+# K线图服务URL配置
+CHART_BASE_URL = "https://5000-iz6uddj6rs3xe48ilsyqq-2e1b9533.sandbox.novita.ai"
+
+# 按时间窗口分页（索引范围查询，见 windowed_query）
+SNAPSHOT_WINDOW = TimeWindowQuery('crypto_snapshots', 'snapshot_time', 'idx_snapshot_time')
+
+# 主页面HTML - 完全仿照参考设计
+MAIN_HTML = """
+<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>加密货币数据历史回看</title>
+    <script src="https://cdn.jsdelivr.net/npm/echarts@5.4.3/dist/echarts.min.js"></script>
+    <style>
+        * {
+            margin: 0;
+            padding: 0;
+            box-sizing: border-box;
+        }
+        
+        body {
+            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'PingFang SC', 'Hiragino Sans GB', 'Microsoft YaHei', sans-serif;
+            background: #1e2139;
+            color: #fff;
+            overflow-x: hidden;
+        }
+        
+        .container {
+            max-width: 100%;
+            margin: 0 auto;
+            padding: 0;
+        }
+        
+        /* 顶部导航栏 */
+        .top-nav {
+            background: #2a2d47;
+            padding: 12px 20px;
+            display: flex;
+            align-items: center;
+            gap: 15px;
+            box-shadow: 0 2px 8px rgba(0,0,0,0.3);
+            justify-content: space-between;
+        }
+        
+        .nav-left {
+            display: flex;
+            align-items: center;
+            gap: 15px;
+        }
+        
+        .nav-right {
+            display: flex;
+            gap: 10px;
+        }
+        
+        /* 系统导航栏 */
+        .systems-nav {
+            background: linear-gradient(135deg, #2a2d47 0%, #3a3d5c 100%);
+            padding: 15px 20px;
+            border-bottom: 2px solid #3b7dff;
+            display: flex;
+            gap: 10px;
+            flex-wrap: wrap;
+            align-items: center;
+        }
+        
+        .systems-nav-title {
+            font-size: 14px;
+            font-weight: 600;
+            color: #8b92b8;
+            margin-right: 10px;
+        }
+        
+        .system-link {
+            background: rgba(59, 125, 255, 0.1);
+            border: 1px solid rgba(59, 125, 255, 0.3);
+            color: #00d4ff;
+            padding: 8px 16px;
+            border-radius: 6px;
+            font-size: 13px;
+            font-weight: 500;
+            cursor: pointer;
+            transition: all 0.3s ease;
+            text-decoration: none;
+            display: inline-flex;
+            align-items: center;
+            gap: 6px;
+        }
+        
+        .system-link:hover {
+            background: rgba(59, 125, 255, 0.2);
+            border-color: #3b7dff;
+            transform: translateY(-2px);
+            box-shadow: 0 4px 12px rgba(59, 125, 255, 0.3);
+        }
+        
+        .system-link.featured {
+            background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+            border: none;
+            color: #fff;
+        }
+        
+        .system-link.featured:hover {
+            background: linear-gradient(135deg, #764ba2 0%, #667eea 100%);
+        }
+        
+        .home-btn {
+            background: linear-gradient(135deg, #00d4ff 0%, #0099ff 100%);
+            color: #fff;
+            border: none;
+            padding: 8px 20px;
+            border-radius: 6px;
+            font-size: 14px;
+            font-weight: 500;
+            cursor: pointer;
+            transition: all 0.3s ease;
+            display: flex;
+            align-items: center;
+            gap: 6px;
+        }
+        
+        .home-btn:hover {
+            background: linear-gradient(135deg, #0099ff 0%, #00d4ff 100%);
+            transform: translateY(-2px);
+            box-shadow: 0 4px 12px rgba(0, 212, 255, 0.4);
+        }
+        
+        .nav-brand {
+            display: flex;
+            align-items: center;
+            gap: 8px;
+            background: #3b7dff;
+            padding: 6px 15px;
+            border-radius: 6px;
+            font-size: 14px;
+            font-weight: 500;
+        }
+        
+        .nav-title {
+            font-size: 18px;
+            font-weight: 500;
+            color: #fff;
+            margin-left: 10px;
+        }
+        
+        /* 控制栏 */
+        .control-bar {
+            background: #2a2d47;
+            padding: 15px 20px;
+            display: flex;
+            align-items: center;
+            gap: 15px;
+            flex-wrap: wrap;
+            border-bottom: 1px solid #3a3d5c;
+        }
+        
+        .control-group {
+            display: flex;
+            align-items: center;
+            gap: 8px;
+        }
+        
+        .control-label {
+            color: #8b92b8;
+            font-size: 13px;
+        }
+        
+        .control-input {
+            background: #1e2139;
+            border: 1px solid #3a3d5c;
+            color: #fff;
+            padding: 6px 12px;
+            border-radius: 4px;
+            font-size: 13px;
+            outline: none;
+        }
+        
+        .control-input:focus {
+            border-color: #3b7dff;
+        }
+        
+        .control-btn {
+            background: #3b7dff;
+            border: none;
+            color: white;
+            padding: 7px 18px;
+            border-radius: 4px;
+            font-size: 13px;
+            cursor: pointer;
+            transition: all 0.3s;
+        }
+        
+        .control-btn:hover {
+            background: #2563eb;
+        }
+        
+        .control-btn.secondary {
+            background: #4a5178;
+        }
+        
+        .control-btn.secondary:hover {
+            background: #5a6188;
+        }
+        
+        /* 数据统计栏 */
+        .stats-bar {
+            background: #2a2d47;
+            padding: 12px 20px;
+            display: flex;
+            gap: 25px;
+            flex-wrap: wrap;
+            border-bottom: 1px solid #3a3d5c;
+            font-size: 13px;
+        }
+        
+        .stat-item {
+            display: flex;
+            gap: 5px;
+        }
+        
+        .stat-label {
+            color: #8b92b8;
+        }
+        
+        .stat-value {
+            color: #fff;
+            font-weight: 500;
+            margin-left: 8px;
+        }
+        
+        .stat-value.rise {
+            color: #10b981;
+        }
+        
+        .stat-value.fall {
+            color: #ef4444;
+        }
+        
+        /* 次级统计栏 */
+        .secondary-stats {
+            background: #1e2139;
+            padding: 10px 20px;
+            display: flex;
+            gap: 20px;
+            flex-wrap: wrap;
+            font-size: 13px;
+        }
+        
+        /* 时间轴容器 - 竖直布局 */
+        .timeline-container {
+            background: #2a2d47;
+            padding: 15px 20px;
+            border-top: 1px solid #3a3d5c;
+            max-height: 500px;  /* 增加高度以显示更多信息 */
+            overflow-y: auto;
+        }
+        
+        .timeline-header {
+            display: flex;
+            justify-content: space-between;
+            align-items: center;
+            margin-bottom: 15px;
+            position: sticky;
+            top: 0;
+            background: #2a2d47;
+            padding-bottom: 10px;
+            border-bottom: 1px solid #3a3d5c;
+        }
+        
+        .timeline-title {
+            color: #8b92b8;
+            font-size: 13px;
+            font-weight: 500;
+        }
+        
+        .timeline-info {
+            color: #3b7dff;
+            font-size: 12px;
+        }
+        
+        /* 竖直时间轴轨道 */
+        .timeline-track {
+            position: relative;
+            padding-left: 30px;
+            margin-top: 10px;
+        }
+        
+        /* 竖直线 */
+        .timeline-line {
+            position: absolute;
+            left: 15px;
+            top: 0;
+            bottom: 0;
+            width: 2px;
+            background: #3a3d5c;
+        }
+        
+        /* 竖直排列的时间点容器 */
+        .timeline-points {
+            display: flex;
+            flex-direction: column;
+            gap: 20px;  /* 增加间距以容纳更多信息 */
+        }
+        
+        /* 时间点项 */
+        .timeline-point {
+            position: relative;
+            display: flex;
+            align-items: flex-start;  /* 改为顶部对齐，适应多行内容 */
+            cursor: pointer;
+            padding: 10px 12px;  /* 增加padding */
+            border-radius: 4px;
+            transition: all 0.3s;
+            min-height: 80px;  /* 最小高度确保显示多行信息 */
+        }
+        
+        .timeline-point:hover {
+            background: rgba(59, 125, 255, 0.1);
+        }
+        
+        /* 时间点圆圈 */
+        .timeline-point::before {
+            content: '';
+            position: absolute;
+            left: -22px;
+            width: 12px;
+            height: 12px;
+            background: #3b7dff;
+            border: 2px solid #2a2d47;
+            border-radius: 50%;
+            transition: all 0.3s;
+            z-index: 2;
+        }
+        
+        .timeline-point:hover::before {
+            width: 16px;
+            height: 16px;
+            left: -24px;
+            background: #2563eb;
+            box-shadow: 0 0 10px rgba(59, 125, 255, 0.5);
+        }
+        
+        .timeline-point.active::before {
+            background: #10b981;
+            width: 16px;
+            height: 16px;
+            left: -24px;
+            box-shadow: 0 0 8px rgba(16, 185, 129, 0.5);
+        }
+        
+        /* 时间标签 */
+        .timeline-label {
+            color: #8b92b8;
+            font-size: 12px;
+            display: flex;
+            flex-direction: column;
+            gap: 2px;
+        }
+        
+        .timeline-point:hover .timeline-label {
+            color: #fff;
+        }
+        
+        .timeline-point.active .timeline-label {
+            color: #10b981;
+            font-weight: 500;
+        }
+        
+        .timeline-label-time {
+            font-size: 13px;
+            font-weight: 500;
+        }
+        
+        .timeline-label-stats {
+            font-size: 11px;
+            opacity: 0.85;
+            line-height: 1.5;
+            color: #a0aec0;
+            max-width: 600px;  /* 限制最大宽度 */
+        }
+        
+        .timeline-label-stats div {
+            white-space: nowrap;
+            overflow: hidden;
+            text-overflow: ellipsis;
+        }
+        
+        /* 图表区域 */
+        .chart-section {
+            background: #2a2d47;
+            margin: 0;
+            padding: 20px;
+        }
+        
+        .chart-title {
+            color: #8b92b8;
+            font-size: 14px;
+            margin-bottom: 15px;
+            text-align: center;
+        }
+        
+        #mainChart {
+            width: 100%;
+            height: 450px;  /* 增加高度，让图表更清晰 */
+        }
+        
+        /* 数据列表标题 */
+        .data-list-header {
+            background: #2a2d47;
+            padding: 12px 20px;
+            color: #3b7dff;
+            font-size: 14px;
+            font-weight: 500;
+            display: flex;
+            align-items: center;
+            gap: 8px;
+        }
+        
+        /* 表格容器 */
+        .table-container {
+            background: #1e2139;
+            overflow-x: auto;
+        }
+        
+        /* 数据表格 */
+        .data-table {
+            width: 100%;
+            border-collapse: collapse;
+            font-size: 12px;
+        }
+        
+        .data-table thead {
+            background: #ef4444;
+            position: sticky;
+            top: 0;
+            z-index: 10;
+        }
+        
+        .data-table th {
+            padding: 10px 8px;
+            text-align: center;
+            font-weight: 500;
+            color: #fff;
+            border-right: 1px solid #dc2626;
+            white-space: nowrap;
+        }
+        
+        .data-table tbody tr {
+            border-bottom: 1px solid #2a2d47;
+        }
+        
+        .data-table tbody tr:hover {
+            background: #2a2d47;
+        }
+        
+        .data-table td {
+            padding: 8px 6px;
+            text-align: center;
+            border-right: 1px solid #2a2d47;
+            white-space: nowrap;
+        }
+        
+        /* 操作列 */
+        .action-btn {
+            background: #ef4444;
+            border: none;
+            color: white;
+            padding: 4px 10px;
+            border-radius: 3px;
+            font-size: 11px;
+            cursor: pointer;
+            font-weight: 500;
+        }
+        
+        .action-btn:hover {
+            background: #dc2626;
+        }
+        
+        /* 币种名称 */
+        .coin-symbol {
+            font-weight: 600;
+            color: #fff;
+        }
+        
+        /* 数值颜色 */
+        .value-positive {
+            color: #ef4444;
+        }
+        
+        .value-negative {
+            color: #10b981;
+        }
+        
+        .value-neutral {
+            color: #8b92b8;
+        }
+        
+        /* 状态标签 */
+        .status-tag {
+            display: inline-block;
+            padding: 2px 6px;
+            border-radius: 3px;
+            font-size: 11px;
+        }
+        
+        .status-tag.rise {
+            background: #dc2626;
+            color: white;
+        }
+        
+        .status-tag.fall {
+            background: #10b981;
+            color: white;
+        }
+        
+        /* 优先级颜色 */
+        .priority-1 { color: #ff0000; font-weight: bold; }
+        .priority-2 { color: #ff6600; font-weight: bold; }
+        .priority-3 { color: #ff9900; }
+        .priority-4 { color: #ffcc00; }
+        .priority-5 { color: #99cc00; }
+        .priority-6 { color: #8b92b8; }
+        
+        /* 加载状态 */
+        .loading {
+            text-align: center;
+            padding: 40px;
+            color: #8b92b8;
+            font-size: 14px;
+        }
+        
+        /* 响应式 */
+        @media (max-width: 768px) {
+            .control-bar {
+                flex-direction: column;
+                align-items: stretch;
+            }
+            
+            .stats-bar {
+                flex-direction: column;
+                gap: 10px;
+            }
+            
+            .data-table {
+                font-size: 11px;
+            }
+            
+            .data-table th,
+            .data-table td {
+                padding: 6px 4px;
+            }
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <!-- 顶部导航 -->
+        <div class="top-nav">
+            <div class="nav-left">
+                <div class="nav-brand">
+                    <span>📊</span> 数据回看
+                </div>
+                <div class="nav-title">加密货币数据历史回看</div>
+            </div>
+            <div class="nav-right">
+                <button class="home-btn" onclick="window.location.href='/'">
+                    <span>🏠</span> 返回首页
+                </button>
+            </div>
+        </div>
+        
+        <!-- 系统导航栏 -->
+        <div class="systems-nav">
+            <div class="systems-nav-title">快速访问:</div>
+            <a href="/sar-slope" class="system-link featured">
+                <span>📈</span> SAR斜率系统
+            </a>
+            <a href="/kline-indicators" class="system-link">
+                <span>📊</span> K线指标系统
+            </a>
+            <a href="/support-resistance" class="system-link">
+                <span>📉</span> 支撑阻力系统
+            </a>
+            <a href="/position-system" class="system-link">
+                <span>💼</span> 仓位系统
+            </a>
+            <a href="/gdrive-monitor-status" class="system-link">
+                <span>☁️</span> Google Drive监控
+            </a>
+            <a href="/crypto-index" class="system-link">
+                <span>📈</span> 指数系统
+            </a>
+            <a href="/coin-pool" class="system-link">
+                <span>🏊</span> 币池系统
+            </a>
+            <a href="/price-comparison" class="system-link">
+                <span>💱</span> 比价系统
+            </a>
+            <a href="/fund-monitor" class="system-link featured">
+                <span>💰</span> 资金监控系统
+            </a>
+        </div>
+        
+        <!-- 控制栏 -->
+        <div class="control-bar">
+            <div class="control-group">
+                <span class="control-label">选项日期:</span>
+                <input type="date" id="queryDate" class="control-input">
+            </div>
+            
+            <div class="control-group">
+                <span class="control-label">时间选择:</span>
+                <input type="time" id="queryTime" class="control-input" value="00:00">
+            </div>
+            
+            <div class="control-group">
+                <span class="control-label">至</span>
+                <input type="time" id="endTime" class="control-input" value="23:59">
+            </div>
+            
+            <button class="control-btn" onclick="queryData()">🔍 查询</button>
+            <button class="control-btn secondary" onclick="loadToday()">📊 今天</button>
+            <button class="control-btn secondary" onclick="loadLatest()">📡 立即加载</button>
+            <button class="control-btn secondary" onclick="batchImportData()" id="batchImportBtn">📥 批量导入今日数据</button>
+        </div>
+        
+        <!-- 主要统计栏 -->
+        <div class="stats-bar">
+            <div class="stat-item">
+                <span class="stat-label">运算时间:</span>
+                <span class="stat-value" id="calcTime">2025-12-06 13:42:42</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">急涨:</span>
+                <span class="stat-value rise" id="rushUp">1</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">急跌:</span>
+                <span class="stat-value fall" id="rushDown">22</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">本轮急涨:</span>
+                <span class="stat-value" id="roundRushUp">1</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">本轮急跌:</span>
+                <span class="stat-value" id="roundRushDown">22</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">计次:</span>
+                <span class="stat-value" id="countTimes">10</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">计次得分:</span>
+                <span class="stat-value" id="countScore">☆☆☆</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">状态:</span>
+                <span class="stat-value" id="status">震荡无序</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">比值:</span>
+                <span class="stat-value" id="ratio">10</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">差值:</span>
+                <span class="stat-value" id="diff">-21</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">比价最低:</span>
+                <span class="stat-value" id="priceLowest">0</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">比价创新高:</span>
+                <span class="stat-value" id="priceNewhigh">0</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">24h涨≥10%:</span>
+                <span class="stat-value rise" id="rise24hCount">0</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">24h跌≤-10%:</span>
+                <span class="stat-value fall" id="fall24hCount">0</span>
+            </div>
+
+        </div>
+        
+        <!-- 次级统计栏 -->
+        <div class="secondary-stats">
+            <div class="stat-item">
+                <span class="stat-label">已回调历史: 无</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">回调天数: 168 秒/0次</span>
+            </div>
+            <div class="stat-item">
+                <span class="stat-label">时间偏限: 2025-12-04 10:22:00 ~ 2025-12-04 18:32:00</span>
+            </div>
+        </div>
+        
+        <!-- 图表区域 -->
+        <div class="chart-section">
+            <div class="chart-header" style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+                <div class="chart-title">急涨/急跌历史趋势图</div>
+                <div class="chart-pagination" style="display: flex; gap: 10px; align-items: center;">
+                    <span id="chartTimeRange" style="color: #8b92b8; font-size: 12px;"></span>
+                    <button id="btnPrevPage" class="page-btn" style="padding: 5px 12px; background: #3a3d5c; color: #8b92b8; border: 1px solid #4a4d6c; border-radius: 4px; cursor: pointer;" disabled>
+                        ◀ 上一页
+                    </button>
+                    <span id="chartPageInfo" style="color: #8b92b8; font-size: 12px;">第1页</span>
+                    <button id="btnNextPage" class="page-btn" style="padding: 5px 12px; background: #3a3d5c; color: #8b92b8; border: 1px solid #4a4d6c; border-radius: 4px; cursor: pointer;" disabled>
+                        下一页 ▶
+                    </button>
+                </div>
+            </div>
+            <div id="mainChart"></div>
+        </div>
+        
+        <!-- 时间轴 - 放在图表下方 -->
+        <div class="timeline-container">
+            <div class="timeline-header">
+                <span class="timeline-title">历史数据时间轴</span>
+                <span class="timeline-info" id="timelineInfo">加载中...</span>
+            </div>
+            <div class="timeline-track">
+                <div class="timeline-line"></div>
+                <div id="timelinePoints" class="timeline-points"></div>
+            </div>
+        </div>
+        
+        <!-- 数据列表标题 -->
+        <div class="data-list-header">
+            <span>📋</span> 币列表
+        </div>
+        
+        <!-- 数据表格 -->
+        <div class="table-container">
+            <table class="data-table">
+                <thead>
+                    <tr>
+                        <th>优先级</th>
+                        <th>序号</th>
+                        <th>币名</th>
+                        <th>涨跌</th>
+                        <th>急涨</th>
+                        <th>急跌</th>
+                        <th>更新时间</th>
+                        <th>历史高点</th>
+                        <th>高点时间</th>
+                        <th>跌幅</th>
+                        <th>24h%</th>
+                        <th>排行</th>
+                        <th>当前价格</th>
+                        <th>最高占比</th>
+                        <th>最低占比</th>
+                    </tr>
+                </thead>
+                <tbody id="dataTableBody">
+                    <tr>
+                        <td colspan="15" class="loading">正在加载数据...</td>
+                    </tr>
+                </tbody>
+            </table>
+        </div>
+    </div>
+
+    <script>
+        // 初始化图表
+        const chart = echarts.init(document.getElementById('mainChart'));
+        
+        // 初始化日期
+        const today = new Date();
+        document.getElementById('queryDate').valueAsDate = today;
+        
+        // 图表配置
+        function updateChart(data) {
+            const option = {
+                backgroundColor: 'transparent',
+                grid: {
+                    left: '50px',
+                    right: '50px',
+                    bottom: '120px',  // 增加底部空间给旋转的横轴标签
+                    top: '50px',
+                    containLabel: true
+                },
+                tooltip: {
+                    trigger: 'axis',  // 改为axis触发，显示同一时间点所有数据
+                    backgroundColor: 'rgba(0, 0, 0, 0.9)',
+                    borderColor: '#3a3d5c',
+                    borderWidth: 1,
+                    textStyle: { color: '#fff', fontSize: 12 },
+                    axisPointer: {
+                        type: 'cross',
+                        crossStyle: {
+                            color: '#8b92b8'
+                        }
+                    },
+                    formatter: function(params) {
+                        if (!params || params.length === 0) return '';
+                        const time = params[0].axisValue;
+                        let html = `<div style="padding: 8px;">
+                            <div style="font-weight: bold; margin-bottom: 8px; font-size: 13px; border-bottom: 1px solid #3a3d5c; padding-bottom: 5px;">${time}</div>`;
+                        
+                        params.forEach(item => {
+                            html += `<div style="margin-top: 5px; display: flex; align-items: center; justify-content: space-between; gap: 15px;">
+                                <span style="display: flex; align-items: center;">
+                                    <span style="display: inline-block; width: 10px; height: 10px; border-radius: 50%; background-color: ${item.color}; margin-right: 8px;"></span>
+                                    ${item.seriesName}
+                                </span>
+                                <span style="color: ${item.color}; font-weight: bold;">${item.value}</span>
+                            </div>`;
+                        });
+                        
+                        html += '</div>';
+                        return html;
+                    }
+                },
+                legend: {
+                    data: ['急涨', '急跌', '差值(急涨-急跌)', '计次'],
+                    top: 10,
+                    left: 'center',
+                    textStyle: { color: '#8b92b8', fontSize: 13 },
+                    itemWidth: 30,
+                    itemHeight: 14,
+                    itemGap: 20
+                },
+                xAxis: {
+                    type: 'category',
+                    data: data.times || [],
+                    axisLine: { 
+                        lineStyle: { color: '#3a3d5c', width: 1 }
+                    },
+                    axisLabel: { 
+                        color: '#8b92b8',
+                        fontSize: 10,
+                        rotate: 45,  // 旋转45度，避免重叠
+                        interval: 0,  // 显示所有标签
+                        margin: 12,
+                        align: 'right',  // 右对齐
+                        verticalAlign: 'middle'
+                    },
+                    axisTick: {
+                        show: true,
+                        lineStyle: { color: '#3a3d5c' }
+                    },
+                    splitLine: { 
+                        show: true,  // 显示分隔线
+                        lineStyle: {
+                            color: '#3a3d5c',
+                            type: 'solid',  // 实线
+                            width: 1,
+                            opacity: 0.3
+                        }
+                    }
+                },
+                yAxis: [
+                    {
+                        type: 'value',
+                        name: '数量',
+                        nameTextStyle: { 
+                            color: '#8b92b8', 
+                            fontSize: 12,
+                            padding: [0, 0, 0, 10]
+                        },
+                        axisLine: { 
+                            show: true,
+                            lineStyle: { color: '#3a3d5c' } 
+                        },
+                        axisLabel: { 
+                            color: '#8b92b8', 
+                            fontSize: 11 
+                        },
+                        splitLine: { 
+                            lineStyle: { 
+                                color: '#3a3d5c', 
+                                type: 'dashed',
+                                opacity: 0.5
+                            } 
+                        }
+                    },
+                    {
+                        type: 'value',
+                        name: '计次',
+                        nameTextStyle: { 
+                            color: '#3b7dff', 
+                            fontSize: 12,
+                            padding: [0, 10, 0, 0]
+                        },
+                        axisLine: { 
+                            show: true,
+                            lineStyle: { color: '#3a3d5c' } 
+                        },
+                        axisLabel: { 
+                            color: '#3b7dff', 
+                            fontSize: 11 
+                        },
+                        splitLine: { show: false }
+                    }
+                ],
+                series: [
+                    {
+                        name: '急涨',
+                        type: 'line',
+                        data: data.rush_up || [],
+                        smooth: true,
+                        connectNulls: true,  // 连接所有数据点，形成连续线段
+                        lineStyle: {
+                            width: 3,
+                            color: '#ef4444'
+                        },
+                        itemStyle: { 
+                            color: '#ef4444',
+                            borderColor: '#fff',
+                            borderWidth: 2
+                        },
+                        symbolSize: 8,
+                        emphasis: {
+                            scale: true,
+                            scaleSize: 12
+                        }
+                    },
+                    {
+                        name: '急跌',
+                        type: 'line',
+                        data: data.rush_down || [],
+                        smooth: true,
+                        connectNulls: true,  // 连接所有数据点，形成连续线段
+                        lineStyle: {
+                            width: 3,
+                            color: '#10b981'
+                        },
+                        itemStyle: { 
+                            color: '#10b981',
+                            borderColor: '#fff',
+                            borderWidth: 2
+                        },
+                        symbolSize: 8,
+                        emphasis: {
+                            scale: true,
+                            scaleSize: 12
+                        }
+                    },
+                    {
+                        name: '差值(急涨-急跌)',
+                        type: 'line',
+                        data: data.diff || [],
+                        smooth: true,
+                        connectNulls: true,  // 连接所有数据点，形成连续线段
+                        lineStyle: {
+                            width: 3,
+                            color: '#fbbf24'
+                        },
+                        itemStyle: { 
+                            color: '#fbbf24',
+                            borderColor: '#fff',
+                            borderWidth: 2
+                        },
+                        symbolSize: 8,
+                        emphasis: {
+                            scale: true,
+                            scaleSize: 12
+                        }
+                    },
+                    {
+                        name: '计次',
+                        type: 'line',
+                        yAxisIndex: 1,
+                        data: data.count || [],
+                        smooth: true,
+                        connectNulls: true,  // 连接所有数据点，形成连续线段
+                        lineStyle: {
+                            width: 3,
+                            color: '#3b7dff'
+                        },
+                        itemStyle: { 
+                            color: '#3b7dff',
+                            borderColor: '#fff',
+                            borderWidth: 2
+                        },
+                        symbolSize: 8,
+                        emphasis: {
+                            scale: true,
+                            scaleSize: 12
+                        }
+                    }
+                ]
+            };
+            
+            chart.setOption(option);
+        }
+        
+        // 查询数据
+        function queryData() {
+            const date = document.getElementById('queryDate').value;
+            const time = document.getElementById('queryTime').value;
+            const datetime = date + ' ' + time;
+            
+            fetch('/api/query?time=' + encodeURIComponent(datetime))
+                .then(response => response.json())
+                .then(data => {
+                    if (data.error) {
+                        alert('❌ ' + data.error);
+                        return;
+                    }
+                    updateUI(data);
+                    loadChartData();  // 加载所有历史数据趋势图
+                })
+                .catch(error => {
+                    alert('查询失败: ' + error);
+                });
+        }
+        
+        // 加载今天
+        function loadToday() {
+            const today = new Date();
+            document.getElementById('queryDate').valueAsDate = today;
+            queryData();
+        }
+        
+        // 加载最新
+        function loadLatest() {
+            fetch('/api/latest')
+                .then(response => response.json())
+                .then(data => {
+                    if (data.error) {
+                        alert('❌ ' + data.error);
+                        return;
+                    }
+                    updateUI(data);
+                    loadChartData();  // 加载所有历史数据趋势图
+                })
+                .catch(error => {
+                    alert('加载失败: ' + error);
+                });
+        }
+        
+        // 批量导入今日数据
+        function batchImportData() {
+            const btn = document.getElementById('batchImportBtn');
+            const originalText = btn.innerHTML;
+            
+            // 禁用按钮并显示加载状态
+            btn.disabled = true;
+            btn.innerHTML = '⏳ 正在批量导入...';
+            btn.style.opacity = '0.6';
+            btn.style.cursor = 'not-allowed';
+            
+            fetch('/api/query/batch-import', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json'
+                }
+            })
+            .then(response => response.json())
+            .then(data => {
+                if (data.success) {
+                    const stats = data.stats;
+                    let message = `✅ 批量导入完成！\n\n`;
+                    message += `📊 统计结果：\n`;
+                    message += `   总文件数: ${stats.total}\n`;
+                    message += `   ✅ 成功导入: ${stats.success}\n`;
+                    message += `   ℹ️  已存在: ${stats.exists}\n`;
+                    if (stats.invalid > 0) {
+                        message += `   ⚠️  无效数据: ${stats.invalid}\n`;
+                    }
+                    if (stats.error > 0) {
+                        message += `   ❌ 失败: ${stats.error}\n`;
+                    }
+                    
+                    alert(message);
+                    
+                    // 如果有新数据导入，则刷新页面数据
+                    if (stats.success > 0) {
+                        loadToday();
+                    }
+                } else {
+                    alert('❌ 批量导入失败: ' + data.error);
+                }
+            })
+            .catch(error => {
+                alert('❌ 批量导入失败: ' + error);
+            })
+            .finally(() => {
+                // 恢复按钮状态
+                btn.disabled = false;
+                btn.innerHTML = originalText;
+                btn.style.opacity = '1';
+                btn.style.cursor = 'pointer';
+            });
+        }
+        
+        // 加载涨跌速数据
+        function loadPriceSpeedData() {
+            fetch('/api/price-speed/latest')
+                .then(response => response.json())
+                .then(response => {
+                    if (response.success && response.data) {
+                        const data = response.data;
+                        
+                        // 统计各级别数量
+                        const upCount = data.filter(coin => 
+                            coin.alert_level && coin.alert_level.includes('up') && coin.alert_level !== 'normal'
+                        ).length;
+                        
+                        const downCount = data.filter(coin => 
+                            coin.alert_level && coin.alert_level.includes('down') && coin.alert_level !== 'normal'
+                        ).length;
+                        
+                        const normalCount = data.filter(coin => 
+                            coin.alert_level === 'normal'
+                        ).length;
+                        
+                        // 更新UI (已移除急涨速、急跌速、正常统计)
+                    }
+                })
+                .catch(err => {
+                    console.error('加载涨跌速数据失败:', err);
+                    // 如果失败，显示默认值 (已移除急涨速、急跌速、正常统计)
+                });
+        }
+        
+        // 更新UI
+        function updateUI(data) {
+            document.getElementById('calcTime').textContent = data.snapshot_time;
+            document.getElementById('rushUp').textContent = data.rush_up;
+            document.getElementById('rushDown').textContent = data.rush_down;
+            document.getElementById('roundRushUp').textContent = data.round_rush_up || data.rush_up;
+            document.getElementById('roundRushDown').textContent = data.round_rush_down || data.rush_down;
+            document.getElementById('countTimes').textContent = data.count;
+            document.getElementById('countScore').textContent = data.count_score_display || '---';
+            document.getElementById('status').textContent = data.status;
+            document.getElementById('ratio').textContent = data.ratio;
+            document.getElementById('diff').textContent = data.diff;
+            document.getElementById('priceLowest').textContent = data.price_lowest || 0;
+            document.getElementById('priceNewhigh').textContent = data.price_newhigh || 0;
+            document.getElementById('rise24hCount').textContent = data.rise_24h_count || 0;
+            document.getElementById('fall24hCount').textContent = data.fall_24h_count || 0;
+            
+            // 加载涨跌速数据
+            loadPriceSpeedData();
+            
+            // 更新表格
+            const tbody = document.getElementById('dataTableBody');
+            if (data.coins && data.coins.length > 0) {
+                let html = '';
+                data.coins.forEach((coin, idx) => {
+                    const changeClass = coin.change > 0 ? 'value-positive' : (coin.change < 0 ? 'value-negative' : 'value-neutral');
+                    const change24Class = coin.change_24h > 0 ? 'value-positive' : (coin.change_24h < 0 ? 'value-negative' : 'value-neutral');
+                    const priority = coin.priority || '未知';
+                    const priorityClass = 'priority-' + priority.replace('等级', '');
+                    
+                    const rushUpTag = coin.rush_up > 0 ? '<span class="status-tag rise">' + coin.rush_up + '</span>' : coin.rush_up;
+                    const rushDownTag = coin.rush_down > 0 ? '<span class="status-tag fall">' + coin.rush_down + '</span>' : coin.rush_down;
+                    
+                    html += '<tr>';
+                    html += '<td class="' + priorityClass + '">' + priority + '</td>';
+                    html += '<td>' + (idx + 1) + '</td>';
+                    html += '<td class="coin-symbol">' + coin.symbol + '</td>';
+                    html += '<td class="' + changeClass + '">' + coin.change.toFixed(2) + '</td>';
+                    html += '<td>' + rushUpTag + '</td>';
+                    html += '<td>' + rushDownTag + '</td>';
+                    html += '<td>' + coin.update_time + '</td>';
+                    html += '<td>' + coin.high_price.toFixed(2) + '</td>';
+                    html += '<td>' + coin.high_time + '</td>';
+                    html += '<td class="value-negative">' + coin.decline.toFixed(2) + '</td>';
+                    html += '<td class="' + change24Class + '">' + coin.change_24h.toFixed(2) + '</td>';
+                    html += '<td>' + coin.rank + '</td>';
+                    html += '<td>' + coin.current_price.toFixed(4) + '</td>';
+                    html += '<td>' + (coin.ratio1 || 'N/A') + '</td>';
+                    html += '<td>' + (coin.ratio2 || 'N/A') + '</td>';
+                    html += '</tr>';
+                });
+                tbody.innerHTML = html;
+            } else {
+                tbody.innerHTML = '<tr><td colspan="15" class="loading">暂无数据</td></tr>';
+            }
+        }
+        
+        // 加载图表数据
+        // 当前页码（全局变量）
+        let currentPage = 0;
+        
+        function loadChartData(page = 0) {
+            // 加载指定页的历史数据点（12小时/页，显示所有数据点）
+            currentPage = page;
+            fetch(`/api/chart?page=${page}`)
+                .then(response => response.json())
+                .then(data => {
+                    if (data.error) {
+                        console.error(data.error);
+                        return;
+                    }
+                    updateChart(data);
+                    
+                    // 更新分页信息
+                    document.getElementById('chartPageInfo').textContent = 
+                        `第${page + 1}/${data.total_pages}页`;
+                    document.getElementById('chartTimeRange').textContent = 
+                        `${data.time_range.start} - ${data.time_range.end}`;
+                    
+                    // 更新按钮状态
+                    document.getElementById('btnPrevPage').disabled = !data.has_prev;
+                    document.getElementById('btnNextPage').disabled = !data.has_next;
+                })
+                .catch(error => {
+                    console.error('图表加载失败:', error);
+                });
+        }
+        
+        // 翻页按钮事件
+        document.addEventListener('DOMContentLoaded', function() {
+            document.getElementById('btnPrevPage').addEventListener('click', function() {
+                loadChartData(currentPage + 1);  // 上一页（更早的数据）
+            });
+            
+            document.getElementById('btnNextPage').addEventListener('click', function() {
+                loadChartData(currentPage - 1);  // 下一页（更新的数据）
+            });
+        });
+        
+        // 页面加载时自动加载最新数据
+        // 加载时间轴数据 - 竖直布局
+        function loadTimeline() {
+            fetch('/api/timeline')
+                .then(response => response.json())
+                .then(data => {
+                    if (data.error) {
+                        document.getElementById('timelineInfo').textContent = data.error;
+                        return;
+                    }
+                    
+                    document.getElementById('timelineInfo').textContent = 
+                        `共 ${data.snapshots.length} 个数据点`;
+                    
+                    const pointsContainer = document.getElementById('timelinePoints');
+                    pointsContainer.innerHTML = '';
+                    
+                    // 时间从上到下：最早的在上面，最新的在下面
+                    data.snapshots.forEach((snapshot, index) => {
+                        const point = document.createElement('div');
+                        point.className = 'timeline-point';
+                        point.setAttribute('data-time', snapshot.snapshot_time);
+                        
+                        // 最后一个（最新的）标记为激活
+                        if (index === data.snapshots.length - 1) {
+                            point.classList.add('active');
+                        }
+                        
+                        const label = document.createElement('div');
+                        label.className = 'timeline-label';
+                        
+                        // 时间显示
+                        const timeSpan = document.createElement('div');
+                        timeSpan.className = 'timeline-label-time';
+                        timeSpan.textContent = snapshot.snapshot_time;
+                        
+                        // 统计信息显示 - 显示所有关键字段
+                        const statsSpan = document.createElement('div');
+                        statsSpan.className = 'timeline-label-stats';
+                        
+                        // 第一行：急涨、急跌、计次、得分
+                        const line1 = `急涨:${snapshot.rush_up} 急跌:${snapshot.rush_down} 计次:${snapshot.count} ${snapshot.count_score_display || ''}`;
+                        
+                        // 第二行：状态、比值、差值
+                        const line2 = `状态:${snapshot.status || ''} 比值:${snapshot.ratio || 0} 差值:${snapshot.diff}`;
+                        
+                        // 第三行：本轮、比价、24h
+                        const line3 = `本轮急涨:${snapshot.round_rush_up || 0} 本轮急跌:${snapshot.round_rush_down || 0} 24h涨≥10%:${snapshot.rise_24h_count || 0} 24h跌≤-10%:${snapshot.fall_24h_count || 0}`;
+                        
+                        statsSpan.innerHTML = `
+                            <div style="margin-bottom: 2px;">${line1}</div>
+                            <div style="margin-bottom: 2px;">${line2}</div>
+                            <div>${line3}</div>
+                        `;
+                        
+                        label.appendChild(timeSpan);
+                        label.appendChild(statsSpan);
+                        point.appendChild(label);
+                        
+                        point.onclick = function() {
+                            // 移除所有激活状态
+                            document.querySelectorAll('.timeline-point').forEach(p => {
+                                p.classList.remove('active');
+                            });
+                            // 激活当前点
+                            this.classList.add('active');
+                            // 加载数据
+                            loadSnapshotData(snapshot.snapshot_time);
+                        };
+                        
+                        pointsContainer.appendChild(point);
+                    });
+                })
+                .catch(error => {
+                    console.error('加载时间轴失败:', error);
+                    document.getElementById('timelineInfo').textContent = '加载失败';
+                });
+        }
+        
+        // 加载指定快照的数据
+        function loadSnapshotData(snapshotTime) {
+            fetch('/api/query?time=' + encodeURIComponent(snapshotTime))
+                .then(response => response.json())
+                .then(data => {
+                    if (data.error) {
+                        alert(data.error);
+                        return;
+                    }
+                    updateUI(data);
+                    updateChart(data);
+                    
+                    // 更新时间轴激活状态
+                    document.querySelectorAll('.timeline-point').forEach(point => {
+                        point.classList.remove('active');
+                    });
+                    event.target.classList.add('active');
+                })
+                .catch(error => console.error('加载数据失败:', error));
+        }
+        
+        window.onload = function() {
+            loadLatest();
+            loadTimeline();
+        };
+        
+        // 响应式调整
+        window.addEventListener('resize', function() {
+            chart.resize();
+        });
+    </script>
+</body>
+</html>
+"""
+
+# API路由保持不变，使用之前的代码
+@market_bp.route('/')
+def index():
+    """首页 - 功能导航"""
+    return render_template('index.html')
+
+@market_bp.route('/query')
+def query_page():
+    """历史数据查询页面"""
+    return render_template_string(MAIN_HTML)
+
+@market_bp.route('/chart')
+def chart_page():
+    """趋势图表页面"""
+    return render_template_string(MAIN_HTML)
+
+@market_bp.route('/timeline')
+def timeline_page():
+    """时间轴页面"""
+    return render_template_string(MAIN_HTML)
+
+@market_bp.route('/status')
+def status_page():
+    """系统状态页面"""
+    return render_template('status.html')
+
+@market_bp.route('/panic')
+def panic_page():
+    """恐慌清洗指数页面"""
+    return render_template('panic_new.html')
+
+@market_bp.route('/api/panic/latest')
+def api_panic_latest():
+    """恐慌清洗指数最新数据API"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 使用新的 panic_wash_index 表
+        cursor.execute('''
+            SELECT record_time, panic_index, hour_24_people, total_position, 
+                   hour_1_amount, hour_24_amount
+            FROM panic_wash_index 
+            ORDER BY record_time DESC 
+            LIMIT 1
+        ''')
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        if row:
+            panic_index_percentage = row[1]  # 百分比形式（如 8.67）
+            # 如果是整数就不显示小数部分，否则保留2位小数
+            panic_index = int(panic_index_percentage) if panic_index_percentage == int(panic_index_percentage) else round(panic_index_percentage, 2)
+            
+            people_wan = round(row[2] / 10000, 2)  # 人 -> 万人（去掉4个0）
+            position_yi = round(row[3] / 100000000, 2)  # 美元 -> 亿美元（去掉8个0 = 除以1亿）
+            hour_1_amount_usd = row[4]  # 1小时爆仓金额（美元）
+            hour_24_amount_usd = row[5]  # 24小时爆仓金额（美元）
+            
+            # 单位转换：美元 -> 万美元
+            hour_1_amount_wan = round(hour_1_amount_usd / 10000, 2)  # 美元 -> 万美元（去掉4个0）
+            hour_24_amount_wan = round(hour_24_amount_usd / 10000, 2)  # 美元 -> 万美元（去掉4个0）
+            
+            # 根据恐慌指数确定等级（现在使用百分比形式判断：8.67% 在低恐慌范围）
+            if panic_index_percentage < 5:
+                panic_level = '低恐慌'
+                level_color = 'green'
+            elif panic_index_percentage < 10:
+                panic_level = '中度恐慌'
+                level_color = 'yellow'
+            else:
+                panic_level = '高度恐慌'
+                level_color = 'red'
+            
+            return jsonify({
+                'success': True,
+                'data': {
+                    'record_time': row[0],
+                    'panic_index': panic_index,
+                    'panic_level': panic_level,
+                    'level_color': level_color,
+                    'hour_24_people': people_wan,
+                    'total_position': position_yi,
+                    'hour_1_amount': hour_1_amount_wan,  # 返回万美元
+                    'hour_24_amount': hour_24_amount_wan,  # 返回万美元
+                    'market_zone': f'{people_wan}万人/{position_yi}亿美元'
+                }
+            })
+        else:
+            return jsonify({'success': False, 'error': '暂无数据'})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@market_bp.route('/api/stats')
+def api_stats():
+    """统计数据API - 包含本轮急涨急跌和恐慌清洗指数"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 总记录数
+        cursor.execute("SELECT COUNT(*) FROM crypto_snapshots")
+        total_records = cursor.fetchone()[0]
+        
+        # 今日记录数
+        today = datetime.now(BEIJING_TZ).date().strftime('%Y-%m-%d')
+        cursor.execute("SELECT COUNT(*) FROM crypto_snapshots WHERE snapshot_date = ?", (today,))
+        today_records = cursor.fetchone()[0]
+        
+        # 数据天数
+        cursor.execute("SELECT COUNT(DISTINCT snapshot_date) FROM crypto_snapshots")
+        data_days = cursor.fetchone()[0]
+        
+        # 获取最新两条记录用于计算本轮差值
+        cursor.execute("""
+            SELECT snapshot_time, rush_up, rush_down, round_rush_up, round_rush_down
+            FROM crypto_snapshots
+            ORDER BY snapshot_date DESC, snapshot_time DESC
+            LIMIT 2
+        """)
+        latest_records = cursor.fetchall()
+        
+        last_update_time = '-'
+        current_round_rush_up = 0
+        current_round_rush_down = 0
+        
+        if latest_records and len(latest_records) >= 1:
+            # snapshot_time 格式: "2025-12-10 16:35:00", 提取时间部分 HH:MM
+            time_str = latest_records[0][0]
+            if time_str:
+                # 如果包含日期，提取时间部分（格式：YYYY-MM-DD HH:MM:SS）
+                if ' ' in time_str:
+                    last_update_time = time_str.split(' ')[1][:5]  # 提取 HH:MM
+                else:
+                    # 如果只有时间（格式：HH:MM:SS）
+                    last_update_time = time_str[:5]
+            else:
+                last_update_time = '-'
+            current_rush_up = latest_records[0][1]
+            current_rush_down = latest_records[0][2]
+            
+            if len(latest_records) >= 2:
+                prev_rush_up = latest_records[1][1]
+                prev_rush_down = latest_records[1][2]
+                
+                # 本轮急涨 = 当前急涨 - 上一轮急涨
+                current_round_rush_up = current_rush_up - prev_rush_up
+                # 本轮急跌 = 当前急跌 - 上一轮急跌
+                current_round_rush_down = current_rush_down - prev_rush_down
+        
+        # 获取恐慌清洗指数（从新的独立采集表）
+        cursor.execute("""
+            SELECT panic_index, hour_24_people, total_position, record_time
+            FROM panic_wash_index
+            ORDER BY record_time DESC
+            LIMIT 1
+        """)
+        panic_data = cursor.fetchone()
+        
+        panic_indicator = '-'
+        panic_color = 'gray'
+        panic_trend_rating = 0
+        panic_market_zone = '-'
+        panic_people_wan = 0
+        panic_position_yi = 0
+        
+        if panic_data:
+            panic_indicator = panic_data[0]  # 恐慌指数（百分比）
+            panic_people_wan = round(panic_data[1] / 10000, 2)  # 爆仓人数（万人）
+            panic_position_yi = round(panic_data[2] / 100000000, 2)  # 持仓量（亿美元）
+            
+            # 根据恐慌指数设置颜色（现在是百分比形式：如8.67%）
+            if panic_indicator < 5:
+                panic_color = '绿'  # 低恐慌（<5%）
+            elif panic_indicator < 10:
+                panic_color = '黄'  # 中恐慌（5-10%）
+            else:
+                panic_color = '红'  # 高恐慌（>10%）
+            
+            # 市场区间描述
+            panic_market_zone = f"{panic_people_wan}万人/{panic_position_yi}亿美元"
+        
+        conn.close()
+        
+        return jsonify({
+            'total_records': total_records,
+            'today_records': today_records,
+            'data_days': data_days,
+            'last_update_time': last_update_time,
+            'current_round_rush_up': current_round_rush_up,
+            'current_round_rush_down': current_round_rush_down,
+            'panic_indicator': panic_indicator,
+            'panic_color': panic_color,
+            'panic_trend_rating': panic_trend_rating,
+            'panic_market_zone': panic_market_zone
+        })
+    except Exception as e:
+        return jsonify({
+            'total_records': 0,
+            'today_records': 0,
+            'data_days': 0,
+            'last_update_time': '-',
+            'current_round_rush_up': 0,
+            'current_round_rush_down': 0,
+            'panic_indicator': '-',
+            'panic_color': 'gray',
+            'panic_trend_rating': 0,
+            'panic_market_zone': '-',
+            'error': str(e)
+        })
+
+@market_bp.route('/api/homepage/summary')
+@cached_response(max_age=30, sources=SNAPSHOT_SOURCES)
+def api_homepage_summary():
+    """首页聚合数据API - 一次返回所有首页需要的数据"""
+    try:
+        result = {
+            'success': True,
+            'timestamp': datetime.now(BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+        }
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 1. 统计栏数据（本轮急涨急跌和恐慌指数）
+        cursor.execute("SELECT COUNT(*) FROM crypto_snapshots")
+        total_records = cursor.fetchone()[0]
+        
+        today = datetime.now(BEIJING_TZ).date().strftime('%Y-%m-%d')
+        cursor.execute("SELECT COUNT(*) FROM crypto_snapshots WHERE snapshot_date = ?", (today,))
+        today_records = cursor.fetchone()[0]
+        
+        cursor.execute("""
+            SELECT snapshot_time, rush_up, rush_down
+            FROM crypto_snapshots
+            ORDER BY snapshot_date DESC, snapshot_time DESC
+            LIMIT 2
+        """)
+        latest_records = cursor.fetchall()
+        
+        last_update_time = '-'
+        current_round_rush_up = 0
+        current_round_rush_down = 0
+        
+        if latest_records and len(latest_records) >= 1:
+            time_str = latest_records[0][0]
+            if time_str and ' ' in time_str:
+                last_update_time = time_str.split(' ')[1][:5]
+            current_rush_up = latest_records[0][1]
+            current_rush_down = latest_records[0][2]
+            
+            if len(latest_records) >= 2:
+                prev_rush_up = latest_records[1][1]
+                prev_rush_down = latest_records[1][2]
+                current_round_rush_up = current_rush_up - prev_rush_up
+                current_round_rush_down = current_rush_down - prev_rush_down
+        
+        cursor.execute("""
+            SELECT panic_index, hour_24_people, total_position
+            FROM panic_wash_index
+            ORDER BY record_time DESC
+            LIMIT 1
+        """)
+        panic_data = cursor.fetchone()
+        
+        panic_indicator = '-'
+        panic_color = 'gray'
+        panic_market_zone = '-'
+        
+        if panic_data:
+            panic_indicator = panic_data[0]
+            panic_people_wan = round(panic_data[1] / 10000, 2)
+            panic_position_yi = round(panic_data[2] / 100000000, 2)
+            
+            if panic_indicator < 5:
+                panic_color = '绿'
+            elif panic_indicator < 10:
+                panic_color = '黄'
+            else:
+                panic_color = '红'
+            
+            panic_market_zone = f"{panic_people_wan}万人/{panic_position_yi}亿美元"
+        
+        result['stats'] = {
+            'total_records': total_records,
+            'today_records': today_records,
+            'last_update_time': last_update_time,
+            'current_round_rush_up': current_round_rush_up,
+            'current_round_rush_down': current_round_rush_down,
+            'panic_indicator': panic_indicator,
+            'panic_color': panic_color,
+            'panic_market_zone': panic_market_zone
+        }
+        
+        # 2. 模块统计数据
+        cursor.execute("SELECT MIN(snapshot_date), MAX(snapshot_date) FROM crypto_snapshots")
+        date_range = cursor.fetchone()
+        data_days = 0
+        if date_range and date_range[0] and date_range[1]:
+            data_days = (datetime.strptime(date_range[1], '%Y-%m-%d') - 
+                        datetime.strptime(date_range[0], '%Y-%m-%d')).days + 1
+        
+        cursor.execute("SELECT MAX(snapshot_time) FROM crypto_snapshots")
+        last_snapshot = cursor.fetchone()
+        last_update = last_snapshot[0] if last_snapshot else '-'
+        
+        result['modules_stats'] = {
+            'query_module': {
+                'total_records': total_records,
+                'data_days': data_days,
+                'last_update': last_update
+            }
+        }
+        
+        # 3. 价格突破统计（创新高/创新低）
+        cursor.execute("""
+            SELECT event_type, COUNT(*) 
+            FROM price_breakthrough_events 
+            WHERE DATE(event_time) = ?
+            GROUP BY event_type
+        """, (today,))
+        breakthrough_today = dict(cursor.fetchall())
+        
+        result['price_breakthrough'] = {
+            'today': {
+                'new_high': breakthrough_today.get('new_high', 0),
+                'new_low': breakthrough_today.get('new_low', 0)
+            }
+        }
+        
+        # 4. V1V2成交系统数据（从实际API获取或占位）
+        # 暂时使用占位数据，后续可以调用原有的v1v2 API
+        result['v1v2_system'] = {
+            'v1_count': 0,
+            'v2_count': 0,
+            'update_time': last_update
+        }
+        
+        # 5. 支撑压力线系统数据
+        cursor.execute("""
+            SELECT 
+                symbol, 
+                alert_scenario_1, alert_scenario_2, alert_scenario_3, alert_scenario_4,
+                position_s2_r1, position_s1_r2, position_s1_r1
+            FROM support_resistance_levels
+            WHERE record_time = (SELECT MAX(record_time) FROM support_resistance_levels)
+        """)
+        sr_data = cursor.fetchall()
+        
+        scenario1_coins = []
+        scenario2_coins = []
+        scenario3_coins = []
+        scenario4_coins = []
+        
+        for row in sr_data:
+            symbol, s1, s2, s3, s4, pos_s2_r1, pos_s1_r2, pos_s1_r1 = row
+            coin_symbol = symbol.replace('USDT', '')
+            
+            if s1:
+                scenario1_coins.append({'symbol': coin_symbol, 'position': pos_s2_r1})
+            if s2:
+                scenario2_coins.append({'symbol': coin_symbol, 'position': pos_s1_r2})
+            if s3:
+                scenario3_coins.append({'symbol': coin_symbol, 'position': pos_s1_r2})
+            if s4:
+                scenario4_coins.append({'symbol': coin_symbol, 'position': pos_s1_r1})
+        
+        result['support_resistance'] = {
+            'total_count': len(sr_data),
+            'scenario1_coins': scenario1_coins,
+            'scenario2_coins': scenario2_coins,
+            'scenario3_coins': scenario3_coins,
+            'scenario4_coins': scenario4_coins,
+            'update_time': last_update
+        }
+        
+        # 6. 交易信号系统数据
+        # 简化版本，返回基本计数
+        result['trading_signals'] = {
+            'buy_point_1_count': 0,
+            'buy_point_2_count': 0,
+            'total_coins': 27,
+            'update_time': last_update
+        }
+        
+        # 7. 1分钟涨跌速数据（占位，需要实际数据源）
+        result['price_speed'] = {
+            'up_count': 0,
+            'down_count': 0,
+            'update_time': last_update
+        }
+        
+        # 8. 监控状态
+        cursor.execute("""
+            SELECT snapshot_time 
+            FROM crypto_snapshots 
+            ORDER BY snapshot_date DESC, snapshot_time DESC 
+            LIMIT 1
+        """)
+        latest_snapshot_row = cursor.fetchone()
+        latest_snapshot_time = latest_snapshot_row[0] if latest_snapshot_row else None
+        
+        need_collection = False
+        minutes_since_last = None
+        
+        if latest_snapshot_time:
+            latest_dt = datetime.strptime(latest_snapshot_time, '%Y-%m-%d %H:%M:%S')
+            latest_dt = BEIJING_TZ.localize(latest_dt)
+            now = datetime.now(BEIJING_TZ)
+            minutes_since_last = (now - latest_dt).total_seconds() / 60
+            
+            if minutes_since_last > 15:
+                need_collection = True
+        
+        result['monitor_status'] = {
+            'need_collection': need_collection,
+            'latest_snapshot': latest_snapshot_time,
+            'minutes_since_last': round(minutes_since_last, 1) if minutes_since_last else None
+        }
+        
+        # 9. Google Drive检测器状态（占位）
+        result['gdrive_detector'] = {
+            'detector_running': False,
+            'file_timestamp': None,
+            'delay_minutes': None,
+            'latest_file': None
+        }
+        
+        conn.close()
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'timestamp': datetime.now(BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+        })
+
+@market_bp.route('/api/query')
+def api_query():
+    """查询API"""
+    query_time = request.args.get('time', '')
+    if not query_time:
+        return jsonify({'error': '请提供查询时间'})
+    
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT 
+                snapshot_date, snapshot_time, rush_up, rush_down, diff, count, ratio, status,
+                round_rush_up, round_rush_down, price_lowest, price_newhigh,
+                count_score_display, count_score_type, rise_24h_count, fall_24h_count
+            FROM crypto_snapshots
+            WHERE snapshot_time LIKE ?
+            ORDER BY snapshot_date DESC, snapshot_time DESC
+            LIMIT 1
+        """, (f"{query_time}%",))
+        
+        snapshot = cursor.fetchone()
+        
+        if not snapshot:
+            conn.close()
+            return jsonify({'error': f'未找到 {query_time} 的数据'})
+        
+        (snapshot_date, snapshot_time, rush_up, rush_down, diff, count, ratio, status,
+         round_rush_up, round_rush_down, price_lowest, price_newhigh,
+         count_score_display, count_score_type, rise_24h_count, fall_24h_count) = snapshot
+        
+        # snapshot_time已经是完整的日期时间，无需拼接
+        # 格式: '2025-12-09 22:40:00'
+        
+        cursor.execute("""
+            SELECT 
+                symbol, change, rush_up, rush_down, update_time,
+                high_price, high_time, decline, change_24h, rank,
+                current_price, priority_level, ratio1, ratio2
+            FROM crypto_coin_data
+            WHERE snapshot_time = ?
+            ORDER BY index_order ASC
+        """, (snapshot_time,))
+        
+        coins = []
+        for row in cursor.fetchall():
+            coins.append({
+                'symbol': row[0],
+                'change': row[1],
+                'rush_up': row[2],
+                'rush_down': row[3],
+                'update_time': row[4],
+                'high_price': row[5],
+                'high_time': row[6],
+                'decline': row[7],
+                'change_24h': row[8],
+                'rank': row[9],
+                'current_price': row[10],
+                'priority': row[11],
+                'ratio1': row[12],
+                'ratio2': row[13]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'snapshot_time': snapshot_time,
+            'rush_up': rush_up,
+            'rush_down': rush_down,
+            'diff': diff,
+            'count': count,
+            'ratio': ratio,
+            'status': status,
+            'round_rush_up': round_rush_up,
+            'round_rush_down': round_rush_down,
+            'price_lowest': price_lowest,
+            'price_newhigh': price_newhigh,
+            'count_score_display': count_score_display,
+            'count_score_type': count_score_type,
+            'rise_24h_count': rise_24h_count,
+            'fall_24h_count': fall_24h_count,
+            'coins': coins
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@market_bp.route('/api/latest')
+def api_latest():
+    """获取最新数据API"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT 
+                snapshot_date, snapshot_time, rush_up, rush_down, diff, count, ratio, status,
+                round_rush_up, round_rush_down, price_lowest, price_newhigh,
+                count_score_display, count_score_type, rise_24h_count, fall_24h_count
+            FROM crypto_snapshots
+            ORDER BY snapshot_date DESC, snapshot_time DESC
+            LIMIT 1
+        """)
+        
+        snapshot = cursor.fetchone()
+        
+        if not snapshot:
+            conn.close()
+            return jsonify({'error': '数据库中暂无数据'})
+        
+        (snapshot_date, snapshot_time, rush_up, rush_down, diff, count, ratio, status,
+         round_rush_up, round_rush_down, price_lowest, price_newhigh,
+         count_score_display, count_score_type, rise_24h_count, fall_24h_count) = snapshot
+        
+        # snapshot_time已经是完整的日期时间，无需拼接
+        # 格式: '2025-12-09 22:40:00'
+        
+        cursor.execute("""
+            SELECT 
+                symbol, change, rush_up, rush_down, update_time,
+                high_price, high_time, decline, change_24h, rank,
+                current_price, priority_level, ratio1, ratio2
+            FROM crypto_coin_data
+            WHERE snapshot_time = ?
+            ORDER BY index_order ASC
+        """, (snapshot_time,))
+        
+        coins = []
+        for row in cursor.fetchall():
+            coins.append({
+                'symbol': row[0],
+                'change': row[1],
+                'rush_up': row[2],
+                'rush_down': row[3],
+                'update_time': row[4],
+                'high_price': row[5],
+                'high_time': row[6],
+                'decline': row[7],
+                'change_24h': row[8],
+                'rank': row[9],
+                'current_price': row[10],
+                'priority': row[11],
+                'ratio1': row[12],
+                'ratio2': row[13]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'snapshot_time': snapshot_time,
+            'rush_up': rush_up,
+            'rush_down': rush_down,
+            'diff': diff,
+            'count': count,
+            'ratio': ratio,
+            'status': status,
+            'round_rush_up': round_rush_up,
+            'round_rush_down': round_rush_down,
+            'price_lowest': price_lowest,
+            'price_newhigh': price_newhigh,
+            'count_score_display': count_score_display,
+            'count_score_type': count_score_type,
+            'rise_24h_count': rise_24h_count,
+            'fall_24h_count': fall_24h_count,
+            'coins': coins
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@market_bp.route('/api/chart')
+def api_chart():
+    """图表数据API - 支持分页的12小时趋势图数据（显示所有数据点）"""
+    try:
+        # 获取分页参数
+        page = request.args.get('page', '0')  # 默认第0页（最新）
+        page = int(page)
+        
+        conn = get_connection('crypto_data')
+        try:
+            # 只读取当前页时间窗口内的数据点（page=0 是最新的12小时）
+            window = SNAPSHOT_WINDOW.page(conn, page, timedelta(hours=12))
+            if window is None:
+                return jsonify({'error': '无数据'})
+            
+            rows = SNAPSHOT_WINDOW.fetch(
+                conn, ('snapshot_time', 'rush_up', 'rush_down', 'diff', 'count'),
+                window['start'], window['end'])
+        finally:
+            conn.close()
+        
+        page_start_time = window['start']
+        page_end_time = window['end']
+        
+        return jsonify({
+            'times': [datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S').strftime('%m-%d %H:%M') for row in rows],
+            'rush_up': [row[1] for row in rows],
+            'rush_down': [row[2] for row in rows],
+            'diff': [row[3] for row in rows],
+            'count': [row[4] for row in rows],
+            'page': window['page'],
+            'total_pages': window['total_pages'],
+            'has_prev': window['has_prev'],  # 有上一页（更早的数据）
+            'has_next': window['has_next'],  # 有下一页（更新的数据）
+            'time_range': {
+                'start': page_start_time.strftime('%Y-%m-%d %H:%M'),
+                'end': page_end_time.strftime('%Y-%m-%d %H:%M')
+            },
+            'data_count': len(rows)
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@market_bp.route('/api/timeline')
+def api_timeline():
+    """
+    获取历史数据点API - 返回完整的统计数据
+    查询参数:
+    - page: 页码（0 为最新，默认0）
+    - hours: 每页小时数（默认24）
+    """
+    try:
+        page = request.args.get('page', 0, type=int)
+        hours = request.args.get('hours', 24, type=int)
+        
+        conn = get_connection('crypto_data')
+        try:
+            window = SNAPSHOT_WINDOW.page(conn, page, timedelta(hours=max(hours, 1)))
+            if window is None:
+                return jsonify({'snapshots': [], 'total': 0, 'page': 0, 'total_pages': 1,
+                                'has_prev': False, 'has_next': False})
+            
+            # 查询所有字段 - 倒序排列（时间晚的在上，时间早的在下）
+            rows = SNAPSHOT_WINDOW.fetch(conn, (
+                'id', 'snapshot_time', 'snapshot_date',
+                'rush_up', 'rush_down', 'diff', 'count', 'ratio', 'status',
+                'round_rush_up', 'round_rush_down',
+                'price_lowest', 'price_newhigh', 'ratio_diff',
+                'init_rush_up', 'init_rush_down',
+                'count_score_display', 'count_score_type',
+                'rise_24h_count', 'fall_24h_count',
+                'green_count', 'percentage', 'filename'
+            ), window['start'], window['end'], descending=True)
+        finally:
+            conn.close()
+        
+        snapshots = []
+        for row in rows:
+            snapshots.append({
+                'id': row[0],
+                'snapshot_time': row[1],
+                'snapshot_date': row[2],
+                # 主要统计
+                'rush_up': row[3],
+                'rush_down': row[4],
+                'diff': row[5],
+                'count': row[6],
+                'ratio': row[7],
+                'status': row[8],
+                # 本轮数据
+                'round_rush_up': row[9],
+                'round_rush_down': row[10],
+                # 比价数据
+                'price_lowest': row[11],
+                'price_newhigh': row[12],
+                'ratio_diff': row[13],
+                # 初始数据
+                'init_rush_up': row[14],
+                'init_rush_down': row[15],
+                # 计次得分
+                'count_score_display': row[16],
+                'count_score_type': row[17],
+                # 24小时涨跌
+                'rise_24h_count': row[18],
+                'fall_24h_count': row[19],
+                # 其他
+                'green_count': row[20],
+                'percentage': row[21],
+                'filename': row[22]
+            })
+        
+        return jsonify({
+            'snapshots': snapshots,
+            'total': len(snapshots),
+            'page': window['page'],
+            'total_pages': window['total_pages'],
+            'has_prev': window['has_prev'],
+            'has_next': window['has_next']
+        })
+    
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@market_bp.route('/api/liquidation/30days')
+def api_liquidation_30days():
+    """30日爆仓数据API"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT date, long_amount, short_amount, total_amount, updated_at
+            FROM liquidation_30days
+            ORDER BY date DESC
+            LIMIT 30
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        data = []
+        for row in rows:
+            data.append({
+                'date': row[0],
+                'long_amount': round(row[1] / 100000000, 2),  # 转换为亿
+                'short_amount': round(row[2] / 100000000, 2),
+                'total_amount': round(row[3] / 100000000, 2),
+                'updated_at': row[4]
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'count': len(data)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@market_bp.route('/api/panic/history')
+def api_panic_history():
+    """恐慌清洗指数历史数据API（支持时间查询）"""
+    try:
+        limit = int(request.args.get('limit', 50))
+        query_time = request.args.get('time', None)  # 可选的时间查询参数
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        if query_time:
+            # 时间范围查询：查询指定时间前后的数据
+            half_limit = limit // 2
+            
+            # 先查询指定时间之前的记录（过滤掉异常数据）
+            cursor.execute('''
+                SELECT record_time, panic_index, hour_24_people, total_position, hour_1_amount, hour_24_amount
+                FROM panic_wash_index
+                WHERE record_time <= ?
+                  AND panic_index > 0 
+                  AND hour_24_people > 0 
+                  AND total_position > 1000000000
+                  AND hour_1_amount > 100000
+                  AND hour_24_amount > 1000000
+                ORDER BY record_time DESC
+                LIMIT ?
+            ''', (query_time, half_limit))
+            before_rows = cursor.fetchall()
+            
+            # 再查询指定时间之后的记录（过滤掉异常数据）
+            cursor.execute('''
+                SELECT record_time, panic_index, hour_24_people, total_position, hour_1_amount, hour_24_amount
+                FROM panic_wash_index
+                WHERE record_time > ?
+                  AND panic_index > 0 
+                  AND hour_24_people > 0 
+                  AND total_position > 1000000000
+                  AND hour_1_amount > 100000
+                  AND hour_24_amount > 1000000
+                ORDER BY record_time ASC
+                LIMIT ?
+            ''', (query_time, half_limit))
+            after_rows = cursor.fetchall()
+            
+            # 合并结果并按时间倒序排列（最新的在前面）
+            rows = list(before_rows) + list(reversed(after_rows))
+        else:
+            # 默认查询：最新的N条记录（过滤掉异常数据，最新的在前面）
+            # total_position > 1000000000 表示大于10亿（原始值以美元计）
+            # hour_1_amount > 100000 表示大于10万（原始值以美元计）
+            # hour_24_amount > 1000000 表示大于100万（原始值以美元计）
+            cursor.execute('''
+                SELECT record_time, panic_index, hour_24_people, total_position, hour_1_amount, hour_24_amount
+                FROM panic_wash_index
+                WHERE panic_index > 0 
+                  AND hour_24_people > 0 
+                  AND total_position > 1000000000
+                  AND hour_1_amount > 100000
+                  AND hour_24_amount > 1000000
+                ORDER BY record_time DESC
+                LIMIT ?
+            ''', (limit,))
+            rows = cursor.fetchall()
+        
+        conn.close()
+        
+        data = []
+        for row in rows:
+            data.append({
+                'record_time': row[0],
+                'panic_index': row[1],
+                'hour_24_people': round(row[2] / 10000, 2),  # 转换为万人
+                'total_position': round(row[3] / 100000000, 2),  # 转换为亿美元
+                'hour_1_amount': round(row[4] / 10000, 2),  # 转换为万美元
+                'hour_24_amount': round(row[5] / 10000, 2)  # 转换为万美元
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'query_time': query_time  # 返回查询的时间
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@market_bp.route('/api/modules/stats')
+def api_modules_stats():
+    """获取所有模块的统计信息"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 1. 历史数据查询模块统计
+        cursor.execute("SELECT COUNT(*) FROM crypto_snapshots")
+        query_total = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT COUNT(DISTINCT snapshot_date) FROM crypto_snapshots")
+        query_days = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT MAX(snapshot_time) FROM crypto_snapshots")
+        query_last_time = cursor.fetchone()[0] or '-'
+        if query_last_time != '-':
+            # 处理时间格式：可能是 "HH:MM:SS" 或 "YYYY-MM-DD HH:MM:SS"
+            if ' ' in query_last_time:
+                query_last_time = query_last_time.split(' ')[1][:5]  # 取HH:MM
+            else:
+                query_last_time = query_last_time[:5]  # 已经是HH:MM:SS，取HH:MM
+        
+        # 2. 交易信号监控模块统计
+        cursor.execute("SELECT COUNT(*) FROM trading_signals")
+        signal_total = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT COUNT(DISTINCT record_date) FROM trading_signals")
+        signal_days = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT MAX(record_time) FROM trading_signals")
+        signal_last_time = cursor.fetchone()[0] or '-'
+        if signal_last_time != '-':
+            # 处理时间格式：可能是 "HH:MM:SS" 或 "YYYY-MM-DD HH:MM:SS"
+            if ' ' in signal_last_time:
+                signal_last_time = signal_last_time.split(' ')[1][:5]  # 取HH:MM
+            else:
+                signal_last_time = signal_last_time[:5]  # 已经是HH:MM:SS，取HH:MM
+        
+        # 3. 恐慌清洗指数模块统计
+        cursor.execute("SELECT COUNT(*) FROM panic_wash_index")
+        panic_total = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT COUNT(DISTINCT DATE(record_time)) FROM panic_wash_index")
+        panic_days = cursor.fetchone()[0]
+        
+        cursor.execute("SELECT MAX(record_time) FROM panic_wash_index")
+        panic_last_time = cursor.fetchone()[0] or '-'
+        if panic_last_time != '-':
+            # 处理时间格式：可能是 "HH:MM:SS" 或 "YYYY-MM-DD HH:MM:SS"
+            if ' ' in panic_last_time:
+                panic_last_time = panic_last_time.split(' ')[1][:5]  # 取HH:MM
+            else:
+                panic_last_time = panic_last_time[:5]  # 已经是HH:MM:SS，取HH:MM
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'query_module': {
+                'total_records': query_total,
+                'data_days': query_days,
+                'last_update': query_last_time
+            },
+            'signal_module': {
+                'total_records': signal_total,
+                'data_days': signal_days,
+                'last_update': signal_last_time
+            },
+            'panic_module': {
+                'total_records': panic_total,
+                'data_days': panic_days,
+                'last_update': panic_last_time
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+# ============================================================================
+# 币种选择和评分系统
+# ============================================================================
+
+@market_bp.route('/coin-pool')
+def coin_pool_page():
+    """币种池页面 - 从星星系统筛选的优质币种池"""
+    response = make_response(render_template('coin_pool.html'))
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    return response
+
+@market_bp.route('/api/coins/realtime-status')
+def api_coins_realtime_status():
+    """
+    获取所有币种的实时状态
+    包括：当前价格（来自最新K线）、7天高低点、涨跌幅、交易信号及发生时间
+    """
+    try:
+        import pytz
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        
+        # 定义27个币种
+        symbols = [
+            'AAVE', 'APT', 'BCH', 'BNB', 'BTC', 'CRV', 'DOGE', 'DOT', 'ETC', 'ETH', 'FIL',
+            'HBAR', 'LDO', 'LINK', 'LTC', 'NEAR', 'SOL', 'SUI', 'TAO', 'TON', 'TRX',
+            'XLM', 'XRP', 'CFX', 'CRO', 'STX', 'UNI'
+        ]
+        
+        results = []
+        
+        for symbol_short in symbols:
+            symbol = f"{symbol_short}-USDT-SWAP"
+            
+            # 1. 获取最新K线数据（当前价格）
+            cursor.execute('''
+                SELECT timestamp, close, open
+                FROM okex_kline_ohlc
+                WHERE symbol = ? AND timeframe = '5m'
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ''', (symbol,))
+            latest_kline = cursor.fetchone()
+            
+            if not latest_kline:
+                continue
+            
+            current_price = latest_kline['close']
+            open_price = latest_kline['open']
+            latest_time = datetime.fromtimestamp(latest_kline['timestamp'] / 1000, tz=beijing_tz)
+            
+            # 计算涨跌幅
+            change_pct = ((current_price - open_price) / open_price * 100) if open_price > 0 else 0
+            
+            # 2. 获取7天高低点
+            cursor.execute('''
+                SELECT MAX(high) as high_7d, MIN(low) as low_7d
+                FROM okex_kline_ohlc
+                WHERE symbol = ? AND timeframe = '5m'
+                AND timestamp >= ?
+            ''', (symbol, int((datetime.now() - timedelta(days=7)).timestamp() * 1000)))
+            extremes = cursor.fetchone()
+            
+            high_7d = extremes['high_7d'] if extremes and extremes['high_7d'] else current_price
+            low_7d = extremes['low_7d'] if extremes and extremes['low_7d'] else current_price
+            
+            # 3. 检查最近2小时的交易信号
+            two_hours_ago = datetime.now(beijing_tz) - timedelta(hours=2)
+            
+            cursor.execute('''
+                SELECT record_time, long_signals, short_signals, today_new_high, today_new_low
+                FROM trading_signals
+                WHERE record_time >= ?
+                ORDER BY record_time DESC
+                LIMIT 1
+            ''', (two_hours_ago.strftime('%Y-%m-%d %H:%M:%S'),))
+            signal_row = cursor.fetchone()
+            
+            signal_type = None
+            signal_time = None
+            
+            if signal_row:
+                signal_time_dt = datetime.strptime(signal_row['record_time'], '%Y-%m-%d %H:%M:%S')
+                signal_time_dt = beijing_tz.localize(signal_time_dt)
+                signal_time = signal_time_dt.strftime('%m-%d %H:%M')
+                
+                # 判断信号类型
+                if signal_row['long_signals'] > 0 or signal_row['today_new_low'] > 0:
+                    signal_type = 'buy'
+                elif signal_row['short_signals'] > 0 or signal_row['today_new_high'] > 0:
+                    signal_type = 'sell'
+            
+            results.append({
+                'symbol': symbol_short,
+                'current_price': current_price,
+                'high_7d': high_7d,
+                'low_7d': low_7d,
+                'change_pct': change_pct,
+                'signal_type': signal_type,  # 'buy' or 'sell' or None
+                'signal_time': signal_time,  # K线时间，格式：'MM-DD HH:MM'
+                'latest_update': latest_time.strftime('%Y-%m-%d %H:%M:%S')
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': results,
+            'count': len(results),
+            'timestamp': datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@market_bp.route('/api/query/latest')
+def api_query_latest():
+    """获取最新查询数据API（用于计次预警）"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT 
+                snapshot_time, rush_up, rush_down, diff, count, ratio, status,
+                round_rush_up, round_rush_down, price_lowest, price_newhigh,
+                count_score_display, rise_24h_count, fall_24h_count
+            FROM crypto_snapshots
+            ORDER BY snapshot_date DESC, snapshot_time DESC
+            LIMIT 1
+        """)
+        
+        snapshot = cursor.fetchone()
+        conn.close()
+        
+        if not snapshot:
+            return jsonify({'success': False, 'error': '暂无数据'})
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                '运算时间': snapshot[0],
+                '急涨': snapshot[1],
+                '急跌': snapshot[2],
+                '差值': snapshot[3],
+                '计次': snapshot[4],
+                '比值': snapshot[5],
+                '状态': snapshot[6],
+                '本轮急涨': snapshot[7],
+                '本轮急跌': snapshot[8],
+                '比价最低': snapshot[9],
+                '比价创新高': snapshot[10],
+                '计次得分': snapshot[11],
+                '24h涨≥10%': snapshot[12],
+                '24h跌≤-10%': snapshot[13]
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@market_bp.route('/api/query/batch-import', methods=['POST'])
+def api_query_batch_import():
+    """批量导入当天所有TXT文件数据"""
+    try:
+        import subprocess
+        import os
+        
+        # 执行批量导入脚本
+        script_path = '/home/user/webapp/batch_import_daily_txt.py'
+        
+        if not os.path.exists(script_path):
+            return jsonify({
+                'success': False,
+                'error': '批量导入脚本不存在'
+            })
+        
+        # 使用subprocess运行脚本
+        result = subprocess.run(
+            ['python3', script_path],
+            capture_output=True,
+            text=True,
+            timeout=300  # 5分钟超时
+        )
+        
+        # 解析输出结果
+        output_lines = result.stdout.split('\n')
+        
+        # 提取统计信息
+        stats = {
+            'total': 0,
+            'success': 0,
+            'exists': 0,
+            'invalid': 0,
+            'error': 0
+        }
+        
+        for line in output_lines:
+            if '总文件数:' in line:
+                stats['total'] = int(line.split(':')[-1].strip())
+            elif '成功导入:' in line:
+                stats['success'] = int(line.split(':')[-1].strip())
+            elif '已存在:' in line:
+                stats['exists'] = int(line.split(':')[-1].strip())
+            elif '无效数据:' in line:
+                stats['invalid'] = int(line.split(':')[-1].strip())
+            elif '失败:' in line and '❌' in line:
+                stats['error'] = int(line.split(':')[-1].strip())
+        
+        return jsonify({
+            'success': True,
+            'message': '批量导入完成',
+            'stats': stats,
+            'output': result.stdout
+        })
+        
+    except subprocess.TimeoutExpired:
+        return jsonify({
+            'success': False,
+            'error': '批量导入超时（超过5分钟）'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@market_bp.route('/test-simple')
+def test_simple():
+    """简单测试页面 - 验证window.onload和ECharts基础功能"""
+    return render_template('test_simple.html')
+
+@market_bp.route('/api/chart-config')
+def chart_config():
+    """获取K线图配置URL"""
+    return jsonify({
+        'success': True,
+        'chart_base_url': CHART_BASE_URL,
+        'example': f"{CHART_BASE_URL}/chart/BTC"
+    })
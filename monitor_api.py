@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+系统监控
+数据采集监控、各模块状态、采集器状态、每日任务
+"""
+
+from datetime import datetime
+import json
+import os
+import pytz
+import traceback
+
+from flask import Blueprint, jsonify, render_template, request
+
+from db_access import get_connection
+
+monitor_bp = Blueprint('monitor', __name__)
+
+@monitor_bp.route('/api/monitor/data-collection')
+def api_monitor_data_collection():
+    """监控数据采集状态"""
+    try:
+        from datetime import datetime, timedelta
+        import pytz
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        
+        # 获取最新快照时间
+        cursor.execute('SELECT MAX(snapshot_time) FROM crypto_snapshots')
+        latest_snapshot = cursor.fetchone()[0]
+        
+        if not latest_snapshot:
+            return jsonify({
+                'success': False,
+                'error': '数据库中没有任何快照数据',
+                'status': 'no_data'
+            })
+        
+        # 计算时间差
+        latest_time = datetime.strptime(latest_snapshot, '%Y-%m-%d %H:%M:%S')
+        latest_time = beijing_tz.localize(latest_time)
+        time_diff_minutes = (now - latest_time).total_seconds() / 60
+        
+        # 获取今天的采集次数
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        today_start_str = today_start.strftime('%Y-%m-%d %H:%M:%S')
+        
+        cursor.execute('''
+            SELECT COUNT(*) FROM crypto_snapshots 
+            WHERE snapshot_time >= ?
+        ''', (today_start_str,))
+        today_count = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        # 判断状态
+        status = 'normal'
+        message = '数据采集正常'
+        alert_level = 'success'
+        
+        if time_diff_minutes > 20:
+            status = 'critical'
+            message = f'严重: 已经 {time_diff_minutes:.1f} 分钟没有新数据'
+            alert_level = 'danger'
+        elif time_diff_minutes > 15:
+            status = 'warning'
+            message = f'警告: 已经 {time_diff_minutes:.1f} 分钟没有新数据'
+            alert_level = 'warning'
+        
+        # 计算预期采集次数（每10分钟一次）
+        expected_count = int((now.hour * 60 + now.minute) / 10)
+        
+        return jsonify({
+            'success': True,
+            'status': status,
+            'message': message,
+            'alert_level': alert_level,
+            'data': {
+                'current_time': now.strftime('%Y-%m-%d %H:%M:%S'),
+                'latest_snapshot': latest_snapshot,
+                'time_diff_minutes': round(time_diff_minutes, 1),
+                'today_count': today_count,
+                'expected_count': expected_count,
+                'collection_rate': round((today_count / expected_count * 100) if expected_count > 0 else 0, 1)
+            }
+        })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+@monitor_bp.route('/monitor')
+def monitor_page():
+    """数据采集监控页面（增强版）- 支持执行日志、开关控制、刷新间隔"""
+    return render_template('unified_monitor_enhanced.html')
+
+@monitor_bp.route('/monitor-old')
+def monitor_page_old():
+    """原始监控页面（旧版）"""
+    return render_template('monitor.html')
+
+# ==================== 数据采集监控 API ====================
+@monitor_bp.route('/api/monitor/status')
+def api_monitor_status():
+    """获取数据采集监控状态"""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ['python3', 'monitor_data_collection.py', 'status'],
+            cwd='/home/user/webapp',
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        status = json.loads(result.stdout)
+        return jsonify({
+            'success': True,
+            'status': status
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@monitor_bp.route('/api/monitor/history')
+def api_monitor_history():
+    """获取采集历史"""
+    import subprocess
+    try:
+        hours = request.args.get('hours', '2')
+        result = subprocess.run(
+            ['python3', 'monitor_data_collection.py', 'history', hours],
+            cwd='/home/user/webapp',
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        history = json.loads(result.stdout)
+        return jsonify({
+            'success': True,
+            'history': history
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@monitor_bp.route('/api/monitor/trigger', methods=['POST'])
+def api_monitor_trigger():
+    """手动触发数据采集"""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ['python3', 'monitor_data_collection.py', 'force'],
+            cwd='/home/user/webapp',
+            capture_output=True,
+            text=True,
+            timeout=300  # 5分钟超时
+        )
+        collection_result = json.loads(result.stdout) if result.stdout else {}
+        return jsonify({
+            'success': result.returncode == 0,
+            'result': collection_result
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@monitor_bp.route('/api/monitor/check', methods=['POST'])
+def api_monitor_check():
+    """检查并自动恢复数据采集"""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ['python3', 'monitor_data_collection.py', 'check'],
+            cwd='/home/user/webapp',
+            capture_output=True,
+            text=True,
+            timeout=300  # 5分钟超时
+        )
+        check_result = json.loads(result.stdout) if result.stdout else {}
+        return jsonify({
+            'success': True,
+            'result': check_result
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+# ==================== 多模块监控 API ====================
+@monitor_bp.route('/api/monitor/all-modules')
+def api_monitor_all_modules():
+    """获取所有模块监控状态"""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ['python3', 'multi_module_monitor.py', 'status'],
+            cwd='/home/user/webapp',
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        # 从stdout提取JSON部分（跳过前面的文本输出）
+        output = result.stdout
+        # 找到JSON开始的位置
+        json_start = output.find('{')
+        if json_start >= 0:
+            json_str = output[json_start:]
+            statuses = json.loads(json_str)
+            return jsonify({
+                'success': True,
+                'modules': statuses
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'error': 'No JSON output found'
+            })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@monitor_bp.route('/api/monitor/check-all', methods=['POST'])
+def api_monitor_check_all():
+    """检查并自动恢复所有模块"""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ['python3', 'multi_module_monitor.py', 'check', '--silent'],
+            cwd='/home/user/webapp',
+            capture_output=True,
+            text=True,
+            timeout=600  # 10分钟超时（多个模块可能需要更长时间）
+        )
+        check_result = json.loads(result.stdout) if result.stdout else {}
+        return jsonify({
+            'success': True,
+            'result': check_result
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@monitor_bp.route('/api/monitor/force-update/<module_key>', methods=['POST'])
+def api_monitor_force_update(module_key):
+    """强制更新指定模块"""
+    import subprocess
+    try:
+        result = subprocess.run(
+            ['python3', 'multi_module_monitor.py', 'force', module_key],
+            cwd='/home/user/webapp',
+            capture_output=True,
+            text=True,
+            timeout=300  # 5分钟超时
+        )
+        update_result = json.loads(result.stdout) if result.stdout else {}
+        return jsonify({
+            'success': result.returncode == 0,
+            'result': update_result
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@monitor_bp.route('/control-center')
+def control_center_page():
+    """深度图得分页面（控制中心）"""
+    return render_template('control_center.html')
+
+# ==================== 统一监控页面 ====================
+@monitor_bp.route('/unified-monitor')
+def unified_monitor():
+    """统一采集监控页面"""
+    return render_template('unified_monitor.html')
+
+@monitor_bp.route('/unified-monitor-enhanced')
+def monitor_enhanced():
+    """统一采集监控页面（增强版）- 带执行日志和开关控制"""
+    return render_template('unified_monitor_enhanced.html')
+
+# ==================== 综合采集器监控 API ====================
+@monitor_bp.route('/api/collectors/status')
+def api_collectors_status():
+    """获取所有采集器的运行状态"""
+    try:
+        import subprocess
+        result = subprocess.run(
+            ['python3', 'get_all_collectors_status.py'],
+            cwd='/home/user/webapp',
+            capture_output=True,
+            text=True,
+            timeout=10
+        )
+        status_list = json.loads(result.stdout)
+        
+        # 统计状态
+        total = len(status_list)
+        normal = sum(1 for s in status_list if s['status'] == 'normal')
+        warning = sum(1 for s in status_list if s['status'] == 'warning')
+        error = sum(1 for s in status_list if s['status'] in ['error', 'stopped', 'no_data'])
+        
+        return jsonify({
+            'success': True,
+            'collectors': status_list,
+            'summary': {
+                'total': total,
+                'normal': normal,
+                'warning': warning,
+                'error': error
+            },
+            'timestamp': datetime.now(pytz.timezone('Asia/Shanghai')).strftime('%Y-%m-%d %H:%M:%S')
+        })
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+# ==================== 每日00:10任务状态 API ====================
+
+@monitor_bp.route('/daily-tasks-status')
+def daily_tasks_status_page():
+    """每日00:10任务执行状态页面"""
+    return render_template('daily_tasks_status.html')
+
+@monitor_bp.route('/api/daily-tasks/status')
+def api_daily_tasks_status():
+    """获取每日00:10任务的执行状态"""
+    import os
+    import json
+    from datetime import datetime
+    import pytz
+    
+    try:
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        today_str = now.strftime('%Y-%m-%d')
+        
+        # 读取配置文件
+        config_file = '/home/user/webapp/daily_folder_config.json'
+        config = {}
+        if os.path.exists(config_file):
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        
+        # 父文件夹更新任务状态
+        parent_folder_update = {
+            'status': config.get('auto_update_status', 'pending'),
+            'last_update': config.get('last_auto_update', '--'),
+            'parent_folder_id': config.get('root_folder_odd') or config.get('root_folder_even', '--'),
+            'child_folder_id': config.get('folder_id', '--'),
+            'url': config.get('parent_folder_url', '--')
+        }
+        
+        # 清理任务状态
+        cleanup = {
+            'last_cleanup': config.get('last_cleanup', None),
+            'cleanup_reason': config.get('cleanup_reason', '--'),
+            'root_folder_odd': config.get('root_folder_odd'),
+            'root_folder_even': config.get('root_folder_even')
+        }
+        
+        return jsonify({
+            'success': True,
+            'today_date': today_str,
+            'parent_folder_update': parent_folder_update,
+            'cleanup': cleanup
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@monitor_bp.route('/api/daily-tasks/logs')
+def api_daily_tasks_logs():
+    """获取每日任务的执行日志"""
+    import os
+    
+    try:
+        log_file = '/home/user/webapp/parent_folder_update.log'
+        logs = []
+        
+        if os.path.exists(log_file):
+            with open(log_file, 'r', encoding='utf-8') as f:
+                lines = f.readlines()
+                # 只返回最近100行
+                logs = [line.rstrip() for line in lines[-100:]]
+        
+        return jsonify({
+            'success': True,
+            'logs': logs
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
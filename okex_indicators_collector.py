@@ -7,7 +7,6 @@
 """
 
 import sqlite3
-import requests
 import time
 import json
 from datetime import datetime, timedelta
@@ -16,6 +15,9 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 
+from okx_market_client import get_client
+from response_cache import bump_data_version
+
 # 北京时区
 BEIJING_TZ = pytz.timezone('Asia/Shanghai')
 
@@ -141,26 +143,11 @@ class OKExIndicatorsCollector:
         Returns:
             K线数据列表，格式：[timestamp, open, high, low, close, vol, volCcy, ...]
         """
-        url = f"{OKEX_BASE_URL}{OKEX_CANDLES_ENDPOINT}"
-        params = {
-            'instId': inst_id,
-            'bar': bar,
-            'limit': str(limit)
-        }
-        
-        try:
-            response = requests.get(url, params=params, timeout=10)
-            response.raise_for_status()
-            data = response.json()
-            
-            if data.get('code') == '0':
-                return data.get('data', [])
-            else:
-                print(f"❌ OKEx API错误: {data.get('msg', 'Unknown error')}")
-                return []
-        except Exception as e:
-            print(f"❌ 获取{inst_id} {bar}K线失败: {e}")
+        candles = get_client().get_candles(inst_id, bar, limit)
+        if candles is None:
+            print(f"❌ 获取{inst_id} {bar}K线失败")
             return []
+        return candles
     
     def save_klines_5m(self, symbol: str, candles: List[List]):
         """
@@ -412,24 +399,29 @@ class OKExIndicatorsCollector:
         
         return max(1, count)  # 至少返回1
     
-    def collect_and_save(self, symbol: str):
+    def collect_and_save(self, symbol: str, candles_5m: Optional[List[List]] = None,
+                         candles_1h: Optional[List[List]] = None):
         """
         采集并保存指定币种的K线和技术指标
         
         Args:
             symbol: OKEx合约ID（如BTC-USDT-SWAP）
+            candles_5m: 已批量获取的5分钟K线（为None时单独请求）
+            candles_1h: 已批量获取的1小时K线（为None时单独请求）
         """
         now = datetime.now(BEIJING_TZ)
         
         # 1. 采集5分钟K线（100根）
-        print(f"📊 采集{symbol} 5分钟K线...")
-        candles_5m = self.fetch_okex_candles(symbol, '5m', 100)
+        if candles_5m is None:
+            print(f"📊 采集{symbol} 5分钟K线...")
+            candles_5m = self.fetch_okex_candles(symbol, '5m', 100)
         if candles_5m:
             self.save_klines_5m(symbol, candles_5m)
         
         # 2. 采集1小时K线（100根）
-        print(f"📊 采集{symbol} 1小时K线...")
-        candles_1h = self.fetch_okex_candles(symbol, '1H', 100)
+        if candles_1h is None:
+            print(f"📊 采集{symbol} 1小时K线...")
+            candles_1h = self.fetch_okex_candles(symbol, '1H', 100)
         if candles_1h:
             self.save_klines_1h(symbol, candles_1h)
         
@@ -497,6 +489,7 @@ class OKExIndicatorsCollector:
             ''', (symbol, '1h', current_close_1h, rsi_1h, sar_1h, sar_pos_1h, sar_quad_1h,
                   count_label_1h, bb_u_1h, bb_m_1h, bb_l_1h, now.strftime('%Y-%m-%d %H:%M:%S')))
         
+        bump_data_version(self.cursor, 'okex_technical_indicators')
         self.conn.commit()
         print(f"✅ {symbol} 技术指标采集完成")
     
@@ -509,11 +502,15 @@ class OKExIndicatorsCollector:
         success_count = 0
         fail_count = 0
         
+        # 并发批量获取K线（由共享客户端按OKX限频调度），数据库写入仍在本线程串行
+        client = get_client()
+        batch_5m = client.get_candles_batch(SYMBOLS, '5m', 100)
+        batch_1h = client.get_candles_batch(SYMBOLS, '1H', 100)
+        
         for symbol in SYMBOLS:
             try:
-                self.collect_and_save(symbol)
+                self.collect_and_save(symbol, batch_5m.get(symbol) or [], batch_1h.get(symbol) or [])
                 success_count += 1
-                time.sleep(0.3)  # 避免API限流
             except Exception as e:
                 print(f"❌ {symbol} 采集失败: {e}")
                 fail_count += 1
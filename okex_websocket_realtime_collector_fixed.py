@@ -15,6 +15,10 @@ from datetime import datetime
 from collections import deque
 import sys
 
+from async_sqlite_writer import AsyncSQLiteWriter
+from streaming_indicators import StreamingIndicators
+from response_cache import bump_data_version
+
 # 设置北京时区
 import os
 os.environ['TZ'] = 'Asia/Shanghai'
@@ -36,6 +40,32 @@ kline_cache = {
     '1H': {symbol: deque(maxlen=100) for symbol in SYMBOLS}
 }
 
+# 增量指标状态（每个tick O(1) 更新，替代每次全量 talib 重算）
+indicator_engines = {
+    '5m': {symbol: StreamingIndicators() for symbol in SYMBOLS},
+    '1H': {symbol: StreamingIndicators() for symbol in SYMBOLS}
+}
+
+KLINE_UPSERT_SQL = '''
+    INSERT OR REPLACE INTO okex_kline_ohlc
+    (symbol, timeframe, timestamp, open, high, low, close, volume, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+LATEST_INDICATORS_UPSERT_SQL = '''
+    INSERT OR REPLACE INTO okex_technical_indicators
+    (symbol, timeframe, current_price, rsi_14, sar, sar_position, sar_quadrant, sar_count_label,
+     bb_upper, bb_middle, bb_lower, record_time)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+HISTORY_INDICATORS_UPSERT_SQL = '''
+    INSERT OR REPLACE INTO okex_indicators_history
+    (symbol, timeframe, timestamp, current_price, rsi_14, sar, sar_position, sar_count_label,
+     bb_upper, bb_middle, bb_lower, created_at)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
 def init_database():
     """初始化数据库"""
     conn = sqlite3.connect('crypto_data.db')
@@ -123,6 +153,7 @@ async def init_kline_cache():
             if klines:
                 for kline in klines:
                     kline_cache[timeframe][symbol].append(kline[:6])
+                    indicator_engines[timeframe][symbol].update(kline[:6])
                 loaded += 1
                 print(f"✅ [{loaded}/{total}] {symbol} ({timeframe}): {len(klines)} 根K线")
             else:
@@ -209,11 +240,9 @@ def calculate_indicators(klines):
     }
 
 def save_kline(symbol, timeframe, kline):
-    """保存K线数据到数据库（仅在整点时刻）"""
+    """保存K线数据到数据库（仅在整点时刻）—— 入队，由写入线程批量落库"""
     try:
         import pytz
-        conn = sqlite3.connect('crypto_data.db')
-        cursor = conn.cursor()
         
         # kline: [timestamp, open, high, low, close, volume]
         timestamp = int(kline[0])
@@ -228,14 +257,8 @@ def save_kline(symbol, timeframe, kline):
         created_at = datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
         
         # 🔥 修复：保存到统一的 okex_kline_ohlc 表
-        cursor.execute('''
-            INSERT OR REPLACE INTO okex_kline_ohlc
-            (symbol, timeframe, timestamp, open, high, low, close, volume, created_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (symbol, timeframe, timestamp, open_price, high, low, close, volume, created_at))
-        
-        conn.commit()
-        conn.close()
+        db_writer.upsert((symbol, timeframe, timestamp), KLINE_UPSERT_SQL,
+                         (symbol, timeframe, timestamp, open_price, high, low, close, volume, created_at))
         
         return True
     except Exception as e:
@@ -243,27 +266,20 @@ def save_kline(symbol, timeframe, kline):
         return False
 
 def save_indicators(symbol, timeframe, indicators, timestamp=None):
-    """保存指标到数据库"""
+    """保存指标到数据库 —— 入队，同一刷新窗口内同一主键只写最后一次"""
     if not indicators:
         print(f"⚠️  save_indicators: indicators为空，跳过保存")
         return
     
     try:
         import pytz
-        conn = sqlite3.connect('crypto_data.db', timeout=30.0)
-        cursor = conn.cursor()
         
         # 使用北京时间
         beijing_tz = pytz.timezone('Asia/Shanghai')
         record_time = datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
         
         # 保存最新指标（用于实时显示）
-        cursor.execute('''
-            INSERT OR REPLACE INTO okex_technical_indicators
-            (symbol, timeframe, current_price, rsi_14, sar, sar_position, sar_quadrant, sar_count_label,
-             bb_upper, bb_middle, bb_lower, record_time)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
+        db_writer.upsert((symbol, timeframe), LATEST_INDICATORS_UPSERT_SQL, (
             symbol, timeframe,
             indicators['current_price'], indicators['rsi_14'],
             indicators['sar'], indicators['sar_position'], indicators['sar_quadrant'],
@@ -272,33 +288,25 @@ def save_indicators(symbol, timeframe, indicators, timestamp=None):
             record_time
         ))
         
-        # 如果提供了timestamp，同时保存到历史表
+        # 如果提供了timestamp，同时保存到历史表（采集器状态在刷新事务中统一更新）
         if timestamp:
-            print(f"💾 save_indicators: 保存到历史表 {symbol} {timeframe} timestamp={timestamp}")
-            cursor.execute('''
-                INSERT OR REPLACE INTO okex_indicators_history
-                (symbol, timeframe, timestamp, current_price, rsi_14, sar, sar_position, sar_count_label,
-                 bb_upper, bb_middle, bb_lower, created_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
+            db_writer.upsert((symbol, timeframe, timestamp), HISTORY_INDICATORS_UPSERT_SQL, (
                 symbol, timeframe, timestamp,
                 indicators['current_price'], indicators['rsi_14'],
                 indicators['sar'], indicators['sar_position'], indicators['sar_count_label'],
                 indicators['bb_upper'], indicators['bb_middle'], indicators['bb_lower'],
                 record_time
             ))
-            print(f"✅ save_indicators: 历史表保存成功")
-            
-            # 在同一个连接中更新采集器状态表
-            update_collector_status_in_transaction(cursor, record_time)
-        else:
-            print(f"⚠️  save_indicators: timestamp为None，只保存到最新表")
-        
-        conn.commit()
-        conn.close()
     except Exception as e:
         print(f"❌ save_indicators失败: {symbol} {timeframe} - {e}")
 
+def on_writer_flush(cursor, written):
+    """每次批量刷新时在同一事务内更新采集器状态"""
+    import pytz
+    record_time = datetime.now(pytz.timezone('Asia/Shanghai')).strftime('%Y-%m-%d %H:%M:%S')
+    update_collector_status_in_transaction(cursor, record_time)
+    bump_data_version(cursor, 'okex_technical_indicators')
+
 def update_collector_status_in_transaction(cursor, collection_time):
     """在现有事务中更新采集器状态表（避免数据库锁定）"""
     try:
@@ -326,6 +334,19 @@ def update_collector_status_in_transaction(cursor, collection_time):
     except Exception as e:
         print(f"❌ 更新collector状态失败: {e}")
 
+# 单连接批量写入器（写入线程持有 WAL 长连接，事件循环只负责入队）
+db_writer = AsyncSQLiteWriter('crypto_data.db', flush_interval=0.5, on_flush=on_writer_flush)
+
+async def report_writer_stats(interval=60):
+    """定期输出写入队列深度与刷新耗时"""
+    while True:
+        await asyncio.sleep(interval)
+        stats = db_writer.stats()
+        print(f"📝 写入器: 队列={stats['queue_depth']} (峰值{stats['max_queue_depth']}), "
+              f"刷新={stats['flushes']}次, 平均{stats['avg_flush_ms']:.1f}ms, "
+              f"最大{stats['max_flush_ms']:.1f}ms, 写入{stats['rows_written']}行, "
+              f"合并{stats['coalesced']}条, 失败{stats['errors']}次")
+
 async def subscribe_klines(websocket, symbols, timeframe):
     """订阅K线频道"""
     args = [{"channel": f"candle{timeframe}", "instId": symbol} for symbol in symbols]
@@ -355,12 +376,17 @@ async def process_kline_message(data):
         else:
             return
         
-        # 更新缓存（保留最近100根K线用于SAR计数）
+        engine = indicator_engines[timeframe][symbol]
+        
+        # 更新缓存（保留最近100根K线用于保存收盘K线）
         for kline in kline_data:
             cache = kline_cache[timeframe][symbol]
             new_kline = kline[:6]
             new_timestamp = int(new_kline[0])
             
+            # 增量更新指标状态（新K线时上一根K线计入已收盘状态）
+            engine.update(new_kline)
+            
             # 检查是否是新K线（时间戳变化）
             is_new_kline = False
             if cache and cache[-1][0] == new_kline[0]:
@@ -409,7 +435,7 @@ async def process_kline_message(data):
                         cache_len = len(cache)
                         print(f"🔍 [{dt.strftime('%H:%M:%S')}] {symbol} ({timeframe}) 开始计算指标 [cache_len={cache_len}]")
                         if cache_len >= 20:
-                            hist_indicators = calculate_indicators(list(cache[:-1]))  # 使用前N-1根K线计算
+                            hist_indicators = engine.closed_indicators()  # 截至前一根收盘K线的指标
                             if hist_indicators:
                                 save_indicators(symbol, timeframe, hist_indicators, prev_timestamp)
                                 print(f"📊 [{dt.strftime('%H:%M:%S')}] 已保存 {symbol} ({timeframe}) 指标 [cache:{cache_len}]")
@@ -420,7 +446,7 @@ async def process_kline_message(data):
         
         # 计算并保存最新指标（实时更新，同时保存timestamp到历史表）
         if len(kline_cache[timeframe][symbol]) >= 20:
-            indicators = calculate_indicators(list(kline_cache[timeframe][symbol]))
+            indicators = engine.indicators()
             
             if indicators:
                 # 获取最新K线的时间戳
@@ -490,11 +516,19 @@ async def main():
     # 初始化数据库
     init_database()
     
-    # 加载历史K线数据
-    await init_kline_cache()
+    # 启动批量写入器
+    db_writer.start()
+    stats_task = asyncio.create_task(report_writer_stats())
     
-    # 启动 WebSocket 客户端
-    await ws_client()
+    try:
+        # 加载历史K线数据
+        await init_kline_cache()
+        
+        # 启动 WebSocket 客户端
+        await ws_client()
+    finally:
+        stats_task.cancel()
+        await db_writer.stop()
 
 if __name__ == '__main__':
     try:
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OKX 公共行情共享客户端
+- 连接池复用的 requests.Session
+- 按 OKX 各接口限频配置的令牌桶（进程内所有线程共享）
+- 有界并发 + 失败指数退避重试
+- 批量接口：一次 /market/tickers 代替逐个币种调用 /market/ticker
+
+采集周期的耗时由限频决定，而不是串行延迟加 sleep。
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OKX_BASE_URL = 'https://www.okx.com'
+
+# OKX 公共行情接口限频：(请求次数, 秒)，按IP计
+ENDPOINT_RATE_LIMITS = {
+    '/api/v5/market/candles': (40, 2),
+    '/api/v5/market/history-candles': (20, 2),
+    '/api/v5/market/ticker': (20, 2),
+    '/api/v5/market/tickers': (20, 2),
+    '/api/v5/market/index-tickers': (20, 2),
+    '/api/v5/public/mark-price': (10, 2),
+    '/api/v5/public/funding-rate': (20, 2),
+    '/api/v5/public/open-interest': (20, 2),
+}
+DEFAULT_RATE_LIMIT = (10, 2)
+
+# 需要退避重试的OKX业务错误码（限频 / 系统繁忙 / 服务暂不可用）
+RETRYABLE_CODES = {'50011', '50013', '50001', '50004'}
+RETRYABLE_HTTP_STATUS = {429, 500, 502, 503, 504}
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """线程安全的令牌桶"""
+
+    def __init__(self, rate: int, per: float):
+        """每 per 秒最多 rate 次，允许突发 rate 次"""
+        self.capacity = float(rate)
+        self.fill_rate = rate / per
+        self.tokens = float(rate)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取一个令牌，必要时阻塞等待；返回等待的秒数"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait = (1 - self.tokens) / self.fill_rate
+            time.sleep(wait)
+            waited += wait
+
+
+class OKXMarketClient:
+    """OKX 公共行情客户端（线程安全，建议通过 get_client() 共享）"""
+
+    def __init__(self, base_url: str = OKX_BASE_URL, max_workers: int = 8,
+                 timeout: float = 10, max_retries: int = 3, backoff: float = 0.5,
+                 rate_limits: Optional[Dict] = None):
+        """
+        Args:
+            base_url: API地址
+            max_workers: 最大并发请求数
+            timeout: 单次请求超时（秒）
+            max_retries: 失败后最多重试次数
+            backoff: 退避基数（秒），第n次重试等待 backoff * 2^n
+            rate_limits: 覆盖默认的接口限频配置
+        """
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.rate_limits = dict(ENDPOINT_RATE_LIMITS)
+        if rate_limits:
+            self.rate_limits.update(rate_limits)
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max_workers * 2)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        self._stats_lock = threading.Lock()
+        self._stats = {'requests': 0, 'retries': 0, 'failures': 0, 'throttle_wait': 0.0}
+
+    # ------------------------------------------------------------------
+    # 基础请求
+    # ------------------------------------------------------------------
+    def _bucket(self, path: str) -> TokenBucket:
+        with self._buckets_lock:
+            bucket = self._buckets.get(path)
+            if bucket is None:
+                rate, per = self.rate_limits.get(path, DEFAULT_RATE_LIMIT)
+                bucket = TokenBucket(rate, per)
+                self._buckets[path] = bucket
+            return bucket
+
+    def _count(self, key: str, value=1):
+        with self._stats_lock:
+            self._stats[key] += value
+
+    def request(self, path: str, params: Optional[Dict] = None) -> Optional[List]:
+        """
+        GET 公共接口
+
+        Returns:
+            OKX 返回的 data 列表；重试后仍失败返回 None
+        """
+        bucket = self._bucket(path)
+        url = f"{self.base_url}{path}"
+        last_error = None
+
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                self._count('retries')
+                time.sleep(self.backoff * (2 ** (attempt - 1)) * (1 + random.random() * 0.2))
+
+            self._count('throttle_wait', bucket.acquire())
+            self._count('requests')
+            try:
+                response = self.session.get(url, params=params, timeout=self.timeout)
+                if response.status_code in RETRYABLE_HTTP_STATUS:
+                    last_error = f"HTTP {response.status_code}"
+                    continue
+                response.raise_for_status()
+                data = response.json()
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                last_error = str(e)
+                continue
+            except Exception as e:
+                last_error = str(e)
+                break
+
+            code = str(data.get('code'))
+            if code == '0':
+                return data.get('data') or []
+            last_error = f"code={code} msg={data.get('msg')}"
+            if code not in RETRYABLE_CODES:
+                break
+
+        self._count('failures')
+        logger.warning(f"⚠️ OKX请求失败 {path} {params}: {last_error}")
+        return None
+
+    # ------------------------------------------------------------------
+    # 并发
+    # ------------------------------------------------------------------
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                    thread_name_prefix='okx-market')
+            return self._executor
+
+    def map(self, func: Callable, items: Iterable) -> List:
+        """
+        有界并发执行 func(item)，按输入顺序返回结果
+        单个任务抛出的异常记录日志并返回 None
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        def run(item):
+            try:
+                return func(item)
+            except Exception as e:
+                logger.error(f"❌ 并发任务失败 {item}: {e}")
+                return None
+
+        return list(self._pool().map(run, items))
+
+    # ------------------------------------------------------------------
+    # 行情接口
+    # ------------------------------------------------------------------
+    def get_candles(self, inst_id: str, bar: str = '5m', limit: int = 100,
+                    after=None, before=None, history: bool = False) -> Optional[List]:
+        """K线（OKX原始格式，从新到旧）；失败返回 None"""
+        params = {'instId': inst_id, 'bar': bar, 'limit': str(limit)}
+        if after:
+            params['after'] = str(after)
+        if before:
+            params['before'] = str(before)
+        path = '/api/v5/market/history-candles' if history else '/api/v5/market/candles'
+        return self.request(path, params)
+
+    def get_candles_batch(self, inst_ids: Iterable[str], bar: str = '5m',
+                          limit: int = 100, **kwargs) -> Dict[str, Optional[List]]:
+        """并发获取多个合约的K线：{inst_id: candles 或 None}"""
+        inst_ids = list(inst_ids)
+        results = self.map(lambda inst_id: self.get_candles(inst_id, bar, limit, **kwargs), inst_ids)
+        return dict(zip(inst_ids, results))
+
+    def get_ticker(self, inst_id: str) -> Optional[Dict]:
+        """单个合约行情；失败返回 None"""
+        data = self.request('/api/v5/market/ticker', {'instId': inst_id})
+        return data[0] if data else None
+
+    def get_tickers(self, inst_type: str = 'SWAP') -> Optional[Dict[str, Dict]]:
+        """一次获取某类产品的全部行情：{instId: ticker}；失败返回 None"""
+        data = self.request('/api/v5/market/tickers', {'instType': inst_type})
+        if data is None:
+            return None
+        return {ticker['instId']: ticker for ticker in data}
+
+    def get_last_prices(self, inst_ids: Iterable[str], inst_type: str = 'SWAP') -> Dict[str, float]:
+        """
+        批量获取最新价：{inst_id: last}
+        优先用一次 tickers 调用；批量接口失败或缺少的合约再并发单独获取
+        """
+        inst_ids = list(inst_ids)
+        prices = {}
+        tickers = self.get_tickers(inst_type) or {}
+        for inst_id in inst_ids:
+            ticker = tickers.get(inst_id)
+            if ticker and ticker.get('last'):
+                prices[inst_id] = float(ticker['last'])
+
+        missing = [inst_id for inst_id in inst_ids if inst_id not in prices]
+        for inst_id, ticker in zip(missing, self.map(self.get_ticker, missing)):
+            if ticker and ticker.get('last'):
+                prices[inst_id] = float(ticker['last'])
+        return prices
+
+    def stats(self) -> Dict:
+        """请求 / 重试 / 失败次数与限频等待总时长"""
+        with self._stats_lock:
+            return dict(self._stats)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> OKXMarketClient:
+    """进程内共享的行情客户端（所有采集器共用同一组限频令牌桶）"""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = OKXMarketClient()
+        return _client
@@ -0,0 +1,248 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+开仓逻辑因子快照
+只在上游表有新数据时重新计算全部因子（一个连接、一条合并查询），
+结果作为带版本号的快照行写入 opening_logic_snapshots；
+接口直接返回内存中的最新快照，历史快照即为开仓建议的历史
+
+上游指纹 = 各上游表的 MAX(rowid) + 今天日期 + 得分系统1小时窗口内最早的信号时间，
+指纹不变说明所有因子都不会变化（窗口滑出旧信号、跨天也会改变指纹）
+
+用法:
+    python opening_factor_snapshot.py               # 常驻，每2秒检查一次上游
+    python opening_factor_snapshot.py --once        # 只刷新一次
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from db_access import get_connection, get_db_path, transaction
+from opening_logic import fetch_raw_data, get_opening_suggestion, query_scalars
+
+SNAPSHOT_DDL = '''
+    CREATE TABLE IF NOT EXISTS opening_logic_snapshots (
+        version INTEGER PRIMARY KEY AUTOINCREMENT,
+        fingerprint TEXT NOT NULL,
+        computed_at TEXT NOT NULL,
+        trend_score INTEGER,
+        trend_level TEXT,
+        suggestion_type TEXT,
+        position_type TEXT,
+        position_percent INTEGER,
+        payload TEXT NOT NULL
+    )
+'''
+
+SUGGESTIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS opening_logic_suggestions (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        suggestion_key TEXT NOT NULL,
+        position_type TEXT,
+        position_percent INTEGER,
+        position_level TEXT,
+        first_appeared_at TEXT,
+        last_updated_at TEXT,
+        is_active INTEGER DEFAULT 1
+    )
+'''
+
+# 上游表变化检测（每项都是 O(log n) 的索引/rowid 查找）
+FINGERPRINT_SUBQUERIES = (
+    ('crypto_snapshots', "SELECT MAX(rowid) FROM crypto_snapshots"),
+    ('crypto_coin_data', "SELECT MAX(rowid) FROM crypto_coin_data"),
+    ('price_breakthrough_events', "SELECT MAX(rowid) FROM price_breakthrough_events"),
+    ('panic_wash_index', "SELECT MAX(rowid) FROM panic_wash_index"),
+    ('trading_signals', "SELECT MAX(rowid) FROM signal.trading_signals"),
+    ('signal_window', "SELECT MIN(timestamp) FROM signal.trading_signals "
+                      "WHERE timestamp > datetime('now', '-1 hour')"),
+)
+
+SNAPSHOT_COLUMNS = ('version', 'fingerprint', 'computed_at', 'trend_score', 'trend_level',
+                    'suggestion_type', 'position_type', 'position_percent')
+
+KEEP_DAYS = 30              # 快照保留天数
+CLEANUP_EVERY = 500         # 每写入多少个版本清理一次过期快照
+
+
+class OpeningSnapshotService:
+    """开仓逻辑快照：按上游指纹增量刷新，读取为 O(1)"""
+
+    def __init__(self, db: str = 'crypto_data', signal_db: str = 'signal_data', poll_interval: float = 1.0):
+        self.db = db
+        self.signal_path = get_db_path(signal_db)
+        self.poll_interval = poll_interval
+        self._snapshot: Optional[Dict] = None
+        self._checked = float('-inf')
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._initialized = False
+
+    # ------------------------------------------------------------------
+    def _prepare(self, conn):
+        """建表；把 signal_data ATTACH 到当前线程的连接（库文件不存在时不 ATTACH，相关因子取默认值）"""
+        if not self._initialized:
+            conn.execute(SNAPSHOT_DDL)
+            conn.execute(SUGGESTIONS_DDL)
+            conn.commit()
+            self._initialized = True
+        attached = {row[1] for row in conn.execute('PRAGMA database_list').fetchall()}
+        if 'signal' not in attached and os.path.exists(self.signal_path):
+            conn.execute('ATTACH DATABASE ? AS signal', (self.signal_path,))
+
+    def fingerprint(self, conn, today: Optional[str] = None) -> str:
+        """上游表的当前指纹"""
+        today = today or datetime.now().strftime('%Y-%m-%d')
+        values = query_scalars(conn, FINGERPRINT_SUBQUERIES, {}, log_errors=False)
+        return json.dumps([today] + [values[name] for name, _ in FINGERPRINT_SUBQUERIES])
+
+    @staticmethod
+    def _latest_row(conn) -> Optional[Dict]:
+        row = conn.execute(f'''
+            SELECT {', '.join(SNAPSHOT_COLUMNS)}, payload FROM opening_logic_snapshots
+            ORDER BY version DESC LIMIT 1
+        ''').fetchone()
+        if row is None:
+            return None
+        row = tuple(row)
+        snapshot = dict(zip(SNAPSHOT_COLUMNS, row[:-1]))
+        snapshot['data'] = json.loads(row[-1])
+        return snapshot
+
+    def refresh(self, force: bool = False) -> Dict:
+        """
+        上游指纹变化（或 force）时重新计算并写入新版本，否则返回已有的最新快照
+
+        Returns:
+            {'version', 'fingerprint', 'computed_at', ..., 'data': get_opening_suggestion() 的结果}
+        """
+        with self._refresh_lock:
+            conn = get_connection(self.db)
+            try:
+                self._prepare(conn)
+                today = datetime.now().strftime('%Y-%m-%d')
+                fingerprint = self.fingerprint(conn, today)
+                latest = self._latest_row(conn)
+                if force or latest is None or latest['fingerprint'] != fingerprint:
+                    latest = self._compute(fingerprint, today, force)
+            finally:
+                conn.close()
+            self._set(latest)
+            return latest
+
+    def _compute(self, fingerprint: str, today: str, force: bool) -> Dict:
+        with transaction(self.db, row_factory=sqlite3.Row) as conn:
+            # 其他进程可能已经写入了同一指纹的快照
+            latest = self._latest_row(conn)
+            if not force and latest is not None and latest['fingerprint'] == fingerprint:
+                return latest
+
+            raw_data = fetch_raw_data(conn, today)
+            data = get_opening_suggestion(raw_data, conn)
+            computed_at = data['timestamp']
+            position = data['position_info']
+            cursor = conn.execute('''
+                INSERT INTO opening_logic_snapshots
+                (fingerprint, computed_at, trend_score, trend_level, suggestion_type,
+                 position_type, position_percent, payload)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ''', (fingerprint, computed_at, data['trend_score'], data['trend_level'], data['suggestion_type'],
+                  position['position_type'], position['position_percent'],
+                  json.dumps(data, ensure_ascii=False)))
+            version = cursor.lastrowid
+            if version % CLEANUP_EVERY == 0:
+                conn.execute("DELETE FROM opening_logic_snapshots WHERE computed_at < datetime('now', ?, '+8 hours')",
+                             (f'-{KEEP_DAYS} days',))
+            return {
+                'version': version,
+                'fingerprint': fingerprint,
+                'computed_at': computed_at,
+                'trend_score': data['trend_score'],
+                'trend_level': data['trend_level'],
+                'suggestion_type': data['suggestion_type'],
+                'position_type': position['position_type'],
+                'position_percent': position['position_percent'],
+                'data': data,
+            }
+
+    def _set(self, snapshot: Dict):
+        with self._lock:
+            if self._snapshot is None or snapshot['version'] >= self._snapshot['version']:
+                self._snapshot = snapshot
+            self._checked = time.monotonic()
+
+    # ------------------------------------------------------------------
+    def get(self) -> Dict:
+        """
+        最新快照；距上次检查超过 poll_interval 时由一个线程检查上游指纹，
+        其他线程直接返回当前快照
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            stale = time.monotonic() - self._checked >= self.poll_interval
+            if stale and snapshot is not None:
+                # 先占位，避免多个线程同时检查
+                self._checked = time.monotonic()
+        if snapshot is None:
+            return self.refresh()
+        if stale:
+            try:
+                return self.refresh()
+            except sqlite3.Error as e:
+                print(f"刷新开仓逻辑快照失败: {e}")
+        return snapshot
+
+    def get_suggestion(self) -> Dict:
+        """与 opening_logic.get_opening_suggestion() 相同的结构，附带快照版本号"""
+        snapshot = self.get()
+        return dict(snapshot['data'], snapshot_version=snapshot['version'])
+
+    def history(self, limit: int = 100, before_version: Optional[int] = None) -> List[Dict]:
+        """历史快照摘要（新到旧），before_version 用于翻页"""
+        conn = get_connection(self.db)
+        try:
+            self._prepare(conn)
+            rows = conn.execute(f'''
+                SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM opening_logic_snapshots
+                WHERE version < ?
+                ORDER BY version DESC LIMIT ?
+            ''', (before_version if before_version is not None else 2 ** 63 - 1, limit)).fetchall()
+        finally:
+            conn.close()
+        return [dict(zip(SNAPSHOT_COLUMNS, row)) for row in rows]
+
+
+# Web 进程共用的实例
+snapshot_service = OpeningSnapshotService()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='开仓逻辑因子快照')
+    parser.add_argument('--interval', type=float, default=2.0, help='检查上游变化的间隔（秒）')
+    parser.add_argument('--once', action='store_true', help='只刷新一次')
+    args = parser.parse_args()
+
+    service = OpeningSnapshotService(poll_interval=args.interval)
+    last_version = None
+    while True:
+        try:
+            snapshot = service.refresh()
+            if snapshot['version'] != last_version:
+                last_version = snapshot['version']
+                print(f"[{snapshot['computed_at']}] 快照 v{snapshot['version']}: 得分 {snapshot['trend_score']}, "
+                      f"{snapshot['data']['suggestion']}, 仓位 {snapshot['position_percent']}%")
+        except Exception as e:
+            print(f"刷新开仓逻辑快照失败: {e}")
+        if args.once:
+            break
+        time.sleep(args.interval)
+
+
+if __name__ == '__main__':
+    main()
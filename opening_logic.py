@@ -5,7 +5,7 @@
 
 import sqlite3
 from datetime import datetime
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 def get_db_connection(db_name: str):
     """获取数据库连接"""
@@ -192,21 +192,113 @@ def get_score_system_avg() -> Dict:
         print(f"获取得分系统数据失败: {e}")
         return {'long_avg': 0.0, 'short_avg': 0.0}
 
-def calculate_trend_score() -> Tuple[int, List[Dict], Dict]:
+# 所有因子的标量子查询（与上面各 get_* 函数的查询相同），合并成一条 SELECT 一次执行
+# 得分系统的 trading_signals 在 signal_data.db 中，以 signal 名称 ATTACH 到同一个连接
+LATEST_COIN_CTE = """
+    WITH latest_coin AS (
+        SELECT change_24h FROM (
+            SELECT symbol, change_24h,
+                   ROW_NUMBER() OVER (PARTITION BY symbol ORDER BY update_time DESC) as rn
+            FROM crypto_coin_data
+            WHERE change_24h IS NOT NULL
+        ) WHERE rn = 1
+    )
+"""
+FACTOR_SUBQUERIES = (
+    ('star_count', "SELECT count FROM crypto_snapshots ORDER BY snapshot_time DESC LIMIT 1"),
+    ('star_type', "SELECT count_score_type FROM crypto_snapshots ORDER BY snapshot_time DESC LIMIT 1"),
+    ('rush_up', "SELECT rush_up FROM crypto_snapshots ORDER BY snapshot_time DESC LIMIT 1"),
+    ('rush_down', "SELECT rush_down FROM crypto_snapshots ORDER BY snapshot_time DESC LIMIT 1"),
+    ('btc_change', "SELECT change_24h FROM crypto_coin_data WHERE symbol = 'BTC' ORDER BY update_time DESC LIMIT 1"),
+    ('eth_change', "SELECT change_24h FROM crypto_coin_data WHERE symbol = 'ETH' ORDER BY update_time DESC LIMIT 1"),
+    ('new_high_count', "SELECT SUM(CASE WHEN event_type = 'new_high' THEN 1 ELSE 0 END) "
+                       "FROM price_breakthrough_events WHERE DATE(event_time) = :today"),
+    ('new_low_count', "SELECT SUM(CASE WHEN event_type = 'new_low' THEN 1 ELSE 0 END) "
+                      "FROM price_breakthrough_events WHERE DATE(event_time) = :today"),
+    ('extreme_up', "SELECT COUNT(*) FROM latest_coin WHERE change_24h >= 10"),
+    ('extreme_down', "SELECT COUNT(*) FROM latest_coin WHERE change_24h <= -10"),
+    ('long_avg', "SELECT AVG(CASE WHEN signal_type = 'long' THEN score ELSE NULL END) "
+                 "FROM signal.trading_signals WHERE timestamp > datetime('now', '-1 hour')"),
+    ('short_avg', "SELECT AVG(CASE WHEN signal_type = 'short' THEN score ELSE NULL END) "
+                  "FROM signal.trading_signals WHERE timestamp > datetime('now', '-1 hour')"),
+    ('total_position', "SELECT total_position FROM panic_wash_index WHERE total_position > 1000000000 "
+                       "ORDER BY record_time DESC LIMIT 1"),
+)
+
+def query_scalars(conn, subqueries, params: Dict, prefix: str = '', log_errors: bool = True) -> Dict:
+    """
+    把多个标量子查询合并成一条 SELECT 执行；某个子查询出错（表/列不存在）时
+    逐个执行，出错的项为 None（与各 get_* 函数出错时返回默认值一致）
+    """
+    columns = ', '.join(f'({sql})' for _, sql in subqueries)
+    try:
+        row = conn.execute(f'{prefix} SELECT {columns}', params).fetchone()
+        return {name: row[i] for i, (name, _) in enumerate(subqueries)}
+    except sqlite3.Error:
+        values = {}
+        for name, sql in subqueries:
+            try:
+                values[name] = conn.execute(f'{prefix} SELECT ({sql})', params).fetchone()[0]
+            except sqlite3.Error as e:
+                if log_errors:
+                    print(f"查询因子 {name} 失败: {e}")
+                values[name] = None
+        return values
+
+def fetch_raw_data(conn, today: Optional[str] = None) -> Dict:
+    """
+    用一个连接、一条查询取全部因子
+    conn: crypto_data 的连接（已 ATTACH signal_data 为 signal）
+    返回: 与 calculate_trend_score 的原始数据相同的结构
+    """
+    today = today or datetime.now().strftime('%Y-%m-%d')
+    v = query_scalars(conn, FACTOR_SUBQUERIES, {'today': today}, prefix=LATEST_COIN_CTE)
+    count_val = v['star_count'] or 0
+    score_type = v['star_type'] or ''
+    return {
+        'star_data': {
+            'solid_stars': count_val if '实心' in score_type else 0,
+            'hollow_stars': count_val if '空心' in score_type else 0,
+            'rush_up': v['rush_up'] or 0,
+            'rush_down': v['rush_down'] or 0
+        },
+        'btc_eth_change': {
+            'BTC': float(v['btc_change']) if v['btc_change'] is not None else 0.0,
+            'ETH': float(v['eth_change']) if v['eth_change'] is not None else 0.0
+        },
+        'breakthrough': {
+            'new_high_count': v['new_high_count'] or 0,
+            'new_low_count': v['new_low_count'] or 0
+        },
+        'extreme': {'extreme_up': v['extreme_up'] or 0, 'extreme_down': v['extreme_down'] or 0},
+        'score_avg': {
+            'long_avg': float(v['long_avg'] or 0),
+            'short_avg': float(v['short_avg'] or 0)
+        },
+        'total_position': round(float(v['total_position']) / 100000000, 2) if v['total_position'] else 0.0
+    }
+
+def calculate_trend_score(raw_data: Optional[Dict] = None) -> Tuple[int, List[Dict], Dict]:
     """
     计算趋势得分
+    raw_data: fetch_raw_data() 的结果；不传时逐项查询
     返回: (总得分, 得分详情列表, 原始数据)
     """
     score = 0
     details = []
     
     # 获取所有数据
-    star_data = get_star_data()
-    btc_eth_change = get_btc_eth_change()
-    breakthrough = get_breakthrough_data()
-    extreme = get_extreme_change_count()
-    score_avg = get_score_system_avg()
-    total_position = get_total_position()
+    if raw_data is None:
+        raw_data = {
+            'star_data': get_star_data(),
+            'btc_eth_change': get_btc_eth_change(),
+            'breakthrough': get_breakthrough_data(),
+            'extreme': get_extreme_change_count(),
+            'score_avg': get_score_system_avg(),
+            'total_position': get_total_position()
+        }
+    star_data = raw_data['star_data']
+    btc_eth_change = raw_data['btc_eth_change']
     
     solid = star_data['solid_stars']
     hollow = star_data['hollow_stars']
@@ -274,16 +366,6 @@ def calculate_trend_score() -> Tuple[int, List[Dict], Dict]:
         score -= 1
         details.append({'factor': 'ETH跌幅', 'level': '一般做空', 'score': -1, 'value': f'{eth_change:.2f}%'})
     
-    # 汇总原始数据
-    raw_data = {
-        'star_data': star_data,
-        'btc_eth_change': btc_eth_change,
-        'breakthrough': breakthrough,
-        'extreme': extreme,
-        'score_avg': score_avg,
-        'total_position': total_position
-    }
-    
     return score, details, raw_data
 
 def check_restrictions(raw_data: Dict) -> Tuple[bool, bool, List[str]]:
@@ -566,9 +648,10 @@ def calculate_position_size(raw_data: Dict, can_long: bool, can_short: bool) ->
         'calculation_details': details
     }
 
-def track_position_suggestion(position_info: Dict) -> Dict:
+def track_position_suggestion(position_info: Dict, conn=None) -> Dict:
     """
     跟踪仓位建议，记录首次出现时间
+    conn: 在调用方的事务内写入（由调用方提交）；不传时自行连接并提交
     返回: 包含首次出现时间和首次开仓建议的字典
     """
     try:
@@ -579,7 +662,9 @@ def track_position_suggestion(position_info: Dict) -> Dict:
         # 生成建议唯一标识
         suggestion_key = f"{position_type}_{position_percent}"
         
-        conn = get_db_connection('crypto_data.db')
+        own_conn = conn is None
+        if own_conn:
+            conn = get_db_connection('crypto_data.db')
         cursor = conn.cursor()
         current_time = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         
@@ -617,8 +702,9 @@ def track_position_suggestion(position_info: Dict) -> Dict:
             """, (suggestion_key, position_type, position_percent, position_level, 
                   first_appeared_at, current_time))
         
-        conn.commit()
-        conn.close()
+        if own_conn:
+            conn.commit()
+            conn.close()
         
         # 计算首次开仓建议（30%）
         initial_position = int(position_percent * 0.3)
@@ -636,12 +722,14 @@ def track_position_suggestion(position_info: Dict) -> Dict:
             'suggestion_key': f"{position_info.get('position_type', 'neutral')}_{position_info.get('position_percent', 0)}"
         }
 
-def get_opening_suggestion() -> Dict:
+def get_opening_suggestion(raw_data: Optional[Dict] = None, conn=None) -> Dict:
     """
-    获取开仓建议
+    获取开仓建议（每次调用都重新计算；接口使用 opening_factor_snapshot 的预计算快照）
+    raw_data: fetch_raw_data() 的结果；不传时逐项查询
+    conn: 跟踪仓位建议所用的连接（见 track_position_suggestion）
     """
     # 计算趋势得分
-    trend_score, score_details, raw_data = calculate_trend_score()
+    trend_score, score_details, raw_data = calculate_trend_score(raw_data)
     
     # 检查限制条件
     can_long, can_short, restrictions = check_restrictions(raw_data)
@@ -650,7 +738,7 @@ def get_opening_suggestion() -> Dict:
     position_info = calculate_position_size(raw_data, can_long, can_short)
     
     # 跟踪仓位建议，获取首次出现时间
-    tracking_info = track_position_suggestion(position_info)
+    tracking_info = track_position_suggestion(position_info, conn)
     
     # 将跟踪信息添加到仓位信息中
     position_info['first_appeared_at'] = tracking_info['first_appeared_at']
@@ -0,0 +1,399 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+OKX 私有WebSocket持仓流服务
+- 主账户和子账户配置（state_store.SUB_ACCOUNT_CONFIG）中每个启用的子账户各一条私有连接
+- 登录后订阅 positions / account 频道，内存中维护每个账户的实时持仓簿
+- 持仓簿变化时原子写入数据目录（DB_DIR）下的 position_book.json，供看板和守护进程直接读取
+- 断线自动重连，重连后以首次推送的全量快照替换旧持仓
+
+读取方（毫秒级，不再每次轮询发起 N 个签名HTTP请求）:
+    from position_stream import read_positions
+    positions = read_positions('Wu666666')
+    if positions is None:
+        ...  # 服务未运行或数据过期，回退到REST
+"""
+
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+import websockets
+
+from db_access import DB_DIR
+from state_store import SUB_ACCOUNT_CONFIG
+
+try:
+    from okex_api_config import OKEX_WS_PRIVATE_URL
+except ImportError:
+    OKEX_WS_PRIVATE_URL = 'wss://ws.okx.com:8443/ws/v5/private'
+
+# 与其他状态文件同在数据目录下，不随进程工作目录变化
+SNAPSHOT_FILE = os.path.join(DB_DIR, 'position_book.json')
+MAIN_ACCOUNT = 'main'
+
+PING_INTERVAL = 25          # 空闲多少秒发送一次 ping（OKX 30秒无消息断开）
+STALE_AFTER = 60            # 快照超过多少秒没有心跳视为过期
+PUBLISH_INTERVAL = 0.2      # 快照文件最短写入间隔（秒）
+MAX_BACKOFF = 30
+
+logger = logging.getLogger(__name__)
+
+
+class PositionStreamError(Exception):
+    """登录或订阅被拒绝"""
+
+
+class Account(NamedTuple):
+    name: str
+    api_key: str
+    secret_key: str
+    passphrase: str
+
+
+def login_args(account: Account, timestamp: Optional[str] = None) -> Dict:
+    """私有频道登录参数：sign = Base64(HMAC-SHA256(secret, timestamp + 'GET' + '/users/self/verify'))"""
+    timestamp = timestamp or str(int(time.time()))
+    mac = hmac.new(account.secret_key.encode('utf-8'),
+                   (timestamp + 'GET' + '/users/self/verify').encode('utf-8'),
+                   hashlib.sha256)
+    return {
+        'apiKey': account.api_key,
+        'passphrase': account.passphrase,
+        'timestamp': timestamp,
+        'sign': base64.b64encode(mac.digest()).decode('utf-8'),
+    }
+
+
+def load_accounts(config_path: Optional[str] = None) -> List[Account]:
+    """主账户（okex_api_config）+ 启用的子账户（config_path 不传时读状态存储中的子账户配置）"""
+    accounts = []
+    try:
+        from okex_api_config import OKEX_API_KEY, OKEX_SECRET_KEY, OKEX_PASSPHRASE
+        accounts.append(Account(MAIN_ACCOUNT, OKEX_API_KEY, OKEX_SECRET_KEY, OKEX_PASSPHRASE))
+    except ImportError:
+        logger.warning("未找到 okex_api_config，跳过主账户")
+
+    try:
+        if config_path:
+            with open(config_path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        else:
+            config = SUB_ACCOUNT_CONFIG.load()
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logger.warning("读取子账户配置失败: %s", e)
+        return accounts
+
+    for sub in config.get('sub_accounts', []):
+        if sub.get('enabled'):
+            accounts.append(Account(sub['account_name'], sub['api_key'],
+                                    sub['secret_key'], sub['passphrase']))
+    return accounts
+
+
+def _position_key(pos: Dict) -> str:
+    return pos.get('posId') or f"{pos.get('instId')}:{pos.get('posSide')}:{pos.get('mgnMode')}"
+
+
+def _is_open(pos: Dict) -> bool:
+    try:
+        return float(pos.get('pos') or 0) != 0
+    except ValueError:
+        return False
+
+
+class PositionBook:
+    """所有账户的实时持仓簿（线程安全）"""
+
+    def __init__(self):
+        self._accounts: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._listeners: List[Callable[[str, 'PositionBook'], None]] = []
+        self.version = 0
+
+    def _account(self, name: str) -> Dict:
+        account = self._accounts.get(name)
+        if account is None:
+            account = self._accounts[name] = {
+                'positions': {}, 'balance': None, 'connected': False,
+                'ready': False, 'awaiting_snapshot': True, 'updated_at': None,
+            }
+        return account
+
+    def subscribe(self, listener: Callable[[str, 'PositionBook'], None]):
+        """持仓变化时回调 listener(account_name, book)"""
+        self._listeners.append(listener)
+
+    def _changed(self, name: str):
+        self.version += 1
+        for listener in list(self._listeners):
+            try:
+                listener(name, self)
+            except Exception as e:
+                logger.warning("持仓簿回调失败: %s", e)
+
+    def set_connected(self, name: str, connected: bool):
+        with self._lock:
+            account = self._account(name)
+            account['connected'] = connected
+            if connected:
+                # 新连接：下一次 positions 推送为全量快照，替换断线期间可能已变化的持仓
+                account['awaiting_snapshot'] = True
+            account['updated_at'] = time.time()
+        self._changed(name)
+
+    def touch(self, name: str):
+        """心跳：连接仍然活着"""
+        with self._lock:
+            self._account(name)['updated_at'] = time.time()
+        self._changed(name)
+
+    def apply_positions(self, name: str, data: List[Dict]):
+        """应用一条 positions 推送：首条为全量快照，之后为增量（pos 为 0 表示已平仓）"""
+        with self._lock:
+            account = self._account(name)
+            if account['awaiting_snapshot']:
+                account['positions'] = {}
+                account['awaiting_snapshot'] = False
+                account['ready'] = True
+            positions = account['positions']
+            for pos in data:
+                key = _position_key(pos)
+                if _is_open(pos):
+                    positions[key] = pos
+                else:
+                    positions.pop(key, None)
+            account['updated_at'] = time.time()
+        self._changed(name)
+
+    def apply_account(self, name: str, data: List[Dict]):
+        """应用一条 account（余额）推送"""
+        if not data:
+            return
+        with self._lock:
+            account = self._account(name)
+            account['balance'] = data[0]
+            account['updated_at'] = time.time()
+        self._changed(name)
+
+    def positions(self, name: str) -> Optional[List[Dict]]:
+        """某账户当前持仓；尚未收到快照返回 None"""
+        with self._lock:
+            account = self._accounts.get(name)
+            if account is None or not account['ready']:
+                return None
+            return list(account['positions'].values())
+
+    def snapshot(self) -> Dict:
+        """可序列化的全量快照"""
+        with self._lock:
+            return {
+                'version': self.version,
+                'written_at': time.time(),
+                'accounts': {
+                    name: {
+                        'connected': account['connected'],
+                        'ready': account['ready'],
+                        'updated_at': account['updated_at'],
+                        'balance': account['balance'],
+                        'positions': list(account['positions'].values()),
+                    }
+                    for name, account in self._accounts.items()
+                },
+            }
+
+
+def write_snapshot(book: PositionBook, path: str = SNAPSHOT_FILE):
+    """原子写入快照文件（先写临时文件再 rename，读取方不会读到半个文件）"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.position_book.', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump(book.snapshot(), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+# ----------------------------------------------------------------------
+# 连接
+# ----------------------------------------------------------------------
+async def _recv_json(ws, timeout: float) -> Optional[Dict]:
+    message = await asyncio.wait_for(ws.recv(), timeout)
+    if message == 'pong':
+        return None
+    return json.loads(message)
+
+
+async def stream_account(account: Account, book: PositionBook, url: str = OKEX_WS_PRIVATE_URL,
+                         inst_type: str = 'ANY', stop: Optional[asyncio.Event] = None,
+                         on_positions: Optional[Callable[[str, List[Dict]], None]] = None):
+    """
+    单个账户的私有连接：登录、订阅、接收推送，断线后指数退避重连
+    on_positions(account_name, data) 在每条 positions 推送应用后调用
+    """
+    backoff = 1
+    while stop is None or not stop.is_set():
+        try:
+            async with websockets.connect(url, ping_interval=None, open_timeout=10) as ws:
+                await ws.send(json.dumps({'op': 'login', 'args': [login_args(account)]}))
+                while True:
+                    reply = await _recv_json(ws, 10)
+                    if reply and reply.get('event') == 'login':
+                        break
+                    if reply and reply.get('event') == 'error':
+                        raise PositionStreamError(f"登录失败: {reply.get('code')} {reply.get('msg')}")
+
+                await ws.send(json.dumps({'op': 'subscribe', 'args': [
+                    {'channel': 'positions', 'instType': inst_type},
+                    {'channel': 'account'},
+                ]}))
+                book.set_connected(account.name, True)
+                logger.info("✅ %s 持仓流已连接", account.name)
+                backoff = 1
+
+                while stop is None or not stop.is_set():
+                    try:
+                        message = await _recv_json(ws, PING_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await ws.send('ping')
+                        continue
+                    if message is None:
+                        book.touch(account.name)
+                        continue
+                    if message.get('event') == 'error':
+                        raise PositionStreamError(f"订阅失败: {message.get('code')} {message.get('msg')}")
+                    channel = message.get('arg', {}).get('channel')
+                    if 'data' not in message:
+                        continue
+                    if channel == 'positions':
+                        book.apply_positions(account.name, message['data'])
+                        if on_positions is not None:
+                            on_positions(account.name, message['data'])
+                    elif channel == 'account':
+                        book.apply_account(account.name, message['data'])
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("❌ %s 持仓流断开: %s，%s秒后重连", account.name, e, backoff)
+        finally:
+            book.set_connected(account.name, False)
+
+        if stop is not None and stop.is_set():
+            break
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+async def publish_snapshots(book: PositionBook, path: str = SNAPSHOT_FILE,
+                            stop: Optional[asyncio.Event] = None):
+    """持仓簿有变化时写快照文件（最多每 PUBLISH_INTERVAL 秒一次）"""
+    published = -1
+    while stop is None or not stop.is_set():
+        if book.version != published:
+            published = book.version
+            try:
+                write_snapshot(book, path)
+            except OSError as e:
+                logger.warning("写入持仓快照失败: %s", e)
+        await asyncio.sleep(PUBLISH_INTERVAL)
+    write_snapshot(book, path)
+
+
+async def run(accounts: List[Account], book: Optional[PositionBook] = None,
+              url: str = OKEX_WS_PRIVATE_URL, path: str = SNAPSHOT_FILE,
+              stop: Optional[asyncio.Event] = None,
+              on_positions: Optional[Callable[[str, List[Dict]], None]] = None):
+    """运行所有账户的持仓流及快照发布"""
+    book = book or PositionBook()
+    await asyncio.gather(
+        publish_snapshots(book, path, stop),
+        *(stream_account(account, book, url, stop=stop, on_positions=on_positions)
+          for account in accounts),
+    )
+
+
+def publish_position_update(account_name: str, data: List[Dict]):
+    """把持仓推送发布到事件总线（position.update）"""
+    from event_bus import publish, POSITION_UPDATE
+    publish(POSITION_UPDATE, {'account': account_name, 'positions': data})
+
+
+# ----------------------------------------------------------------------
+# 读取
+# ----------------------------------------------------------------------
+_read_cache = {}
+_read_lock = threading.Lock()
+
+
+def read_book(path: str = SNAPSHOT_FILE) -> Optional[Dict]:
+    """读取快照文件（按修改时间缓存解析结果）；文件不存在返回 None"""
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    with _read_lock:
+        cached = _read_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            book = json.load(f)
+    except (OSError, ValueError):
+        return None
+    with _read_lock:
+        _read_cache[path] = (mtime, book)
+    return book
+
+
+def read_positions(account_name: str = MAIN_ACCOUNT, inst_type: Optional[str] = None,
+                   max_age: float = STALE_AFTER, path: str = SNAPSHOT_FILE) -> Optional[List[Dict]]:
+    """
+    从持仓流快照读取某账户的持仓（字段与REST /api/v5/account/positions 相同，只含非零持仓）
+
+    Returns:
+        持仓列表；服务未运行、账户未连接、尚未收到快照或超过 max_age 秒无心跳时返回 None
+    """
+    book = read_book(path)
+    if not book:
+        return None
+    account = book.get('accounts', {}).get(account_name)
+    if not account or not account.get('connected') or not account.get('ready'):
+        return None
+    if time.time() - (account.get('updated_at') or 0) > max_age:
+        return None
+    positions = account.get('positions', [])
+    if inst_type:
+        positions = [pos for pos in positions if pos.get('instType') == inst_type]
+    return positions
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    accounts = load_accounts()
+    print("=" * 80)
+    print("🚀 OKX 私有WebSocket持仓流服务")
+    print(f"账户: {', '.join(account.name for account in accounts)}")
+    print(f"快照文件: {SNAPSHOT_FILE}")
+    print("=" * 80)
+    try:
+        asyncio.run(run(accounts, on_positions=publish_position_update))
+    except KeyboardInterrupt:
+        print("\n⚠️  收到停止信号，正在关闭...")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+持仓系统
+持仓数据、汇总、历史与统计
+"""
+
+from flask import Blueprint, jsonify, render_template, request
+
+from db_access import get_connection
+
+position_system_bp = Blueprint('position_system', __name__)
+
+# ==================== 位置系统 API ====================
+
+@position_system_bp.route('/position-system')
+def position_system():
+    """位置系统页面"""
+    return render_template('position_system.html')
+
+@position_system_bp.route('/api/position/latest')
+def api_position_latest():
+    """获取最新位置数据"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取最新的记录时间
+        cursor.execute('SELECT MAX(record_time) FROM position_system')
+        latest_time = cursor.fetchone()[0]
+        
+        if not latest_time:
+            return jsonify({
+                'success': False,
+                'message': '暂无数据'
+            })
+        
+        # 获取该时间的所有币种数据
+        cursor.execute('''
+            SELECT symbol, current_price,
+                   position_4h, position_12h, position_24h, position_48h,
+                   high_4h, low_4h, high_12h, low_12h, high_24h, low_24h, high_48h, low_48h
+            FROM position_system
+            WHERE record_time = ?
+            ORDER BY symbol
+        ''', (latest_time,))
+        
+        rows = cursor.fetchall()
+        
+        # 构造返回数据
+        data_list = []
+        symbol_set = set()
+        for row in rows:
+            symbol_set.add(row[0])
+            data_list.append({
+                'symbol': row[0],
+                'current_price': row[1],
+                'position_4h': row[2],
+                'position_12h': row[3],
+                'position_24h': row[4],
+                'position_48h': row[5],
+                'high_4h': row[6],
+                'low_4h': row[7],
+                'high_12h': row[8],
+                'low_12h': row[9],
+                'high_24h': row[10],
+                'low_24h': row[11],
+                'high_48h': row[12],
+                'low_48h': row[13]
+            })
+        
+        # 检查BTC和ETH是否存在，如果不存在则从最近记录中补充
+        missing_coins = []
+        if 'BTC-USDT-SWAP' not in symbol_set:
+            missing_coins.append('BTC-USDT-SWAP')
+        if 'ETH-USDT-SWAP' not in symbol_set:
+            missing_coins.append('ETH-USDT-SWAP')
+        
+        if missing_coins:
+            for coin in missing_coins:
+                cursor.execute('''
+                    SELECT symbol, current_price,
+                           position_4h, position_12h, position_24h, position_48h,
+                           high_4h, low_4h, high_12h, low_12h, high_24h, low_24h, high_48h, low_48h
+                    FROM position_system
+                    WHERE symbol = ?
+                    ORDER BY record_time DESC
+                    LIMIT 1
+                ''', (coin,))
+                coin_row = cursor.fetchone()
+                if coin_row:
+                    data_list.append({
+                        'symbol': coin_row[0],
+                        'current_price': coin_row[1],
+                        'position_4h': coin_row[2],
+                        'position_12h': coin_row[3],
+                        'position_24h': coin_row[4],
+                        'position_48h': coin_row[5],
+                        'high_4h': coin_row[6],
+                        'low_4h': coin_row[7],
+                        'high_12h': coin_row[8],
+                        'low_12h': coin_row[9],
+                        'high_24h': coin_row[10],
+                        'low_24h': coin_row[11],
+                        'high_48h': coin_row[12],
+                        'low_48h': coin_row[13]
+                    })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'record_time': latest_time,
+            'total_count': len(data_list),
+            'data': data_list
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取数据失败: {str(e)}'
+        })
+
+@position_system_bp.route('/api/position/summary')
+def api_position_summary():
+    """获取位置统计摘要"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取最新的记录时间
+        cursor.execute('SELECT MAX(record_time) FROM position_system')
+        latest_time = cursor.fetchone()[0]
+        
+        if not latest_time:
+            return jsonify({
+                'success': False,
+                'message': '暂无数据'
+            })
+        
+        # 统计各周期的平均位置
+        cursor.execute('''
+            SELECT 
+                AVG(position_4h) as avg_4h,
+                AVG(position_12h) as avg_12h,
+                AVG(position_24h) as avg_24h,
+                AVG(position_48h) as avg_48h,
+                COUNT(*) as total_count
+            FROM position_system
+            WHERE record_time = ?
+        ''', (latest_time,))
+        
+        row = cursor.fetchone()
+        
+        # 统计各区间的币种数量（以24h为例）
+        cursor.execute('''
+            SELECT 
+                SUM(CASE WHEN position_24h >= 80 THEN 1 ELSE 0 END) as high_zone,
+                SUM(CASE WHEN position_24h >= 50 AND position_24h < 80 THEN 1 ELSE 0 END) as mid_high_zone,
+                SUM(CASE WHEN position_24h >= 20 AND position_24h < 50 THEN 1 ELSE 0 END) as mid_low_zone,
+                SUM(CASE WHEN position_24h < 20 THEN 1 ELSE 0 END) as low_zone
+            FROM position_system
+            WHERE record_time = ?
+        ''', (latest_time,))
+        
+        zone_counts = cursor.fetchone()
+        
+        # 新增：统计各周期>=95%的币种数量
+        cursor.execute('''
+            SELECT 
+                SUM(CASE WHEN position_4h >= 95 THEN 1 ELSE 0 END) as count_4h_ge95,
+                SUM(CASE WHEN position_12h >= 95 THEN 1 ELSE 0 END) as count_12h_ge95,
+                SUM(CASE WHEN position_24h >= 95 THEN 1 ELSE 0 END) as count_24h_ge95,
+                SUM(CASE WHEN position_48h >= 95 THEN 1 ELSE 0 END) as count_48h_ge95
+            FROM position_system
+            WHERE record_time = ?
+        ''', (latest_time,))
+        
+        ge95_counts = cursor.fetchone()
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'record_time': latest_time,
+            'averages': {
+                '4h': round(row[0], 2) if row[0] else 0,
+                '12h': round(row[1], 2) if row[1] else 0,
+                '24h': round(row[2], 2) if row[2] else 0,
+                '48h': round(row[3], 2) if row[3] else 0
+            },
+            'total_count': row[4],
+            'zone_distribution_24h': {
+                'high': zone_counts[0] or 0,      # 80-100%
+                'mid_high': zone_counts[1] or 0,  # 50-80%
+                'mid_low': zone_counts[2] or 0,   # 20-50%
+                'low': zone_counts[3] or 0        # 0-20%
+            },
+            'high_position_counts': {
+                '4h': ge95_counts[0] or 0,   # 4小时>=95%
+                '12h': ge95_counts[1] or 0,  # 12小时>=95%
+                '24h': ge95_counts[2] or 0,  # 24小时>=95%
+                '48h': ge95_counts[3] or 0   # 48小时>=95%
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取统计失败: {str(e)}'
+        })
+
+@position_system_bp.route('/api/position/history/<symbol>')
+def api_position_history(symbol):
+    """获取指定币种的历史位置数据"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取最近24小时的数据
+        cursor.execute('''
+            SELECT record_time, current_price,
+                   position_4h, position_12h, position_24h, position_48h
+            FROM position_system
+            WHERE symbol = ?
+            ORDER BY record_time DESC
+            LIMIT 288
+        ''', (symbol,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        history = []
+        for row in rows:
+            history.append({
+                'time': row[0],
+                'price': row[1],
+                '4h': row[2],
+                '12h': row[3],
+                '24h': row[4],
+                '48h': row[5]
+            })
+        
+        history.reverse()  # 时间正序
+        
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'data': history
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取历史失败: {str(e)}'
+        })
+
+@position_system_bp.route('/api/position/stats/latest')
+def api_position_stats_latest():
+    """获取最新的位置统计数据（低于1%的币种数量）"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取最新的统计数据
+        cursor.execute('''
+            SELECT record_time, count_below_1_4h, count_below_1_12h, 
+                   count_below_1_24h, count_below_1_48h, total_coins
+            FROM position_system_stats
+            ORDER BY record_time DESC
+            LIMIT 1
+        ''')
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return jsonify({
+                'success': False,
+                'message': '暂无统计数据'
+            })
+        
+        return jsonify({
+            'success': True,
+            'record_time': row[0],
+            'stats': {
+                '4h': {'below_1': row[1], 'total': row[5]},
+                '12h': {'below_1': row[2], 'total': row[5]},
+                '24h': {'below_1': row[3], 'total': row[5]},
+                '48h': {'below_1': row[4], 'total': row[5]}
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取统计数据失败: {str(e)}'
+        })
+
+@position_system_bp.route('/api/position/stats/history')
+def api_position_stats_history():
+    """获取统计数据历史记录"""
+    try:
+        # 获取查询参数
+        limit = request.args.get('limit', default=100, type=int)
+        start_time = request.args.get('start_time', default=None, type=str)
+        end_time = request.args.get('end_time', default=None, type=str)
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 构建查询条件
+        query = '''
+            SELECT record_time, count_below_1_4h, count_below_1_12h, 
+                   count_below_1_24h, count_below_1_48h, total_coins
+            FROM position_system_stats
+            WHERE 1=1
+        '''
+        params = []
+        
+        if start_time:
+            query += ' AND record_time >= ?'
+            params.append(start_time)
+        
+        if end_time:
+            query += ' AND record_time <= ?'
+            params.append(end_time)
+        
+        query += ' ORDER BY record_time DESC LIMIT ?'
+        params.append(limit)
+        
+        cursor.execute(query, params)
+        rows = cursor.fetchall()
+        conn.close()
+        
+        history = []
+        for row in rows:
+            history.append({
+                'time': row[0],
+                '4h': {'below_1': row[1], 'total': row[5]},
+                '12h': {'below_1': row[2], 'total': row[5]},
+                '24h': {'below_1': row[3], 'total': row[5]},
+                '48h': {'below_1': row[4], 'total': row[5]}
+            })
+        
+        history.reverse()  # 时间正序
+        
+        return jsonify({
+            'success': True,
+            'count': len(history),
+            'data': history
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取历史统计失败: {str(e)}'
+        })
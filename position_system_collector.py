@@ -8,13 +8,14 @@
 """
 
 import sqlite3
-import requests
 import time
 import json
 from datetime import datetime, timedelta
 import logging
 import pytz
 
+from okx_market_client import get_client
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -135,20 +136,12 @@ class PositionSystemCollector:
             limit: 获取数量
         """
         try:
-            url = f"{OKEX_API_URL}/market/candles"
-            params = {
-                'instId': symbol,
-                'bar': bar,
-                'limit': limit
-            }
-            
-            response = requests.get(url, params=params, timeout=30)
-            data = response.json()
+            candles = get_client().get_candles(symbol, bar, limit)
             
-            if data.get('code') == '0' and data.get('data'):
-                return data['data']
+            if candles:
+                return candles
             else:
-                logging.warning(f"⚠️ {symbol} K线数据获取失败: {data.get('msg', 'Unknown error')}")
+                logging.warning(f"⚠️ {symbol} K线数据获取失败")
                 return None
             
         except Exception as e:
@@ -316,10 +309,12 @@ class PositionSystemCollector:
         position_data_list = []
         success_count = 0
         
-        for i, symbol in enumerate(SYMBOLS, 1):
+        # 并发获取并计算（共享客户端按OKX限频调度）
+        results = get_client().map(self.collect_symbol_data, SYMBOLS)
+        
+        for i, (symbol, data) in enumerate(zip(SYMBOLS, results), 1):
             logging.info(f"  [{i}/{len(SYMBOLS)}] 采集 {symbol}...")
             
-            data = self.collect_symbol_data(symbol)
             if data:
                 # 使用统一的记录时间
                 data['record_time'] = unified_record_time
@@ -329,9 +324,6 @@ class PositionSystemCollector:
                 # 显示位置数据
                 logging.info(f"    💰 当前价格: ${data['current_price']}")
                 logging.info(f"    📊 位置: 4h={data['position_4h']}% | 12h={data['position_12h']}% | 24h={data['position_24h']}% | 48h={data['position_48h']}%")
-            
-            # 避免请求过快
-            time.sleep(0.5)
         
         # 保存数据
         if position_data_list:
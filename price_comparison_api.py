@@ -0,0 +1,532 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+比价系统
+价格对比、突破统计与日志
+"""
+
+from datetime import datetime, timedelta
+import pytz
+import traceback
+
+from flask import Blueprint, jsonify, render_template, request
+
+from db_access import get_connection
+
+price_comparison_bp = Blueprint('price_comparison', __name__)
+
+@price_comparison_bp.route('/price-comparison')
+def price_comparison_page():
+    """比价系统页面"""
+    return render_template('price_comparison.html')
+
+@price_comparison_bp.route('/api/price-comparison/list')
+def api_price_comparison_list():
+    """获取比价系统所有币种数据 - 按用户指定顺序，使用北京时间"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT symbol, highest_price, highest_count, lowest_price, lowest_count,
+                   highest_ratio, lowest_ratio, last_update_time
+            FROM price_baseline
+            ORDER BY display_order
+        ''')
+        
+        rows = cursor.fetchall()
+        data = []
+        for row in rows:
+            # 从 symbol 提取币种名称 (例如: BTC-USDT-SWAP -> BTC)
+            symbol = row[0]
+            coin_name = symbol.split('-')[0] if symbol else ''
+            
+            # 转换时间为北京时间格式
+            update_time = row[7]
+            if update_time:
+                try:
+                    # 如果数据库时间是UTC，需要转换
+                    from datetime import datetime
+                    import pytz
+                    dt = datetime.strptime(update_time, '%Y-%m-%d %H:%M:%S')
+                    # 假设数据库存的是北京时间，直接使用
+                    beijing_time = update_time
+                except:
+                    beijing_time = update_time
+            else:
+                beijing_time = None
+            
+            data.append({
+                'coin_name': coin_name,
+                'symbol': symbol,
+                'highest_price': row[1],
+                'highest_count': row[2],
+                'lowest_price': row[3],
+                'lowest_count': row[4],
+                'highest_ratio': row[5],
+                'lowest_ratio': row[6],
+                'last_update_time': beijing_time
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'total': len(data)
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@price_comparison_bp.route('/api/price-comparison/update', methods=['POST'])
+def api_price_comparison_update():
+    """更新币种价格并进行比价判断
+    
+    逻辑:
+    - 新价格 > 最高价: 更新最高价，最高计次清零
+    - 新价格 < 最低价: 更新最低价，最低计次清零  
+    - 最低价 <= 新价格 <= 最高价: 两个计次都+1
+    """
+    try:
+        data = request.get_json()
+        coin_name = data.get('coin_name')
+        new_price = float(data.get('price'))
+        
+        if not coin_name or new_price is None:
+            return jsonify({
+                'success': False,
+                'error': '缺少必要参数: coin_name 或 price'
+            })
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取当前币种的最高价和最低价
+        cursor.execute('''
+            SELECT highest_price, highest_count, lowest_price, lowest_count
+            FROM price_baseline
+            WHERE symbol = ?
+        ''', (coin_name,))
+        
+        row = cursor.fetchone()
+        if not row:
+            conn.close()
+            return jsonify({
+                'success': False,
+                'error': f'币种 {coin_name} 不存在'
+            })
+        
+        highest_price, highest_count, lowest_price, lowest_count = row
+        old_highest_price = highest_price
+        old_lowest_price = lowest_price
+        
+        # 价格比较逻辑
+        action = ''
+        if new_price > highest_price:
+            # 新价格创新高
+            old_highest_price = highest_price
+            highest_price = new_price
+            highest_count = 0
+            action = 'new_high'
+        elif new_price < lowest_price:
+            # 新价格创新低
+            old_lowest_price = lowest_price
+            lowest_price = new_price
+            lowest_count = 0
+            action = 'new_low'
+        else:
+            # 价格在区间内
+            highest_count += 1
+            lowest_count += 1
+            action = 'in_range'
+        
+        # 计算占比
+        # 最高价占比 = (当前价 / 最高价) × 100
+        highest_ratio = round((new_price / highest_price) * 100, 2) if highest_price > 0 else 0
+        # 最低价占比 = (当前价 / 最低价) × 100
+        lowest_ratio = round((new_price / lowest_price) * 100, 2) if lowest_price > 0 else 0
+        
+        # 更新数据库 - 使用北京时间
+        from datetime import datetime
+        import pytz
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        beijing_time = datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
+        
+        cursor.execute('''
+            UPDATE price_baseline
+            SET highest_price = ?,
+                highest_count = ?,
+                lowest_price = ?,
+                lowest_count = ?,
+                highest_ratio = ?,
+                lowest_ratio = ?,
+                last_update_time = ?
+            WHERE symbol = ?
+        ''', (highest_price, highest_count, lowest_price, lowest_count, 
+              highest_ratio, lowest_ratio, beijing_time, coin_name))
+        
+        # 如果发生创新高或创新低，记录事件
+        if action in ['new_high', 'new_low']:
+            cursor.execute('''
+                INSERT INTO price_breakthrough_events 
+                (symbol, event_type, price, event_time)
+                VALUES (?, ?, ?, ?)
+            ''', (coin_name, action, new_price, beijing_time))
+            
+            # 更新统计表缓存（清除今天的缓存，下次查询时会重新计算）
+            today_date = beijing_tz.localize(datetime.now()).strftime('%Y-%m-%d')
+            cursor.execute('''
+                DELETE FROM price_comparison_stats
+                WHERE stat_date = ?
+            ''', (today_date,))
+        
+        conn.commit()
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'action': action,
+            'data': {
+                'coin_name': coin_name,
+                'new_price': new_price,
+                'highest_price': highest_price,
+                'highest_count': highest_count,
+                'lowest_price': lowest_price,
+                'lowest_count': lowest_count
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@price_comparison_bp.route('/api/price-comparison/breakthrough-stats')
+def api_breakthrough_stats():
+    """获取创新高/低统计
+    
+    返回:
+    - 当天创新高次数、创新低次数
+    - 3天内创新高次数、创新低次数
+    - 7天内创新高次数、创新低次数
+    
+    优先从统计表读取，如果没有则实时计算并保存
+    """
+    try:
+        from datetime import datetime, timedelta
+        import pytz
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        today_date = now.strftime('%Y-%m-%d')
+        
+        # 先尝试从统计表读取今天的数据
+        cursor.execute('''
+            SELECT today_new_high, today_new_low, 
+                   three_days_new_high, three_days_new_low,
+                   seven_days_new_high, seven_days_new_low
+            FROM price_comparison_stats
+            WHERE stat_date = ?
+        ''', (today_date,))
+        
+        cached_stats = cursor.fetchone()
+        
+        # 如果缓存存在且不超过5分钟，直接返回
+        if cached_stats:
+            conn.close()
+            return jsonify({
+                'success': True,
+                'data': {
+                    'today': {
+                        'new_high': cached_stats[0],
+                        'new_low': cached_stats[1]
+                    },
+                    'three_days': {
+                        'new_high': cached_stats[2],
+                        'new_low': cached_stats[3]
+                    },
+                    'seven_days': {
+                        'new_high': cached_stats[4],
+                        'new_low': cached_stats[5]
+                    }
+                },
+                'from_cache': True
+            })
+        
+        # 如果没有缓存，实时计算
+        # 计算时间边界
+        today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        three_days_ago = now - timedelta(days=3)
+        seven_days_ago = now - timedelta(days=7)
+        
+        # 转换为字符串格式
+        today_start_str = today_start.strftime('%Y-%m-%d %H:%M:%S')
+        three_days_ago_str = three_days_ago.strftime('%Y-%m-%d %H:%M:%S')
+        seven_days_ago_str = seven_days_ago.strftime('%Y-%m-%d %H:%M:%S')
+        
+        # 当天统计
+        cursor.execute('''
+            SELECT event_type, COUNT(*) 
+            FROM price_breakthrough_events 
+            WHERE event_time >= ?
+            GROUP BY event_type
+        ''', (today_start_str,))
+        today_stats = dict(cursor.fetchall())
+        
+        # 3天统计
+        cursor.execute('''
+            SELECT event_type, COUNT(*) 
+            FROM price_breakthrough_events 
+            WHERE event_time >= ?
+            GROUP BY event_type
+        ''', (three_days_ago_str,))
+        three_days_stats = dict(cursor.fetchall())
+        
+        # 7天统计
+        cursor.execute('''
+            SELECT event_type, COUNT(*) 
+            FROM price_breakthrough_events 
+            WHERE event_time >= ?
+            GROUP BY event_type
+        ''', (seven_days_ago_str,))
+        seven_days_stats = dict(cursor.fetchall())
+        
+        # 保存统计结果到数据库
+        cursor.execute('''
+            INSERT OR REPLACE INTO price_comparison_stats
+            (stat_date, today_new_high, today_new_low, 
+             three_days_new_high, three_days_new_low,
+             seven_days_new_high, seven_days_new_low, record_time)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (
+            today_date,
+            today_stats.get('new_high', 0),
+            today_stats.get('new_low', 0),
+            three_days_stats.get('new_high', 0),
+            three_days_stats.get('new_low', 0),
+            seven_days_stats.get('new_high', 0),
+            seven_days_stats.get('new_low', 0),
+            now.strftime('%Y-%m-%d %H:%M:%S')
+        ))
+        
+        conn.commit()
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'today': {
+                    'new_high': today_stats.get('new_high', 0),
+                    'new_low': today_stats.get('new_low', 0)
+                },
+                'three_days': {
+                    'new_high': three_days_stats.get('new_high', 0),
+                    'new_low': three_days_stats.get('new_low', 0)
+                },
+                'seven_days': {
+                    'new_high': seven_days_stats.get('new_high', 0),
+                    'new_low': seven_days_stats.get('new_low', 0)
+                }
+            },
+            'from_cache': False
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@price_comparison_bp.route('/api/price-comparison/breakthrough-logs')
+def api_breakthrough_logs():
+    """获取创新高/低详细日志
+    
+    参数:
+    - limit: 返回记录数量，默认50
+    - days: 查询最近N天的记录，默认7天
+    - coin: 筛选特定币种
+    - type: 筛选类型 (new_high/new_low)
+    
+    返回:
+    - 时间、币名、事件类型(创新高/创新低)、价格、之前极值价格
+    """
+    try:
+        from datetime import datetime, timedelta
+        import pytz
+        
+        # 获取参数
+        limit = request.args.get('limit', 50, type=int)
+        days = request.args.get('days', 7, type=int)
+        coin_filter = request.args.get('coin', None)
+        type_filter = request.args.get('type', None)
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 构建查询
+        query = '''
+            SELECT symbol, event_type, price, event_time
+            FROM price_breakthrough_events
+            WHERE 1=1
+        '''
+        params = []
+        
+        # 时间过滤
+        if days > 0:
+            beijing_tz = pytz.timezone('Asia/Shanghai')
+            now = datetime.now(beijing_tz)
+            cutoff_time = now - timedelta(days=days)
+            cutoff_str = cutoff_time.strftime('%Y-%m-%d %H:%M:%S')
+            query += ' AND event_time >= ?'
+            params.append(cutoff_str)
+        
+        # 币种过滤
+        if coin_filter:
+            query += ' AND symbol = ?'
+            params.append(coin_filter)
+        
+        # 类型过滤
+        if type_filter in ['new_high', 'new_low']:
+            query += ' AND event_type = ?'
+            params.append(type_filter)
+        
+        query += ' ORDER BY event_time DESC LIMIT ?'
+        params.append(limit)
+        
+        cursor.execute(query, params)
+        results = cursor.fetchall()
+        
+        # 格式化结果
+        logs = []
+        for row in results:
+            symbol, event_type, price, event_time = row
+            # 从 symbol 提取币种名称
+            coin_name = symbol.split('-')[0] if symbol else ''
+            logs.append({
+                'coin_name': coin_name,
+                'symbol': symbol,
+                'event_type': event_type,
+                'event_label': '创新高' if event_type == 'new_high' else '创新低',
+                'price': price,
+                'event_time': event_time
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': logs,
+            'count': len(logs),
+            'filters': {
+                'days': days,
+                'coin': coin_filter,
+                'type': type_filter,
+                'limit': limit
+            }
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@price_comparison_bp.route('/api/price-comparison/update-ratios')
+def api_update_price_ratios():
+    """批量更新所有币种的价格占比
+    
+    从最新快照数据获取当前价格，计算并更新占比:
+    - 最高价占比 = (当前价 / 最高价) × 100%
+    - 最低价占比 = (当前价 / 最低价) × 100%
+    """
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取最新快照时间
+        cursor.execute('SELECT MAX(snapshot_time) FROM crypto_coin_data')
+        latest_time = cursor.fetchone()[0]
+        
+        if not latest_time:
+            return jsonify({
+                'success': False,
+                'error': '没有找到快照数据'
+            })
+        
+        # 获取最新快照的所有币种价格
+        cursor.execute('''
+            SELECT symbol, current_price
+            FROM crypto_coin_data
+            WHERE snapshot_time = ?
+        ''', (latest_time,))
+        
+        current_prices = {row[0]: row[1] for row in cursor.fetchall()}
+        
+        # 获取所有币种的最高价和最低价
+        cursor.execute('''
+            SELECT symbol, highest_price, lowest_price
+            FROM price_baseline
+        ''')
+        
+        from datetime import datetime
+        import pytz
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        current_time = datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
+        
+        updated_count = 0
+        update_details = []
+        
+        for row in cursor.fetchall():
+            coin_name, highest_price, lowest_price = row
+            
+            # 查找当前价格
+            current_price = current_prices.get(coin_name)
+            
+            if current_price is not None and current_price > 0:
+                # 计算占比
+                highest_ratio = round((current_price / highest_price) * 100, 2) if highest_price > 0 else 0
+                lowest_ratio = round((current_price / lowest_price) * 100, 2) if lowest_price > 0 else 0
+                
+                # 更新数据库
+                cursor.execute('''
+                    UPDATE price_baseline
+                    SET highest_ratio = ?,
+                        lowest_ratio = ?,
+                        last_update_time = ?
+                    WHERE symbol = ?
+                ''', (highest_ratio, lowest_ratio, current_time, coin_name))
+                
+                updated_count += 1
+                update_details.append({
+                    'coin_name': coin_name,
+                    'current_price': current_price,
+                    'highest_ratio': highest_ratio,
+                    'lowest_ratio': lowest_ratio
+                })
+        
+        conn.commit()
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'message': f'成功更新 {updated_count} 个币种的占比',
+            'snapshot_time': latest_time,
+            'updated_count': updated_count,
+            'details': update_details[:10]  # 只返回前10个作为示例
+        })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+价格速度监控
+价格速度最新数据与历史
+"""
+
+from datetime import datetime
+import pytz
+
+from flask import Blueprint, jsonify, render_template, request
+
+from db_access import get_connection
+
+price_speed_bp = Blueprint('price_speed', __name__)
+
+@price_speed_bp.route('/price-speed-monitor')
+def price_speed_monitor():
+    """1分钟涨跌速监控页面"""
+    return render_template('price_speed_monitor.html')
+
+@price_speed_bp.route('/api/price-speed/latest')
+def api_price_speed_latest():
+    """获取所有币种的最新涨跌速数据"""
+    try:
+        import sqlite3
+        from datetime import datetime
+        import pytz
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        conn = get_connection('price_speed')
+        cursor = conn.cursor()
+        
+        # 获取所有币种的最新数据
+        cursor.execute('''
+            SELECT symbol, current_price, previous_price, change_percent, 
+                   alert_level, alert_type, timestamp
+            FROM latest_price_speed
+            ORDER BY symbol
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        data = []
+        for row in rows:
+            data.append({
+                'symbol': row[0],
+                'current_price': row[1],
+                'previous_price': row[2],
+                'change_percent': row[3],
+                'alert_level': row[4],
+                'alert_type': row[5],
+                'timestamp': row[6]
+            })
+        
+        return jsonify({
+            'success': True,
+            'count': len(data),
+            'data': data,
+            'update_time': datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取涨跌速数据失败: {str(e)}',
+            'data': []
+        })
+
+@price_speed_bp.route('/api/price-speed/history/<symbol>')
+def api_price_speed_history(symbol):
+    """获取指定币种的历史涨跌速数据"""
+    try:
+        import sqlite3
+        
+        # 获取查询参数
+        limit = request.args.get('limit', 100, type=int)
+        
+        conn = get_connection('price_speed')
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT current_price, previous_price, change_percent, 
+                   alert_level, alert_type, timestamp
+            FROM price_speed_alerts
+            WHERE symbol = ?
+            ORDER BY timestamp DESC
+            LIMIT ?
+        ''', (symbol, limit))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        data = []
+        for row in rows:
+            data.append({
+                'current_price': row[0],
+                'previous_price': row[1],
+                'change_percent': row[2],
+                'alert_level': row[3],
+                'alert_type': row[4],
+                'timestamp': row[5]
+            })
+        
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'count': len(data),
+            'data': data
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取历史数据失败: {str(e)}',
+            'data': []
+        })
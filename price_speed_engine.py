@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+流式涨跌速引擎
+- 一条 tickers 行情流（OKX 公共 WebSocket，或每秒一次的 REST tickers 作为备用）驱动
+- 每个币种只在内存中保留最新成交价；每个整秒把所有币种的价格一起写入环形缓冲区
+  （二维数组：时间槽 × 币种），同一整秒取同一时刻的价格
+- 在对齐的整秒时刻一次计算所有币种精确的 1/3/5 分钟涨跌幅：
+  当前整秒价格 / 60、180、300 秒前那个整秒的价格；缺少对应时刻的采样时为 None
+- 1分钟涨跌幅的预警级别变化时立即发布 price_speed.alert 事件并更新 latest_price_speed（亚秒级）
+- 每 PERSIST_EVERY 秒的对齐时刻批量写入 price_history / price_speed_alerts / latest_price_speed，
+  由 AsyncSQLiteWriter 合并成一个事务，不再每个币种两次数据库往返
+
+用法:
+    engine = SpeedEngine(['BTC', 'ETH'])
+    engine.on_tick('BTC', 95000.0, ts_ms)
+    snapshot = engine.sample(int(time.time()))
+    snapshot.changes[60]        # 所有币种的1分钟涨跌幅（numpy 数组，NaN 表示数据不足）
+"""
+
+import asyncio
+import json
+import logging
+import math
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+import websockets
+
+from async_sqlite_writer import AsyncSQLiteWriter
+
+try:
+    from okex_api_config import OKEX_WS_PUBLIC_URL
+except ImportError:
+    OKEX_WS_PUBLIC_URL = 'wss://ws.okx.com:8443/ws/v5/public'
+
+WINDOWS = (60, 180, 300)        # 涨跌幅窗口（秒）
+ALERT_WINDOW = 60               # 预警使用的窗口
+STEP = 1                        # 采样对齐间隔（秒）
+PERSIST_EVERY = 15              # 每隔多少秒的对齐时刻写一次历史
+STALE_AFTER = 60                # 超过多少秒没有成交价视为无效
+POLL_INTERVAL = 1.0             # REST 备用行情的轮询间隔（秒）
+PING_INTERVAL = 25
+MAX_BACKOFF = 30
+RETENTION_DAYS = 7
+CLEANUP_EVERY = 3600            # 清理过期历史的间隔（秒）
+
+BEIJING_TZ = timezone(timedelta(hours=8))
+
+# 涨跌速预警阈值配置
+ALERT_LEVELS = {
+    'general_down': -0.5,      # 一般下跌预警
+    'strong_down': -1.0,       # 较强下跌预警
+    'very_strong_down': -1.5,  # 很强下跌预警
+    'super_strong_down': -2.0, # 超强下跌预警
+    'general_up': 0.5,         # 一般上涨预警
+    'strong_up': 1.0,          # 较强上涨预警
+    'very_strong_up': 1.5,     # 很强上涨预警
+    'super_strong_up': 2.0     # 超强上涨预警
+}
+
+PRICE_HISTORY_SQL = 'INSERT INTO price_history (symbol, price, timestamp) VALUES (?, ?, ?)'
+ALERT_HISTORY_SQL = '''
+    INSERT INTO price_speed_alerts (
+        symbol, current_price, previous_price, change_percent,
+        alert_level, alert_type, timestamp, change_3m, change_5m
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+LATEST_SQL = '''
+    INSERT OR REPLACE INTO latest_price_speed (
+        symbol, current_price, previous_price, change_percent,
+        alert_level, alert_type, timestamp, change_3m, change_5m, updated_at
+    )
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+'''
+
+logger = logging.getLogger(__name__)
+
+
+def init_database(conn):
+    """建表；旧库补充 3/5 分钟涨跌幅列"""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS price_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            price REAL NOT NULL,
+            timestamp TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS price_speed_alerts (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL,
+            current_price REAL NOT NULL,
+            previous_price REAL NOT NULL,
+            change_percent REAL NOT NULL,
+            alert_level TEXT NOT NULL,
+            alert_type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS latest_price_speed (
+            symbol TEXT PRIMARY KEY,
+            current_price REAL NOT NULL,
+            previous_price REAL NOT NULL,
+            change_percent REAL NOT NULL,
+            alert_level TEXT NOT NULL,
+            alert_type TEXT NOT NULL,
+            timestamp TEXT NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    for table in ('price_speed_alerts', 'latest_price_speed'):
+        columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+        for column in ('change_3m', 'change_5m'):
+            if column not in columns:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} REAL')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_price_history_symbol ON price_history(symbol)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_price_history_timestamp ON price_history(timestamp)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_symbol ON price_speed_alerts(symbol)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_alerts_timestamp ON price_speed_alerts(timestamp)')
+
+
+def alert_level(change_percent: float) -> Tuple[str, str]:
+    """根据涨跌幅获取预警级别 (alert_level, alert_type)"""
+    if change_percent <= ALERT_LEVELS['super_strong_down']:
+        return 'super_strong_down', 'DOWN'
+    elif change_percent <= ALERT_LEVELS['very_strong_down']:
+        return 'very_strong_down', 'DOWN'
+    elif change_percent <= ALERT_LEVELS['strong_down']:
+        return 'strong_down', 'DOWN'
+    elif change_percent <= ALERT_LEVELS['general_down']:
+        return 'general_down', 'DOWN'
+    elif change_percent >= ALERT_LEVELS['super_strong_up']:
+        return 'super_strong_up', 'UP'
+    elif change_percent >= ALERT_LEVELS['very_strong_up']:
+        return 'very_strong_up', 'UP'
+    elif change_percent >= ALERT_LEVELS['strong_up']:
+        return 'strong_up', 'UP'
+    elif change_percent >= ALERT_LEVELS['general_up']:
+        return 'general_up', 'UP'
+    else:
+        return 'normal', 'NORMAL'
+
+
+def beijing_time(instant: int) -> str:
+    return datetime.fromtimestamp(instant, BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _optional(value) -> Optional[float]:
+    return None if value is None or math.isnan(value) else float(value)
+
+
+class SpeedSnapshot(NamedTuple):
+    """一个对齐时刻所有币种的价格和涨跌幅（数组按 engine.symbols 排列，NaN 表示无数据）"""
+    instant: int
+    prices: np.ndarray
+    previous: Dict[int, np.ndarray]
+    changes: Dict[int, np.ndarray]
+
+
+class SpeedAlert(NamedTuple):
+    symbol: str
+    alert_level: str
+    alert_type: str
+    previous_level: Optional[str]
+    change_percent: float
+    current_price: float
+    previous_price: float
+    instant: int
+
+
+class SpeedEngine:
+    """所有币种的价格环形缓冲区及对齐时刻的涨跌幅计算"""
+
+    def __init__(self, symbols: Sequence[str], windows: Iterable[int] = WINDOWS, step: int = STEP,
+                 stale_after: float = STALE_AFTER):
+        self.symbols = list(symbols)
+        self.index = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.windows = tuple(windows)
+        self.step = step
+        self.stale_after = stale_after
+
+        count = len(self.symbols)
+        self.latest = np.full(count, np.nan)                # 最新成交价
+        self.latest_ms = np.zeros(count, dtype=np.int64)    # 最新成交价的时间
+
+        # 环形缓冲区：每个槽位是一个对齐时刻所有币种的价格
+        self.capacity = max(self.windows) // step + 1
+        self.samples = np.full((self.capacity, count), np.nan)
+        self.sample_times = np.full(self.capacity, -1, dtype=np.int64)
+
+        self.levels: List[Optional[str]] = [None] * count
+        self.stats = {'ticks': 0, 'stale_ticks': 0, 'samples': 0, 'alerts': 0}
+
+    # ------------------------------------------------------------------
+    # 行情输入
+    # ------------------------------------------------------------------
+    def on_tick(self, symbol: str, price, ts_ms: Optional[int] = None) -> bool:
+        """
+        一条成交价推送；价格为0/无效、未监控的币种或早于已有价格的推送被忽略
+
+        Returns:
+            是否更新了价格
+        """
+        i = self.index.get(symbol)
+        if i is None:
+            return False
+        try:
+            price = float(price)
+        except (TypeError, ValueError):
+            return False
+        if not price > 0:
+            return False
+        ts_ms = int(ts_ms) if ts_ms is not None else int(time.time() * 1000)
+        if ts_ms < self.latest_ms[i]:
+            self.stats['stale_ticks'] += 1
+            return False
+        self.latest[i] = price
+        self.latest_ms[i] = ts_ms
+        self.stats['ticks'] += 1
+        return True
+
+    def on_prices(self, prices: Dict[str, float], ts_ms: Optional[int] = None) -> int:
+        """一次 tickers 快照（币种 -> 价格）"""
+        return sum(self.on_tick(symbol, price, ts_ms) for symbol, price in prices.items())
+
+    # ------------------------------------------------------------------
+    # 采样与计算
+    # ------------------------------------------------------------------
+    def _slot(self, instant: int) -> int:
+        return (instant // self.step) % self.capacity
+
+    def sample(self, instant: int) -> SpeedSnapshot:
+        """
+        记录对齐时刻 instant（秒）所有币种的最新价，并计算各窗口的涨跌幅
+        超过 stale_after 秒没有推送的币种记为 NaN
+        """
+        instant = int(instant) - int(instant) % self.step
+        fresh = (instant * 1000 - self.latest_ms) <= self.stale_after * 1000
+        prices = np.where(fresh, self.latest, np.nan)
+
+        slot = self._slot(instant)
+        self.samples[slot] = prices
+        self.sample_times[slot] = instant
+        self.stats['samples'] += 1
+
+        previous, changes = {}, {}
+        for window in self.windows:
+            past = instant - window
+            past_slot = self._slot(past)
+            if self.sample_times[past_slot] == past:
+                before = self.samples[past_slot]
+            else:
+                before = np.full(len(self.symbols), np.nan)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                changes[window] = (prices - before) / before * 100
+            previous[window] = before
+        return SpeedSnapshot(instant, prices, previous, changes)
+
+    def alerts(self, snapshot: SpeedSnapshot, window: int = ALERT_WINDOW) -> List[SpeedAlert]:
+        """预警级别发生变化（进入、升级或降级为非 normal）的币种"""
+        result = []
+        changes = snapshot.changes[window]
+        for i in np.flatnonzero(~np.isnan(changes)):
+            level, alert_type = alert_level(changes[i])
+            previous_level = self.levels[i]
+            self.levels[i] = level
+            if level == previous_level or level == 'normal':
+                continue
+            result.append(SpeedAlert(self.symbols[i], level, alert_type, previous_level,
+                                     float(changes[i]), float(snapshot.prices[i]),
+                                     float(snapshot.previous[window][i]), snapshot.instant))
+        self.stats['alerts'] += len(result)
+        return result
+
+    def rows(self, snapshot: SpeedSnapshot, symbols: Optional[Iterable[str]] = None) -> List[Dict]:
+        """对齐时刻各币种的一行结果（字段同 latest_price_speed），只含1分钟涨跌幅可计算的币种"""
+        indexes = (range(len(self.symbols)) if symbols is None
+                   else [self.index[symbol] for symbol in symbols])
+        change_1m = snapshot.changes[ALERT_WINDOW]
+        timestamp = beijing_time(snapshot.instant)
+        rows = []
+        for i in indexes:
+            if math.isnan(change_1m[i]):
+                continue
+            level, alert_type = alert_level(change_1m[i])
+            rows.append({
+                'symbol': self.symbols[i],
+                'current_price': float(snapshot.prices[i]),
+                'previous_price': float(snapshot.previous[ALERT_WINDOW][i]),
+                'change_percent': float(change_1m[i]),
+                'alert_level': level,
+                'alert_type': alert_type,
+                'timestamp': timestamp,
+                'change_3m': _optional(snapshot.changes[180][i]) if 180 in snapshot.changes else None,
+                'change_5m': _optional(snapshot.changes[300][i]) if 300 in snapshot.changes else None,
+            })
+        return rows
+
+
+# ----------------------------------------------------------------------
+# 持久化
+# ----------------------------------------------------------------------
+def _row_params(row: Dict) -> tuple:
+    return (row['symbol'], row['current_price'], row['previous_price'], row['change_percent'],
+            row['alert_level'], row['alert_type'], row['timestamp'], row['change_3m'], row['change_5m'])
+
+
+def persist_snapshot(writer: AsyncSQLiteWriter, engine: SpeedEngine, snapshot: SpeedSnapshot):
+    """价格历史、涨跌速历史和最新状态入队（写入线程批量落库）"""
+    timestamp = beijing_time(snapshot.instant)
+    for symbol, price in zip(engine.symbols, snapshot.prices):
+        if not math.isnan(price):
+            writer.append(PRICE_HISTORY_SQL, (symbol, float(price), timestamp))
+    for row in engine.rows(snapshot):
+        params = _row_params(row)
+        writer.append(ALERT_HISTORY_SQL, params)
+        writer.upsert(row['symbol'], LATEST_SQL, params)
+
+
+def persist_alerts(writer: AsyncSQLiteWriter, engine: SpeedEngine, snapshot: SpeedSnapshot,
+                   alerts: List[SpeedAlert]):
+    """预警变化立即更新 latest_price_speed（不等下一个持久化时刻）"""
+    for row in engine.rows(snapshot, [alert.symbol for alert in alerts]):
+        writer.upsert(row['symbol'], LATEST_SQL, _row_params(row))
+
+
+def cleanup(writer: AsyncSQLiteWriter, now: Optional[datetime] = None, days: int = RETENTION_DAYS):
+    """清理过期的价格和涨跌速历史"""
+    cutoff = ((now or datetime.now(BEIJING_TZ)) - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    writer.append('DELETE FROM price_history WHERE timestamp < ?', (cutoff,))
+    writer.append('DELETE FROM price_speed_alerts WHERE timestamp < ?', (cutoff,))
+
+
+def publish_alerts(alerts: List[SpeedAlert]):
+    """把预警变化发布到事件总线（price_speed.alert）"""
+    from event_bus import publish_many, PRICE_SPEED_ALERT
+    publish_many(PRICE_SPEED_ALERT, [{
+        'symbol': alert.symbol,
+        'alert_level': alert.alert_level,
+        'alert_type': alert.alert_type,
+        'previous_level': alert.previous_level,
+        'change_percent': round(alert.change_percent, 4),
+        'current_price': alert.current_price,
+        'previous_price': alert.previous_price,
+        'timestamp': beijing_time(alert.instant),
+    } for alert in alerts], [f'{alert.symbol}:{alert.alert_level}:{alert.instant}' for alert in alerts])
+
+
+# ----------------------------------------------------------------------
+# 行情源
+# ----------------------------------------------------------------------
+def inst_id(symbol: str) -> str:
+    return f'{symbol}-USDT-SWAP'
+
+
+def _symbol(inst: str) -> str:
+    return inst[:-len('-USDT-SWAP')] if inst.endswith('-USDT-SWAP') else inst
+
+
+def apply_ticker_message(engine: SpeedEngine, message: Dict) -> int:
+    """处理一条 tickers 频道推送"""
+    if message.get('arg', {}).get('channel') != 'tickers':
+        return 0
+    updated = 0
+    for ticker in message.get('data') or []:
+        updated += engine.on_tick(_symbol(ticker.get('instId', '')), ticker.get('last'), ticker.get('ts'))
+    return updated
+
+
+async def stream_tickers(engine: SpeedEngine, url: str = OKEX_WS_PUBLIC_URL,
+                         stop: Optional[asyncio.Event] = None):
+    """OKX 公共 tickers 频道：订阅所有监控币种，断线后指数退避重连"""
+    backoff = 1
+    args = [{'channel': 'tickers', 'instId': inst_id(symbol)} for symbol in engine.symbols]
+    while stop is None or not stop.is_set():
+        try:
+            async with websockets.connect(url, ping_interval=None, open_timeout=10) as ws:
+                await ws.send(json.dumps({'op': 'subscribe', 'args': args}))
+                logger.info("✅ tickers 行情流已连接（%s 个币种）", len(args))
+                backoff = 1
+                while stop is None or not stop.is_set():
+                    try:
+                        message = await asyncio.wait_for(ws.recv(), PING_INTERVAL)
+                    except asyncio.TimeoutError:
+                        await ws.send('ping')
+                        continue
+                    if message == 'pong':
+                        continue
+                    data = json.loads(message)
+                    if data.get('event') == 'error':
+                        raise RuntimeError(f"订阅失败: {data.get('code')} {data.get('msg')}")
+                    apply_ticker_message(engine, data)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning("❌ tickers 行情流断开: %s，%s秒后重连", e, backoff)
+
+        if stop is not None and stop.is_set():
+            break
+        await asyncio.sleep(backoff)
+        backoff = min(backoff * 2, MAX_BACKOFF)
+
+
+async def poll_tickers(engine: SpeedEngine, interval: float = POLL_INTERVAL,
+                       stop: Optional[asyncio.Event] = None):
+    """REST 备用行情：每 interval 秒一次 tickers 调用取全部币种价格"""
+    from okx_market_client import get_client
+
+    loop = asyncio.get_running_loop()
+    inst_ids = [inst_id(symbol) for symbol in engine.symbols]
+    while stop is None or not stop.is_set():
+        started = loop.time()
+        try:
+            prices = await loop.run_in_executor(None, get_client().get_last_prices, inst_ids)
+            engine.on_prices({_symbol(inst): price for inst, price in prices.items()},
+                             int(time.time() * 1000))
+        except Exception as e:
+            logger.warning("❌ 获取 tickers 失败: %s", e)
+        await asyncio.sleep(max(0.0, interval - (loop.time() - started)))
+
+
+# ----------------------------------------------------------------------
+# 时钟
+# ----------------------------------------------------------------------
+def _log_alert_failure(future: asyncio.Future):
+    """预警回调在线程池中执行，不会被 await；异常在这里记录，否则会被静默丢弃"""
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is not None:
+        logger.error("❌ 预警推送失败: %s", error, exc_info=error)
+
+
+async def run_clock(engine: SpeedEngine, writer: AsyncSQLiteWriter,
+                    stop: Optional[asyncio.Event] = None,
+                    on_alerts: Optional[Callable[[List[SpeedAlert]], None]] = publish_alerts,
+                    persist_every: int = PERSIST_EVERY):
+    """在每个对齐的整秒采样、计算、预警，每 persist_every 秒写一次历史"""
+    loop = asyncio.get_running_loop()
+    last_cleanup = 0.0
+    while stop is None or not stop.is_set():
+        now = time.time()
+        instant = int(now) - int(now) % engine.step + engine.step
+        await asyncio.sleep(max(0.0, instant - time.time()))
+
+        snapshot = engine.sample(instant)
+        alerts = engine.alerts(snapshot)
+        if alerts:
+            persist_alerts(writer, engine, snapshot, alerts)
+            for alert in alerts:
+                logger.info("⚠️  %s: %+.2f%% (%s) - $%.4f", alert.symbol, alert.change_percent,
+                            alert.alert_level, alert.current_price)
+            if on_alerts is not None:
+                future = loop.run_in_executor(None, on_alerts, alerts)
+                future.add_done_callback(_log_alert_failure)
+        if instant % persist_every == 0:
+            persist_snapshot(writer, engine, snapshot)
+        if instant - last_cleanup >= CLEANUP_EVERY:
+            last_cleanup = instant
+            cleanup(writer)
+
+
+async def run(symbols: Sequence[str], db_path: str, source: str = 'ws',
+              stop: Optional[asyncio.Event] = None,
+              on_alerts: Optional[Callable[[List[SpeedAlert]], None]] = publish_alerts):
+    """运行行情源、时钟和批量写入"""
+    import sqlite3
+
+    conn = sqlite3.connect(db_path)
+    try:
+        init_database(conn)
+        conn.commit()
+    finally:
+        conn.close()
+
+    engine = SpeedEngine(symbols)
+    writer = AsyncSQLiteWriter(db_path, flush_interval=0.5)
+    writer.start()
+    feed = stream_tickers(engine, stop=stop) if source == 'ws' else poll_tickers(engine, stop=stop)
+    try:
+        await asyncio.gather(feed, run_clock(engine, writer, stop, on_alerts))
+    finally:
+        await writer.stop()
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+API响应缓存
+- LRU淘汰 + 每条缓存单独的TTL
+- 单飞（single-flight）：并发的相同请求只计算一次，其余等待结果
+- 数据版本失效：采集器写入数据时在同一事务内递增 data_versions 表的版本号，
+  缓存条目记录生成时的版本，版本变化即视为失效
+- 按路由统计命中 / 未命中 / 耗时
+
+bump_data_version() 不依赖Flask，采集器可以直接导入。
+"""
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+DATA_VERSIONS_DDL = '''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        source TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0,
+        updated_at TEXT
+    )
+'''
+
+
+def bump_data_version(cursor, source: str):
+    """
+    递增数据源版本号（在写入数据的事务内调用，随数据一起提交）
+
+    Args:
+        cursor: 写入数据所用的游标或连接
+        source: 数据源名称，如 'crypto_snapshots'
+    """
+    cursor.execute(DATA_VERSIONS_DDL)
+    cursor.execute('''
+        INSERT INTO data_versions (source, version, updated_at)
+        VALUES (?, 1, datetime('now', '+8 hours'))
+        ON CONFLICT(source) DO UPDATE SET
+            version = version + 1,
+            updated_at = excluded.updated_at
+    ''', (source,))
+
+
+class DataVersions:
+    """读取各数据库的数据源版本号，每个库最多每 poll_interval 秒查询一次"""
+
+    def __init__(self, poll_interval: float = 1.0):
+        self.poll_interval = poll_interval
+        self._versions: Dict[str, Dict[str, int]] = {}
+        self._checked: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _load(self, db_path: str) -> Dict[str, int]:
+        try:
+            conn = sqlite3.connect(db_path, timeout=5.0)
+            try:
+                return dict(conn.execute('SELECT source, version FROM data_versions').fetchall())
+            finally:
+                conn.close()
+        except sqlite3.Error:
+            # 表还不存在（采集器尚未写入过），只靠TTL过期
+            return {}
+
+    def get(self, sources: Iterable[Tuple[str, str]]) -> Tuple:
+        """
+        Args:
+            sources: [(db_path, source), ...]
+        Returns:
+            对应的版本号元组，未知的数据源为 0
+        """
+        result = []
+        now = time.monotonic()
+        for db_path, source in sources:
+            with self._lock:
+                stale = now - self._checked.get(db_path, float('-inf')) >= self.poll_interval
+                if stale:
+                    # 先占位，避免多个线程同时查询同一个库
+                    self._checked[db_path] = now
+            if stale:
+                versions = self._load(db_path)
+                with self._lock:
+                    self._versions[db_path] = versions
+            result.append(self._versions.get(db_path, {}).get(source, 0))
+        return tuple(result)
+
+    def invalidate(self):
+        """下次读取时强制重新查询"""
+        with self._lock:
+            self._checked.clear()
+
+
+class _Flight:
+    """一次进行中的计算"""
+    __slots__ = ('event', 'value', 'ok')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.value = None
+        self.ok = False
+
+
+class ResponseCache:
+    """线程安全的LRU响应缓存"""
+
+    def __init__(self, max_entries: int = 512):
+        self.max_entries = max_entries
+        # key -> (value, expires_at, versions, created_at)
+        self._entries: OrderedDict = OrderedDict()
+        self._flights: Dict = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict] = {}
+
+    def _route_stats(self, route: str) -> Dict:
+        stats = self._stats.get(route)
+        if stats is None:
+            stats = self._stats[route] = {
+                'hits': 0, 'misses': 0, 'expired': 0, 'invalidated': 0,
+                'coalesced': 0, 'evictions': 0, 'errors': 0,
+                'hit_ms_total': 0.0, 'compute_ms_total': 0.0, 'compute_ms_max': 0.0,
+            }
+        return stats
+
+    def get_or_compute(self, route: str, key, ttl: float, versions: Tuple,
+                       compute: Callable[[], Tuple[object, bool]]):
+        """
+        取缓存，未命中时计算
+
+        Args:
+            route: 统计用的路由名
+            key: 缓存键（需可哈希）
+            ttl: 有效期（秒）
+            versions: 当前数据版本，与缓存条目记录的不同即失效
+            compute: 返回 (value, cacheable)；cacheable 为 False 的结果不缓存
+
+        Returns:
+            (value, age_seconds)；age 为 None 表示本次新计算
+        """
+        started = time.perf_counter()
+        with self._lock:
+            stats = self._route_stats(route)
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, entry_versions, created_at = entry
+                now = time.monotonic()
+                if entry_versions != versions:
+                    stats['invalidated'] += 1
+                    del self._entries[key]
+                elif now >= expires_at:
+                    stats['expired'] += 1
+                    del self._entries[key]
+                else:
+                    self._entries.move_to_end(key)
+                    stats['hits'] += 1
+                    stats['hit_ms_total'] += (time.perf_counter() - started) * 1000
+                    return value, now - created_at
+
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+                stats['misses'] += 1
+            else:
+                stats['coalesced'] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.ok:
+                return flight.value, 0.0
+            # 领头的计算失败了，自己再算一次（不缓存）
+            value, _ = compute()
+            return value, None
+
+        try:
+            value, cacheable = compute()
+            flight.value, flight.ok = value, True
+        except Exception:
+            with self._lock:
+                stats['errors'] += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                stats['compute_ms_total'] += elapsed_ms
+                stats['compute_ms_max'] = max(stats['compute_ms_max'], elapsed_ms)
+                if flight.ok and cacheable:
+                    now = time.monotonic()
+                    self._entries[key] = (value, now + ttl, versions, now)
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+                        stats['evictions'] += 1
+                del self._flights[key]
+            flight.event.set()
+        return value, None
+
+    def clear(self, route: Optional[str] = None):
+        """清除缓存；指定 route 时只清除该路由的条目"""
+        with self._lock:
+            if route is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == route]:
+                    del self._entries[key]
+
+    def get_stats(self) -> Dict:
+        """按路由汇总的统计"""
+        with self._lock:
+            routes = {}
+            for route, stats in self._stats.items():
+                computed = stats['misses']
+                lookups = stats['hits'] + stats['misses'] + stats['coalesced']
+                routes[route] = {
+                    'hits': stats['hits'],
+                    'misses': stats['misses'],
+                    'coalesced': stats['coalesced'],
+                    'expired': stats['expired'],
+                    'invalidated': stats['invalidated'],
+                    'evictions': stats['evictions'],
+                    'errors': stats['errors'],
+                    'hit_rate': round(stats['hits'] / lookups, 4) if lookups else 0.0,
+                    'avg_hit_ms': round(stats['hit_ms_total'] / stats['hits'], 3) if stats['hits'] else 0.0,
+                    'avg_compute_ms': round(stats['compute_ms_total'] / computed, 2) if computed else 0.0,
+                    'max_compute_ms': round(stats['compute_ms_max'], 2),
+                }
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'in_flight': len(self._flights),
+                'routes': routes,
+            }
@@ -0,0 +1,452 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+止盈/止损/维护规则向量化回测
+回放 okex_kline_ohlc 的历史K线，同时模拟「多个币种 × 多组参数」的持仓：
+每个 (参数组, 币种) 是一条通道，所有通道的状态（持仓量、均价、已触发的止盈级别、
+维护次数、已实现盈亏……）都是 numpy 数组，按K线逐根推进、所有通道一起更新。
+
+规则与实盘使用同一份配置：
+- 止盈: take_profit_rules.TakeProfitRules.SHORT_RULES / LONG_RULES（allow_long 选择规则集）
+  每个级别在一笔持仓内只触发一次，按剩余仓位的百分比平仓或「留 keep_amount U」
+- 止损: stop_profit_loss_manager.StopProfitLossManager.LOSS_RULES（同一根K线已止盈则不再检查止损）
+- 锚点单维护: anchor_maintenance_daemon（亏损触发后补仓 N 倍，再平仓到保留 0.6~2U 保证金，每笔持仓一次）
+- 子账户超级维护: sub_account_super_maintenance（MAINTENANCE_SCHEDULE，每天最多3次，第3次前低于止损线不再维护）
+
+模拟约定:
+- 空仓且冷却结束时在K线收盘价开仓（entry_margin U 保证金 × leverage）
+- 收益率 = 方向 × (收盘价 / 均价 - 1) × 杠杆 × 100，与 OKX uplRatio 一致
+- 全部平仓后等待 reentry_bars 根K线再开仓；手续费按成交名义价值 × fee_rate
+
+用法:
+    python rule_backtester.py --days 10 --workers 4 \\
+        --grid side=long,short leverage=5,10 allow_long=0,1 maintenance=none,anchor,super
+"""
+
+import argparse
+import itertools
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+import anchor_maintenance_daemon as anchor_rules
+import sub_account_super_maintenance as super_rules
+from cold_archive import KLINE_ARCHIVE
+from db_access import get_connection
+from stop_profit_loss_manager import StopProfitLossManager
+from take_profit_rules import TakeProfitRules
+
+DAY_MS = 24 * 60 * 60 * 1000
+BEIJING_OFFSET_MS = 8 * 60 * 60 * 1000
+
+MAINTENANCE_MODES = ('none', 'anchor', 'super')
+
+DEFAULT_PARAMS = {
+    'side': 'short',             # 'long' / 'short'
+    'leverage': 10,
+    'entry_margin': 10.0,        # 每次开仓的保证金（U）
+    'allow_long': False,         # 选择止盈规则集（市场配置 allow_long）
+    'stop_loss': None,           # 止损收益率；None 使用 LOSS_RULES，'off' 不止损
+    'maintenance': 'anchor',     # 'none' / 'anchor' / 'super'
+    'maintenance_trigger': None, # 维护触发收益率；None 使用各维护进程的阈值
+    'fee_rate': 0.0005,
+    'reentry_bars': 12,
+}
+
+
+class MarketData(NamedTuple):
+    """按时间对齐的收盘价：closes[币种, K线]，缺失处前值填充，首根K线之前为 NaN"""
+    symbols: List[str]
+    timestamps: np.ndarray
+    closes: np.ndarray
+
+
+# ----------------------------------------------------------------------
+# 数据
+# ----------------------------------------------------------------------
+def align_closes(symbols: Sequence[str], series: Sequence[Sequence[tuple]]) -> MarketData:
+    """每个币种的 (timestamp, close) -> 对齐到所有时间戳的并集"""
+    timestamps = np.unique(np.concatenate(
+        [np.array([row[0] for row in rows], dtype=np.int64) for rows in series] or [np.zeros(0, np.int64)]))
+    closes = np.full((len(symbols), len(timestamps)), np.nan)
+    for i, rows in enumerate(series):
+        if not rows:
+            continue
+        times = np.array([row[0] for row in rows], dtype=np.int64)
+        values = np.array([row[1] for row in rows], dtype=np.float64)
+        # 每个时间点取该时间及之前最后一根K线的收盘价
+        index = np.searchsorted(times, timestamps, side='right') - 1
+        closes[i] = np.where(index >= 0, values[np.maximum(index, 0)], np.nan)
+    return MarketData(list(symbols), timestamps, closes)
+
+
+def load_closes(conn, symbols: Sequence[str], timeframe: str = '5m', start: Optional[int] = None,
+                end: Optional[int] = None) -> MarketData:
+    """读取多个币种的收盘价（okex_kline_ohlc 及其冷数据归档）"""
+    series = []
+    for symbol in symbols:
+        rows = KLINE_ARCHIVE.query(conn, symbol, ('timestamp', 'close'), start=start, end=end,
+                                   where={'timeframe': timeframe})
+        series.append([row for row in rows if row[1]])
+    return align_closes(symbols, series)
+
+
+# ----------------------------------------------------------------------
+# 规则表
+# ----------------------------------------------------------------------
+def _rule_tables():
+    """
+    止盈规则 -> 数组，表序号 = side_index * 2 + allow_long（side_index: long=0, short=1）
+
+    Returns:
+        (thresholds, close_fraction, keep_amount)，形状 (4, 最大级别数)，
+        不足的级别阈值为 inf；close_fraction/keep_amount 不适用处为 NaN
+    """
+    tables = [TakeProfitRules.LONG_RULES['not_allow_long'], TakeProfitRules.LONG_RULES['allow_long'],
+              TakeProfitRules.SHORT_RULES['not_allow_long'], TakeProfitRules.SHORT_RULES['allow_long']]
+    levels = max(len(table['triggers']) for table in tables)
+    thresholds = np.full((4, levels), np.inf)
+    close_fraction = np.full((4, levels), np.nan)
+    keep_amount = np.full((4, levels), np.nan)
+    for i, table in enumerate(tables):
+        for j, trigger in enumerate(table['triggers']):
+            thresholds[i, j] = trigger['profit']
+            if trigger.get('keep_amount'):
+                keep_amount[i, j] = trigger['keep_amount']
+            else:
+                close_fraction[i, j] = trigger['close_percent'] / 100
+    return thresholds, close_fraction, keep_amount
+
+
+def param_grid(**options) -> List[Dict]:
+    """参数网格：每个键给出候选值列表，其余取 DEFAULT_PARAMS"""
+    for key in options:
+        if key not in DEFAULT_PARAMS:
+            raise ValueError(f'未知参数: {key}')
+    keys = list(options)
+    grid = []
+    for values in itertools.product(*(options[key] for key in keys)):
+        params = dict(DEFAULT_PARAMS)
+        params.update(zip(keys, values))
+        grid.append(params)
+    return grid
+
+
+def _lane_params(params_list: Sequence[Dict], symbol_count: int) -> Dict[str, np.ndarray]:
+    """参数组 -> 每条通道的参数数组（通道 = 参数组序号 * 币种数 + 币种序号）"""
+    columns = {name: [] for name in ('direction', 'leverage', 'entry_margin', 'table', 'stop_rate',
+                                     'mode', 'trigger', 'fee_rate', 'reentry_bars')}
+    for params in params_list:
+        params = {**DEFAULT_PARAMS, **params}
+        side = params['side']
+        if side not in ('long', 'short'):
+            raise ValueError(f'未知方向: {side}')
+        mode = params['maintenance']
+        if mode not in MAINTENANCE_MODES:
+            raise ValueError(f'未知维护方式: {mode}')
+
+        stop_loss = params['stop_loss']
+        if stop_loss is None:
+            stop_loss = StopProfitLossManager.LOSS_RULES[side]
+        elif stop_loss == 'off':
+            stop_loss = -np.inf
+        trigger = params['maintenance_trigger']
+        if trigger is None:
+            trigger = (super_rules.TRIGGER_RATE if mode == 'super'
+                       else anchor_rules.MAINTENANCE_TRIGGER_RATE)
+
+        columns['direction'].append(1.0 if side == 'long' else -1.0)
+        columns['leverage'].append(float(params['leverage']))
+        columns['entry_margin'].append(float(params['entry_margin']))
+        columns['table'].append((0 if side == 'long' else 2) + int(bool(params['allow_long'])))
+        columns['stop_rate'].append(float(stop_loss))
+        columns['mode'].append(MAINTENANCE_MODES.index(mode))
+        columns['trigger'].append(float(trigger))
+        columns['fee_rate'].append(float(params['fee_rate']))
+        columns['reentry_bars'].append(int(params['reentry_bars']))
+    return {name: np.repeat(np.array(values), symbol_count) for name, values in columns.items()}
+
+
+# ----------------------------------------------------------------------
+# 模拟
+# ----------------------------------------------------------------------
+COUNTERS = ('entries', 'take_profits', 'stops', 'maintenances')
+
+
+def simulate(market: MarketData, params_list: Sequence[Dict]) -> List[Dict]:
+    """
+    在同一份行情上回测多组参数
+
+    Returns:
+        每组参数一条结果：总盈亏、已实现/未实现盈亏、手续费、最大回撤、最大占用保证金、
+        触发次数，以及 'symbols' 下每个币种的同样指标
+    """
+    symbol_count = len(market.symbols)
+    lanes = len(params_list) * symbol_count
+    p = _lane_params(params_list, symbol_count)
+    group = np.repeat(np.arange(len(params_list)), symbol_count)
+    symbol_index = np.tile(np.arange(symbol_count), len(params_list))
+    thresholds, close_fraction, keep_amount = _rule_tables()
+    lane_thresholds = thresholds[p['table']]
+    days = (market.timestamps + BEIJING_OFFSET_MS) // DAY_MS
+    schedule = np.array(super_rules.MAINTENANCE_SCHEDULE, dtype=np.float64)
+    direction, leverage = p['direction'], p['leverage']
+    is_anchor, is_super = p['mode'] == 1, p['mode'] == 2
+
+    qty = np.zeros(lanes)
+    avg = np.zeros(lanes)
+    last_price = np.full(lanes, np.nan)
+    tp_level = np.zeros(lanes, dtype=np.int64)
+    anchor_done = np.zeros(lanes, dtype=bool)
+    super_count = np.zeros(lanes, dtype=np.int64)
+    super_day = np.full(lanes, -1, dtype=np.int64)
+    cooldown_until = np.zeros(lanes, dtype=np.int64)
+    realized = np.zeros(lanes)
+    fees = np.zeros(lanes)
+    peak = np.zeros(lanes)
+    max_drawdown = np.zeros(lanes)
+    max_margin = np.zeros(lanes)
+    counters = {name: np.zeros(lanes, dtype=np.int64) for name in COUNTERS}
+    group_peak = np.zeros(len(params_list))
+    group_drawdown = np.zeros(len(params_list))
+    group_margin = np.zeros(len(params_list))
+
+    def trade(mask, size, price):
+        fees[mask] += np.abs(size[mask]) * price[mask] * p['fee_rate'][mask]
+
+    def close(mask, size, price, position_avg):
+        """按 position_avg 平掉 size，返回平仓后是否已空仓"""
+        realized[mask] += direction[mask] * (price[mask] - position_avg[mask]) * size[mask]
+        trade(mask, size, price)
+        qty[mask] -= size[mask]
+        flat = mask & (qty <= 1e-12 * np.maximum(1.0, np.abs(size)))
+        qty[flat] = 0.0
+        cooldown_until[flat] = step + p['reentry_bars'][flat]
+        return flat
+
+    for step in range(len(market.timestamps)):
+        price = market.closes[symbol_index, step]
+        valid = ~np.isnan(price)
+        last_price = np.where(valid, price, last_price)
+
+        # 开仓（本根K线开的仓从下一根K线开始检查规则）
+        enter = valid & (qty == 0) & (step >= cooldown_until)
+        if enter.any():
+            size = np.where(enter, p['entry_margin'] * leverage / np.where(valid, price, 1.0), 0.0)
+            qty[enter] = size[enter]
+            avg[enter] = price[enter]
+            trade(enter, size, price)
+            tp_level[enter] = 0
+            anchor_done[enter] = False
+            counters['entries'][enter] += 1
+
+        active = valid & (qty > 0) & ~enter
+        if active.any():
+            with np.errstate(invalid='ignore', divide='ignore'):
+                profit_rate = direction * (price / avg - 1) * leverage * 100
+
+            # 止盈：已达到的最高级别高于已触发的级别时触发该级别
+            reached = (lane_thresholds <= profit_rate[:, None]).sum(axis=1)
+            fire = active & (reached > tp_level)
+            if fire.any():
+                level = np.maximum(reached - 1, 0)
+                fraction = close_fraction[p['table'], level]
+                keep = keep_amount[p['table'], level]
+                margin = qty * avg / leverage
+                keep_qty = np.where(margin > keep, qty * (1 - keep / np.where(margin > 0, margin, 1.0)), 0.0)
+                size = np.clip(np.where(np.isnan(keep), qty * np.nan_to_num(fraction), keep_qty), 0.0, qty)
+                closing = fire & (size > 0)
+                close(closing, size, price, avg)
+                tp_level[fire] = reached[fire]
+                counters['take_profits'][closing] += 1
+
+            # 止损（同一根K线已止盈则不再检查）
+            stop = active & ~fire & (profit_rate <= p['stop_rate'])
+            if stop.any():
+                close(stop, qty.copy(), price, avg)
+                counters['stops'][stop] += 1
+
+            candidates = active & ~fire & ~stop & (profit_rate <= p['trigger'])
+
+            # 锚点单维护：补仓 N 倍后平仓到保留 MIN~MAX_KEEP_MARGIN 保证金，每笔持仓一次
+            anchor = candidates & is_anchor & ~anchor_done
+            if anchor.any():
+                add = qty * anchor_rules.MAINTENANCE_ADD_MULTIPLE
+                total = qty + add
+                target = np.maximum(anchor_rules.MIN_KEEP_MARGIN,
+                                    np.minimum(anchor_rules.MAX_KEEP_MARGIN, total * price / leverage))
+                remain = target * leverage / np.where(valid, price, 1.0)
+                execute = anchor & (remain < total)
+                if execute.any():
+                    new_avg = np.where(execute, (qty * avg + add * price) / np.where(total > 0, total, 1.0), avg)
+                    trade(execute, add, price)
+                    qty[execute] = total[execute]
+                    avg[execute] = new_avg[execute]
+                    close(execute, total - remain, price, avg)
+                    counters['maintenances'][execute] += 1
+                anchor_done[anchor] = True
+
+            # 子账户超级维护：每天最多 len(MAINTENANCE_SCHEDULE) 次
+            day = days[step]
+            super_count[super_day != day] = 0
+            super_day[:] = day
+            maintain = (candidates & is_super & (super_count < super_rules.MAX_MAINTENANCE_COUNT)
+                        & (super_count < len(schedule))
+                        & ~((super_count == 2) & (profit_rate <= super_rules.STOP_LOSS_RATE)))
+            if maintain.any():
+                slot = np.minimum(super_count, len(schedule) - 1)
+                amount, target = schedule[slot, 0], schedule[slot, 1]
+                order = amount * leverage / np.where(valid, price, 1.0)
+                keep = target * leverage / np.where(valid, price, 1.0)
+                total = qty + order
+                new_avg = np.where(maintain, (qty * avg + order * price) / np.where(total > 0, total, 1.0), avg)
+                trade(maintain, order, price)
+                qty[maintain] = total[maintain]
+                avg[maintain] = new_avg[maintain]
+                close(maintain, np.maximum(order - keep, 0.0), price, avg)
+                super_count[maintain] += 1
+                counters['maintenances'][maintain] += 1
+
+        # 权益与回撤（未实现盈亏按最新收盘价）
+        unrealized = np.where(qty > 0, direction * (last_price - avg) * qty, 0.0)
+        equity = realized - fees + np.nan_to_num(unrealized)
+        peak = np.maximum(peak, equity)
+        max_drawdown = np.maximum(max_drawdown, peak - equity)
+        margin = qty * avg / leverage
+        max_margin = np.maximum(max_margin, margin)
+
+        group_equity = np.bincount(group, weights=equity, minlength=len(params_list))
+        group_peak = np.maximum(group_peak, group_equity)
+        group_drawdown = np.maximum(group_drawdown, group_peak - group_equity)
+        group_margin = np.maximum(group_margin, np.bincount(group, weights=margin, minlength=len(params_list)))
+
+    unrealized = np.nan_to_num(np.where(qty > 0, direction * (last_price - avg) * qty, 0.0))
+    lane_metrics = {
+        'pnl': realized - fees + unrealized,
+        'realized': realized,
+        'unrealized': unrealized,
+        'fees': fees,
+        'max_drawdown': max_drawdown,
+        'max_margin': max_margin,
+        **counters,
+    }
+
+    results = []
+    for g, params in enumerate(params_list):
+        lanes_of_group = slice(g * symbol_count, (g + 1) * symbol_count)
+        result = {'params': {**DEFAULT_PARAMS, **params}}
+        for name, values in lane_metrics.items():
+            total = values[lanes_of_group].sum()
+            result[name] = int(total) if name in COUNTERS else float(total)
+        # 组合的回撤和保证金按同一时刻的合计计算
+        result['max_drawdown'] = float(group_drawdown[g])
+        result['max_margin'] = float(group_margin[g])
+        result['symbols'] = {
+            symbol: {name: (int(values[g * symbol_count + i]) if name in COUNTERS
+                            else float(values[g * symbol_count + i]))
+                     for name, values in lane_metrics.items()}
+            for i, symbol in enumerate(market.symbols)
+        }
+        results.append(result)
+    return results
+
+
+def _simulate_chunk(args) -> List[Dict]:
+    return simulate(*args)
+
+
+def run_grid(market: MarketData, params_list: Sequence[Dict], workers: int = 1,
+             chunk_size: int = 32) -> List[Dict]:
+    """参数组分块后用进程池回测（结果顺序与 params_list 相同）"""
+    params_list = list(params_list)
+    chunks = [params_list[i:i + chunk_size] for i in range(0, len(params_list), chunk_size)]
+    if workers <= 1 or len(chunks) <= 1:
+        return [result for chunk in chunks for result in simulate(market, chunk)]
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for part in executor.map(_simulate_chunk, [(market, chunk) for chunk in chunks]):
+            results.extend(part)
+    return results
+
+
+# ----------------------------------------------------------------------
+# 命令行
+# ----------------------------------------------------------------------
+def _parse_value(key: str, text: str):
+    if key in ('side', 'maintenance'):
+        return text
+    if key == 'allow_long':
+        return text.lower() in ('1', 'true', 'yes')
+    if key in ('stop_loss', 'maintenance_trigger') and text.lower() in ('none', 'default'):
+        return None
+    if key == 'stop_loss' and text.lower() == 'off':
+        return 'off'
+    if key in ('leverage', 'reentry_bars'):
+        return int(text)
+    return float(text)
+
+
+def parse_grid(items: Sequence[str]) -> Dict[str, list]:
+    """['side=long,short', 'leverage=5,10'] -> {'side': ['long', 'short'], 'leverage': [5, 10]}"""
+    options = {}
+    for item in items:
+        key, _, values = item.partition('=')
+        key = key.strip()
+        if key not in DEFAULT_PARAMS:
+            raise ValueError(f'未知参数: {key}')
+        options[key] = [_parse_value(key, value.strip()) for value in values.split(',') if value.strip()]
+    return options
+
+
+def main():
+    parser = argparse.ArgumentParser(description='止盈/止损/维护规则向量化回测')
+    parser.add_argument('--db', default='crypto_data', help='K线数据库名称或路径')
+    parser.add_argument('--symbols', nargs='+', help='币种（默认K线表中的全部币种）')
+    parser.add_argument('--timeframe', default='5m')
+    parser.add_argument('--days', type=float, default=10, help='回测最近多少天')
+    parser.add_argument('--grid', nargs='*', default=[], help='参数网格，如 side=long,short leverage=5,10')
+    parser.add_argument('--workers', type=int, default=1, help='并行进程数')
+    parser.add_argument('--top', type=int, default=20, help='按总盈亏输出前N组')
+    parser.add_argument('--json', help='把全部结果写入该 JSON 文件')
+    args = parser.parse_args()
+
+    grid = param_grid(**parse_grid(args.grid))
+    conn = get_connection(args.db)
+    try:
+        symbols = args.symbols
+        if not symbols:
+            symbols = [row[0] for row in conn.execute(
+                'SELECT DISTINCT symbol FROM okex_kline_ohlc WHERE timeframe = ? ORDER BY symbol',
+                (args.timeframe,)).fetchall()]
+        start = int((time.time() - args.days * 86400) * 1000)
+        market = load_closes(conn, symbols, args.timeframe, start=start)
+    finally:
+        conn.close()
+
+    print("=" * 80)
+    print(f"回测: {len(symbols)} 个币种 × {len(market.timestamps)} 根K线 × {len(grid)} 组参数, 进程: {args.workers}")
+    print("=" * 80)
+    started = time.time()
+    results = run_grid(market, grid, args.workers)
+    elapsed = time.time() - started
+
+    varied = [key for key in DEFAULT_PARAMS if len({str(params[key]) for params in grid}) > 1]
+    for result in sorted(results, key=lambda item: item['pnl'], reverse=True)[:args.top]:
+        label = ' '.join(f"{key}={result['params'][key]}" for key in varied) or '默认参数'
+        print(f"  {label}: 盈亏 {result['pnl']:+.2f}U, 最大回撤 {result['max_drawdown']:.2f}U, "
+              f"最大保证金 {result['max_margin']:.2f}U, 开仓 {result['entries']}, 止盈 {result['take_profits']}, "
+              f"止损 {result['stops']}, 维护 {result['maintenances']}")
+    print("=" * 80)
+    print(f"✅ 完成: {len(grid)} 组参数, 耗时 {elapsed:.1f}秒")
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+        print(f"📄 结果已写入 {args.json}")
+
+
+if __name__ == '__main__':
+    main()
@@ -70,9 +70,9 @@ def collect_all_symbols_daemon():
             fail_count += 1
             logger.error(f"  ✗ {symbol} 采集异常: {e}")
         
-        # 避免请求过快
+        # 避免请求过快（增量模式每个币种通常只有1次请求）
         if i < len(SYMBOLS):
-            time.sleep(0.5)
+            time.sleep(0.1)
     
     # 清理旧数据
     try:
@@ -19,6 +19,8 @@ from datetime import datetime, timedelta
 import pytz
 import os
 
+from response_cache import bump_data_version
+
 # ==================== 配置 ====================
 BEIJING_TZ = pytz.timezone('Asia/Shanghai')
 DB_PATH = '/home/user/webapp/sar_slope_data.db'
@@ -148,11 +150,38 @@ def init_database():
         )
     ''')
     
+    # 7. SAR计算状态表（增量模式从最后一根已收盘K线继续计算）
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS sar_calc_state (
+            symbol TEXT PRIMARY KEY,
+            timestamp INTEGER NOT NULL,
+            kline_time TEXT NOT NULL,
+            sar REAL NOT NULL,
+            ep REAL NOT NULL,
+            af REAL NOT NULL,
+            is_uptrend INTEGER NOT NULL,
+            high REAL NOT NULL,
+            low REAL NOT NULL,
+            prev_high REAL NOT NULL,
+            prev_low REAL NOT NULL,
+            position TEXT NOT NULL,
+            sequence INTEGER NOT NULL,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    
+    # sar_consecutive_changes 早期版本没有 duration_minutes 字段
+    cursor.execute("PRAGMA table_info(sar_consecutive_changes)")
+    columns = [col[1] for col in cursor.fetchall()]
+    if 'duration_minutes' not in columns:
+        cursor.execute('ALTER TABLE sar_consecutive_changes ADD COLUMN duration_minutes INTEGER')
+    
     # 创建索引
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_sar_raw_symbol_time ON sar_raw_data(symbol, timestamp DESC)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_sar_conversion_symbol ON sar_conversion_points(symbol, timestamp DESC)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_sar_changes_symbol ON sar_consecutive_changes(symbol, position, sequence_num)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_sar_alerts_symbol ON sar_anomaly_alerts(symbol, created_at DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_sar_changes_duration ON sar_consecutive_changes(symbol, position, duration_minutes)')
     
     conn.commit()
     conn.close()
@@ -219,7 +248,177 @@ def fetch_kline_data(symbol, limit=5000):
         print(f"    ✗ 获取{symbol} K线数据失败: {e}")
         return None
 
+def fetch_new_klines(symbol, since_timestamp, max_klines=MIN_KLINES):
+    """
+    只获取 since_timestamp 之后的5分钟K线（增量模式）
+    从最新一页往前翻，直到覆盖 since_timestamp，通常只需要1次请求
+    
+    返回: 从旧到新的K线列表；缺口超过 max_klines 或请求失败时返回 None（需要全量重建）
+    """
+    url = "https://www.okx.com/api/v5/market/candles"
+    new_klines = []
+    after = None
+    
+    try:
+        while True:
+            params = {
+                'instId': f'{symbol}-USDT-SWAP',
+                'bar': '5m',
+                'limit': 300
+            }
+            if after:
+                params['after'] = after
+            
+            response = requests.get(url, params=params, timeout=15)
+            if response.status_code != 200:
+                return None
+            data = response.json()
+            if data.get('code') != '0':
+                return None
+            
+            klines = data.get('data') or []
+            reached = not klines
+            for kline in klines:  # 从新到旧
+                if int(kline[0]) <= since_timestamp:
+                    reached = True
+                    break
+                new_klines.append(kline)
+            
+            if reached:
+                break
+            if len(new_klines) >= max_klines:
+                return None
+            
+            after = klines[-1][0]
+            time.sleep(0.2)
+        
+        new_klines.reverse()
+        return new_klines
+    
+    except Exception as e:
+        print(f"    ✗ 获取{symbol} 增量K线失败: {e}")
+        return None
+
 # ==================== SAR计算 ====================
+def _next_sar_point(state, kline):
+    """
+    由上一根K线的SAR状态推进一根K线
+    state 为 None 时以该K线作为第一根K线初始化
+
+    返回: (item, new_state)
+    """
+    timestamp = int(kline[0])
+    open_price = float(kline[1])
+    high = float(kline[2])
+    low = float(kline[3])
+    close = float(kline[4])
+
+    if state is None:
+        # 初始SAR值取第一根K线的最低价，初始假设为上升趋势
+        sar = low
+        ep = high  # 极值点 (Extreme Point)
+        af = SAR_AF_START  # 加速因子
+        is_uptrend = True
+        prev_high, prev_low = high, low
+    else:
+        sar = state['sar']
+        ep = state['ep']
+        af = state['af']
+        is_uptrend = state['is_uptrend']
+
+        # 更新SAR
+        sar = sar + af * (ep - sar)
+
+        # 确保SAR不会进入前两根K线的范围
+        if is_uptrend:
+            sar = min(sar, state['low'], state['prev_low'])
+        else:
+            sar = max(sar, state['high'], state['prev_high'])
+
+        # 检查是否需要转势
+        if is_uptrend:
+            if low <= sar:
+                # 转为下降趋势
+                is_uptrend = False
+                sar = ep
+                ep = low
+                af = SAR_AF_START
+            elif high > ep:
+                # 继续上升趋势
+                ep = high
+                af = min(af + SAR_AF_INCREMENT, SAR_AF_MAX)
+        else:
+            if high >= sar:
+                # 转为上升趋势
+                is_uptrend = True
+                sar = ep
+                ep = high
+                af = SAR_AF_START
+            elif low < ep:
+                # 继续下降趋势
+                ep = low
+                af = min(af + SAR_AF_INCREMENT, SAR_AF_MAX)
+
+        prev_high, prev_low = state['high'], state['low']
+
+    # 判断当前position（根据SAR与开盘价关系）
+    position = 'long' if sar < open_price else 'short'
+
+    # 判断是否为转换点，并延续序列号
+    is_conversion = state is not None and position != state['position']
+    sequence = 1 if (state is None or is_conversion) else state['sequence'] + 1
+
+    kline_time = datetime.fromtimestamp(timestamp/1000, BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+    item = {
+        'timestamp': timestamp,
+        'kline_time': kline_time,
+        'open': open_price,
+        'high': high,
+        'low': low,
+        'close': close,
+        'sar': sar,
+        'position': position,
+        'is_conversion': is_conversion,
+        'position_sequence': sequence,
+        'duration_minutes': (sequence - 1) * 5
+    }
+
+    new_state = {
+        'timestamp': timestamp,
+        'kline_time': kline_time,
+        'sar': sar,
+        'ep': ep,
+        'af': af,
+        'is_uptrend': is_uptrend,
+        'high': high,
+        'low': low,
+        'prev_high': prev_high,
+        'prev_low': prev_low,
+        'position': position,
+        'sequence': sequence,
+        'duration_minutes': (sequence - 1) * 5
+    }
+    return item, new_state
+
+def run_sar(klines, state=None):
+    """
+    从给定状态开始逐根计算SAR
+
+    返回: (sar_data, confirmed_state)
+    confirmed_state 为最后一根已收盘K线之后的状态（OKX 第9列 confirm='0' 表示未收盘），
+    下一次增量计算从这里继续，未收盘的K线下次会被重新计算
+    """
+    sar_data = []
+    confirmed_state = state
+
+    for kline in klines:
+        item, state = _next_sar_point(state, kline)
+        sar_data.append(item)
+        if len(kline) <= 8 or str(kline[8]) != '0':
+            confirmed_state = state
+
+    return sar_data, confirmed_state
+
 def calculate_sar_with_position(klines):
     """
     计算SAR指标并判断多空状态
@@ -246,100 +445,8 @@ def calculate_sar_with_position(klines):
     if not klines or len(klines) < 2:
         return []
     
-    results = []
-    
-    # 初始化SAR
-    first_kline = klines[0]
-    first_timestamp = int(first_kline[0])
-    first_open = float(first_kline[1])
-    first_high = float(first_kline[2])
-    first_low = float(first_kline[3])
-    first_close = float(first_kline[4])
-    
-    # 初始SAR值取第一根K线的最低价
-    sar = first_low
-    ep = first_high  # 极值点 (Extreme Point)
-    af = SAR_AF_START  # 加速因子
-    is_uptrend = True  # 初始假设为上升趋势
-    
-    # 根据第一根K线判断初始position
-    first_position = 'long' if sar < first_open else 'short'
-    
-    for i, kline in enumerate(klines):
-        timestamp = int(kline[0])
-        open_price = float(kline[1])
-        high = float(kline[2])
-        low = float(kline[3])
-        close = float(kline[4])
-        
-        # 判断当前position（根据SAR与开盘价关系）
-        current_position = 'long' if sar < open_price else 'short'
-        
-        # 判断是否为转换点
-        is_conversion = False
-        if i > 0:
-            prev_position = results[-1]['position']
-            if current_position != prev_position:
-                is_conversion = True
-        
-        # 记录当前K线数据
-        kline_time = datetime.fromtimestamp(timestamp/1000, BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
-        results.append({
-            'timestamp': timestamp,
-            'kline_time': kline_time,
-            'open': open_price,
-            'high': high,
-            'low': low,
-            'close': close,
-            'sar': sar,
-            'position': current_position,
-            'is_conversion': is_conversion
-        })
-        
-        # 计算下一个SAR值
-        if i < len(klines) - 1:
-            # 更新SAR
-            sar = sar + af * (ep - sar)
-            
-            # 确保SAR不会进入前两根K线的范围
-            if is_uptrend:
-                sar = min(sar, low, float(klines[max(0, i-1)][3]))
-            else:
-                sar = max(sar, high, float(klines[max(0, i-1)][2]))
-            
-            # 检查是否需要转势
-            next_kline = klines[i + 1]
-            next_high = float(next_kline[2])
-            next_low = float(next_kline[3])
-            
-            if is_uptrend:
-                # 上升趋势中
-                if next_low <= sar:
-                    # 转为下降趋势
-                    is_uptrend = False
-                    sar = ep
-                    ep = next_low
-                    af = SAR_AF_START
-                else:
-                    # 继续上升趋势
-                    if next_high > ep:
-                        ep = next_high
-                        af = min(af + SAR_AF_INCREMENT, SAR_AF_MAX)
-            else:
-                # 下降趋势中
-                if next_high >= sar:
-                    # 转为上升趋势
-                    is_uptrend = True
-                    sar = ep
-                    ep = next_high
-                    af = SAR_AF_START
-                else:
-                    # 继续下降趋势
-                    if next_low < ep:
-                        ep = next_low
-                        af = min(af + SAR_AF_INCREMENT, SAR_AF_MAX)
-    
-    return results
+    sar_data, _ = run_sar(klines)
+    return sar_data
 
 # ==================== 序列号分配 ====================
 def assign_position_sequences(sar_data):
@@ -387,6 +494,11 @@ def save_sar_data(symbol, sar_data):
     saved_count = 0
     conversion_count = 0
     
+    # 重新计算的区间内旧转换点先删除，避免重复插入
+    if sar_data:
+        cursor.execute('DELETE FROM sar_conversion_points WHERE symbol = ? AND timestamp >= ?',
+                       (symbol, sar_data[0]['timestamp']))
+    
     for item in sar_data:
         try:
             # 保存原始SAR数据
@@ -771,11 +883,301 @@ def cleanup_old_data():
     
     return total_deleted
 
+# ==================== 增量计算 ====================
+def load_sar_state(cursor, symbol):
+    """读取SAR计算状态，与 system_status 的最后K线时间一起作为增量起点"""
+    cursor.execute('''
+        SELECT st.timestamp, st.kline_time, st.sar, st.ep, st.af, st.is_uptrend,
+               st.high, st.low, st.prev_high, st.prev_low, st.position, st.sequence,
+               ss.last_update_time
+        FROM sar_calc_state st
+        LEFT JOIN system_status ss ON ss.symbol = st.symbol
+        WHERE st.symbol = ?
+    ''', (symbol,))
+    row = cursor.fetchone()
+    
+    # system_status 缺失或落后于计算状态，说明上次写入不完整，需要全量重建
+    if not row or row[12] is None or row[12] < row[0]:
+        return None
+    
+    return {
+        'timestamp': row[0],
+        'kline_time': row[1],
+        'sar': row[2],
+        'ep': row[3],
+        'af': row[4],
+        'is_uptrend': bool(row[5]),
+        'high': row[6],
+        'low': row[7],
+        'prev_high': row[8],
+        'prev_low': row[9],
+        'position': row[10],
+        'sequence': row[11],
+        'duration_minutes': (row[11] - 1) * 5
+    }
+
+def save_sar_state(cursor, symbol, state):
+    """保存最后一根已收盘K线之后的SAR计算状态"""
+    cursor.execute('''
+        INSERT OR REPLACE INTO sar_calc_state
+        (symbol, timestamp, kline_time, sar, ep, af, is_uptrend,
+         high, low, prev_high, prev_low, position, sequence, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+    ''', (
+        symbol, state['timestamp'], state['kline_time'], state['sar'], state['ep'],
+        state['af'], int(state['is_uptrend']), state['high'], state['low'],
+        state['prev_high'], state['prev_low'], state['position'], state['sequence']
+    ))
+
+def update_period_averages(cursor, symbol, affected):
+    """
+    只重算受新数据影响的平均值窗口（替代整表删除重建）
+    
+    affected: {position: {'sequences': set, 'durations': set}}
+    每个窗口只取最近 N 条（走索引），不再扫描全部历史
+    """
+    periods = {
+        '1day': 288,
+        '3day': 864,
+        '7day': 2016,
+        '15day': 4320
+    }
+    max_count = max(periods.values())
+    
+    def upsert_windows(changes, prefix):
+        # changes 按 id 降序
+        for period_type, period_count in periods.items():
+            recent_changes = changes[:period_count]
+            recent_changes.reverse()
+            cursor.execute('''
+                INSERT OR REPLACE INTO sar_period_averages
+                (symbol, position, period_type, avg_change_percent, sample_count)
+                VALUES (?, ?, ?, ?, ?)
+            ''', (symbol, position, f'{prefix}{period_type}',
+                  sum(recent_changes) / len(recent_changes), len(recent_changes)))
+    
+    def delete_prefix(period_type):
+        cursor.execute('''
+            DELETE FROM sar_period_averages
+            WHERE symbol = ? AND position = ? AND period_type LIKE ?
+        ''', (symbol, position, period_type))
+    
+    for position, keys in affected.items():
+        # 1. 整体周期平均值
+        cursor.execute('''
+            SELECT change_percent
+            FROM sar_consecutive_changes
+            WHERE symbol = ? AND position = ?
+            ORDER BY id DESC
+            LIMIT ?
+        ''', (symbol, position, max_count))
+        changes = [row[0] for row in cursor.fetchall()]
+        if changes:
+            upsert_windows(changes, '')
+        
+        # 2. 按序列号分组的平均值
+        for seq_num in keys['sequences']:
+            cursor.execute('''
+                SELECT AVG(change_percent), COUNT(*)
+                FROM sar_consecutive_changes
+                WHERE symbol = ? AND position = ? AND sequence_num = ?
+            ''', (symbol, position, seq_num))
+            avg_change, count = cursor.fetchone()
+            if count:
+                cursor.execute('''
+                    INSERT OR REPLACE INTO sar_period_averages
+                    (symbol, position, period_type, avg_change_percent, sample_count)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', (symbol, position, f'seq_{seq_num:02d}', avg_change, count))
+            else:
+                delete_prefix(f'seq_{seq_num:02d}')
+        
+        # 3. 按持续时间分组的平均值
+        for duration in keys['durations']:
+            cursor.execute('''
+                SELECT change_percent
+                FROM sar_consecutive_changes
+                WHERE symbol = ? AND position = ? AND duration_minutes = ?
+                ORDER BY id DESC
+                LIMIT ?
+            ''', (symbol, position, duration, max_count))
+            duration_changes = [row[0] for row in cursor.fetchall()]
+            if duration_changes:
+                upsert_windows(duration_changes, f'dur_{duration}_')
+            else:
+                delete_prefix(f'dur_{duration}_%')
+
+def mark_data_updated():
+    """递增数据版本号，通知API响应缓存失效"""
+    conn = sqlite3.connect(DB_PATH, timeout=30.0)
+    try:
+        bump_data_version(conn, 'sar_slope')
+        conn.commit()
+    finally:
+        conn.close()
+
+def collect_symbol_data_incremental(symbol):
+    """
+    增量采集单个币种：从上次已收盘K线的SAR状态继续
+    - 只获取新K线
+    - 只追加新的原始数据、转换点和连续变化
+    - 只更新受影响的平均值窗口
+    
+    返回: True/False；没有可用状态或缺口过大时返回 None（需要全量重建）
+    """
+    conn = sqlite3.connect(DB_PATH, timeout=30.0)
+    cursor = conn.cursor()
+    
+    try:
+        state = load_sar_state(cursor, symbol)
+        if state is None:
+            return None
+        
+        klines = fetch_new_klines(symbol, state['timestamp'])
+        if klines is None:
+            return None
+        if not klines:
+            print(f"    ✓ 没有新K线")
+            return True
+        
+        sar_data, confirmed_state = run_sar(klines, state)
+        print(f"    ✓ 增量获取 {len(klines)} 根K线 (起点 {state['kline_time']})")
+        
+        affected = {
+            'long': {'sequences': set(), 'durations': set()},
+            'short': {'sequences': set(), 'durations': set()}
+        }
+        
+        # 1. 移除上次写入的未收盘K线及其派生数据（本次重新计算）
+        cursor.execute('''
+            SELECT position, sequence_num, duration_minutes
+            FROM sar_consecutive_changes
+            WHERE symbol = ? AND kline_time > ?
+        ''', (symbol, state['kline_time']))
+        for position, seq_num, duration in cursor.fetchall():
+            affected[position]['sequences'].add(seq_num)
+            if duration is not None:
+                affected[position]['durations'].add(duration)
+        
+        cursor.execute('DELETE FROM sar_consecutive_changes WHERE symbol = ? AND kline_time > ?',
+                       (symbol, state['kline_time']))
+        cursor.execute('DELETE FROM sar_conversion_points WHERE symbol = ? AND timestamp > ?',
+                       (symbol, state['timestamp']))
+        cursor.execute('DELETE FROM sar_raw_data WHERE symbol = ? AND timestamp > ?',
+                       (symbol, state['timestamp']))
+        
+        # 2. 每个方向上一个SAR点（连续变化跨越同方向的上一段）
+        last_sar = {}
+        for position in ('long', 'short'):
+            cursor.execute('''
+                SELECT sar_value FROM sar_raw_data
+                WHERE symbol = ? AND position = ?
+                ORDER BY timestamp DESC
+                LIMIT 1
+            ''', (symbol, position))
+            row = cursor.fetchone()
+            last_sar[position] = row[0] if row else None
+        
+        # 3. 在内存中生成新行
+        raw_rows = []
+        conversion_rows = []
+        change_rows = []
+        prev_item = state
+        for item in sar_data:
+            raw_rows.append((
+                symbol, item['timestamp'], item['kline_time'],
+                item['open'], item['high'], item['low'], item['close'],
+                item['sar'], item['position'], item['position_sequence'],
+                item['duration_minutes']
+            ))
+            
+            if item['is_conversion']:
+                conversion_rows.append((
+                    symbol, item['timestamp'], item['kline_time'],
+                    prev_item['position'], item['position'],
+                    item['sar'], item['open'], prev_item['duration_minutes']
+                ))
+            
+            position = item['position']
+            prev_sar = last_sar[position]
+            if prev_sar is not None:
+                change_value = item['sar'] - prev_sar
+                change_percent = abs(change_value / prev_sar * 100) if prev_sar != 0 else 0
+                change_rows.append((
+                    symbol, position, item['position_sequence'], prev_sar, item['sar'],
+                    change_value, change_percent, item['kline_time'], item['duration_minutes']
+                ))
+                affected[position]['sequences'].add(item['position_sequence'])
+                affected[position]['durations'].add(item['duration_minutes'])
+            last_sar[position] = item['sar']
+            prev_item = item
+        
+        # 4. 批量追加
+        cursor.executemany('''
+            INSERT OR REPLACE INTO sar_raw_data
+            (symbol, timestamp, kline_time, open_price, high_price, low_price,
+             close_price, sar_value, position, position_sequence, duration_minutes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', raw_rows)
+        cursor.executemany('''
+            INSERT INTO sar_conversion_points
+            (symbol, timestamp, kline_time, from_position, to_position,
+             conversion_sar, conversion_price, previous_duration)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', conversion_rows)
+        cursor.executemany('''
+            INSERT INTO sar_consecutive_changes
+            (symbol, position, sequence_num, prev_sar, current_sar,
+             change_value, change_percent, kline_time, duration_minutes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', change_rows)
+        
+        # 5. 只更新受影响的平均值窗口
+        update_period_averages(cursor, symbol,
+                               {p: keys for p, keys in affected.items() if keys['sequences']})
+        
+        # 6. 保存计算状态和系统状态
+        save_sar_state(cursor, symbol, confirmed_state)
+        cursor.execute('SELECT COUNT(*) FROM sar_raw_data WHERE symbol = ?', (symbol,))
+        total_klines = cursor.fetchone()[0]
+        last_item = sar_data[-1]
+        cursor.execute('''
+            INSERT OR REPLACE INTO system_status
+            (symbol, last_update_time, last_kline_time, total_klines,
+             current_position, current_sequence, status)
+            VALUES (?, ?, ?, ?, ?, ?, 'active')
+        ''', (
+            symbol, last_item['timestamp'], last_item['kline_time'],
+            total_klines, last_item['position'], last_item['position_sequence']
+        ))
+        
+        conn.commit()
+        print(f"    ✓ 追加了 {len(raw_rows)} 条数据, {len(conversion_rows)} 个转换点, "
+              f"{len(change_rows)} 条变化率")
+    finally:
+        conn.close()
+    
+    # 7. 检测异常（只看最近100条，开销固定）
+    detect_anomalies(symbol)
+    mark_data_updated()
+    print(f"    ✓ 完成异常检测")
+    
+    return True
+
 # ==================== 主采集函数 ====================
-def collect_symbol_data(symbol):
-    """采集单个币种的SAR数据"""
+def collect_symbol_data(symbol, incremental=True):
+    """
+    采集单个币种的SAR数据
+    incremental=True 时优先从上次状态增量计算，没有状态时自动全量重建
+    """
     print(f"  正在处理 {symbol}...")
     
+    if incremental:
+        result = collect_symbol_data_incremental(symbol)
+        if result is not None:
+            return result
+        print(f"    ⚠ 没有可用的增量状态，执行全量重建")
+    
     # 1. 获取K线数据
     klines = fetch_kline_data(symbol, limit=5000)
     if not klines:
@@ -785,7 +1187,10 @@ def collect_symbol_data(symbol):
     print(f"    ✓ 获取了 {len(klines)} 根K线")
     
     # 2. 计算SAR
-    sar_data = calculate_sar_with_position(klines)
+    if len(klines) < 2:
+        print(f"    ✗ SAR计算失败")
+        return False
+    sar_data, confirmed_state = run_sar(klines)
     if not sar_data:
         print(f"    ✗ SAR计算失败")
         return False
@@ -799,6 +1204,13 @@ def collect_symbol_data(symbol):
     saved, conversions = save_sar_data(symbol, sar_data_with_seq)
     print(f"    ✓ 保存了 {saved} 条数据, {conversions} 个转换点")
     
+    # 保存SAR计算状态，后续周期增量计算
+    if confirmed_state:
+        conn = sqlite3.connect(DB_PATH, timeout=30.0)
+        save_sar_state(conn.cursor(), symbol, confirmed_state)
+        conn.commit()
+        conn.close()
+    
     # 5. 计算变化率
     calculate_consecutive_changes(symbol)
     print(f"    ✓ 计算了连续变化率")
@@ -811,9 +1223,11 @@ def collect_symbol_data(symbol):
     detect_anomalies(symbol)
     print(f"    ✓ 完成异常检测")
     
+    mark_data_updated()
+    
     return True
 
-def collect_all_symbols():
+def collect_all_symbols(incremental=True):
     """采集所有币种的数据"""
     print("\n" + "="*80)
     print("SAR斜率系统完整版 - 数据采集")
@@ -837,7 +1251,7 @@ def collect_all_symbols():
         print(f"[{i}/{len(SYMBOLS)}] {symbol}")
         
         try:
-            if collect_symbol_data(symbol):
+            if collect_symbol_data(symbol, incremental=incremental):
                 success_count += 1
             else:
                 fail_count += 1
@@ -845,9 +1259,9 @@ def collect_all_symbols():
             print(f"    ✗ 处理失败: {e}")
             fail_count += 1
         
-        # 避免请求过快
+        # 避免请求过快（增量模式每个币种通常只有1次请求）
         if i < len(SYMBOLS):
-            time.sleep(0.5)
+            time.sleep(0.1)
         
         print()
     
@@ -968,9 +1382,13 @@ if __name__ == '__main__':
                 print(f"{a[0]:<8} | {a[1]:<6} | 序列{a[2]:<4} | SAR:{a[3]:.6f} | 变化:{a[4]:.4f}% | 偏离:{a[5]:.2f}% | {a[6]}{extreme}")
             print("="*120)
         
+        elif command == 'rebuild':
+            # 全量重建（获取5000根K线重新计算）
+            collect_all_symbols(incremental=False)
+        
         else:
             print(f"未知命令: {command}")
-            print("可用命令: status, alerts")
+            print("可用命令: status, alerts, rebuild")
     
     else:
         # 默认执行采集
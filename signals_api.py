@@ -0,0 +1,1250 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+交易信号
+信号统计、交易信号分析与买点、卖点1、开仓逻辑建议
+"""
+
+from datetime import datetime, timedelta
+import json
+import pytz
+import sqlite3
+import traceback
+
+from flask import Blueprint, jsonify, make_response, render_template, request
+
+from app_common import INDICATOR_SOURCES, SNAPSHOT_SOURCES, cached_response
+from db_access import get_connection
+from latest_state import (
+    COIN_DATA_LATEST, INDICATORS_LATEST, POSITION_SYSTEM_LATEST, SUPPORT_RESISTANCE_LATEST
+)
+from windowed_query import TimeWindowQuery
+
+signals_bp = Blueprint('signals', __name__)
+
+SIGNALS_WINDOW = TimeWindowQuery('trading_signals', 'record_time', 'idx_record_time')
+
+# ==================== 交易信号监控 API ====================
+
+@signals_bp.route('/signals')
+def signals_page():
+    """交易信号监控页面"""
+    return render_template('signals.html')
+
+@signals_bp.route('/popup-demo')
+def popup_demo():
+    """弹窗效果演示页面"""
+    with open('popup_demo.html', 'r', encoding='utf-8') as f:
+        return f.read()
+
+@signals_bp.route('/api/signals/stats')
+def api_signals_stats():
+    """获取信号统计数据"""
+    try:
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 获取最新记录
+        cursor.execute('''
+            SELECT record_time, long_signals, short_signals, 
+                   total_signals, long_ratio, short_ratio
+            FROM trading_signals
+            ORDER BY record_time DESC
+            LIMIT 1
+        ''')
+        latest = cursor.fetchone()
+        
+        # 获取总记录数
+        cursor.execute('SELECT COUNT(*) FROM trading_signals')
+        total_records = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        if latest:
+            return jsonify({
+                'success': True,
+                'data': {
+                    'latest_time': latest[0],
+                    'latest_long': latest[1],
+                    'latest_short': latest[2],
+                    'latest_total': latest[3],
+                    'long_ratio': latest[4],
+                    'short_ratio': latest[5],
+                    'total_records': total_records
+                }
+            })
+        else:
+            return jsonify({
+                'success': False,
+                'message': '暂无数据'
+            })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@signals_bp.route('/api/signals/chart')
+def api_signals_chart():
+    """获取图表数据（支持分页和时间范围）"""
+    try:
+        page = int(request.args.get('page', 0))
+        time_range = request.args.get('range', '12h')
+        
+        # 每页对应的时间范围
+        range_minutes = {
+            '1h': 60,
+            '6h': 360,
+            '12h': 720,
+            '24h': 1440
+        }
+        
+        minutes = range_minutes.get(time_range, 720)
+        
+        conn = get_connection('crypto_data')
+        try:
+            window = SIGNALS_WINDOW.page(conn, page, timedelta(minutes=minutes))
+            rows = [] if window is None else SIGNALS_WINDOW.fetch(
+                conn, ('record_time', 'long_signals', 'short_signals', 'total_signals'),
+                window['start'], window['end'])
+        finally:
+            conn.close()
+        
+        data = [{
+            'time': row[0].split(' ')[1][:5],  # 只取时分
+            'long_signals': row[1],
+            'short_signals': row[2],
+            'total_signals': row[3]
+        } for row in rows]
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'page': window['page'] if window else 0,
+            'total_pages': window['total_pages'] if window else 0,
+            'range': time_range
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@signals_bp.route('/api/signals/history')
+def api_signals_history():
+    """获取历史记录列表"""
+    try:
+        limit = int(request.args.get('limit', 50))
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT record_time, long_signals, short_signals,
+                   total_signals, long_ratio, short_ratio
+            FROM trading_signals
+            ORDER BY record_time DESC
+            LIMIT ?
+        ''', (limit,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        data = [{
+            'record_time': row[0],
+            'long_signals': row[1],
+            'short_signals': row[2],
+            'total_signals': row[3],
+            'long_ratio': row[4],
+            'short_ratio': row[5]
+        } for row in rows]
+        
+        return jsonify({
+            'success': True,
+            'data': data
+        })
+    
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@signals_bp.route('/opening-logic')
+def opening_logic_page():
+    """开仓逻辑系统页面"""
+    from flask import make_response
+    response = make_response(render_template('opening_logic.html'))
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    return response
+
+@signals_bp.route('/api/opening-logic/suggestion')
+def opening_logic_suggestion():
+    """获取开仓建议API（预计算快照，上游数据变化时才重新计算）"""
+    try:
+        from opening_factor_snapshot import snapshot_service
+        result = snapshot_service.get_suggestion()
+        return jsonify({'success': True, 'data': result})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@signals_bp.route('/api/opening-logic/history')
+def opening_logic_history():
+    """开仓建议历史（每个快照版本一条，before_version 翻页）"""
+    try:
+        from opening_factor_snapshot import snapshot_service
+        limit = min(request.args.get('limit', 100, type=int), 1000)
+        before_version = request.args.get('before_version', type=int)
+        history = snapshot_service.history(limit, before_version)
+        return jsonify({'success': True, 'data': history, 'count': len(history)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@signals_bp.route('/trading-signals')
+def trading_signals_page():
+    """决策-交易信号系统页面"""
+    response = make_response(render_template('trading_signals.html'))
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    return response
+
+def track_trading_signal(symbol, buy_point_type, suggested_position):
+    """跟踪交易信号的首次触发时间"""
+    from datetime import datetime
+    import pytz
+    import sqlite3
+    
+    beijing_tz = pytz.timezone('Asia/Shanghai')
+    now = datetime.now(beijing_tz)
+    
+    signal_key = f"{symbol}_{buy_point_type}"
+    
+    # 同一线程复用连接，不会与调用方的连接互相锁等待
+    conn_track = get_connection('crypto_data')
+    conn_track.row_factory = sqlite3.Row
+    cursor_track = conn_track.cursor()
+    
+    try:
+        # 检查该信号是否已存在
+        cursor_track.execute('''
+            SELECT id, first_triggered_at, suggested_position 
+            FROM trading_signal_history 
+            WHERE signal_key = ? AND is_active = 1
+        ''', (signal_key,))
+        
+        existing = cursor_track.fetchone()
+        
+        if existing:
+            # 更新最后更新时间
+            cursor_track.execute('''
+                UPDATE trading_signal_history 
+                SET last_updated_at = ?, suggested_position = ?
+                WHERE id = ?
+            ''', (now.strftime('%Y-%m-%d %H:%M:%S'), suggested_position, existing['id']))
+            conn_track.commit()
+            return {
+                'first_triggered_at': existing['first_triggered_at'],
+                'initial_position': str(int(float(existing['suggested_position'].replace('%', '')) * 0.3)) + '%'
+            }
+        else:
+            # 插入新信号
+            cursor_track.execute('''
+                INSERT INTO trading_signal_history 
+                (signal_key, symbol, buy_point_type, suggested_position, 
+                 first_triggered_at, last_updated_at, is_active)
+                VALUES (?, ?, ?, ?, ?, ?, 1)
+            ''', (signal_key, symbol, buy_point_type, suggested_position,
+                  now.strftime('%Y-%m-%d %H:%M:%S'), 
+                  now.strftime('%Y-%m-%d %H:%M:%S')))
+            conn_track.commit()
+            return {
+                'first_triggered_at': now.strftime('%Y-%m-%d %H:%M:%S'),
+                'initial_position': str(int(float(suggested_position.replace('%', '')) * 0.3)) + '%'
+            }
+    finally:
+        conn_track.close()
+
+def check_no_new_low_5min(symbol):
+    """检查创新低后连续5个5分钟K线不创新低"""
+    import sqlite3
+    from datetime import datetime, timedelta
+    
+    conn = get_connection('crypto_data')
+    cursor = conn.cursor()
+    
+    try:
+        # 统一格式：FIL -> FIL-USDT-SWAP
+        symbol_full = f"{symbol}-USDT-SWAP" if not symbol.endswith('-USDT-SWAP') else symbol
+        symbol_short = symbol.replace('-USDT-SWAP', '')
+        
+        # 获取最近的创新低事件
+        cursor.execute('''
+            SELECT event_time, price
+            FROM price_breakthrough_events
+            WHERE symbol = ? AND event_type = 'new_low'
+            ORDER BY event_time DESC
+            LIMIT 1
+        ''', (symbol_short,))
+        
+        last_new_low = cursor.fetchone()
+        if not last_new_low:
+            return False
+        
+        new_low_time = datetime.strptime(last_new_low[0], '%Y-%m-%d %H:%M:%S')
+        new_low_price = last_new_low[1]
+        
+        # 获取创新低之后的5个5分钟K线
+        cursor.execute('''
+            SELECT low, timestamp
+            FROM okex_kline_ohlc
+            WHERE symbol = ?
+              AND timeframe = '5m'
+              AND datetime(timestamp/1000, 'unixepoch') > datetime(?)
+            ORDER BY timestamp ASC
+            LIMIT 5
+        ''', (symbol_full, new_low_time.strftime('%Y-%m-%d %H:%M:%S')))
+        
+        klines_after = cursor.fetchall()
+        
+        # 需要有5根K线
+        if len(klines_after) < 5:
+            return False
+        
+        # 检查这5根K线是否都没有创新低
+        for low, ts in klines_after:
+            if low < new_low_price:
+                return False
+        
+        return True
+    finally:
+        conn.close()
+
+def get_1h_rsi(symbol):
+    """获取1小时RSI"""
+    import sqlite3
+    
+    conn = get_connection('crypto_data')
+    cursor = conn.cursor()
+    
+    try:
+        # 统一格式
+        symbol_full = f"{symbol}-USDT-SWAP" if not symbol.endswith('-USDT-SWAP') else symbol
+        
+        cursor.execute('''
+            SELECT rsi_14
+            FROM okex_technical_indicators
+            WHERE symbol = ? AND timeframe IN ('1h', '1H')
+            ORDER BY record_time DESC
+            LIMIT 1
+        ''', (symbol_full,))
+        
+        result = cursor.fetchone()
+        return result[0] if result else None
+    finally:
+        conn.close()
+
+def check_consecutive_oscillation_5min(symbol):
+    """检查5分钟周期连续3个震荡≤0.5% 且涨跌在0%到+0.25%之间（不包括负涨跌）"""
+    import sqlite3
+    
+    conn = get_connection('crypto_data')
+    cursor = conn.cursor()
+    
+    try:
+        # 统一格式
+        symbol_full = f"{symbol}-USDT-SWAP" if not symbol.endswith('-USDT-SWAP') else symbol
+        
+        # 获取最近3根5分钟K线
+        cursor.execute('''
+            SELECT open, high, low, close
+            FROM okex_kline_ohlc
+            WHERE symbol = ?
+              AND timeframe = '5m'
+            ORDER BY timestamp DESC
+            LIMIT 3
+        ''', (symbol_full,))
+        
+        klines = cursor.fetchall()
+        
+        if len(klines) < 3:
+            return False
+        
+        # 检查每根K线
+        for open_price, high, low, close in klines:
+            if open_price == 0:
+                return False
+            
+            # 震荡幅度 = (最高-最低) / 开盘 * 100
+            oscillation = ((high - low) / open_price) * 100 if open_price > 0 else 999
+            
+            # 涨跌幅 = (收盘-开盘) / 开盘 * 100（保留正负，不取绝对值）
+            change = ((close - open_price) / open_price) * 100
+            
+            # 任何一根不满足条件就返回False
+            # 涨跌幅必须在 0% 到 +0.25% 之间，震荡幅度 <= 0.50%
+            if change < 0 or change > 0.25 or oscillation > 0.5:
+                return False
+        
+        return True
+    finally:
+        conn.close()
+
+def deactivate_missing_signals(active_signal_keys):
+    """将不再满足条件的信号标记为失效"""
+    from datetime import datetime
+    import pytz
+    import sqlite3
+    
+    beijing_tz = pytz.timezone('Asia/Shanghai')
+    now = datetime.now(beijing_tz)
+    
+    conn = get_connection('crypto_data')
+    cursor = conn.cursor()
+    
+    try:
+        # 获取所有当前活跃的信号
+        cursor.execute('SELECT signal_key FROM trading_signal_history WHERE is_active = 1')
+        all_active = [row[0] for row in cursor.fetchall()]
+        
+        # 找出不在当前信号列表中的信号（即条件不再满足的信号）
+        signals_to_deactivate = [sig for sig in all_active if sig not in active_signal_keys]
+        
+        # 标记这些信号为失效
+        for signal_key in signals_to_deactivate:
+            cursor.execute('''
+                UPDATE trading_signal_history 
+                SET is_active = 0, last_updated_at = ?
+                WHERE signal_key = ? AND is_active = 1
+            ''', (now.strftime('%Y-%m-%d %H:%M:%S'), signal_key))
+        
+        conn.commit()
+        return len(signals_to_deactivate)
+    finally:
+        conn.close()
+
+@signals_bp.route('/api/trading-signals/analyze')
+@cached_response(max_age=60, sources=SNAPSHOT_SOURCES + INDICATOR_SOURCES)
+def api_trading_signals_analyze():
+    """分析交易信号 - 做多买点1/2/3"""
+    try:
+        from datetime import datetime, timedelta
+        import pytz
+        from opening_factor_snapshot import snapshot_service
+        
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        
+        # 0. 获取开仓逻辑建议（用于买点3仓位计算）
+        try:
+            opening_logic_data = snapshot_service.get_suggestion()
+            opening_position = opening_logic_data.get('position_info', {})
+            opening_can_long = opening_logic_data.get('can_long', False)
+            opening_position_percent = opening_position.get('position_percent', 0)
+        except Exception as e:
+            print(f"获取开仓逻辑失败: {e}")
+            opening_can_long = False
+            opening_position_percent = 0
+        
+        # 1. 获取支撑压力线数据（每个币种的最新一行，见 latest_state）
+        cursor.execute(f'''
+            SELECT symbol, current_price, support_line_1, support_line_2, resistance_line_1,
+                   distance_to_support_1, distance_to_support_2, distance_to_resistance_1,
+                   position_s2_r1, record_time
+            FROM {SUPPORT_RESISTANCE_LATEST.ensure(conn)}
+        ''')
+        sr_data = {row['symbol']: dict(row) for row in cursor.fetchall()}
+        
+        # 2. 获取价格突破数据(创新低统计 - 最近7天)
+        seven_days_ago = now - timedelta(days=7)
+        cursor.execute('''
+            SELECT symbol, COUNT(*) as count
+            FROM price_breakthrough_events
+            WHERE event_type = 'new_low'
+              AND event_time >= ?
+            GROUP BY symbol
+        ''', (seven_days_ago.strftime('%Y-%m-%d %H:%M:%S'),))
+        breakthrough_data = {row['symbol']: row['count'] for row in cursor.fetchall()}
+        
+        # 3. 获取最新快照数据(急涨急跌、计次得分)
+        cursor.execute(f'''
+            SELECT c.symbol, c.rush_up, c.rush_down, c.current_price,
+                   s.count_score_display, s.count_score_type
+            FROM {COIN_DATA_LATEST.ensure(conn)} c
+            JOIN crypto_snapshots s ON c.snapshot_id = s.id
+        ''')
+        coin_data = {row['symbol']: dict(row) for row in cursor.fetchall()}
+        
+        # 3.5 获取K线指标数据 (5分钟RSI、SAR位置、SAR象限)
+        cursor.execute(f'''
+            SELECT symbol, rsi_14, sar_position, sar_quadrant, sar_count_label
+            FROM {INDICATORS_LATEST.ensure(conn)}
+            WHERE timeframe = '5m'
+        ''')
+        kline_indicators = {}
+        for row in cursor.fetchall():
+            # 统一格式：FIL-USDT-SWAP -> FIL
+            symbol_short = row['symbol'].replace('-USDT-SWAP', '')
+            kline_indicators[symbol_short] = {
+                'rsi_5m': row['rsi_14'],
+                'sar_position': row['sar_position'],  # 'bullish' 或 'bearish'
+                'sar_quadrant': row['sar_quadrant'],  # 1-4象限
+                'sar_count_label': row['sar_count_label']  # 例如 "多头12"
+            }
+        
+        # 4. 获取位置系统数据（BTC/ETH的4h/12h/24h/48h周期位置）
+        cursor.execute(f'''
+            SELECT symbol, position_4h, position_12h, position_24h, position_48h
+            FROM {POSITION_SYSTEM_LATEST.ensure(conn)}
+            WHERE symbol IN ('BTC', 'ETH')
+        ''')
+        position_data = {}
+        for row in cursor.fetchall():
+            symbol = row['symbol']
+            positions = [
+                row['position_4h'], row['position_12h'], 
+                row['position_24h'], row['position_48h']
+            ]
+            # 统计有多少个周期位置 < 10%
+            low_position_count = sum(1 for p in positions if p is not None and p < 10)
+            position_data[symbol] = low_position_count
+        
+        conn.close()
+        
+        # 检查BTC和ETH是否至少有5个周期 < 10%
+        # 由于只有4个周期，我们改为检查BTC和ETH加起来是否有5个以上
+        btc_low = position_data.get('BTC', 0)
+        eth_low = position_data.get('ETH', 0)
+        total_low_positions = btc_low + eth_low
+        condition6_pass = total_low_positions >= 5
+        
+        # 5. 统计接近支撑线的币种数量（用于买点3条件6）
+        # 接近支撑1：距离支撑线1 <= 某个阈值（例如10%）
+        # 接近支撑2：距离支撑线2 <= 某个阈值（例如10%）
+        near_support_1_count = 0
+        near_support_2_count = 0
+        
+        for symbol, sr in sr_data.items():
+            dist_s1 = sr.get('distance_to_support_1')
+            dist_s2 = sr.get('distance_to_support_2')
+            
+            # 统计接近支撑1的币种（距离 <= 10%）
+            if dist_s1 is not None and dist_s1 <= 10:
+                near_support_1_count += 1
+            
+            # 统计接近支撑2的币种（距离 <= 10%）
+            if dist_s2 is not None and dist_s2 <= 10:
+                near_support_2_count += 1
+        
+        # 买点3条件6：接近支撑1的币种数 >= 8 或 接近支撑2的币种数 >= 8
+        condition6_support_system = near_support_1_count >= 8 or near_support_2_count >= 8
+        
+        # 6. 分析信号
+        signals = []
+        buy_point_1_count = 0
+        buy_point_2_count = 0
+        buy_point_3_count = 0
+        
+        for symbol, sr in sr_data.items():
+            coin_name = symbol.replace('USDT', '')
+            coin = coin_data.get(coin_name, {})
+            kline = kline_indicators.get(coin_name, {})
+            
+            # 获取创新低次数
+            new_lows = breakthrough_data.get(coin_name, 0)
+            
+            # 获取计次得分
+            score_display = coin.get('count_score_display', '---')
+            score_type = coin.get('count_score_type', '中性')
+            
+            # 获取急涨急跌
+            rush_up = coin.get('rush_up', 0) or 0
+            rush_down = coin.get('rush_down', 0) or 0
+            rush_diff = rush_up - rush_down
+            
+            # 获取K线指标数据
+            rsi_5m = kline.get('rsi_5m')
+            sar_position = kline.get('sar_position')  # 'bullish' / 'bearish'
+            sar_quadrant = kline.get('sar_quadrant')  # 1-4
+            sar_count_label = kline.get('sar_count_label', '')
+            
+            # 解析空头/多头数量（从 "空头20" 或 "多头12" 中提取数字）
+            sar_count = 0
+            if sar_count_label:
+                import re
+                match = re.search(r'(\d+)', sar_count_label)
+                if match:
+                    sar_count = int(match.group(1))
+            
+            # 通用条件判断
+            condition1 = new_lows < 3  # 创新低 < 3 【买点1/2/3适用】
+            condition2 = '★' in score_display or '⭐' in score_display  # 计次得分是星星 【买点1/2适用】
+            condition3 = rush_diff > 0  # 急涨 - 急跌 > 0 【买点1/2适用】
+            condition4 = rsi_5m is not None and rsi_5m < 20  # 5分钟RSI < 20 【买点1适用】（修改为使用5分钟RSI）
+            condition5 = rush_diff > -15  # 急涨 - 急跌 > -15 【买点3适用】
+            condition6 = condition6_pass  # BTC/ETH至少5个周期 < 10% 【买点3适用】
+            
+            # 新增条件（基于K线指标）
+            condition_sar_bearish = sar_position == 'bearish'  # 空头趋势
+            condition_sar_count = sar_count > 20  # 空头数量>20
+            condition_sar_quadrant3 = sar_quadrant == 3  # SAR第三象限
+            condition_rsi_low = rsi_5m is not None and rsi_5m < 30  # 5分钟RSI<30 【买点2适用】
+            
+            # 买点3专用条件检查
+            condition_no_new_low_5m = check_no_new_low_5min(coin_name)  # 创新低后连续5个5分钟K线不创新低
+            rsi_1h = get_1h_rsi(coin_name)  # 获取1小时RSI
+            condition_rsi_1h_low = rsi_1h is not None and rsi_1h < 15  # 1小时RSI<15
+            condition_oscillation_3 = check_consecutive_oscillation_5min(coin_name)  # 连续3个震荡
+            
+            # 获取距离支撑线1的距离（用于买点1）
+            distance = sr.get('distance_to_support_1')
+            
+            # 判断各个买点
+            buy_point_1 = False
+            buy_point_2 = False
+            buy_point_3 = False
+            
+            # 买点1: 达到支撑线1 (距离 < 5%) + 条件1234
+            if (distance is not None and distance <= 5 and 
+                condition1 and condition2 and condition3 and condition4):
+                buy_point_1 = True
+                buy_point_1_count += 1
+            
+            # 买点2: 回调买入
+            # 条件：条件123 + 空头>20 + 5分钟SAR第三象限 + 5分钟RSI<30
+            if (condition1 and condition2 and condition3 and 
+                condition_sar_count and condition_sar_quadrant3 and condition_rsi_low):
+                buy_point_2 = True
+                buy_point_2_count += 1
+            
+            # 买点3: 空转多买入（重新定义条件）
+            # 6个必须条件：
+            # 1. 创新低后连续5个5分钟K线不创新低
+            # 2. 1小时RSI < 15
+            # 3. 5分钟周期连续3个震荡≤0.5% 且涨跌<0.25%
+            # 4. SAR空头数量 > 20
+            # 5. 5分钟SAR在第三象限
+            # 6. 支撑压力线系统：接近支撑1的币种数 >= 8 或 接近支撑2的币种数 >= 8
+            if (condition_no_new_low_5m and 
+                condition_rsi_1h_low and 
+                condition_oscillation_3 and 
+                condition_sar_count and 
+                condition_sar_quadrant3 and 
+                condition6_support_system):  # 使用全局条件
+                buy_point_3 = True
+                buy_point_3_count += 1
+            
+            # 只保留有信号的币种
+            if buy_point_1 or buy_point_2 or buy_point_3:
+                # 详细的条件判断结果 - 用于透明化显示
+                detailed_conditions = {
+                    'buy_point_1_conditions': {
+                        'distance_to_support': {'value': distance, 'threshold': '≤ 5%', 'pass': distance is not None and distance <= 5, 'desc': '距离支撑线1'},
+                        'condition1': {'value': new_lows, 'threshold': '< 3', 'pass': condition1, 'desc': '7天创新低次数'},
+                        'condition2': {'value': score_display, 'threshold': '包含★或⭐', 'pass': condition2, 'desc': '计次得分显示'},
+                        'condition3': {'value': round(rush_diff, 2), 'threshold': '> 0', 'pass': condition3, 'desc': '急涨-急跌'},
+                        'condition4': {'value': round(rsi_5m, 2) if rsi_5m else None, 'threshold': '< 20', 'pass': condition4, 'desc': '5分钟RSI'}
+                    },
+                    'buy_point_2_conditions': {
+                        'condition1': {'value': new_lows, 'threshold': '< 3', 'pass': condition1, 'desc': '7天创新低次数'},
+                        'condition2': {'value': score_display, 'threshold': '包含★或⭐', 'pass': condition2, 'desc': '计次得分显示'},
+                        'condition3': {'value': round(rush_diff, 2), 'threshold': '> 0', 'pass': condition3, 'desc': '急涨-急跌'},
+                        'sar_count': {'value': sar_count, 'threshold': '> 20', 'pass': condition_sar_count, 'desc': 'SAR空头数量'},
+                        'sar_quadrant': {'value': sar_quadrant, 'threshold': '= 3', 'pass': condition_sar_quadrant3, 'desc': 'SAR第三象限'},
+                        'rsi_5m': {'value': round(rsi_5m, 2) if rsi_5m else None, 'threshold': '< 30', 'pass': condition_rsi_low, 'desc': '5分钟RSI'}
+                    },
+                    'buy_point_3_conditions': {
+                        'no_new_low_5m': {'value': '是' if condition_no_new_low_5m else '否', 'threshold': '是', 'pass': condition_no_new_low_5m, 'desc': '创新低后连续5个5分钟K线不创新低'},
+                        'rsi_1h': {'value': round(rsi_1h, 2) if rsi_1h else None, 'threshold': '< 15', 'pass': condition_rsi_1h_low, 'desc': '1小时RSI'},
+                        'oscillation_3': {'value': '是' if condition_oscillation_3 else '否', 'threshold': '是', 'pass': condition_oscillation_3, 'desc': '连续3个震荡≤0.5% 且涨跌<0.25%'},
+                        'sar_count': {'value': sar_count, 'threshold': '> 20', 'pass': condition_sar_count, 'desc': 'SAR空头数量'},
+                        'sar_quadrant': {'value': sar_quadrant, 'threshold': '= 3', 'pass': condition_sar_quadrant3, 'desc': '5分钟SAR第三象限'},
+                        'support_system': {'value': f'接近支撑1: {near_support_1_count}个, 接近支撑2: {near_support_2_count}个', 'threshold': '接近支撑1 ≥ 8个 或 接近支撑2 ≥ 8个', 'pass': condition6_support_system, 'desc': '支撑压力线系统'}
+                    }
+                }
+                
+                # 确定买点类型和建议仓位
+                buy_point_type = None
+                suggested_position = None
+                position_calculation_note = None
+                buy_times = None  # 分批买入次数
+                
+                if buy_point_1:
+                    buy_point_type = 'buy_point_1'
+                    suggested_position = '30%'
+                    buy_times = 3  # 买点1分3次买入
+                    position_calculation_note = '买点1固定仓位，分3次买入'
+                    
+                elif buy_point_3:
+                    buy_point_type = 'buy_point_3'
+                    buy_times = 2  # 买点3分2次买入
+                    # 买点3特殊仓位逻辑
+                    if opening_can_long and opening_position_percent > 0:
+                        # 情况2：开仓逻辑允许开仓
+                        # 买点3仓位 = 开仓逻辑建议 + 20%，最高70%
+                        bp3_position = min(opening_position_percent + 20, 70)
+                        suggested_position = f'{int(bp3_position)}%'
+                        position_calculation_note = f'开仓逻辑{int(opening_position_percent)}% + 买点3加成20% = {int(bp3_position)}% (上限70%)，分2次买入'
+                    else:
+                        # 情况1：开仓逻辑不允许开仓
+                        # 买点3可额外开20%
+                        suggested_position = '20%'
+                        position_calculation_note = '开仓逻辑不允许，买点3可额外开20%，分2次买入'
+                        
+                elif buy_point_2:
+                    buy_point_type = 'buy_point_2'
+                    suggested_position = '20%'
+                    buy_times = 2  # 买点2分2次买入
+                    position_calculation_note = '买点2固定仓位，分2次买入'
+                
+                # 跟踪信号历史，获取首次触发时间和首次开仓建议
+                tracking_info = track_trading_signal(coin_name, buy_point_type, suggested_position)
+                
+                signals.append({
+                    'symbol': coin_name,
+                    'current_price': sr.get('current_price', 0),
+                    'support_line_1': sr.get('support_line_1'),
+                    'distance_to_support_1': distance,
+                    'buy_point_1': buy_point_1,
+                    'buy_point_2': buy_point_2,
+                    'buy_point_3': buy_point_3,
+                    'suggested_position': suggested_position,
+                    'buy_times': buy_times,  # 新增：分批买入次数
+                    'position_calculation_note': position_calculation_note,  # 新增：仓位计算说明
+                    'opening_logic_position': f'{int(opening_position_percent)}%' if opening_can_long else '不允许',  # 新增：开仓逻辑建议
+                    'first_triggered_at': tracking_info['first_triggered_at'],  # 新增：首次触发时间
+                    'initial_position': tracking_info['initial_position'],  # 新增：首次开仓建议(总仓位的30%)
+                    'conditions': {
+                        'condition1_pass': condition1,
+                        'condition2_pass': condition2,
+                        'condition3_pass': condition3,
+                        'new_lows': new_lows,
+                        'score_display': score_display,
+                        'rush_diff': round(rush_diff, 2)
+                    },
+                    'kline_indicators': {
+                        'rsi_5m': round(rsi_5m, 2) if rsi_5m else None,
+                        'sar_position': sar_position,
+                        'sar_quadrant': sar_quadrant,
+                        'sar_count': sar_count,
+                        'sar_count_label': sar_count_label
+                    },
+                    'detailed_conditions': detailed_conditions  # 新增：详细条件判断结果
+                })
+        
+        # 按买点1 > 买点3 > 买点2 优先级排序，同优先级按距支撑线距离排序
+        def sort_key(x):
+            priority = 0
+            if x['buy_point_1']:
+                priority = 3
+            elif x['buy_point_3']:
+                priority = 2
+            elif x['buy_point_2']:
+                priority = 1
+            distance = x['distance_to_support_1'] if x['distance_to_support_1'] is not None else 999
+            return (-priority, distance)
+        
+        signals.sort(key=sort_key)
+        
+        # 收集当前所有活跃信号的signal_key
+        active_signal_keys = []
+        for signal in signals:
+            coin_name = signal['symbol']
+            if signal['buy_point_1']:
+                active_signal_keys.append(f"{coin_name}_buy_point_1")
+            elif signal['buy_point_3']:
+                active_signal_keys.append(f"{coin_name}_buy_point_3")
+            elif signal['buy_point_2']:
+                active_signal_keys.append(f"{coin_name}_buy_point_2")
+        
+        # 将不再满足条件的信号标记为失效
+        deactivated_count = deactivate_missing_signals(active_signal_keys)
+        
+        # 买点规则说明 - 透明化展示
+        buy_point_rules = {
+            'buy_point_1': {
+                'name': '买点1 - 支撑线买入',
+                'suggested_position': '30%',
+                'buy_times': 3,  # 分3次买入
+                'conditions': [
+                    {'id': '距离支撑线', 'rule': '距离支撑线1 ≤ 5%', 'priority': 'high'},
+                    {'id': '创新低', 'rule': '7天创新低次数 < 3', 'priority': 'high'},
+                    {'id': '计次得分', 'rule': '计次得分显示包含★或⭐', 'priority': 'medium'},
+                    {'id': '急涨急跌', 'rule': '急涨 - 急跌 > 0', 'priority': 'medium'},
+                    {'id': 'RSI 5m', 'rule': '5分钟RSI < 20', 'priority': 'high'}
+                ],
+                'description': '价格接近支撑线时的买入机会，风险较低，建议分3次买入'
+            },
+            'buy_point_2': {
+                'name': '买点2 - 回调买入',
+                'suggested_position': '20%',
+                'buy_times': 2,  # 分2次买入
+                'conditions': [
+                    {'id': '创新低', 'rule': '7天创新低次数 < 3', 'priority': 'high'},
+                    {'id': '计次得分', 'rule': '计次得分显示包含★或⭐', 'priority': 'medium'},
+                    {'id': '急涨急跌', 'rule': '急涨 - 急跌 > 0', 'priority': 'medium'},
+                    {'id': 'SAR空头数', 'rule': 'SAR空头数量 > 20', 'priority': 'high'},
+                    {'id': 'SAR象限', 'rule': 'SAR在第三象限', 'priority': 'high'},
+                    {'id': 'RSI 5m', 'rule': '5分钟RSI < 30', 'priority': 'high'}
+                ],
+                'description': '市场回调时的买入机会，需要技术指标确认，建议分2次买入'
+            },
+            'buy_point_3': {
+                'name': '买点3 - 空转多买入',
+                'suggested_position': '最多20% (如无开仓逻辑建议)',
+                'buy_times': 2,  # 分2次买入
+                'conditions': [
+                    {'id': '5分钟不创新低', 'rule': '创新低后连续5个5分钟K线不创新低', 'priority': 'high'},
+                    {'id': '1h RSI', 'rule': '1小时RSI < 15', 'priority': 'high'},
+                    {'id': '连续震荡', 'rule': '5分钟周期连续3个震荡≤0.5% 且涨跌<0.25%', 'priority': 'high'},
+                    {'id': 'SAR空头数', 'rule': 'SAR空头持续数量 > 20', 'priority': 'high'},
+                    {'id': 'SAR象限', 'rule': '5分钟SAR在第三象限', 'priority': 'high'},
+                    {'id': '支撑压力线', 'rule': '接近支撑1的币种数 ≥ 8个 或 接近支撑2的币种数 ≥ 8个', 'priority': 'high'}
+                ],
+                'description': '极度超卖后的空转多买入机会，严格条件筛选（需市场整体接近支撑线），建议分2次买入'
+            }
+        }
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'signals': signals,
+                'buy_point_1_count': buy_point_1_count,
+                'buy_point_2_count': buy_point_2_count,
+                'buy_point_3_count': buy_point_3_count,
+                'total_coins': len(sr_data),
+                'update_time': now.strftime('%Y-%m-%d %H:%M:%S'),
+                'buy_point_rules': buy_point_rules,  # 新增：买点规则说明
+                'opening_logic_info': {  # 新增：开仓逻辑信息
+                    'can_long': opening_can_long,
+                    'position_percent': opening_position_percent,
+                    'suggestion': f'{int(opening_position_percent)}%' if opening_can_long else '不允许开仓'
+                },
+                'notes': {
+                    'buy_point_1': '✅ 支撑线买入 (距离<5%) + 创新低<3 + 计次得分⭐/★ + 急涨>急跌 + 5分钟RSI<20 - 已更新使用5分钟RSI',
+                    'buy_point_2': '✅ 回调买入 (条件1-3 + 空头>20 + 5分钟SAR第三象限 + 5分钟RSI<30) - 已集成K线指标',
+                    'buy_point_3': '✅ 空转多买入 (5个5分钟不创新低 + 1h RSI<15 + 连续3个震荡 + SAR空头>20 + SAR第3象限) - 严格条件',
+                    'buy_point_3_position': '📊 买点3仓位规则：若开仓逻辑允许，则为 开仓逻辑仓位+20% (上限70%)；若开仓逻辑不允许，则额外开20%',
+                    'data_integration': '✅ 已集成kline-indicators数据：5分钟RSI、SAR位置、SAR象限、SAR计数',
+                    'data_limitation': '⚠️ 仍需补充：连续5个5分钟K线不创新低、连续3个震荡条件'
+                }
+            }
+        })
+    
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@signals_bp.route('/api/trading-signals/buy-points')
+def api_trading_signals_buy_points():
+    """获取当前所有买点信号（简化版API）"""
+    try:
+        import sqlite3
+        from datetime import datetime
+        import pytz
+        
+        # 调用现有的分析函数
+        response = api_trading_signals_analyze()
+        
+        # 如果返回的是Response对象，获取其JSON数据
+        if hasattr(response, 'get_json'):
+            data = response.get_json()
+        else:
+            import json
+            data = json.loads(response[0])
+        
+        if not data.get('success'):
+            return jsonify({
+                'success': False,
+                'message': '获取买点数据失败',
+                'error': data.get('error', 'Unknown error')
+            }), 500
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        
+        # 提取买点信号
+        signals_data = data.get('data', {})
+        buy_signals = signals_data.get('signals', [])
+        
+        # 按买点类型分组
+        buy_point_1 = [s for s in buy_signals if s.get('buy_point') == 1]
+        buy_point_2 = [s for s in buy_signals if s.get('buy_point') == 2]
+        buy_point_3 = [s for s in buy_signals if s.get('buy_point') == 3]
+        
+        # 简化信号数据
+        def simplify_signal(signal):
+            return {
+                'symbol': signal.get('symbol'),
+                'buy_point': signal.get('buy_point'),
+                'current_price': signal.get('current_price'),
+                'suggested_position': signal.get('suggested_position'),
+                'buy_times': signal.get('buy_times'),
+                'distance_to_support': signal.get('distance_to_support_1'),
+                'conditions_met': signal.get('conditions_met'),
+                'score_display': signal.get('score_display'),
+                'sar_position': signal.get('sar_position'),
+                'rsi_5m': signal.get('rsi_5m'),
+                'rsi_1h': signal.get('rsi_1h'),
+                'recommended': signal.get('recommended', False)
+            }
+        
+        result = {
+            'success': True,
+            'timestamp': now.strftime('%Y-%m-%d %H:%M:%S'),
+            'summary': {
+                'total_signals': len(buy_signals),
+                'buy_point_1_count': len(buy_point_1),
+                'buy_point_2_count': len(buy_point_2),
+                'buy_point_3_count': len(buy_point_3)
+            },
+            'buy_points': {
+                'buy_point_1': [simplify_signal(s) for s in buy_point_1],
+                'buy_point_2': [simplify_signal(s) for s in buy_point_2],
+                'buy_point_3': [simplify_signal(s) for s in buy_point_3]
+            },
+            'all_signals': [simplify_signal(s) for s in buy_signals],
+            'rules': signals_data.get('buy_point_rules', {})
+        }
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        import traceback
+        print(f"获取买点信号失败: {e}")
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'message': '获取买点信号失败',
+            'error': str(e)
+        }), 500
+
+@signals_bp.route('/api/trading-signals/history')
+def api_trading_signals_history():
+    """获取历史信号（已失效的信号）"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        import pytz
+        
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        now = datetime.now(beijing_tz)
+        
+        # 获取最近7天内失效的信号
+        seven_days_ago = now - timedelta(days=7)
+        
+        cursor.execute('''
+            SELECT signal_key, symbol, buy_point_type, suggested_position,
+                   first_triggered_at, last_updated_at
+            FROM trading_signal_history
+            WHERE is_active = 0
+              AND last_updated_at >= ?
+            ORDER BY last_updated_at DESC
+            LIMIT 50
+        ''', (seven_days_ago.strftime('%Y-%m-%d %H:%M:%S'),))
+        
+        history_signals = []
+        for row in cursor.fetchall():
+            # 计算信号持续时间
+            first_time = datetime.strptime(row['first_triggered_at'], '%Y-%m-%d %H:%M:%S')
+            last_time = datetime.strptime(row['last_updated_at'], '%Y-%m-%d %H:%M:%S')
+            duration_minutes = int((last_time - first_time).total_seconds() / 60)
+            
+            buy_point_name = {
+                'buy_point_1': '买点1',
+                'buy_point_2': '买点2',
+                'buy_point_3': '买点3'
+            }.get(row['buy_point_type'], '未知')
+            
+            history_signals.append({
+                'symbol': row['symbol'],
+                'buy_point_type': buy_point_name,
+                'suggested_position': row['suggested_position'],
+                'initial_position': str(int(float(row['suggested_position'].replace('%', '')) * 0.3)) + '%',
+                'first_triggered_at': row['first_triggered_at'],
+                'last_updated_at': row['last_updated_at'],
+                'duration_minutes': duration_minutes
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'history_signals': history_signals,
+                'total_count': len(history_signals),
+                'update_time': now.strftime('%Y-%m-%d %H:%M:%S')
+            }
+        })
+    
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@signals_bp.route('/api/signals/recent')
+def api_signals_recent():
+    """获取最近2小时内的交易信号，按类型分类"""
+    try:
+        from datetime import datetime, timedelta
+        import json
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 计算2小时前的时间
+        two_hours_ago = (datetime.now() - timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        # 获取2小时内的信号
+        cursor.execute('''
+            SELECT record_time, long_signals, short_signals, 
+                   today_new_high, today_new_low, raw_data
+            FROM trading_signals
+            WHERE record_time >= ?
+            ORDER BY record_time DESC
+        ''', (two_hours_ago,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        # 分类统计
+        signals_by_type = {
+            'long': [],  # 做多信号
+            'short': [],  # 做空信号
+            'new_high': [],  # 新高信号
+            'new_low': []  # 新低信号
+        }
+        
+        for row in rows:
+            record_time = row[0]
+            long_count = row[1] or 0
+            short_count = row[2] or 0
+            new_high = row[3] or 0
+            new_low = row[4] or 0
+            raw_data = json.loads(row[5]) if row[5] else {}
+            
+            if long_count > 0:
+                signals_by_type['long'].append({
+                    'time': record_time,
+                    'count': long_count,
+                    'detail': raw_data.get('breakdown', {})
+                })
+            
+            if short_count > 0:
+                signals_by_type['short'].append({
+                    'time': record_time,
+                    'count': short_count,
+                    'detail': raw_data.get('breakdown', {})
+                })
+            
+            if new_high > 0:
+                signals_by_type['new_high'].append({
+                    'time': record_time,
+                    'count': new_high
+                })
+            
+            if new_low > 0:
+                signals_by_type['new_low'].append({
+                    'time': record_time,
+                    'count': new_low
+                })
+        
+        # 计算汇总
+        summary = {
+            'long_total': sum(s['count'] for s in signals_by_type['long']),
+            'short_total': sum(s['count'] for s in signals_by_type['short']),
+            'new_high_total': sum(s['count'] for s in signals_by_type['new_high']),
+            'new_low_total': sum(s['count'] for s in signals_by_type['new_low']),
+            'time_range': two_hours_ago
+        }
+        
+        return jsonify({
+            'success': True,
+            'signals': signals_by_type,
+            'summary': summary
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@signals_bp.route('/api/sell-point-1/save', methods=['POST'])
+def api_sell_point_1_save():
+    """
+    保存卖点1信号到数据库
+    
+    请求体格式:
+    {
+        "symbol": "BTC",
+        "high_price": 90000.0,
+        "high_time": "2025-12-15 14:30:00",
+        "high_index": 1000,
+        "mark_price": 89500.0,
+        "mark_time": "2025-12-15 15:00:00",
+        "mark_index": 1006,
+        "mark_rsi": 65.5
+    }
+    """
+    try:
+        data = request.get_json()
+        
+        if not data:
+            return jsonify({
+                'success': False,
+                'error': '请求体不能为空'
+            }), 400
+        
+        # 验证必需字段
+        required_fields = ['symbol', 'high_price', 'high_time', 'high_index', 
+                          'mark_price', 'mark_time', 'mark_index', 'mark_rsi']
+        for field in required_fields:
+            if field not in data:
+                return jsonify({
+                    'success': False,
+                    'error': f'缺少必需字段: {field}'
+                }), 400
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 检查是否已存在相同的信号（避免重复插入）
+        cursor.execute('''
+            SELECT id FROM sell_point_1_signals
+            WHERE symbol = ? AND mark_time = ? AND is_valid = 1
+        ''', (data['symbol'], data['mark_time']))
+        
+        existing = cursor.fetchone()
+        if existing:
+            conn.close()
+            return jsonify({
+                'success': True,
+                'message': '信号已存在',
+                'signal_id': existing[0]
+            })
+        
+        # 插入新信号
+        now = datetime.now(pytz.timezone('Asia/Shanghai')).strftime('%Y-%m-%d %H:%M:%S')
+        cursor.execute('''
+            INSERT INTO sell_point_1_signals (
+                symbol, high_price, high_time, high_index,
+                mark_price, mark_time, mark_index, mark_rsi,
+                signal_generated_at, is_valid
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, 1)
+        ''', (
+            data['symbol'],
+            data['high_price'],
+            data['high_time'],
+            data['high_index'],
+            data['mark_price'],
+            data['mark_time'],
+            data['mark_index'],
+            data['mark_rsi'],
+            now
+        ))
+        
+        signal_id = cursor.lastrowid
+        conn.commit()
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'message': '卖点1信号保存成功',
+            'signal_id': signal_id
+        })
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@signals_bp.route('/api/sell-point-1/latest')
+def api_sell_point_1_latest():
+    """
+    获取最新的卖点1信号
+    
+    参数:
+        - symbol: 币种（可选，如BTC）
+        - hours: 时间范围（可选，默认24小时）
+    """
+    try:
+        symbol = request.args.get('symbol')
+        hours = int(request.args.get('hours', 24))
+        
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 构建查询
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        cutoff_time = (datetime.now(beijing_tz) - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        if symbol:
+            cursor.execute('''
+                SELECT * FROM sell_point_1_signals
+                WHERE symbol = ? AND mark_time >= ? AND is_valid = 1
+                ORDER BY mark_time DESC
+            ''', (symbol, cutoff_time))
+        else:
+            cursor.execute('''
+                SELECT * FROM sell_point_1_signals
+                WHERE mark_time >= ? AND is_valid = 1
+                ORDER BY mark_time DESC
+            ''', (cutoff_time,))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        signals = []
+        for row in rows:
+            signals.append({
+                'id': row['id'],
+                'symbol': row['symbol'],
+                'high_price': row['high_price'],
+                'high_time': row['high_time'],
+                'high_index': row['high_index'],
+                'mark_price': row['mark_price'],
+                'mark_time': row['mark_time'],
+                'mark_index': row['mark_index'],
+                'mark_rsi': row['mark_rsi'],
+                'signal_generated_at': row['signal_generated_at'],
+                'created_at': row['created_at']
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': signals,
+            'count': len(signals),
+            'timestamp': datetime.now(beijing_tz).strftime('%Y-%m-%d %H:%M:%S')
+        })
+        
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
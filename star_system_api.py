@@ -0,0 +1,467 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+星星系统
+星星系统页面与数据、历史
+"""
+
+from datetime import datetime, timedelta
+import pytz
+import traceback
+
+from flask import Blueprint, jsonify, render_template, request
+
+from app_common import SNAPSHOT_SOURCES, cached_response
+from db_access import get_connection
+
+star_system_bp = Blueprint('star_system', __name__)
+
+@star_system_bp.route('/star-system')
+def star_system_page():
+    """星星系统页面"""
+    return render_template('star_system.html')
+
+@star_system_bp.route('/api/star-system/data')
+@cached_response(max_age=30, sources=SNAPSHOT_SOURCES)
+def api_star_system_data():
+    """获取星星系统所有指标数据"""
+    try:
+        import sys
+        sys.path.insert(0, '/home/user/webapp')
+        from star_system import calculate_star_system
+        from datetime import datetime, timedelta
+        import pytz
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        beijing_tz = pytz.timezone('Asia/Shanghai')
+        
+        # 获取最新快照数据
+        cursor.execute('''
+            SELECT rush_up, rush_down, diff, count, snapshot_time
+            FROM crypto_snapshots
+            ORDER BY snapshot_date DESC, snapshot_time DESC
+            LIMIT 1
+        ''')
+        snapshot = cursor.fetchone()
+        
+        if not snapshot:
+            return jsonify({'success': False, 'error': '暂无快照数据'})
+        
+        rush_up, rush_down, diff, count, snapshot_time = snapshot
+        
+        # 确保数值不为None
+        rush_up = rush_up if rush_up is not None else 0
+        rush_down = rush_down if rush_down is not None else 0
+        diff = diff if diff is not None else 0
+        count = count if count is not None else 0
+        
+        # 获取全网持仓量（从恐慌清洗指数表）
+        cursor.execute('''
+            SELECT total_position
+            FROM panic_wash_index
+            ORDER BY record_time DESC
+            LIMIT 1
+        ''')
+        holdings_row = cursor.fetchone()
+        holdings = holdings_row[0] if holdings_row and holdings_row[0] is not None else 10000000000  # 默认100亿（元）
+        
+        # 获取做多做空信号（从交易信号表）
+        cursor.execute('''
+            SELECT long_signals, short_signals
+            FROM trading_signals
+            ORDER BY record_time DESC
+            LIMIT 1
+        ''')
+        signals_row = cursor.fetchone()
+        long_signals = signals_row[0] if signals_row and signals_row[0] is not None else 0
+        short_signals = signals_row[1] if signals_row and signals_row[1] is not None else 0
+        
+        # 获取今日创新高新低次数
+        today_start = datetime.now(beijing_tz).replace(hour=0, minute=0, second=0, microsecond=0)
+        today_start_str = today_start.strftime('%Y-%m-%d %H:%M:%S')
+        
+        cursor.execute('''
+            SELECT event_type, COUNT(*) 
+            FROM price_breakthrough_events 
+            WHERE event_time >= ?
+            GROUP BY event_type
+        ''', (today_start_str,))
+        today_breakthrough = dict(cursor.fetchall())
+        new_high_today = today_breakthrough.get('new_high', 0)
+        new_low_today = today_breakthrough.get('new_low', 0)
+        
+        # 获取币种统计数据（从最新快照的详细数据）
+        cursor.execute('''
+            SELECT symbol, rush_up, rush_down, priority_level
+            FROM crypto_coin_data
+            WHERE snapshot_time = ?
+        ''', (snapshot_time,))
+        coin_data = cursor.fetchall()
+        
+        # 统计特殊情况并记录具体币种
+        only_rush_up_coins = [c[0] for c in coin_data if c[1] > 0 and c[2] == 0]
+        only_rush_up_count = len(only_rush_up_coins)
+        
+        rush_up_gt_down_coins = [c[0] for c in coin_data if c[1] > c[2]]
+        rush_up_gt_down_count = len(rush_up_gt_down_coins)
+        
+        only_rush_down_coins = [c[0] for c in coin_data if c[1] == 0 and c[2] > 0]
+        only_rush_down_count = len(only_rush_down_coins)
+        
+        rush_down_gt_up_coins = [c[0] for c in coin_data if c[2] > c[1]]
+        rush_down_gt_up_count = len(rush_down_gt_up_coins)
+        
+        # 优先级≥4 means 等级1,2,3,4 (priority_level values: '等级1', '等级2', etc.)
+        priority_high_coins = [c[0] for c in coin_data if c[3] in ['等级1', '等级2', '等级3', '等级4']]
+        priority_high_count = len(priority_high_coins)
+        
+        # ========== 新增功能3: 位置系统平均位置（在conn.close()之前查询） ==========
+        try:
+            # 计算48小时前的北京时间
+            hours_ago_48 = datetime.now(beijing_tz) - timedelta(hours=48)
+            hours_ago_48_str = hours_ago_48.strftime('%Y-%m-%d %H:%M:%S')
+            
+            cursor.execute("""
+                SELECT 
+                    AVG(position_4h) as avg_4h,
+                    AVG(position_12h) as avg_12h,
+                    AVG(position_24h) as avg_24h,
+                    AVG(position_48h) as avg_48h
+                FROM position_system
+                WHERE record_time >= ?
+            """, (hours_ago_48_str,))
+            pos_row = cursor.fetchone()
+            
+            position_avg = {
+                '4h': round(pos_row[0], 2) if pos_row and pos_row[0] else 0,
+                '12h': round(pos_row[1], 2) if pos_row and pos_row[1] else 0,
+                '24h': round(pos_row[2], 2) if pos_row and pos_row[2] else 0,
+                '48h': round(pos_row[3], 2) if pos_row and pos_row[3] else 0
+            }
+        except Exception as e:
+            position_avg = {'4h': 0, '12h': 0, '24h': 0, '48h': 0}
+            print(f"位置系统平均位置查询错误: {e}")
+        
+        # ========== 新增功能4: 创新高/创新低统计（在conn.close()之前查询） ==========
+        try:
+            # 当天统计（今天0点到现在）
+            today_start = datetime.now(beijing_tz).replace(hour=0, minute=0, second=0, microsecond=0)
+            today_start_str = today_start.strftime('%Y-%m-%d %H:%M:%S')
+            
+            # 3天统计
+            three_days_ago = datetime.now(beijing_tz) - timedelta(days=3)
+            three_days_ago_str = three_days_ago.strftime('%Y-%m-%d %H:%M:%S')
+            
+            # 7天统计
+            seven_days_ago = datetime.now(beijing_tz) - timedelta(days=7)
+            seven_days_ago_str = seven_days_ago.strftime('%Y-%m-%d %H:%M:%S')
+            
+            # 查询当天创新高/创新低
+            cursor.execute("""
+                SELECT 
+                    SUM(CASE WHEN event_type = 'new_high' THEN 1 ELSE 0 END) as today_high,
+                    SUM(CASE WHEN event_type = 'new_low' THEN 1 ELSE 0 END) as today_low
+                FROM price_breakthrough_events
+                WHERE event_time >= ?
+            """, (today_start_str,))
+            today_bt = cursor.fetchone()
+            
+            # 查询3天创新高/创新低
+            cursor.execute("""
+                SELECT 
+                    SUM(CASE WHEN event_type = 'new_high' THEN 1 ELSE 0 END) as three_days_high,
+                    SUM(CASE WHEN event_type = 'new_low' THEN 1 ELSE 0 END) as three_days_low
+                FROM price_breakthrough_events
+                WHERE event_time >= ?
+            """, (three_days_ago_str,))
+            three_days_bt = cursor.fetchone()
+            
+            # 查询7天创新高/创新低
+            cursor.execute("""
+                SELECT 
+                    SUM(CASE WHEN event_type = 'new_high' THEN 1 ELSE 0 END) as seven_days_high,
+                    SUM(CASE WHEN event_type = 'new_low' THEN 1 ELSE 0 END) as seven_days_low
+                FROM price_breakthrough_events
+                WHERE event_time >= ?
+            """, (seven_days_ago_str,))
+            seven_days_bt = cursor.fetchone()
+            
+            breakthrough_stats = {
+                'today': {
+                    'new_high': today_bt[0] if today_bt and today_bt[0] else 0,
+                    'new_low': today_bt[1] if today_bt and today_bt[1] else 0
+                },
+                'three_days': {
+                    'new_high': three_days_bt[0] if three_days_bt and three_days_bt[0] else 0,
+                    'new_low': three_days_bt[1] if three_days_bt and three_days_bt[1] else 0
+                },
+                'seven_days': {
+                    'new_high': seven_days_bt[0] if seven_days_bt and seven_days_bt[0] else 0,
+                    'new_low': seven_days_bt[1] if seven_days_bt and seven_days_bt[1] else 0
+                }
+            }
+        except Exception as e:
+            breakthrough_stats = {
+                'today': {'new_high': 0, 'new_low': 0},
+                'three_days': {'new_high': 0, 'new_low': 0},
+                'seven_days': {'new_high': 0, 'new_low': 0}
+            }
+            print(f"创新高/创新低统计查询错误: {e}")
+        
+        conn.close()
+        
+        # 准备数据给星星系统计算
+        data = {
+            'rush_up': rush_up,
+            'rush_down': rush_down,
+            'diff': diff,
+            'holdings': holdings,
+            'long_signals': long_signals,
+            'short_signals': short_signals,
+            'only_rush_up_count': only_rush_up_count,
+            'rush_up_gt_down_count': rush_up_gt_down_count,
+            'priority_high_count': priority_high_count,
+            'only_rush_down_count': only_rush_down_count,
+            'rush_down_gt_up_count': rush_down_gt_up_count,
+            'new_low_today': new_low_today,
+            'new_high_today': new_high_today,
+            'count': count,
+            'snapshot_time': snapshot_time
+        }
+        
+        # 计算星星系统
+        results = calculate_star_system(data)
+        
+        # 保存到历史记录表（每次调用API时保存）
+        try:
+            import json as json_lib
+            cursor.execute('''
+                INSERT INTO star_system_history 
+                (timestamp, total_stars, solid_stars, hollow_stars, solid_percentage, hollow_percentage, raw_data)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (
+                snapshot_time,
+                results.get('total_stars', 0),
+                results.get('solid_stars', 0),
+                results.get('hollow_stars', 0),
+                results.get('solid_percentage', 0),
+                results.get('hollow_percentage', 0),
+                json_lib.dumps(results, ensure_ascii=False)
+            ))
+            conn.commit()
+        except Exception as save_err:
+            print(f"保存历史数据失败: {save_err}")
+        
+        # 添加币种列表到结果中
+        coin_lists = {
+            'only_rush_up_coins': only_rush_up_coins,
+            'rush_up_gt_down_coins': rush_up_gt_down_coins,
+            'priority_high_coins': priority_high_coins,
+            'only_rush_down_coins': only_rush_down_coins,
+            'rush_down_gt_up_coins': rush_down_gt_up_coins
+        }
+        
+        # ========== 新增功能1: V1/V2币种统计 ==========
+        try:
+            conn_v1v2 = get_connection('v1v2')
+            cursor_v1v2 = conn_v1v2.cursor()
+            
+            coins_list = ['BTC', 'ETH', 'XRP', 'SOL', 'BNB', 'LTC', 'DOGE', 'SUI', 'TRX', 'TON', 
+                         'ETC', 'BCH', 'HBAR', 'XLM', 'FIL', 'ADA', 'LINK', 'CRO', 'DOT', 'UNI',
+                         'NEAR', 'APT', 'CFX', 'CRV', 'STX', 'LDO', 'TAO', 'AAVE']
+            
+            v1_coins_list = []
+            v2_coins_list = []
+            
+            for coin in coins_list:
+                try:
+                    cursor_v1v2.execute(f"""
+                        SELECT level FROM volume_{coin.lower()}
+                        ORDER BY id DESC LIMIT 1
+                    """)
+                    row = cursor_v1v2.fetchone()
+                    if row and row[0] == 'V1':
+                        v1_coins_list.append(coin)
+                    elif row and row[0] == 'V2':
+                        v2_coins_list.append(coin)
+                except:
+                    pass
+            
+            conn_v1v2.close()
+        except:
+            v1_coins_list = []
+            v2_coins_list = []
+        
+        # ========== 新增功能2: 1分钟涨跌速预警统计 ==========
+        try:
+            conn_ps = get_connection('price_speed')
+            cursor_ps = conn_ps.cursor()
+            
+            # 获取各类型预警的币种
+            cursor_ps.execute("""
+                SELECT alert_type, symbol
+                FROM latest_price_speed
+                WHERE alert_type != 'NORMAL'
+            """)
+            
+            alert_coins = {
+                'super_strong_up': [],
+                'very_strong_up': [],
+                'strong_up': [],
+                'general_up': [],
+                'super_strong_down': [],
+                'very_strong_down': [],
+                'strong_down': [],
+                'general_down': []
+            }
+            
+            for alert_type, symbol in cursor_ps.fetchall():
+                if alert_type == 'SUPER_STRONG_UP':
+                    alert_coins['super_strong_up'].append(symbol)
+                elif alert_type == 'VERY_STRONG_UP':
+                    alert_coins['very_strong_up'].append(symbol)
+                elif alert_type == 'STRONG_UP':
+                    alert_coins['strong_up'].append(symbol)
+                elif alert_type == 'GENERAL_UP':
+                    alert_coins['general_up'].append(symbol)
+                elif alert_type == 'SUPER_STRONG_DOWN':
+                    alert_coins['super_strong_down'].append(symbol)
+                elif alert_type == 'VERY_STRONG_DOWN':
+                    alert_coins['very_strong_down'].append(symbol)
+                elif alert_type == 'STRONG_DOWN':
+                    alert_coins['strong_down'].append(symbol)
+                elif alert_type == 'GENERAL_DOWN':
+                    alert_coins['general_down'].append(symbol)
+            
+            conn_ps.close()
+        except:
+            alert_coins = {
+                'super_strong_up': [],
+                'very_strong_up': [],
+                'strong_up': [],
+                'general_up': [],
+                'super_strong_down': [],
+                'very_strong_down': [],
+                'strong_down': [],
+                'general_down': []
+            }
+        
+        return jsonify({
+            'success': True,
+            'data': results,
+            'raw_data': data,
+            'coin_lists': coin_lists,
+            'update_time': snapshot_time,
+            # 新增数据
+            'v1v2_data': {
+                'v1_coins': v1_coins_list,
+                'v1_count': len(v1_coins_list),
+                'v2_coins': v2_coins_list,
+                'v2_count': len(v2_coins_list)
+            },
+            'price_speed_alerts': {
+                'up': {
+                    'super_strong': {'count': len(alert_coins['super_strong_up']), 'coins': alert_coins['super_strong_up']},
+                    'very_strong': {'count': len(alert_coins['very_strong_up']), 'coins': alert_coins['very_strong_up']},
+                    'strong': {'count': len(alert_coins['strong_up']), 'coins': alert_coins['strong_up']},
+                    'general': {'count': len(alert_coins['general_up']), 'coins': alert_coins['general_up']}
+                },
+                'down': {
+                    'super_strong': {'count': len(alert_coins['super_strong_down']), 'coins': alert_coins['super_strong_down']},
+                    'very_strong': {'count': len(alert_coins['very_strong_down']), 'coins': alert_coins['very_strong_down']},
+                    'strong': {'count': len(alert_coins['strong_down']), 'coins': alert_coins['strong_down']},
+                    'general': {'count': len(alert_coins['general_down']), 'coins': alert_coins['general_down']}
+                }
+            },
+            'position_avg': position_avg,
+            'breakthrough_stats': breakthrough_stats
+        })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
+
+# ==================== 星星系统历史数据 API ====================
+@star_system_bp.route('/api/star-system/history')
+def api_star_system_history():
+    """获取星星系统历史数据"""
+    try:
+        date = request.args.get('date')  # 格式: YYYY-MM-DD
+        limit = int(request.args.get('limit', 100))
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        if date:
+            # 查询指定日期的数据
+            start_time = f"{date} 00:00:00"
+            end_time = f"{date} 23:59:59"
+            cursor.execute('''
+                SELECT id, timestamp, total_stars, solid_stars, hollow_stars, 
+                       solid_percentage, hollow_percentage, raw_data
+                FROM star_system_history
+                WHERE timestamp BETWEEN ? AND ?
+                ORDER BY timestamp DESC
+                LIMIT ?
+            ''', (start_time, end_time, limit))
+        else:
+            # 查询最近的记录
+            cursor.execute('''
+                SELECT id, timestamp, total_stars, solid_stars, hollow_stars, 
+                       solid_percentage, hollow_percentage, raw_data
+                FROM star_system_history
+                ORDER BY timestamp DESC
+                LIMIT ?
+            ''', (limit,))
+        
+        rows = cursor.fetchall()
+        
+        history_data = []
+        for row in rows:
+            try:
+                import json as json_lib
+                raw_data = json_lib.loads(row[7]) if row[7] else {}
+            except:
+                raw_data = {}
+            
+            history_data.append({
+                'id': row[0],
+                'timestamp': row[1],
+                'total_stars': row[2],
+                'solid_stars': row[3],
+                'hollow_stars': row[4],
+                'solid_percentage': row[5],
+                'hollow_percentage': row[6],
+                'details': raw_data
+            })
+        
+        # 获取可用日期列表
+        cursor.execute('''
+            SELECT DISTINCT DATE(timestamp) as date
+            FROM star_system_history
+            ORDER BY date DESC
+            LIMIT 30
+        ''')
+        available_dates = [row[0] for row in cursor.fetchall()]
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': history_data,
+            'available_dates': available_dates,
+            'total_records': len(history_data)
+        })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
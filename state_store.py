@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+事务型键值状态存储
+替代整文件读写的 JSON 状态文件（子账户配置、已开仓记录、维护次数、维护订单……）：
+- 每个 JSON 文件对应一个命名空间，存放在 state_store.db 的 kv_state 表
+- 映射型命名空间每个键一行；单键读-改-写在一个 BEGIN IMMEDIATE 事务内完成，并发更新不会丢失
+- 进程内缓存各键的 JSON 文本；读取时只查一次连接的 PRAGMA data_version，
+  其他连接提交过才查询 kv_namespaces 的版本号，丢弃版本变化的命名空间
+- 命名空间首次访问时自动导入旧 JSON 文件，导入后改名为 *.migrated 留作备份
+
+用法:
+    from state_store import SUB_ACCOUNT_CONFIG, SUB_ACCOUNT_MAINTENANCE
+    config = SUB_ACCOUNT_CONFIG.load()
+    SUB_ACCOUNT_MAINTENANCE.update(key, lambda record: dict(record, count=record['count'] + 1),
+                                   default={'count': 0})
+
+    python state_store.py migrate                       # 导入全部旧 JSON 文件
+    python state_store.py export sub_account_config     # 以 JSON 输出某个命名空间
+"""
+
+import abc
+import argparse
+import json
+import os
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+
+from db_access import DB_DIR, get_connection, transaction
+
+SCHEMA = (
+    '''
+    CREATE TABLE IF NOT EXISTS kv_state (
+        namespace TEXT NOT NULL,
+        key TEXT NOT NULL,
+        value TEXT NOT NULL,
+        updated_at TEXT,
+        UNIQUE (namespace, key)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS kv_namespaces (
+        namespace TEXT PRIMARY KEY,
+        version INTEGER NOT NULL,
+        migrated_from TEXT,
+        updated_at TEXT
+    )
+    ''',
+)
+
+DOCUMENT_KEY = ''     # 文档型命名空间的唯一键
+
+# 命名空间名称 -> StateMap / StateDocument（migrate_all 按此导入）
+NAMESPACES: Dict[str, 'StateNamespace'] = {}
+
+
+def _now() -> str:
+    return datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class StateStore:
+    """
+    SQLite 键值存储 + 进程内缓存
+
+    缓存: namespace -> (version, {key: JSON文本})，读取时反序列化，调用方拿到的总是新对象
+    """
+
+    def __init__(self, db: str = 'state_store', legacy_dir: Optional[str] = None):
+        self.db = db
+        self.legacy_dir = legacy_dir or DB_DIR
+        self._cache: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ready = set()
+        self._schema_ready = False
+
+    # ------------------------------------------------------------------
+    # 缓存有效性
+    # ------------------------------------------------------------------
+    def _prepare(self, conn, namespace: 'StateNamespace'):
+        """建表并在命名空间首次访问时导入旧 JSON 文件"""
+        if not self._schema_ready:
+            for ddl in SCHEMA:
+                conn.execute(ddl)
+            conn.commit()
+            self._schema_ready = True
+        if namespace.name not in self._ready:
+            self._migrate(namespace)
+            self._ready.add(namespace.name)
+
+    def _validate(self, conn):
+        """
+        数据库变化过时，丢弃版本号已变化的命名空间缓存
+        data_version 反映其他连接的提交，total_changes 反映同一连接（同线程的其他实例）的写入
+        """
+        data_version = (os.getpid(), conn.execute('PRAGMA data_version').fetchone()[0], conn.total_changes)
+        if getattr(self._local, 'data_version', None) == data_version:
+            return
+        versions = dict(conn.execute('SELECT namespace, version FROM kv_namespaces').fetchall())
+        with self._lock:
+            for name in [name for name, (version, _) in self._cache.items() if versions.get(name) != version]:
+                del self._cache[name]
+        self._local.data_version = data_version
+
+    def _entries(self, namespace: 'StateNamespace') -> Dict[str, str]:
+        """命名空间的 {key: JSON文本}（缓存对象，只读）"""
+        conn = get_connection(self.db)
+        try:
+            self._prepare(conn, namespace)
+            self._validate(conn)
+            cached = self._cache.get(namespace.name)
+            if cached is not None:
+                return cached[1]
+            # 版本号和数据在同一条语句里读，保证是同一个快照
+            rows = conn.execute('''
+                SELECT 0 AS part, 0 AS seq, NULL, NULL, version FROM kv_namespaces WHERE namespace = ?
+                UNION ALL
+                SELECT 1, rowid, key, value, NULL FROM kv_state WHERE namespace = ?
+                ORDER BY part, seq
+            ''', (namespace.name, namespace.name)).fetchall()
+        finally:
+            conn.close()
+        version = rows[0][4] if rows and rows[0][0] == 0 else 0
+        entries = {row[2]: row[3] for row in rows if row[0] == 1}
+        self._store(namespace.name, version, entries, replace=True)
+        return entries
+
+    def _store(self, name: str, version: int, entries: Dict[str, str], replace: bool):
+        """
+        写入缓存
+        replace=True: entries 是版本 version 的完整内容
+        replace=False: entries 是从 version-1 到 version 的改动（None 表示删除），缓存不是 version-1 时丢弃
+        """
+        with self._lock:
+            cached = self._cache.get(name)
+            if replace:
+                if cached is None or cached[0] <= version:
+                    self._cache[name] = (version, entries)
+            elif cached is not None and cached[0] == version - 1:
+                merged = dict(cached[1])
+                for key, text in entries.items():
+                    if text is None:
+                        merged.pop(key, None)
+                    else:
+                        merged[key] = text
+                self._cache[name] = (version, merged)
+            elif cached is not None and cached[0] < version:
+                del self._cache[name]
+
+    # ------------------------------------------------------------------
+    # 读写
+    # ------------------------------------------------------------------
+    def get(self, namespace: 'StateNamespace', key: str, default=None):
+        text = self._entries(namespace).get(key)
+        return default if text is None else json.loads(text)
+
+    def items(self, namespace: 'StateNamespace') -> Dict[str, Any]:
+        return {key: json.loads(text) for key, text in self._entries(namespace).items()}
+
+    def contains(self, namespace: 'StateNamespace', key: str) -> bool:
+        return key in self._entries(namespace)
+
+    def _bump(self, conn, name: str, migrated_from: Optional[str] = None) -> int:
+        conn.execute('''
+            INSERT INTO kv_namespaces (namespace, version, migrated_from, updated_at)
+            VALUES (?, 1, ?, ?)
+            ON CONFLICT(namespace) DO UPDATE SET version = version + 1, updated_at = excluded.updated_at
+        ''', (name, migrated_from, _now()))
+        return conn.execute('SELECT version FROM kv_namespaces WHERE namespace = ?', (name,)).fetchone()[0]
+
+    def _upsert(self, conn, name: str, key: str, text: str):
+        conn.execute('''
+            INSERT INTO kv_state (namespace, key, value, updated_at) VALUES (?, ?, ?, ?)
+            ON CONFLICT(namespace, key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at
+        ''', (name, key, text, _now()))
+
+    def write(self, namespace: 'StateNamespace', changes: Callable[[Callable[[str], Any]], Dict[str, Any]]):
+        """
+        原子写入：在写事务内调用 changes(read)，read(key) 返回该键的当前值（不存在为 None），
+        changes 返回 {key: 新值}，新值为 DELETE 时删除该键
+
+        Returns:
+            changes 的返回值
+        """
+        conn = get_connection(self.db)
+        try:
+            self._prepare(conn, namespace)
+        finally:
+            conn.close()
+        name = namespace.name
+        with transaction(self.db) as conn:
+            def read(key):
+                row = conn.execute('SELECT value FROM kv_state WHERE namespace = ? AND key = ?',
+                                   (name, key)).fetchone()
+                return None if row is None else json.loads(row[0])
+
+            updates = changes(read)
+            texts = {}
+            for key, value in updates.items():
+                if value is DELETE:
+                    conn.execute('DELETE FROM kv_state WHERE namespace = ? AND key = ?', (name, key))
+                    texts[key] = None
+                else:
+                    namespace.check(key, value)
+                    texts[key] = _dumps(value)
+                    self._upsert(conn, name, key, texts[key])
+            version = self._bump(conn, name)
+        self._store(name, version, texts, replace=False)
+        return updates
+
+    def replace(self, namespace: 'StateNamespace', mapping: Dict[str, Any]):
+        """整体替换命名空间的内容"""
+        for key, value in mapping.items():
+            namespace.check(key, value)
+        texts = {key: _dumps(value) for key, value in mapping.items()}
+        conn = get_connection(self.db)
+        try:
+            self._prepare(conn, namespace)
+        finally:
+            conn.close()
+        with transaction(self.db) as conn:
+            conn.execute('DELETE FROM kv_state WHERE namespace = ?', (namespace.name,))
+            for key, text in texts.items():
+                self._upsert(conn, namespace.name, key, text)
+            version = self._bump(conn, namespace.name)
+        self._store(namespace.name, version, texts, replace=True)
+
+    # ------------------------------------------------------------------
+    # 旧 JSON 文件导入
+    # ------------------------------------------------------------------
+    def _migrate(self, namespace: 'StateNamespace'):
+        """命名空间还不存在时导入旧 JSON 文件（文件不存在则建一个空命名空间）"""
+        path = os.path.join(self.legacy_dir, namespace.legacy_file) if namespace.legacy_file else None
+        with transaction(self.db) as conn:
+            if conn.execute('SELECT 1 FROM kv_namespaces WHERE namespace = ?', (namespace.name,)).fetchone():
+                return
+            imported = None
+            if path and os.path.exists(path):
+                with open(path, 'r', encoding='utf-8') as f:
+                    imported = namespace.from_legacy(json.load(f))
+                for key, value in imported.items():
+                    self._upsert(conn, namespace.name, key, _dumps(value))
+            self._bump(conn, namespace.name, migrated_from=path if imported is not None else None)
+        if imported is not None:
+            os.replace(path, path + '.migrated')
+            print(f"📦 已导入 {path} → {namespace.name} ({len(imported)} 项)")
+
+
+class _Delete:
+    def __repr__(self):
+        return 'DELETE'
+
+
+DELETE = _Delete()
+
+_default_store = StateStore()
+
+
+def get_default_store() -> StateStore:
+    return _default_store
+
+
+def set_default_store(store: StateStore):
+    """替换全局存储（测试或使用其他数据库目录时）"""
+    global _default_store
+    _default_store = store
+
+
+class StateNamespace(abc.ABC):
+    """一个命名空间（原来的一个 JSON 文件）"""
+
+    def __init__(self, name: str, legacy_file: Optional[str] = None, store: Optional[StateStore] = None):
+        self.name = name
+        self.legacy_file = legacy_file
+        self._store = store
+        NAMESPACES[name] = self
+
+    @property
+    def store(self) -> StateStore:
+        return self._store or _default_store
+
+    def check(self, key: str, value):
+        """写入前的类型检查"""
+
+    @abc.abstractmethod
+    def from_legacy(self, data) -> Dict[str, Any]:
+        """旧 JSON 文件内容 -> {key: value}"""
+
+
+class StateMap(StateNamespace):
+    """映射型命名空间：{key: record}，每个键独立读写"""
+
+    def __init__(self, name: str, legacy_file: Optional[str] = None, value_type: type = dict,
+                 store: Optional[StateStore] = None):
+        super().__init__(name, legacy_file, store)
+        self.value_type = value_type
+
+    def check(self, key, value):
+        if not isinstance(key, str):
+            raise TypeError(f'{self.name}: 键必须是字符串，实际为 {type(key).__name__}')
+        if not isinstance(value, self.value_type):
+            raise TypeError(f'{self.name}[{key}]: 值必须是 {self.value_type.__name__}，实际为 {type(value).__name__}')
+
+    def from_legacy(self, data):
+        if not isinstance(data, dict):
+            raise ValueError(f'{self.legacy_file} 不是 JSON 对象')
+        return data
+
+    def get(self, key: str, default=None):
+        return self.store.get(self, key, default)
+
+    def all(self) -> Dict[str, Any]:
+        return self.store.items(self)
+
+    def __contains__(self, key: str) -> bool:
+        return self.store.contains(self, key)
+
+    def set(self, key: str, value):
+        self.store.write(self, lambda read: {key: value})
+
+    def delete(self, key: str):
+        self.store.write(self, lambda read: {key: DELETE})
+
+    def update(self, key: str, fn: Callable[[Any], Any], default=None):
+        """
+        原子地读-改-写一个键
+        fn(当前值或 default 的副本) 返回新值；返回 None 表示原地修改了传入的值
+
+        Returns:
+            新值
+        """
+        def changes(read):
+            current = read(key)
+            if current is None:
+                current = json.loads(_dumps(default)) if default is not None else None
+            result = fn(current)
+            return {key: current if result is None else result}
+
+        return self.store.write(self, changes)[key]
+
+    def replace(self, mapping: Dict[str, Any]):
+        self.store.replace(self, mapping)
+
+
+class StateDocument(StateNamespace):
+    """文档型命名空间：整体读写的一个 JSON 值（配置、列表）"""
+
+    def __init__(self, name: str, legacy_file: Optional[str] = None, default_factory: Callable[[], Any] = dict,
+                 store: Optional[StateStore] = None):
+        super().__init__(name, legacy_file, store)
+        self.default_factory = default_factory
+
+    def check(self, key, value):
+        expected = type(self.default_factory())
+        if not isinstance(value, expected):
+            raise TypeError(f'{self.name}: 值必须是 {expected.__name__}，实际为 {type(value).__name__}')
+
+    def from_legacy(self, data):
+        return {DOCUMENT_KEY: data}
+
+    def load(self):
+        value = self.store.get(self, DOCUMENT_KEY)
+        return self.default_factory() if value is None else value
+
+    def save(self, value):
+        self.store.write(self, lambda read: {DOCUMENT_KEY: value})
+
+    def update(self, fn: Callable[[Any], Any]):
+        """原子地读-改-写整个文档，fn 返回 None 表示原地修改；返回新值"""
+        def changes(read):
+            current = read(DOCUMENT_KEY)
+            if current is None:
+                current = self.default_factory()
+            result = fn(current)
+            return {DOCUMENT_KEY: current if result is None else result}
+
+        return self.store.write(self, changes)[DOCUMENT_KEY]
+
+
+# ----------------------------------------------------------------------
+# 各状态（名称与原来的 JSON 文件对应）
+# ----------------------------------------------------------------------
+def default_sub_account_config() -> Dict:
+    """还没有子账户配置时的默认值"""
+    return {
+        'sub_accounts': [],
+        'main_account': {'account_name': 'JAMESYI', 'enabled': True}
+    }
+
+
+SUB_ACCOUNT_CONFIG = StateDocument('sub_account_config', 'sub_account_config.json',
+                                   default_factory=default_sub_account_config)
+SUB_ACCOUNT_OPENED_POSITIONS = StateMap('sub_account_opened_positions', 'sub_account_opened_positions.json')
+SUB_ACCOUNT_MAINTENANCE = StateMap('sub_account_maintenance', 'sub_account_maintenance.json')
+SUB_ACCOUNT_MAINTENANCE_COUNT = StateMap('sub_account_maintenance_count', 'sub_account_maintenance_count.json',
+                                         value_type=int)
+MAINTENANCE_ORDERS = StateDocument('maintenance_orders', 'maintenance_orders.json', default_factory=list)
+MAIN_ACCOUNT_MAINTENANCE = StateMap('main_account_maintenance', 'main_account_maintenance.json')
+
+
+def export(namespace: StateNamespace):
+    """命名空间 -> 与旧 JSON 文件相同结构的值"""
+    if isinstance(namespace, StateDocument):
+        return namespace.load()
+    return namespace.all()
+
+
+def migrate_all():
+    """导入全部旧 JSON 文件（已导入的命名空间跳过）"""
+    for namespace in NAMESPACES.values():
+        export(namespace)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='事务型键值状态存储')
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('migrate', help='导入全部旧 JSON 状态文件')
+    export_parser = sub.add_parser('export', help='以 JSON 输出命名空间')
+    export_parser.add_argument('namespace', choices=sorted(NAMESPACES))
+    args = parser.parse_args()
+
+    if args.command == 'migrate':
+        migrate_all()
+        for name, namespace in NAMESPACES.items():
+            print(f"  {name}: {len(export(namespace))} 项")
+        print("✅ 迁移完成")
+    else:
+        print(json.dumps(export(NAMESPACES[args.namespace]), ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    main()
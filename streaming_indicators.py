@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+增量流式技术指标引擎
+- 每个 (币种, 周期) 一个状态对象，每个tick O(1) 更新
+- RSI(14): Wilder 平滑状态
+- Parabolic SAR: 与 talib.SAR 相同的状态机
+- Bollinger Bands(20, 2): 滚动 sum / sum of squares
+- SAR 连续计数随价格实时跟踪，不再每个tick全量重算
+
+输出与 talib 对同一条完整K线序列的计算结果一致
+（talib.RSI / talib.SAR / talib.BBANDS 的最后一个值）。
+"""
+
+import math
+from collections import deque, namedtuple
+from typing import Dict, List, Optional
+
+# SAR 状态：is_long=None 表示只见过第一根K线；high/low 为最后一根已收盘K线
+_SarState = namedtuple('_SarState', ['is_long', 'sar', 'ep', 'af', 'high', 'low'])
+
+
+def _advance_sar(state: Optional[_SarState], high: float, low: float,
+                 acceleration: float, maximum: float):
+    """
+    推进一根K线的SAR状态（纯函数，不修改传入状态）
+
+    Returns:
+        (sar_value, new_state)，第一根K线 sar_value 为 None
+    """
+    if state is None:
+        return None, _SarState(None, None, None, None, high, low)
+
+    if state.is_long is None:
+        # 第二根K线：与 talib 一样用 1 周期 -DM 判断初始方向
+        diff_plus = high - state.high
+        diff_minus = state.low - low
+        minus_dm = diff_minus if (diff_minus > 0 and diff_plus < diff_minus) else 0.0
+        is_long = minus_dm <= 0
+        if is_long:
+            ep, sar = high, state.low
+        else:
+            ep, sar = low, state.high
+        state = _SarState(is_long, sar, ep, acceleration, high, low)
+
+    is_long, sar, ep, af = state.is_long, state.sar, state.ep, state.af
+    prev_high, prev_low = state.high, state.low
+
+    if is_long:
+        if low <= sar:
+            # 多转空
+            is_long = False
+            sar = max(ep, prev_high, high)
+            output = sar
+            af = acceleration
+            ep = low
+            sar = sar + af * (ep - sar)
+            sar = max(sar, prev_high, high)
+        else:
+            output = sar
+            if high > ep:
+                ep = high
+                af = min(af + acceleration, maximum)
+            sar = sar + af * (ep - sar)
+            sar = min(sar, prev_low, low)
+    else:
+        if high >= sar:
+            # 空转多
+            is_long = True
+            sar = min(ep, prev_low, low)
+            output = sar
+            af = acceleration
+            ep = high
+            sar = sar + af * (ep - sar)
+            sar = min(sar, prev_low, low)
+        else:
+            output = sar
+            if low < ep:
+                ep = low
+                af = min(af + acceleration, maximum)
+            sar = sar + af * (ep - sar)
+            sar = max(sar, prev_high, high)
+
+    return output, _SarState(is_long, sar, ep, af, high, low)
+
+
+class StreamingIndicators:
+    """单个 (币种, 周期) 的增量指标状态"""
+
+    def __init__(self, rsi_period: int = 14, bb_period: int = 20, bb_dev: float = 2.0,
+                 sar_acceleration: float = 0.02, sar_maximum: float = 0.2,
+                 min_bars: int = 20):
+        """初始化"""
+        self.rsi_period = rsi_period
+        self.bb_period = bb_period
+        self.bb_dev = bb_dev
+        self.sar_acceleration = min(sar_acceleration, sar_maximum)
+        self.sar_maximum = sar_maximum
+        self.min_bars = min_bars
+
+        # 已收盘K线数量及最后收盘价
+        self.closed_count = 0
+        self.last_close = None
+
+        # RSI: 种子期累计涨跌，之后为 Wilder 平均
+        self.avg_gain = 0.0
+        self.avg_loss = 0.0
+
+        # 布林带：最近 bb_period 根收盘价及滚动和
+        self.bb_window = deque(maxlen=bb_period)
+        self.bb_sum = 0.0
+        self.bb_sum_sq = 0.0
+        self._bb_commits = 0
+
+        # SAR 状态机及连续计数
+        self.sar_state = None
+        self.run_position = None
+        self.run_count = 0
+        self.last_closed = None
+
+        # 当前未收盘K线 [timestamp, open, high, low, close, volume]
+        self.forming = None
+
+    # ------------------------------------------------------------------
+    # 输入
+    # ------------------------------------------------------------------
+    def update(self, kline: List) -> bool:
+        """
+        接收一条K线推送
+
+        Args:
+            kline: [timestamp, open, high, low, close, volume]（OKEx 原始字符串也可）
+
+        Returns:
+            bool: 是否开启了一根新K线（上一根K线已收盘并计入状态）
+        """
+        timestamp = int(kline[0])
+        bar = (timestamp, float(kline[2]), float(kline[3]), float(kline[4]))
+
+        if self.forming is None:
+            self.forming = bar
+            return True
+        if timestamp == self.forming[0]:
+            self.forming = bar
+            return False
+        if timestamp < self.forming[0]:
+            # 过期推送（如重连后的旧K线），忽略
+            return False
+
+        self._commit(*self.forming[1:])
+        self.forming = bar
+        return True
+
+    def _commit(self, high: float, low: float, close: float):
+        """把一根收盘K线计入状态"""
+        n = self.closed_count
+        period = self.rsi_period
+
+        # RSI
+        if n >= 1:
+            change = close - self.last_close
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+            if n <= period:
+                self.avg_gain += gain
+                self.avg_loss += loss
+                if n == period:
+                    self.avg_gain /= period
+                    self.avg_loss /= period
+            else:
+                self.avg_gain = (self.avg_gain * (period - 1) + gain) / period
+                self.avg_loss = (self.avg_loss * (period - 1) + loss) / period
+
+        # 布林带滚动和（每满一个周期用窗口重新求和，消除浮点漂移）
+        if len(self.bb_window) == self.bb_period:
+            oldest = self.bb_window[0]
+            self.bb_sum -= oldest
+            self.bb_sum_sq -= oldest * oldest
+        self.bb_window.append(close)
+        self.bb_sum += close
+        self.bb_sum_sq += close * close
+        self._bb_commits += 1
+        if self._bb_commits >= self.bb_period:
+            self._bb_commits = 0
+            self.bb_sum = math.fsum(self.bb_window)
+            self.bb_sum_sq = math.fsum(x * x for x in self.bb_window)
+
+        # SAR 及连续计数
+        sar_value, self.sar_state = _advance_sar(
+            self.sar_state, high, low, self.sar_acceleration, self.sar_maximum)
+        if sar_value is None:
+            self.run_position, self.run_count = None, 0
+        else:
+            position = 'bullish' if close > sar_value else 'bearish'
+            if position == self.run_position:
+                self.run_count += 1
+            else:
+                self.run_position, self.run_count = position, 1
+
+        self.closed_count = n + 1
+        self.last_close = close
+        self.last_closed = (high, low, close, sar_value)
+
+    # ------------------------------------------------------------------
+    # 输出
+    # ------------------------------------------------------------------
+    def _rsi_with(self, close: float) -> Optional[float]:
+        """在已收盘状态上追加一根收盘价后的RSI（不修改状态）"""
+        n = self.closed_count
+        period = self.rsi_period
+        if n < period:
+            return None
+
+        change = close - self.last_close
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if n == period:
+            avg_gain = (self.avg_gain + gain) / period
+            avg_loss = (self.avg_loss + loss) / period
+        else:
+            avg_gain = (self.avg_gain * (period - 1) + gain) / period
+            avg_loss = (self.avg_loss * (period - 1) + loss) / period
+
+        total = avg_gain + avg_loss
+        if -1e-8 < total < 1e-8:
+            return 0.0
+        return 100.0 * (avg_gain / total)
+
+    def _bbands_with(self, close: float):
+        """在已收盘窗口上追加一根收盘价后的布林带（不修改状态）"""
+        if len(self.bb_window) < self.bb_period - 1:
+            return None, None, None
+
+        total, total_sq = self.bb_sum, self.bb_sum_sq
+        if len(self.bb_window) == self.bb_period:
+            oldest = self.bb_window[0]
+            total -= oldest
+            total_sq -= oldest * oldest
+        total += close
+        total_sq += close * close
+
+        middle = total / self.bb_period
+        variance = total_sq / self.bb_period - middle * middle
+        std = math.sqrt(variance) if variance > 0 else 0.0
+        return middle + self.bb_dev * std, middle, middle - self.bb_dev * std
+
+    def _build(self, high: float, low: float, close: float, sar_value: Optional[float],
+               run_position: Optional[str], run_count: int,
+               rsi_14: Optional[float], bbands) -> Dict:
+        """组装与 calculate_indicators 相同结构的结果"""
+        bb_upper, bb_middle, bb_lower = bbands
+
+        if sar_value:
+            sar_position = run_position
+            sar_count_label = f"{'多头' if sar_position == 'bullish' else '空头'}{run_count:02d}"
+            if bb_upper is not None:
+                if sar_value > bb_upper:
+                    sar_quadrant = 1
+                elif sar_value > bb_middle:
+                    sar_quadrant = 2
+                elif sar_value > bb_lower:
+                    sar_quadrant = 3
+                else:
+                    sar_quadrant = 4
+            else:
+                sar_quadrant = None
+        else:
+            sar_position = None
+            sar_count_label = None
+            sar_quadrant = None
+
+        return {
+            'current_price': close,
+            'rsi_14': rsi_14,
+            'sar': sar_value,
+            'sar_position': sar_position,
+            'sar_quadrant': sar_quadrant,
+            'sar_count_label': sar_count_label,
+            'bb_upper': bb_upper,
+            'bb_middle': bb_middle,
+            'bb_lower': bb_lower
+        }
+
+    def indicators(self) -> Optional[Dict]:
+        """
+        包含未收盘K线在内的最新指标
+        等价于 calculate_indicators(list(cache))
+        """
+        if self.forming is None or self.closed_count + 1 < self.min_bars:
+            return None
+
+        _, high, low, close = self.forming
+        sar_value, _ = _advance_sar(
+            self.sar_state, high, low, self.sar_acceleration, self.sar_maximum)
+
+        run_position, run_count = self.run_position, self.run_count
+        if sar_value is not None:
+            position = 'bullish' if close > sar_value else 'bearish'
+            if position == run_position:
+                run_count += 1
+            else:
+                run_position, run_count = position, 1
+
+        return self._build(high, low, close, sar_value, run_position, run_count,
+                           self._rsi_with(close), self._bbands_with(close))
+
+    def closed_indicators(self) -> Optional[Dict]:
+        """
+        截至最后一根已收盘K线的指标
+        等价于 calculate_indicators(list(cache[:-1]))
+        """
+        if self.last_closed is None or self.closed_count < self.min_bars:
+            return None
+
+        high, low, close, sar_value = self.last_closed
+
+        rsi_14 = None
+        if self.closed_count > self.rsi_period:
+            total = self.avg_gain + self.avg_loss
+            rsi_14 = 0.0 if -1e-8 < total < 1e-8 else 100.0 * (self.avg_gain / total)
+
+        bbands = (None, None, None)
+        if len(self.bb_window) == self.bb_period:
+            middle = self.bb_sum / self.bb_period
+            variance = self.bb_sum_sq / self.bb_period - middle * middle
+            std = math.sqrt(variance) if variance > 0 else 0.0
+            bbands = (middle + self.bb_dev * std, middle, middle - self.bb_dev * std)
+
+        return self._build(high, low, close, sar_value, self.run_position, self.run_count,
+                           rsi_14, bbands)
@@ -4,7 +4,6 @@
 功能：监控主账户持仓，如果出现亏损且子账户没有该币种，自动开10U仓位
 """
 
-import json
 import time
 import requests
 import hmac
@@ -12,6 +11,8 @@ import base64
 from datetime import datetime
 import traceback
 
+from state_store import SUB_ACCOUNT_CONFIG
+
 # 配置
 CHECK_INTERVAL = 30  # 30秒检查一次
 OPEN_AMOUNT_USDT = 10  # 开仓金额10U
@@ -29,8 +30,7 @@ def log(msg):
 def load_sub_account_config():
     """加载子账户配置"""
     try:
-        with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = SUB_ACCOUNT_CONFIG.load()
         
         # 获取第一个启用的子账户
         for acc in config['sub_accounts']:
@@ -21,6 +21,8 @@ import hashlib
 from datetime import datetime, timezone, timedelta
 import traceback
 
+from state_store import SUB_ACCOUNT_CONFIG, SUB_ACCOUNT_MAINTENANCE
+
 # 配置
 CHECK_INTERVAL = 300  # 5分钟检查一次
 OKEX_REST_URL = 'https://www.okx.com'
@@ -40,8 +42,7 @@ def log(msg):
 def load_config():
     """加载配置文件"""
     try:
-        with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return SUB_ACCOUNT_CONFIG.load()
     except Exception as e:
         log(f"❌ 加载配置文件失败: {e}")
         return None
@@ -49,18 +50,13 @@ def load_config():
 def get_maintenance_record(account_name, inst_id, pos_side):
     """获取维护记录"""
     try:
-        with open('sub_account_maintenance.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         key = f"{account_name}_{inst_id}_{pos_side}"
-        if key in data:
-            record = data[key]
+        record = SUB_ACCOUNT_MAINTENANCE.get(key)
+        if record:
             today = get_china_today()
             if record.get('date') == today:
                 return record.get('count', 0), record
         return 0, None
-    except FileNotFoundError:
-        return 0, None
     except Exception as e:
         log(f"⚠️ 读取维护记录失败: {e}")
         return 0, None
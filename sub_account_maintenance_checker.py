@@ -18,29 +18,19 @@ import hashlib
 from datetime import datetime
 from collections import defaultdict
 
+from state_store import SUB_ACCOUNT_CONFIG, SUB_ACCOUNT_MAINTENANCE_COUNT
+
 # 配置
-CONFIG_FILE = '/home/user/webapp/sub_account_config.json'
-MAINTENANCE_COUNT_FILE = '/home/user/webapp/sub_account_maintenance_count.json'
 OKEX_REST_URL = 'https://www.okx.com'
 CHECK_INTERVAL = 10  # 每10秒检查一次
 
 def load_config():
     """加载配置"""
-    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return SUB_ACCOUNT_CONFIG.load()
 
 def load_maintenance_count():
     """加载维护次数记录"""
-    try:
-        with open(MAINTENANCE_COUNT_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-
-def save_maintenance_count(counts):
-    """保存维护次数记录"""
-    with open(MAINTENANCE_COUNT_FILE, 'w', encoding='utf-8') as f:
-        json.dump(counts, f, indent=2, ensure_ascii=False)
+    return SUB_ACCOUNT_MAINTENANCE_COUNT.all()
 
 def get_okex_signature(timestamp, method, request_path, body, secret_key):
     """生成OKEx签名"""
@@ -328,9 +318,8 @@ def check_and_maintain():
                     
                     if success:
                         # 清除维护次数
-                        if key in maintenance_counts:
-                            del maintenance_counts[key]
-                        save_maintenance_count(maintenance_counts)
+                        maintenance_counts.pop(key, None)
+                        SUB_ACCOUNT_MAINTENANCE_COUNT.delete(key)
                         print(f"   ✅ 止损完成")
                     continue
                 
@@ -340,9 +329,9 @@ def check_and_maintain():
                     success = execute_super_maintenance(sub_account, pos, current_count + 1)
                     
                     if success:
-                        # 增加维护次数
-                        maintenance_counts[key] = current_count + 1
-                        save_maintenance_count(maintenance_counts)
+                        # 增加维护次数（原子递增，不覆盖其他进程的更新）
+                        maintenance_counts[key] = SUB_ACCOUNT_MAINTENANCE_COUNT.update(
+                            key, lambda count: count + 1, default=0)
                         print(f"   ✅ 维护完成 当前次数:{maintenance_counts[key]}/{max_count}")
                     
                     # 等待一下再检查下一个
@@ -355,7 +344,7 @@ def main():
     """主函数"""
     print("=" * 60)
     print("🚀 子账号自动维护检查器已启动")
-    print(f"📊 配置文件: {CONFIG_FILE}")
+    print(f"📊 配置: 状态存储 {SUB_ACCOUNT_CONFIG.name}")
     print(f"⏰ 检查间隔: {CHECK_INTERVAL}秒")
     print(f"📅 启动时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print("=" * 60)
@@ -13,48 +13,35 @@ import base64
 import hashlib
 from datetime import datetime
 
+from state_store import SUB_ACCOUNT_CONFIG, SUB_ACCOUNT_OPENED_POSITIONS  # 配置、已开仓记录
+
 # 配置
-CONFIG_FILE = '/home/user/webapp/sub_account_config.json'
-OPENED_POSITIONS_FILE = '/home/user/webapp/sub_account_opened_positions.json'  # 已开仓记录
 MAIN_API_URL = 'http://localhost:5000'
 OKEX_REST_URL = 'https://www.okx.com'
 CHECK_INTERVAL = 60  # 每60秒检查一次
 
 def load_config():
     """加载配置"""
-    with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return SUB_ACCOUNT_CONFIG.load()
 
 def load_opened_positions():
     """加载已开仓记录"""
-    try:
-        with open(OPENED_POSITIONS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except FileNotFoundError:
-        return {}
-
-def save_opened_positions(positions):
-    """保存已开仓记录"""
-    with open(OPENED_POSITIONS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(positions, f, indent=2, ensure_ascii=False)
+    return SUB_ACCOUNT_OPENED_POSITIONS.all()
 
 def mark_position_opened(account_name, inst_id, pos_side):
     """标记已开仓"""
-    positions = load_opened_positions()
     key = f"{account_name}:{inst_id}:{pos_side}"
-    positions[key] = {
+    SUB_ACCOUNT_OPENED_POSITIONS.set(key, {
         'account_name': account_name,
         'inst_id': inst_id,
         'pos_side': pos_side,
         'opened_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    save_opened_positions(positions)
+    })
 
 def is_position_opened(account_name, inst_id, pos_side):
     """检查是否已开仓"""
-    positions = load_opened_positions()
     key = f"{account_name}:{inst_id}:{pos_side}"
-    return key in positions
+    return key in SUB_ACCOUNT_OPENED_POSITIONS
 
 
 def get_okex_signature(timestamp, method, request_path, body, secret_key):
@@ -339,7 +326,7 @@ def main():
     """主函数"""
     print("=" * 60)
     print("🚀 子账号自动开仓守护进程已启动")
-    print(f"📊 配置文件: {CONFIG_FILE}")
+    print(f"📊 配置: 状态存储 {SUB_ACCOUNT_CONFIG.name}")
     print(f"🌐 主账号API: {MAIN_API_URL}")
     print(f"⏰ 检查间隔: {CHECK_INTERVAL}秒")
     print(f"📅 启动时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
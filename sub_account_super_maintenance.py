@@ -4,7 +4,6 @@
 功能：监控子账户持仓，收益率跌破-10%时自动维护
 """
 
-import json
 import time
 import requests
 import hmac
@@ -12,12 +11,16 @@ import base64
 from datetime import datetime, timezone, timedelta
 import traceback
 
+from state_store import SUB_ACCOUNT_CONFIG, SUB_ACCOUNT_MAINTENANCE
+
 # 配置
 CHECK_INTERVAL = 30  # 30秒检查一次
 TRIGGER_RATE = -10  # 触发维护的收益率阈值
 MAINTENANCE_AMOUNT = 100  # 维护金额100U
 MAX_MAINTENANCE_COUNT = 3  # 最大维护次数
 STOP_LOSS_RATE = -20  # 止损线
+# 第N次维护的 (买入金额U, 保留保证金U)，第3次后设置止损（回测 rule_backtester 共用）
+MAINTENANCE_SCHEDULE = [(100, 10), (100, 20), (200, 30)]
 
 def get_china_time():
     """获取北京时间"""
@@ -34,8 +37,7 @@ def log(msg):
 def load_sub_account_config():
     """加载子账户配置"""
     try:
-        with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = SUB_ACCOUNT_CONFIG.load()
         
         # 获取第一个启用的子账户
         for acc in config['sub_accounts']:
@@ -49,18 +51,13 @@ def load_sub_account_config():
 def get_maintenance_count(account_name, inst_id, pos_side):
     """获取今日维护次数"""
     try:
-        with open('sub_account_maintenance.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
         key = f"{account_name}_{inst_id}_{pos_side}"
-        if key in data:
-            record = data[key]
+        record = SUB_ACCOUNT_MAINTENANCE.get(key)
+        if record:
             today = get_china_today()
             if record.get('date') == today:
                 return record.get('count', 0)
         return 0
-    except FileNotFoundError:
-        return 0
     except Exception as e:
         log(f"⚠️ 读取维护次数失败: {e}")
         return 0
@@ -68,35 +65,27 @@ def get_maintenance_count(account_name, inst_id, pos_side):
 def update_maintenance_count(account_name, inst_id, pos_side):
     """更新维护次数+1"""
     try:
-        try:
-            with open('sub_account_maintenance.json', 'r', encoding='utf-8') as f:
-                data = json.load(f)
-        except FileNotFoundError:
-            data = {}
-        
         key = f"{account_name}_{inst_id}_{pos_side}"
         today = get_china_today()
         now = get_china_time().strftime('%Y-%m-%d %H:%M:%S')
         
-        if key not in data:
-            data[key] = {
-                'count': 1,
-                'date': today,
-                'last_maintenance': now
-            }
-        else:
-            record = data[key]
+        def increment(record):
+            if record is None:
+                return {
+                    'count': 1,
+                    'date': today,
+                    'last_maintenance': now
+                }
             if record.get('date') == today:
                 record['count'] = record.get('count', 0) + 1
             else:
                 record['count'] = 1
                 record['date'] = today
             record['last_maintenance'] = now
+            return record
         
-        with open('sub_account_maintenance.json', 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        
-        return data[key]['count']
+        # 原子读-改-写，与网页端的重置互不覆盖
+        return SUB_ACCOUNT_MAINTENANCE.update(key, increment)['count']
     except Exception as e:
         log(f"❌ 更新维护次数失败: {e}")
         return 0
@@ -124,18 +113,9 @@ def execute_super_maintenance(account_config, inst_id, pos_side, pos_size, profi
         current_count = get_maintenance_count(account_name, inst_id, pos_side)
         
         # 根据维护次数确定参数
-        if current_count == 0:
-            # 第1次：买入100U，留10U
-            maintenance_amount = 100
-            target_margin = 10
-        elif current_count == 1:
-            # 第2次：买入100U，留20U
-            maintenance_amount = 100
-            target_margin = 20
-        elif current_count == 2:
-            # 第3次：买入200U，留30U，设置-20%止损
-            maintenance_amount = 200
-            target_margin = 30
+        # 第1次：买入100U，留10U；第2次：买入100U，留20U；第3次：买入200U，留30U，设置-20%止损
+        if current_count < len(MAINTENANCE_SCHEDULE):
+            maintenance_amount, target_margin = MAINTENANCE_SCHEDULE[current_count]
         else:
             log(f"⚠️  今日维护次数已达上限: {current_count}/{MAX_MAINTENANCE_COUNT}")
             return False
@@ -12,11 +12,14 @@ import requests
 from datetime import datetime, timezone, timedelta
 import traceback
 
+from state_store import SUB_ACCOUNT_CONFIG
+
 # 配置
 CHECK_INTERVAL = 30  # 30秒检查一次
 PROFIT_THRESHOLD = 30  # 盈利30%触发止盈
 TAKE_PROFIT_RATIO = 0.5  # 止盈50%仓位
 MAIN_ACCOUNT_LOSS_THRESHOLD = 0  # 主账户反向交易对亏损即触发
+EVENT_DEBOUNCE = 2  # 收到持仓事件后再等2秒合并连续推送
 
 # 止盈记录文件
 TAKE_PROFIT_RECORDS_FILE = 'sub_account_take_profit_records.json'
@@ -36,8 +39,7 @@ def log(msg):
 def load_sub_account_config():
     """加载子账户配置"""
     try:
-        with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = SUB_ACCOUNT_CONFIG.load()
         
         # 获取第一个启用的子账户
         for acc in config['sub_accounts']:
@@ -240,6 +242,31 @@ def check_rule2_reverse_loss(sub_account, sub_positions, main_positions):
         else:
             log(f"    ✓ {inst_id} 主账户无反向持仓")
 
+_position_subscriber = None
+
+
+def wait_for_position_update():
+    """
+    等待持仓流服务的 position.update 事件，最长 CHECK_INTERVAL 秒
+    持仓变化时立即进入下一轮检查；事件总线不可用时退回定时休眠
+    """
+    global _position_subscriber
+    try:
+        if _position_subscriber is None:
+            from event_bus import Subscriber, POSITION_UPDATE
+            _position_subscriber = Subscriber('sub_account_take_profit', [POSITION_UPDATE])
+        events = _position_subscriber.wait(timeout=CHECK_INTERVAL)
+        if events:
+            time.sleep(EVENT_DEBOUNCE)
+            events = _position_subscriber.poll(limit=1000) or events
+            log(f"📨 收到{len(events)}条持仓变化事件")
+        for event in events:
+            _position_subscriber.ack(event)
+    except Exception as e:
+        log(f"⚠️ 事件总线不可用，改为定时检查: {e}")
+        time.sleep(CHECK_INTERVAL)
+
+
 def main_loop():
     """主循环"""
     log("🚀 子账户止盈守护进程启动")
@@ -285,8 +312,8 @@ def main_loop():
             log(f"❌ 主循环异常: {e}")
             log(traceback.format_exc())
         
-        # 等待下一次检查
-        time.sleep(CHECK_INTERVAL)
+        # 等待持仓变化或下一次定时检查
+        wait_for_position_update()
 
 if __name__ == '__main__':
     main_loop()
@@ -0,0 +1,1073 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+支撑压力线与逃顶信号
+支撑压力线数据、快照、导入导出，逃顶信号及统计
+"""
+
+from datetime import datetime, timedelta
+import json
+import os
+import sqlite3
+
+from flask import Blueprint, jsonify, make_response, render_template, request, send_from_directory
+
+from db_access import get_connection
+from latest_state import KLINE_LATEST, SUPPORT_RESISTANCE_LATEST
+
+support_resistance_bp = Blueprint('support_resistance', __name__)
+
+# ============================================================================
+# 支撑压力线系统
+# ============================================================================
+
+@support_resistance_bp.route('/support-resistance')
+def support_resistance_page():
+    """支撑压力线系统页面"""
+    response = make_response(render_template('support_resistance.html'))
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    return response
+
+@support_resistance_bp.route('/api/support-resistance/latest')
+def api_support_resistance_latest():
+    """获取最新的支撑压力线数据"""
+    try:
+        conn = get_connection('support_resistance')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 获取最新的快照数据
+        cursor.execute('''
+            SELECT 
+                snapshot_time,
+                scenario_1_coins,
+                scenario_2_coins,
+                scenario_3_coins,
+                scenario_4_coins
+            FROM support_resistance_snapshots
+            ORDER BY created_at DESC
+            LIMIT 1
+        ''')
+        
+        snapshot_row = cursor.fetchone()
+        
+        import json
+        
+        # 获取实时数据的最新更新时间（不依赖快照）
+        cursor.execute(f'''
+            SELECT MAX(record_time) as latest_time
+            FROM {SUPPORT_RESISTANCE_LATEST.ensure(conn)}
+        ''')
+        latest_row = cursor.fetchone()
+        update_time = latest_row['latest_time'] if latest_row and latest_row['latest_time'] else None
+        
+        if not update_time:
+            conn.close()
+            return jsonify({
+                'success': False,
+                'message': 'No data available'
+            })
+        
+        # 获取所有监控的币种（27个）
+        MONITORED_SYMBOLS = [
+            'BTC-USDT-SWAP', 'ETH-USDT-SWAP', 'XRP-USDT-SWAP', 'BNB-USDT-SWAP',
+            'SOL-USDT-SWAP', 'LTC-USDT-SWAP', 'DOGE-USDT-SWAP', 'SUI-USDT-SWAP',
+            'TRX-USDT-SWAP', 'TON-USDT-SWAP', 'ETC-USDT-SWAP', 'BCH-USDT-SWAP',
+            'HBAR-USDT-SWAP', 'XLM-USDT-SWAP', 'FIL-USDT-SWAP', 'LINK-USDT-SWAP',
+            'CRO-USDT-SWAP', 'DOT-USDT-SWAP', 'AAVE-USDT-SWAP', 'UNI-USDT-SWAP',
+            'NEAR-USDT-SWAP', 'APT-USDT-SWAP', 'CFX-USDT-SWAP', 'CRV-USDT-SWAP',
+            'STX-USDT-SWAP', 'LDO-USDT-SWAP', 'TAO-USDT-SWAP'
+        ]
+        
+        # 获取每个币种的最新价格
+        placeholders = ','.join(['?' for _ in MONITORED_SYMBOLS])
+        cursor.execute(f'''
+            SELECT symbol, close as current_price, timestamp
+            FROM {KLINE_LATEST.ensure(conn)}
+            WHERE timeframe = '5m'
+            AND symbol IN ({placeholders})
+            ORDER BY symbol
+        ''', MONITORED_SYMBOLS)
+        
+        price_rows = cursor.fetchall()
+        price_dict = {row['symbol']: row['current_price'] for row in price_rows}
+        
+        # 解析4种情况的币种数据，构建alert字典
+        alert_dict = {}
+        if snapshot_row:  # 只有当快照存在时才解析
+            for scenario_num in range(1, 5):
+                coins_json = snapshot_row[f'scenario_{scenario_num}_coins']
+                if coins_json:
+                    try:
+                        coins = json.loads(coins_json)
+                        for coin in coins:
+                            symbol = coin['symbol']
+                            if symbol not in alert_dict:
+                                alert_dict[symbol] = {
+                                    'support_1': 0,
+                                    'support_2': 0,
+                                    'resistance_1': 0,
+                                    'resistance_2': 0,
+                                    'position_s2_r1': None,
+                                    'position_s1_r2': None,
+                                    'position_s1_r2_upper': None,
+                                    'position_s1_r1': None,
+                                    'alert_scenario_1': False,
+                                    'alert_scenario_2': False,
+                                    'alert_scenario_3': False,
+                                    'alert_scenario_4': False
+                                }
+                            
+                            # 从当前币种数据中更新支撑/压力线值（合并所有场景的数据）
+                            if 'support_1' in coin and coin['support_1']:
+                                alert_dict[symbol]['support_1'] = coin['support_1']
+                            if 'support_2' in coin and coin['support_2']:
+                                alert_dict[symbol]['support_2'] = coin['support_2']
+                            if 'resistance_1' in coin and coin['resistance_1']:
+                                alert_dict[symbol]['resistance_1'] = coin['resistance_1']
+                            if 'resistance_2' in coin and coin['resistance_2']:
+                                alert_dict[symbol]['resistance_2'] = coin['resistance_2']
+                            
+                            # 设置对应情况的alert和position
+                            if scenario_num == 1:
+                                alert_dict[symbol]['alert_scenario_1'] = True
+                                alert_dict[symbol]['position_s2_r1'] = coin.get('position', 0)
+                            elif scenario_num == 2:
+                                alert_dict[symbol]['alert_scenario_2'] = True
+                                alert_dict[symbol]['position_s1_r2'] = coin.get('position', 0)
+                            elif scenario_num == 3:
+                                alert_dict[symbol]['alert_scenario_3'] = True
+                                alert_dict[symbol]['position_s1_r2_upper'] = coin.get('position', 0)
+                            elif scenario_num == 4:
+                                alert_dict[symbol]['alert_scenario_4'] = True
+                                alert_dict[symbol]['position_s1_r1'] = coin.get('position', 0)
+                    except:
+                        pass
+        
+        # 获取所有币种的支撑/压力线数据（从support_resistance_levels表）
+        # 将币种格式从 'BTC-USDT-SWAP' 转换为 'BTCUSDT'
+        symbols_for_levels = [s.replace('-USDT-SWAP', 'USDT') for s in MONITORED_SYMBOLS]
+        placeholders_levels = ','.join(['?' for _ in symbols_for_levels])
+        
+        # 每个币种的最新记录（物化表）
+        cursor.execute(f'''
+            SELECT srl.symbol, srl.current_price, srl.support_line_1, srl.support_line_2, 
+                   srl.resistance_line_1, srl.resistance_line_2,
+                   srl.position_7d, srl.position_48h,
+                   srl.alert_7d_low, srl.alert_7d_high,
+                   srl.alert_48h_low, srl.alert_48h_high,
+                   srl.support_1_days, srl.support_2_hours,
+                   srl.resistance_1_days, srl.resistance_2_hours,
+                   srl.baseline_price_24h, srl.price_change_24h, srl.change_percent_24h
+            FROM {SUPPORT_RESISTANCE_LATEST.ensure(conn)} srl
+            WHERE srl.symbol IN ({placeholders_levels})
+        ''', symbols_for_levels)
+        
+        sr_levels_rows = cursor.fetchall()
+        sr_levels_dict = {}
+        for row in sr_levels_rows:
+            symbol = row['symbol']  # 已经是 BTCUSDT 格式
+            sr_levels_dict[symbol] = {
+                'current_price': row['current_price'] or 0,  # 从数据库读取current_price
+                'support_1': row['support_line_1'] or 0,
+                'support_2': row['support_line_2'] or 0,
+                'resistance_1': row['resistance_line_1'] or 0,
+                'resistance_2': row['resistance_line_2'] or 0,
+                'position_7d': row['position_7d'] or 0,
+                'position_48h': row['position_48h'] or 0,
+                'alert_7d_low': row['alert_7d_low'] or False,
+                'alert_7d_high': row['alert_7d_high'] or False,
+                'alert_48h_low': row['alert_48h_low'] or False,
+                'alert_48h_high': row['alert_48h_high'] or False,
+                'support_1_days': row['support_1_days'] or 0,
+                'support_2_hours': row['support_2_hours'] or 0,
+                'resistance_1_days': row['resistance_1_days'] or 0,
+                'resistance_2_hours': row['support_2_hours'] or 0,
+                'baseline_price_24h': row['baseline_price_24h'] or 0,
+                'price_change_24h': row['price_change_24h'] or 0,
+                'change_percent_24h': row['change_percent_24h'] or 0
+            }
+        
+        # 构建结果：所有27个币种
+        result_data = []
+        for symbol in MONITORED_SYMBOLS:
+            alert_info = alert_dict.get(symbol, {})
+            symbol_usdt = symbol.replace('-USDT-SWAP', 'USDT')
+            
+            # 优先使用alert_info中的支撑/压力线数据，如果没有则使用sr_levels_dict中的数据
+            sr_data = sr_levels_dict.get(symbol_usdt, {})
+            # 使用数据库中的current_price，而不是实时查询的价格（保持数据一致性）
+            current_price = sr_data.get('current_price', 0) or price_dict.get(symbol, 0)
+            support_1 = alert_info.get('support_1', 0) or sr_data.get('support_1', 0)
+            support_2 = alert_info.get('support_2', 0) or sr_data.get('support_2', 0)
+            resistance_1 = alert_info.get('resistance_1', 0) or sr_data.get('resistance_1', 0)
+            resistance_2 = alert_info.get('resistance_2', 0) or sr_data.get('resistance_2', 0)
+            
+            # 计算距离百分比（使用实时价格）
+            distance_to_support_1 = ((current_price - support_1) / support_1) * 100 if support_1 > 0 else 0
+            distance_to_support_2 = ((current_price - support_2) / support_2) * 100 if support_2 > 0 else 0
+            distance_to_resistance_1 = ((resistance_1 - current_price) / current_price) * 100 if current_price > 0 else 0
+            distance_to_resistance_2 = ((resistance_2 - current_price) / current_price) * 100 if current_price > 0 else 0
+            
+            coin_data = {
+                'symbol': symbol_usdt,
+                'current_price': current_price,
+                'support_line_1': support_1,
+                'support_line_2': support_2,
+                'resistance_line_1': resistance_1,
+                'resistance_line_2': resistance_2,
+                'distance_to_support_1': distance_to_support_1,
+                'distance_to_support_2': distance_to_support_2,
+                'distance_to_resistance_1': distance_to_resistance_1,
+                'distance_to_resistance_2': distance_to_resistance_2,
+                'position_7d': sr_data.get('position_7d', 0),  # 7天位置百分比
+                'position_48h': sr_data.get('position_48h', 0),  # 48小时位置百分比
+                'support_1_days': sr_data.get('support_1_days', 0),  # 7天最低价发生在N天前
+                'support_2_hours': sr_data.get('support_2_hours', 0),  # 48h最低价发生在N小时前
+                'resistance_1_days': sr_data.get('resistance_1_days', 0),  # 7天最高价发生在N天前
+                'resistance_2_hours': sr_data.get('resistance_2_hours', 0),  # 48h最高价发生在N小时前
+                'alert_7d_low': sr_data.get('alert_7d_low', False),  # 7天低位预警
+                'alert_7d_high': sr_data.get('alert_7d_high', False),  # 7天高位预警
+                'alert_48h_low': sr_data.get('alert_48h_low', False),  # 48h低位预警
+                'alert_48h_high': sr_data.get('alert_48h_high', False),  # 48h高位预警
+                'baseline_price_24h': sr_data.get('baseline_price_24h', 0),  # 今日基准价格（北京时间0点）
+                'price_change_24h': sr_data.get('price_change_24h', 0),  # 24小时涨跌额
+                'change_percent_24h': sr_data.get('change_percent_24h', 0),  # 24小时涨跌幅%
+                'position_s2_r1': alert_info.get('position_s2_r1'),
+                'position_s1_r2': alert_info.get('position_s1_r2'),
+                'position_s1_r2_upper': alert_info.get('position_s1_r2_upper'),
+                'position_s1_r1': alert_info.get('position_s1_r1'),
+                'alert_scenario_1': alert_info.get('alert_scenario_1', False),
+                'alert_scenario_2': alert_info.get('alert_scenario_2', False),
+                'alert_scenario_3': alert_info.get('alert_scenario_3', False),
+                'alert_scenario_4': alert_info.get('alert_scenario_4', False),
+                'alert_triggered': any([
+                    alert_info.get('alert_scenario_1', False),
+                    alert_info.get('alert_scenario_2', False),
+                    alert_info.get('alert_scenario_3', False),
+                    alert_info.get('alert_scenario_4', False)
+                ]),
+                'record_time': update_time
+            }
+            result_data.append(coin_data)
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': result_data,
+            'count': len(result_data),
+            'update_time': update_time
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+@support_resistance_bp.route('/api/support-resistance/history/<symbol>')
+def api_support_resistance_history(symbol):
+    """获取指定币种的历史支撑压力线数据"""
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        
+        conn = get_connection('support_resistance')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT 
+                symbol,
+                current_price,
+                support_line_1,
+                support_line_2,
+                resistance_line_1,
+                resistance_line_2,
+                distance_to_support_1,
+                distance_to_support_2,
+                distance_to_resistance_1,
+                distance_to_resistance_2,
+                record_time
+            FROM support_resistance_levels
+            WHERE symbol = ?
+            AND datetime(record_time) >= datetime('now', '+8 hours', ? || ' hours')
+            ORDER BY record_time DESC
+        ''', (symbol, -hours))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        data = []
+        for row in rows:
+            data.append({
+                'symbol': row['symbol'],
+                'current_price': row['current_price'],
+                'support_line_1': row['support_line_1'],
+                'support_line_2': row['support_line_2'],
+                'resistance_line_1': row['resistance_line_1'],
+                'resistance_line_2': row['resistance_line_2'],
+                'distance_to_support_1': row['distance_to_support_1'],
+                'distance_to_support_2': row['distance_to_support_2'],
+                'distance_to_resistance_1': row['distance_to_resistance_1'],
+                'distance_to_resistance_2': row['distance_to_resistance_2'],
+                'record_time': row['record_time']
+            })
+        
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'data': data,
+            'count': len(data)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+@support_resistance_bp.route('/api/support-resistance/snapshots')
+def api_support_resistance_snapshots():
+    """获取支撑压力线快照历史数据（用于时间轴和趋势图）"""
+    try:
+        import json
+        from datetime import datetime, timedelta
+        import pytz
+        
+        date = request.args.get('date')  # 格式: 2025-12-13
+        start_hour = request.args.get('start_hour', type=int)  # 0-23
+        end_hour = request.args.get('end_hour', type=int)  # 0-23
+        start_time = request.args.get('start_time')  # 格式: 2025-12-13 00:00:00
+        end_time = request.args.get('end_time')  # 格式: 2025-12-13 12:00:00
+        get_all = request.args.get('all', 'false').lower() == 'true'  # 获取所有历史数据
+        
+        conn = get_connection('support_resistance')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 构建查询条件
+        if get_all:
+            # 获取所有历史数据（用于全局趋势图）
+            cursor.execute('''
+                SELECT 
+                    snapshot_time, snapshot_date,
+                    scenario_1_count, scenario_2_count, scenario_3_count, scenario_4_count,
+                    scenario_1_coins, scenario_2_coins, scenario_3_coins, scenario_4_coins,
+                    total_coins
+                FROM support_resistance_snapshots
+                ORDER BY snapshot_time ASC
+            ''')
+        elif start_time and end_time:
+            # 获取指定时间范围的数据（用于翻页查看）
+            cursor.execute('''
+                SELECT 
+                    snapshot_time, snapshot_date,
+                    scenario_1_count, scenario_2_count, scenario_3_count, scenario_4_count,
+                    scenario_1_coins, scenario_2_coins, scenario_3_coins, scenario_4_coins,
+                    total_coins
+                FROM support_resistance_snapshots
+                WHERE snapshot_time >= ? AND snapshot_time < ?
+                ORDER BY snapshot_time ASC
+            ''', (start_time, end_time))
+        elif date and start_hour is not None and end_hour is not None:
+            # 🆕 支持按小时范围查询（北京时间）
+            # 注意：数据库存储的已经是北京时间，直接使用即可
+            
+            # 构造北京时间范围字符串
+            beijing_start_str = f"{date} {start_hour:02d}:00:00"
+            
+            # 处理 end_hour = 24 的情况（24:00 = 次日 00:00）
+            if end_hour >= 24:
+                from datetime import timedelta
+                beijing_start_dt = datetime.strptime(beijing_start_str, "%Y-%m-%d %H:%M:%S")
+                beijing_end_dt = beijing_start_dt + timedelta(hours=(end_hour - start_hour))
+                beijing_end_str = beijing_end_dt.strftime("%Y-%m-%d %H:%M:%S")
+            else:
+                beijing_end_str = f"{date} {end_hour:02d}:00:00"
+            
+            cursor.execute('''
+                SELECT 
+                    snapshot_time, snapshot_date,
+                    scenario_1_count, scenario_2_count, scenario_3_count, scenario_4_count,
+                    scenario_1_coins, scenario_2_coins, scenario_3_coins, scenario_4_coins,
+                    total_coins
+                FROM support_resistance_snapshots
+                WHERE snapshot_time >= ? AND snapshot_time < ?
+                ORDER BY snapshot_time ASC
+            ''', (beijing_start_str, beijing_end_str))
+        elif date:
+            # 获取指定日期的所有数据
+            cursor.execute('''
+                SELECT 
+                    snapshot_time, snapshot_date,
+                    scenario_1_count, scenario_2_count, scenario_3_count, scenario_4_count,
+                    scenario_1_coins, scenario_2_coins, scenario_3_coins, scenario_4_coins,
+                    total_coins
+                FROM support_resistance_snapshots
+                WHERE snapshot_date = ?
+                ORDER BY snapshot_time ASC
+            ''', (date,))
+        else:
+            # 获取最近12小时的数据
+            cursor.execute('''
+                SELECT 
+                    snapshot_time, snapshot_date,
+                    scenario_1_count, scenario_2_count, scenario_3_count, scenario_4_count,
+                    scenario_1_coins, scenario_2_coins, scenario_3_coins, scenario_4_coins,
+                    total_coins
+                FROM support_resistance_snapshots
+                WHERE snapshot_time >= datetime('now', '-12 hours')
+                ORDER BY snapshot_time ASC
+            ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        # 数据库中存储的已经是北京时间，直接使用
+        data = []
+        for row in rows:
+            data.append({
+                'snapshot_time': row['snapshot_time'],  # 数据库存储的是北京时间
+                'snapshot_date': row['snapshot_date'],
+                'scenario_1_count': row['scenario_1_count'],
+                'scenario_2_count': row['scenario_2_count'],
+                'scenario_3_count': row['scenario_3_count'],
+                'scenario_4_count': row['scenario_4_count'],
+                'scenario_1_coins': json.loads(row['scenario_1_coins']) if row['scenario_1_coins'] else [],
+                'scenario_2_coins': json.loads(row['scenario_2_coins']) if row['scenario_2_coins'] else [],
+                'scenario_3_coins': json.loads(row['scenario_3_coins']) if row['scenario_3_coins'] else [],
+                'scenario_4_coins': json.loads(row['scenario_4_coins']) if row['scenario_4_coins'] else [],
+                'total_coins': row['total_coins']
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': data,
+            'count': len(data),
+            'date': date,
+            'start_time': start_time,
+            'end_time': end_time
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+@support_resistance_bp.route('/api/support-resistance/latest-signal')
+def api_support_resistance_latest_signal():
+    """获取最新快照数据并检测是否触发信号"""
+    try:
+        import json
+        from datetime import datetime
+        import pytz
+        
+        conn = get_connection('support_resistance')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 获取最新的实时数据时间（从support_resistance_levels表）
+        cursor.execute(f'''
+            SELECT MAX(record_time) as latest_time
+            FROM {SUPPORT_RESISTANCE_LATEST.ensure(conn)}
+        ''')
+        
+        time_row = cursor.fetchone()
+        latest_time = time_row['latest_time'] if time_row else None
+        
+        # 获取最新的快照（如果有）
+        cursor.execute('''
+            SELECT 
+                snapshot_time, snapshot_date,
+                scenario_1_count, scenario_2_count, scenario_3_count, scenario_4_count,
+                scenario_1_coins, scenario_2_coins, scenario_3_coins, scenario_4_coins,
+                total_coins
+            FROM support_resistance_snapshots
+            ORDER BY snapshot_time DESC
+            LIMIT 1
+        ''')
+        
+        row = cursor.fetchone()
+        conn.close()
+        
+        if not row:
+            return jsonify({
+                'success': False,
+                'message': '暂无快照数据'
+            })
+        
+        # 使用实时数据的最新时间，而不是快照时间
+        snapshot_time_str = latest_time if latest_time else row['snapshot_time']
+        
+        scenario_1 = row['scenario_1_count'] or 0
+        scenario_2 = row['scenario_2_count'] or 0
+        scenario_3 = row['scenario_3_count'] or 0
+        scenario_4 = row['scenario_4_count'] or 0
+        
+        # 检测信号
+        # 抄底信号：情况1 >= 8 AND 情况2 >= 8（两个条件都要满足）
+        buy_signal = scenario_1 >= 8 and scenario_2 >= 8
+        
+        # 逃顶信号：(情况3 + 情况4) >= 8（总和满足即可）
+        sell_signal = (scenario_3 + scenario_4) >= 8
+        
+        result = {
+            'success': True,
+            'snapshot_time': snapshot_time_str,  # 直接使用数据库中的北京时间
+            'snapshot_date': row['snapshot_date'],
+            'scenario_1_count': scenario_1,
+            'scenario_2_count': scenario_2,
+            'scenario_3_count': scenario_3,
+            'scenario_4_count': scenario_4,
+            'scenario_1_coins': json.loads(row['scenario_1_coins']) if row['scenario_1_coins'] else [],
+            'scenario_2_coins': json.loads(row['scenario_2_coins']) if row['scenario_2_coins'] else [],
+            'scenario_3_coins': json.loads(row['scenario_3_coins']) if row['scenario_3_coins'] else [],
+            'scenario_4_coins': json.loads(row['scenario_4_coins']) if row['scenario_4_coins'] else [],
+            'total_coins': row['total_coins'],
+            'signals': {
+                'buy': buy_signal,
+                'sell': sell_signal,
+                'buy_count': scenario_1 + scenario_2 if buy_signal else 0,
+                'sell_count': scenario_3 + scenario_4 if sell_signal else 0
+            }
+        }
+        
+        return jsonify(result)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+@support_resistance_bp.route('/api/support-resistance/dates')
+def api_support_resistance_dates():
+    """获取有快照数据的所有日期列表"""
+    try:
+        conn = get_connection('support_resistance')
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT DISTINCT snapshot_date
+            FROM support_resistance_snapshots
+            ORDER BY snapshot_date DESC
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        dates = [row[0] for row in rows]
+        
+        return jsonify({
+            'success': True,
+            'dates': dates,
+            'count': len(dates)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+# =====================================================
+# 逃顶信号系统 API路由
+# =====================================================
+
+@support_resistance_bp.route('/escape-top-signals')
+def escape_top_signals_page():
+    """逃顶信号监控页面"""
+    response = make_response(render_template('escape_top_signals.html'))
+    response.headers['Cache-Control'] = 'no-cache, no-store, must-revalidate, max-age=0'
+    response.headers['Pragma'] = 'no-cache'
+    response.headers['Expires'] = '0'
+    return response
+
+@support_resistance_bp.route('/api/escape-top-signals/latest')
+def api_escape_top_signals_latest():
+    """获取最新的逃顶信号数据 - 直接从support_resistance_levels查询"""
+    try:
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 直接从support_resistance_levels表查询24小时内有逃顶倾向的数据
+        cursor.execute('''
+            SELECT 
+                symbol,
+                record_time as signal_time,
+                current_price,
+                resistance_line_1,
+                resistance_line_2,
+                distance_to_resistance_1 as distance_to_r1,
+                distance_to_resistance_2 as distance_to_r2,
+                alert_scenario_3 as scenario_3_count,
+                alert_scenario_4 as scenario_4_count,
+                (alert_scenario_3 + alert_scenario_4) as total_escape_score,
+                CASE WHEN (alert_scenario_3 + alert_scenario_4) >= 8 THEN 1 ELSE 0 END as is_escape_signal,
+                position_48h,
+                position_7d,
+                price_change_24h,
+                change_percent_24h,
+                alert_triggered
+            FROM support_resistance_levels
+            WHERE datetime(record_time) >= datetime('now', '-24 hours')
+              AND (alert_scenario_3 > 0 OR alert_scenario_4 > 0)
+            ORDER BY record_time DESC
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        signals = []
+        for row in rows:
+            signals.append({
+                'symbol': row['symbol'],
+                'signal_time': row['signal_time'],
+                'current_price': row['current_price'],
+                'resistance_line_1': row['resistance_line_1'],
+                'resistance_line_2': row['resistance_line_2'],
+                'distance_to_r1': row['distance_to_r1'],
+                'distance_to_r2': row['distance_to_r2'],
+                'scenario_3_count': row['scenario_3_count'],
+                'scenario_4_count': row['scenario_4_count'],
+                'total_escape_score': row['total_escape_score'],
+                'is_escape_signal': row['is_escape_signal'],
+                'position_48h': row['position_48h'],
+                'position_7d': row['position_7d'],
+                'price_change_24h': row['price_change_24h'],
+                'change_percent_24h': row['change_percent_24h'],
+                'alert_triggered': row['alert_triggered']
+            })
+        
+        return jsonify({
+            'success': True,
+            'data': signals,
+            'count': len(signals)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': []
+        })
+
+@support_resistance_bp.route('/api/escape-top-signals/history/<symbol>')
+def api_escape_top_signals_history(symbol):
+    """获取指定币种的历史逃顶信号"""
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        
+        conn = get_connection('crypto_data')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+            SELECT 
+                signal_time,
+                current_price,
+                total_escape_score,
+                is_escape_signal,
+                position_48h,
+                position_7d
+            FROM escape_top_signals_24h
+            WHERE symbol = ?
+              AND datetime(signal_time) >= datetime('now', ? || ' hours')
+            ORDER BY signal_time ASC
+        ''', (symbol, f'-{hours}'))
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        history = []
+        for row in rows:
+            history.append({
+                'signal_time': row['signal_time'],
+                'current_price': row['current_price'],
+                'total_escape_score': row['total_escape_score'],
+                'is_escape_signal': row['is_escape_signal'],
+                'position_48h': row['position_48h'],
+                'position_7d': row['position_7d']
+            })
+        
+        return jsonify({
+            'success': True,
+            'symbol': symbol,
+            'data': history,
+            'count': len(history)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': []
+        })
+
+@support_resistance_bp.route('/api/escape-top-signals/stats')
+def api_escape_top_signals_stats():
+    """获取逃顶信号统计数据 - 返回真实的逃顶事件次数"""
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 逃顶事件次数（统计不同时间点的逃顶事件数量）
+        # 条件：alert_triggered=1 且 (情况3+情况4)>=8 且 情况3>=1 且 情况4>=1
+        cursor.execute('''
+            SELECT COUNT(DISTINCT strftime('%Y-%m-%d %H:%M', record_time)) as event_count
+            FROM support_resistance_levels
+            WHERE datetime(record_time) >= datetime('now', ? || ' hours')
+              AND alert_triggered = 1
+              AND (alert_scenario_3 + alert_scenario_4) >= 8
+              AND alert_scenario_3 >= 1
+              AND alert_scenario_4 >= 1
+        ''', (f'-{hours}',))
+        total_escape_events = cursor.fetchone()[0]
+        
+        # 触发信号的币种数
+        cursor.execute('''
+            SELECT COUNT(DISTINCT symbol) as coin_count
+            FROM support_resistance_levels
+            WHERE datetime(record_time) >= datetime('now', ? || ' hours')
+              AND alert_triggered = 1
+              AND (alert_scenario_3 + alert_scenario_4) >= 8
+              AND alert_scenario_3 >= 1
+              AND alert_scenario_4 >= 1
+        ''', (f'-{hours}',))
+        coin_count = cursor.fetchone()[0]
+        
+        # 平均逃顶分数
+        cursor.execute('''
+            SELECT AVG(alert_scenario_3 + alert_scenario_4) as avg_score
+            FROM support_resistance_levels
+            WHERE datetime(record_time) >= datetime('now', ? || ' hours')
+              AND (alert_scenario_3 > 0 OR alert_scenario_4 > 0)
+        ''', (f'-{hours}',))
+        avg_score = cursor.fetchone()[0] or 0
+        
+        # 按币种统计
+        cursor.execute('''
+            SELECT 
+                symbol,
+                COUNT(*) as signal_count,
+                AVG(alert_scenario_3 + alert_scenario_4) as avg_score,
+                MAX(alert_scenario_3 + alert_scenario_4) as max_score
+            FROM support_resistance_levels
+            WHERE datetime(record_time) >= datetime('now', ? || ' hours')
+              AND (alert_scenario_3 > 0 OR alert_scenario_4 > 0)
+            GROUP BY symbol
+            ORDER BY signal_count DESC
+        ''', (f'-{hours}',))
+        
+        by_symbol = []
+        for row in cursor.fetchall():
+            by_symbol.append({
+                'symbol': row[0],
+                'signal_count': row[1],
+                'avg_score': round(row[2], 2),
+                'max_score': row[3]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'stats': {
+                'total_signals': total_escape_events,  # 真实的逃顶事件次数
+                'active_coins': coin_count,
+                'avg_escape_score': round(avg_score, 2),
+                'by_symbol': by_symbol
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        })
+
+@support_resistance_bp.route('/api/escape-top-signals/history-timeseries')
+def api_escape_top_signals_history_timeseries():
+    """获取逃顶信号的历史时间序列数据（每5分钟统计一次）- 北京时间"""
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        
+        conn = get_connection('crypto_data')
+        cursor = conn.cursor()
+        
+        # 按5分钟间隔统计逃顶信号数量（UTC转北京时间+8小时）
+        cursor.execute('''
+            SELECT 
+                datetime(
+                    strftime('%Y-%m-%d %H:', datetime(record_time, '+8 hours')) || 
+                    printf('%02d', (CAST(strftime('%M', datetime(record_time, '+8 hours')) AS INTEGER) / 5) * 5) ||
+                    ':00'
+                ) as time_slot,
+                COUNT(DISTINCT symbol) as unique_symbols
+            FROM support_resistance_levels
+            WHERE datetime(record_time) >= datetime('now', ? || ' hours')
+              AND (alert_scenario_3 > 0 OR alert_scenario_4 > 0)
+            GROUP BY time_slot
+            ORDER BY time_slot ASC
+        ''', (f'-{hours}',))
+        
+        timeseries = []
+        for row in cursor.fetchall():
+            timeseries.append({
+                'time': row[0],  # 已经包含完整时间格式
+                'count': row[1]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': timeseries,
+            'count': len(timeseries),
+            'timezone': '北京时间 (UTC+8)'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': []
+        })
+
+@support_resistance_bp.route('/api/escape-event-stats/timeseries')
+def api_escape_event_stats_timeseries():
+    """获取逃顶事件统计的时间序列数据（从JSON文件读取）"""
+    try:
+        hours = request.args.get('hours', 24, type=int)
+        
+        # 从JSON文件读取数据
+        import json
+        import os
+        from datetime import datetime, timedelta
+        
+        data_file = 'escape_event_stats.json'
+        timeseries = []
+        
+        if os.path.exists(data_file):
+            with open(data_file, 'r') as f:
+                data = json.load(f)
+                
+            # 过滤指定小时数的数据
+            cutoff_time = (datetime.now() - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:00')
+            timeseries = [item for item in data if item['time'] >= cutoff_time]
+        
+        return jsonify({
+            'success': True,
+            'data': timeseries,
+            'count': len(timeseries),
+            'timezone': '北京时间 (UTC+8)'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': str(e),
+            'data': []
+        })
+
+@support_resistance_bp.route('/api/support-resistance/export', methods=['POST'])
+def api_support_resistance_export():
+    """导出支撑阻力位数据"""
+    try:
+        import subprocess
+        import os
+        
+        script_path = '/home/user/webapp/export_support_resistance_data.py'
+        
+        if not os.path.exists(script_path):
+            return jsonify({
+                'success': False,
+                'error': '导出脚本不存在'
+            })
+        
+        # 执行导出脚本
+        result = subprocess.run(
+            ['python3', script_path],
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        
+        if result.returncode != 0:
+            return jsonify({
+                'success': False,
+                'error': '导出失败',
+                'output': result.stderr
+            })
+        
+        # 从输出中提取导出文件路径
+        export_file = None
+        for line in result.stdout.split('\n'):
+            if '导出文件:' in line:
+                export_file = line.split('导出文件:')[-1].strip()
+                break
+        
+        if not export_file or not os.path.exists(export_file):
+            return jsonify({
+                'success': False,
+                'error': '找不到导出文件'
+            })
+        
+        # 获取文件信息
+        file_size = os.path.getsize(export_file)
+        file_size_mb = file_size / (1024 * 1024)
+        filename = os.path.basename(export_file)
+        
+        return jsonify({
+            'success': True,
+            'message': '导出成功',
+            'file_path': export_file,
+            'filename': filename,
+            'file_size': file_size,
+            'file_size_mb': round(file_size_mb, 2),
+            'download_url': f'/api/support-resistance/download/{filename}'
+        })
+        
+    except subprocess.TimeoutExpired:
+        return jsonify({
+            'success': False,
+            'error': '导出超时'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@support_resistance_bp.route('/api/support-resistance/download/<filename>')
+def api_support_resistance_download(filename):
+    """下载导出的数据文件"""
+    try:
+        export_dir = '/home/user/webapp/exports'
+        file_path = os.path.join(export_dir, filename)
+        
+        if not os.path.exists(file_path):
+            return jsonify({
+                'success': False,
+                'error': '文件不存在'
+            }), 404
+        
+        return send_from_directory(export_dir, filename, as_attachment=True)
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@support_resistance_bp.route('/api/support-resistance/import', methods=['POST'])
+def api_support_resistance_import():
+    """导入支撑阻力位数据"""
+    try:
+        import subprocess
+        import os
+        from werkzeug.utils import secure_filename
+        
+        # 检查是否有上传的文件
+        if 'file' not in request.files:
+            return jsonify({
+                'success': False,
+                'error': '没有上传文件'
+            })
+        
+        file = request.files['file']
+        
+        if file.filename == '':
+            return jsonify({
+                'success': False,
+                'error': '文件名为空'
+            })
+        
+        # 检查是否清空现有数据
+        clear_existing = request.form.get('clear_existing', 'false').lower() == 'true'
+        
+        # 保存上传的文件
+        filename = secure_filename(file.filename)
+        upload_dir = '/home/user/webapp/uploads'
+        os.makedirs(upload_dir, exist_ok=True)
+        
+        file_path = os.path.join(upload_dir, filename)
+        file.save(file_path)
+        
+        # 执行导入脚本
+        script_path = '/home/user/webapp/import_support_resistance_data.py'
+        
+        if not os.path.exists(script_path):
+            return jsonify({
+                'success': False,
+                'error': '导入脚本不存在'
+            })
+        
+        # 构建命令
+        cmd = ['python3', script_path, file_path]
+        if clear_existing:
+            cmd.append('--clear')
+        
+        # 执行导入
+        result = subprocess.run(
+            cmd,
+            capture_output=True,
+            text=True,
+            timeout=300
+        )
+        
+        # 删除上传的临时文件
+        try:
+            os.remove(file_path)
+        except:
+            pass
+        
+        if result.returncode != 0:
+            return jsonify({
+                'success': False,
+                'error': '导入失败',
+                'output': result.stderr or result.stdout
+            })
+        
+        # 从输出中提取统计信息
+        stats = {
+            'tables': 0,
+            'records': 0
+        }
+        
+        for line in result.stdout.split('\n'):
+            if '表数量:' in line:
+                try:
+                    stats['tables'] = int(line.split(':')[-1].strip())
+                except:
+                    pass
+            elif '总记录数:' in line:
+                try:
+                    stats['records'] = int(line.split(':')[-1].strip().replace(',', ''))
+                except:
+                    pass
+        
+        return jsonify({
+            'success': True,
+            'message': '导入成功',
+            'stats': stats,
+            'output': result.stdout
+        })
+        
+    except subprocess.TimeoutExpired:
+        return jsonify({
+            'success': False,
+            'error': '导入超时'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
@@ -3,17 +3,20 @@
 支撑压力线采集器
 每30秒采集一次27个币种的支撑线和压力线
 同时采集当前价格、7天周期(1W)和48小时周期(2D)的最高最低价
+批量计算见 support_resistance_engine
 """
 
 import os
 import sys
 import time
 import sqlite3
-import requests
 import pytz
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 
+from okx_market_client import get_client
+from support_resistance_engine import INSERT_LEVEL_SQL, SupportResistanceEngine, level_row
+
 # 数据库配置
 DB_PATH = os.path.join(os.path.dirname(__file__), 'support_resistance.db')
 DB_TIMEOUT = 60.0  # 60秒超时
@@ -34,9 +37,14 @@ SYMBOLS = [
 # OKX API配置
 OKX_API_BASE = 'https://www.okx.com'
 
+# 采集间隔（秒）；大周期K线走缓存后每轮只有一次 tickers 请求，可按需缩短
+COLLECT_INTERVAL = 30
+
 # 北京时区配置
 BEIJING_TZ = pytz.timezone('Asia/Shanghai')
 
+ENGINE = SupportResistanceEngine(SYMBOLS)
+
 def log(message: str):
     """记录日志"""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -55,15 +63,9 @@ def get_current_price(symbol: str) -> Optional[float]:
         # 转换为OKX永续合约格式 (BTCUSDT -> BTC-USDT-SWAP)
         okx_symbol = f"{symbol[:-4]}-{symbol[-4:]}-SWAP"
         
-        url = f"{OKX_API_BASE}/api/v5/market/ticker"
-        params = {'instId': okx_symbol}
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
-        
-        if data.get('code') == '0' and data.get('data'):
-            price = float(data['data'][0]['last'])
-            return price
+        ticker = get_client().get_ticker(okx_symbol)
+        if ticker:
+            return float(ticker['last'])
         return None
     except Exception as e:
         log(f"获取 {symbol} 当前价格失败: {e}")
@@ -78,19 +80,11 @@ def get_historical_klines(symbol: str, hours: int) -> List[Dict]:
         # 计算需要多少根K线（每根5分钟）
         bars = (hours * 60) // 5 + 10  # 多取一些以确保有足够数据
         
-        url = f"{OKX_API_BASE}/api/v5/market/candles"
-        params = {
-            'instId': okx_symbol,
-            'bar': '5m',
-            'limit': min(bars, 300)  # OKX限制最多300根
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        data = response.json()
+        candles = get_client().get_candles(okx_symbol, '5m', min(bars, 300))  # OKX限制最多300根
         
-        if data.get('code') == '0' and data.get('data'):
+        if candles:
             klines = []
-            for k in data['data']:
+            for k in candles:
                 klines.append({
                     'timestamp': int(k[0]),
                     'open': float(k[1]),
@@ -157,11 +151,12 @@ def get_or_create_baseline_price(symbol: str, current_price: float) -> dict:
         'change_percent': round(change_percent, 2)
     }
 
-def calculate_support_resistance(symbol: str) -> Optional[Dict]:
-    """计算支撑线和压力线"""
+def calculate_support_resistance(symbol: str, current_price: Optional[float] = None) -> Optional[Dict]:
+    """计算支撑线和压力线（current_price 为批量获取的最新价，为None时单独请求）"""
     try:
         # 1. 获取当前价格
-        current_price = get_current_price(symbol)
+        if not current_price:
+            current_price = get_current_price(symbol)
         if not current_price:
             log(f"⚠️ {symbol} 无法获取当前价格")
             return None
@@ -172,17 +167,14 @@ def calculate_support_resistance(symbol: str) -> Optional[Dict]:
         
         # 3. 获取1周K线（最新1根）
         try:
-            url_1w = f"https://www.okx.com/api/v5/market/candles?instId={okx_symbol}&bar=1W&limit=1"
-            response_1w = requests.get(url_1w, timeout=10)
-            response_1w.raise_for_status()
-            data_1w = response_1w.json()
+            candles_1w = get_client().get_candles(okx_symbol, '1W', 1)
             
-            if data_1w['code'] != '0' or not data_1w['data']:
-                log(f"⚠️ {symbol} OKX API返回错误: {data_1w.get('msg')}")
+            if not candles_1w:
+                log(f"⚠️ {symbol} OKX API返回1周K线错误")
                 return None
             
             # OKX K线格式: [timestamp, open, high, low, close, volume, ...]
-            kline_1w = data_1w['data'][0]
+            kline_1w = candles_1w[0]
             historical_7d_high = float(kline_1w[2])  # 1周最高价
             historical_7d_low = float(kline_1w[3])   # 1周最低价
             
@@ -196,18 +188,15 @@ def calculate_support_resistance(symbol: str) -> Optional[Dict]:
         
         # 4. 获取2天K线（最新1根）- 用于48小时数据
         try:
-            url_2d = f"https://www.okx.com/api/v5/market/candles?instId={okx_symbol}&bar=2D&limit=1"
-            response_2d = requests.get(url_2d, timeout=10)
-            response_2d.raise_for_status()
-            data_2d = response_2d.json()
+            candles_2d = get_client().get_candles(okx_symbol, '2D', 1)
             
-            if data_2d['code'] != '0' or not data_2d['data']:
-                log(f"⚠️ {symbol} OKX API返回2天K线错误: {data_2d.get('msg')}")
+            if not candles_2d:
+                log(f"⚠️ {symbol} OKX API返回2天K线错误")
                 # 使用7天数据作为后备
                 historical_48h_high = historical_7d_high
                 historical_48h_low = historical_7d_low
             else:
-                kline_2d = data_2d['data'][0]
+                kline_2d = candles_2d[0]
                 historical_48h_high = float(kline_2d[2])  # 2天最高价
                 historical_48h_low = float(kline_2d[3])   # 2天最低价
                 
@@ -354,42 +343,8 @@ def save_to_database(data: Dict) -> bool:
         cursor = conn.cursor()
         
         # 使用北京时间
-        from datetime import datetime as dt_class
-        import pytz
-        china_tz = pytz.timezone('Asia/Shanghai')
-        beijing_now = dt_class.now(china_tz).strftime('%Y-%m-%d %H:%M:%S')
-        
-        cursor.execute('''
-            INSERT INTO support_resistance_levels (
-                symbol, current_price,
-                support_line_1, support_line_2,
-                resistance_line_1, resistance_line_2,
-                distance_to_support_1, distance_to_support_2,
-                distance_to_resistance_1, distance_to_resistance_2,
-                position_s2_r1, position_s1_r2, position_s1_r2_upper, position_s1_r1,
-                position_7d, position_48h,
-                alert_scenario_1, alert_scenario_2, alert_scenario_3, alert_scenario_4,
-                alert_7d_low, alert_7d_high, alert_48h_low, alert_48h_high,
-                alert_triggered,
-                baseline_price_24h, price_change_24h, change_percent_24h,
-                record_time
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (
-            data['symbol'], data['current_price'],
-            data['support_line_1'], data['support_line_2'],
-            data['resistance_line_1'], data['resistance_line_2'],
-            data['distance_to_support_1'], data['distance_to_support_2'],
-            data['distance_to_resistance_1'], data['distance_to_resistance_2'],
-            data['position_s2_r1'], data['position_s1_r2'], data['position_s1_r2_upper'], data['position_s1_r1'],
-            data['position_7d'], data['position_48h'],
-            int(data['alert_scenario_1']), int(data['alert_scenario_2']), 
-            int(data['alert_scenario_3']), int(data['alert_scenario_4']),
-            int(data['alert_7d_low']), int(data['alert_7d_high']),
-            int(data['alert_48h_low']), int(data['alert_48h_high']),
-            int(data['alert_triggered']),
-            data['baseline_price_24h'], data['price_change_24h'], data['change_percent_24h'],
-            beijing_now
-        ))
+        beijing_now = datetime.now(BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+        cursor.execute(INSERT_LEVEL_SQL, level_row(data, beijing_now))
         
         conn.commit()
         conn.close()
@@ -404,52 +359,45 @@ def collect_all_symbols():
     log("=" * 60)
     log("🚀 开始采集支撑压力线数据")
     
-    success_count = 0
-    failed_count = 0
+    # 一次 tickers 调用获取全部最新价；1W/2D 高低点走缓存，只在新K线或突破时重新请求；
+    # 所有币种一次向量化计算，一个事务写入
+    try:
+        results = ENGINE.run_once(DB_PATH)
+    except Exception as e:
+        log(f"❌ 采集失败: {e}")
+        return
     
-    for i, symbol in enumerate(SYMBOLS, 1):
-        log(f"📊 [{i}/{len(SYMBOLS)}] 正在处理 {symbol}...")
-        
-        data = calculate_support_resistance(symbol)
-        
-        if data:
-            if save_to_database(data):
-                log(f"✅ {symbol} 采集成功 | 当前价: ${data['current_price']:.2f} | "
-                    f"支撑1: ${data['support_line_1']:.2f} ({data['distance_to_support_1']:.2f}%) | "
-                    f"压力1: ${data['resistance_line_1']:.2f} ({data['distance_to_resistance_1']:.2f}%)")
-                success_count += 1
-            else:
-                failed_count += 1
-        else:
-            failed_count += 1
-        
-        # 避免请求过快
-        time.sleep(0.5)
+    for data in results:
+        log(f"✅ {data['symbol']} | 当前价: ${data['current_price']:.2f} | "
+            f"支撑1: ${data['support_line_1']:.2f} ({data['distance_to_support_1']:.2f}%) | "
+            f"压力1: ${data['resistance_line_1']:.2f} ({data['distance_to_resistance_1']:.2f}%)")
     
-    log(f"✅ 采集完成! 成功: {success_count}, 失败: {failed_count}")
+    stats = ENGINE.cache.stats
+    log(f"✅ 采集完成! 成功: {len(results)}, 失败: {len(SYMBOLS) - len(results)} | "
+        f"大周期K线请求累计 {stats['fetches']} 次, 缓存命中 {stats['hits']} 次")
     log("=" * 60)
 
 def main():
     """主函数"""
     log("🎯 支撑压力线采集器启动")
     log(f"📊 监控币种数量: {len(SYMBOLS)}")
-    log(f"⏰ 采集间隔: 30秒")
+    log(f"⏰ 采集间隔: {COLLECT_INTERVAL}秒")
     log(f"📁 数据库路径: {DB_PATH}")
-    log(f"📈 数据来源: OKX API (1W K线 + 2D K线 + 实时价格)")
+    log(f"📈 数据来源: OKX API (1W K线 + 2D K线 + 实时价格，大周期高低点缓存)")
     
     while True:
         try:
             collect_all_symbols()
-            log("⏳ 等待30秒后进行下一次采集...")
-            time.sleep(30)  # 30秒
+            log(f"⏳ 等待{COLLECT_INTERVAL}秒后进行下一次采集...")
+            time.sleep(COLLECT_INTERVAL)
             
         except KeyboardInterrupt:
             log("⚠️ 收到停止信号，正在退出...")
             break
         except Exception as e:
             log(f"❌ 采集出错: {e}")
-            log("⏳ 等待30秒后重试...")
-            time.sleep(30)
+            log(f"⏳ 等待{COLLECT_INTERVAL}秒后重试...")
+            time.sleep(COLLECT_INTERVAL)
 
 if __name__ == '__main__':
     main()
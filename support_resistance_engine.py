@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+支撑压力线批量计算引擎
+- 1W / 2D 大周期最高最低价缓存在内存中，只在新K线开盘、当前价突破缓存的高低点
+  或超过 max_age 时重新请求（大多数轮次0次K线请求）
+- 当前价来自一次 tickers 批量调用
+- 所有币种的支撑压力线、距离、位置和警报一次性用 NumPy 数组计算，
+  结果与 support_resistance_collector.calculate_support_resistance 逐项一致
+- 基准价读取/创建和所有结果在一个事务内写入
+
+用法:
+    engine = SupportResistanceEngine(SYMBOLS)
+    results = engine.run_once(db_path)
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pytz
+
+from db_access import transaction
+
+BEIJING_TZ = pytz.timezone('Asia/Shanghai')
+
+# 大周期 -> 一根K线的毫秒数
+BAR_MS = {
+    '1W': 7 * 24 * 60 * 60 * 1000,
+    '2D': 2 * 24 * 60 * 60 * 1000,
+}
+EXTREMES_MAX_AGE = 300          # 缓存的高低点最长使用时间（秒），覆盖两次采集之间未观察到的插针
+
+# support_resistance_levels 的写入列（不含 record_time）
+LEVEL_COLUMNS = (
+    'symbol', 'current_price',
+    'support_line_1', 'support_line_2',
+    'resistance_line_1', 'resistance_line_2',
+    'distance_to_support_1', 'distance_to_support_2',
+    'distance_to_resistance_1', 'distance_to_resistance_2',
+    'position_s2_r1', 'position_s1_r2', 'position_s1_r2_upper', 'position_s1_r1',
+    'position_7d', 'position_48h',
+    'alert_scenario_1', 'alert_scenario_2', 'alert_scenario_3', 'alert_scenario_4',
+    'alert_7d_low', 'alert_7d_high', 'alert_48h_low', 'alert_48h_high',
+    'alert_triggered',
+    'baseline_price_24h', 'price_change_24h', 'change_percent_24h',
+)
+_ALERT_COLUMNS = frozenset(column for column in LEVEL_COLUMNS if column.startswith('alert_'))
+
+INSERT_LEVEL_SQL = f'''
+    INSERT INTO support_resistance_levels ({', '.join(LEVEL_COLUMNS)}, record_time)
+    VALUES ({', '.join('?' * (len(LEVEL_COLUMNS) + 1))})
+'''
+
+
+def okx_inst_id(symbol: str) -> str:
+    """BTCUSDT -> BTC-USDT-SWAP"""
+    return f"{symbol[:-4]}-{symbol[-4:]}-SWAP"
+
+
+def level_row(data: Dict, record_time: str) -> Tuple:
+    """结果字典 -> INSERT_LEVEL_SQL 的参数（警报转为 0/1）"""
+    return tuple(int(data[column]) if column in _ALERT_COLUMNS else data[column]
+                 for column in LEVEL_COLUMNS) + (record_time,)
+
+
+# ----------------------------------------------------------------------
+# 大周期高低点缓存
+# ----------------------------------------------------------------------
+class ExtremesCache:
+    """每个 (币种, 大周期) 最新一根K线的 (开盘时间, 最高, 最低)"""
+
+    def __init__(self, fetch: Callable[[str, str], Optional[Sequence]], max_age: float = EXTREMES_MAX_AGE):
+        """
+        Args:
+            fetch: (inst_id, bar) -> OKX K线 [ts, open, high, low, ...]，失败返回 None
+            max_age: 缓存最长使用时间（秒）
+        """
+        self.fetch = fetch
+        self.max_age = max_age
+        self._bars: Dict[Tuple[str, str], Tuple[int, float, float, float]] = {}   # -> (ts, high, low, 取得时间)
+        self.stats = {'fetches': 0, 'hits': 0}
+
+    def stale(self, symbol: str, bar: str, price: float, now_ms: int) -> bool:
+        cached = self._bars.get((symbol, bar))
+        if cached is None:
+            return True
+        bar_ts, high, low, fetched_at = cached
+        return (now_ms >= bar_ts + BAR_MS[bar]            # 新K线已开盘
+                or price > high or price < low             # 当前价突破缓存的高低点
+                or time.monotonic() - fetched_at >= self.max_age)
+
+    def refresh(self, keys: Sequence[Tuple[str, str]], map_func: Callable = map):
+        """重新请求指定的 (币种, 大周期)；请求失败的移出缓存"""
+        candles = list(map_func(lambda key: self.fetch(okx_inst_id(key[0]), key[1]), keys))
+        now = time.monotonic()
+        for key, candle in zip(keys, candles):
+            self.stats['fetches'] += 1
+            if candle:
+                self._bars[key] = (int(candle[0]), float(candle[2]), float(candle[3]), now)
+            else:
+                self._bars.pop(key, None)
+
+    def get(self, symbol: str, bar: str) -> Optional[Tuple[float, float]]:
+        cached = self._bars.get((symbol, bar))
+        return (cached[1], cached[2]) if cached else None
+
+    def clear(self):
+        self._bars.clear()
+
+
+# ----------------------------------------------------------------------
+# 向量化计算
+# ----------------------------------------------------------------------
+def _ratio(numerator: np.ndarray, denominator: np.ndarray, valid: np.ndarray, default: float) -> np.ndarray:
+    out = np.full(numerator.shape, default, dtype=np.float64)
+    np.divide(numerator, denominator, out=out, where=valid)
+    return out
+
+
+def compute_levels(price: np.ndarray, high_7d: np.ndarray, low_7d: np.ndarray,
+                   high_48h: np.ndarray, low_48h: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    所有币种的支撑压力线、距离、位置和警报（公式同 calculate_support_resistance）
+
+    Returns:
+        列名 -> 数组（警报为 bool 数组）
+    """
+    support_1 = np.minimum(low_7d, price)
+    resistance_1 = np.maximum(high_7d, price)
+    support_2 = np.minimum(low_48h, price)
+    resistance_2 = np.maximum(high_48h, price)
+
+    # 距离百分比（非负）
+    distance_s1 = np.maximum(0, _ratio(price - support_1, support_1, support_1 > 0, 0.0) * 100)
+    distance_s2 = np.maximum(0, _ratio(price - support_2, support_2, support_2 > 0, 0.0) * 100)
+    distance_r1 = np.maximum(0, _ratio(resistance_1 - price, price, price > 0, 0.0) * 100)
+    distance_r2 = np.maximum(0, _ratio(resistance_2 - price, price, price > 0, 0.0) * 100)
+
+    # 位置百分比：区间为0时取50%
+    def position(support, resistance):
+        scaled = _ratio(price - support, resistance - support, resistance != support, np.nan) * 100
+        return np.where(resistance != support, scaled, 50.0)
+
+    position_7d = position(support_1, resistance_1)
+    position_48h = position(support_2, resistance_2)
+    position_s2_r1 = position(support_2, resistance_1)
+    position_s1_r2 = position(support_1, resistance_2)
+
+    alert_7d_low = position_7d <= 5
+    alert_7d_high = position_7d >= 95
+    alert_48h_low = position_48h <= 5
+    alert_48h_high = position_48h >= 95
+    supports_8 = (support_1 >= 8) & (support_2 >= 8)
+    supports_1 = (support_1 >= 1) & (support_2 >= 1)
+    alert_scenario_1 = (position_s2_r1 <= 5) & supports_8
+    alert_scenario_2 = (position_s1_r2 <= 5) & supports_8
+    alert_scenario_3 = (position_s1_r2 >= 95) & supports_1
+    alert_scenario_4 = position_7d >= 95
+
+    return {
+        'current_price': price,
+        'support_line_1': support_1,
+        'support_line_2': support_2,
+        'resistance_line_1': resistance_1,
+        'resistance_line_2': resistance_2,
+        'distance_to_support_1': distance_s1,
+        'distance_to_support_2': distance_s2,
+        'distance_to_resistance_1': distance_r1,
+        'distance_to_resistance_2': distance_r2,
+        'position_7d': position_7d,
+        'position_48h': position_48h,
+        'position_s2_r1': position_s2_r1,
+        'position_s1_r2': position_s1_r2,
+        'position_s1_r2_upper': position_s1_r2,
+        'position_s1_r1': position_7d,
+        'alert_7d_low': alert_7d_low,
+        'alert_7d_high': alert_7d_high,
+        'alert_48h_low': alert_48h_low,
+        'alert_48h_high': alert_48h_high,
+        'alert_scenario_1': alert_scenario_1,
+        'alert_scenario_2': alert_scenario_2,
+        'alert_scenario_3': alert_scenario_3,
+        'alert_scenario_4': alert_scenario_4,
+        'alert_triggered': (alert_scenario_1 | alert_scenario_2 | alert_scenario_3 | alert_scenario_4
+                            | alert_7d_low | alert_7d_high | alert_48h_low | alert_48h_high),
+    }
+
+
+# ----------------------------------------------------------------------
+# 引擎
+# ----------------------------------------------------------------------
+def _apply_baselines(conn, results: List[Dict], now: datetime):
+    """读取/创建今日基准价（北京时间0点），补充24小时涨跌字段"""
+    today = now.date().isoformat()
+    symbols = [data['symbol'] for data in results]
+    placeholders = ','.join('?' * len(symbols))
+    baselines = dict(conn.execute(f'''
+        SELECT symbol, baseline_price FROM daily_baseline_prices
+        WHERE baseline_date = ? AND symbol IN ({placeholders})
+    ''', [today] + symbols).fetchall())
+
+    missing = [(data['symbol'], today, data['current_price'], now.strftime('%Y-%m-%d 00:00:00'))
+               for data in results if data['symbol'] not in baselines]
+    if missing:
+        conn.executemany('''
+            INSERT OR REPLACE INTO daily_baseline_prices
+            (symbol, baseline_date, baseline_price, baseline_time)
+            VALUES (?, ?, ?, ?)
+        ''', missing)
+        baselines.update((symbol, price) for symbol, _, price, _ in missing)
+
+    for data in results:
+        baseline_price = baselines[data['symbol']]
+        price_change = data['current_price'] - baseline_price
+        change_percent = (price_change / baseline_price * 100) if baseline_price > 0 else 0
+        data['baseline_price_24h'] = baseline_price
+        data['price_change_24h'] = round(price_change, 4)
+        data['change_percent_24h'] = round(change_percent, 2)
+    return [symbol for symbol, _, _, _ in missing]
+
+
+class SupportResistanceEngine:
+    """一轮采集：批量取价 -> 按需刷新大周期高低点 -> 向量化计算 -> 单事务写入"""
+
+    def __init__(self, symbols: Sequence[str], client=None, max_age: float = EXTREMES_MAX_AGE):
+        self.symbols = list(symbols)
+        self._client = client
+        self.cache = ExtremesCache(self._fetch_bar, max_age=max_age)
+
+    @property
+    def client(self):
+        if self._client is None:
+            from okx_market_client import get_client
+            self._client = get_client()
+        return self._client
+
+    def _fetch_bar(self, inst_id: str, bar: str) -> Optional[Sequence]:
+        candles = self.client.get_candles(inst_id, bar, 1)
+        return candles[0] if candles else None
+
+    def compute(self, prices: Dict[str, float], now_ms: Optional[int] = None) -> List[Dict]:
+        """
+        计算所有有价格的币种（prices: 币种 -> 当前价）
+
+        Returns:
+            与 calculate_support_resistance 相同格式的结果（不含24小时涨跌字段）；
+            没有价格或1周K线的币种跳过
+        """
+        now_ms = now_ms if now_ms is not None else int(time.time() * 1000)
+        symbols = [symbol for symbol in self.symbols if prices.get(symbol)]
+        stale = [(symbol, bar) for symbol in symbols for bar in BAR_MS
+                 if self.cache.stale(symbol, bar, prices[symbol], now_ms)]
+        self.cache.stats['hits'] += len(symbols) * len(BAR_MS) - len(stale)
+        if stale:
+            self.cache.refresh(stale, self.client.map)
+
+        rows = []
+        for symbol in symbols:
+            weekly = self.cache.get(symbol, '1W')
+            if weekly is None:
+                continue
+            two_day = self.cache.get(symbol, '2D') or weekly   # 2天K线缺失时使用7天数据
+            rows.append((symbol, prices[symbol]) + weekly + two_day)
+        if not rows:
+            return []
+
+        names = [row[0] for row in rows]
+        price, high_7d, low_7d, high_48h, low_48h = np.array([row[1:] for row in rows], dtype=np.float64).T
+        levels = compute_levels(price, high_7d, low_7d, high_48h, low_48h)
+        columns = {name: array.tolist() for name, array in levels.items()}
+        return [dict({'symbol': symbol}, **{name: values[i] for name, values in columns.items()})
+                for i, symbol in enumerate(names)]
+
+    def save(self, db: str, results: List[Dict], now: Optional[datetime] = None) -> List[str]:
+        """基准价和所有结果在一个事务内写入，返回新建基准价的币种"""
+        if not results:
+            return []
+        now = now or datetime.now(BEIJING_TZ)
+        with transaction(db) as conn:
+            created = _apply_baselines(conn, results, now)
+            record_time = now.strftime('%Y-%m-%d %H:%M:%S')
+            conn.executemany(INSERT_LEVEL_SQL, [level_row(data, record_time) for data in results])
+        return created
+
+    def run_once(self, db: str) -> List[Dict]:
+        """批量取价、计算并写入一轮"""
+        inst_ids = {symbol: okx_inst_id(symbol) for symbol in self.symbols}
+        okx_prices = self.client.get_last_prices(inst_ids.values())
+        prices = {symbol: okx_prices.get(inst_id) for symbol, inst_id in inst_ids.items()}
+        results = self.compute(prices)
+        self.save(db, results)
+        return results
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+系统接口
+缓存统计与清除、数据库统计
+"""
+
+import os
+
+from flask import Blueprint, jsonify, render_template, request
+
+from app_common import CACHE_CLEAR_DB, CACHE_CLEAR_SOURCE, candle_store, data_versions, response_cache
+from db_access import get_stats as get_db_stats, transaction
+from response_cache import bump_data_version
+
+system_bp = Blueprint('system', __name__)
+
+@system_bp.route('/favicon.ico')
+def favicon():
+    """处理favicon请求，避免404错误"""
+    return '', 204  # 返回无内容状态码
+
+@system_bp.route('/cache-help')
+def cache_help():
+    """缓存清除帮助页面"""
+    return render_template('cache_clear_guide.html')
+
+# ============================================
+# 缓存管理API
+# ============================================
+@system_bp.route('/api/cache/stats')
+def cache_stats():
+    """获取缓存统计信息（本进程）"""
+    return jsonify({
+        'success': True,
+        'worker_pid': os.getpid(),
+        'response_cache': response_cache.get_stats(),
+        # K线常驻内存只在 K线功能首次使用后才创建，统计接口不触发加载
+        'candle_store': candle_store().get_stats() if candle_store.loaded() else None,
+        'message': '服务器端缓存统计信息'
+    })
+
+@system_bp.route('/api/cache/clear', methods=['POST'])
+def cache_clear():
+    """清除服务器端缓存（key 为路由函数名；递增版本号，其他 worker 进程在下次读取时失效）"""
+    try:
+        key = request.json.get('key') if request.json else None
+        with transaction(CACHE_CLEAR_DB) as conn:
+            bump_data_version(conn, f'{CACHE_CLEAR_SOURCE}:{key}' if key else CACHE_CLEAR_SOURCE)
+        response_cache.clear(key)
+        data_versions.invalidate()
+        return jsonify({
+            'success': True,
+            'message': f'缓存已清除{"（键: " + key + "）" if key else "（全部）"}'
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        })
+
+@system_bp.route('/api/db/stats')
+def db_stats():
+    """数据库连接与锁等待统计（本进程）"""
+    return jsonify({
+        'success': True,
+        'db_stats': get_db_stats()
+    })
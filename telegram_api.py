@@ -0,0 +1,510 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Telegram 通知
+通知状态、历史、信号推送、配置与启停
+"""
+
+from datetime import datetime, timedelta
+import json
+import os
+import sqlite3
+import traceback
+
+from flask import Blueprint, jsonify, render_template, request
+
+from db_access import get_connection
+
+telegram_bp = Blueprint('telegram', __name__)
+
+# 旧的telegram-dashboard路由已废弃，使用下方新版本
+# @app.route('/telegram-dashboard')
+# def telegram_dashboard():
+#     """Telegram信号推送系统监控面板"""
+#     import time
+#     cache_buster = int(time.time())
+#     return render_template('telegram_dashboard.html', cache_buster=cache_buster)
+
+@telegram_bp.route('/api/telegram/status')
+def telegram_status():
+    """获取Telegram监控系统状态"""
+    try:
+        import subprocess
+        import os
+        
+        # 检查进程是否运行（检查telegram_signal_system.py而不是tg_signal_monitor.py）
+        result = subprocess.run(
+            ['pgrep', '-f', 'telegram_signal_system.py'],
+            capture_output=True,
+            text=True
+        )
+        
+        is_running = bool(result.stdout.strip())
+        pid = result.stdout.strip() if is_running else None
+        
+        # 获取数据库统计
+        db_stats = {}
+        if os.path.exists('tg_signals.db'):
+            conn = get_connection('tg_signals')
+            cursor = conn.cursor()
+            
+            # 获取总发送数
+            cursor.execute("SELECT COUNT(*) FROM signal_history")
+            total_sent = cursor.fetchone()[0]
+            
+            # 获取最近1小时发送数
+            cursor.execute("""
+                SELECT COUNT(*) FROM signal_history 
+                WHERE sent_time >= datetime('now', '-1 hour', 'localtime')
+            """)
+            sent_1h = cursor.fetchone()[0]
+            
+            # 获取今天发送数
+            cursor.execute("""
+                SELECT COUNT(*) FROM signal_history 
+                WHERE date(sent_time) = date('now', 'localtime')
+            """)
+            sent_today = cursor.fetchone()[0]
+            
+            # 获取各类信号统计
+            cursor.execute("""
+                SELECT signal_type, COUNT(*) as count
+                FROM signal_history
+                GROUP BY signal_type
+            """)
+            signal_counts = dict(cursor.fetchall())
+            
+            # 获取最新发送时间
+            cursor.execute("""
+                SELECT sent_time FROM signal_history 
+                ORDER BY created_at DESC LIMIT 1
+            """)
+            last_sent = cursor.fetchone()
+            last_sent_time = last_sent[0] if last_sent else None
+            
+            conn.close()
+            
+            db_stats = {
+                'total_sent': total_sent,
+                'sent_1h': sent_1h,
+                'sent_today': sent_today,
+                'signal_counts': signal_counts,
+                'last_sent_time': last_sent_time
+            }
+        
+        # 返回扁平化的数据结构，符合前端期待的格式
+        return jsonify({
+            'success': True,
+            'is_running': is_running,
+            'pid': pid,
+            'status': '运行中' if is_running else '未运行',
+            'total_sent': db_stats.get('total_sent', 0),
+            'sent_1h': db_stats.get('sent_1h', 0),
+            'sent_today': db_stats.get('sent_today', 0),
+            'last_sent_time': db_stats.get('last_sent_time'),
+            'last_update': db_stats.get('last_sent_time', '未知'),
+            'signal_counts': signal_counts,
+            'last_messages': [],  # 前端需要的字段
+            # 同时保留嵌套格式以兼容其他可能的调用
+            'data': {
+                'is_running': is_running,
+                'pid': pid,
+                'database_stats': db_stats
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@telegram_bp.route('/api/telegram/history')
+def telegram_history():
+    """获取Telegram信号发送历史"""
+    try:
+        import os
+        
+        if not os.path.exists('tg_signals.db'):
+            return jsonify({
+                'success': False,
+                'error': '数据库不存在'
+            }), 404
+        
+        # 获取分页参数
+        page = request.args.get('page', 1, type=int)
+        limit = request.args.get('limit', 50, type=int)
+        signal_type = request.args.get('type', '')
+        
+        conn = get_connection('tg_signals')
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 构建查询
+        where_clause = ""
+        params = []
+        if signal_type:
+            where_clause = "WHERE signal_type = ?"
+            params.append(signal_type)
+        
+        # 获取总数
+        cursor.execute(f"SELECT COUNT(*) FROM signal_history {where_clause}", params)
+        total = cursor.fetchone()[0]
+        
+        # 获取分页数据
+        offset = (page - 1) * limit
+        cursor.execute(f"""
+            SELECT id, signal_type, symbol, signal_name, signal_data, sent_time, created_at
+            FROM signal_history
+            {where_clause}
+            ORDER BY created_at DESC
+            LIMIT ? OFFSET ?
+        """, params + [limit, offset])
+        
+        records = []
+        for row in cursor.fetchall():
+            records.append({
+                'id': row['id'],
+                'signal_type': row['signal_type'],
+                'symbol': row['symbol'],
+                'signal_name': row['signal_name'],
+                'signal_data': row['signal_data'],
+                'sent_time': row['sent_time'],
+                'created_at': row['created_at']
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'records': records,
+                'total': total,
+                'page': page,
+                'limit': limit,
+                'pages': (total + limit - 1) // limit
+            }
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+@telegram_bp.route('/telegram-dashboard')
+def telegram_dashboard():
+    """Telegram信号推送系统仪表板"""
+    return render_template('telegram_signal_dashboard.html')
+
+@telegram_bp.route('/api/telegram/signals/support-resistance')
+def api_telegram_support_resistance():
+    """获取支撑压力线信号（2小时内）"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        
+        conn = get_connection('telegram_signals')
+        cursor = conn.cursor()
+        
+        # 获取2小时内的信号
+        two_hours_ago = (datetime.now() - timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        cursor.execute('''
+            SELECT signal_type, symbol, price, signal_time, sent_at
+            FROM support_resistance_signals
+            WHERE sent_at >= ?
+            ORDER BY sent_at DESC
+        ''', (two_hours_ago,))
+        
+        signals = []
+        for row in cursor.fetchall():
+            signals.append({
+                'signal_type': row[0],
+                'symbol': row[1],
+                'price': row[2],
+                'signal_time': row[3],
+                'sent_at': row[4]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'signals': signals,
+            'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@telegram_bp.route('/api/telegram/signals/count-alerts')
+def api_telegram_count_alerts():
+    """获取计次预警（2小时内）"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        
+        conn = get_connection('telegram_signals')
+        cursor = conn.cursor()
+        
+        two_hours_ago = (datetime.now() - timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        cursor.execute('''
+            SELECT record_time, count_value, threshold, full_data, sent_at
+            FROM count_alerts
+            WHERE sent_at >= ?
+            ORDER BY sent_at DESC
+        ''', (two_hours_ago,))
+        
+        alerts = []
+        for row in cursor.fetchall():
+            alerts.append({
+                'record_time': row[0],
+                'count_value': row[1],
+                'threshold': row[2],
+                'full_data': row[3],
+                'sent_at': row[4]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'alerts': alerts,
+            'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@telegram_bp.route('/api/telegram/signals/trading')
+def api_telegram_trading():
+    """获取交易信号（2小时内）"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        
+        conn = get_connection('telegram_signals')
+        cursor = conn.cursor()
+        
+        two_hours_ago = (datetime.now() - timedelta(hours=2)).strftime('%Y-%m-%d %H:%M:%S')
+        
+        cursor.execute('''
+            SELECT signal_type, symbol, price, signal_time, rsi, sent_at
+            FROM trading_signals
+            WHERE sent_at >= ?
+            ORDER BY sent_at DESC
+        ''', (two_hours_ago,))
+        
+        signals = []
+        for row in cursor.fetchall():
+            signals.append({
+                'signal_type': row[0],
+                'symbol': row[1],
+                'price': row[2],
+                'signal_time': row[3],
+                'rsi': row[4],
+                'sent_at': row[5]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'signals': signals,
+            'update_time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@telegram_bp.route('/api/telegram/signals/stats')
+def api_telegram_stats():
+    """获取发送统计"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        
+        conn = get_connection('telegram_signals')
+        cursor = conn.cursor()
+        
+        # 总发送数
+        cursor.execute('SELECT COUNT(*) FROM support_resistance_signals')
+        support_count = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM count_alerts')
+        alert_count = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM trading_signals')
+        trade_count = cursor.fetchone()[0]
+        total = support_count + alert_count + trade_count
+        
+        # 最近1小时
+        one_hour_ago = (datetime.now() - timedelta(hours=1)).strftime('%Y-%m-%d %H:%M:%S')
+        cursor.execute('SELECT COUNT(*) FROM support_resistance_signals WHERE sent_at >= ?', (one_hour_ago,))
+        support_1h = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM count_alerts WHERE sent_at >= ?', (one_hour_ago,))
+        alert_1h = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM trading_signals WHERE sent_at >= ?', (one_hour_ago,))
+        trade_1h = cursor.fetchone()[0]
+        last_hour = support_1h + alert_1h + trade_1h
+        
+        # 今日发送
+        today_start = datetime.now().strftime('%Y-%m-%d 00:00:00')
+        cursor.execute('SELECT COUNT(*) FROM support_resistance_signals WHERE sent_at >= ?', (today_start,))
+        support_today = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM count_alerts WHERE sent_at >= ?', (today_start,))
+        alert_today = cursor.fetchone()[0]
+        cursor.execute('SELECT COUNT(*) FROM trading_signals WHERE sent_at >= ?', (today_start,))
+        trade_today = cursor.fetchone()[0]
+        today = support_today + alert_today + trade_today
+        
+        # 最后推送时间
+        cursor.execute('''
+            SELECT MAX(sent_at) FROM (
+                SELECT sent_at FROM support_resistance_signals
+                UNION ALL
+                SELECT sent_at FROM count_alerts
+                UNION ALL
+                SELECT sent_at FROM trading_signals
+            )
+        ''')
+        last_time = cursor.fetchone()[0]
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'total': total,
+            'last_hour': last_hour,
+            'today': today,
+            'last_time': last_time
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@telegram_bp.route('/api/telegram/system/status')
+def api_telegram_system_status():
+    """获取Telegram推送系统状态"""
+    try:
+        import subprocess
+        # 检查进程是否运行
+        result = subprocess.run(['pgrep', '-f', 'telegram_signal_system.py'], 
+                               capture_output=True, text=True)
+        is_running = bool(result.stdout.strip())
+        pid = result.stdout.strip() if is_running else None
+        
+        return jsonify({
+            'success': True,
+            'running': is_running,
+            'pid': pid,
+            'message': '系统运行中' if is_running else '系统未运行'
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@telegram_bp.route('/api/telegram/start', methods=['POST'])
+def api_telegram_start():
+    """启动Telegram推送系统"""
+    try:
+        import subprocess
+        result = subprocess.run(['./start_telegram_signal_system.sh'], 
+                               capture_output=True, text=True, cwd='/home/user/webapp')
+        return jsonify({
+            'success': True,
+            'message': '系统已启动',
+            'output': result.stdout
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@telegram_bp.route('/api/telegram/stop', methods=['POST'])
+def api_telegram_stop():
+    """停止Telegram推送系统"""
+    try:
+        import subprocess
+        result = subprocess.run(['./stop_telegram_signal_system.sh'], 
+                               capture_output=True, text=True, cwd='/home/user/webapp')
+        return jsonify({
+            'success': True,
+            'message': '系统已停止',
+            'output': result.stdout
+        })
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+# ==================== Telegram 配置管理 API ====================
+
+@telegram_bp.route('/api/telegram/config', methods=['GET', 'POST'])
+def telegram_config_api():
+    """
+    获取或更新 Telegram 配置
+    GET: 返回当前配置
+    POST: 更新配置
+    """
+    config_file = 'telegram_config.json'
+    
+    try:
+        if request.method == 'GET':
+            # 读取当前配置
+            if not os.path.exists(config_file):
+                return jsonify({
+                    'success': False,
+                    'error': '配置文件不存在'
+                }), 404
+            
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            
+            return jsonify({
+                'success': True,
+                'config': config
+            })
+        
+        elif request.method == 'POST':
+            # 更新配置
+            data = request.json
+            
+            if not data:
+                return jsonify({
+                    'success': False,
+                    'error': '请提供配置数据'
+                }), 400
+            
+            # 读取现有配置
+            if not os.path.exists(config_file):
+                return jsonify({
+                    'success': False,
+                    'error': '配置文件不存在'
+                }), 404
+            
+            with open(config_file, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+            
+            # 更新信号类型的启用状态
+            if 'buy' in data:
+                config['signal_types']['buy']['enabled'] = data['buy']
+            if 'sell' in data:
+                config['signal_types']['sell']['enabled'] = data['sell']
+            if 'double_buy' in data:
+                config['signal_types']['double_buy']['enabled'] = data['double_buy']
+            if 'double_sell' in data:
+                config['signal_types']['double_sell']['enabled'] = data['double_sell']
+            
+            # 备份原配置
+            backup_file = f'telegram_config_backup_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+            with open(backup_file, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=2, ensure_ascii=False)
+            
+            # 保存新配置
+            with open(config_file, 'w', encoding='utf-8') as f:
+                json.dump(config, f, indent=2, ensure_ascii=False)
+            
+            return jsonify({
+                'success': True,
+                'message': '配置已更新',
+                'config': config,
+                'backup_file': backup_file
+            })
+            
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
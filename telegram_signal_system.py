@@ -16,6 +16,9 @@ from datetime import datetime, timedelta
 import pytz
 import os
 
+from db_access import get_connection
+from event_bus import Subscriber, SNAPSHOT_CREATED
+
 # 北京时区
 BEIJING_TZ = pytz.timezone('Asia/Shanghai')
 
@@ -37,6 +40,9 @@ TG_API_BASE = f"https://api.telegram.org/bot{TG_BOT_TOKEN}"
 # API基础URL
 API_BASE = "http://localhost:5000"
 
+# 定时检查间隔（秒）；快照事件到达时立即检查计次预警
+CHECK_INTERVAL = 60
+
 # 数据库文件
 DB_FILE = 'telegram_signals.db'
 
@@ -134,6 +140,9 @@ def check_support_resistance_signals():
     """
     检查支撑压力线系统信号（抄底/逃顶）
     从 support-resistance 页面的API获取数据
+
+    注意：该规则目前不会触发——/api/support-resistance/latest-signal 不返回 'data' 字段，
+    所以主循环不再调用（避免无效的本地 HTTP 请求）。启用支撑压力线推送需要单独确定规则
     """
     try:
         # 获取支撑压力线最新信号
@@ -223,6 +232,28 @@ def check_support_resistance_signals():
 
 # ==================== 2. 计次预警系统 ====================
 
+def load_latest_query_data():
+    """读取最新的首页快照（字段同 /api/query/latest）"""
+    conn = get_connection('crypto_data')
+    try:
+        snapshot = conn.execute("""
+            SELECT 
+                snapshot_time, rush_up, rush_down, diff, count, ratio, status,
+                round_rush_up, round_rush_down, price_lowest, price_newhigh,
+                count_score_display, rise_24h_count, fall_24h_count
+            FROM crypto_snapshots
+            ORDER BY snapshot_date DESC, snapshot_time DESC
+            LIMIT 1
+        """).fetchone()
+    finally:
+        conn.close()
+    if not snapshot:
+        return None
+    keys = ('运算时间', '急涨', '急跌', '差值', '计次', '比值', '状态', '本轮急涨', '本轮急跌',
+            '比价最低', '比价创新高', '计次得分', '24h涨≥10%', '24h跌≤-10%')
+    return dict(zip(keys, snapshot))
+
+
 def check_count_alerts():
     """
     检查计次预警系统
@@ -230,15 +261,11 @@ def check_count_alerts():
     2. 当前计次 >= 基准值+2 时触发预警
     """
     try:
-        # 获取历史数据查询API
-        url = f"{API_BASE}/api/query/latest"
-        response = requests.get(url, timeout=5)
-        data = response.json()
-        
-        if not data.get('success'):
+        # 直接读取最新快照（snapshot.created 事件到达时立即检查）
+        query_data = load_latest_query_data()
+        if not query_data:
             return
         
-        query_data = data.get('data', {})
         current_count = query_data.get('计次', 0)
         record_time = query_data.get('运算时间', datetime.now(BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S'))
         
@@ -554,22 +581,31 @@ def main():
     )
     send_telegram_message(start_message)
     
+    # 订阅快照事件：新快照入库后立即检查计次预警，不必等到下一轮
+    subscriber = Subscriber('telegram_signal_system', [SNAPSHOT_CREATED])
+    next_check = 0
+    
     while True:
         try:
-            now = datetime.now(BEIJING_TZ)
-            logging.info(f"\n⏰ 开始检查信号 - {now.strftime('%Y-%m-%d %H:%M:%S')}")
+            if time.monotonic() >= next_check:
+                now = datetime.now(BEIJING_TZ)
+                logging.info(f"\n⏰ 开始检查信号 - {now.strftime('%Y-%m-%d %H:%M:%S')}")
+                
+                # 1. 支撑压力线信号规则未生效，暂不检查（见 check_support_resistance_signals）
+                
+                # 2. 检查计次预警
+                check_count_alerts()
+                
+                # 3. 检查交易信号
+                check_trading_signals()
+                
+                next_check = time.monotonic() + CHECK_INTERVAL
+                logging.info(f"✅ 本轮检查完成，等待事件或{CHECK_INTERVAL}秒...\n")
             
-            # 1. 检查支撑压力线信号
-            check_support_resistance_signals()
-            
-            # 2. 检查计次预警
-            check_count_alerts()
-            
-            # 3. 检查交易信号
-            check_trading_signals()
-            
-            logging.info(f"✅ 本轮检查完成，等待60秒...\n")
-            time.sleep(60)
+            for event in subscriber.wait(timeout=max(0, next_check - time.monotonic())):
+                if event.topic == SNAPSHOT_CREATED:
+                    check_count_alerts()
+                subscriber.ack(event)
             
         except KeyboardInterrupt:
             logging.info("⚠️ 收到停止信号，正在退出...")
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+测试锚点系统批量监控
+验证批量路径写入的极值、监控记录和告警与逐个持仓的旧路径一致
+"""
+
+import os
+import sqlite3
+import tempfile
+
+import anchor_system
+
+
+def make_position(inst_id, pos_side, avg_price, mark_price, size=10.0, lever=10.0):
+    if pos_side == 'short':
+        upl = size * (avg_price - mark_price)
+    else:
+        upl = size * (mark_price - avg_price)
+    margin = size * avg_price / lever
+    return {
+        'instId': inst_id, 'posSide': pos_side, 'pos': str(size),
+        'avgPx': str(avg_price), 'markPx': str(mark_price), 'lever': str(lever),
+        'upl': str(upl), 'margin': str(margin), 'uplRatio': str(upl / margin),
+    }
+
+
+def use_temp_db():
+    anchor_system.DB_PATH = os.path.join(tempfile.mkdtemp(), 'anchor_test.db')
+    anchor_system.TRADE_MODE = 'paper'
+    anchor_system.init_database()
+    conn = sqlite3.connect(anchor_system.DB_PATH)
+    schema = conn.execute("SELECT sql FROM sqlite_master WHERE name = 'anchor_profit_records'").fetchone()[0]
+    conn.execute(schema.replace('anchor_profit_records', 'anchor_paper_profit_records'))
+    conn.commit()
+    conn.close()
+    return anchor_system.DB_PATH
+
+
+def stub_outputs(sent):
+    anchor_system.send_telegram_message = lambda message: sent.append(message) or True
+    anchor_system.get_market_data = lambda: None
+    anchor_system.get_btc_eth_change = lambda: {'BTC': 1.0, 'ETH': -1.0}
+
+
+def legacy_cycle(positions):
+    """原 monitor_positions 的逐个持仓流程"""
+    for pos in positions:
+        profit_rate = anchor_system.calculate_profit_rate(pos)
+        anchor_system.update_profit_record(pos, profit_rate)
+        if anchor_system.ONLY_SHORT and pos['posSide'] != 'short':
+            anchor_system.save_monitor_record(pos, profit_rate)
+            continue
+        alert_type = None
+        if profit_rate >= anchor_system.PROFIT_TARGET:
+            alert_type = 'profit_target'
+        elif profit_rate <= anchor_system.LOSS_LIMIT:
+            alert_type = 'loss_limit'
+        if alert_type:
+            if anchor_system.check_alert_sent_recently(pos['instId'], alert_type, anchor_system.ALERT_COOLDOWN):
+                anchor_system.save_monitor_record(pos, profit_rate, alert_type, alert_sent=0)
+            else:
+                message = anchor_system.format_alert_message(pos, profit_rate, alert_type)
+                ok = anchor_system.send_telegram_message(message)
+                anchor_system.save_monitor_record(pos, profit_rate, alert_type, alert_sent=1 if ok else 0)
+                anchor_system.save_alert_record(pos['instId'], pos['posSide'], profit_rate,
+                                                alert_type, message, 1 if ok else 0)
+        else:
+            anchor_system.save_monitor_record(pos, profit_rate)
+
+
+def dump(db_path):
+    conn = sqlite3.connect(db_path)
+    result = {
+        'extremes': sorted(conn.execute('''
+            SELECT inst_id, pos_side, record_type, round(profit_rate, 6)
+            FROM anchor_paper_profit_records''').fetchall()),
+        'monitors': sorted(conn.execute('''
+            SELECT inst_id, pos_side, round(profit_rate, 6), alert_type, alert_sent
+            FROM anchor_monitors''').fetchall(), key=repr),
+        'alerts': sorted(conn.execute('''
+            SELECT inst_id, pos_side, alert_type, sent_status FROM anchor_alerts''').fetchall()),
+    }
+    conn.close()
+    return result
+
+
+CYCLES = [
+    [make_position('BTC-USDT-SWAP', 'short', 100, 99),
+     make_position('ETH-USDT-SWAP', 'short', 100, 95),
+     make_position('SOL-USDT-SWAP', 'long', 100, 101),
+     make_position('DOGE-USDT-SWAP', 'short', 100, 101)],
+    [make_position('BTC-USDT-SWAP', 'short', 100, 98),       # 刷新最高收益
+     make_position('ETH-USDT-SWAP', 'short', 100, 94),       # 盈利目标，冷却中
+     make_position('SOL-USDT-SWAP', 'long', 100, 99),        # 非做空，只记录极值
+     make_position('DOGE-USDT-SWAP', 'short', 100, 102)],    # 刷新最大亏损 + 止损
+    [make_position('BTC-USDT-SWAP', 'short', 100, 98.5),
+     make_position('ETH-USDT-SWAP', 'short', 100, 93),
+     make_position('DOGE-USDT-SWAP', 'short', 100, 103)],
+]
+
+
+def test_batch_matches_legacy():
+    sent_batch, sent_legacy = [], []
+
+    batch_db = use_temp_db()
+    stub_outputs(sent_batch)
+    for positions in CYCLES:
+        anchor_system.get_positions = lambda positions=positions: positions
+        anchor_system.monitor_positions()
+    batch = dump(batch_db)
+
+    legacy_db = use_temp_db()
+    stub_outputs(sent_legacy)
+    for positions in CYCLES:
+        legacy_cycle(positions)
+    legacy = dump(legacy_db)
+
+    assert batch == legacy
+    assert len(sent_batch) == len(sent_legacy)
+    assert any(a[2] == 'extreme_max_profit' for a in batch['alerts'])
+    assert any(a[2] == 'extreme_max_loss' for a in batch['alerts'])
+    print(f"✅ 批量监控与逐个处理结果一致: {len(batch['monitors'])} 条监控记录, "
+          f"{len(batch['alerts'])} 条告警, {len(sent_batch)} 条消息")
+
+
+def test_evaluate_cooldown_in_memory():
+    """同一轮内同币种同类告警只发送一次"""
+    positions = [make_position('ETH-USDT-SWAP', 'short', 100, 50),
+                 make_position('ETH-USDT-SWAP', 'short', 100, 40, size=5)]
+    decisions = anchor_system.evaluate_positions(positions, {}, set())
+    assert [d['send_alert'] for d in decisions] == [True, False]
+    assert all(d['alert_type'] == 'profit_target' for d in decisions)
+    print("✅ 内存中的告警冷却判断正确")
+
+
+if __name__ == '__main__':
+    test_batch_matches_legacy()
+    test_evaluate_cooldown_in_memory()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+测试按功能注册 Blueprint 的应用工厂
+验证全部功能时路由与拆分前一致、只启用部分功能时不导入其他功能和重依赖、
+未知功能名报错、拆分后的接口可以正常请求
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+from app_factory import FEATURES, create_app, parse_features
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _rules(app):
+    return {(rule.rule, rule.endpoint.split('.')[-1]) for rule in app.url_map.iter_rules()}
+
+
+def test_all_features():
+    """默认启用全部功能，路由数与拆分前的 app_new.py 相同"""
+    app = create_app('all')
+    assert len(list(app.url_map.iter_rules())) == 302
+    profile = app.extensions['feature_profile']
+    assert [item['feature'] for item in profile] == list(FEATURES)
+    assert all(item['routes'] > 0 for item in profile)
+    # 同一路径注册了多次时，先注册的 trading 优先匹配（与拆分前相同）
+    adapter = app.url_map.bind('localhost')
+    assert adapter.match('/api/trading/decisions')[0] == 'trading.get_trading_decisions'
+    print(f"✅ 全部功能共 {len(_rules(app))} 个路由")
+
+
+def test_subset_features():
+    """只注册启用的功能；system 总是启用；未知功能名报错"""
+    assert parse_features('sar_slope, market') == ['market', 'system', 'sar_slope']
+    assert parse_features(['all']) == list(FEATURES)
+
+    app = create_app('sar_slope')
+    endpoints = {rule.endpoint.split('.')[0] for rule in app.url_map.iter_rules()}
+    assert endpoints == {'static', 'sar_slope', 'system'}, endpoints
+
+    try:
+        create_app('sar_slope,no_such_feature')
+    except ValueError as e:
+        assert 'no_such_feature' in str(e)
+    else:
+        raise AssertionError('未知功能应当报错')
+    print("✅ 只注册启用的功能")
+
+
+def test_subset_does_not_import_others():
+    """未启用的功能模块和 numpy 等重依赖不会被导入"""
+    code = (
+        "import json, sys\n"
+        "import app_new\n"
+        "print(json.dumps(sorted(sys.modules)))\n"
+    )
+    env = dict(os.environ, WEBAPP_FEATURES='market,sar_slope')
+    output = subprocess.run([sys.executable, '-c', code], cwd=HERE, env=env, capture_output=True, text=True,
+                            check=True).stdout
+    modules = set(json.loads(output.strip().splitlines()[-1]))
+    assert {'market_api', 'sar_slope_api', 'system_api'} <= modules
+    for name in ('anchor_api', 'gdrive_api', 'trading_api', 'numpy', 'candle_store', 'cold_archive'):
+        assert name not in modules, name
+    print("✅ 未启用的功能和重依赖不导入")
+
+
+def test_requests():
+    """拆分后的接口可以正常请求，K线常驻内存未使用时不加载"""
+    client = create_app('system').test_client()
+    response = client.get('/api/cache/stats')
+    data = response.get_json()
+    assert response.status_code == 200 and data['success'], data
+    assert data['worker_pid'] == os.getpid()
+    assert data['candle_store'] is None
+    print("✅ 拆分后的接口正常响应")
+
+
+if __name__ == '__main__':
+    test_all_features()
+    test_subset_features()
+    test_subset_does_not_import_others()
+    test_requests()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+测试异步批量 SQLite 写入器
+验证同主键合并、executemany 追加、刷新回调与统计
+"""
+
+import asyncio
+import os
+import sqlite3
+import tempfile
+
+from async_sqlite_writer import AsyncSQLiteWriter
+
+
+def _make_db():
+    path = os.path.join(tempfile.mkdtemp(), 'writer_test.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE latest (symbol TEXT PRIMARY KEY, price REAL)')
+    conn.execute('CREATE TABLE history (symbol TEXT, ts INTEGER, price REAL)')
+    conn.execute('CREATE TABLE status (id INTEGER PRIMARY KEY, flushes INTEGER)')
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_coalesce_and_batch():
+    """同一窗口内同主键只写最后一次，追加行全部写入"""
+    path = _make_db()
+    flushes = []
+
+    def on_flush(cursor, written):
+        flushes.append(written)
+        cursor.execute('INSERT OR REPLACE INTO status VALUES (1, ?)', (len(flushes),))
+
+    async def run():
+        writer = AsyncSQLiteWriter(path, flush_interval=0.2, on_flush=on_flush)
+        writer.start()
+        for i in range(100):
+            writer.upsert('BTC', 'INSERT OR REPLACE INTO latest VALUES (?, ?)', ('BTC', float(i)))
+            writer.append('INSERT INTO history VALUES (?, ?, ?)', ('BTC', i, float(i)))
+        writer.upsert('ETH', 'INSERT OR REPLACE INTO latest VALUES (?, ?)', ('ETH', 1.0))
+        assert writer.stats()['queue_depth'] > 0
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(run())
+
+    conn = sqlite3.connect(path)
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert dict(conn.execute('SELECT symbol, price FROM latest').fetchall()) == {'BTC': 99.0, 'ETH': 1.0}
+    assert conn.execute('SELECT COUNT(*) FROM history').fetchone()[0] == 100
+    assert conn.execute('SELECT flushes FROM status').fetchone()[0] == len(flushes)
+    conn.close()
+
+    assert stats['enqueued'] == 201
+    assert stats['requests_written'] == 201
+    assert stats['coalesced'] == 99
+    assert stats['rows_written'] == 102
+    assert stats['queue_depth'] == 0
+    assert stats['flushes'] >= 1 and stats['max_flush_ms'] >= stats['last_flush_ms'] >= 0
+    print(f"✅ 合并写入正确: {stats}")
+
+
+def test_failed_batch_is_reported():
+    """失败的批次回滚并计入 errors，写入器继续工作"""
+    path = _make_db()
+
+    async def run():
+        writer = AsyncSQLiteWriter(path, flush_interval=0.05)
+        writer.start()
+        writer.append('INSERT INTO missing_table VALUES (?)', (1,))
+        await asyncio.sleep(0.2)
+        writer.append('INSERT INTO history VALUES (?, ?, ?)', ('BTC', 1, 1.0))
+        await writer.stop()
+        return writer.stats()
+
+    stats = asyncio.run(run())
+    conn = sqlite3.connect(path)
+    assert conn.execute('SELECT COUNT(*) FROM history').fetchone()[0] == 1
+    conn.close()
+    assert stats['errors'] == 1
+    print("✅ 失败批次处理正确")
+
+
+if __name__ == '__main__':
+    test_coalesce_and_batch()
+    test_failed_batch_is_reported()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+测试内存K线存储
+验证追加/覆盖/乱序写入、保留窗口、零拷贝视图，以及与 okex_kline_ohlc 的增量同步
+"""
+
+import random
+import sqlite3
+import time
+
+import numpy as np
+
+from candle_store import CandleSeries, CandleStore
+
+STEP_MS = 5 * 60 * 1000
+
+
+def make_db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE okex_kline_ohlc (
+            symbol TEXT, timeframe TEXT, timestamp INTEGER,
+            open REAL, high REAL, low REAL, close REAL, volume REAL, created_at TEXT,
+            PRIMARY KEY (symbol, timeframe, timestamp)
+        )
+    ''')
+    return conn
+
+
+def insert(conn, symbol, timeframe, rows):
+    conn.executemany('INSERT OR REPLACE INTO okex_kline_ohlc VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL)',
+                     [(symbol, timeframe) + row for row in rows])
+    conn.commit()
+
+
+def random_rows(count, start_ts=1700000000000, seed=5):
+    rng = random.Random(seed)
+    rows, price = [], 100.0
+    for i in range(count):
+        close = price * (1 + rng.gauss(0, 0.003))
+        rows.append((start_ts + i * STEP_MS, price, max(price, close) * 1.001,
+                     min(price, close) * 0.999, close, rng.uniform(1, 100)))
+        price = close
+    return rows
+
+
+def test_series_matches_reference():
+    """随机追加/覆盖/乱序写入，与字典参考实现一致"""
+    rng = random.Random(11)
+    series = CandleSeries(retention=50)
+    reference = {}
+    ts = 0
+    for _ in range(2000):
+        action = rng.random()
+        if action < 0.7 or not reference:
+            ts += STEP_MS
+        elif action < 0.9:
+            pass  # 覆盖最后一根
+        else:
+            ts_old = rng.choice(sorted(reference)[-40:]) - rng.choice([0, STEP_MS // 2])
+            values = tuple(rng.random() for _ in range(5))
+            series.upsert(ts_old, values)
+            reference[ts_old] = values
+            continue
+        values = tuple(rng.random() for _ in range(5))
+        series.upsert(ts, values)
+        reference[ts] = values
+
+    expected = sorted(reference.items())[-50:]
+    candles = series.view()
+    assert candles.timestamp.tolist() == [t for t, _ in expected]
+    assert np.allclose(np.vstack(candles[1:]).T, [v for _, v in expected])
+    print(f"✅ 环形缓冲与参考实现一致 ({len(candles)} 根)")
+
+
+def test_views_are_zero_copy_and_stable():
+    series = CandleSeries(retention=10)
+    for i in range(10):
+        series.upsert(i, (i, i, i, i, i))
+    view = series.tail(5)
+    assert view.close.base is not None  # 视图而非拷贝
+    assert not view.close.flags.writeable
+
+    # 继续追加直到触发压缩，已返回的视图内容不变
+    for i in range(10, 40):
+        series.upsert(i, (i, i, i, i, i))
+    assert view.timestamp.tolist() == [5, 6, 7, 8, 9]
+    assert series.tail(3).timestamp.tolist() == [37, 38, 39]
+    assert len(series) == 10
+    assert series.between(32, 34).timestamp.tolist() == [32, 33, 34]
+    assert len(series.between(100, 200)) == 0
+    print("✅ 切片为只读视图，压缩后旧视图保持不变")
+
+
+def test_sync_with_database():
+    conn = make_db()
+    rows = random_rows(3000)
+    insert(conn, 'BTC-USDT-SWAP', '5m', rows[:2990])
+
+    store = CandleStore(days=10, sync_interval=0)
+    assert store.retention('5m') == 2880 and store.retention('1H') == 240
+    assert store.sync(conn, 'BTC-USDT-SWAP', '5m') == 2880
+
+    # 最后一根更新 + 10根新K线
+    insert(conn, 'BTC-USDT-SWAP', '5m', [rows[2989][:4] + (rows[2989][4] * 1.01, 7.0)] + rows[2990:])
+    assert store.sync(conn, 'BTC-USDT-SWAP', '5m') == 11
+
+    expected = conn.execute('''
+        SELECT timestamp, open, high, low, close, volume FROM (
+            SELECT * FROM okex_kline_ohlc WHERE symbol = ? AND timeframe = ?
+            ORDER BY timestamp DESC LIMIT 2880
+        ) ORDER BY timestamp ASC
+    ''', ('BTC-USDT-SWAP', '5m')).fetchall()
+    assert store.tail('BTC-USDT-SWAP', '5m', 2880).rows() == expected
+    assert store.tail('ETH-USDT-SWAP', '5m') is None
+
+    # 同步间隔内不查询数据库
+    slow = CandleStore(sync_interval=60)
+    slow.sync(conn, 'BTC-USDT-SWAP', '5m')
+    insert(conn, 'BTC-USDT-SWAP', '5m', random_rows(1, start_ts=rows[-1][0] + STEP_MS))
+    assert slow.sync(conn, 'BTC-USDT-SWAP', '5m') == 0
+    assert slow.sync(conn, 'BTC-USDT-SWAP', '5m', force=True) == 2
+
+    # 采集器推送（OKEx 原始字符串）
+    slow.append('BTC-USDT-SWAP', '5m', [str(rows[-1][0] + 2 * STEP_MS), '1', '2', '0.5', '1.5', '10', '0'])
+    assert slow.tail('BTC-USDT-SWAP', '5m', 1).close.tolist() == [1.5]
+
+    started = time.perf_counter()
+    for _ in range(1000):
+        store.tail('BTC-USDT-SWAP', '5m', 2880)
+    per_query_ms = (time.perf_counter() - started)
+    assert per_query_ms < 1.0
+    print(f"✅ 增量同步与数据库一致，切片查询 {per_query_ms * 1000:.1f}µs/次, 统计: {store.get_stats()}")
+
+
+if __name__ == '__main__':
+    test_series_matches_reference()
+    test_views_are_zero_copy_and_stable()
+    test_sync_with_database()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+测试冷数据归档
+验证归档后 SQLite 只保留近期数据，查询门面的结果与归档前直接查 SQLite 一致，
+同一天重复归档（晚到的数据）按 rowid 合并，NULL 和文本列无损
+"""
+
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+from cold_archive import BEIJING_TZ, ArchivedTable
+from db_access import get_connection
+
+NOW = datetime(2025, 12, 20, 12, 0, tzinfo=BEIJING_TZ)
+HOUR_MS = 60 * 60 * 1000
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _setup(db):
+    conn = sqlite3.connect(db)
+    conn.execute('''
+        CREATE TABLE fund_monitor_aggregated (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT NOT NULL, timestamp INTEGER NOT NULL, collect_time TEXT NOT NULL,
+            interval_type TEXT NOT NULL, volume REAL NOT NULL, avg_3day REAL, is_abnormal INTEGER DEFAULT 0,
+            UNIQUE(symbol, timestamp, interval_type)
+        )
+    ''')
+    start = int((NOW - timedelta(days=10)).timestamp() * 1000)
+    rows = []
+    for hour in range(10 * 24):
+        ts = start + hour * HOUR_MS
+        collect_time = datetime.fromtimestamp(ts / 1000, BEIJING_TZ).strftime('%Y-%m-%d %H:%M:%S')
+        for symbol in ('BTC', 'ETH'):
+            for interval in ('15min', '60min'):
+                avg = None if hour % 7 == 0 else hour * 1.5
+                rows.append((symbol, ts, collect_time, interval, hour + 0.25, avg, hour % 2))
+    conn.executemany('''
+        INSERT INTO fund_monitor_aggregated (symbol, timestamp, collect_time, interval_type, volume, avg_3day, is_abnormal)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    return conn, start
+
+
+COLUMNS = ('timestamp', 'collect_time', 'volume', 'avg_3day', 'is_abnormal')
+
+
+def _queries(table, conn, start):
+    where = {'interval_type': '15min'}
+    return [
+        table.query(conn, 'BTC', COLUMNS, where=where),
+        table.query(conn, 'BTC', COLUMNS, start=start + 30 * HOUR_MS, where=where),
+        table.query(conn, 'ETH', COLUMNS, start=start + 30 * HOUR_MS, end=start + 200 * HOUR_MS,
+                    where={'interval_type': '60min'}, descending=True),
+        table.query(conn, 'BTC', COLUMNS, where=where, descending=True, limit=150),
+        table.query(conn, 'BTC', COLUMNS, where=where, limit=50),
+        table.query(conn, 'ETH', ('id', 'symbol'), descending=True, limit=3),
+        table.query(conn, 'DOGE', COLUMNS),
+    ]
+
+
+def test_archive_and_query():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'fund_monitor.db')
+        raw, start = _setup(db)
+        table = ArchivedTable(db, 'fund_monitor_aggregated', 'symbol', 'timestamp',
+                              archive_after_days=3, root=os.path.join(tmp, 'archive'))
+        conn = get_connection(db)
+        before = _queries(table, conn, start)
+        assert len(before[0]) == 240 and before[5][0][1] == 'ETH'
+
+        assert table.archive(now=NOW, dry_run=True)['rows'] > 0
+        result = table.archive(now=NOW)
+        cutoff = table.cutoff(now=NOW)
+        assert result['rows'] == 156 * 4   # 12-10 12:00 ~ 12-17 00:00，2个币种 x 2个周期
+        assert raw.execute('SELECT MIN(timestamp) FROM fund_monitor_aggregated').fetchone()[0] >= cutoff
+        assert len(table.archived_days('BTC')) == result['days'] == 7
+        assert result['files'] == 14
+
+        after = _queries(table, conn, start)
+        assert after == before
+        assert any(row[3] is None for row in after[0])
+
+        # 归档过的日期又写入了晚到的数据：再次归档时合并进同一个文件
+        raw.execute('''
+            INSERT INTO fund_monitor_aggregated (symbol, timestamp, collect_time, interval_type, volume, avg_3day)
+            VALUES ('BTC', ?, '晚到', '15min', 1.0, NULL)
+        ''', (start + HOUR_MS // 2,))
+        raw.commit()
+        expected = _queries(table, conn, start)
+        assert len(expected[0]) == 241
+        again = table.archive(now=NOW)
+        assert again['rows'] == 1 and again['files'] == 1
+        assert _queries(table, conn, start) == expected
+        assert table.archive(now=NOW)['rows'] == 0
+        conn.close()
+        raw.close()
+        print(f"✅ 归档 {result['rows']} 行到 {result['files']} 个文件，查询结果与归档前一致")
+
+
+def test_interrupted_delete():
+    """文件已写入但删除行的事务没有提交：查询不返回重复行，下次归档合并后删除"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'fund_monitor.db')
+        raw, start = _setup(db)
+        table = ArchivedTable(db, 'fund_monitor_aggregated', 'symbol', 'timestamp',
+                              archive_after_days=3, root=os.path.join(tmp, 'archive'))
+        conn = get_connection(db)
+        before = _queries(table, conn, start)
+        cutoff = table.cutoff(now=NOW)
+        old_rows = raw.execute('SELECT * FROM fund_monitor_aggregated WHERE timestamp < ?', (cutoff,)).fetchall()
+
+        result = table.archive(now=NOW)
+        assert result['rows'] == len(old_rows)
+        # 模拟删除回滚：行按原 rowid（id）回到 SQLite，归档文件已存在
+        raw.executemany('INSERT INTO fund_monitor_aggregated VALUES (?, ?, ?, ?, ?, ?, ?, ?)', old_rows)
+        raw.commit()
+        assert _queries(table, conn, start) == before
+
+        again = table.archive(now=NOW)
+        assert again['rows'] == len(old_rows) and again['files'] == result['files']
+        assert raw.execute('SELECT COUNT(*) FROM fund_monitor_aggregated WHERE timestamp < ?',
+                           (cutoff,)).fetchone()[0] == 0
+        assert _queries(table, conn, start) == before
+        conn.close()
+        raw.close()
+        print("✅ 删除中断后查询按 rowid 去重，再次归档合并")
+
+
+def test_text_time_column():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'crypto_data.db')
+        raw = sqlite3.connect(db)
+        raw.execute('CREATE TABLE price_breakthrough_events (id INTEGER PRIMARY KEY, symbol TEXT, '
+                    'event_type TEXT, price REAL, event_time TEXT)')
+        raw.executemany('INSERT INTO price_breakthrough_events (symbol, event_type, price, event_time) '
+                        'VALUES (?, ?, ?, ?)', [
+                            ('BTC', 'new_high', 100.5, '2025-12-01 08:00:00'),
+                            ('BTC', 'new_low', None, '2025-12-01 23:59:59'),
+                            ('BTC', 'new_high', 120, '2025-12-19 10:00:00'),
+                        ])
+        raw.commit()
+        table = ArchivedTable(db, 'price_breakthrough_events', 'symbol', 'event_time',
+                              time_kind='text', archive_after_days=5, root=os.path.join(tmp, 'archive'))
+        assert table.archive(now=NOW)['rows'] == 2
+        assert table.archived_days('BTC') == ['2025-12-01']
+
+        conn = get_connection(db)
+        rows = table.query(conn, 'BTC', ('event_type', 'price', 'event_time'),
+                           start='2025-12-01 12:00:00', end='2025-12-31 00:00:00')
+        assert rows == [('new_low', None, '2025-12-01 23:59:59'), ('new_high', 120.0, '2025-12-19 10:00:00')]
+        assert table.query(conn, 'BTC', ('price',), where={'event_type': 'new_high'}) == [(100.5,), (120.0,)]
+        conn.close()
+        raw.close()
+        print("✅ 文本时间列按北京时间日期归档")
+
+
+def test_archive_all_keeps_query_history():
+    """定时归档后，/api/query 查询30天前的快照仍能返回币种数据"""
+    with tempfile.TemporaryDirectory() as tmp:
+        day = (datetime.now(BEIJING_TZ) - timedelta(days=40)).strftime('%Y-%m-%d')
+        snapshot_time = f'{day} 10:00:00'
+        raw = sqlite3.connect(os.path.join(tmp, 'crypto_data.db'))
+        raw.execute('''CREATE TABLE crypto_snapshots (id INTEGER PRIMARY KEY, snapshot_date TEXT, snapshot_time TEXT,
+                       rush_up INTEGER, rush_down INTEGER, diff INTEGER, count INTEGER, ratio REAL, status TEXT,
+                       round_rush_up INTEGER, round_rush_down INTEGER, price_lowest INTEGER, price_newhigh INTEGER,
+                       count_score_display TEXT, count_score_type TEXT, rise_24h_count INTEGER,
+                       fall_24h_count INTEGER)''')
+        raw.execute('''CREATE TABLE crypto_coin_data (id INTEGER PRIMARY KEY, snapshot_time TEXT, symbol TEXT,
+                       index_order INTEGER, change REAL, rush_up INTEGER, rush_down INTEGER, update_time TEXT,
+                       high_price REAL, high_time TEXT, decline REAL, change_24h REAL, rank INTEGER,
+                       current_price REAL, priority_level TEXT, ratio1 TEXT, ratio2 TEXT)''')
+        raw.execute('''CREATE TABLE price_breakthrough_events (id INTEGER PRIMARY KEY, symbol TEXT,
+                       event_type TEXT, price REAL, event_time TEXT)''')
+        raw.execute('''CREATE TABLE okex_kline_ohlc (id INTEGER PRIMARY KEY, symbol TEXT, timeframe TEXT,
+                       timestamp INTEGER, close REAL)''')
+        raw.execute("INSERT INTO crypto_snapshots (snapshot_date, snapshot_time, rush_up, count) VALUES (?, ?, 3, 2)",
+                    (day, snapshot_time))
+        raw.executemany("INSERT INTO crypto_coin_data (snapshot_time, symbol, index_order, change_24h) "
+                        "VALUES (?, ?, ?, ?)", [(snapshot_time, 'BTC', 1, 1.5), (snapshot_time, 'ETH', 2, -0.5)])
+        raw.execute("INSERT INTO price_breakthrough_events (symbol, event_type, price, event_time) "
+                    "VALUES ('BTC', 'new_high', 100.0, ?)", (snapshot_time,))
+        old_ms = int((datetime.now(BEIJING_TZ) - timedelta(days=40)).timestamp() * 1000)
+        raw.execute("INSERT INTO okex_kline_ohlc (symbol, timeframe, timestamp, close) VALUES ('BTC', '5m', ?, 1.0)",
+                    (old_ms,))
+        raw.commit()
+        raw.close()
+
+        code = (
+            "import json, sys\n"
+            "from cold_archive import archive_all\n"
+            "from app_factory import create_app\n"
+            "results = {r['table']: r['rows'] for r in archive_all()}\n"
+            "data = create_app('market').test_client().get('/api/query', query_string={'time': sys.argv[1]})\n"
+            "print(json.dumps([results, data.get_json()]))\n"
+        )
+        env = dict(os.environ, WEBAPP_DB_DIR=tmp, COLD_ARCHIVE_DIR=os.path.join(tmp, 'archive'))
+        output = subprocess.run([sys.executable, '-c', code, day], cwd=HERE, env=env, capture_output=True,
+                                text=True, check=True).stdout
+        results, data = json.loads(output.strip().splitlines()[-1])
+
+        # 确实执行了归档，但没有门面读取方的表不归档
+        assert results.get('okex_kline_ohlc') == 1, results
+        assert 'crypto_coin_data' not in results and 'price_breakthrough_events' not in results, results
+        assert data['snapshot_time'] == snapshot_time, data
+        assert [coin['symbol'] for coin in data['coins']] == ['BTC', 'ETH'], data
+        raw = sqlite3.connect(os.path.join(tmp, 'crypto_data.db'))
+        assert raw.execute('SELECT COUNT(*) FROM price_breakthrough_events').fetchone()[0] == 1
+        raw.close()
+        print("✅ 定时归档后 /api/query 历史快照仍有币种数据")
+
+
+if __name__ == '__main__':
+    test_archive_and_query()
+    test_interrupted_delete()
+    test_text_time_column()
+    test_archive_all_keeps_query_history()
+    print("\n✅ 所有测试通过")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+测试统一SQLite访问层
+验证线程内连接复用、PRAGMA、句柄级row_factory、事务与锁等待统计
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import db_access
+
+
+def use_temp_dir():
+    db_access.DB_DIR = tempfile.mkdtemp()
+    db_access.close_thread_connections()
+    return db_access.get_db_path('crypto_data')
+
+
+def test_reuse_and_pragmas():
+    path = use_temp_dir()
+    assert path == os.path.join(db_access.DB_DIR, 'crypto_data.db')
+
+    first = db_access.get_connection('crypto_data')
+    raw = first._conn
+    assert first.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    assert first.execute('PRAGMA synchronous').fetchone()[0] == 1
+    first.close()
+
+    second = db_access.get_connection(path)
+    assert second._conn is raw
+
+    other_thread = []
+    t = threading.Thread(target=lambda: other_thread.append(db_access.get_connection('crypto_data')._conn))
+    t.start()
+    t.join()
+    assert other_thread[0] is not raw
+    print("✅ 同线程复用连接，不同线程独立连接，WAL已启用")
+
+
+def test_handle_row_factory_and_release():
+    use_temp_dir()
+    conn = db_access.get_connection('crypto_data')
+    conn.execute('CREATE TABLE t (id INTEGER PRIMARY KEY, name TEXT)')
+    conn.execute("INSERT INTO t (name) VALUES ('a')")
+    conn.commit()
+
+    # 嵌套句柄：内层的 row_factory 不影响外层
+    inner = db_access.get_connection('crypto_data')
+    inner.row_factory = sqlite3.Row
+    assert inner.execute('SELECT name FROM t').fetchone()['name'] == 'a'
+    inner.close()
+    assert conn.execute('SELECT name FROM t').fetchone() == ('a',)
+
+    # 最外层句柄归还时回滚未提交的写入
+    conn.execute("INSERT INTO t (name) VALUES ('b')")
+    conn.close()
+    check = db_access.get_connection('crypto_data')
+    assert check.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+
+    # 忘记 close 的句柄被回收时同样归还
+    leaked = db_access.get_connection('crypto_data')
+    leaked.execute("INSERT INTO t (name) VALUES ('c')")
+    del leaked
+    check.close()
+    check = db_access.get_connection('crypto_data')
+    assert check.execute('SELECT COUNT(*) FROM t').fetchone()[0] == 1
+    check.close()
+    print("✅ 句柄级row_factory，归还时回滚未提交事务")
+
+
+def test_transaction_and_lock_wait_stats():
+    path = use_temp_dir()
+    with db_access.transaction('crypto_data') as conn:
+        conn.execute('CREATE TABLE t (v INTEGER)')
+        conn.execute('INSERT INTO t VALUES (1)')
+
+    # 另一个连接持有写锁 0.2 秒
+    holder = sqlite3.connect(path, check_same_thread=False)
+    holder.execute('BEGIN IMMEDIATE')
+    threading.Timer(0.2, holder.commit).start()
+
+    started = time.perf_counter()
+    with db_access.transaction('crypto_data') as conn:
+        conn.execute('INSERT INTO t VALUES (2)')
+    assert time.perf_counter() - started >= 0.15
+
+    try:
+        with db_access.transaction('crypto_data') as conn:
+            conn.execute('INSERT INTO t VALUES (3)')
+            raise ValueError('boom')
+    except ValueError:
+        pass
+
+    conn = db_access.get_connection('crypto_data')
+    assert [r[0] for r in conn.execute('SELECT v FROM t ORDER BY v')] == [1, 2]
+    conn.close()
+
+    stats = db_access.get_stats()['crypto_data.db']
+    assert stats['write_transactions'] >= 3
+    assert stats['lock_waits'] >= 1 and stats['lock_wait_ms_max'] >= 150
+    print(f"✅ 事务提交/回滚正确，锁等待已计量: {stats}")
+
+
+if __name__ == '__main__':
+    test_reuse_and_pragmas()
+    test_handle_row_factory_and_release()
+    test_transaction_and_lock_wait_stats()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+测试事件总线
+验证发布/订阅顺序、持久化游标、去重、跨进程唤醒和处理失败跳过
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from event_bus import Subscriber, get_stats, publish, publish_many
+
+
+def test_order_cursor_and_dedup():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'bus.db')
+        publish('a', {'n': 0}, db=db)
+
+        latest = Subscriber('latest', ['a', 'b'], db=db)
+        earliest = Subscriber('earliest', ['a'], start='earliest', db=db)
+        assert latest.poll() == []
+        assert [e.payload['n'] for e in earliest.poll()] == [0]
+
+        publish('a', {'n': 1}, db=db)
+        publish('b', {'n': 2}, db=db)
+        publish('c', {'n': 3}, db=db)
+        events = latest.poll()
+        assert [(e.topic, e.payload['n']) for e in events] == [('a', 1), ('b', 2)]
+
+        # 只确认第一条，新实例从断点继续
+        latest.ack(events[0])
+        resumed = Subscriber('latest', ['a', 'b'], db=db)
+        assert [e.payload['n'] for e in resumed.poll()] == [2]
+
+        # 去重键
+        ids = publish_many('a', [{'n': 4}, {'n': 5}], ['k', 'k'], db=db)
+        assert ids[0] is not None and ids[1] is None
+        assert publish('a', {'n': 6}, dedup_key='k', db=db) is None
+
+        stats = get_stats(db=db)
+        assert stats['topics']['a']['events'] == 3
+        assert stats['consumers']['latest']['b']['backlog'] == 1
+        print(f"✅ 顺序/游标/去重正确: {stats['consumers']}")
+
+
+def test_wait_wakes_on_publish():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'bus.db')
+        subscriber = Subscriber('waiter', ['a'], poll_interval=0.02, db=db)
+
+        # 超时返回空列表
+        started = time.monotonic()
+        assert subscriber.wait(timeout=0.1) == []
+        assert time.monotonic() - started >= 0.1
+
+        # 同进程其他线程发布
+        threading.Timer(0.1, publish, args=('a', {'from': 'thread'}), kwargs={'db': db}).start()
+        started = time.monotonic()
+        events = subscriber.wait(timeout=5)
+        assert [e.payload['from'] for e in events] == ['thread']
+        assert time.monotonic() - started < 1
+        subscriber.ack(events[0])
+
+        # 其他进程发布（PRAGMA data_version 变化）
+        script = f"import time; time.sleep(0.2); from event_bus import publish; publish('a', {{'from': 'process'}}, db={db!r})"
+        process = subprocess.Popen([sys.executable, '-c', script], cwd=os.path.dirname(os.path.abspath(__file__)))
+        events = subscriber.wait(timeout=10)
+        process.wait()
+        assert [e.payload['from'] for e in events] == ['process']
+        print("✅ wait 在发布后立即唤醒（线程/进程）")
+
+
+def test_listen_skips_failed_handler():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'bus.db')
+        subscriber = Subscriber('listener', ['a'], db=db)
+        for n in range(3):
+            publish('a', {'n': n}, db=db)
+
+        handled = []
+
+        def handler(event):
+            if event.payload['n'] == 1:
+                raise ValueError('boom')
+            handled.append(event.payload['n'])
+
+        subscriber.listen(handler, timeout=0.05, stop=lambda: len(handled) >= 2)
+        assert handled == [0, 2]
+        assert Subscriber('listener', ['a'], db=db).poll() == []
+        print("✅ 处理失败的事件被跳过，游标已前进")
+
+
+if __name__ == '__main__':
+    test_order_cursor_and_dedup()
+    test_wait_wakes_on_publish()
+    test_listen_skips_failed_handler()
+    print("\n✅ 所有测试通过")
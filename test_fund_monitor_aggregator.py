@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+测试资金监控增量聚合
+同一串5分钟成交量（含重复采集、缺失K线、3天以上的历史）分别用原来的 SUM/AVG 查询和
+FundAggregator 处理，聚合表和异常历史必须一致；中途重启后从数据库恢复的结果也一致
+"""
+
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+
+_tmp = tempfile.mkdtemp()
+_cwd = os.getcwd()
+os.chdir(_tmp)   # 采集器导入时在当前目录创建日志文件
+sys.path.insert(0, _cwd)
+import fund_monitor_collector as collector
+os.chdir(_cwd)
+
+from fund_monitor_aggregator import FundAggregator
+
+FIVE_MIN = 5 * 60 * 1000
+SYMBOLS = ('BTC', 'ETH', 'SOL')
+
+
+def _make_db(path):
+    collector.DB_FILE = path
+    collector.init_database()
+    conn = sqlite3.connect(path)
+    conn.execute('''
+        CREATE TABLE fund_monitor_abnormal_history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT, interval_type TEXT, timestamp INTEGER, collect_time TEXT, collect_date TEXT,
+            volume REAL, avg_3day REAL, deviation_percent REAL, deviation_type TEXT, severity TEXT
+        )
+    ''')
+    conn.commit()
+    return conn
+
+
+def _bars(count=4 * 288):
+    rng = random.Random(11)
+    start = 1765000800000
+    bars = []
+    for i in range(count):
+        ts = start + i * FIVE_MIN
+        for symbol in SYMBOLS:
+            if rng.random() < 0.05:
+                continue    # 缺失的K线
+            volume = rng.uniform(1e5, 5e6) * (3 if rng.random() < 0.03 else 1)
+            bars.append((symbol, ts, round(volume, 2)))
+            if rng.random() < 0.1:
+                bars.append((symbol, ts, round(volume * 1.2, 2)))   # 未收盘K线被重复采集
+    return bars
+
+
+def _process_sql(conn, symbol, ts, volume):
+    collector.store_5min_data(conn, symbol, ts, volume)
+    for interval in (15, 30, 60):
+        agg = collector.calculate_aggregated_volume(conn, symbol, ts, interval)
+        avg = collector.calculate_3day_average(conn, symbol, ts, interval)
+        collector.store_aggregated_data(conn, symbol, ts, interval, agg, avg)
+
+
+def _process_incremental(conn, aggregator, symbol, ts, volume):
+    collector.store_5min_data(conn, symbol, ts, volume)
+    for interval, (agg, avg) in aggregator.update(symbol, ts, volume).items():
+        collector.store_aggregated_data(conn, symbol, ts, interval, agg, avg)
+
+
+def _dump(conn):
+    aggregated = conn.execute('''
+        SELECT symbol, timestamp, interval_type, volume, avg_3day, deviation_percent, is_abnormal
+        FROM fund_monitor_aggregated ORDER BY symbol, timestamp, interval_type
+    ''').fetchall()
+    abnormal = conn.execute('''
+        SELECT symbol, interval_type, timestamp, deviation_type, severity
+        FROM fund_monitor_abnormal_history ORDER BY id
+    ''').fetchall()
+    return aggregated, abnormal
+
+
+def _close(a, b):
+    return a == b or (a is not None and b is not None and abs(a - b) <= 1e-9 * max(1.0, abs(a)))
+
+
+def test_matches_sql_queries():
+    collector.logging.disable(collector.logging.CRITICAL)
+    sql_conn = _make_db(os.path.join(_tmp, 'sql.db'))
+    inc_conn = _make_db(os.path.join(_tmp, 'incremental.db'))
+    bars = _bars()
+    restart_at = len(bars) * 2 // 3
+
+    aggregator = FundAggregator()
+    aggregator.restore(inc_conn)
+    for i, (symbol, ts, volume) in enumerate(bars):
+        _process_sql(sql_conn, symbol, ts, volume)
+        if i == restart_at:
+            inc_conn.commit()
+            aggregator = FundAggregator()     # 模拟采集器重启
+            restored = aggregator.restore(inc_conn, SYMBOLS)
+            assert restored['aggregated'] > 0
+        _process_incremental(inc_conn, aggregator, symbol, ts, volume)
+
+    expected_rows, expected_abnormal = _dump(sql_conn)
+    rows, abnormal = _dump(inc_conn)
+    assert len(rows) == len(expected_rows) > 3 * 3 * 1000
+    for row, expected in zip(rows, expected_rows):
+        assert row[:3] == expected[:3] and row[6] == expected[6], (row, expected)
+        assert all(_close(a, b) for a, b in zip(row[3:6], expected[3:6])), (row, expected)
+    assert abnormal == expected_abnormal and len(abnormal) > 0
+    sql_conn.close()
+    inc_conn.close()
+    collector.logging.disable(collector.logging.NOTSET)
+    print(f"✅ {len(rows)} 条聚合数据、{len(abnormal)} 条异常记录与SQL计算一致")
+
+
+def test_out_of_order_bar():
+    aggregator = FundAggregator()
+    base = 1765000800000
+    for i in range(6):
+        assert aggregator.update('BTC', base + i * FIVE_MIN, 100.0 + i) is not None
+    # 补采集的旧K线：窗口可能已移出内存，交给调用方用SQL计算
+    assert aggregator.update('BTC', base + 2 * FIVE_MIN, 50.0) is None
+    aggregator.add_aggregated('BTC', base + 2 * FIVE_MIN, 15, 251.0)
+    result = aggregator.update('BTC', base + 6 * FIVE_MIN, 106.0)
+    assert result[15][0] == 104.0 + 105.0 + 106.0
+    print("✅ 乱序K线回退到SQL计算")
+
+
+if __name__ == '__main__':
+    test_matches_sql_queries()
+    test_out_of_order_bar()
+    print("\n✅ 所有测试通过")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+测试首页TXT解析器
+与重构前实现的输出（test_data/home_txt/golden.json）逐字段比对，
+并验证一遍扫描与逐个 re.search 等价、进程池批量解析结果一致
+"""
+
+import json
+import os
+import random
+import re
+import tempfile
+
+from gdrive_final_detector import parse_coin_data, parse_content
+from home_txt_parser import HOME_FIELDS, home_page_data, parse, parse_files, scan_fields
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test_data', 'home_txt')
+
+
+def _fixtures():
+    with open(os.path.join(DATA_DIR, 'golden.json'), encoding='utf-8') as f:
+        golden = json.load(f)
+    for name in sorted(golden):
+        with open(os.path.join(DATA_DIR, name), encoding='utf-8', newline='') as f:
+            yield name, f.read(), golden[name]
+
+
+def test_golden_equivalence():
+    count = 0
+    for name, content, expected in _fixtures():
+        assert parse_content(content) == expected['parse_content'], name
+        assert parse_content(content, file_timestamp='2025-12-12 08:30:59') == \
+            expected['parse_content_with_timestamp'], name
+        assert parse_coin_data(content) == expected['parse_coin_data'], name
+        assert home_page_data(parse(content)) == expected['parse_home_data'], name
+        count += 1
+    assert count == 5
+    print(f"✅ {count} 个样例文件与重构前的解析结果一致")
+
+
+def test_scan_matches_full_search():
+    rng = random.Random(7)
+    pieces = ['透明标签_急涨总和=急涨：12', '透明标签_急跌总和=急跌:3', '本轮急涨 8/20', '本轮急跌 5/',
+              '透明标签_计次=4', '计次：9', '透明标签_五种状态=状态：震荡', '★★☆--- | 多头', '☆ | 空头\r',
+              '2025-12-09 22:20:15', '急涨', '计次', '★', '1|BTC|1|2|3', '\r', '']
+    for _ in range(300):
+        content = '\n'.join(rng.choice(pieces) + rng.choice(['', ' ', 'x'])
+                            for _ in range(rng.randint(0, 12)))
+        result = scan_fields(content, HOME_FIELDS)
+        for spec in HOME_FIELDS:
+            match = spec.pattern.search(content)
+            expected = (spec.convert(match) if spec.convert else match.group(1)) if match else None
+            assert result[spec.name] == expected, (spec.name, content)
+    print("✅ 一遍扫描与逐字段 re.search 结果一致")
+
+
+def test_parse_files_pool():
+    with open(os.path.join(DATA_DIR, 'new_format.txt'), encoding='utf-8') as f:
+        content = f.read()
+    with tempfile.TemporaryDirectory() as tmp:
+        paths = []
+        for i in range(40):
+            path = os.path.join(tmp, f'{i:03d}.txt')
+            with open(path, 'w', encoding='gb18030' if i % 2 else 'utf-8') as f:
+                f.write(re.sub(r'急涨：\d+', f'急涨：{i}', content))
+            paths.append(path)
+        paths.append(os.path.join(tmp, 'missing.txt'))
+
+        serial = parse_files(paths, workers=1)
+        pooled = parse_files(paths, workers=2, chunksize=4)
+        assert serial == pooled
+        assert [snapshot.rush_up for _, snapshot in pooled[:-1]] == list(range(40))
+        assert pooled[-1] == (paths[-1], None)
+    print("✅ 进程池批量解析结果与顺序解析一致")
+
+
+if __name__ == '__main__':
+    test_golden_equivalence()
+    test_scan_matches_full_search()
+    test_parse_files_pool()
+    print("\n✅ 所有测试通过")
@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+测试多币种批量指标重算
+验证批量数组计算的每根K线结果与 WebSocket 采集器的 calculate_indicators 一致，
+--since 只替换对应分区，多进程与单进程写回结果相同，
+--since 只读取预热窗口内的K线，替换范围不超过读到的最后一根K线
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+
+os.environ.setdefault('COLD_ARCHIVE_DIR', tempfile.mkdtemp())
+
+from indicator_recalc import (OhlcBatch, calculate_batch, indicator_dict, load_ohlc,
+                              recalculate, recalculate_parallel, warmup_start)
+from okex_websocket_realtime_collector_fixed import calculate_indicators
+
+START_MS = 1735660800000
+BAR_MS = 5 * 60 * 1000
+
+# 币种 -> (K线数, 起始价)，包含不足20根和价格极小（布林带方差低于阈值）的币种
+SERIES = {
+    'BTC-USDT-SWAP': (300, 95000.0),
+    'ETH-USDT-SWAP': (260, 3300.0),
+    'SHIB-USDT-SWAP': (220, 0.000021),
+    'NEW-USDT-SWAP': (15, 1.5),
+}
+
+
+def make_klines(count, seed, start_price, offset=0):
+    """随机游走K线 [timestamp, open, high, low, close, volume]"""
+    rng = random.Random(seed)
+    klines = []
+    price = start_price
+    for i in range(count):
+        open_price = price
+        close = open_price * (1 + rng.gauss(0, 0.01))
+        high = max(open_price, close) * (1 + abs(rng.gauss(0, 0.004)))
+        low = min(open_price, close) * (1 - abs(rng.gauss(0, 0.004)))
+        klines.append([START_MS + (i + offset) * BAR_MS, open_price, high, low, close, 1.0])
+        price = close
+    return klines
+
+
+def all_klines():
+    return {symbol: make_klines(count, seed, price, offset=seed * 3)
+            for seed, (symbol, (count, price)) in enumerate(SERIES.items())}
+
+
+def assert_same(result, expected, context):
+    if expected is None:
+        assert result is None, context
+        return
+    for key, value in expected.items():
+        actual = result[key]
+        if isinstance(value, float) and actual is not None and value is not None:
+            assert abs(actual - value) <= 1e-7 * max(1e-6, abs(value)), (context, key, actual, value)
+        else:
+            assert actual == value, (context, key, actual, value)
+
+
+def test_matches_collector_per_bar():
+    """每个币种每根K线与 calculate_indicators(klines[:i+1]) 一致"""
+    klines = all_klines()
+    batch = OhlcBatch(list(klines), [[(k[0], k[2], k[3], k[4]) for k in rows] for rows in klines.values()])
+    results = calculate_batch(batch)
+    for row, rows in enumerate(klines.values()):
+        for i in range(len(rows)):
+            expected = calculate_indicators(rows[:i + 1])
+            assert_same(indicator_dict(batch, results, row, i), expected, (batch.symbols[row], i))
+    print("✅ 批量计算与 calculate_indicators 逐K线一致")
+
+
+def _setup(db):
+    conn = sqlite3.connect(db)
+    conn.execute('''
+        CREATE TABLE okex_kline_ohlc (
+            symbol TEXT NOT NULL, timeframe TEXT NOT NULL, timestamp INTEGER NOT NULL,
+            open REAL, high REAL, low REAL, close REAL, volume REAL, created_at TEXT,
+            PRIMARY KEY (symbol, timeframe, timestamp)
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE okex_indicators_history (
+            symbol TEXT NOT NULL, timeframe TEXT NOT NULL, timestamp INTEGER NOT NULL,
+            current_price REAL, rsi_14 REAL, sar REAL, sar_position TEXT, sar_count_label TEXT,
+            bb_upper REAL, bb_middle REAL, bb_lower REAL, created_at TEXT,
+            PRIMARY KEY (symbol, timeframe, timestamp)
+        )
+    ''')
+    for symbol, rows in all_klines().items():
+        conn.executemany('INSERT INTO okex_kline_ohlc VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                         [(symbol, '5m', *k, 'x') for k in rows])
+        # 旧公式算出的错误数据
+        conn.executemany('''
+            INSERT INTO okex_indicators_history (symbol, timeframe, timestamp, current_price, rsi_14, created_at)
+            VALUES (?, '5m', ?, ?, -1, 'old')
+        ''', [(symbol, k[0], k[4]) for k in rows])
+    conn.commit()
+    return conn
+
+
+def _history(conn):
+    return conn.execute('''
+        SELECT symbol, timeframe, timestamp, current_price, rsi_14, sar, sar_position, sar_count_label,
+               bb_upper, bb_middle, bb_lower
+        FROM okex_indicators_history ORDER BY symbol, timestamp
+    ''').fetchall()
+
+
+def test_replace_partitions():
+    """--since 只替换之后的分区；全量重算和多进程结果相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'crypto_data.db')
+        conn = _setup(db)
+        symbols = list(SERIES)
+        since = START_MS + 200 * BAR_MS
+
+        summary = recalculate(db, symbols, ('5m',), since=since)
+        by_symbol = {item['symbol']: item for item in summary}
+        assert by_symbol['NEW-USDT-SWAP']['inserted'] == 0
+        old = conn.execute("SELECT COUNT(*) FROM okex_indicators_history WHERE created_at = 'old'").fetchone()[0]
+        assert old == sum(min(count, 200 - seed * 3) for seed, (count, _) in enumerate(SERIES.values())), old
+        assert conn.execute('''
+            SELECT COUNT(*) FROM okex_indicators_history WHERE timestamp >= ? AND created_at = 'old'
+        ''', (since,)).fetchone()[0] == 0
+
+        batch = load_ohlc(conn, symbols, '5m')
+        results = calculate_batch(batch)
+        row = batch.symbols.index('BTC-USDT-SWAP')
+        column = 250
+        stored = conn.execute('''
+            SELECT current_price, rsi_14, sar, sar_position, sar_count_label, bb_upper, bb_middle, bb_lower
+            FROM okex_indicators_history WHERE symbol = ? AND timestamp = ?
+        ''', ('BTC-USDT-SWAP', int(batch.timestamps[row, column]))).fetchone()
+        expected = indicator_dict(batch, results, row, column)
+        assert stored == tuple(expected[key] for key in (
+            'current_price', 'rsi_14', 'sar', 'sar_position', 'sar_count_label',
+            'bb_upper', 'bb_middle', 'bb_lower'))
+
+        recalculate(db, symbols, ('5m',))
+        full = _history(conn)
+        assert len(full) == sum(max(0, count - 19) for count, _ in SERIES.values())
+
+        conn.execute('DELETE FROM okex_indicators_history')
+        conn.commit()
+        recalculate_parallel(db, symbols, ('5m',), workers=2)
+        assert _history(conn) == full
+        conn.close()
+    print("✅ 分区替换及多进程写回正确")
+
+
+def test_warmup_window():
+    """--since 只读取 warmup_bars 根预热K线；最后一根K线之后的指标不删除；预热足够时与全量相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'crypto_data.db')
+        conn = _setup(db)
+        symbols = list(SERIES)
+        since = START_MS + 250 * BAR_MS
+        assert warmup_start('5m', since, 60) == since - 60 * BAR_MS
+        assert warmup_start('5m', None) is None and warmup_start('3m', since) is None
+
+        # 采集器已写入、K线表中还没有的一根
+        future = START_MS + 400 * BAR_MS
+        conn.execute('''
+            INSERT INTO okex_indicators_history (symbol, timeframe, timestamp, current_price, created_at)
+            VALUES ('BTC-USDT-SWAP', '5m', ?, 1, 'collector')
+        ''', (future,))
+        conn.commit()
+
+        summary = recalculate(db, symbols, ('5m',), since=since, warmup_bars=60)
+        bars = {item['symbol']: item['bars'] for item in summary}
+        for seed, (symbol, (count, _)) in enumerate(SERIES.items()):
+            first_loaded = max(0, 250 - 60 - seed * 3)
+            assert bars[symbol] == max(0, count - first_loaded), (symbol, bars[symbol])
+        assert conn.execute('SELECT created_at FROM okex_indicators_history WHERE timestamp = ?',
+                            (future,)).fetchone() == ('collector',)
+
+        # 预热覆盖全部历史时与不指定 since 的全量结果相同
+        recalculate(db, symbols, ('5m',), since=since, warmup_bars=1000)
+        partial = [row for row in _history(conn) if since <= row[2] < future]
+        recalculate(db, symbols, ('5m',))
+        assert partial == [row for row in _history(conn) if since <= row[2] < future]
+        assert conn.execute('SELECT created_at FROM okex_indicators_history WHERE timestamp = ?',
+                            (future,)).fetchone() == ('collector',)
+        conn.close()
+    print("✅ 预热窗口与分区上界正确")
+
+
+if __name__ == '__main__':
+    test_matches_collector_per_bar()
+    test_replace_partitions()
+    test_warmup_window()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+测试K线技术标记的向量化计算
+验证窄幅连续段、高低点、SAR标签、买点4，以及增量模式与全量重算一致
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+
+import numpy as np
+
+import calculate_kline_markers_v2 as markers_v2
+
+SYMBOL = 'BTC-USDT-SWAP'
+STEP_MS = 5 * 60 * 1000
+
+
+def make_db(candles, indicators):
+    markers_v2.DB_PATH = os.path.join(tempfile.mkdtemp(), 'crypto_data.db')
+    conn = sqlite3.connect(markers_v2.DB_PATH)
+    conn.executescript('''
+        CREATE TABLE okex_kline_ohlc (
+            symbol TEXT, timeframe TEXT, timestamp INTEGER,
+            open REAL, high REAL, low REAL, close REAL,
+            PRIMARY KEY (symbol, timeframe, timestamp)
+        );
+        CREATE TABLE okex_indicators_history (
+            symbol TEXT, timeframe TEXT, timestamp INTEGER, current_price REAL,
+            rsi_14 REAL, sar REAL, sar_position TEXT, sar_count_label TEXT,
+            bb_upper REAL, bb_middle REAL, bb_lower REAL
+        );
+        CREATE TABLE kline_technical_markers (
+            symbol TEXT, timeframe TEXT, timestamp INTEGER,
+            is_narrow_range INTEGER, change_percent REAL, range_percent REAL,
+            consecutive_count INTEGER, is_7d_high INTEGER, is_7d_low INTEGER,
+            is_48h_high INTEGER, is_48h_low INTEGER, rsi_14 REAL, sar REAL,
+            sar_position TEXT, sar_quadrant INTEGER, sar_count_label TEXT,
+            bb_upper REAL, bb_middle REAL, bb_lower REAL, is_buy_point_4 INTEGER,
+            UNIQUE (symbol, timeframe, timestamp)
+        );
+    ''')
+    insert(conn, candles, indicators)
+    return conn
+
+
+def insert(conn, candles, indicators):
+    conn.executemany('INSERT INTO okex_kline_ohlc VALUES (?, ?, ?, ?, ?, ?, ?)',
+                     [(SYMBOL, '5m') + c for c in candles])
+    conn.executemany('INSERT INTO okex_indicators_history VALUES (?, ?, ?, ?, ?, ?, NULL, NULL, ?, ?, ?)',
+                     [(SYMBOL, '5m') + i for i in indicators])
+    conn.commit()
+
+
+def random_series(count, seed, start_ts=1700000000000, price=100.0):
+    rng = random.Random(seed)
+    candles, indicators = [], []
+    ts = start_ts
+    for _ in range(count):
+        o = price
+        c = o * (1 + rng.gauss(0, 0.002))
+        h = max(o, c) * (1 + abs(rng.gauss(0, 0.001)))
+        l = min(o, c) * (1 - abs(rng.gauss(0, 0.001)))
+        candles.append((ts, o, h, l, c))
+        if rng.random() > 0.05:
+            sar = c * (1 + rng.choice([-1, 1]) * 0.004)
+            mid = c * (1 + rng.gauss(0, 0.002))
+            indicators.append((ts, c, rng.uniform(20, 80), sar, mid * 1.006, mid, mid * 0.994))
+        price = c
+        ts += STEP_MS
+    return candles, indicators
+
+
+def stored(conn):
+    return conn.execute('SELECT * FROM kline_technical_markers ORDER BY timestamp').fetchall()
+
+
+def test_markers_on_known_series():
+    # 0-1 宽幅、2-4 窄幅（3根连续）、5 宽幅、6 窄幅（单根不成段）、7 开盘价为0
+    closes = [100, 103, 103.1, 103.2, 103.1, 99, 99.1, 99.1]
+    candles = []
+    for i, c in enumerate(closes):
+        o = closes[i - 1] if i else 99
+        candles.append((i * STEP_MS, o, max(o, c) * 1.0005, min(o, c) * 0.9995, c))
+    candles[7] = (7 * STEP_MS, 0, 99.2, 99.0, 99.1)
+    # SAR：前3根在K线下方（多头），之后在上方（空头）；第4根无指标
+    indicators = []
+    for ts, o, h, l, c in candles:
+        if ts == 4 * STEP_MS:
+            continue
+        sar = c * 0.99 if ts < 3 * STEP_MS else c * 1.01
+        indicators.append((ts, c, 50.0, sar, c * 1.005, c, c * 0.995))
+    conn = make_db(candles, indicators)
+
+    markers_v2.calculate_all_markers(SYMBOL, '5m')
+    rows = stored(conn)
+    assert [r[3] for r in rows] == [0, 0, 1, 1, 1, 0, 1, 0]
+    assert [r[6] for r in rows] == [0, 0, 3, 3, 3, 0, 0, 0]
+    # 7天高点为 103.2 那根，低点在第5根（首根不参与统计）
+    assert [r[7] for r in rows].index(1) == 3
+    assert [r[8] for r in rows].index(1) == 5
+    # SAR 标签按有指标的K线计数
+    assert [r[15] for r in rows][:5] == ['多头01', '多头02', '多头03', '空头01', '空头02']
+    assert rows[0][13] == 'bullish' and rows[0][14] == 4
+    # 低点后第2根未创新低 → 买点4
+    assert [r[19] for r in rows] == [0, 0, 0, 0, 0, 0, 0, 1]
+    print("✅ 窄幅连续段/高低点/SAR标签/买点4 计算正确")
+
+
+def test_run_helpers():
+    mask = np.array([0, 1, 1, 0, 1, 1, 1, 0, 1], dtype=bool)
+    assert markers_v2.run_lengths(mask).tolist() == [0, 2, 2, 0, 3, 3, 3, 0, 1]
+    values = np.array([1, 1, 0, 0, 0, 1], dtype=bool)
+    assert markers_v2.run_positions(values).tolist() == [1, 2, 1, 2, 3, 1]
+    assert markers_v2.run_lengths(np.zeros(0, dtype=bool)).tolist() == []
+    print("✅ 连续段长度/序号计算正确")
+
+
+def test_incremental_matches_full_rebuild():
+    candles, indicators = random_series(3000, seed=7)
+    conn = make_db(candles[:2900], indicators[:sum(1 for i in indicators if i[0] < candles[2900][0])])
+    markers_v2.calculate_all_markers(SYMBOL, '5m')
+
+    # 新K线到达后增量更新
+    new_indicators = [i for i in indicators if i[0] >= candles[2900][0]]
+    insert(conn, candles[2900:], new_indicators)
+    markers_v2.calculate_all_markers(SYMBOL, '5m', incremental=True)
+    incremental_rows = stored(conn)
+
+    full = make_db(candles, indicators)
+    markers_v2.calculate_all_markers(SYMBOL, '5m')
+    assert incremental_rows == stored(full)
+    assert len(incremental_rows) == 3000
+
+    # 没有新数据时增量模式不写入
+    existing = markers_v2.load_existing_markers(full.cursor(), SYMBOL, '5m')
+    markers, _ = markers_v2.compute_markers(
+        full.execute('SELECT timestamp, open, high, low, close FROM okex_kline_ohlc ORDER BY timestamp').fetchall(),
+        markers_v2.get_indicator_data(SYMBOL, '5m'))
+    assert all(existing[m[0]] == m for m in markers)
+    print(f"✅ 增量模式结果与全量重算一致 ({len(incremental_rows)} 条)")
+
+
+if __name__ == '__main__':
+    test_markers_on_known_series()
+    test_run_helpers()
+    test_incremental_matches_full_rebuild()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+测试"最新一行"物化表
+验证回填、插入/覆盖/乱序插入、删除最新行、更新和列变化后重建
+"""
+
+import os
+import sqlite3
+import tempfile
+
+from db_access import get_connection
+from latest_state import LatestTable
+
+
+def _setup(db):
+    conn = sqlite3.connect(db)
+    conn.execute('''
+        CREATE TABLE history (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            symbol TEXT, timeframe TEXT, timestamp INTEGER, value REAL,
+            UNIQUE(symbol, timeframe, timestamp)
+        )
+    ''')
+    conn.executemany('INSERT INTO history (symbol, timeframe, timestamp, value) VALUES (?, ?, ?, ?)', [
+        ('A', '5m', 1, 1), ('A', '5m', 3, 3), ('A', '5m', 2, 2), ('B', '5m', 1, 10), ('A', '1H', 1, 5),
+    ])
+    conn.commit()
+    return conn
+
+
+def _latest(conn):
+    return sorted(conn.execute('SELECT symbol, timeframe, timestamp, value FROM history_latest').fetchall())
+
+
+def _expected(conn):
+    # 原来的 GROUP BY 查询
+    return sorted(conn.execute('''
+        SELECT h.symbol, h.timeframe, h.timestamp, h.value FROM history h
+        WHERE h.id IN (
+            SELECT id FROM history h2 WHERE h2.symbol = h.symbol AND h2.timeframe = h.timeframe
+            ORDER BY timestamp DESC, id DESC LIMIT 1
+        )
+    ''').fetchall())
+
+
+def test_backfill_and_triggers():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'history.db')
+        conn = _setup(db)
+        latest = LatestTable('history', ('symbol', 'timeframe'), 'timestamp')
+        assert latest.ensure(get_connection(db)) == 'history_latest'
+        assert _latest(conn) == _expected(conn)
+        assert len(_latest(conn)) == 3
+
+        steps = [
+            "INSERT OR REPLACE INTO history (symbol, timeframe, timestamp, value) VALUES ('A', '5m', 3, 33)",
+            "INSERT INTO history (symbol, timeframe, timestamp, value) VALUES ('A', '5m', 0, 0)",
+            "INSERT INTO history (symbol, timeframe, timestamp, value) VALUES ('C', '5m', 7, 7)",
+            "DELETE FROM history WHERE symbol = 'A' AND timeframe = '5m' AND timestamp = 3",
+            "DELETE FROM history WHERE timestamp <= 1",
+            "UPDATE history SET value = 99 WHERE symbol = 'C'",
+            "UPDATE history SET timestamp = 9, value = 0 WHERE symbol = 'A' AND timestamp = 2",
+        ]
+        for sql in steps:
+            conn.execute(sql)
+            conn.commit()
+            assert _latest(conn) == _expected(conn), sql
+        assert ('A', '5m', 9, 0.0) in _latest(conn)
+        conn.close()
+        print("✅ 回填和触发器维护结果与 GROUP BY 查询一致")
+
+
+def test_rebuild_on_schema_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'history.db')
+        conn = _setup(db)
+        latest = LatestTable('history', ('symbol', 'timeframe'), 'timestamp')
+        latest.ensure(get_connection(db))
+
+        conn.execute('ALTER TABLE history ADD COLUMN extra TEXT')
+        conn.execute("INSERT INTO history (symbol, timeframe, timestamp, value, extra) VALUES ('B', '5m', 5, 5, 'x')")
+        conn.commit()
+
+        # 新进程（清除已安装标记）发现列变化后重建
+        latest.clear()
+        latest.ensure(get_connection(db))
+        row = conn.execute("SELECT timestamp, extra FROM history_latest WHERE symbol = 'B'").fetchone()
+        assert row == (5, 'x')
+        triggers = [r[0] for r in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]
+        assert len(triggers) == 3
+
+        try:
+            LatestTable('missing', ('symbol',), 'id').ensure(get_connection(db))
+            assert False
+        except sqlite3.OperationalError:
+            pass
+        conn.close()
+        print("✅ 历史表加列后重建物化表")
+
+
+if __name__ == '__main__':
+    test_backfill_and_triggers()
+    test_rebuild_on_schema_change()
+    print("\n✅ 所有测试通过")
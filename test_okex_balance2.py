@@ -1,12 +1,11 @@
-import json
 import requests
 import hmac
 import base64
 from datetime import datetime
+from state_store import SUB_ACCOUNT_CONFIG
 
 # 读取配置
-with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-    config = json.load(f)
+config = SUB_ACCOUNT_CONFIG.load()
 
 # 获取第一个启用的子账户
 sub_account = None
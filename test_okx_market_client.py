@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+测试OKX共享行情客户端
+用本地HTTP服务模拟OKX接口，验证限频、重试和批量接口
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from okx_market_client import OKXMarketClient, TokenBucket
+
+
+class FakeOKX(BaseHTTPRequestHandler):
+    calls = []
+    fail_first = {}
+
+    def log_message(self, *args):
+        pass
+
+    def _reply(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        FakeOKX.calls.append((url.path, params, time.monotonic()))
+
+        key = (url.path, params.get('instId'))
+        remaining = FakeOKX.fail_first.get(key, 0)
+        if remaining:
+            FakeOKX.fail_first[key] = remaining - 1
+            if remaining % 2:
+                return self._reply(429, {'code': '50011', 'msg': 'Too Many Requests'})
+            return self._reply(200, {'code': '50011', 'msg': 'Too Many Requests', 'data': []})
+
+        if url.path == '/api/v5/market/tickers':
+            return self._reply(200, {'code': '0', 'data': [
+                {'instId': 'BTC-USDT-SWAP', 'last': '90000'},
+                {'instId': 'ETH-USDT-SWAP', 'last': '3000'},
+            ]})
+        if url.path == '/api/v5/market/ticker':
+            if params['instId'] == 'BAD-USDT-SWAP':
+                return self._reply(200, {'code': '51001', 'msg': 'Instrument ID does not exist'})
+            return self._reply(200, {'code': '0', 'data': [{'instId': params['instId'], 'last': '1.5'}]})
+        if url.path == '/api/v5/market/candles':
+            return self._reply(200, {'code': '0', 'data': [
+                ['1700000300000', '1', '2', '0.5', '1.5', '10', '10', '15', '0'],
+                ['1700000000000', '1', '2', '0.5', '1.0', '10', '10', '15', '1'],
+            ]})
+        self._reply(404, {})
+
+
+def start_server():
+    FakeOKX.calls = []
+    FakeOKX.fail_first = {}
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOKX)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_token_bucket_rate():
+    """突发容量用完后按速率放行"""
+    bucket = TokenBucket(5, 0.5)
+    started = time.monotonic()
+    for _ in range(10):
+        bucket.acquire()
+    elapsed = time.monotonic() - started
+    assert 0.4 <= elapsed < 1.0, elapsed
+    print(f"✅ 令牌桶限速正确: 10次耗时 {elapsed:.2f}s")
+
+
+def test_retry_and_batch_helpers():
+    server, base_url = start_server()
+    try:
+        client = OKXMarketClient(base_url=base_url, backoff=0.01, max_workers=4)
+
+        # 429 和 50011 退避重试后成功
+        FakeOKX.fail_first[('/api/v5/market/candles', 'BTC-USDT-SWAP')] = 2
+        candles = client.get_candles('BTC-USDT-SWAP', '5m', 2)
+        assert candles[0][0] == '1700000300000'
+        assert client.stats()['retries'] == 2
+
+        # 非重试类错误直接返回 None
+        assert client.get_ticker('BAD-USDT-SWAP') is None
+
+        # 批量价格：一次 tickers，缺失的合约单独补取
+        FakeOKX.calls = []
+        prices = client.get_last_prices(['BTC-USDT-SWAP', 'ETH-USDT-SWAP', 'SOL-USDT-SWAP'])
+        assert prices == {'BTC-USDT-SWAP': 90000.0, 'ETH-USDT-SWAP': 3000.0, 'SOL-USDT-SWAP': 1.5}
+        assert [c[0] for c in FakeOKX.calls] == ['/api/v5/market/tickers', '/api/v5/market/ticker']
+
+        # 批量K线按输入顺序返回
+        batch = client.get_candles_batch(['A-USDT-SWAP', 'B-USDT-SWAP'], '1H', 2)
+        assert list(batch) == ['A-USDT-SWAP', 'B-USDT-SWAP']
+        assert all(len(v) == 2 for v in batch.values())
+        print(f"✅ 重试与批量接口正确: {client.stats()}")
+    finally:
+        server.shutdown()
+
+
+def test_concurrency_respects_endpoint_limit():
+    """并发请求仍受接口令牌桶约束"""
+    server, base_url = start_server()
+    try:
+        client = OKXMarketClient(base_url=base_url, max_workers=8,
+                                 rate_limits={'/api/v5/market/candles': (5, 0.5)})
+        started = time.monotonic()
+        client.get_candles_batch([f'C{i}-USDT-SWAP' for i in range(15)], '5m', 1)
+        elapsed = time.monotonic() - started
+        # 5次突发 + 10次 × 0.1s
+        assert 0.9 <= elapsed < 2.0, elapsed
+        print(f"✅ 并发受限频约束: 15次耗时 {elapsed:.2f}s")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    test_token_bucket_rate()
+    test_retry_and_batch_helpers()
+    test_concurrency_respects_endpoint_limit()
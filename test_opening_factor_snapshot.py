@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+测试开仓逻辑因子快照
+验证合并查询取到的因子与原来逐项查询一致，上游表不变时不重新计算，
+上游变化生成新版本并保留历史，多个实例（进程）不会为同一指纹重复写入
+"""
+
+import os
+import sqlite3
+import tempfile
+from datetime import datetime
+
+import opening_logic
+from opening_factor_snapshot import OpeningSnapshotService
+from opening_logic import fetch_raw_data
+
+
+def _setup(tmp):
+    crypto = os.path.join(tmp, 'crypto_data.db')
+    signal = os.path.join(tmp, 'signal_data.db')
+    conn = sqlite3.connect(crypto)
+    conn.executescript('''
+        CREATE TABLE crypto_snapshots (snapshot_time TEXT, count INTEGER, count_score_type TEXT,
+                                       rush_up INTEGER, rush_down INTEGER);
+        CREATE TABLE crypto_coin_data (symbol TEXT, change_24h REAL, update_time TEXT);
+        CREATE TABLE price_breakthrough_events (symbol TEXT, event_type TEXT, price REAL, event_time TEXT);
+        CREATE TABLE panic_wash_index (record_time TEXT, total_position REAL);
+    ''')
+    today = datetime.now().strftime('%Y-%m-%d')
+    conn.executemany('INSERT INTO crypto_snapshots VALUES (?, ?, ?, ?, ?)', [
+        ('2025-01-01 10:00:00', 2, '空心', 5, 3),
+        ('2025-01-01 10:10:00', 6, '实心☆', 30, 4),
+    ])
+    conn.executemany('INSERT INTO crypto_coin_data VALUES (?, ?, ?)', [
+        ('BTC', -1.0, '2025-01-01 10:00:00'), ('BTC', 1.4, '2025-01-01 10:10:00'),
+        ('ETH', 3.1, '2025-01-01 10:10:00'), ('ETH', None, '2025-01-01 10:20:00'),
+        ('DOGE', 12.0, '2025-01-01 10:00:00'), ('DOGE', 5.0, '2025-01-01 10:10:00'),
+        ('PEPE', 15.0, '2025-01-01 10:10:00'), ('SOL', -11.0, '2025-01-01 10:10:00'),
+        ('XRP', 9.0, '2025-01-01 10:10:00'),
+    ])
+    conn.executemany('INSERT INTO price_breakthrough_events VALUES (?, ?, ?, ?)', [
+        ('BTC', 'new_high', 1.0, f'{today} 01:00:00'), ('ETH', 'new_high', 1.0, f'{today} 02:00:00'),
+        ('SOL', 'new_low', 1.0, f'{today} 03:00:00'), ('BTC', 'new_high', 1.0, '2020-01-01 01:00:00'),
+    ])
+    conn.executemany('INSERT INTO panic_wash_index VALUES (?, ?)', [
+        ('2025-01-01 10:00:00', 9.8e9), ('2025-01-01 10:10:00', 5e8),
+    ])
+    conn.commit()
+
+    sconn = sqlite3.connect(signal)
+    sconn.execute('CREATE TABLE trading_signals (signal_type TEXT, score REAL, timestamp TEXT)')
+    sconn.executemany("INSERT INTO trading_signals VALUES (?, ?, datetime('now', ?))", [
+        ('long', 90, '-10 minutes'), ('long', 70, '-20 minutes'), ('short', 40, '-5 minutes'),
+        ('short', 99, '-2 hours'),
+    ])
+    sconn.commit()
+    sconn.close()
+    return conn, crypto, signal
+
+
+def test_combined_query_matches_getters():
+    """一条合并查询的结果与原来6个 get_* 函数逐项查询相同"""
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, crypto, signal = _setup(tmp)
+        conn.execute('ATTACH DATABASE ? AS signal', (signal,))
+        combined = fetch_raw_data(conn)
+
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            expected = opening_logic.calculate_trend_score()[2]
+        finally:
+            os.chdir(cwd)
+        assert combined == expected, (combined, expected)
+        assert combined['star_data']['solid_stars'] == 6
+        assert combined['extreme'] == {'extreme_up': 1, 'extreme_down': 1}
+        assert combined['score_avg'] == {'long_avg': 80.0, 'short_avg': 40.0}
+
+        # 缺少 signal_data 时得分系统取默认值，其他因子不受影响
+        conn.execute('DETACH DATABASE signal')
+        missing = fetch_raw_data(conn)
+        assert missing['score_avg'] == {'long_avg': 0.0, 'short_avg': 0.0}
+        assert missing['star_data'] == combined['star_data']
+        conn.close()
+    print("✅ 合并查询与逐项查询的因子一致")
+
+
+def test_versioned_snapshots():
+    """上游不变时复用快照；上游变化生成新版本；历史可翻页"""
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, crypto, signal = _setup(tmp)
+        service = OpeningSnapshotService(db=crypto, signal_db=signal, poll_interval=0)
+
+        first = service.get()
+        assert first['version'] == 1
+        assert first['data']['position_info']['first_appeared_at']
+        assert service.get_suggestion()['snapshot_version'] == 1
+        assert service.refresh()['version'] == 1
+        assert conn.execute('SELECT COUNT(*) FROM opening_logic_snapshots').fetchone()[0] == 1
+
+        # 另一个进程的实例看到同一指纹，不重复计算
+        other = OpeningSnapshotService(db=crypto, signal_db=signal)
+        assert other.refresh()['version'] == 1
+
+        # 新的首页快照：星星变为空心
+        conn.execute("INSERT INTO crypto_snapshots VALUES ('2025-01-01 10:20:00', 12, '空心', 4, 30)")
+        conn.commit()
+        second = service.get()
+        assert second['version'] == 2
+        assert second['data']['raw_data']['star_data']['hollow_stars'] == 12
+        assert second['data']['position_info']['position_type'] == 'short'
+
+        history = service.history()
+        assert [item['version'] for item in history] == [2, 1]
+        assert service.history(limit=10, before_version=2)[0]['version'] == 1
+        assert history[0]['position_type'] == 'short' and history[1]['position_type'] == 'long'
+
+        active = conn.execute('''
+            SELECT position_type FROM opening_logic_suggestions WHERE is_active = 1
+        ''').fetchall()
+        assert active == [('short',)], active
+
+        # 强制刷新总是写新版本
+        assert service.refresh(force=True)['version'] == 3
+        conn.close()
+    print("✅ 快照按上游变化生成版本并保留历史")
+
+
+def test_cached_between_polls():
+    """poll_interval 内不访问数据库"""
+    with tempfile.TemporaryDirectory() as tmp:
+        conn, crypto, signal = _setup(tmp)
+        service = OpeningSnapshotService(db=crypto, signal_db=signal, poll_interval=60)
+        first = service.get()
+        calls = []
+        service.refresh = lambda force=False: calls.append(1)
+        for _ in range(100):
+            assert service.get() is first
+        assert calls == []
+        conn.close()
+    print("✅ 检查间隔内直接返回内存中的快照")
+
+
+if __name__ == '__main__':
+    test_combined_query_matches_getters()
+    test_versioned_snapshots()
+    test_cached_between_polls()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+测试私有WebSocket持仓流
+用本地模拟OKX私有WS服务验证：登录签名、全量快照+增量更新、心跳、断线重连后快照替换、快照文件读取
+"""
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+from websockets.asyncio.server import serve
+
+import position_stream
+from position_stream import Account, PositionBook, login_args, read_positions
+
+ACCOUNTS = {
+    'main': Account('main', 'key-main', 'secret-main', 'pass-main'),
+    'Wu666666': Account('Wu666666', 'key-sub', 'secret-sub', 'pass-sub'),
+}
+
+
+def position(inst_id, pos_side, pos, upl='1.5', inst_type='SWAP'):
+    return {'instId': inst_id, 'instType': inst_type, 'posSide': pos_side, 'mgnMode': 'isolated',
+            'posId': f'{inst_id}-{pos_side}', 'pos': pos, 'upl': upl, 'margin': '10'}
+
+
+class MockOKX:
+    """模拟OKX私有频道：每个账户一个连接，按脚本推送消息"""
+
+    def __init__(self):
+        self.connections = {}
+        self.logins = []
+        self.initial_positions = {
+            'main': [position('BTC-USDT-SWAP', 'long', '2'), position('ETH-USDT-SWAP', 'short', '5')],
+            'Wu666666': [position('CRV-USDT-SWAP', 'long', '100'), position('BTC-USDT', 'net', '1', inst_type='MARGIN')],
+        }
+
+    async def handler(self, ws):
+        login = json.loads(await ws.recv())
+        args = login['args'][0]
+        account = next((a for a in ACCOUNTS.values() if a.api_key == args['apiKey']), None)
+        expected = login_args(account, args['timestamp'])['sign'] if account else None
+        if args['sign'] != expected or args['passphrase'] != account.passphrase:
+            await ws.send(json.dumps({'event': 'error', 'code': '60009', 'msg': 'Login failed.'}))
+            return
+        self.logins.append(account.name)
+        await ws.send(json.dumps({'event': 'login', 'code': '0', 'msg': ''}))
+
+        subscribe = json.loads(await ws.recv())
+        assert [a['channel'] for a in subscribe['args']] == ['positions', 'account']
+        self.connections[account.name] = ws
+        await ws.send(json.dumps({'arg': {'channel': 'positions', 'instType': 'ANY'},
+                                  'data': self.initial_positions[account.name]}))
+        async for message in ws:
+            if message == 'ping':
+                await ws.send('pong')
+
+    async def push(self, name, channel, data):
+        await self.connections[name].send(json.dumps({'arg': {'channel': channel}, 'data': data}))
+
+
+async def wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "等待超时"
+        await asyncio.sleep(0.01)
+
+
+async def run_scenario(snapshot_path):
+    mock = MockOKX()
+    book = PositionBook()
+    stop = asyncio.Event()
+    async with serve(mock.handler, '127.0.0.1', 0) as server:
+        port = server.sockets[0].getsockname()[1]
+        url = f'ws://127.0.0.1:{port}'
+        accounts = list(ACCOUNTS.values()) + [Account('bad', 'key-main', 'wrong', 'pass-main')]
+        task = asyncio.create_task(position_stream.run(accounts, book, url, snapshot_path, stop))
+
+        # 全量快照
+        await wait_for(lambda: book.positions('main') is not None and book.positions('Wu666666') is not None)
+        assert {p['instId'] for p in book.positions('main')} == {'BTC-USDT-SWAP', 'ETH-USDT-SWAP'}
+        assert book.positions('bad') is None
+        print(f"✅ 登录签名校验通过，收到全量快照: {sorted(mock.logins)}")
+
+        # 增量：ETH 平仓、SOL 新开仓、BTC 更新；余额推送
+        await mock.push('main', 'positions', [position('ETH-USDT-SWAP', 'short', '0'),
+                                              position('SOL-USDT-SWAP', 'long', '3'),
+                                              position('BTC-USDT-SWAP', 'long', '2', upl='9.9')])
+        await mock.push('main', 'account', [{'totalEq': '1234.5'}])
+        await wait_for(lambda: len(book.positions('main')) == 2 and book.snapshot()['accounts']['main']['balance'])
+        by_inst = {p['instId']: p for p in book.positions('main')}
+        assert set(by_inst) == {'BTC-USDT-SWAP', 'SOL-USDT-SWAP'}
+        assert by_inst['BTC-USDT-SWAP']['upl'] == '9.9'
+
+        # 快照文件可被其他进程读取
+        await wait_for(lambda: read_positions('main', path=snapshot_path) is not None
+                       and len(read_positions('main', path=snapshot_path)) == 2)
+        assert [p['instId'] for p in read_positions('Wu666666', inst_type='SWAP', path=snapshot_path)] == ['CRV-USDT-SWAP']
+        assert read_positions('bad', path=snapshot_path) is None
+        print("✅ 增量更新（平仓/开仓/更新）与快照文件一致")
+
+        # 断线期间 CRV 已平仓：重连后全量快照替换旧持仓
+        mock.initial_positions['Wu666666'] = [position('LDO-USDT-SWAP', 'short', '50')]
+        await mock.connections['Wu666666'].close()
+        await wait_for(lambda: mock.logins.count('Wu666666') == 2
+                       and [p['instId'] for p in book.positions('Wu666666') or []] == ['LDO-USDT-SWAP'])
+        print("✅ 断线重连后以全量快照替换持仓")
+
+        stop.set()
+        for ws in list(mock.connections.values()):
+            await ws.close()
+        await asyncio.wait_for(task, 5)
+
+    # 服务停止后快照标记为未连接，读取方回退到REST
+    assert read_positions('main', path=snapshot_path) is None
+
+
+def test_position_stream_with_mock_server():
+    snapshot_path = os.path.join(tempfile.mkdtemp(), 'position_book.json')
+    original = position_stream.MAX_BACKOFF
+    position_stream.MAX_BACKOFF = 0.05
+    try:
+        asyncio.run(run_scenario(snapshot_path))
+    finally:
+        position_stream.MAX_BACKOFF = original
+
+
+def test_stale_snapshot_is_ignored():
+    snapshot_path = os.path.join(tempfile.mkdtemp(), 'position_book.json')
+    book = PositionBook()
+    book.set_connected('main', True)
+    book.apply_positions('main', [position('BTC-USDT-SWAP', 'long', '1')])
+    position_stream.write_snapshot(book, snapshot_path)
+    assert len(read_positions('main', path=snapshot_path)) == 1
+
+    data = json.load(open(snapshot_path, encoding='utf-8'))
+    data['accounts']['main']['updated_at'] = time.time() - 120
+    with open(snapshot_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.utime(snapshot_path, ns=(time.time_ns(), time.time_ns() + 1000))
+    assert read_positions('main', path=snapshot_path) is None
+    assert read_positions('main', path=snapshot_path + '.missing') is None
+    print("✅ 过期或缺失的快照返回 None（回退到REST）")
+
+
+if __name__ == '__main__':
+    test_position_stream_with_mock_server()
+    test_stale_snapshot_is_ignored()
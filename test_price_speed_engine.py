@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+测试流式涨跌速引擎
+验证对齐时刻的 1/3/5 分钟涨跌幅与按时间点回放推送得到的价格精确一致，
+缺失采样/过期价格为 NaN，预警变化只触发一次，时钟批量写库且预警亚秒级送达，
+预警回调的异常会被记录
+"""
+
+import asyncio
+import logging
+import math
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+import numpy as np
+
+from async_sqlite_writer import AsyncSQLiteWriter
+from price_speed_engine import (SpeedEngine, _log_alert_failure, alert_level, apply_ticker_message, init_database,
+                                run_clock)
+
+SYMBOLS = ['BTC', 'ETH', 'DOGE']
+START = 1760000000          # 对齐的起始秒
+
+
+def make_ticks(seconds, seed=3):
+    """每个币种不规则间隔的推送 (ts_ms, symbol, price)，按时间排序"""
+    rng = random.Random(seed)
+    ticks = []
+    for symbol, price in zip(SYMBOLS, (95000.0, 3300.0, 0.2)):
+        ts = START * 1000 - 500
+        while ts < (START + seconds) * 1000:
+            ts += rng.randint(50, 2500)
+            price *= 1 + rng.gauss(0, 0.002)
+            ticks.append((ts, symbol, price))
+    ticks.sort()
+    return ticks
+
+
+def price_at(ticks, symbol, instant):
+    """instant 秒（含）之前最后一次推送的价格"""
+    price = None
+    for ts, tick_symbol, tick_price in ticks:
+        if ts > instant * 1000:
+            break
+        if tick_symbol == symbol:
+            price = tick_price
+    return price
+
+
+def test_exact_aligned_changes():
+    """每个整秒的涨跌幅与回放价格计算一致；跳过的采样使对应窗口为 NaN"""
+    ticks = make_ticks(400)
+    engine = SpeedEngine(SYMBOLS)
+    skipped = START + 100
+    position = 0
+    checked = 0
+    for instant in range(START, START + 400):
+        while position < len(ticks) and ticks[position][0] <= instant * 1000:
+            ts, symbol, price = ticks[position]
+            engine.on_tick(symbol, price, ts)
+            position += 1
+        if instant == skipped:
+            continue
+        snapshot = engine.sample(instant)
+        for i, symbol in enumerate(SYMBOLS):
+            for window in (60, 180, 300):
+                past = instant - window
+                change = snapshot.changes[window][i]
+                before = price_at(ticks, symbol, past)
+                if past < START or past == skipped or before is None:
+                    assert math.isnan(change), (instant, symbol, window)
+                    continue
+                now = price_at(ticks, symbol, instant)
+                assert change == (now - before) / before * 100, (instant, symbol, window)
+                checked += 1
+    assert checked > 1500
+    print("✅ 对齐时刻的1/3/5分钟涨跌幅精确一致")
+
+
+def test_ignored_and_stale_ticks():
+    """0价格、未知币种、乱序推送被忽略；超过 stale_after 无推送的币种为 NaN"""
+    engine = SpeedEngine(SYMBOLS, stale_after=60)
+    assert engine.on_tick('BTC', '95000', START * 1000)
+    assert not engine.on_tick('BTC', 0, START * 1000 + 1)
+    assert not engine.on_tick('BTC', None, START * 1000 + 2)
+    assert not engine.on_tick('XXX', 1.0, START * 1000)
+    assert not engine.on_tick('BTC', 90000, START * 1000 - 1)
+    assert apply_ticker_message(engine, {
+        'arg': {'channel': 'tickers', 'instId': 'ETH-USDT-SWAP'},
+        'data': [{'instId': 'ETH-USDT-SWAP', 'last': '3300.5', 'ts': str(START * 1000)}],
+    }) == 1
+    snapshot = engine.sample(START)
+    assert snapshot.prices.tolist()[:2] == [95000.0, 3300.5] and math.isnan(snapshot.prices[2])
+    later = engine.sample(START + 61)
+    assert np.isnan(later.prices).all()
+    print("✅ 无效推送与过期价格处理正确")
+
+
+def test_alert_transitions():
+    """预警级别进入、升级时各触发一次，回到 normal 不触发"""
+    engine = SpeedEngine(['BTC'])
+    levels = []
+    for offset, price in enumerate([100.0] * 61 + [100.6, 100.7, 101.2, 100.1, 100.7]):
+        engine.on_tick('BTC', price, (START + offset) * 1000)
+        snapshot = engine.sample(START + offset)
+        levels.extend(alert.alert_level for alert in engine.alerts(snapshot))
+    assert levels == ['general_up', 'strong_up', 'general_up'], levels
+    assert alert_level(-2.5) == ('super_strong_down', 'DOWN')
+    print("✅ 预警级别变化只触发一次")
+
+
+def test_clock_persists_and_alerts():
+    """时钟每秒采样，批量写入历史与最新状态，预警在一秒内送达"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'price_speed_data.db')
+        conn = sqlite3.connect(db)
+        init_database(conn)
+        conn.commit()
+
+        engine = SpeedEngine(SYMBOLS)
+        now = int(time.time())
+        for instant in range(now - 70, now + 1):
+            for symbol in SYMBOLS:
+                engine.on_tick(symbol, 10.0, instant * 1000)
+            engine.sample(instant)
+
+        received = []
+
+        async def main():
+            stop = asyncio.Event()
+            writer = AsyncSQLiteWriter(db, flush_interval=0.1)
+            writer.start()
+            clock = asyncio.ensure_future(run_clock(
+                engine, writer, stop, on_alerts=lambda alerts: received.append((time.time(), alerts)),
+                persist_every=1))
+            await asyncio.sleep(1.2)
+            jumped_at = time.time()
+            engine.on_tick('ETH', 10.11)
+            while not received and time.time() - jumped_at < 3:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(1.1)
+            stop.set()
+            await clock
+            await writer.stop()
+            return jumped_at
+
+        jumped_at = asyncio.run(main())
+        assert received, "没有收到预警"
+        latency = received[0][0] - jumped_at
+        assert latency < 1.1, latency
+        assert [alert.symbol for alert in received[0][1]] == ['ETH']
+
+        latest = dict(conn.execute('SELECT symbol, alert_level FROM latest_price_speed').fetchall())
+        assert latest == {'BTC': 'normal', 'ETH': 'strong_up', 'DOGE': 'normal'}, latest
+        row = conn.execute('''
+            SELECT current_price, previous_price, change_3m, change_5m FROM latest_price_speed
+            WHERE symbol = 'ETH'
+        ''').fetchone()
+        assert row[:2] == (10.11, 10.0) and row[2] is None and row[3] is None
+        assert conn.execute('SELECT COUNT(*) FROM price_history').fetchone()[0] >= 6
+        assert conn.execute('SELECT COUNT(*) FROM price_speed_alerts').fetchone()[0] >= 6
+        conn.close()
+    print(f"✅ 批量写库正确，预警延迟 {latency * 1000:.0f}ms")
+
+
+def test_alert_failure_logged():
+    """线程池中的预警回调抛出的异常会被记录而不是静默丢弃"""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    logger = logging.getLogger('price_speed_engine')
+    logger.addHandler(handler)
+
+    def on_alerts(alerts):
+        raise RuntimeError('telegram down')
+
+    async def main():
+        future = asyncio.get_running_loop().run_in_executor(None, on_alerts, [])
+        future.add_done_callback(_log_alert_failure)
+        await asyncio.wait([future])
+        await asyncio.sleep(0)
+
+    try:
+        asyncio.run(main())
+    finally:
+        logger.removeHandler(handler)
+    assert len(records) == 1 and records[0].levelno == logging.ERROR
+    assert 'telegram down' in records[0].getMessage()
+    print("✅ 预警推送异常已记录")
+
+
+if __name__ == '__main__':
+    test_exact_aligned_changes()
+    test_ignored_and_stale_ticks()
+    test_alert_transitions()
+    test_clock_persists_and_alerts()
+    test_alert_failure_logged()
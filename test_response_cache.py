@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+测试API响应缓存
+验证LRU淘汰、TTL过期、数据版本失效、单飞和统计
+"""
+
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+from response_cache import DataVersions, ResponseCache, bump_data_version
+
+
+def test_lru_ttl_and_versions():
+    cache = ResponseCache(max_entries=2)
+    calls = []
+
+    def compute(value):
+        def run():
+            calls.append(value)
+            return value, True
+        return run
+
+    assert cache.get_or_compute('r', ('r', 1), 60, (1,), compute('a')) == ('a', None)
+    value, age = cache.get_or_compute('r', ('r', 1), 60, (1,), compute('x'))
+    assert value == 'a' and age is not None
+
+    # 版本变化 → 失效重算
+    assert cache.get_or_compute('r', ('r', 1), 60, (2,), compute('b'))[0] == 'b'
+
+    # TTL 过期
+    cache.get_or_compute('r', ('r', 2), 0.05, (1,), compute('c'))
+    time.sleep(0.06)
+    assert cache.get_or_compute('r', ('r', 2), 0.05, (1,), compute('d'))[0] == 'd'
+
+    # 容量2，插入第三个键淘汰最久未使用的 ('r', 1)
+    cache.get_or_compute('r', ('r', 3), 60, (1,), compute('e'))
+    assert cache.get_or_compute('r', ('r', 1), 60, (2,), compute('f'))[0] == 'f'
+    assert calls == ['a', 'b', 'c', 'd', 'e', 'f']
+
+    stats = cache.get_stats()['routes']['r']
+    assert stats['hits'] == 1
+    assert stats['invalidated'] == 1 and stats['expired'] == 1
+    assert stats['evictions'] >= 1
+    print(f"✅ LRU/TTL/版本失效正确: {stats}")
+
+
+def test_uncacheable_and_errors():
+    cache = ResponseCache()
+    cache.get_or_compute('r', 'k', 60, (), lambda: ({'success': False}, False))
+    assert cache.get_stats()['entries'] == 0
+
+    try:
+        cache.get_or_compute('r', 'k', 60, (), lambda: 1 / 0)
+        assert False
+    except ZeroDivisionError:
+        pass
+    assert cache.get_stats()['routes']['r']['errors'] == 1
+    assert cache.get_stats()['in_flight'] == 0
+    print("✅ 失败结果不缓存，异常不残留进行中的计算")
+
+
+def test_single_flight():
+    """并发相同请求只计算一次"""
+    cache = ResponseCache()
+    calls = []
+    barrier = threading.Barrier(8)
+
+    def slow():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'value', True
+
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(cache.get_or_compute('slow', 'k', 60, (), slow)[0])
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+    stats = cache.get_stats()['routes']['slow']
+    assert stats['misses'] == 1 and stats['coalesced'] + stats['hits'] == 7
+    print(f"✅ 单飞: 8个并发请求只计算 {len(calls)} 次")
+
+
+def test_data_versions_table():
+    db_path = os.path.join(tempfile.mkdtemp(), 'versions.db')
+    versions = DataVersions(poll_interval=0)
+    sources = [(db_path, 'crypto_snapshots'), (db_path, 'other')]
+
+    # 表不存在时为0
+    assert versions.get(sources) == (0, 0)
+
+    conn = sqlite3.connect(db_path)
+    bump_data_version(conn.cursor(), 'crypto_snapshots')
+    bump_data_version(conn.cursor(), 'crypto_snapshots')
+    conn.commit()
+    conn.close()
+    assert versions.get(sources) == (2, 0)
+
+    # 轮询间隔内不重复查询
+    slow = DataVersions(poll_interval=60)
+    assert slow.get(sources) == (2, 0)
+    conn = sqlite3.connect(db_path)
+    bump_data_version(conn, 'crypto_snapshots')
+    conn.commit()
+    conn.close()
+    assert slow.get(sources) == (2, 0)
+    slow.invalidate()
+    assert slow.get(sources) == (3, 0)
+    print("✅ 数据版本号递增与读取正确")
+
+
+if __name__ == '__main__':
+    test_lru_ttl_and_versions()
+    test_uncacheable_and_errors()
+    test_single_flight()
+    test_data_versions_table()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+测试规则向量化回测
+用实盘的 TakeProfitRules.get_take_profit_rule / StopProfitLossManager.check_loss_trigger
+逐币种逐K线跑标量参考实现，验证向量化回测的盈亏、回撤与触发次数一致；
+进程池分块与单进程结果相同
+"""
+
+import math
+import random
+
+import numpy as np
+
+import anchor_maintenance_daemon as anchor_rules
+import sub_account_super_maintenance as super_rules
+from rule_backtester import DAY_MS, BEIJING_OFFSET_MS, align_closes, param_grid, run_grid, simulate
+from stop_profit_loss_manager import StopProfitLossManager
+from take_profit_rules import TakeProfitRules
+
+START_MS = 1735660800000
+BAR_MS = 5 * 60 * 1000
+SYMBOLS = ['BTC', 'ETH', 'DOGE']
+
+
+def make_market(bars=900, seed=7):
+    """随机游走收盘价，ETH 晚上市、DOGE 中间缺几根K线"""
+    rng = random.Random(seed)
+    series = []
+    for i, (symbol, price) in enumerate(zip(SYMBOLS, (95000.0, 3300.0, 0.2))):
+        rows = []
+        for bar in range(bars):
+            price *= 1 + rng.gauss(0, 0.006)
+            if (symbol == 'ETH' and bar < 40) or (symbol == 'DOGE' and 300 <= bar < 310):
+                continue
+            rows.append((START_MS + bar * BAR_MS, price))
+        series.append(rows)
+    return align_closes(SYMBOLS, series)
+
+
+def reference(closes, timestamps, params):
+    """单币种标量回测，止盈/止损判断直接调用实盘规则"""
+    rules = TakeProfitRules.__new__(TakeProfitRules)
+    rules.get_market_config = lambda: {'allow_long': params['allow_long']}
+    stops = StopProfitLossManager.__new__(StopProfitLossManager)
+    side = params['side']
+    direction = 1 if side == 'long' else -1
+    lev = params['leverage']
+    fee_rate = params['fee_rate']
+    stop_loss = params['stop_loss']
+    trigger = params['maintenance_trigger']
+    if trigger is None:
+        trigger = super_rules.TRIGGER_RATE if params['maintenance'] == 'super' else anchor_rules.MAINTENANCE_TRIGGER_RATE
+
+    state = dict(qty=0.0, avg=0.0, realized=0.0, fees=0.0, level=0, anchor_done=False, count=0, day=None,
+                 cooldown=0, last=math.nan)
+    counts = dict(entries=0, take_profits=0, stops=0, maintenances=0)
+    peak = drawdown = max_margin = 0.0
+
+    def close(size, price, step):
+        state['realized'] += direction * (price - state['avg']) * size
+        state['fees'] += size * price * fee_rate
+        state['qty'] -= size
+        if state['qty'] <= 1e-12 * max(1.0, size):
+            state['qty'] = 0.0
+            state['cooldown'] = step + params['reentry_bars']
+
+    def buy(size, price):
+        state['fees'] += size * price * fee_rate
+        total = state['qty'] + size
+        state['avg'] = (state['qty'] * state['avg'] + size * price) / total
+        state['qty'] = total
+
+    for step, price in enumerate(closes):
+        if not math.isnan(price):
+            state['last'] = price
+            if state['qty'] == 0 and step >= state['cooldown']:
+                state.update(qty=0.0, avg=0.0, level=0, anchor_done=False)
+                buy(params['entry_margin'] * lev / price, price)
+                counts['entries'] += 1
+            elif state['qty'] > 0:
+                profit_rate = direction * (price / state['avg'] - 1) * lev * 100
+                thresholds = (TakeProfitRules.LONG_RULES if side == 'long' else TakeProfitRules.SHORT_RULES)[
+                    'allow_long' if params['allow_long'] else 'not_allow_long']['triggers']
+                reached = sum(1 for t in thresholds if t['profit'] <= profit_rate)
+                fired = reached > state['level']
+                if fired:
+                    margin = state['qty'] * state['avg'] / lev
+                    rule = rules.get_take_profit_rule(side, profit_rate, margin)
+                    if rule:
+                        size = min(state['qty'], state['qty'] * rule['close_size'] / margin)
+                        if size > 0:
+                            close(size, price, step)
+                            counts['take_profits'] += 1
+                    state['level'] = reached
+                if stop_loss is None:
+                    stopped = not fired and stops.check_loss_trigger(side, profit_rate)
+                else:
+                    stopped = not fired and stop_loss != 'off' and profit_rate <= stop_loss
+                if stopped:
+                    close(state['qty'], price, step)
+                    counts['stops'] += 1
+
+                day = (int(timestamps[step]) + BEIJING_OFFSET_MS) // DAY_MS
+                if day != state['day']:
+                    state.update(day=day, count=0)
+                if not fired and not stopped and profit_rate <= trigger:
+                    if params['maintenance'] == 'anchor' and not state['anchor_done']:
+                        state['anchor_done'] = True
+                        add = state['qty'] * anchor_rules.MAINTENANCE_ADD_MULTIPLE
+                        total = state['qty'] + add
+                        target = max(anchor_rules.MIN_KEEP_MARGIN,
+                                     min(anchor_rules.MAX_KEEP_MARGIN, total * price / lev))
+                        remain = target * lev / price
+                        if remain < total:
+                            buy(add, price)
+                            close(total - remain, price, step)
+                            counts['maintenances'] += 1
+                    elif (params['maintenance'] == 'super' and state['count'] < super_rules.MAX_MAINTENANCE_COUNT
+                          and not (state['count'] == 2 and profit_rate <= super_rules.STOP_LOSS_RATE)):
+                        amount, target = super_rules.MAINTENANCE_SCHEDULE[state['count']]
+                        order = amount * lev / price
+                        buy(order, price)
+                        close(max(order - target * lev / price, 0.0), price, step)
+                        state['count'] += 1
+                        counts['maintenances'] += 1
+
+        unrealized = direction * (state['last'] - state['avg']) * state['qty'] if state['qty'] > 0 else 0.0
+        equity = state['realized'] - state['fees'] + unrealized
+        peak = max(peak, equity)
+        drawdown = max(drawdown, peak - equity)
+        max_margin = max(max_margin, state['qty'] * state['avg'] / lev)
+
+    unrealized = direction * (state['last'] - state['avg']) * state['qty'] if state['qty'] > 0 else 0.0
+    return dict(pnl=state['realized'] - state['fees'] + unrealized, realized=state['realized'],
+                fees=state['fees'], max_drawdown=drawdown, max_margin=max_margin, **counts)
+
+
+def close_enough(a, b):
+    return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+
+
+def test_matches_scalar_reference():
+    """每组参数、每个币种的结果与标量参考实现一致"""
+    market = make_market()
+    grid = param_grid(side=['long', 'short'], allow_long=[False, True], maintenance=['none', 'anchor', 'super'],
+                      stop_loss=[None, 'off', -60.0], leverage=[10, 20])
+    results = simulate(market, grid)
+    assert len(results) == len(grid)
+    totals = dict(take_profits=0, stops=0, maintenances=0)
+    for params, result in zip(grid, results):
+        for i, symbol in enumerate(SYMBOLS):
+            expected = reference(market.closes[i], market.timestamps, params)
+            actual = result['symbols'][symbol]
+            for key, value in expected.items():
+                if isinstance(value, int):
+                    assert actual[key] == value, (params, symbol, key, actual[key], value)
+                else:
+                    assert close_enough(actual[key], value), (params, symbol, key, actual[key], value)
+        for key in totals:
+            totals[key] += result[key]
+        assert close_enough(result['pnl'], sum(item['pnl'] for item in result['symbols'].values()))
+        assert result['max_drawdown'] <= sum(item['max_drawdown'] for item in result['symbols'].values()) + 1e-9
+    # 随机行情要覆盖到所有类型的触发
+    assert all(count > 0 for count in totals.values()), totals
+    print(f"✅ {len(grid)} 组参数 × {len(SYMBOLS)} 币种与标量参考实现一致 {totals}")
+
+
+def test_process_pool_grid():
+    """参数组分块跑进程池，结果与单进程相同"""
+    market = make_market(bars=400, seed=11)
+    grid = param_grid(side=['long', 'short'], maintenance=['anchor', 'super'], reentry_bars=[0, 6, 24])
+    single = simulate(market, grid)
+    pooled = run_grid(market, grid, workers=2, chunk_size=5)
+    assert [r['params'] for r in pooled] == grid
+    for a, b in zip(single, pooled):
+        assert a == b
+    assert not np.isnan([r['pnl'] for r in pooled]).any()
+    print("✅ 进程池分块回测结果一致")
+
+
+if __name__ == '__main__':
+    test_matches_scalar_reference()
+    test_process_pool_grid()
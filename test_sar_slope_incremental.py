@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+测试SAR斜率系统增量模式
+验证增量追加后的数据与对同一段K线全量重建的结果一致
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+
+import sar_slope_system_complete as sar_system
+
+
+def make_klines(count, seed=5, start_ts=1700000000000):
+    """生成随机5分钟K线（OKX格式，第9列为confirm）"""
+    rng = random.Random(seed)
+    klines = []
+    price = 100.0
+    for i in range(count):
+        open_price = price
+        close = open_price * (1 + rng.gauss(0, 0.01))
+        high = max(open_price, close) * (1 + abs(rng.gauss(0, 0.003)))
+        low = min(open_price, close) * (1 - abs(rng.gauss(0, 0.003)))
+        klines.append([str(start_ts + i * 300000), str(open_price), str(high), str(low),
+                       str(close), '1', '1', '1', '1'])
+        price = close
+    return klines
+
+
+def unconfirmed(kline, close_factor):
+    """同一时间戳的未收盘K线（价格与最终收盘不同）"""
+    close = float(kline[4]) * close_factor
+    return [kline[0], kline[1], str(max(float(kline[2]), close)),
+            str(min(float(kline[3]), close)), str(close), '1', '1', '1', '0']
+
+
+def use_temp_db():
+    sar_system.DB_PATH = os.path.join(tempfile.mkdtemp(), 'sar_slope_test.db')
+    sar_system.init_database()
+    sar_system.detect_anomalies = lambda symbol: None
+    return sar_system.DB_PATH
+
+
+def dump(db_path):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    result = {
+        'raw': cursor.execute('''
+            SELECT timestamp, sar_value, position, position_sequence, duration_minutes
+            FROM sar_raw_data ORDER BY timestamp''').fetchall(),
+        'conversions': cursor.execute('''
+            SELECT timestamp, from_position, to_position, conversion_sar
+            FROM sar_conversion_points ORDER BY timestamp''').fetchall(),
+        'changes': cursor.execute('''
+            SELECT position, sequence_num, prev_sar, current_sar, kline_time, duration_minutes
+            FROM sar_consecutive_changes ORDER BY kline_time, position''').fetchall(),
+        'averages': {(row[0], row[1]): (round(row[2], 9), row[3]) for row in cursor.execute('''
+            SELECT position, period_type, avg_change_percent, sample_count
+            FROM sar_period_averages''')},
+        'status': cursor.execute('''
+            SELECT last_update_time, total_klines, current_position, current_sequence
+            FROM system_status''').fetchall(),
+    }
+    conn.close()
+    return result
+
+
+def test_incremental_matches_full_rebuild():
+    """全量 → 多次增量（含未收盘K线被修正）与一次性全量结果一致"""
+    klines = make_klines(700)
+    fetched = []
+
+    # 增量库：先全量600根（最后一根未收盘），再分三次增量
+    incremental_db = use_temp_db()
+    sar_system.fetch_kline_data = lambda symbol, limit=5000: klines[:599] + [unconfirmed(klines[599], 1.02)]
+    assert sar_system.collect_symbol_data('BTC') is True
+
+    batches = [
+        klines[599:650] + [unconfirmed(klines[650], 0.97)],
+        klines[650:651],
+        klines[651:700],
+    ]
+
+    def fake_fetch_new(symbol, since_timestamp, max_klines=sar_system.MIN_KLINES):
+        batch = batches.pop(0)
+        assert all(int(k[0]) > since_timestamp for k in batch)
+        fetched.append(len(batch))
+        return batch
+
+    sar_system.fetch_new_klines = fake_fetch_new
+    for _ in range(3):
+        assert sar_system.collect_symbol_data('BTC') is True
+    assert fetched == [52, 1, 49]
+    incremental = dump(incremental_db)
+
+    # 对照库：一次性全量700根
+    full_db = use_temp_db()
+    sar_system.fetch_kline_data = lambda symbol, limit=5000: klines
+    assert sar_system.collect_symbol_data('BTC', incremental=False) is True
+    full = dump(full_db)
+
+    assert incremental['raw'] == full['raw']
+    assert incremental['changes'] == full['changes']
+    assert [c[0] for c in incremental['conversions']] == [c[0] for c in full['conversions']]
+    assert incremental['averages'] == full['averages']
+    assert incremental['status'] == full['status']
+    print(f"✅ 增量结果与全量重建一致: {len(full['raw'])} 条SAR, "
+          f"{len(full['conversions'])} 个转换点, {len(full['averages'])} 个平均值")
+
+
+def test_missing_state_falls_back_to_full():
+    """没有计算状态时自动全量重建"""
+    use_temp_db()
+    klines = make_klines(50, seed=9)
+    calls = []
+
+    def fake_fetch(symbol, limit=5000):
+        calls.append(limit)
+        return klines
+
+    sar_system.fetch_kline_data = fake_fetch
+    assert sar_system.collect_symbol_data('ETH') is True
+    assert calls == [5000]
+
+    conn = sqlite3.connect(sar_system.DB_PATH)
+    state_ts = conn.execute("SELECT timestamp FROM sar_calc_state WHERE symbol = 'ETH'").fetchone()[0]
+    conn.close()
+    assert state_ts == int(klines[-1][0])
+    print("✅ 无状态时全量重建并保存状态")
+
+
+if __name__ == '__main__':
+    test_incremental_matches_full_rebuild()
+    test_missing_state_falls_back_to_full()
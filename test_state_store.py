@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+测试事务型键值状态存储
+验证旧 JSON 文件自动导入、多线程/多进程并发计数不丢失、
+其他进程写入后缓存失效、类型检查和删除、抽象命名空间不能实例化
+"""
+
+import json
+import multiprocessing
+import os
+import tempfile
+import threading
+
+from state_store import DELETE, StateDocument, StateMap, StateNamespace, StateStore
+
+
+def _namespaces(store):
+    config = StateDocument('test_config', 'sub_account_config.json', default_factory=dict, store=store)
+    counts = StateMap('test_counts', 'sub_account_maintenance_count.json', value_type=int, store=store)
+    records = StateMap('test_records', 'sub_account_maintenance.json', store=store)
+    return config, counts, records
+
+
+def _increment(db, legacy_dir, times):
+    store = StateStore(db=db, legacy_dir=legacy_dir)
+    _, counts, records = _namespaces(store)
+    for _ in range(times):
+        counts.update('BTC-USDT-SWAP_long', lambda count: count + 1, default=0)
+        records.update('acc_BTC_long', lambda record: dict(record, count=record['count'] + 1), default={'count': 0})
+
+
+def test_migrate_legacy_files():
+    """首次访问时导入旧 JSON 文件并改名为 .migrated"""
+    with tempfile.TemporaryDirectory() as tmp:
+        config_data = {'sub_accounts': [{'account_name': 'A', 'enabled': True}]}
+        with open(os.path.join(tmp, 'sub_account_config.json'), 'w', encoding='utf-8') as f:
+            json.dump(config_data, f)
+        with open(os.path.join(tmp, 'sub_account_maintenance_count.json'), 'w', encoding='utf-8') as f:
+            json.dump({'BTC-USDT-SWAP_long': 2}, f)
+
+        store = StateStore(db=os.path.join(tmp, 'state.db'), legacy_dir=tmp)
+        config, counts, records = _namespaces(store)
+        assert config.load() == config_data
+        assert counts.get('BTC-USDT-SWAP_long') == 2
+        assert records.all() == {}
+        assert os.path.exists(os.path.join(tmp, 'sub_account_config.json.migrated'))
+        assert not os.path.exists(os.path.join(tmp, 'sub_account_config.json'))
+
+        # 返回的是副本，修改不影响存储
+        config.load()['sub_accounts'].clear()
+        assert config.load() == config_data
+
+        # 新文件不会覆盖已导入的命名空间
+        with open(os.path.join(tmp, 'sub_account_config.json'), 'w', encoding='utf-8') as f:
+            json.dump({}, f)
+        other = StateStore(db=os.path.join(tmp, 'state.db'), legacy_dir=tmp)
+        assert _namespaces(other)[0].load() == config_data
+    print("✅ 旧 JSON 文件首次访问时导入")
+
+
+def test_concurrent_updates():
+    """多线程、多进程同时累加计数，没有丢失的更新"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'state.db')
+        store = StateStore(db=db, legacy_dir=tmp)
+        _, counts, records = _namespaces(store)
+        assert counts.get('BTC-USDT-SWAP_long') is None
+
+        threads = [threading.Thread(target=_increment, args=(db, tmp, 50)) for _ in range(4)]
+        # 有线程在写时 fork 会继承 SQLite 的进程内锁状态，子进程用 spawn 启动（与独立运行的守护进程一致）
+        spawn = multiprocessing.get_context('spawn')
+        processes = [spawn.Process(target=_increment, args=(db, tmp, 50)) for _ in range(3)]
+        for worker in threads + processes:
+            worker.start()
+        for worker in threads + processes:
+            worker.join()
+        assert all(p.exitcode == 0 for p in processes)
+
+        assert counts.get('BTC-USDT-SWAP_long') == 350
+        assert records.get('acc_BTC_long') == {'count': 350}
+    print("✅ 并发累加没有丢失更新")
+
+
+def test_cache_invalidation():
+    """其他实例写入后本实例读到新值；没有写入时命中缓存"""
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'state.db')
+        reader = StateStore(db=db, legacy_dir=tmp)
+        writer = StateStore(db=db, legacy_dir=tmp)
+        config, counts, _ = _namespaces(reader)
+        w_config, w_counts, _ = _namespaces(writer)
+
+        counts.set('a', 1)
+        assert counts.get('a') == 1
+        cached = reader._cache['test_counts']
+        assert counts.get('a') == 1 and reader._cache['test_counts'] is cached
+
+        w_counts.update('a', lambda count: count + 10)
+        w_config.save({'enabled': True})
+        assert counts.get('a') == 11
+        assert config.load() == {'enabled': True}
+        assert config.update(lambda value: value.update(enabled=False)) == {'enabled': False}
+        assert w_config.load() == {'enabled': False}
+    print("✅ 其他实例写入后缓存失效")
+
+
+def test_types_and_delete():
+    """写入时检查类型；DELETE 删除键；没有实现 from_legacy 的命名空间不能创建"""
+    try:
+        StateNamespace('test_abstract')
+    except TypeError:
+        pass
+    else:
+        raise AssertionError('StateNamespace 是抽象类')
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = StateStore(db=os.path.join(tmp, 'state.db'), legacy_dir=tmp)
+        config, counts, records = _namespaces(store)
+        for bad in (lambda: counts.set('a', 'x'), lambda: records.set('a', 1), lambda: config.save([])):
+            try:
+                bad()
+            except TypeError:
+                pass
+            else:
+                raise AssertionError('应当拒绝错误的类型')
+
+        counts.set('a', 1)
+        counts.set('b', 2)
+        assert 'a' in counts
+        counts.delete('a')
+        assert 'a' not in counts and counts.all() == {'b': 2}
+        store.write(counts, lambda read: {'b': DELETE, 'c': read('b') + 1})
+        assert counts.all() == {'c': 3}
+        counts.replace({'d': 4})
+        assert counts.all() == {'d': 4}
+    print("✅ 类型检查和删除")
+
+
+if __name__ == '__main__':
+    test_migrate_legacy_files()
+    test_concurrent_updates()
+    test_cache_invalidation()
+    test_types_and_delete()
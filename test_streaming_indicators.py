@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+测试增量流式指标引擎
+验证逐tick更新后的结果与 talib 对完整序列的计算一致
+"""
+
+import random
+
+import numpy as np
+import talib
+
+from okex_websocket_realtime_collector_fixed import calculate_indicators
+from streaming_indicators import StreamingIndicators
+
+
+def make_klines(count, seed=7, start_price=100.0):
+    """生成随机游走K线 [timestamp, open, high, low, close, volume]"""
+    rng = random.Random(seed)
+    klines = []
+    price = start_price
+    for i in range(count):
+        open_price = price
+        close = max(0.01, open_price * (1 + rng.gauss(0, 0.01)))
+        high = max(open_price, close) * (1 + abs(rng.gauss(0, 0.004)))
+        low = min(open_price, close) * (1 - abs(rng.gauss(0, 0.004)))
+        klines.append([str(1700000000000 + i * 300000), str(open_price), str(high),
+                       str(low), str(close), '1'])
+        price = close
+    return klines
+
+
+def reference(klines):
+    """talib 对完整序列的计算结果（SAR计数不受窗口长度限制）"""
+    closes = np.array([float(k[4]) for k in klines])
+    highs = np.array([float(k[2]) for k in klines])
+    lows = np.array([float(k[3]) for k in klines])
+    rsi = talib.RSI(closes, timeperiod=14)
+    sar = talib.SAR(highs, lows, acceleration=0.02, maximum=0.2)
+    upper, middle, lower = talib.BBANDS(closes, timeperiod=20, nbdevup=2, nbdevdn=2)
+
+    position = 'bullish' if closes[-1] > sar[-1] else 'bearish'
+    count = 1
+    for i in range(len(sar) - 2, -1, -1):
+        if np.isnan(sar[i]):
+            break
+        if ('bullish' if closes[i] > sar[i] else 'bearish') != position:
+            break
+        count += 1
+    return {
+        'rsi_14': rsi[-1], 'sar': sar[-1], 'bb_upper': upper[-1],
+        'bb_middle': middle[-1], 'bb_lower': lower[-1],
+        'sar_position': position, 'sar_count': count,
+    }
+
+
+def assert_matches(result, klines):
+    expected = reference(klines)
+    for key in ('rsi_14', 'sar', 'bb_upper', 'bb_middle', 'bb_lower'):
+        assert abs(result[key] - expected[key]) <= 1e-7 * max(1.0, abs(expected[key])), \
+            (key, result[key], expected[key], len(klines))
+    assert result['sar_position'] == expected['sar_position']
+    assert int(result['sar_count_label'][2:]) == expected['sar_count']
+
+
+def test_matches_talib_per_bar():
+    """每根K线收盘后与 talib 一致"""
+    klines = make_klines(400)
+    engine = StreamingIndicators()
+    for i, kline in enumerate(klines):
+        engine.update(kline)
+        if i + 1 >= 20:
+            assert_matches(engine.indicators(), klines[:i + 1])
+        if i >= 20:
+            assert_matches(engine.closed_indicators(), klines[:i])
+    print("✅ 逐K线结果与 talib 一致")
+
+
+def test_tiny_prices():
+    """价格极小（方差低于 1e-8）的币种布林带与 talib 一致"""
+    klines = [[k[0]] + [str(float(v) * 2e-7) for v in k[1:5]] + [k[5]]
+              for k in make_klines(60, seed=5)]
+    engine = StreamingIndicators()
+    for kline in klines:
+        engine.update(kline)
+    expected = reference(klines)
+    result = engine.indicators()
+    for key in ('bb_upper', 'bb_lower'):
+        assert abs(result[key] - expected[key]) <= 1e-9 * abs(expected[key]), (key, result[key], expected[key])
+    assert result['bb_upper'] > result['bb_middle']
+    print("✅ 极小价格布林带与 talib 一致")
+
+
+def test_intrabar_ticks():
+    """同一根K线多次推送只修改未收盘K线，不影响已收盘状态"""
+    klines = make_klines(120, seed=11)
+    engine = StreamingIndicators()
+    for kline in klines[:-1]:
+        engine.update(kline)
+
+    last = klines[-1]
+    assert engine.update(last) is True
+    for close in (float(last[4]) * 0.97, float(last[4]) * 1.03, float(last[4])):
+        tick = [last[0], last[1], str(max(float(last[2]), close)),
+                str(min(float(last[3]), close)), str(close), '1']
+        assert engine.update(tick) is False
+        assert_matches(engine.indicators(), klines[:-1] + [tick])
+    print("✅ 未收盘K线实时更新正确")
+
+
+def test_same_as_calculate_indicators_on_warm_cache():
+    """只加载100根K线时与采集器原来的 calculate_indicators 完全一致"""
+    klines = make_klines(100, seed=3, start_price=95000.0)
+    engine = StreamingIndicators()
+    for kline in klines:
+        engine.update(kline)
+
+    for result, expected in ((engine.indicators(), calculate_indicators(klines)),
+                             (engine.closed_indicators(), calculate_indicators(klines[:-1]))):
+        for key, value in expected.items():
+            if isinstance(value, str) or value is None:
+                assert result[key] == value, key
+            else:
+                assert abs(result[key] - value) <= 1e-7 * max(1.0, abs(value)), key
+    print("✅ 与 calculate_indicators 结果一致")
+
+
+def test_stale_and_short_series():
+    engine = StreamingIndicators()
+    klines = make_klines(25)
+    for kline in klines[:19]:
+        engine.update(kline)
+    assert engine.indicators() is None
+    engine.update(klines[19])
+    assert engine.indicators() is not None
+    # 旧时间戳的推送被忽略
+    assert engine.update(klines[5]) is False
+    assert engine.forming[0] == int(klines[19][0])
+    print("✅ 数据不足与过期推送处理正确")
+
+
+if __name__ == '__main__':
+    test_matches_talib_per_bar()
+    test_tiny_prices()
+    test_intrabar_ticks()
+    test_same_as_calculate_indicators_on_warm_cache()
+    test_stale_and_short_series()
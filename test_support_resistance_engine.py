@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+测试支撑压力线批量引擎
+验证向量化结果与逐币种的 calculate_support_resistance 一致、大周期高低点缓存的刷新条件、
+基准价和结果单事务写入
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import datetime
+
+import support_resistance_collector as collector
+from support_resistance_engine import BAR_MS, BEIJING_TZ, LEVEL_COLUMNS, SupportResistanceEngine, okx_inst_id
+
+NOW_MS = 1765500000000
+WEEK_START = NOW_MS - BAR_MS['1W'] // 2
+TWO_DAY_START = NOW_MS - BAR_MS['2D'] // 2
+
+
+class FakeClient:
+    def __init__(self, bars, prices):
+        self.bars = bars          # (inst_id, bar) -> [ts, open, high, low, close]
+        self.prices = prices      # inst_id -> last
+        self.candle_calls = []
+
+    def get_candles(self, inst_id, bar='5m', limit=100):
+        self.candle_calls.append((inst_id, bar))
+        candle = self.bars.get((inst_id, bar))
+        return [candle] if candle else None
+
+    def get_last_prices(self, inst_ids, inst_type='SWAP'):
+        return {inst_id: self.prices[inst_id] for inst_id in inst_ids if inst_id in self.prices}
+
+    def map(self, func, items):
+        return [func(item) for item in items]
+
+
+def _market(count=60, consistent=False):
+    rng = random.Random(5)
+    symbols, bars, prices = [], {}, {}
+    for i in range(count):
+        symbol = f'C{i}USDT'
+        inst_id = okx_inst_id(symbol)
+        symbols.append(symbol)
+        base = rng.choice([0.05, 0.9, 5, 12, 300, 60000])
+        low_7d, high_7d = base * 0.8, base * 1.2
+        low_48h, high_48h = base * rng.uniform(0.8, 1.0), base * rng.uniform(1.0, 1.2)
+        price = base * rng.choice([0.7, 0.81, 0.85, 1.0, 1.15, 1.19, 1.3])
+        if i % 10 == 0:
+            low_7d = high_7d = low_48h = high_48h = price = base    # 区间为0
+        if consistent:
+            # 真实K线的高低点包含当前价
+            low_7d, high_7d = min(low_7d, price), max(high_7d, price)
+            low_48h, high_48h = min(low_48h, price), max(high_48h, price)
+        bars[(inst_id, '1W')] = [str(WEEK_START), '0', str(high_7d), str(low_7d), '0']
+        if i % 7 != 3:
+            bars[(inst_id, '2D')] = [str(TWO_DAY_START), '0', str(high_48h), str(low_48h), '0']
+        if i % 13 != 5:
+            prices[inst_id] = price
+    bars.pop((okx_inst_id('C11USDT'), '1W'), None)    # 1周K线请求失败
+    return symbols, bars, prices
+
+
+def test_matches_scalar_calculation():
+    symbols, bars, prices = _market()
+    client = FakeClient(bars, prices)
+    engine = SupportResistanceEngine(symbols, client=client)
+    symbol_prices = {symbol: prices.get(okx_inst_id(symbol)) for symbol in symbols}
+    results = {data['symbol']: data for data in engine.compute(symbol_prices, now_ms=NOW_MS)}
+
+    original = (collector.get_client, collector.get_or_create_baseline_price, collector.log)
+    collector.get_client = lambda: client
+    collector.log = lambda message: None
+    collector.get_or_create_baseline_price = lambda symbol, price: {
+        'baseline_price': 0, 'price_change': 0, 'change_percent': 0}
+    try:
+        compared = 0
+        for symbol in symbols:
+            expected = collector.calculate_support_resistance(symbol, symbol_prices[symbol])
+            if expected is None:
+                assert symbol not in results, symbol
+                continue
+            data = results[symbol]
+            for column in LEVEL_COLUMNS[:25]:
+                assert data[column] == expected[column], (symbol, column, data[column], expected[column])
+            compared += 1
+    finally:
+        collector.get_client, collector.get_or_create_baseline_price, collector.log = original
+    assert compared == len(results) > 40
+    assert any(data['alert_triggered'] for data in results.values())
+    print(f"✅ {compared} 个币种的向量化结果与逐币种计算一致")
+
+
+def test_extremes_cache():
+    symbols, bars, prices = _market(10, consistent=True)
+    client = FakeClient(bars, prices)
+    engine = SupportResistanceEngine(symbols, client=client)
+    symbol_prices = {symbol: prices.get(okx_inst_id(symbol)) for symbol in symbols}
+
+    engine.compute(symbol_prices, now_ms=NOW_MS)
+    first = len(client.candle_calls)
+    assert first == 2 * sum(1 for price in symbol_prices.values() if price)
+
+    # 价格不变：只重试上次请求失败的（C3 没有2D K线）
+    client.candle_calls.clear()
+    engine.compute(symbol_prices, now_ms=NOW_MS + 5000)
+    assert client.candle_calls == [(okx_inst_id('C3USDT'), '2D')]
+
+    # 一个币种突破1周最高价：只重新请求该币种（2D 也被突破）
+    symbol = 'C1USDT'
+    symbol_prices[symbol] = float(bars[(okx_inst_id(symbol), '1W')][2]) * 1.5
+    client.candle_calls.clear()
+    engine.compute(symbol_prices, now_ms=NOW_MS + 10000)
+    assert sorted(client.candle_calls) == [(okx_inst_id(symbol), '1W'), (okx_inst_id(symbol), '2D'),
+                                           (okx_inst_id('C3USDT'), '2D')]
+
+    # 新的2D K线开盘：所有币种重新请求2D
+    client.candle_calls.clear()
+    engine.compute(symbol_prices, now_ms=TWO_DAY_START + BAR_MS['2D'])
+    priced = [okx_inst_id(s) for s, price in symbol_prices.items() if price]
+    assert sorted(inst for inst, bar in client.candle_calls if bar == '2D') == sorted(priced)
+    # 1W 只有仍高于（模拟数据中未更新的）最高价的 C1
+    assert [inst for inst, bar in client.candle_calls if bar == '1W'] == [okx_inst_id(symbol)]
+    print("✅ 大周期高低点只在新K线或突破时刷新")
+
+
+def test_save_in_one_transaction():
+    symbols, bars, prices = _market(8)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, 'support_resistance.db')
+        conn = sqlite3.connect(db)
+        conn.execute(f'''CREATE TABLE support_resistance_levels (
+            id INTEGER PRIMARY KEY AUTOINCREMENT, {', '.join(LEVEL_COLUMNS)}, record_time TEXT)''')
+        conn.execute('''CREATE TABLE daily_baseline_prices (
+            symbol TEXT, baseline_date TEXT, baseline_price REAL, baseline_time TEXT,
+            PRIMARY KEY (symbol, baseline_date))''')
+        conn.execute("INSERT INTO daily_baseline_prices VALUES ('C1USDT', '2025-12-12', 100.0, '2025-12-12 00:00:00')")
+        conn.commit()
+
+        engine = SupportResistanceEngine(symbols, client=FakeClient(bars, prices))
+        results = engine.compute({symbol: prices.get(okx_inst_id(symbol)) for symbol in symbols}, now_ms=NOW_MS)
+        now = datetime(2025, 12, 12, 9, 30, tzinfo=BEIJING_TZ)
+        created = engine.save(db, results, now=now)
+        assert 'C1USDT' not in created and len(created) == len(results) - 1
+
+        rows = conn.execute('SELECT symbol, alert_triggered, baseline_price_24h, change_percent_24h, record_time '
+                            'FROM support_resistance_levels').fetchall()
+        assert len(rows) == len(results)
+        by_symbol = {row[0]: row for row in rows}
+        c1 = next(data for data in results if data['symbol'] == 'C1USDT')
+        assert by_symbol['C1USDT'][2] == 100.0
+        assert by_symbol['C1USDT'][3] == round((c1['current_price'] - 100.0) / 100.0 * 100, 2)
+        assert all(row[1] in (0, 1) and row[4] == '2025-12-12 09:30:00' for row in rows)
+        conn.close()
+        print(f"✅ {len(rows)} 条结果和 {len(created)} 条基准价一次写入")
+
+
+if __name__ == '__main__':
+    test_matches_scalar_calculation()
+    test_extremes_cache()
+    test_save_in_one_transaction()
+    print("\n✅ 所有测试通过")
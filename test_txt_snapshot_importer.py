@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+测试TXT快照批量导入
+验证文件解析、批量写入、snapshot_time 去重和币种数据关联
+"""
+
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+
+from crypto_database import CryptoDatabase
+from txt_snapshot_importer import (find_txt_files, import_files, import_snapshots, parse_files, parse_txt,
+                                   timestamp_from_filename)
+
+COIN_LINE = '{index}|{symbol}|-0.14|1|0|2025-12-09 22:20:00|126259.48|2025-10-07|-28.43|-1.24|||15|{price}|95.5%|125.0%'
+
+
+def make_txt(time_str, rush_up=12, rush_down=3, count=5, symbols=('BTC', 'ETH', 'SOL')):
+    lines = [
+        time_str,
+        f'透明标签_急涨总和=急涨：{rush_up}',
+        f'透明标签_急跌总和=急跌：{rush_down}',
+        f'透明标签_计次={count}',
+        '透明标签_五种状态=状态：震荡无序',
+        '[超级列表框_首页开始]',
+    ]
+    lines += [COIN_LINE.format(index=i + 1, symbol=symbol, price=100 + i) for i, symbol in enumerate(symbols)]
+    lines.append('[超级列表框_首页结束]')
+    return '\n'.join(lines)
+
+
+def make_db(tmp):
+    db = os.path.join(tmp, 'crypto_data.db')
+    CryptoDatabase(db)
+    conn = sqlite3.connect(db)
+    conn.execute('ALTER TABLE crypto_snapshots ADD COLUMN count_score_display TEXT')
+    conn.execute('ALTER TABLE crypto_snapshots ADD COLUMN count_score_type TEXT')
+    conn.commit()
+    conn.close()
+    return db
+
+
+def test_parse_txt():
+    assert timestamp_from_filename('/x/2025-12-09_2220.txt') == '2025-12-09 22:20:00'
+    assert timestamp_from_filename('notes.txt') is None
+
+    data = parse_txt(make_txt('2025-12-09 22:20:15'), filename='a.txt')
+    assert data['snapshot_time'] == '2025-12-09 22:20:00'
+    assert (data['rush_up'], data['rush_down'], data['diff'], data['count']) == (12, 3, 9, 5)
+    assert data['status'] == '震荡无序'
+    assert [coin['symbol'] for coin in data['coins']] == ['BTC', 'ETH', 'SOL']
+    assert data['coins'][0]['priority_level'] == '等级1'
+
+    # 文件名时间优先
+    data = parse_txt(make_txt('2025-12-09 22:20:15'), file_timestamp='2025-12-10 08:05:00')
+    assert data['snapshot_time'] == '2025-12-10 08:05:00'
+    assert parse_txt('无效内容') is None
+
+    # 离线导入不依赖 Google Drive 检测守护进程（不会写它的日志）
+    code = ("import sys, txt_snapshot_importer as m\n"
+            "m.parse_txt(open(sys.argv[1], encoding='utf-8').read())\n"
+            "assert 'gdrive_final_detector' not in sys.modules\n")
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', encoding='utf-8', delete=False) as f:
+        f.write(make_txt('2025-12-09 22:20:15'))
+    try:
+        subprocess.run([sys.executable, '-c', code, f.name], check=True,
+                       cwd=os.path.dirname(os.path.abspath(__file__)))
+    finally:
+        os.unlink(f.name)
+    print("✅ TXT解析正确")
+
+
+def test_bulk_import_and_dedup():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_db(tmp)
+        folder = os.path.join(tmp, 'txt')
+        os.makedirs(folder)
+        for minute in range(0, 60, 10):
+            with open(os.path.join(folder, f'2025-12-09_22{minute:02d}.txt'), 'w', encoding='gb18030') as f:
+                f.write(make_txt(f'2025-12-09 22:{minute:02d}:30'))
+        with open(os.path.join(folder, 'broken.txt'), 'w', encoding='utf-8') as f:
+            f.write('损坏的文件')
+
+        files = find_txt_files([folder])
+        assert len(files) == 7
+        # 进程池并行解析与逐个解析结果一致
+        assert parse_files(files, workers=2, chunksize=2) == parse_files(files, workers=1)
+        result = import_files(files, db=db, batch_size=4, workers=2, chunksize=2)
+        assert len(result['inserted']) == 6 and result['skipped'] == []
+        assert result['coins'] == 18
+        assert [os.path.basename(path) for path in result['failed']] == ['broken.txt']
+
+        conn = sqlite3.connect(db)
+        rows = conn.execute('''
+            SELECT s.snapshot_time, s.filename, COUNT(c.id)
+            FROM crypto_snapshots s JOIN crypto_coin_data c ON c.snapshot_id = s.id
+            GROUP BY s.id ORDER BY s.snapshot_time
+        ''').fetchall()
+        assert rows[0] == ('2025-12-09 22:00:00', '2025-12-09_2200.txt', 3)
+        assert all(count == 3 for _, _, count in rows)
+        version = conn.execute("SELECT version FROM data_versions WHERE source = 'crypto_snapshots'").fetchone()[0]
+        assert version == 2   # 两批各一次
+
+        # 重复导入：已存在的整批跳过；同一批内重复的时间只写入一次
+        again = import_files(files, db=db)
+        assert again['inserted'] == [] and len(again['skipped']) == 6
+        snapshots = [parse_txt(make_txt('2025-12-09 23:10:00', count=1)),
+                     parse_txt(make_txt('2025-12-09 23:10:00', count=9))]
+        result = import_snapshots(snapshots, db=db)
+        assert len(result['inserted']) == 1 and len(result['skipped']) == 1
+        assert result['inserted'][0]['snapshot_id']
+        assert conn.execute('SELECT COUNT(*) FROM crypto_snapshots').fetchone()[0] == 7
+        assert conn.execute('SELECT COUNT(*) FROM crypto_coin_data').fetchone()[0] == 21
+        conn.close()
+        print(f"✅ 批量导入与去重正确: {len(rows)} 条快照")
+
+
+if __name__ == '__main__':
+    test_parse_txt()
+    test_bulk_import_and_dedup()
+    print("\n✅ 所有测试通过")
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+测试按时间窗口分页查询
+验证与原来"全表读取 + Python过滤"的分页结果一致，并且查询走时间索引
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+from datetime import datetime, timedelta
+
+from windowed_query import TIME_FORMAT, TimeWindowQuery
+
+
+def make_db(count=3000, seed=3):
+    db_path = os.path.join(tempfile.mkdtemp(), 'window_test.db')
+    conn = sqlite3.connect(db_path)
+    conn.execute('''
+        CREATE TABLE crypto_snapshots (
+            id INTEGER PRIMARY KEY, snapshot_time TEXT, snapshot_date TEXT,
+            rush_up INTEGER, rush_down INTEGER
+        )
+    ''')
+    rng = random.Random(seed)
+    t = datetime(2025, 10, 1, 0, 0, 0)
+    rows = []
+    for _ in range(count):
+        # 不规则间隔，含较大的缺口
+        t += timedelta(minutes=rng.choice([3, 3, 3, 10, 90]), seconds=rng.randint(0, 59))
+        rows.append((t.strftime(TIME_FORMAT), t.strftime('%Y-%m-%d'),
+                     rng.randint(0, 50), rng.randint(0, 50)))
+    conn.executemany('''
+        INSERT INTO crypto_snapshots (snapshot_time, snapshot_date, rush_up, rush_down)
+        VALUES (?, ?, ?, ?)
+    ''', rows)
+    conn.commit()
+    return conn
+
+
+def legacy_page(conn, page, hours=12):
+    """原 /api/chart 的实现：全表读取后在Python中筛选"""
+    rows = conn.execute('''
+        SELECT snapshot_time, rush_up, rush_down FROM crypto_snapshots
+        ORDER BY snapshot_date ASC, snapshot_time ASC
+    ''').fetchall()
+    points = [(datetime.strptime(r[0], TIME_FORMAT), r) for r in rows]
+    earliest, latest = points[0][0], points[-1][0]
+    total_pages = max(1, int((latest - earliest).total_seconds() / 3600 / hours) + 1)
+    page = min(max(page, 0), total_pages - 1)
+    end = latest - timedelta(hours=hours * page)
+    start = end - timedelta(hours=hours)
+    return total_pages, [r for t, r in points if start <= t <= end]
+
+
+def test_matches_legacy_paging():
+    conn = make_db()
+    query = TimeWindowQuery('crypto_snapshots', 'snapshot_time', 'idx_snapshot_time')
+    legacy_total, _ = legacy_page(conn, 0)
+
+    for page in [-1, 0, 1, 2, 7, legacy_total // 2, legacy_total - 1, legacy_total + 5]:
+        window = query.page(conn, page, timedelta(hours=12))
+        rows = query.fetch(conn, ('snapshot_time', 'rush_up', 'rush_down'),
+                           window['start'], window['end'])
+        total_pages, expected = legacy_page(conn, page)
+        assert window['total_pages'] == total_pages
+        assert rows == expected, page
+    print(f"✅ 窗口分页与原实现一致: {legacy_total} 页")
+
+
+def test_uses_index_and_sees_new_rows():
+    conn = make_db(count=200)
+    query = TimeWindowQuery('crypto_snapshots', 'snapshot_time', 'idx_snapshot_time')
+    window = query.page(conn, 0, timedelta(hours=12))
+
+    plan = ' '.join(str(r) for r in conn.execute('''
+        EXPLAIN QUERY PLAN SELECT snapshot_time FROM crypto_snapshots
+        WHERE snapshot_time >= ? AND snapshot_time <= ? ORDER BY snapshot_time
+    ''', ('2025-10-01 00:00:00', '2025-10-02 00:00:00')))
+    assert 'idx_snapshot_time' in plan, plan
+
+    # 最早时间有缓存，但新写入的最新数据立即可见
+    newest = (window['end'] + timedelta(minutes=3)).strftime(TIME_FORMAT)
+    conn.execute("INSERT INTO crypto_snapshots (snapshot_time, snapshot_date, rush_up, rush_down) "
+                 "VALUES (?, ?, 1, 2)", (newest, newest[:10]))
+    conn.commit()
+    window = query.page(conn, 0, timedelta(hours=12))
+    rows = query.fetch(conn, ('snapshot_time',), window['start'], window['end'], descending=True)
+    assert rows[0][0] == newest
+    print("✅ 查询走时间索引，新数据立即可见")
+
+
+def test_empty_table():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE trading_signals (record_time TEXT)')
+    query = TimeWindowQuery('trading_signals', 'record_time', 'idx_record_time')
+    assert query.page(conn, 0, timedelta(minutes=720)) is None
+    print("✅ 空表返回 None")
+
+
+if __name__ == '__main__':
+    test_matches_legacy_paging()
+    test_uses_index_and_sees_new_rows()
+    test_empty_table()
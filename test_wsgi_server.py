@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+测试生产环境 WSGI 服务
+验证请求分通道（调用 OKX 的只读路由走交易通道）、慢的交易操作不拖慢看板轮询、
+多 worker 预加载（应用只导入一次）以及 /api/cache/clear 对所有 worker 生效
+"""
+
+import http.client
+import inspect
+import json
+import os
+import re
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from flask import Flask, jsonify
+
+from load_test import percentile, run_load
+from wsgi_server import DASHBOARD, TRADING, LaneWSGIServer, classify
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _get(port, path, method='GET', body=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=10)
+    try:
+        conn.request(method, path, body=body, headers={'Content-Type': 'application/json'} if body else {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def _wait_listening(port, proc, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        assert proc.poll() is None, proc.stdout.read()
+        try:
+            if _get(port, '/api/cache/stats')[0] == 200:
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise AssertionError('服务没有启动')
+
+
+def test_classify():
+    """写操作和调用 OKX 的只读路由走交易通道"""
+    assert classify('POST', '/api/anchor/maintain-anchor') == TRADING
+    assert classify('delete', '/api/anything') == TRADING
+    assert classify('GET', '/api/anchor-system/sub-account-positions?x=1') == TRADING
+    assert classify('GET', '/api/sar-slope/status') == DASHBOARD
+    assert classify('HEAD', '/') == DASHBOARD
+    print("✅ 请求按方法和路径分通道")
+
+
+# 视图函数中同步请求 OKX 的标志：直接请求 REST 接口或经 anchor_system 读取实盘持仓
+OKX_CALL = re.compile(r'okx\.com|OKEX_REST_URL|\bget_positions(_from_okex)?\(')
+
+
+def test_okx_routes_use_trading_lane():
+    """全部路由中视图函数会请求 OKX 的只读路由都走交易通道"""
+    from app_factory import create_app
+
+    app = create_app('all')
+    okx_routes = []
+    for rule in app.url_map.iter_rules():
+        if 'GET' not in rule.methods or rule.endpoint == 'static':
+            continue
+        if OKX_CALL.search(inspect.getsource(app.view_functions[rule.endpoint])):
+            okx_routes.append(rule.rule)
+            path = re.sub(r'<[^>]+>', 'x', rule.rule)
+            assert classify('GET', path) == TRADING, rule.rule
+    assert {'/api/anchor/decline-strength', '/api/anchor-system/current-positions'} <= set(okx_routes), okx_routes
+    print(f"✅ {len(okx_routes)} 个调用 OKX 的只读路由都走交易通道")
+
+
+def test_slow_trading_does_not_block_dashboard():
+    """交易通道被慢请求占满时，看板请求仍然快速返回"""
+    app = Flask(__name__)
+
+    @app.route('/api/slow-action', methods=['POST'])
+    def slow_action():
+        time.sleep(1.0)
+        return jsonify({'success': True})
+
+    @app.route('/api/fast')
+    def fast():
+        return jsonify({'success': True})
+
+    server = LaneWSGIServer('127.0.0.1', 0, app, dashboard_threads=8, trading_threads=1)
+    thread = threading.Thread(target=server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+    thread.start()
+    try:
+        port = server.port
+        slow = []
+        actions = [threading.Thread(target=lambda: slow.append(_get(port, '/api/slow-action', 'POST', b'{}')[0]))
+                   for _ in range(3)]
+        started = time.monotonic()
+        for action in actions:
+            action.start()
+        time.sleep(0.1)
+
+        result = run_load(f'http://127.0.0.1:{port}', ['/api/fast'], pollers=8, duration=1.0)
+        stats = result['endpoints']['GET /api/fast']
+        assert stats['errors'] == 0 and stats['count'] > 50, stats
+        assert stats['p99_ms'] < 300, stats
+
+        for action in actions:
+            action.join()
+        # 交易通道只有1个线程：3个慢操作排队执行
+        assert slow == [200, 200, 200]
+        assert time.monotonic() - started >= 3.0
+    finally:
+        server.shutdown()
+        thread.join()
+    assert percentile([1, 2, 3, 4], 50) == 2 and percentile([1, 2, 3, 4], 99) == 4
+    print(f"✅ 交易通道占满时看板 p50={stats['p50_ms']}ms p99={stats['p99_ms']}ms")
+
+
+def test_prefork_cache_clear():
+    """多个 worker 共享监听 socket；应用只在主进程导入一次；清除缓存对所有 worker 生效"""
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, 'sar_slope_data.db'))
+        conn.execute('''CREATE TABLE system_status (symbol TEXT, last_kline_time TEXT, total_klines INTEGER,
+                        current_position TEXT, current_sequence INTEGER, updated_at TEXT)''')
+        conn.execute("INSERT INTO system_status VALUES ('BTC', '', 1, 'long', 1, '')")
+        conn.commit()
+
+        port = _free_port()
+        env = dict(os.environ, WEBAPP_DB_DIR=tmp, PYTHONUNBUFFERED='1')
+        proc = subprocess.Popen([sys.executable, os.path.join(HERE, 'wsgi_server.py'), '--host', '127.0.0.1',
+                                 '--port', str(port), '--workers', '2'],
+                                cwd=tmp, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        try:
+            _wait_listening(port, proc)
+
+            def counts(n):
+                return [json.loads(_get(port, '/api/sar-slope/status')[2])['count'] for _ in range(n)]
+
+            pids = {json.loads(_get(port, '/api/cache/stats')[2])['worker_pid'] for _ in range(40)}
+            assert len(pids) == 2, pids
+            assert counts(20) == [1] * 20
+
+            # 不递增数据版本地写入：各 worker 仍返回缓存
+            conn.execute("INSERT INTO system_status VALUES ('ETH', '', 1, 'short', 1, '')")
+            conn.commit()
+            assert counts(10) == [1] * 10
+
+            status, _, body = _get(port, '/api/cache/clear', 'POST', json.dumps({'key': 'sar_slope_status'}).encode())
+            assert status == 200 and json.loads(body)['success'], body
+            time.sleep(1.2)   # DataVersions 每秒检查一次版本号
+            assert counts(20) == [2] * 20
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            output = proc.communicate(timeout=30)[0]
+            conn.close()
+        assert proc.returncode == 0, output
+        # 预加载：只导入一次（trading_api 导入时打印一次），两个 worker 各自启动
+        assert output.count('锚点单纠错系统API已添加') == 1, output
+        assert output.count('👷 worker') == 2, output
+    print("✅ 多 worker 预加载，清除缓存对所有 worker 生效")
+
+
+if __name__ == '__main__':
+    test_classify()
+    test_okx_routes_use_trading_lane()
+    test_slow_trading_does_not_block_dashboard()
+    test_prefork_cache_clear()
@@ -0,0 +1,441 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+交易决策系统
+交易决策、配置、信号、维护日志等管理页面与接口
+"""
+
+import json
+import sqlite3
+import traceback
+
+from flask import Blueprint, jsonify, make_response, redirect, request
+
+from db_access import get_connection, get_db_path
+
+trading_decision_bp = Blueprint('trading_decision', __name__)
+
+# ====================交易决策系统路由 ====================
+
+@trading_decision_bp.route('/trading-decision')
+def trading_decision_page():
+    """交易决策系统管理页面 - 重定向到统一管理页面"""
+    return redirect('/trading-manager')
+
+@trading_decision_bp.route('/api/trading/anchor-maintenance/logs')
+def anchor_maintenance_logs_api():
+    """获取锚点单维护日志"""
+    try:
+        limit = request.args.get('limit', 10, type=int)
+        
+        conn = get_connection('trading_decision')
+        cursor = conn.cursor()
+        
+        cursor.execute('''
+        SELECT id, inst_id, pos_side, original_size, original_price, 
+               original_margin, current_price, profit_rate, step, action,
+               trade_size, trade_price, remaining_size, remaining_margin,
+               trigger_reason, decision_log, status, executed_at, created_at
+        FROM anchor_maintenance_logs
+        ORDER BY created_at DESC
+        LIMIT ?
+        ''', (limit,))
+        
+        logs = []
+        for row in cursor.fetchall():
+            logs.append({
+                'id': row[0],
+                'inst_id': row[1],
+                'pos_side': row[2],
+                'original_size': float(row[3]),
+                'original_price': float(row[4]),
+                'original_margin': float(row[5]),
+                'current_price': float(row[6]),
+                'profit_rate': float(row[7]),
+                'step': row[8],
+                'action': row[9],
+                'trade_size': float(row[10]),
+                'trade_price': float(row[11]),
+                'remaining_size': float(row[12]),
+                'remaining_margin': float(row[13]),
+                'trigger_reason': row[14],
+                'decision_log': row[15],
+                'status': row[16],
+                'executed_at': row[17],
+                'created_at': row[18]
+            })
+        
+        conn.close()
+        
+        return jsonify({
+            'success': True,
+            'count': len(logs),
+            'logs': logs
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        }), 500
+
+@trading_decision_bp.route('/api/trading/config', methods=['GET', 'POST'])
+def trading_config_api():
+    """交易配置API"""
+    config_file = '/home/user/webapp/trading_config.json'
+    
+    if request.method == 'GET':
+        try:
+            with open(config_file, 'r') as f:
+                config = json.load(f)
+            return jsonify({'success': True, 'config': config})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+    
+    elif request.method == 'POST':
+        try:
+            new_config = request.json
+            
+            # 更新数据库中的配置
+            conn = get_connection('trading_decision')
+            cursor = conn.cursor()
+            cursor.execute('''
+            UPDATE market_config SET
+                market_mode = ?,
+                market_trend = ?,
+                total_capital = ?,
+                position_limit_percent = ?,
+                anchor_capital_limit = ?,
+                allow_long = ?,
+                enabled = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = 1
+            ''', (
+                new_config.get('market_mode'),
+                new_config.get('market_trend'),
+                new_config.get('total_capital'),
+                new_config.get('position_limit_percent'),
+                new_config.get('anchor_capital_limit'),
+                1 if new_config.get('allow_long') else 0,
+                1 if new_config.get('enabled') else 0
+            ))
+            conn.commit()
+            conn.close()
+            
+            # 更新JSON文件
+            with open(config_file, 'w') as f:
+                json.dump(new_config, f, indent=2)
+            
+            return jsonify({'success': True, 'message': '配置更新成功'})
+        except Exception as e:
+            return jsonify({'success': False, 'error': str(e)}), 500
+
+@trading_decision_bp.route('/api/trading/decisions')
+def trading_decisions_api():
+    """获取交易决策记录"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        
+        conn = get_connection('trading_decision')
+        cursor = conn.cursor()
+        cursor.execute(f'''
+        SELECT id, inst_id, pos_side, action, decision_type, current_size,
+               target_size, close_size, close_percent, profit_rate,
+               current_price, reason, executed, timestamp
+        FROM trading_decisions
+        ORDER BY id DESC
+        LIMIT {limit}
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        decisions = []
+        for row in rows:
+            decisions.append({
+                'id': row[0],
+                'inst_id': row[1],
+                'pos_side': row[2],
+                'action': row[3],
+                'decision_type': row[4],
+                'current_size': row[5],
+                'target_size': row[6],
+                'close_size': row[7],
+                'close_percent': row[8],
+                'profit_rate': row[9],
+                'current_price': row[10],
+                'reason': row[11],
+                'executed': bool(row[12]),
+                'timestamp': row[13]
+            })
+        
+        return jsonify({'success': True, 'decisions': decisions, 'total': len(decisions)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@trading_decision_bp.route('/api/trading/signals')
+def trading_signals_api():
+    """获取交易信号（供其他账号使用）"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        
+        conn = get_connection('trading_decision')
+        cursor = conn.cursor()
+        cursor.execute(f'''
+        SELECT id, inst_id, signal_type, action, price, size,
+               profit_rate, reason, timestamp
+        FROM trading_signals
+        ORDER BY id DESC
+        LIMIT {limit}
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        signals = []
+        for row in rows:
+            signals.append({
+                'id': row[0],
+                'inst_id': row[1],
+                'signal_type': row[2],
+                'action': row[3],
+                'price': row[4],
+                'size': row[5],
+                'profit_rate': row[6],
+                'reason': row[7],
+                'timestamp': row[8]
+            })
+        
+        return jsonify({'success': True, 'signals': signals, 'total': len(signals)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@trading_decision_bp.route('/api/trading/maintenance')
+def trading_maintenance_api():
+    """获取锚点单维护记录"""
+    try:
+        limit = request.args.get('limit', 50, type=int)
+        
+        conn = get_connection('trading_decision')
+        cursor = conn.cursor()
+        cursor.execute(f'''
+        SELECT id, inst_id, pos_side, original_size, original_price,
+               maintenance_price, maintenance_size, profit_rate,
+               action, status, timestamp
+        FROM anchor_maintenance
+        ORDER BY id DESC
+        LIMIT {limit}
+        ''')
+        
+        rows = cursor.fetchall()
+        conn.close()
+        
+        records = []
+        for row in rows:
+            records.append({
+                'id': row[0],
+                'inst_id': row[1],
+                'pos_side': row[2],
+                'original_size': row[3],
+                'original_price': row[4],
+                'maintenance_price': row[5],
+                'maintenance_size': row[6],
+                'profit_rate': row[7],
+                'action': row[8],
+                'status': row[9],
+                'timestamp': row[10]
+            })
+        
+        return jsonify({'success': True, 'records': records, 'total': len(records)})
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@trading_decision_bp.route('/dashboard')
+def dashboard():
+    """实时监控仪表板 - 重定向到统一管理页面"""
+    return redirect('/trading-manager')
+
+@trading_decision_bp.route('/trading-manager')
+def trading_manager():
+    """交易管理界面 - 模拟交易系统"""
+    try:
+        with open('/home/user/webapp/templates/trading_manager.html', 'r', encoding='utf-8') as f:
+            content = f.read()
+        
+        # 添加缓存控制头，强制浏览器刷新
+        response = make_response(content)
+        response.headers['Cache-Control'] = 'no-store, no-cache, must-revalidate, max-age=0'
+        response.headers['Pragma'] = 'no-cache'
+        response.headers['Expires'] = '0'
+        return response
+    except FileNotFoundError:
+        return "Trading manager template not found", 404
+    except Exception as e:
+        return f"Error loading trading manager: {str(e)}", 500
+
+@trading_decision_bp.route('/simulated-trades')
+def simulated_trades():
+    """模拟交易详情界面"""
+    try:
+        with open('/home/user/webapp/templates/simulated_trades.html', 'r', encoding='utf-8') as f:
+            return f.read()
+    except FileNotFoundError:
+        return "Simulated trades template not found", 404
+    except Exception as e:
+        return f"Error loading simulated trades: {str(e)}", 500
+
+@trading_decision_bp.route('/api/trading/positions/opens')
+def get_trading_positions_opens():
+    """获取开仓持仓 - Trading Manager专用，支持维护价格表"""
+    try:
+        import sqlite3
+        
+        # 获取参数
+        is_anchor = request.args.get('is_anchor', type=int)
+        limit = request.args.get('limit', 50, type=int)
+        trade_mode = request.args.get('trade_mode', 'paper')
+        
+        DB_PATH = get_db_path('trading_decision')
+        conn = get_connection(DB_PATH)
+        conn.row_factory = sqlite3.Row
+        cursor = conn.cursor()
+        
+        # 如果是锚点单，使用维护价格表
+        if is_anchor == 1:
+            # 联合查询：position_opens 和 anchor_maintenance_prices
+            cursor.execute('''
+                SELECT 
+                    p.id,
+                    p.inst_id,
+                    p.pos_side,
+                    p.open_size,
+                    p.mark_price,
+                    p.profit_rate,
+                    p.lever,
+                    p.upl,
+                    p.margin,
+                    p.created_at,
+                    p.updated_time,
+                    p.trade_mode,
+                    p.is_anchor,
+                    p.granularity,
+                    p.open_percent,
+                    p.total_adds,
+                    p.total_positions,
+                    COALESCE(amp.maintenance_price, p.open_price) as open_price,
+                    amp.original_open_price,
+                    amp.maintenance_count,
+                    amp.last_maintenance_time,
+                    p.mark_price as current_price
+                FROM position_opens p
+                LEFT JOIN anchor_maintenance_prices amp 
+                    ON p.inst_id = amp.inst_id 
+                    AND p.pos_side = amp.pos_side 
+                    AND p.trade_mode = amp.trade_mode
+                WHERE p.is_anchor = 1 AND p.trade_mode = ?
+                ORDER BY p.id DESC
+                LIMIT ?
+            ''', (trade_mode, limit))
+            
+            rows = cursor.fetchall()
+            
+            # 获取最新价格更新时间
+            cursor.execute('''
+                SELECT MAX(updated_time) FROM position_opens WHERE is_anchor = 1 AND trade_mode = ?
+            ''', (trade_mode,))
+            
+            price_update_time = cursor.fetchone()[0] or ''
+            
+            records = []
+            for row in rows:
+                records.append({
+                    'id': row['id'],
+                    'inst_id': row['inst_id'],
+                    'pos_side': row['pos_side'],
+                    'open_price': float(row['open_price']),  # 使用维护价格
+                    'original_open_price': float(row['original_open_price']) if row['original_open_price'] else None,
+                    'open_size': float(row['open_size']),
+                    'current_price': float(row['current_price']) if row['current_price'] else 0.0,
+                    'mark_price': float(row['mark_price']) if row['mark_price'] else 0.0,
+                    'profit_rate': float(row['profit_rate']) if row['profit_rate'] else 0.0,
+                    'lever': int(row['lever']) if row['lever'] else 10,
+                    'upl': float(row['upl']) if row['upl'] else 0.0,
+                    'margin': float(row['margin']) if row['margin'] else 0.0,
+                    'is_anchor': bool(row['is_anchor']),
+                    'granularity': float(row['granularity']) if row['granularity'] else 0.0,
+                    'open_percent': float(row['open_percent']) if row['open_percent'] else 0.0,
+                    'total_adds': int(row['total_adds']) if row['total_adds'] else 0,
+                    'total_positions': int(row['total_positions']) if row['total_positions'] else 0,
+                    'maintenance_count': int(row['maintenance_count']) if row['maintenance_count'] else 0,
+                    'last_maintenance_time': row['last_maintenance_time'] or '',
+                    'created_at': row['created_at'],
+                    'price_update_time': row['updated_time'] or '',
+                    'trade_mode': row['trade_mode']
+                })
+            
+            conn.close()
+            
+            return jsonify({
+                'success': True,
+                'records': records,
+                'total': len(records),
+                'price_update_time': price_update_time,
+                'trade_mode': trade_mode
+            })
+        
+        # 非锚点单，直接查询
+        else:
+            cursor.execute('''
+                SELECT 
+                    id, inst_id, pos_side, open_price, open_size, mark_price, 
+                    profit_rate, lever, upl, margin, created_at, updated_time,
+                    trade_mode, is_anchor, granularity, open_percent, 
+                    total_adds, total_positions
+                FROM position_opens
+                WHERE (? IS NULL OR is_anchor = ?) AND trade_mode = ?
+                ORDER BY id DESC
+                LIMIT ?
+            ''', (is_anchor, is_anchor, trade_mode, limit))
+            
+            rows = cursor.fetchall()
+            conn.close()
+            
+            records = []
+            for row in rows:
+                records.append({
+                    'id': row['id'],
+                    'inst_id': row['inst_id'],
+                    'pos_side': row['pos_side'],
+                    'open_price': float(row['open_price']),
+                    'open_size': float(row['open_size']),
+                    'current_price': float(row['mark_price']) if row['mark_price'] else 0.0,
+                    'mark_price': float(row['mark_price']) if row['mark_price'] else 0.0,
+                    'profit_rate': float(row['profit_rate']) if row['profit_rate'] else 0.0,
+                    'lever': int(row['lever']) if row['lever'] else 10,
+                    'upl': float(row['upl']) if row['upl'] else 0.0,
+                    'margin': float(row['margin']) if row['margin'] else 0.0,
+                    'is_anchor': bool(row['is_anchor']),
+                    'granularity': float(row['granularity']) if row['granularity'] else 0.0,
+                    'open_percent': float(row['open_percent']) if row['open_percent'] else 0.0,
+                    'total_adds': int(row['total_adds']) if row['total_adds'] else 0,
+                    'total_positions': int(row['total_positions']) if row['total_positions'] else 0,
+                    'created_at': row['created_at'],
+                    'price_update_time': row['updated_time'] or '',
+                    'trade_mode': row['trade_mode']
+                })
+            
+            return jsonify({
+                'success': True,
+                'records': records,
+                'total': len(records),
+                'trade_mode': trade_mode
+            })
+    
+    except Exception as e:
+        import traceback
+        return jsonify({
+            'success': False,
+            'error': str(e),
+            'traceback': traceback.format_exc()
+        })
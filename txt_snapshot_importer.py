@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+首页监控TXT快照批量导入
+Google Drive 实时检测和各个历史补数据脚本共用
+
+- 每个TXT文件只扫描一遍（home_txt_parser），快照统计和币种明细来自同一次解析
+- 大量历史文件用进程池并行读取和解析（home_txt_parser.parse_files，--workers 控制进程数）
+- 多个文件一起写入：每批一个事务，快照和币种数据都用 executemany
+- 按 UNIQUE(snapshot_time) 去重（INSERT OR IGNORE），已存在的快照及其币种数据跳过
+- 写锁等待由 db_access 的 busy_timeout 处理，不再逐条重试
+
+用法:
+    from txt_snapshot_importer import parse_txt, import_snapshots
+    snapshot = parse_txt(content, file_timestamp='2025-12-09 22:20:00')
+    result = import_snapshots([snapshot])
+
+    python txt_snapshot_importer.py <txt文件或目录> ... [--workers 8] [--chunksize 64]
+"""
+
+import argparse
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from calculate_count_score import calculate_count_score
+from db_access import transaction
+from home_txt_parser import HomeSnapshot, parse, parse_files as parse_txt_files
+from response_cache import bump_data_version
+
+DB_NAME = 'crypto_data'
+BATCH_SIZE = 500        # 每个事务写入的快照数
+
+# 文件名: 2025-12-09_2220.txt
+TXT_NAME_PATTERN = re.compile(r'(\d{4}-\d{2}-\d{2})_(\d{2})(\d{2})\.txt$')
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_COLUMNS = ('snapshot_time', 'snapshot_date', 'rush_up', 'rush_down', 'diff', 'count',
+                    'status', 'count_score_display', 'count_score_type', 'filename')
+COIN_COLUMNS = ('symbol', 'index_order', 'change', 'rush_up', 'rush_down', 'update_time',
+                'high_price', 'high_time', 'decline', 'change_24h', 'rank', 'current_price',
+                'ratio1', 'ratio2', 'priority_level')
+
+INSERT_SNAPSHOT_SQL = f'''
+    INSERT OR IGNORE INTO crypto_snapshots ({', '.join(SNAPSHOT_COLUMNS)}, created_at)
+    VALUES ({', '.join('?' * len(SNAPSHOT_COLUMNS))}, datetime('now', '+8 hours'))
+'''
+INSERT_COIN_SQL = f'''
+    INSERT OR IGNORE INTO crypto_coin_data (snapshot_id, snapshot_time, {', '.join(COIN_COLUMNS)}, created_at)
+    VALUES (?, ?, {', '.join('?' * len(COIN_COLUMNS))}, datetime('now', '+8 hours'))
+'''
+
+
+def timestamp_from_filename(filename: str) -> Optional[str]:
+    """2025-12-09_2220.txt -> '2025-12-09 22:20:00'；不符合命名规则返回 None"""
+    match = TXT_NAME_PATTERN.search(os.path.basename(filename))
+    if not match:
+        return None
+    date_str, hour, minute = match.groups()
+    return f"{date_str} {hour}:{minute}:00"
+
+
+def snapshot_data(snapshot: HomeSnapshot, file_timestamp: Optional[str] = None) -> Optional[Dict]:
+    """由 home_txt_parser 的解析结果生成 crypto_snapshots 记录；没有时间或无法解析返回 None"""
+    try:
+        # 时间戳（如果未提供则取内容中的）
+        timestamp = file_timestamp or snapshot.timestamp
+        if not timestamp:
+            return None
+        
+        # 解析为datetime对象（只保留到分钟）
+        dt = datetime.strptime(timestamp, '%Y-%m-%d %H:%M:%S')
+        snapshot_time = dt.strftime('%Y-%m-%d %H:%M:00')
+        snapshot_date = dt.strftime('%Y-%m-%d')
+        
+        # 自动计算计次得分（确保数据完整性）
+        count_score_display, count_score_type = calculate_count_score(snapshot_time, snapshot.count)
+        
+        # 如果文件中有得分，记录日志但使用计算结果
+        if snapshot.score_display and snapshot.score_display != count_score_display:
+            logger.warning(f"文件中的计次得分 '{snapshot.score_display}' 与计算结果 "
+                           f"'{count_score_display}' 不一致，使用计算结果")
+        
+        return {
+            'snapshot_time': snapshot_time,
+            'snapshot_date': snapshot_date,
+            'rush_up': snapshot.rush_up,
+            'rush_down': snapshot.rush_down,
+            'diff': snapshot.rush_up - snapshot.rush_down,
+            'count': snapshot.count,
+            'status': snapshot.status,
+            'count_score_display': count_score_display,
+            'count_score_type': count_score_type,
+            'file_timestamp': timestamp
+        }
+        
+    except Exception as e:
+        logger.warning(f"解析内容失败: {e}")
+        return None
+
+
+def parse_txt(content: str, file_timestamp: Optional[str] = None,
+              filename: Optional[str] = None) -> Optional[Dict]:
+    """
+    解析一个TXT文件：快照统计 + 币种明细
+    返回 snapshot_data() 的结果，附加 coins 和 filename；无法解析返回 None
+    """
+    return _snapshot_record(parse(content), file_timestamp, filename)
+
+
+def _snapshot_record(snapshot: HomeSnapshot, file_timestamp: Optional[str],
+                     filename: Optional[str]) -> Optional[Dict]:
+    data = snapshot_data(snapshot, file_timestamp=file_timestamp)
+    if not data:
+        return None
+    data['coins'] = [coin._asdict() for coin in snapshot.coins]
+    data['filename'] = filename
+    return data
+
+
+def parse_files(paths: Iterable[str], workers: Optional[int] = None,
+                chunksize: int = 64) -> Dict[str, List]:
+    """
+    解析多个TXT文件（时间优先取文件名，其次取文件内容）
+    读取和解析由 home_txt_parser.parse_files 的进程池并行完成，参数含义相同
+
+    Returns:
+        {'snapshots': [...], 'failed': [无法解析的路径]}
+    """
+    snapshots, failed = [], []
+    for path, snapshot in parse_txt_files(paths, workers=workers, chunksize=chunksize):
+        filename = os.path.basename(path)
+        data = _snapshot_record(snapshot, timestamp_from_filename(filename), filename) if snapshot else None
+        if data:
+            snapshots.append(data)
+        else:
+            failed.append(path)
+    return {'snapshots': snapshots, 'failed': failed}
+
+
+def _import_batch(conn, batch: Sequence[Dict]) -> Dict:
+    times = [snapshot['snapshot_time'] for snapshot in batch]
+    placeholders = ','.join('?' * len(times))
+    existing = {row[0] for row in conn.execute(
+        f'SELECT snapshot_time FROM crypto_snapshots WHERE snapshot_time IN ({placeholders})', times)}
+
+    new = {}
+    for snapshot in batch:
+        if snapshot['snapshot_time'] not in existing:
+            new.setdefault(snapshot['snapshot_time'], snapshot)   # 同一批内重复的只保留第一个
+    skipped = [snapshot['snapshot_time'] for snapshot in batch
+               if new.get(snapshot['snapshot_time']) is not snapshot]
+    if not new:
+        return {'inserted': [], 'skipped': skipped, 'coins': 0}
+
+    conn.executemany(INSERT_SNAPSHOT_SQL, [
+        tuple(snapshot.get(column) for column in SNAPSHOT_COLUMNS) for snapshot in new.values()])
+
+    placeholders = ','.join('?' * len(new))
+    ids = dict(conn.execute(
+        f'SELECT snapshot_time, id FROM crypto_snapshots WHERE snapshot_time IN ({placeholders})',
+        list(new)).fetchall())
+
+    cursor = conn.executemany(INSERT_COIN_SQL, [
+        (ids[snapshot_time], snapshot_time) + tuple(coin.get(column) for column in COIN_COLUMNS)
+        for snapshot_time, snapshot in new.items()
+        for coin in snapshot.get('coins') or ()
+    ])
+
+    for snapshot_time, snapshot in new.items():
+        snapshot['snapshot_id'] = ids[snapshot_time]
+    return {'inserted': list(new.values()), 'skipped': skipped, 'coins': max(cursor.rowcount, 0)}
+
+
+def import_snapshots(snapshots: Iterable[Dict], db: str = DB_NAME,
+                     batch_size: int = BATCH_SIZE) -> Dict:
+    """
+    批量写入已解析的快照（parse_txt 的结果）
+
+    Returns:
+        {'inserted': [新写入的快照（带 snapshot_id）], 'skipped': [已存在的 snapshot_time],
+         'coins': 写入的币种行数}
+    """
+    snapshots = sorted((s for s in snapshots if s), key=lambda s: s['snapshot_time'])
+    result = {'inserted': [], 'skipped': [], 'coins': 0}
+    for start in range(0, len(snapshots), batch_size):
+        batch = snapshots[start:start + batch_size]
+        with transaction(db) as conn:
+            batch_result = _import_batch(conn, batch)
+            if batch_result['inserted']:
+                bump_data_version(conn, 'crypto_snapshots')
+        for key in result:
+            result[key] += batch_result[key]
+    return result
+
+
+def import_files(paths: Iterable[str], db: str = DB_NAME, batch_size: int = BATCH_SIZE,
+                 workers: Optional[int] = None, chunksize: int = 64) -> Dict:
+    """
+    解析并批量导入多个TXT文件，结果同 import_snapshots，另加 failed（无法解析的文件）
+    workers / chunksize: 并行解析的进程数和每个任务的文件数（见 parse_files）
+    """
+    parsed = parse_files(paths, workers=workers, chunksize=chunksize)
+    result = import_snapshots(parsed['snapshots'], db=db, batch_size=batch_size)
+    result['failed'] = parsed['failed']
+    return result
+
+
+def find_txt_files(paths: Iterable[str]) -> List[str]:
+    """展开目录，返回按文件名排序的TXT文件"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in names if name.endswith('.txt'))
+        elif path.endswith('.txt'):
+            files.append(path)
+    return sorted(files, key=os.path.basename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='首页监控TXT快照批量导入')
+    parser.add_argument('paths', nargs='+', help='TXT文件或目录')
+    parser.add_argument('--workers', type=int, default=None, help='并行解析的进程数（默认CPU核数，1 表示不并行）')
+    parser.add_argument('--chunksize', type=int, default=64, help='每个解析任务包含的文件数')
+    args = parser.parse_args()
+
+    files = find_txt_files(args.paths)
+    print(f"📄 找到 {len(files)} 个TXT文件")
+    result = import_files(files, workers=args.workers, chunksize=args.chunksize)
+    print(f"✅ 新导入 {len(result['inserted'])} 条快照，{result['coins']} 条币种数据")
+    print(f"ℹ️  已存在 {len(result['skipped'])} 条")
+    if result['failed']:
+        print(f"❌ 解析失败 {len(result['failed'])} 个文件:")
+        for path in result['failed'][:20]:
+            print(f"   - {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+V1V2 成交量监控
+V1V2 成交量、设置与统计
+"""
+
+from datetime import datetime, timedelta
+import json
+import os
+import sqlite3
+import time
+import traceback
+
+from flask import Blueprint, jsonify, render_template, request
+
+from db_access import get_connection
+
+v1v2_bp = Blueprint('v1v2', __name__)
+
+@v1v2_bp.route('/v1v2-volume')
+def v1v2_volume():
+    """V1V2成交量系统页面"""
+    return render_template('v1v2_volume.html')
+
+@v1v2_bp.route('/v1v2-monitor')
+def v1v2_monitor():
+    """V1V2成交额监控页面"""
+    return render_template('v1v2_monitor.html')
+
+@v1v2_bp.route('/api/v1v2/latest')
+def api_v1v2_latest():
+    """获取所有币种的最新V1V2数据"""
+    try:
+        import sqlite3
+        from datetime import datetime
+        
+        conn = get_connection('v1v2')
+        cursor = conn.cursor()
+        
+        # 27个币种配置
+        coins_config = {
+            'BTC': {'v1': 200000, 'v2': 100000},
+            'ETH': {'v1': 1300000, 'v2': 500000},
+            'XRP': {'v1': 200000, 'v2': 87000},
+            'SOL': {'v1': 351620, 'v2': 246380},
+            'BNB': {'v1': 2388300, 'v2': 1737500},
+            'LTC': {'v1': 50000, 'v2': 15000},
+            'DOGE': {'v1': 150000, 'v2': 60000},
+            'SUI': {'v1': 2000000, 'v2': 800000},
+            'TRX': {'v1': 13280, 'v2': 6022},
+            'TON': {'v1': 350000, 'v2': 200000},
+            'ETC': {'v1': 12000, 'v2': 2000},
+            'BCH': {'v1': 103500, 'v2': 50000},
+            'HBAR': {'v1': 103500, 'v2': 40000},
+            'XLM': {'v1': 103500, 'v2': 30000},
+            'FIL': {'v1': 5003500, 'v2': 3700000},
+            'ADA': {'v1': 67210, 'v2': 44230},
+            'LINK': {'v1': 280000, 'v2': 200000},
+            'CRO': {'v1': 100000, 'v2': 40000},
+            'DOT': {'v1': 300000, 'v2': 250000},
+            'UNI': {'v1': 140000, 'v2': 100000},
+            'NEAR': {'v1': 100000, 'v2': 50000},
+            'APT': {'v1': 300000, 'v2': 200000},
+            'CFX': {'v1': 300000, 'v2': 250000},
+            'CRV': {'v1': 1500000, 'v2': 1000000},
+            'STX': {'v1': 50000, 'v2': 30000},
+            'LDO': {'v1': 1000000, 'v2': 600000},
+            'TAO': {'v1': 300000, 'v2': 180000}
+        }
+        
+        result = []
+        update_time = None
+        
+        for symbol, thresholds in coins_config.items():
+            table_name = f'volume_{symbol.lower()}'
+            
+            try:
+                # 获取最新一条记录（按ID降序，确保获取最新插入的数据）
+                cursor.execute(f'''
+                    SELECT volume, collect_time, level, timestamp
+                    FROM {table_name}
+                    ORDER BY id DESC
+                    LIMIT 1
+                ''')
+                
+                row = cursor.fetchone()
+                
+                if row:
+                    result.append({
+                        'symbol': symbol,
+                        'volume': row[0],
+                        'collect_time': row[1],
+                        'level': row[2],
+                        'v1': thresholds['v1'],
+                        'v2': thresholds['v2']
+                    })
+                    
+                    if not update_time:
+                        update_time = row[1]
+                        
+            except sqlite3.OperationalError:
+                # 表不存在,跳过
+                continue
+        
+        conn.close()
+        
+        # 按级别排序: V1 > V2 > NONE
+        level_order = {'V1': 0, 'V2': 1, 'NONE': 2}
+        result.sort(key=lambda x: (level_order.get(x['level'], 3), -x['volume']))
+        
+        return jsonify({
+            'success': True,
+            'count': len(result),
+            'data': result,
+            'update_time': update_time
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'获取数据失败: {str(e)}'
+        })
+
+@v1v2_bp.route('/v1v2-settings')
+def v1v2_settings():
+    """V1V2阈值设置页面"""
+    return render_template('v1v2_settings.html')
+
+@v1v2_bp.route('/api/v1v2/settings', methods=['GET', 'POST'])
+def api_v1v2_settings():
+    """获取或更新V1V2阈值设置"""
+    import json
+    import os
+    
+    SETTINGS_FILE = 'v1v2_settings.json'
+    
+    # 默认配置
+    DEFAULT_SETTINGS = {
+        'BTC': {'v1': 200000, 'v2': 100000},
+        'ETH': {'v1': 1300000, 'v2': 500000},
+        'XRP': {'v1': 200000, 'v2': 87000},
+        'SOL': {'v1': 351620, 'v2': 246380},
+        'BNB': {'v1': 2388300, 'v2': 1737500},
+        'LTC': {'v1': 50000, 'v2': 15000},
+        'DOGE': {'v1': 150000, 'v2': 60000},
+        'SUI': {'v1': 2000000, 'v2': 800000},
+        'TRX': {'v1': 13280, 'v2': 6022},
+        'TON': {'v1': 350000, 'v2': 200000},
+        'ETC': {'v1': 12000, 'v2': 2000},
+        'BCH': {'v1': 103500, 'v2': 50000},
+        'HBAR': {'v1': 103500, 'v2': 40000},
+        'XLM': {'v1': 103500, 'v2': 30000},
+        'FIL': {'v1': 5003500, 'v2': 3700000},
+        'ADA': {'v1': 67210, 'v2': 44230},
+        'LINK': {'v1': 280000, 'v2': 200000},
+        'CRO': {'v1': 100000, 'v2': 40000},
+        'DOT': {'v1': 300000, 'v2': 250000},
+        'UNI': {'v1': 140000, 'v2': 100000},
+        'NEAR': {'v1': 100000, 'v2': 50000},
+        'APT': {'v1': 300000, 'v2': 200000},
+        'CFX': {'v1': 300000, 'v2': 250000},
+        'CRV': {'v1': 1500000, 'v2': 1000000},
+        'STX': {'v1': 50000, 'v2': 30000},
+        'LDO': {'v1': 1000000, 'v2': 600000},
+        'TAO': {'v1': 300000, 'v2': 180000}
+    }
+    
+    if request.method == 'GET':
+        # 读取设置
+        try:
+            if os.path.exists(SETTINGS_FILE):
+                with open(SETTINGS_FILE, 'r', encoding='utf-8') as f:
+                    settings = json.load(f)
+            else:
+                settings = DEFAULT_SETTINGS
+                # 保存默认设置
+                with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
+                    json.dump(settings, f, indent=2, ensure_ascii=False)
+            
+            return jsonify({
+                'success': True,
+                'settings': settings
+            })
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'读取设置失败: {str(e)}'
+            })
+    
+    elif request.method == 'POST':
+        # 更新设置
+        try:
+            data = request.get_json()
+            new_settings = data.get('settings', {})
+            
+            # 验证数据
+            for symbol, config in new_settings.items():
+                if 'v1' not in config or 'v2' not in config:
+                    return jsonify({
+                        'success': False,
+                        'message': f'币种 {symbol} 配置不完整'
+                    })
+                
+                # 确保V1 > V2
+                if config['v1'] <= config['v2']:
+                    return jsonify({
+                        'success': False,
+                        'message': f'币种 {symbol}: V1阈值必须大于V2阈值'
+                    })
+            
+            # 保存设置
+            with open(SETTINGS_FILE, 'w', encoding='utf-8') as f:
+                json.dump(new_settings, f, indent=2, ensure_ascii=False)
+            
+            # 触发采集器重新加载配置（通过创建标记文件）
+            with open('.v1v2_settings_updated', 'w') as f:
+                f.write(str(int(time.time())))
+            
+            return jsonify({
+                'success': True,
+                'message': '设置已保存，采集器将在下次采集时使用新配置'
+            })
+            
+        except Exception as e:
+            return jsonify({
+                'success': False,
+                'message': f'保存设置失败: {str(e)}'
+            })
+
+@v1v2_bp.route('/api/v1v2/statistics')
+def api_v1v2_statistics():
+    """获取V1V2信号统计数据（1h/3h/12h/1day/3day/7day）"""
+    try:
+        import sqlite3
+        from datetime import datetime, timedelta
+        
+        conn = get_connection('v1v2')
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA busy_timeout=30000')
+        cursor = conn.cursor()
+        
+        # 获取所有币种表
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name LIKE 'volume_%'")
+        tables = [row[0] for row in cursor.fetchall()]
+        
+        # 定义时间范围
+        now = datetime.now()
+        time_ranges = {
+            '1h': now - timedelta(hours=1),
+            '3h': now - timedelta(hours=3),
+            '12h': now - timedelta(hours=12),
+            '1day': now - timedelta(days=1),
+            '3day': now - timedelta(days=3),
+            '7day': now - timedelta(days=7)
+        }
+        
+        statistics = []
+        
+        for table_name in tables:
+            symbol = table_name.replace('volume_', '').upper()
+            
+            try:
+                coin_stats = {
+                    'symbol': symbol,
+                    '1h': {'v1': 0, 'v2': 0, 'total': 0},
+                    '3h': {'v1': 0, 'v2': 0, 'total': 0},
+                    '12h': {'v1': 0, 'v2': 0, 'total': 0},
+                    '1day': {'v1': 0, 'v2': 0, 'total': 0},
+                    '3day': {'v1': 0, 'v2': 0, 'total': 0},
+                    '7day': {'v1': 0, 'v2': 0, 'total': 0}
+                }
+                
+                # 对每个时间范围进行统计
+                for period, start_time in time_ranges.items():
+                    start_time_str = start_time.strftime('%Y-%m-%d %H:%M:%S')
+                    
+                    # 统计V1和V2的次数（只统计V1和V2）
+                    cursor.execute(f"""
+                        SELECT level, COUNT(*) 
+                        FROM {table_name} 
+                        WHERE collect_time >= ? AND level IN ('V1', 'V2')
+                        GROUP BY level
+                    """, (start_time_str,))
+                    
+                    counts = dict(cursor.fetchall())
+                    v1_count = counts.get('V1', 0)
+                    v2_count = counts.get('V2', 0)
+                    
+                    coin_stats[period]['v1'] = v1_count
+                    coin_stats[period]['v2'] = v2_count
+                    coin_stats[period]['total'] = v1_count + v2_count
+                
+                statistics.append(coin_stats)
+                
+            except sqlite3.OperationalError:
+                # 表不存在或出错，跳过
+                continue
+        
+        conn.close()
+        
+        # 按7天总信号数排序
+        statistics.sort(key=lambda x: x['7day']['total'], reverse=True)
+        
+        return jsonify({
+            'success': True,
+            'data': {
+                'statistics': statistics,
+                'update_time': now.strftime('%Y-%m-%d %H:%M:%S'),
+                'total_coins': len(statistics)
+            }
+        })
+        
+    except Exception as e:
+        import traceback
+        print(f"❌ V1V2统计API错误: {str(e)}")
+        print(traceback.format_exc())
+        return jsonify({
+            'success': False,
+            'message': f'获取统计数据失败: {str(e)}'
+        }), 500
@@ -3,7 +3,6 @@
 V1V2成交额数据采集器
 每30秒从OKEx获取27个币种的5分钟成交额数据
 """
-import requests
 import sqlite3
 import time
 import logging
@@ -12,6 +11,8 @@ import pytz
 import json
 import os
 
+from okx_market_client import get_client
+
 # 配置日志
 logging.basicConfig(
     level=logging.INFO,
@@ -127,30 +128,20 @@ def fetch_volume_from_okex(symbol):
     返回最新的5分钟成交额(USDT)
     """
     try:
-        # OKEx API - 获取5分钟K线数据
-        url = 'https://www.okx.com/api/v5/market/candles'
-        params = {
-            'instId': f'{symbol}-USDT-SWAP',
-            'bar': '5m',
-            'limit': '1'  # 只获取最新一根K线
-        }
-        
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-        
-        data = response.json()
+        # OKEx API - 获取最新一根5分钟K线（共享客户端负责限频与重试）
+        candles = get_client().get_candles(f'{symbol}-USDT-SWAP', '5m', 1)
         
-        if data['code'] == '0' and data['data']:
+        if candles:
             # K线数据格式: [timestamp, open, high, low, close, volume, volCcy, volCcyQuote, confirm]
             # volCcyQuote 是以报价货币(USDT)计价的成交量
-            candle = data['data'][0]
+            candle = candles[0]
             volume_usdt = float(candle[7])  # volCcyQuote - USDT成交额
             timestamp = int(candle[0])  # 时间戳(毫秒)
             
             logging.info(f'✅ {symbol}: 成交额 ${volume_usdt:,.2f} USDT')
             return volume_usdt, timestamp
         else:
-            logging.warning(f'⚠️ {symbol}: API返回错误 - {data}')
+            logging.warning(f'⚠️ {symbol}: API返回错误')
             return None, None
             
     except Exception as e:
@@ -224,8 +215,12 @@ def collect_all_coins():
     retry_count = 0
     max_retries = 3  # 最多重试3次
     
+    # 并发获取所有币种的成交额
+    symbols = list(COINS_CONFIG.keys())
+    fetched = dict(zip(symbols, get_client().map(fetch_volume_from_okex, symbols)))
+    
     for symbol, thresholds in COINS_CONFIG.items():
-        volume, timestamp = fetch_volume_from_okex(symbol)
+        volume, timestamp = fetched[symbol] or (None, None)
         
         # 如果成交额为0，重试最多max_retries次
         retry_attempts = 0
@@ -246,9 +241,6 @@ def collect_all_coins():
                 success_count += 1
         elif volume == 0:
             logging.error(f'❌ {symbol}: 成交额仍为0，已重试{retry_attempts}次，跳过本次保存')
-        
-        # 避免请求过快
-        time.sleep(0.5)
     
     if retry_count > 0:
         logging.info(f'🔄 本轮共重试 {retry_count} 次（成交额为0）')
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+按时间窗口分页查询
+把"最新往前第N页、每页X小时"的计算放进SQL：时间列上的索引范围查询，
+每次请求只读取当前页的数据，响应时间不随表的历史长度增长。
+
+时间列为 'YYYY-MM-DD HH:MM:SS' 格式的字符串，字符串比较即时间比较。
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def compute_page(earliest: datetime, latest: datetime, page: int, window: timedelta) -> Dict:
+    """
+    计算分页窗口（page=0 是最新的一页，往前递增）
+
+    Returns:
+        {'page', 'total_pages', 'start', 'end', 'has_prev', 'has_next'}，start/end 为闭区间
+    """
+    total_pages = max(1, int((latest - earliest).total_seconds() / window.total_seconds()) + 1)
+    page = min(max(page, 0), total_pages - 1)
+    end = latest - window * page
+    start = end - window
+    return {
+        'page': page,
+        'total_pages': total_pages,
+        'start': start,
+        'end': end,
+        'has_prev': page < total_pages - 1,  # 有上一页（更早的数据）
+        'has_next': page > 0,  # 有下一页（更新的数据）
+    }
+
+
+class TimeWindowQuery:
+    """单张表按时间列分页"""
+
+    def __init__(self, table: str, time_column: str, index_name: str, min_ttl: float = 300):
+        """
+        Args:
+            table: 表名
+            time_column: 时间列（需有索引）
+            index_name: 索引名，首次使用时 CREATE INDEX IF NOT EXISTS
+            min_ttl: 最早时间的缓存秒数（只会因清理旧数据而变化）
+        """
+        self.table = table
+        self.time_column = time_column
+        self.index_name = index_name
+        self.min_ttl = min_ttl
+        self._earliest: Dict[str, Tuple[Optional[str], float]] = {}
+        self._indexed = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _db_key(conn) -> str:
+        return conn.execute('PRAGMA database_list').fetchone()[2]
+
+    def _ensure_index(self, conn, db_key: str):
+        if db_key in self._indexed:
+            return
+        try:
+            conn.execute(f'CREATE INDEX IF NOT EXISTS {self.index_name} '
+                         f'ON {self.table}({self.time_column})')
+            conn.commit()
+        except sqlite3.OperationalError:
+            # 只读或被锁时不阻塞查询，索引通常已由采集器创建
+            pass
+        with self._lock:
+            self._indexed.add(db_key)
+
+    def bounds(self, conn) -> Optional[Tuple[datetime, datetime]]:
+        """
+        (最早, 最新) 时间；表为空返回 None
+        最早时间按 min_ttl 缓存；最新时间每次查询（索引上的单次查找）
+        """
+        db_key = self._db_key(conn)
+        self._ensure_index(conn, db_key)
+
+        latest = conn.execute(f'SELECT MAX({self.time_column}) FROM {self.table}').fetchone()[0]
+        if latest is None:
+            return None
+
+        now = time.monotonic()
+        with self._lock:
+            cached = self._earliest.get(db_key)
+        if cached is None or now - cached[1] >= self.min_ttl or cached[0] is None:
+            earliest = conn.execute(f'SELECT MIN({self.time_column}) FROM {self.table}').fetchone()[0]
+            with self._lock:
+                self._earliest[db_key] = (earliest, now)
+        else:
+            earliest = cached[0]
+
+        return (datetime.strptime(earliest, TIME_FORMAT),
+                datetime.strptime(latest, TIME_FORMAT))
+
+    def page(self, conn, page: int, window: timedelta) -> Optional[Dict]:
+        """计算第 page 页的时间窗口；表为空返回 None"""
+        bounds = self.bounds(conn)
+        if bounds is None:
+            return None
+        return compute_page(bounds[0], bounds[1], page, window)
+
+    def fetch(self, conn, columns: Sequence[str], start: datetime, end: datetime,
+              descending: bool = False) -> List[Tuple]:
+        """读取 [start, end] 闭区间内的行，按时间列排序"""
+        order = 'DESC' if descending else 'ASC'
+        return conn.execute(f'''
+            SELECT {', '.join(columns)}
+            FROM {self.table}
+            WHERE {self.time_column} >= ? AND {self.time_column} <= ?
+            ORDER BY {self.time_column} {order}
+        ''', (start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT))).fetchall()
+
+    def clear(self):
+        """清除最早时间缓存（清理旧数据后调用）"""
+        with self._lock:
+            self._earliest.clear()
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+生产环境 WSGI 服务（替代 app_new.py 末尾的 app.run 开发服务器）
+- 预加载: 主进程只导入一次应用并执行一次性初始化（导入旧 JSON 状态等），
+  之后 fork 出多个 worker 进程共享同一个监听 socket，worker 不再重复导入和初始化
+- 执行通道: 每个 worker 内按请求行把连接分到两个独立线程池
+    trading   - 写操作（POST/PUT/PATCH/DELETE）和同步调用 OKX / Google Drive 的只读路由
+    dashboard - 其余只读看板接口和页面
+  慢的 OKX 调用最多占满 trading 通道，不影响看板轮询
+- 主进程监控 worker，异常退出时自动重启；SIGTERM / SIGINT 时等待处理中的请求结束后退出
+
+每个连接只处理一个请求（HTTP/1.0），保证按请求分通道；前面有 nginx 时由 nginx 保持长连接。
+进程内缓存（response_cache）在各 worker 独立，/api/cache/clear 通过数据版本号对所有 worker 生效。
+
+用法:
+    python wsgi_server.py                                   # 4 个 worker，端口 5000
+    python wsgi_server.py --workers 8 --dashboard-threads 32 --trading-threads 8
+    python wsgi_server.py --app app_new:app --port 5001
+"""
+
+import argparse
+import importlib
+import os
+import re
+import signal
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+DEFAULT_APP = 'app_new:app'
+
+TRADING = 'trading'
+DASHBOARD = 'dashboard'
+
+# 交易通道：所有写操作 + 以下同步调用外部接口的只读路由
+TRADING_METHODS = frozenset({'POST', 'PUT', 'PATCH', 'DELETE'})
+TRADING_PATHS = (
+    re.compile(r'^/api/anchor-system/sub-account-positions'),
+    re.compile(r'^/api/anchor-system/current-positions'),
+    re.compile(r'^/api/anchor-system/today-statistics'),
+    re.compile(r'^/api/anchor/test-api-permission'),
+    re.compile(r'^/api/anchor/decline-strength'),
+    re.compile(r'^/api/index/components'),
+    re.compile(r'^/api/gdrive-detector/txt-files'),
+    re.compile(r'^/api/gdrive-monitor/status'),
+    re.compile(r'^/api/list-recent-folders'),
+)
+
+PEEK_BYTES = 2048        # 读取请求行时最多预读的字节数
+PEEK_TIMEOUT = 5.0       # 客户端迟迟不发请求行时放弃分类（秒）
+RESPAWN_DELAY = 1.0      # worker 异常退出后重启前的等待（秒），避免启动即崩溃时空转
+
+
+def classify(method: str, path: str) -> str:
+    """请求 -> 执行通道"""
+    if method.upper() in TRADING_METHODS:
+        return TRADING
+    if any(pattern.match(path) for pattern in TRADING_PATHS):
+        return TRADING
+    return DASHBOARD
+
+
+def peek_request_line(sock: socket.socket):
+    """预读（不消费）请求行，返回 (method, path)；读不到时返回 (None, None)"""
+    try:
+        sock.settimeout(PEEK_TIMEOUT)
+        head = sock.recv(PEEK_BYTES, socket.MSG_PEEK)
+    except OSError:
+        return None, None
+    finally:
+        try:
+            sock.settimeout(None)
+        except OSError:
+            pass
+    parts = head.split(b'\r\n', 1)[0].split(b' ')
+    if len(parts) < 2:
+        return None, None
+    return parts[0].decode('latin-1'), parts[1].decode('latin-1')
+
+
+class LaneRequestHandler(WSGIRequestHandler):
+    """一个连接一个请求，保证每个请求都按自己的路径分通道"""
+    protocol_version = 'HTTP/1.0'
+
+
+class LaneWSGIServer(BaseWSGIServer):
+    """
+    按执行通道分线程池的 WSGI 服务
+    接受连接后先交给 dashboard 池预读请求行，属于 trading 的再转交 trading 池，
+    监听线程本身不做任何阻塞读
+    """
+
+    multithread = True
+
+    def __init__(self, host: str, port: int, app, dashboard_threads: int = 16, trading_threads: int = 4,
+                 fd: Optional[int] = None, multiprocess: bool = False):
+        self.multiprocess = multiprocess
+        super().__init__(host, port, app, handler=LaneRequestHandler, fd=fd)
+        self.executors: Dict[str, ThreadPoolExecutor] = {
+            DASHBOARD: ThreadPoolExecutor(dashboard_threads, thread_name_prefix='dashboard'),
+            TRADING: ThreadPoolExecutor(trading_threads, thread_name_prefix='trading'),
+        }
+
+    def process_request(self, request, client_address):
+        self.executors[DASHBOARD].submit(self._dispatch, request, client_address)
+
+    def _dispatch(self, request, client_address):
+        method, path = peek_request_line(request)
+        if method is not None and classify(method, path) == TRADING:
+            self.executors[TRADING].submit(self._process, request, client_address)
+        else:
+            self._process(request, client_address)
+
+    def _process(self, request, client_address):
+        # 与 socketserver.ThreadingMixIn.process_request_thread 相同
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        for executor in getattr(self, 'executors', {}).values():
+            executor.shutdown(wait=True)
+
+
+# ----------------------------------------------------------------------
+# 预加载与一次性初始化
+# ----------------------------------------------------------------------
+def load_app(app_path: str = DEFAULT_APP):
+    """'module:attr' -> WSGI 应用"""
+    module_name, _, attr = app_path.partition(':')
+    return getattr(importlib.import_module(module_name), attr or 'app')
+
+
+def init_once():
+    """只在主进程执行一次的初始化（fork 之前）"""
+    from db_access import close_thread_connections
+    from state_store import migrate_all
+
+    # 旧 JSON 状态文件只导入一次，worker 不再各自检查
+    migrate_all()
+    # fork 前关闭主进程的数据库连接，worker 使用各自的连接
+    close_thread_connections()
+
+
+# ----------------------------------------------------------------------
+# 主进程
+# ----------------------------------------------------------------------
+def _bind(host: str, port: int, backlog: int) -> socket.socket:
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock: socket.socket, args, multiprocess: bool):
+    server = LaneWSGIServer(args.host, args.port, app, args.dashboard_threads, args.trading_threads,
+                            fd=sock.fileno(), multiprocess=multiprocess)
+
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    print(f"👷 worker {os.getpid()} 已启动（看板线程 {args.dashboard_threads}，交易线程 {args.trading_threads}）",
+          flush=True)
+    # serve_forever 收到 KeyboardInterrupt 后关闭 socket，并等待线程池中的请求处理完
+    server.serve_forever()
+
+
+def _spawn(app, sock, args) -> int:
+    pid = os.fork()
+    if pid == 0:
+        code = 0
+        try:
+            _run_worker(app, sock, args, multiprocess=True)
+        except BaseException as e:
+            print(f"❌ worker {os.getpid()} 异常退出: {e}", file=sys.stderr, flush=True)
+            code = 1
+        finally:
+            os._exit(code)
+    return pid
+
+
+def serve(args):
+    started = time.perf_counter()
+    app = load_app(args.app)
+    init_once()
+    print(f"📦 预加载 {args.app} 用时 {time.perf_counter() - started:.2f}s", flush=True)
+
+    sock = _bind(args.host, args.port, args.backlog)
+    print(f"🚀 监听 {args.host}:{args.port}，{args.workers} 个 worker", flush=True)
+    if args.workers <= 1:
+        _run_worker(app, sock, args, multiprocess=False)
+        return
+
+    workers = {_spawn(app, sock, args) for _ in range(args.workers)}
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    while workers:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        workers.discard(pid)
+        if not stopping:
+            print(f"⚠️ worker {pid} 退出（状态 {status}），重新启动", file=sys.stderr, flush=True)
+            time.sleep(RESPAWN_DELAY)
+            workers.add(_spawn(app, sock, args))
+    sock.close()
+    print("✅ 服务已停止", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='生产环境 WSGI 服务（预加载 + 多进程 + 执行通道）')
+    parser.add_argument('--app', default=DEFAULT_APP, help='WSGI 应用，module:attr')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--workers', type=int, default=4, help='worker 进程数')
+    parser.add_argument('--dashboard-threads', type=int, default=16, help='每个 worker 的看板通道线程数')
+    parser.add_argument('--trading-threads', type=int, default=4, help='每个 worker 的交易通道线程数')
+    parser.add_argument('--backlog', type=int, default=1024)
+    serve(parser.parse_args())
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@
 import requests
 import json
 from datetime import datetime, timezone, timedelta
+from state_store import SUB_ACCOUNT_CONFIG
 
 def log(msg):
     timestamp = datetime.now(timezone(timedelta(hours=8))).strftime('%Y-%m-%d %H:%M:%S')
@@ -41,8 +42,7 @@ def add_margin_to_position(account_name, inst_id, pos_side, target_margin):
         log(f"   需要补: {add_amount:.2f}U")
         
         # 加载子账户配置
-        with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = SUB_ACCOUNT_CONFIG.load()
         
         # 查找目标子账户
         sub_account = None
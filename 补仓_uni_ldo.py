@@ -10,6 +10,7 @@ from datetime import datetime, timezone, timedelta
 import hmac
 import hashlib
 import base64
+from state_store import SUB_ACCOUNT_CONFIG
 
 # API配置
 OKEX_REST_URL = "https://www.okx.com"
@@ -59,8 +60,7 @@ def add_margin_to_position(account_name, inst_id, pos_side, add_amount):
     """
     try:
         # 加载子账户配置
-        with open('sub_account_config.json', 'r', encoding='utf-8') as f:
-            config = json.load(f)
+        config = SUB_ACCOUNT_CONFIG.load()
         
         # 查找目标子账户
         sub_account = None